@@ -25,6 +25,15 @@ class Config:
     # Market data configuration - now loaded from JSON config
     CONFIG_FILE: str = os.getenv("CONFIG_FILE", "test_0.json")
     
+    # Price generation: "controlled" (linear drift) or "stochastic" (correlated GBM)
+    GENERATOR_MODE: str = os.getenv("GENERATOR_MODE", "controlled")
+    GENERATOR_SEED: int = int(os.getenv("GENERATOR_SEED")) if os.getenv("GENERATOR_SEED") else None
+    
+    # Subscriber fan-out configuration
+    SUBSCRIBER_QUEUE_SIZE: int = int(os.getenv("SUBSCRIBER_QUEUE_SIZE", "16"))
+    # drop (default) | disconnect | coalesce; coalesce is opt-in since it silently discards queued bars
+    SLOW_CONSUMER_POLICY: str = os.getenv("SLOW_CONSUMER_POLICY", "drop")
+    
     # Database configuration
     db: DatabaseConfig = DatabaseConfig()
     
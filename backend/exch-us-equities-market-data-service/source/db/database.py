@@ -203,4 +203,44 @@ class DatabaseManager:
                 
         except Exception as e:
             logger.error(f"Error saving FX data to database: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    async def copy_equity_data(self, records: List[tuple]) -> int:
+        """
+        Bulk-load equity minute bars via COPY into a staging table, then upsert.
+        Records are (timestamp, symbol, currency, open, high, low, close, vwap, vwas, vwav, volume, count).
+        """
+        columns = ['timestamp', 'symbol', 'currency', 'open', 'high', 'low', 'close',
+                   'vwap', 'vwas', 'vwav', 'volume', 'count']
+        return await self._copy_upsert('equity_data', columns, ['timestamp', 'symbol'], records)
+
+    async def copy_fx_data(self, records: List[tuple]) -> int:
+        """Bulk-load FX rates via COPY into a staging table, then upsert. Records are (timestamp, from, to, rate)."""
+        columns = ['timestamp', 'from_currency', 'to_currency', 'rate']
+        return await self._copy_upsert('fx_data', columns, ['timestamp', 'from_currency', 'to_currency'], records)
+
+    async def _copy_upsert(self, table: str, columns: List[str], conflict_columns: List[str],
+                           records: List[tuple]) -> int:
+        """COPY records into a temp table shaped like exch_us_equity.{table} and upsert them in one statement"""
+        if not records:
+            return 0
+        if not self.pool:
+            raise Exception("Cannot bulk load: database not connected")
+
+        staging = f"{table}_staging_{uuid.uuid4().hex[:8]}"
+        column_list = ', '.join(columns)
+        updates = ', '.join(f"{column} = EXCLUDED.{column}" for column in columns if column not in conflict_columns)
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    f"CREATE TEMP TABLE {staging} (LIKE exch_us_equity.{table} INCLUDING DEFAULTS) ON COMMIT DROP")
+                await conn.copy_records_to_table(staging, records=records, columns=columns)
+                await conn.execute(f'''
+                    INSERT INTO exch_us_equity.{table} ({column_list})
+                    SELECT {column_list} FROM {staging}
+                    ON CONFLICT ({', '.join(conflict_columns)}) DO UPDATE SET {updates}
+                ''')
+
+        logger.info(f"Bulk loaded {len(records)} rows into exch_us_equity.{table}")
+        return len(records)
@@ -0,0 +1,313 @@
+# source/generator/backfill.py
+"""
+Seeded historical backfill of minute bars using the stochastic generator.
+
+Simulates whole trading days for the configured universe (optionally padded with synthetic
+symbols) and writes them either to the exch_us_equity tables or straight into the exchange
+service's columnar minute store layout ({root}/{dataset}/{YYYYMMDD}/seg_NNNNN/cNNNN.npy).
+
+    python -m source.generator.backfill --start-date 2024-01-02 --days 5 --seed 7 --output db
+    python -m source.generator.backfill --start-date 2024-01-02 --days 5 --output store --store-root data/store
+    python -m source.generator.backfill --benchmark --symbols 10000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from source.config import config
+from source.generator.stochastic_generator import StochasticMarketDataGenerator, intraday_volume_curve
+
+logger = logging.getLogger(__name__)
+
+# Minute store layout shared with the exchange service
+STORE_EQUITY_DATASET = 'equity_data'
+STORE_FX_DATASET = 'fx'
+STORE_RESERVED = ('_ts', '_book', '_group', '_shape', '_key')
+STORE_SCHEMA_FILE = '_schema.json'
+
+EQUITY_FLOAT_FIELDS = ('open', 'high', 'low', 'close', 'vwap')
+
+
+def expand_universe(market_config: Dict[str, Any], symbols: int, seed: Optional[int]) -> Dict[str, Any]:
+    """Return a copy of the market config padded with synthetic symbols up to the requested universe size"""
+    expanded = dict(market_config)
+    equity = list(market_config['equity'])
+    missing = symbols - len(equity)
+    if missing > 0:
+        rng = np.random.default_rng(seed)
+        prices = np.round(rng.lognormal(np.log(50.0), 0.8, missing), 2)
+        volumes = np.rint(rng.lognormal(np.log(20000.0), 1.0, missing)).astype(int)
+        volatilities = np.round(rng.uniform(0.15, 0.6, missing), 4)
+        for i in range(missing):
+            equity.append({
+                'symbol': f"SYN{i:05d}",
+                'currency': 'USD',
+                'starting_price': float(prices[i]),
+                'price_change_per_minute': 0.0,
+                'base_volume': int(volumes[i]),
+                'trade_count': max(1, int(volumes[i]) // 100),
+                'vwas': 0.001,
+                'vwav': 0.002,
+                'exchange': 'SYNTH',
+                'volatility': float(volatilities[i])
+            })
+    expanded['equity'] = equity
+    return expanded
+
+
+class HistoricalBackfill:
+    """Generates minute bars day by day in chunks of minutes and hands each chunk to a writer"""
+
+    def __init__(self, generator: StochasticMarketDataGenerator, session: str = 'extended', chunk_minutes: int = 60):
+        self.generator = generator
+        self.session = session
+        self.chunk_minutes = max(1, chunk_minutes)
+
+        g = generator
+        self.market_open = g.market_open_hour * 60 + g.market_open_minute
+        self.market_close = g.market_close_hour * 60 + g.market_close_minute
+        if session == 'regular':
+            self.session_start, self.session_end = self.market_open, self.market_close
+        else:
+            self.session_start = g.pre_market_start_hour * 60 + g.pre_market_start_minute
+            self.session_end = g.after_hours_end_hour * 60 + g.after_hours_end_minute
+
+        self.symbols = np.asarray(g.symbols)
+        self.currencies = np.asarray([g.equity_config[s]['currency'] for s in g.symbols])
+        self.vwas = np.asarray([g.equity_config[s]['vwas'] for s in g.symbols], dtype=np.float64)
+        self.vwav = np.asarray([g.equity_config[s]['vwav'] for s in g.symbols], dtype=np.float64)
+
+    def session_minutes(self, day: date) -> List[datetime]:
+        """UTC datetimes of every session minute on a weekday (empty on weekends)"""
+        if day.weekday() >= 5:
+            return []
+        midnight = datetime(day.year, day.month, day.day)
+        minutes = []
+        for minute_of_day in range(self.session_start, self.session_end):
+            local = midnight + timedelta(minutes=minute_of_day)
+            if self.generator.timezone is not None:
+                if hasattr(self.generator.timezone, 'localize'):
+                    local = self.generator.timezone.localize(local)
+                else:
+                    local = local.replace(tzinfo=self.generator.timezone)
+                minutes.append(local.astimezone(timezone.utc).replace(tzinfo=None))
+            else:
+                minutes.append(local)
+        return minutes
+
+    def generate_day(self, day: date):
+        """Yield (utc_minutes, equity_bar_arrays, fx_rate_array) chunks for one day"""
+        minutes = self.session_minutes(day)
+        for start in range(0, len(minutes), self.chunk_minutes):
+            chunk = minutes[start:start + self.chunk_minutes]
+            minute_of_day = np.arange(self.session_start + start, self.session_start + start + len(chunk))
+            weights = intraday_volume_curve(minute_of_day, self.market_open, self.market_close)
+
+            bars = self.generator.equity_simulator.simulate(weights)
+            fx_rates = self.generator.fx_simulator.simulate(weights)['close']
+            yield chunk, bars, fx_rates
+
+    async def run(self, start_day: date, days: int, writer) -> Dict[str, int]:
+        """Backfill calendar days from start_day and return rows written per table"""
+        totals = {'equity': 0, 'fx': 0}
+        for offset in range(days):
+            day = start_day + timedelta(days=offset)
+            day_started = time.perf_counter()
+            day_rows = 0
+            for chunk, bars, fx_rates in self.generate_day(day):
+                equity_rows, fx_rows = await writer.write(self, chunk, bars, fx_rates)
+                totals['equity'] += equity_rows
+                totals['fx'] += fx_rows
+                day_rows += equity_rows
+            if day_rows:
+                logger.info(f"📅 {day.isoformat()}: {day_rows} equity bars in {time.perf_counter() - day_started:.2f}s")
+        return totals
+
+
+class DatabaseBackfillWriter:
+    """Writes backfill chunks into exch_us_equity via COPY"""
+
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    async def write(self, backfill: HistoricalBackfill, minutes: List[datetime], bars: Dict[str, np.ndarray],
+                    fx_rates: np.ndarray):
+        n_minutes, n_symbols = bars['close'].shape
+        utc_minutes = [minute.replace(tzinfo=timezone.utc) for minute in minutes]
+
+        timestamps = np.repeat(np.asarray(utc_minutes, dtype=object), n_symbols)
+        columns = [
+            timestamps,
+            np.tile(backfill.symbols.astype(object), n_minutes),
+            np.tile(backfill.currencies.astype(object), n_minutes),
+            *[np.round(bars[name], 4).ravel() for name in EQUITY_FLOAT_FIELDS],
+            np.tile(backfill.vwas, n_minutes),
+            np.tile(backfill.vwav, n_minutes),
+            bars['volume'].ravel(),
+            bars['trade_count'].ravel(),
+        ]
+        equity_records = list(zip(*[column.tolist() for column in columns]))
+
+        pairs = backfill.generator.pairs
+        fx_records = [
+            (utc_minutes[i], from_curr, to_curr, rate)
+            for i, rates in enumerate(np.round(fx_rates, 6).tolist())
+            for (from_curr, to_curr), rate in zip(pairs, rates)
+        ]
+
+        await self.db_manager.copy_equity_data(equity_records)
+        await self.db_manager.copy_fx_data(fx_records)
+        return len(equity_records), len(fx_records)
+
+
+class MinuteStoreBackfillWriter:
+    """Writes backfill chunks as minute store segments, one segment per chunk and UTC day"""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    async def write(self, backfill: HistoricalBackfill, minutes: List[datetime], bars: Dict[str, np.ndarray],
+                    fx_rates: np.ndarray):
+        ts_keys = np.asarray([int(minute.strftime('%Y%m%d%H%M')) for minute in minutes], dtype=np.int64)
+        iso_times = np.asarray([json.dumps(minute.isoformat() + 'Z') for minute in minutes])
+        days = ts_keys // 10000
+
+        pairs = backfill.generator.pairs
+        from_json = np.asarray([json.dumps(pair[0]) for pair in pairs])
+        to_json = np.asarray([json.dumps(pair[1]) for pair in pairs])
+        symbol_json = np.asarray([json.dumps(s) for s in backfill.symbols.tolist()])
+        currency_json = np.asarray([json.dumps(c) for c in backfill.currencies.tolist()])
+
+        equity_rows = fx_rows = 0
+        for day in np.unique(days):
+            sel = days == day
+            n_minutes = int(sel.sum())
+
+            equity_fields = {
+                'symbol': ('json', np.tile(symbol_json, n_minutes)),
+                'currency': ('json', np.tile(currency_json, n_minutes)),
+                **{name: ('float', np.round(bars[name][sel], 4).ravel()) for name in EQUITY_FLOAT_FIELDS},
+                'vwas': ('float', np.tile(backfill.vwas, n_minutes)),
+                'vwav': ('float', np.tile(backfill.vwav, n_minutes)),
+                'volume': ('int', bars['volume'][sel].ravel()),
+                'count': ('int', bars['trade_count'][sel].ravel()),
+            }
+            equity_rows += self._write_segment(STORE_EQUITY_DATASET, str(day), ts_keys[sel], len(backfill.symbols),
+                                               equity_fields)
+
+            if pairs:
+                fx_fields = {
+                    'from_currency': ('json', np.tile(from_json, n_minutes)),
+                    'to_currency': ('json', np.tile(to_json, n_minutes)),
+                    'rate': ('float', np.round(fx_rates[sel], 6).ravel()),
+                    'timestamp': ('json', np.repeat(iso_times[sel], len(pairs))),
+                }
+                fx_rows += self._write_segment(STORE_FX_DATASET, str(day), ts_keys[sel], len(pairs), fx_fields)
+
+        return equity_rows, fx_rows
+
+    def _write_segment(self, dataset: str, day: str, ts_keys: np.ndarray, rows_per_minute: int,
+                       fields: Dict[str, tuple]) -> int:
+        """Write one segment of list-shaped payloads (one payload per minute) in the store's column format"""
+        n_rows = len(ts_keys) * rows_per_minute
+        columns = {
+            '_ts': np.repeat(ts_keys, rows_per_minute),
+            '_book': np.full(n_rows, '', dtype='<U1'),
+            '_group': np.repeat(np.arange(len(ts_keys), dtype=np.int64), rows_per_minute),
+            '_shape': np.full(n_rows, 'list', dtype='<U4'),
+            '_key': np.full(n_rows, '', dtype='<U1'),
+        }
+        types = {}
+        for name, (kind, values) in fields.items():
+            columns[name] = values
+            types[name] = kind
+
+        day_dir = os.path.join(self.root, dataset, day)
+        os.makedirs(day_dir, exist_ok=True)
+        existing = sorted(name for name in os.listdir(day_dir) if name.startswith('seg_') and not name.endswith('.tmp'))
+        segment_index = int(existing[-1][4:]) + 1 if existing else 0
+        segment_dir = os.path.join(day_dir, f"seg_{segment_index:05d}")
+        tmp_dir = segment_dir + '.tmp'
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        for position, (name, array) in enumerate(columns.items()):
+            np.save(os.path.join(tmp_dir, f"c{position:04d}.npy"), array, allow_pickle=False)
+        with open(os.path.join(tmp_dir, STORE_SCHEMA_FILE), 'w') as f:
+            json.dump({'columns': list(columns), 'types': types}, f)
+
+        # Rename last so readers never see a partially written segment
+        os.replace(tmp_dir, segment_dir)
+        return n_rows
+
+
+def benchmark(market_config: Dict[str, Any], symbols: int, seed: Optional[int]) -> None:
+    """Time generating one regular trading session for the given universe size"""
+    generator = StochasticMarketDataGenerator(expand_universe(market_config, symbols, seed), seed=seed)
+    backfill = HistoricalBackfill(generator, session='regular', chunk_minutes=390)
+
+    day = date(2024, 1, 2)
+    started = time.perf_counter()
+    rows = sum(bars['close'].size for _, bars, _ in backfill.generate_day(day))
+    elapsed = time.perf_counter() - started
+
+    print(f"symbols={len(generator.symbols)} minutes={backfill.market_close - backfill.market_open} "
+          f"bars={rows} seconds={elapsed:.3f} bars_per_second={rows / elapsed:,.0f}")
+
+
+async def _run_backfill(args, market_config: Dict[str, Any]) -> None:
+    generator = StochasticMarketDataGenerator(expand_universe(market_config, args.symbols, args.seed), seed=args.seed)
+    backfill = HistoricalBackfill(generator, session=args.session, chunk_minutes=args.chunk_minutes)
+    start_day = datetime.strptime(args.start_date, '%Y-%m-%d').date()
+
+    db_manager = None
+    if args.output == 'db':
+        from source.db.database import DatabaseManager
+        db_manager = DatabaseManager()
+        await db_manager.connect()
+        writer = DatabaseBackfillWriter(db_manager)
+    else:
+        writer = MinuteStoreBackfillWriter(args.store_root)
+
+    started = time.perf_counter()
+    try:
+        totals = await backfill.run(start_day, args.days, writer)
+    finally:
+        if db_manager:
+            await db_manager.close()
+
+    logger.info(f"✅ Backfilled {totals['equity']} equity bars and {totals['fx']} FX rates "
+                f"to {args.output} in {time.perf_counter() - started:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seeded historical minute bar backfill")
+    parser.add_argument('--start-date', default=(date.today() - timedelta(days=7)).isoformat())
+    parser.add_argument('--days', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=config.GENERATOR_SEED)
+    parser.add_argument('--symbols', type=int, default=0, help="pad the configured universe with synthetic symbols")
+    parser.add_argument('--session', choices=('extended', 'regular'), default='extended')
+    parser.add_argument('--chunk-minutes', type=int, default=60)
+    parser.add_argument('--output', choices=('db', 'store'), default='db')
+    parser.add_argument('--store-root', default='data/store')
+    parser.add_argument('--benchmark', action='store_true', help="time one regular session and exit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    market_config = config.load_market_config()
+
+    if args.benchmark:
+        benchmark(market_config, args.symbols or 10000, args.seed)
+        return
+
+    asyncio.run(_run_backfill(args, market_config))
+
+
+if __name__ == '__main__':
+    main()
@@ -212,31 +212,7 @@ class ControlledMarketDataGenerator:
         fx_rates_to_use = self.current_fx_rates if is_trading else self.last_market_fx_rates
         
         # Generate equity data
-        equity_data = []
-        for symbol in prices_to_use:
-            config = self.equity_config[symbol]
-            price = prices_to_use[symbol]
-            
-            # Generate controlled OHLC with minimal spread
-            open_price = round(price, 2)
-            high_price = round(price + 0.01, 2)
-            low_price = round(price - 0.01, 2) 
-            close_price = round(price, 2)
-            
-            equity_data.append({
-                'symbol': symbol,
-                'open': open_price,
-                'high': high_price,
-                'low': low_price,
-                'close': close_price,
-                'vwap': round(price, 2),
-                'vwas': round(config["vwas"], 4),
-                'vwav': round(config["vwav"], 4),
-                'volume': config["base_volume"] if is_trading else 0,  # No volume when closed
-                'trade_count': config["trade_count"] if is_trading else 0,  # No trades when closed
-                'currency': config["currency"],
-                'exchange': config["exchange"]
-            })
+        equity_data = self._build_equity_data(prices_to_use, is_trading)
         
         # Generate FX data
         fx_data = []
@@ -267,6 +243,35 @@ class ControlledMarketDataGenerator:
             'is_weekend': current_market_time.weekday() >= 5
         }
 
+    def _build_equity_data(self, prices: Dict[str, float], is_trading: bool) -> List[Dict[str, Any]]:
+        """Build minute bar records from the given prices"""
+        equity_data = []
+        for symbol in prices:
+            config = self.equity_config[symbol]
+            price = prices[symbol]
+            
+            # Generate controlled OHLC with minimal spread
+            open_price = round(price, 2)
+            high_price = round(price + 0.01, 2)
+            low_price = round(price - 0.01, 2) 
+            close_price = round(price, 2)
+            
+            equity_data.append({
+                'symbol': symbol,
+                'open': open_price,
+                'high': high_price,
+                'low': low_price,
+                'close': close_price,
+                'vwap': round(price, 2),
+                'vwas': round(config["vwas"], 4),
+                'vwav': round(config["vwav"], 4),
+                'volume': config["base_volume"] if is_trading else 0,  # No volume when closed
+                'trade_count': config["trade_count"] if is_trading else 0,  # No trades when closed
+                'currency': config["currency"],
+                'exchange': config["exchange"]
+            })
+        return equity_data
+
     def get_current_time(self) -> datetime:
         """Get the current UTC time"""
         return datetime.utcnow()
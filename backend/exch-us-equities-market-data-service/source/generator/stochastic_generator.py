@@ -0,0 +1,192 @@
+# source/generator/stochastic_generator.py
+import logging
+from typing import Dict, List, Any, Optional, Sequence
+
+import numpy as np
+
+from source.generator.market_data_generator import ControlledMarketDataGenerator
+
+logger = logging.getLogger(__name__)
+
+MINUTES_PER_YEAR = 252 * 390
+
+# Defaults for config entries that do not carry stochastic parameters
+DEFAULT_EQUITY_VOLATILITY = 0.25  # annualized
+DEFAULT_FX_VOLATILITY = 0.08
+DEFAULT_MARKET_CORRELATION = 0.3
+EXTENDED_HOURS_VOLUME_FACTOR = 0.1
+
+
+def intraday_volume_curve(minutes_of_day: np.ndarray, market_open: int, market_close: int) -> np.ndarray:
+    """
+    U-shaped volume weight per minute of day (mean ~1 over the regular session).
+    Pre-market and after-hours minutes get a flat fraction of the regular-session level.
+    """
+    minutes_of_day = np.asarray(minutes_of_day, dtype=np.float64)
+    session_length = max(1, market_close - market_open)
+    x = (minutes_of_day - market_open) / session_length
+    regular = (x >= 0) & (x < 1)
+
+    # Heavy open and close, quiet midday: 0.5 + 3 * (2x - 1)^2 averages to 1.5 -> normalize
+    curve = (0.5 + 3.0 * (2.0 * x - 1.0) ** 2) / 1.5
+    return np.where(regular, curve, EXTENDED_HOURS_VOLUME_FACTOR)
+
+
+class StochasticPathSimulator:
+    """
+    Vectorized correlated geometric Brownian motion for a whole universe.
+    Correlation follows a one-factor model: every name loads sqrt(rho) on a shared market shock,
+    so the full correlation matrix never has to be built or factorized.
+    """
+
+    def __init__(self, start_prices: Sequence[float], volatilities: Sequence[float], drifts: Sequence[float],
+                 base_volumes: Sequence[float], trade_counts: Sequence[float],
+                 market_correlation: float = DEFAULT_MARKET_CORRELATION, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+        self.prices = np.asarray(start_prices, dtype=np.float64).copy()
+        self.base_volumes = np.asarray(base_volumes, dtype=np.float64)
+        self.trade_counts = np.asarray(trade_counts, dtype=np.float64)
+
+        sigma = np.asarray(volatilities, dtype=np.float64) / np.sqrt(MINUTES_PER_YEAR)
+        mu = np.asarray(drifts, dtype=np.float64) / MINUTES_PER_YEAR
+        self.sigma = sigma
+        self.log_drift = mu - 0.5 * sigma ** 2
+
+        rho = float(np.clip(market_correlation, 0.0, 1.0))
+        self.market_loading = np.sqrt(rho)
+        self.idio_loading = np.sqrt(1.0 - rho)
+
+    @property
+    def size(self) -> int:
+        return self.prices.shape[0]
+
+    def simulate(self, volume_weights: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Advance one step per entry of volume_weights and return (steps, symbols) bar arrays:
+        open, high, low, close, vwap, volume, trade_count.
+        """
+        volume_weights = np.asarray(volume_weights, dtype=np.float64)
+        steps, n = volume_weights.shape[0], self.size
+
+        market = self.rng.standard_normal((steps, 1))
+        shocks = self.market_loading * market + self.idio_loading * self.rng.standard_normal((steps, n))
+        log_returns = self.log_drift + self.sigma * shocks
+
+        close = self.prices * np.exp(np.cumsum(log_returns, axis=0))
+        open_ = np.empty_like(close)
+        open_[0] = self.prices
+        open_[1:] = close[:-1]
+
+        # Intra-minute range scales with the minute's volatility
+        wick = self.sigma * np.abs(self.rng.standard_normal((2, steps, n)))
+        high = np.maximum(open_, close) * np.exp(wick[0])
+        low = np.minimum(open_, close) * np.exp(-wick[1])
+        vwap = (high + low + close) / 3.0
+
+        activity = volume_weights[:, None] * self.rng.lognormal(0.0, 0.25, (steps, n))
+        volume = np.rint(self.base_volumes * activity).astype(np.int64)
+        trade_count = np.maximum(1, np.rint(self.trade_counts * activity)).astype(np.int64)
+
+        self.prices = close[-1].copy()
+        return {
+            'open': open_,
+            'high': high,
+            'low': low,
+            'close': close,
+            'vwap': vwap,
+            'volume': volume,
+            'trade_count': trade_count,
+        }
+
+
+class StochasticMarketDataGenerator(ControlledMarketDataGenerator):
+    """
+    Market data generator driven by StochasticPathSimulator instead of linear drift.
+    Equity config entries may add 'volatility' and 'drift' (annualized); FX entries may add 'volatility'.
+    The market config may set 'market_correlation' for the shared equity factor.
+    """
+
+    def __init__(self, market_config: Dict[str, Any], seed: Optional[int] = None):
+        super().__init__(market_config)
+
+        self.symbols: List[str] = list(self.current_prices.keys())
+        self.pairs: List[tuple] = list(self.current_fx_rates.keys())
+        equities = [self.equity_config[symbol] for symbol in self.symbols]
+        fx_pairs = [self.fx_config[pair] for pair in self.pairs]
+
+        self.equity_simulator = StochasticPathSimulator(
+            start_prices=[eq["starting_price"] for eq in equities],
+            volatilities=[eq.get("volatility", DEFAULT_EQUITY_VOLATILITY) for eq in equities],
+            drifts=[eq.get("drift", 0.0) for eq in equities],
+            base_volumes=[eq["base_volume"] for eq in equities],
+            trade_counts=[eq["trade_count"] for eq in equities],
+            market_correlation=market_config.get("market_correlation", DEFAULT_MARKET_CORRELATION),
+            seed=seed
+        )
+        self.fx_simulator = StochasticPathSimulator(
+            start_prices=[fx["starting_rate"] for fx in fx_pairs],
+            volatilities=[fx.get("volatility", DEFAULT_FX_VOLATILITY) for fx in fx_pairs],
+            drifts=[0.0] * len(fx_pairs),
+            base_volumes=[0] * len(fx_pairs),
+            trade_counts=[0] * len(fx_pairs),
+            market_correlation=0.0,
+            seed=None if seed is None else seed + 1
+        )
+
+        self.market_open_minutes = self.market_open_hour * 60 + self.market_open_minute
+        self.market_close_minutes = self.market_close_hour * 60 + self.market_close_minute
+        self.last_bar: Optional[Dict[str, np.ndarray]] = None
+
+        logger.info(f"Stochastic generator: {len(self.symbols)} symbols, {len(self.pairs)} FX pairs, seed={seed}")
+
+    def update_prices(self):
+        """Advance the whole universe one minute during market hours"""
+        current_market_time = self._get_current_market_time()
+        is_trading, market_status = self.is_market_hours(current_market_time)
+
+        if not is_trading:
+            logger.debug(f"Market closed ({market_status}) - using last available prices")
+            return
+
+        minute_of_day = current_market_time.hour * 60 + current_market_time.minute
+        weights = intraday_volume_curve(np.array([minute_of_day]), self.market_open_minutes, self.market_close_minutes)
+
+        bar = self.equity_simulator.simulate(weights)
+        self.last_bar = {name: values[0] for name, values in bar.items()}
+        fx_rates = self.fx_simulator.simulate(weights)['close'][0]
+
+        self.current_prices = dict(zip(self.symbols, np.round(self.last_bar['close'], 2).tolist()))
+        self.current_fx_rates = dict(zip(self.pairs, np.round(fx_rates, 4).tolist()))
+        self.last_market_prices = self.current_prices.copy()
+        self.last_market_fx_rates = self.current_fx_rates.copy()
+
+        logger.debug(f"Simulated {len(self.symbols)} symbols during {market_status}")
+
+    def _build_equity_data(self, prices: Dict[str, float], is_trading: bool) -> List[Dict[str, Any]]:
+        """Build minute bar records from the last simulated bar"""
+        if self.last_bar is None:
+            return super()._build_equity_data(prices, is_trading)
+
+        columns = {name: np.round(self.last_bar[name], 2).tolist()
+                   for name in ('open', 'high', 'low', 'close', 'vwap')}
+        volumes = self.last_bar['volume'].tolist()
+        trade_counts = self.last_bar['trade_count'].tolist()
+
+        equity_data = []
+        for i, symbol in enumerate(self.symbols):
+            config = self.equity_config[symbol]
+            equity_data.append({
+                'symbol': symbol,
+                'open': columns['open'][i],
+                'high': columns['high'][i],
+                'low': columns['low'][i],
+                'close': columns['close'][i],
+                'vwap': columns['vwap'][i],
+                'vwas': round(config["vwas"], 4),
+                'vwav': round(config["vwav"], 4),
+                'volume': volumes[i] if is_trading else 0,  # No volume when closed
+                'trade_count': trade_counts[i] if is_trading else 0,  # No trades when closed
+                'currency': config["currency"],
+                'exchange': config["exchange"]
+            })
+        return equity_data
@@ -9,9 +9,9 @@ import os
 from source.config import config
 from source.utils.logging_utils import setup_logging
 from source.generator.market_data_generator import ControlledMarketDataGenerator
+from source.generator.stochastic_generator import StochasticMarketDataGenerator
 from source.db.database import DatabaseManager
-from source.api.grpc.market_exchange_interface_pb2_grpc import add_MarketDataServiceServicer_to_server
-from source.service.market_data_service import MarketDataService
+from source.service.market_data_service import MarketDataService, add_market_data_service_to_server
 from source.service.health import HealthService
 
 async def shutdown(service, server, health_service):
@@ -64,8 +64,12 @@ async def main():
         logger.info(f"   After-hrs:  {market_hours.get('market_close', 16):02d}:{market_hours.get('market_close_min', 0):02d} - {market_hours.get('after_hours_end', 20):02d}:{market_hours.get('after_hours_end_min', 0):02d}")
         logger.info(f"   Data policy: Live during market hours, last available during weekends/holidays/closed hours")
         
-        # Create the controlled market data generator
-        generator = ControlledMarketDataGenerator(market_config)
+        # Create the market data generator
+        if config.GENERATOR_MODE == "stochastic":
+            generator = StochasticMarketDataGenerator(market_config, seed=config.GENERATOR_SEED)
+            logger.info(f"🎲 Generator: stochastic (seed={config.GENERATOR_SEED})")
+        else:
+            generator = ControlledMarketDataGenerator(market_config)
         
         # Create database manager
         db_manager = DatabaseManager()
@@ -82,7 +86,7 @@ async def main():
 
         # Create gRPC server
         server = grpc.aio.server()
-        add_MarketDataServiceServicer_to_server(service, server)
+        add_market_data_service_to_server(service, server)
         
         # Start server
         server_addr = f"{config.API_HOST}:{config.API_PORT}"
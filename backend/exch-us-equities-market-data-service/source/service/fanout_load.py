@@ -0,0 +1,107 @@
+# source/service/fanout_load.py
+"""
+Local load generator for subscriber fan-out.
+Attaches N in-process subscribers (a fraction of them artificially slow) to
+SubscriberStream writers and reports p50/p99 delivery latency for each bar.
+
+    python -m source.service.fanout_load --subscribers 200 --slow-fraction 0.1
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+from source.service.subscriber_stream import SubscriberStream, SLOW_CONSUMER_POLICIES
+
+
+class _FakeContext:
+    """Stand-in for a gRPC stream context that records when each bar arrives"""
+
+    def __init__(self, write_delay: float, arrivals: Dict[int, List[float]]):
+        self.write_delay = write_delay
+        self.arrivals = arrivals
+
+    async def write(self, payload):
+        if self.write_delay:
+            await asyncio.sleep(self.write_delay)
+        bar_number = int.from_bytes(payload[:4], 'big')
+        self.arrivals.setdefault(bar_number, []).append(time.monotonic())
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_load(subscribers: int, slow_fraction: float, slow_delay: float, bars: int,
+                   interval: float, payload_size: int, queue_size: int, policy: str):
+    """Broadcast bars to local subscribers and print delivery latency per bar"""
+    arrivals: Dict[int, List[float]] = {}
+    published: Dict[int, float] = {}
+    slow_count = int(subscribers * slow_fraction)
+
+    streams = []
+    for i in range(subscribers):
+        delay = slow_delay if i < slow_count else 0.0
+        streams.append(SubscriberStream(f"load-{i}", _FakeContext(delay, arrivals), queue_size, policy))
+    writers = [asyncio.create_task(stream.run()) for stream in streams]
+
+    disconnected = 0
+    padding = b'\x00' * max(0, payload_size - 4)
+    for bar_number in range(bars):
+        payload = bar_number.to_bytes(4, 'big') + padding
+        published[bar_number] = time.monotonic()
+        for stream in streams:
+            if not stream.closed and not stream.offer(payload):
+                disconnected += 1
+        await asyncio.sleep(interval)
+
+    # Give fast writers time to finish, then stop everything
+    await asyncio.sleep(max(interval, slow_delay))
+    for stream in streams:
+        stream.close()
+    await asyncio.gather(*writers, return_exceptions=True)
+
+    print(f"subscribers={subscribers} slow={slow_count} policy={policy} queue={queue_size}")
+    print(f"{'bar':>5} {'delivered':>9} {'p50_ms':>9} {'p99_ms':>9}")
+    for bar_number in range(bars):
+        latencies = [(t - published[bar_number]) * 1000 for t in arrivals.get(bar_number, [])]
+        if not latencies:
+            print(f"{bar_number:>5} {0:>9} {'-':>9} {'-':>9}")
+            continue
+        print(f"{bar_number:>5} {len(latencies):>9} "
+              f"{statistics.median(latencies):>9.3f} {_percentile(latencies, 99):>9.3f}")
+
+    dropped = sum(s.bars_dropped for s in streams)
+    coalesced = sum(s.bars_coalesced for s in streams)
+    print(f"dropped={dropped} coalesced={coalesced} disconnected={disconnected}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Subscriber fan-out load generator")
+    parser.add_argument('--subscribers', type=int, default=200)
+    parser.add_argument('--slow-fraction', type=float, default=0.1)
+    parser.add_argument('--slow-delay', type=float, default=0.5, help="seconds per write for slow subscribers")
+    parser.add_argument('--bars', type=int, default=20)
+    parser.add_argument('--interval', type=float, default=0.05, help="seconds between bars")
+    parser.add_argument('--payload-size', type=int, default=4096)
+    parser.add_argument('--queue-size', type=int, default=4)
+    parser.add_argument('--policy', choices=SLOW_CONSUMER_POLICIES, default='drop')
+    args = parser.parse_args()
+
+    asyncio.run(run_load(
+        subscribers=max(1, args.subscribers),
+        slow_fraction=args.slow_fraction,
+        slow_delay=args.slow_delay,
+        bars=args.bars,
+        interval=args.interval,
+        payload_size=args.payload_size,
+        queue_size=args.queue_size,
+        policy=args.policy
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -8,6 +8,7 @@ from typing import Dict, List, Any
 
 from source.api.grpc.market_exchange_interface_pb2 import SubscriptionRequest, MarketDataStream, EquityData, FXRate
 from source.api.grpc.market_exchange_interface_pb2_grpc import MarketDataServiceServicer
+from source.service.subscriber_stream import SubscriberStream
 from source.generator.market_data_generator import ControlledMarketDataGenerator
 from source.db.database import DatabaseManager
 from source.config import config
@@ -25,7 +26,7 @@ class MarketDataService(MarketDataServiceServicer):
     def __init__(self, generator: ControlledMarketDataGenerator, db_manager: DatabaseManager):
         self.generator = generator
         self.db_manager = db_manager
-        self.subscribers = {}  # Maps client_id to subscription stream context
+        self.subscribers: Dict[str, SubscriberStream] = {}  # Maps client_id to its queued writer
         self.running = False
         self.broadcast_task = None
         
@@ -38,6 +39,9 @@ class MarketDataService(MarketDataServiceServicer):
         self.market_hours_updates = 0
         self.closed_hours_updates = 0
         self.weekend_updates = 0
+        self.bars_dropped = 0
+        self.bars_coalesced = 0
+        self.slow_disconnects = 0
         
         logger.info(f"Market data service initialized for 24/7/365 Kubernetes operation")
         logger.info(f"Always provides data - live during market hours, last available otherwise")
@@ -64,6 +68,10 @@ class MarketDataService(MarketDataServiceServicer):
         logger.info("🛑 Stopping market data service")
         self.running = False
         
+        # Let every open subscription return
+        for client_id in list(self.subscribers):
+            self._remove_subscriber(client_id)
+        
         if self.broadcast_task:
             self.broadcast_task.cancel()
             try:
@@ -190,14 +198,8 @@ class MarketDataService(MarketDataServiceServicer):
         except Exception as e:
             logger.error(f"Error generating minute bar: {e}", exc_info=True)
     
-    async def _broadcast_market_data(self, market_data):
-        """Broadcast minute bar data to all subscribers - always broadcasts based on exchange parameters"""
-        is_trading = market_data['is_trading_hours']
-        market_status = market_data['market_status']
-        is_weekend = market_data['is_weekend']
-        
-        logger.debug(f"📡 Broadcasting {market_status} minute bar for {len(market_data['equity'])} symbols to {len(self.subscribers)} subscribers")
-        
+    def _build_stream_message(self, market_data) -> bytes:
+        """Build the MarketDataStream protobuf for a minute bar and serialize it once"""
         # Convert equity data to protobuf EquityData format
         equity_data_list = []
         for eq in market_data['equity']:
@@ -237,23 +239,31 @@ class MarketDataService(MarketDataServiceServicer):
             batch_number=self.batch_count
         )
         
-        # Send to all subscribers
-        dead_subscribers = []
+        # Shared by every subscriber - the response serializer passes bytes through untouched
+        return stream_message.SerializeToString()
+    
+    async def _broadcast_market_data(self, market_data):
+        """Queue minute bar data for all subscribers - never waits on a subscriber's write"""
+        market_status = market_data['market_status']
         
-        for client_id, context in self.subscribers.items():
-            try:
-                await context.write(stream_message)
-                data_type = "live" if is_trading else ("weekend last" if is_weekend else "last market")
-                logger.debug(f"✅ Sent {data_type} minute bar to {client_id}")
-            except Exception as e:
-                logger.warning(f"⚠️ Failed to send minute bar to {client_id}: {e}")
-                dead_subscribers.append(client_id)
+        logger.debug(f"📡 Broadcasting {market_status} minute bar for {len(market_data['equity'])} symbols to {len(self.subscribers)} subscribers")
         
-        # Remove dead subscribers
-        for client_id in dead_subscribers:
-            logger.info(f"🗑️ Removing dead subscriber: {client_id}")
-            del self.subscribers[client_id]
+        payload = self._build_stream_message(market_data)
         
+        # Hand the shared payload to each subscriber's writer task
+        for client_id, stream in list(self.subscribers.items()):
+            if not stream.offer(payload):
+                self.slow_disconnects += 1
+                self._remove_subscriber(client_id)
+    
+    def _remove_subscriber(self, client_id: str):
+        """Close a subscriber's stream and drop it from the registry"""
+        stream = self.subscribers.pop(client_id, None)
+        if stream is None:
+            return
+        stream.close()
+        self.bars_dropped += stream.bars_dropped
+        self.bars_coalesced += stream.bars_coalesced
         self.subscribers_count = len(self.subscribers)
     
     async def SubscribeToMarketData(self, request: SubscriptionRequest, context):
@@ -267,59 +277,28 @@ class MarketDataService(MarketDataServiceServicer):
         
         logger.info(f"📡 New subscription from {client_id} (include_history: {include_history})")
         
-        # Register this subscriber
-        self.subscribers[client_id] = context
+        # Replace any previous stream registered under the same id
+        self._remove_subscriber(client_id)
+        
+        # Register this subscriber with its own bounded queue
+        stream = SubscriberStream(
+            client_id,
+            context,
+            max_queue=config.SUBSCRIBER_QUEUE_SIZE,
+            policy=config.SLOW_CONSUMER_POLICY
+        )
+        self.subscribers[client_id] = stream
         self.subscribers_count = len(self.subscribers)
         
-        # Generate initial market data
+        # Queue initial market data ahead of the next minute bar
         market_data = self.generator.get_market_data()
         is_trading = market_data['is_trading_hours']
         market_status = market_data['market_status']
         is_weekend = market_data['is_weekend']
-       
-        # Convert equity data to protobuf format
-        equity_data_list = []
-        for eq in market_data['equity']:
-            equity_data = EquityData(
-                symbol=eq['symbol'],
-                open=eq['open'],
-                high=eq['high'],
-                low=eq['low'],
-                close=eq['close'],
-                volume=eq['volume'],
-                trade_count=eq['trade_count'],
-                vwap=eq['vwap'],
-                exchange=eq['exchange'],
-                currency=eq['currency'],
-                vwas=eq['vwas'],
-                vwav=eq['vwav']
-            )
-            equity_data_list.append(equity_data)
         
-        # Convert FX data to protobuf format
-        fx_data_list = []
-        for fx in market_data['fx']:
-            fx_rate = FXRate(
-                from_currency=fx['from_currency'],
-                to_currency=fx['to_currency'],
-                timestamp=fx['timestamp'],
-                rate=fx['rate']
-            )
-            fx_data_list.append(fx_rate)
-        
-        # Create initial MarketDataStream message
-        initial_stream = MarketDataStream(
-            timestamp=market_data['timestamp'],
-            bin_time=market_data['bin_time'],
-            equity=equity_data_list,
-            fx=fx_data_list,
-            batch_number=self.batch_count
-        )
-        
-        # Send initial update with market status info
-        await context.write(initial_stream)
+        stream.offer(self._build_stream_message(market_data))
         data_type = "live" if is_trading else ("weekend last" if is_weekend else "last market")
-        logger.info(f"📤 Sent initial {data_type} minute bar to {client_id} (market: {market_status})")
+        logger.info(f"📤 Queued initial {data_type} minute bar for {client_id} (market: {market_status})")
         
         # If history is requested, send historical data (implement as needed)
         if include_history:
@@ -328,16 +307,14 @@ class MarketDataService(MarketDataServiceServicer):
         
         # Keep the stream open until client disconnects or we shut down
         try:
-            while self.running and client_id in self.subscribers:
-                await asyncio.sleep(10)  # Keep stream alive
+            await stream.run()
         except Exception as e:
             logger.warning(f"📡 Subscriber {client_id} disconnected: {e}")
         finally:
             # Clean up when client disconnects
-            if client_id in self.subscribers:
-                del self.subscribers[client_id]
-                self.subscribers_count = len(self.subscribers)
-                logger.info(f"📡 Subscription ended for {client_id}")
+            if self.subscribers.get(client_id) is stream:
+                self._remove_subscriber(client_id)
+            logger.info(f"📡 Subscription ended for {client_id} ({stream.bars_sent} bars sent)")
 
     def get_stats(self) -> Dict[str, Any]:
         """Get service statistics including 24/7/365 operation info"""
@@ -356,6 +333,11 @@ class MarketDataService(MarketDataServiceServicer):
             'market_hours_updates': self.market_hours_updates,
             'closed_hours_updates': self.closed_hours_updates,
             'weekend_updates': self.weekend_updates,
+            'slow_consumer_policy': config.SLOW_CONSUMER_POLICY,
+            'bars_dropped': self.bars_dropped + sum(s.bars_dropped for s in self.subscribers.values()),
+            'bars_coalesced': self.bars_coalesced + sum(s.bars_coalesced for s in self.subscribers.values()),
+            'slow_disconnects': self.slow_disconnects,
+            'subscriber_delivery': {client_id: s.get_stats() for client_id, s in self.subscribers.items()},
             'utc_time': utc_time.isoformat() + 'Z',
             'market_time': market_time.strftime('%Y-%m-%d %H:%M:%S %Z'),
             'market_status': market_status,
@@ -377,4 +359,25 @@ class MarketDataService(MarketDataServiceServicer):
                 'after_hours': f"{self.generator.market_close_hour:02d}:{self.generator.market_close_minute:02d}-{self.generator.after_hours_end_hour:02d}:{self.generator.after_hours_end_minute:02d}",
                 'timezone': self.generator.timezone_name
             }
-        }
\ No newline at end of file
+        }
+
+
+def _serialize_stream(message) -> bytes:
+    """Response serializer that accepts pre-serialized bytes as well as messages"""
+    if isinstance(message, bytes):
+        return message
+    return message.SerializeToString()
+
+
+def add_market_data_service_to_server(servicer: MarketDataService, server):
+    """Register the servicer with a serializer that lets broadcasts share one encoded bar"""
+    rpc_method_handlers = {
+        'SubscribeToMarketData': grpc.unary_stream_rpc_method_handler(
+            servicer.SubscribeToMarketData,
+            request_deserializer=SubscriptionRequest.FromString,
+            response_serializer=_serialize_stream,
+        ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+        'market_data.MarketDataService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
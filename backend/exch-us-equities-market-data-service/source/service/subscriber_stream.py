@@ -0,0 +1,106 @@
+# source/service/subscriber_stream.py
+import asyncio
+import logging
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SLOW_CONSUMER_POLICIES = ('drop', 'coalesce', 'disconnect')
+
+_CLOSE = object()
+
+
+class SubscriberStream:
+    """
+    Bounded outbound queue plus writer task for a single subscriber.
+    A slow subscriber only backs up its own queue; when that queue is full the
+    slow-consumer policy decides what happens to the next bar:
+      - drop:       discard the new bar, keep what is already queued (default; drops are logged and counted)
+      - disconnect: end the subscription
+      - coalesce:   replace everything queued with the new bar (latest wins). Opt-in only: the
+                    subscriber silently misses the bars that were queued
+    """
+
+    def __init__(self, client_id: str, context: Any, max_queue: int, policy: str):
+        if policy not in SLOW_CONSUMER_POLICIES:
+            raise ValueError(f"Unknown slow consumer policy: {policy}")
+
+        self.client_id = client_id
+        self.context = context
+        self.policy = policy
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, max_queue))
+        self.closed = False
+
+        # Metrics
+        self.bars_sent = 0
+        self.bars_dropped = 0
+        self.bars_coalesced = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+
+    def offer(self, payload: Any) -> bool:
+        """Queue a bar without blocking - returns False if the subscriber should be disconnected"""
+        if self.closed:
+            return False
+
+        item = (time.monotonic(), payload)
+        if not self.queue.full():
+            self.queue.put_nowait(item)
+            return True
+
+        if self.policy == 'drop':
+            self.bars_dropped += 1
+            if self.bars_dropped == 1 or self.bars_dropped % 100 == 0:
+                logger.warning(f"🐢 Dropping bars for slow subscriber {self.client_id} "
+                               f"({self.bars_dropped} dropped so far)")
+            return True
+
+        if self.policy == 'coalesce':
+            self.bars_coalesced += self._drain()
+            self.queue.put_nowait(item)
+            return True
+
+        logger.warning(f"🐢 Disconnecting slow subscriber {self.client_id} ({self.queue.qsize()} bars queued)")
+        self.close()
+        return False
+
+    def close(self):
+        """Stop the writer after anything already queued is discarded"""
+        if self.closed:
+            return
+        self.closed = True
+        self._drain()
+        self.queue.put_nowait((time.monotonic(), _CLOSE))
+
+    async def run(self):
+        """Write queued bars to the subscriber until closed or the write fails"""
+        while True:
+            enqueued_at, payload = await self.queue.get()
+            if payload is _CLOSE:
+                return
+
+            await self.context.write(payload)
+
+            self.bars_sent += 1
+            self.last_latency = time.monotonic() - enqueued_at
+            self.max_latency = max(self.max_latency, self.last_latency)
+
+    def _drain(self) -> int:
+        """Discard all queued items and return how many were removed"""
+        removed = 0
+        while not self.queue.empty():
+            self.queue.get_nowait()
+            removed += 1
+        return removed
+
+    def get_stats(self) -> dict:
+        """Per-subscriber delivery statistics"""
+        return {
+            'queued': self.queue.qsize(),
+            'bars_sent': self.bars_sent,
+            'bars_dropped': self.bars_dropped,
+            'bars_coalesced': self.bars_coalesced,
+            'last_latency_ms': round(self.last_latency * 1000, 3),
+            'max_latency_ms': round(self.max_latency * 1000, 3),
+        }
@@ -27,6 +27,13 @@ class DatabaseConfig(BaseModel):
     min_connections: int = Field(default=int(os.getenv('DB_MIN_CONNECTIONS', '5')))
     max_connections: int = Field(default=int(os.getenv('DB_MAX_CONNECTIONS', '20')))
 
+    # Simulation output writer: rows per COPY batch and max seconds a row waits in the queue
+    write_batch_size: int = Field(default=int(os.getenv('DB_WRITE_BATCH_SIZE', '5000')))
+    write_flush_interval: float = Field(default=float(os.getenv('DB_WRITE_FLUSH_INTERVAL', '0.5')))
+    # A failed write is retried this many times, sleeping backoff seconds (doubled each time), then requeued
+    write_retry_attempts: int = Field(default=int(os.getenv('DB_WRITE_RETRY_ATTEMPTS', '3')))
+    write_retry_backoff: float = Field(default=float(os.getenv('DB_WRITE_RETRY_BACKOFF', '0.2')))
+
     @property
     def connection_string(self) -> str:
         return f"postgresql://{self.user}:{self.password}@{self.host}:{self.port}/{self.database}"
@@ -56,14 +63,33 @@ class Config:
         self.exch_id = os.getenv('EXCH_ID', '00000000-0000-0000-0000-000000000002')
         self.exchange_type = os.getenv('EXCHANGE_TYPE', 'US_EQUITIES')
 
+        # Simulation settings
+        self.volume_lookback_minutes = int(os.getenv('VOLUME_LOOKBACK_MINUTES', '390'))
+        self.book_processing_workers = int(os.getenv('BOOK_PROCESSING_WORKERS', '1'))
+
+        # Execution kernel: decay symbols without open orders in one columnar pass per minute
+        self.execution_kernel = os.getenv('EXECUTION_KERNEL', 'false').lower() == 'true'
+
+        # Snapshot restore: books fetched per set-based query, and how many of those batches run at once
+        self.snapshot_restore_batch_size = int(os.getenv('SNAPSHOT_RESTORE_BATCH_SIZE', '50'))
+        self.snapshot_restore_workers = int(os.getenv('SNAPSHOT_RESTORE_WORKERS', '4'))
+
+        # Replay: minutes of market data fetched per prefetch window
+        self.replay_prefetch_minutes = int(os.getenv('REPLAY_PREFETCH_MINUTES', '60'))
+
         # Service configuration
         self.host = os.getenv('HOST', '0.0.0.0')
         self.grpc_service_port = int(os.getenv('GRPC_SERVICE_PORT', '50055'))
         self.health_service_port = int(os.getenv('HEALTH_SERVICE_PORT', '50056'))
 
+        # Session stream settings
+        self.session_snapshot_interval = int(os.getenv('SESSION_SNAPSHOT_INTERVAL', '60'))
+        # Unacknowledged updates a client may fall behind before it is resynced with a snapshot
+        self.session_delta_history = int(os.getenv('SESSION_DELTA_HISTORY', '256'))
+
         # Feature flags
         self.enable_metrics = os.getenv('ENABLE_METRICS', 'true').lower() == 'true'
-        self.enable_tracing = os.getenv('ENABLE_TRACING', 'true').lower() == 'true'
+        self.enable_tracing = os.getenv('ENABLE_TRACING', 'false').lower() == 'true'
         self.enable_session_service = os.getenv('ENABLE_SESSION_SERVICE', 'true').lower() == 'true'
         self.enable_conviction_service = os.getenv('ENABLE_CONVICTION_SERVICE', 'true').lower() == 'true'
 
@@ -1,8 +1,10 @@
 # source/db/db_manager.py
 import asyncpg
 import logging
-from typing import Optional
+from datetime import datetime
+from typing import List, Optional
 from source.config import app_config
+from source.db.managers.base_manager import BaseTableManager
 
 
 class DatabaseManager:
@@ -111,6 +113,14 @@ class DatabaseManager:
         """Load FX data - delegates to fx manager"""
         return await self.fx_data.load_fx_data(timestamp_str)
 
+    async def load_equity_data_range(self, start_time: datetime, end_time: datetime):
+        """Load equity data for a time range, grouped by timestamp - delegates to equity manager"""
+        return await self.equity_data.load_equity_data_range(start_time, end_time)
+
+    async def load_fx_data_range(self, start_time: datetime, end_time: datetime):
+        """Load FX data for a time range, grouped by timestamp - delegates to fx manager"""
+        return await self.fx_data.load_fx_data_range(start_time, end_time)
+
     # BOOK SPECIFIC
 
     async def load_books_for_exchange(self, exch_id: str):
@@ -137,13 +147,33 @@ class DatabaseManager:
         """Load book returns data - delegates to return manager"""
         return await self.return_data.load_book_data(book_id, timestamp_str)
 
+    async def load_books_portfolio_data(self, book_ids: List[str], timestamp_str: str):
+        """Load portfolio data for several books in one query - delegates to portfolio manager"""
+        return await self.portfolio_data.load_books_data(book_ids, timestamp_str)
+
+    async def load_books_account_data(self, book_ids: List[str], timestamp_str: str):
+        """Load account data for several books in one query - delegates to account manager"""
+        return await self.account_data.load_books_data(book_ids, timestamp_str)
+
+    async def load_books_impact_data(self, book_ids: List[str], timestamp_str: str):
+        """Load impact data for several books in one query - delegates to impact manager"""
+        return await self.impact_data.load_books_data(book_ids, timestamp_str)
+
+    async def load_books_order_data(self, book_ids: List[str], timestamp_str: str):
+        """Load orders data for several books in one query - delegates to order manager"""
+        return await self.order_data.load_books_data(book_ids, timestamp_str)
+
+    async def load_books_return_data(self, book_ids: List[str], timestamp_str: str):
+        """Load returns data for several books in one query - delegates to return manager"""
+        return await self.return_data.load_books_data(book_ids, timestamp_str)
+
     # Add convenience methods
     async def load_book_operational_parameters(self, book_id: str):
         """Load PM operational parameters for book"""
         return await self.book_operational_parameters.load_parameters_for_book(book_id)
 
-    async def insert_simulation_data(self, table_name: str, data, book_id: str, timestamp):
-        """Insert simulation data - routes to appropriate table manager"""
+    def get_table_manager(self, table_name: str) -> Optional[BaseTableManager]:
+        """Table manager for a simulation output table (None if unknown)"""
         table_manager_map = {
             'account_data': self.account_data,
             'cash_flow_data': self.cash_flow_data,
@@ -154,9 +184,14 @@ class DatabaseManager:
             'risk_factor_data': self.risk_factor_data,
             'trade_data': self.trade_data,
         }
+        return table_manager_map.get(table_name)
+
+    async def insert_simulation_data(self, table_name: str, data, book_id: str, timestamp):
+        """Insert simulation data - routes to appropriate table manager"""
+        table_manager = self.get_table_manager(table_name)
 
-        if table_name in table_manager_map:
-            return await table_manager_map[table_name].insert_simulation_data(data, book_id, timestamp)
+        if table_manager is not None:
+            return await table_manager.insert_simulation_data(data, book_id, timestamp)
         else:
             self.logger.error(f"❌ Unknown table name: {table_name}")
             return 0
@@ -6,7 +6,7 @@ This package contains individual managers for each database table,
 providing a clean separation of concerns and better maintainability.
 """
 
-from .base_manager import BaseTableManager
+from .base_manager import BaseTableManager, BulkTableManager
 from .metadata import MetadataManager
 from .books import BooksManager
 from .book_operational_parameters import BookOperationalParametersManager
@@ -23,6 +23,7 @@ from .trade_data import TradeDataManager
 
 __all__ = [
     'BaseTableManager',
+    'BulkTableManager',
     'MetadataManager',
     'BooksManager',
     'BookOperationalParametersManager',
@@ -1,35 +1,40 @@
 # source/db/managers/account_data.py
 from typing import Dict, List
 from datetime import datetime
-from decimal import Decimal
 
 from source.simulation.managers.account import AccountBalance
 from source.simulation.managers.account import AccountManager
 
-from source.db.managers.base_manager import BaseTableManager
+from source.db.managers.base_manager import BulkTableManager, to_numeric
 
 
-class AccountDataManager(BaseTableManager):
+class AccountDataManager(BulkTableManager):
     """Manager for account data table"""
 
+    TABLE_NAME = 'exch_us_equity.account_data'
+    COLUMNS = ('book_id', 'timestamp', 'type', 'currency', 'amount', 'previous_amount', 'change')
+    NUMERIC_COLUMNS = frozenset({'amount', 'previous_amount', 'change'})
+
     async def load_book_data(self, book_id: str, timestamp_str: str) -> Dict[str, Dict[str, AccountBalance]]:
         """Load book account data from PostgreSQL"""
-        await self.ensure_connection()
+        books_data = await self.load_books_data([book_id], timestamp_str)
+        return books_data.get(book_id, {})
 
+    async def load_books_data(self, book_ids: List[str],
+                              timestamp_str: str) -> Dict[str, Dict[str, Dict[str, AccountBalance]]]:
+        """Load account data for several books with a single query"""
         try:
-            async with self.pool.acquire() as conn:
-                # Convert timestamp string to actual datetime object
-                target_datetime = self._get_timestamp_str(timestamp_str)
-
-                query = """
-                    SELECT book_id, timestamp, type, currency, amount, 
-                           previous_amount, change
-                    FROM exch_us_equity.account_data 
-                    WHERE book_id = $1 AND timestamp = $2
-                """
+            query = """
+                SELECT book_id, timestamp, type, currency, amount, 
+                       previous_amount, change
+                FROM exch_us_equity.account_data 
+                WHERE book_id = ANY($1) AND timestamp = $2
+            """
 
-                rows = await conn.fetch(query, book_id, target_datetime)
+            rows_by_book = await self.fetch_rows_by_book(query, book_ids, timestamp_str)
 
+            books_data = {}
+            for book_id, rows in rows_by_book.items():
                 # Initialize account structure
                 accounts = {balance_type: {} for balance_type in AccountManager.VALID_TYPES}
 
@@ -44,46 +49,41 @@ class AccountDataManager(BaseTableManager):
                             amount=amount
                         )
 
-                total_balances = sum(len(balances) for balances in accounts.values())
-                self.logger.info(f"✅ Loaded account data for {book_id}: {total_balances} balances")
-                return accounts
+                books_data[book_id] = accounts
+
+            self.logger.info(f"✅ Loaded account data for {len(books_data)} books")
+            return books_data
 
         except Exception as e:
-            self.logger.error(f"❌ Error loading account data for {book_id}: {e}")
+            self.logger.error(f"❌ Error loading account data for {len(book_ids)} books: {e}")
             return {}
 
+    def build_records(self, data: List[Dict], book_id: str, timestamp: datetime) -> List[tuple]:
+        """Account rows ordered as COLUMNS"""
+        return [
+            (
+                book_id,
+                timestamp,
+                record['type'],
+                record['currency'],
+                to_numeric(record['amount']),
+                to_numeric(record.get('previous_amount', 0)),
+                to_numeric(record.get('change', 0))
+            )
+            for record in data
+        ]
+
     async def insert_simulation_data(self, data: List[Dict], book_id: str, timestamp: datetime) -> int:
         """Insert account simulation data"""
-        await self.ensure_connection()
-
         if not data:
             return 0
 
         try:
-            async with self.pool.acquire() as conn:
-                query = """
-                    INSERT INTO exch_us_equity.account_data (
-                        book_id, timestamp, type, currency, amount,
-                        previous_amount, change
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7)
-                """
-
-                records = []
-                for record in data:
-                    records.append((
-                        book_id,
-                        timestamp,
-                        record['type'],
-                        record['currency'],
-                        Decimal(str(record['amount'])),
-                        Decimal(str(record.get('previous_amount', 0))),
-                        Decimal(str(record.get('change', 0)))
-                    ))
-
-                await conn.executemany(query, records)
-
-                self.logger.info(f"✅ Inserted {len(records)} account records for {book_id}")
-                return len(records)
+            records = self.coalesce_records(self.build_records(data, book_id, timestamp))
+            inserted = await self.bulk_insert(records)
+
+            self.logger.info(f"✅ Inserted {inserted} account records for {book_id}")
+            return inserted
 
         except Exception as e:
             self.logger.error(f"❌ Error inserting account data: {e}")
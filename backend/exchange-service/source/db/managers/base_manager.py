@@ -1,12 +1,19 @@
 # source/db/managers/base_manager.py
 import logging
+from abc import ABC, abstractmethod
 from datetime import datetime
-from typing import TYPE_CHECKING
+from decimal import Decimal
+from typing import TYPE_CHECKING, Dict, FrozenSet, List, Tuple
 
 if TYPE_CHECKING:
     from source.db.db_manager import DatabaseManager
 
 
+def to_numeric(value) -> Decimal:
+    """Value for a numeric column: Decimals pass through unchanged, anything else goes through str()"""
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
 class BaseTableManager:
     """Base class for all table-specific managers"""
 
@@ -44,4 +51,83 @@ class BaseTableManager:
     async def ensure_connection(self):
         """Ensure database connection is available"""
         if not self.pool:
-            await self.db_manager.initialize()
\ No newline at end of file
+            await self.db_manager.initialize()
+
+    async def fetch_rows_by_book(self, query: str, book_ids: List[str], timestamp_str: str) -> Dict[str, list]:
+        """Run a `book_id = ANY($1) AND timestamp = $2` query once and group its rows by book id"""
+        await self.ensure_connection()
+
+        rows_by_book: Dict[str, list] = {book_id: [] for book_id in book_ids}
+        async with self.pool.acquire() as conn:
+            rows = await conn.fetch(query, list(book_ids), self._get_timestamp_str(timestamp_str))
+
+        for row in rows:
+            rows_by_book.setdefault(str(row['book_id']), []).append(row)
+        return rows_by_book
+
+    @property
+    def supports_bulk_insert(self) -> bool:
+        """Whether DatabaseQueue can hand this table's rows to build_records / bulk_insert (see BulkTableManager)"""
+        return False
+
+
+class BulkTableManager(BaseTableManager, ABC):
+    """
+    Manager of a simulation output table written in bulk.
+    Rows are COPYed into a temporary staging table and merged with one INSERT ... SELECT.
+    """
+
+    TABLE_NAME: str
+    COLUMNS: Tuple[str, ...] = ()
+    NUMERIC_COLUMNS: FrozenSet[str] = frozenset()  # Staged as unconstrained numeric, rounded to the table's type by the merge
+    CONFLICT_COLUMNS: Tuple[str, ...] = ()  # Upsert key; empty for append-only tables
+
+    @property
+    def supports_bulk_insert(self) -> bool:
+        return True
+
+    @abstractmethod
+    def build_records(self, data: List[Dict], book_id: str, timestamp: datetime) -> List[tuple]:
+        """Convert simulation output rows to tuples ordered as COLUMNS"""
+
+    def coalesce_records(self, records: List[tuple]) -> List[tuple]:
+        """Keep only the last record per upsert key (a single merge cannot update a row twice)"""
+        if not self.CONFLICT_COLUMNS:
+            return records
+
+        key_positions = [self.COLUMNS.index(column) for column in self.CONFLICT_COLUMNS]
+        latest: Dict[tuple, tuple] = {}
+        for record in records:
+            latest[tuple(record[i] for i in key_positions)] = record
+        return list(latest.values())
+
+    async def bulk_insert(self, records: List[tuple]) -> int:
+        """COPY records into a staging table and merge them into TABLE_NAME in one statement"""
+        if not records:
+            return 0
+
+        await self.ensure_connection()
+
+        staging = f"staging_{self.TABLE_NAME.split('.')[-1]}"
+        columns = ', '.join(self.COLUMNS)
+        staged_columns = ', '.join(
+            f"{column}::numeric AS {column}" if column in self.NUMERIC_COLUMNS else column
+            for column in self.COLUMNS
+        )
+
+        merge = f"INSERT INTO {self.TABLE_NAME} ({columns}) SELECT {columns} FROM {staging}"
+        if self.CONFLICT_COLUMNS:
+            updates = ', '.join(f"{column} = EXCLUDED.{column}"
+                                for column in self.COLUMNS if column not in self.CONFLICT_COLUMNS)
+            merge += f" ON CONFLICT ({', '.join(self.CONFLICT_COLUMNS)}) DO UPDATE SET {updates}"
+
+        async with self.pool.acquire() as conn:
+            async with conn.transaction():
+                await conn.execute(
+                    f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS "
+                    f"SELECT {staged_columns} FROM {self.TABLE_NAME} WITH NO DATA"
+                )
+                await conn.copy_records_to_table(staging, records=records, columns=list(self.COLUMNS))
+                await conn.execute(merge)
+
+        return len(records)
@@ -3,13 +3,19 @@ import logging
 import traceback
 from typing import List, Dict
 from datetime import datetime
-from decimal import Decimal
-from source.db.managers.base_manager import BaseTableManager
+from source.db.managers.base_manager import BulkTableManager, to_numeric
 
 
-class CashFlowDataManager(BaseTableManager):
+class CashFlowDataManager(BulkTableManager):
     """Manages cash flow data table operations"""
 
+    TABLE_NAME = 'exch_us_equity.cash_flow_data'
+    COLUMNS = ('book_id', 'timestamp', 'flow_type', 'from_account', 'from_currency',
+               'from_fx', 'from_amount', 'to_account', 'to_currency', 'to_fx', 'to_amount',
+               'instrument', 'trade_id', 'description')
+    NUMERIC_COLUMNS = frozenset({'from_fx', 'from_amount', 'to_fx', 'to_amount'})
+    CONFLICT_COLUMNS = ('book_id', 'timestamp', 'flow_type', 'from_account', 'to_account', 'trade_id')
+
     def __init__(self, db_manager):
         super().__init__(db_manager)
         self.logger = logging.getLogger(self.__class__.__name__)
@@ -59,60 +65,41 @@ class CashFlowDataManager(BaseTableManager):
             self.logger.error(f"❌ Error loading cash flow data for {book_id}: {e}")
             return []
 
+    def build_records(self, data: List[Dict], book_id: str, timestamp: datetime) -> List[tuple]:
+        """Cash flow rows ordered as COLUMNS"""
+        return [
+            (
+                book_id,
+                timestamp,
+                record.get('flow_type', ''),
+                record.get('from_account', ''),
+                record.get('from_currency', 'USD'),
+                to_numeric(record.get('from_fx', 1.0)),
+                to_numeric(record.get('from_amount', 0)),
+                record.get('to_account', ''),
+                record.get('to_currency', 'USD'),
+                to_numeric(record.get('to_fx', 1.0)),
+                to_numeric(record.get('to_amount', 0)),
+                record.get('instrument', None),
+                record.get('trade_id', None),
+                record.get('description', None)
+            )
+            for record in data
+        ]
+
     async def insert_simulation_data(self, data: List[Dict], book_id: str, timestamp: datetime) -> int:
         """Insert cash flow simulation data"""
-        await self.ensure_connection()
-
-        self.logger.info(f"Attempting to insert {len(data)} cash flow records for book {book_id} at timestamp {timestamp}")
         if not data:
-            self.logger.info(f"No cash flow data provided for book {book_id} at timestamp {timestamp}. Skipping insertion.")
             return 0
 
         try:
-            async with self.pool.acquire() as conn:
-                query = """
-                    INSERT INTO exch_us_equity.cash_flow_data (
-                        book_id, timestamp, flow_type, from_account, from_currency,
-                        from_fx, from_amount, to_account, to_currency, to_fx, to_amount,
-                        instrument, trade_id, description
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
-                    ON CONFLICT (book_id, timestamp, flow_type, from_account, to_account, trade_id) 
-                    DO UPDATE SET
-                        from_currency = EXCLUDED.from_currency,
-                        from_fx = EXCLUDED.from_fx,
-                        from_amount = EXCLUDED.from_amount,
-                        to_currency = EXCLUDED.to_currency,
-                        to_fx = EXCLUDED.to_fx,
-                        to_amount = EXCLUDED.to_amount,
-                        instrument = EXCLUDED.instrument,
-                        description = EXCLUDED.description
-                """
+            records = self.coalesce_records(self.build_records(data, book_id, timestamp))
+            inserted = await self.bulk_insert(records)
 
-                records = []
-                for record in data:
-                    records.append((
-                        book_id,
-                        timestamp,
-                        record.get('flow_type', ''),
-                        record.get('from_account', ''),
-                        record.get('from_currency', 'USD'),
-                        Decimal(str(record.get('from_fx', 1.0))),
-                        Decimal(str(record.get('from_amount', 0))),
-                        record.get('to_account', ''),
-                        record.get('to_currency', 'USD'),
-                        Decimal(str(record.get('to_fx', 1.0))),
-                        Decimal(str(record.get('to_amount', 0))),
-                        record.get('instrument', None),
-                        record.get('trade_id', None),
-                        record.get('description', None)
-                    ))
-
-                await conn.executemany(query, records)
-
-                self.logger.info(f"✅ Inserted {len(records)} cash flow records for {book_id}")
-                return len(records)
+            self.logger.info(f"✅ Inserted {inserted} cash flow records for {book_id}")
+            return inserted
 
         except Exception as e:
             self.logger.error(f"❌ Error inserting cash flow simulation data: {e}")
             self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
-            return 0
\ No newline at end of file
+            return 0
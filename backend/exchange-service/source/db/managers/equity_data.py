@@ -48,4 +48,33 @@ class EquityDataManager(BaseTableManager):
         except Exception as e:
             self.logger.error(f"❌ Error loading equity data for {timestamp_str}: {e}")
             self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
-            return []
\ No newline at end of file
+            return []
+
+    async def load_equity_data_range(self, start_time: datetime, end_time: datetime) -> Dict[datetime, List[Dict]]:
+        """Load equity data for every minute in [start_time, end_time) with one query, grouped by timestamp"""
+        await self.ensure_connection()
+
+        try:
+            async with self.pool.acquire() as conn:
+                query = """
+                    SELECT timestamp, symbol, currency, open, high, low, close,
+                        vwap, vwas, vwav, volume, count
+                    FROM exch_us_equity.equity_data 
+                    WHERE timestamp >= $1 AND timestamp < $2
+                    ORDER BY timestamp
+                """
+
+                rows = await conn.fetch(query, start_time, end_time)
+
+                equity_data: Dict[datetime, List[Dict]] = {}
+                for row in rows:
+                    equity_data.setdefault(row['timestamp'], []).append(dict(row))
+
+                self.logger.info(f"✅ Loaded equity data: {len(rows)} records in {len(equity_data)} bins "
+                                 f"for {start_time} - {end_time}")
+                return equity_data
+
+        except Exception as e:
+            self.logger.error(f"❌ Error loading equity data for {start_time} - {end_time}: {e}")
+            self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+            return {}
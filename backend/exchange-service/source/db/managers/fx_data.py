@@ -41,3 +41,29 @@ class FxDataManager(BaseTableManager):
         except Exception as e:
             self.logger.error(f"❌ Error loading FX data: {e}")
             return []
+
+    async def load_fx_data_range(self, start_time: datetime, end_time: datetime) -> Dict[datetime, List[Dict]]:
+        """Load FX data for every minute in [start_time, end_time) with one query, grouped by timestamp"""
+        await self.ensure_connection()
+
+        try:
+            async with self.pool.acquire() as conn:
+                query = """
+                    SELECT timestamp, from_currency, to_currency, rate
+                    FROM exch_us_equity.fx_data 
+                    WHERE timestamp >= $1 AND timestamp < $2
+                    ORDER BY timestamp
+                """
+
+                rows = await conn.fetch(query, start_time, end_time)
+
+                fx_data: Dict[datetime, List[Dict]] = {}
+                for row in rows:
+                    fx_data.setdefault(row['timestamp'], []).append(dict(row))
+
+                self.logger.info(f"✅ Loaded FX data: {len(rows)} records in {len(fx_data)} bins")
+                return fx_data
+
+        except Exception as e:
+            self.logger.error(f"❌ Error loading FX data for {start_time} - {end_time}: {e}")
+            return {}
@@ -4,30 +4,39 @@ from datetime import datetime
 import traceback
 from decimal import Decimal
 from source.simulation.managers.impact import ImpactState
-from source.db.managers.base_manager import BaseTableManager
+from source.db.managers.base_manager import BulkTableManager, to_numeric
 
 
-class ImpactDataManager(BaseTableManager):
+class ImpactDataManager(BulkTableManager):
     """Manager for impact data table"""
 
+    TABLE_NAME = 'exch_us_equity.impact_data'
+    COLUMNS = ('book_id', 'timestamp', 'symbol', 'trade_id', 'previous_impact',
+               'current_impact', 'currency', 'base_price', 'impacted_price', 'cumulative_volume',
+               'trade_volume', 'start_timestamp', 'end_timestamp', 'impact_type')
+    NUMERIC_COLUMNS = frozenset({'previous_impact', 'current_impact', 'base_price', 'impacted_price',
+                                 'cumulative_volume', 'trade_volume'})
+
     async def load_book_data(self, book_id: str, timestamp_str: str) -> Dict[str, ImpactState]:
         """Load book impact data from PostgreSQL"""
-        await self.ensure_connection()
+        books_data = await self.load_books_data([book_id], timestamp_str)
+        return books_data.get(book_id, {})
 
+    async def load_books_data(self, book_ids: List[str], timestamp_str: str) -> Dict[str, Dict[str, ImpactState]]:
+        """Load impact data for several books with a single query"""
         try:
-            async with self.pool.acquire() as conn:
-                target_datetime = self._get_timestamp_str(timestamp_str)
-
-                query = """
-                    SELECT book_id, timestamp, symbol, trade_id, previous_impact,
-                        current_impact, currency, base_price, impacted_price, cumulative_volume,
-                        trade_volume, start_timestamp, end_timestamp, impact_type
-                    FROM exch_us_equity.impact_data 
-                    WHERE book_id = $1 AND timestamp = $2
-                """
-
-                rows = await conn.fetch(query, book_id, target_datetime)
-
+            query = """
+                SELECT book_id, timestamp, symbol, trade_id, previous_impact,
+                    current_impact, currency, base_price, impacted_price, cumulative_volume,
+                    trade_volume, start_timestamp, end_timestamp, impact_type
+                FROM exch_us_equity.impact_data 
+                WHERE book_id = ANY($1) AND timestamp = $2
+            """
+
+            rows_by_book = await self.fetch_rows_by_book(query, book_ids, timestamp_str)
+
+            books_data = {}
+            for book_id, rows in rows_by_book.items():
                 impact_data = {}
                 for row in rows:
                     symbol = row['symbol']
@@ -46,59 +55,51 @@ class ImpactDataManager(BaseTableManager):
                         impact_type=row['impact_type']
                     )
 
-                self.logger.info(f"✅ Loaded impact data: {len(impact_data)} records for timestamp: {timestamp_str}")
-                return impact_data
+                books_data[book_id] = impact_data
+
+            self.logger.info(f"✅ Loaded impact data for {len(books_data)} books at timestamp: {timestamp_str}")
+            return books_data
 
         except Exception as e:
             self.logger.error(f"❌ Error loading impact data for {timestamp_str}: {e}")
             self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
             return {}
 
+    def build_records(self, data: List[Dict], book_id: str, timestamp: datetime) -> List[tuple]:
+        """Impact rows ordered as COLUMNS (rows without any impact are skipped)"""
+        records = []
+        for record in data:
+            if record.get('previous_impact', 0) == 0 and record.get('current_impact', 0) == 0:
+                continue
+            records.append((
+                book_id,
+                timestamp,
+                record['symbol'],
+                record.get('trade_id', ''),
+                to_numeric(record.get('previous_impact', 0)),
+                to_numeric(record.get('current_impact', 0)),
+                record.get('currency', 'USD'),
+                to_numeric(record.get('base_price', 0)),
+                to_numeric(record.get('impacted_price', 0)),
+                to_numeric(record.get('cumulative_volume', 0)),
+                to_numeric(record.get('trade_volume', 0)),
+                datetime.fromisoformat(record.get('start_timestamp')) if record.get('start_timestamp') else None,
+                datetime.fromisoformat(record.get('end_timestamp')) if record.get('end_timestamp') else None,
+                record.get('impact_type', '')
+            ))
+        return records
+
     async def insert_simulation_data(self, data: List[Dict], book_id: str, timestamp: datetime) -> int:
         """Insert impact simulation data"""
-        await self.ensure_connection()
-
         if not data:
             return 0
 
         try:
-            async with self.pool.acquire() as conn:
-                query = """
-                    INSERT INTO exch_us_equity.impact_data (
-                        book_id, timestamp, symbol, trade_id, previous_impact,
-                        current_impact, currency, base_price, impacted_price, cumulative_volume,
-                        trade_volume, start_timestamp, end_timestamp, impact_type
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
-                """
-
-                records = []
-                for record in data:
-                    if record.get('previous_impact', 0) == 0 and record.get('current_impact', 0) == 0:
-                        continue
-                    records.append((
-                        book_id,
-                        timestamp,
-                        record['symbol'],
-                        record.get('trade_id', ''),
-                        Decimal(str(record.get('previous_impact', 0))),
-                        Decimal(str(record.get('current_impact', 0))),
-                        record.get('currency', 'USD'),
-                        Decimal(str(record.get('base_price', 0))),
-                        Decimal(str(record.get('impacted_price', 0))),
-                        Decimal(str(record.get('cumulative_volume', 0))),
-                        Decimal(str(record.get('trade_volume', 0))),
-                        datetime.fromisoformat(record.get('start_timestamp')) if record.get('start_timestamp') else None,
-                        datetime.fromisoformat(record.get('end_timestamp')) if record.get('end_timestamp') else None,
-                        record.get('impact_type', '')
-                    ))
-
-                if not records:
-                    return 0
-
-                await conn.executemany(query, records)
+            records = self.coalesce_records(self.build_records(data, book_id, timestamp))
+            inserted = await self.bulk_insert(records)
 
-                self.logger.info(f"✅ Inserted {len(records)} impact records for {book_id}")
-                return len(records)
+            self.logger.info(f"✅ Inserted {inserted} impact records for {book_id}")
+            return inserted
 
         except Exception as e:
             self.logger.error(f"❌ Error inserting impact data: {e}")
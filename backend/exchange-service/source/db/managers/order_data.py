@@ -2,32 +2,40 @@
 from typing import Dict, List
 import traceback
 from datetime import datetime
-from decimal import Decimal
-from source.db.managers.base_manager import BaseTableManager
+from source.db.managers.base_manager import BulkTableManager, to_numeric
 
 
-class OrderDataManager(BaseTableManager):
+class OrderDataManager(BulkTableManager):
     """Manager for order data table"""
 
+    TABLE_NAME = 'exch_us_equity.order_data'
+    COLUMNS = ('book_id', 'timestamp', 'order_id', 'cl_order_id', 'symbol', 'side',
+               'original_qty', 'remaining_qty', 'completed_qty', 'currency', 'price',
+               'order_type', 'participation_rate', 'order_state', 'submit_timestamp',
+               'start_timestamp', 'tag', 'conviction_id')
+    NUMERIC_COLUMNS = frozenset({'original_qty', 'remaining_qty', 'completed_qty', 'price'})
+
     async def load_book_data(self, book_id: str, timestamp_str: str) -> List[Dict]:
         """Load book orders data from PostgreSQL"""
-        await self.ensure_connection()
+        books_data = await self.load_books_data([book_id], timestamp_str)
+        return books_data.get(book_id, [])
 
+    async def load_books_data(self, book_ids: List[str], timestamp_str: str) -> Dict[str, List[Dict]]:
+        """Load order data for several books with a single query"""
         try:
-            async with self.pool.acquire() as conn:
-                target_datetime = self._get_timestamp_str(timestamp_str)
-
-                query = """
-                    SELECT book_id, timestamp, order_id, cl_order_id, symbol, side,
-                        original_qty, remaining_qty, completed_qty, currency, price,
-                        order_type, participation_rate, order_state, submit_timestamp,
-                        start_timestamp, tag, conviction_id
-                    FROM exch_us_equity.order_data 
-                    WHERE book_id = $1 AND timestamp = $2
-                """
+            query = """
+                SELECT book_id, timestamp, order_id, cl_order_id, symbol, side,
+                    original_qty, remaining_qty, completed_qty, currency, price,
+                    order_type, participation_rate, order_state, submit_timestamp,
+                    start_timestamp, tag, conviction_id
+                FROM exch_us_equity.order_data 
+                WHERE book_id = ANY($1) AND timestamp = $2
+            """
 
-                rows = await conn.fetch(query, book_id, target_datetime)
+            rows_by_book = await self.fetch_rows_by_book(query, book_ids, timestamp_str)
 
+            books_data = {}
+            for book_id, rows in rows_by_book.items():
                 orders_data = []
                 for row in rows:
                     orders_data.append({
@@ -51,13 +59,41 @@ class OrderDataManager(BaseTableManager):
                         'conviction_id': row['conviction_id']
                     })
 
-                self.logger.info(f"✅ Loaded order data: {len(orders_data)} records for timestamp: {timestamp_str}")
-                return orders_data
+                books_data[book_id] = orders_data
+
+            self.logger.info(f"✅ Loaded order data for {len(books_data)} books at timestamp: {timestamp_str}")
+            return books_data
 
         except Exception as e:
             self.logger.error(f"❌ Error loading order data for {timestamp_str}: {e}")
             self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
-            return []
+            return {}
+
+    def build_records(self, data: List[Dict], book_id: str, timestamp: datetime) -> List[tuple]:
+        """Order rows ordered as COLUMNS"""
+        return [
+            (
+                book_id,
+                timestamp,
+                record.get('order_id', ''),
+                record.get('cl_order_id', ''),
+                record['symbol'],
+                record.get('side', ''),
+                to_numeric(record.get('original_qty', 0)),
+                to_numeric(record.get('remaining_qty', 0)),
+                to_numeric(record.get('completed_qty', 0)),
+                record.get('currency', 'USD'),
+                to_numeric(record.get('price', 0)),
+                record.get('order_type', ''),
+                record.get('participation_rate', ''),
+                record.get('order_state', ''),
+                record.get('submit_timestamp'),
+                record.get('start_timestamp'),
+                record.get('tag'),
+                record.get('conviction_id')
+            )
+            for record in data
+        ]
 
     async def insert_simulation_data(self, data: List[Dict], book_id: str, timestamp: datetime) -> int:
         """Insert order simulation data"""
@@ -65,43 +101,11 @@ class OrderDataManager(BaseTableManager):
             return 0
 
         try:
-            async with self.pool.acquire() as conn:
-                query = """
-                    INSERT INTO exch_us_equity.order_data (
-                        book_id, timestamp, order_id, cl_order_id, symbol, side,
-                        original_qty, remaining_qty, completed_qty, currency, price,
-                        order_type, participation_rate, order_state, submit_timestamp,
-                        start_timestamp, tag, conviction_id
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, $17, $18)
-                """
-
-                records = []
-                for record in data:
-                    records.append((
-                        book_id,
-                        timestamp,
-                        record.get('order_id', ''),
-                        record.get('cl_order_id', ''),
-                        record['symbol'],
-                        record.get('side', ''),
-                        Decimal(str(record.get('original_qty', 0))),
-                        Decimal(str(record.get('remaining_qty', 0))),
-                        Decimal(str(record.get('completed_qty', 0))),
-                        record.get('currency', 'USD'),
-                        Decimal(str(record.get('price', 0))),
-                        record.get('order_type', ''),
-                        record.get('participation_rate', ''),
-                        record.get('order_state', ''),
-                        record.get('submit_timestamp'),
-                        record.get('start_timestamp'),
-                        record.get('tag'),
-                        record.get('conviction_id')
-                    ))
-
-                await conn.executemany(query, records)
+            records = self.coalesce_records(self.build_records(data, book_id, timestamp))
+            inserted = await self.bulk_insert(records)
 
-                self.logger.info(f"✅ Inserted {len(records)} order records for {book_id}")
-                return len(records)
+            self.logger.info(f"✅ Inserted {inserted} order records for {book_id}")
+            return inserted
 
         except Exception as e:
             self.logger.error(f"❌ Error inserting order data: {e}")
@@ -2,41 +2,49 @@
 from typing import Dict, List
 import traceback
 from datetime import datetime
-from decimal import Decimal
 from source.simulation.managers.portfolio import Position
-from source.db.managers.base_manager import BaseTableManager
+from source.db.managers.base_manager import BulkTableManager, to_numeric
 
 
-class PortfolioDataManager(BaseTableManager):
+class PortfolioDataManager(BulkTableManager):
     """Manager for portfolio data table operations"""
 
+    TABLE_NAME = 'exch_us_equity.portfolio_data'
+    COLUMNS = ('book_id', 'timestamp', 'symbol', 'quantity', 'currency',
+               'avg_price', 'mtm_value', 'sod_realized_pnl', 'itd_realized_pnl',
+               'realized_pnl', 'unrealized_pnl')
+    NUMERIC_COLUMNS = frozenset({'quantity', 'avg_price', 'mtm_value', 'sod_realized_pnl',
+                                 'itd_realized_pnl', 'realized_pnl', 'unrealized_pnl'})
+    CONFLICT_COLUMNS = ('book_id', 'timestamp', 'symbol')
+
     async def load_book_data(self, book_id: str, timestamp_str: str) -> Dict[str, Position]:
         """Load book portfolio data from PostgreSQL using normalized schema"""
-        await self.ensure_connection()
+        books_data = await self.load_books_data([book_id], timestamp_str)
+        return books_data.get(book_id, {})
 
+    async def load_books_data(self, book_ids: List[str], timestamp_str: str) -> Dict[str, Dict[str, Position]]:
+        """Load portfolio data for several books with a single query"""
         try:
-            async with self.pool.acquire() as conn:
-                target_datetime = self._get_timestamp_str(timestamp_str)
-
-                query = """
-                    SELECT book_id, timestamp, symbol, quantity, currency, 
-                           avg_price, mtm_value, sod_realized_pnl, itd_realized_pnl,
-                           realized_pnl, unrealized_pnl
-                    FROM exch_us_equity.portfolio_data 
-                    WHERE book_id = $1 AND timestamp = $2
-                """
-
-                rows = await conn.fetch(query, book_id, target_datetime)
-
+            query = """
+                SELECT book_id, timestamp, symbol, quantity, currency, 
+                       avg_price, mtm_value, sod_realized_pnl, itd_realized_pnl,
+                       realized_pnl, unrealized_pnl
+                FROM exch_us_equity.portfolio_data 
+                WHERE book_id = ANY($1) AND timestamp = $2
+            """
+
+            rows_by_book = await self.fetch_rows_by_book(query, book_ids, timestamp_str)
+
+            books_data = {}
+            for book_id, rows in rows_by_book.items():
                 # Build portfolio positions dictionary
                 portfolio_data = {}
-                processed_symbols = set()
 
                 for row in rows:
                     symbol = row['symbol']
 
                     # Take only the most recent record for each symbol
-                    if symbol not in processed_symbols:
+                    if symbol not in portfolio_data:
                         portfolio_data[symbol] = Position(
                             symbol=symbol,
                             quantity=float(row['quantity']),
@@ -49,63 +57,47 @@ class PortfolioDataManager(BaseTableManager):
                             realized_pnl=float(row['realized_pnl']),
                             unrealized_pnl=float(row['unrealized_pnl'])
                         )
-                        processed_symbols.add(symbol)
 
-                self.logger.info(f"✅ Loaded portfolio data for {book_id}: {len(portfolio_data)} positions")
-                return portfolio_data
+                books_data[book_id] = portfolio_data
+
+            self.logger.info(f"✅ Loaded portfolio data for {len(books_data)} books: "
+                             f"{sum(len(p) for p in books_data.values())} positions")
+            return books_data
 
         except Exception as e:
-            self.logger.error(f"❌ Error loading portfolio data for {book_id}: {e}")
+            self.logger.error(f"❌ Error loading portfolio data for {len(book_ids)} books: {e}")
             return {}
 
+    def build_records(self, data: List[Dict], book_id: str, timestamp: datetime) -> List[tuple]:
+        """Portfolio rows ordered as COLUMNS"""
+        return [
+            (
+                book_id,
+                timestamp,
+                record['symbol'],
+                to_numeric(record.get('quantity', 0)),
+                record.get('currency', 'USD'),
+                to_numeric(record.get('avg_price', 0)),
+                to_numeric(record.get('mtm_value', 0)),
+                to_numeric(record.get('sod_realized_pnl', 0)),
+                to_numeric(record.get('itd_realized_pnl', 0)),
+                to_numeric(record.get('realized_pnl', 0)),
+                to_numeric(record.get('unrealized_pnl', 0))
+            )
+            for record in data
+        ]
+
     async def insert_simulation_data(self, data: List[Dict], book_id: str, timestamp: datetime) -> int:
         """Insert portfolio simulation data into normalized table"""
-        await self.ensure_connection()
-
         if not data:
             return 0
 
         try:
-            async with self.pool.acquire() as conn:
-                # Insert into normalized portfolio_data table
-                query = """
-                    INSERT INTO exch_us_equity.portfolio_data (
-                        book_id, timestamp, symbol, quantity, currency,
-                        avg_price, mtm_value, sod_realized_pnl, itd_realized_pnl,
-                        realized_pnl, unrealized_pnl
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
-                    ON CONFLICT (book_id, timestamp, symbol) DO UPDATE SET
-                        quantity = EXCLUDED.quantity,
-                        currency = EXCLUDED.currency,
-                        avg_price = EXCLUDED.avg_price,
-                        mtm_value = EXCLUDED.mtm_value,
-                        sod_realized_pnl = EXCLUDED.sod_realized_pnl,
-                        itd_realized_pnl = EXCLUDED.itd_realized_pnl,
-                        realized_pnl = EXCLUDED.realized_pnl,
-                        unrealized_pnl = EXCLUDED.unrealized_pnl
-                """
-
-                records = []
-                for record in data:
-                    records.append((
-                        book_id,
-                        timestamp,
-                        record['symbol'],
-                        Decimal(str(record.get('quantity', 0))),
-                        record.get('currency', 'USD'),
-                        Decimal(str(record.get('avg_price', 0))),
-                        Decimal(str(record.get('mtm_value', 0))),
-                        Decimal(str(record.get('sod_realized_pnl', 0))),
-                        Decimal(str(record.get('itd_realized_pnl', 0))),
-                        Decimal(str(record.get('realized_pnl', 0))),
-                        Decimal(str(record.get('unrealized_pnl', 0)))
-                    ))
-
-
-                await conn.executemany(query, records)
-
-                self.logger.info(f"✅ Inserted {len(records)} portfolio records for {book_id}")
-                return len(records)
+            records = self.coalesce_records(self.build_records(data, book_id, timestamp))
+            inserted = await self.bulk_insert(records)
+
+            self.logger.info(f"✅ Inserted {inserted} portfolio records for {book_id}")
+            return inserted
 
         except Exception as e:
             self.logger.error(f"❌ Error inserting portfolio simulation data: {e}")
@@ -2,33 +2,44 @@
 from typing import Dict, List
 from datetime import datetime
 import traceback
-from decimal import Decimal
 import uuid
-from source.db.managers.base_manager import BaseTableManager
+from source.db.managers.base_manager import BulkTableManager, to_numeric
 
 
-class ReturnDataManager(BaseTableManager):
+class ReturnDataManager(BulkTableManager):
     """Manager for return data table operations"""
 
+    TABLE_NAME = 'exch_us_equity.return_data'
+    COLUMNS = ('book_id', 'timestamp', 'return_id', 'category', 'subcategory',
+               'emv', 'bmv', 'bmv_book', 'cf', 'periodic_return_subcategory',
+               'cumulative_return_subcategory', 'contribution_percentage',
+               'periodic_return_contribution', 'cumulative_return_contribution')
+    NUMERIC_COLUMNS = frozenset({'emv', 'bmv', 'bmv_book', 'cf', 'periodic_return_subcategory',
+                                 'cumulative_return_subcategory', 'contribution_percentage',
+                                 'periodic_return_contribution', 'cumulative_return_contribution'})
+    CONFLICT_COLUMNS = ('book_id', 'timestamp', 'return_id')
+
     async def load_book_data(self, book_id: str, timestamp_str: str) -> List[Dict]:
         """Load book returns data from PostgreSQL using normalized schema"""
-        await self.ensure_connection()
+        books_data = await self.load_books_data([book_id], timestamp_str)
+        return books_data.get(book_id, [])
 
+    async def load_books_data(self, book_ids: List[str], timestamp_str: str) -> Dict[str, List[Dict]]:
+        """Load returns data for several books with a single query"""
         try:
-            async with self.pool.acquire() as conn:
-                target_datetime = self._get_timestamp_str(timestamp_str)
-
-                query = """
-                    SELECT book_id, timestamp, return_id, category, subcategory,
-                        emv, bmv, bmv_book, cf, periodic_return_subcategory,
-                        cumulative_return_subcategory, contribution_percentage,
-                        periodic_return_contribution, cumulative_return_contribution
-                    FROM exch_us_equity.return_data 
-                    WHERE book_id = $1 AND timestamp = $2
-                """
-
-                rows = await conn.fetch(query, book_id, target_datetime)
-
+            query = """
+                SELECT book_id, timestamp, return_id, category, subcategory,
+                    emv, bmv, bmv_book, cf, periodic_return_subcategory,
+                    cumulative_return_subcategory, contribution_percentage,
+                    periodic_return_contribution, cumulative_return_contribution
+                FROM exch_us_equity.return_data 
+                WHERE book_id = ANY($1) AND timestamp = $2
+            """
+
+            rows_by_book = await self.fetch_rows_by_book(query, book_ids, timestamp_str)
+
+            books_data = {}
+            for book_id, rows in rows_by_book.items():
                 returns_data = []
                 for row in rows:
                     returns_data.append({
@@ -48,67 +59,49 @@ class ReturnDataManager(BaseTableManager):
                         'cumulative_return_contribution': float(row['cumulative_return_contribution'])
                     })
 
-                self.logger.info(f"✅ Loaded return data: {len(returns_data)} records for timestamp: {timestamp_str}")
-                return returns_data
+                books_data[book_id] = returns_data
+
+            self.logger.info(f"✅ Loaded return data for {len(books_data)} books at timestamp: {timestamp_str}")
+            return books_data
 
         except Exception as e:
             self.logger.error(f"❌ Error loading return data for {timestamp_str}: {e}")
             self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
-            return []
+            return {}
+
+    def build_records(self, data: List[Dict], book_id: str, timestamp: datetime) -> List[tuple]:
+        """Return rows ordered as COLUMNS"""
+        return [
+            (
+                book_id,
+                timestamp,
+                record.get('return_id', f"RET_{uuid.uuid4().hex[:8]}"),
+                record.get('category', 'TOTAL'),
+                record.get('subcategory', 'PORTFOLIO'),
+                to_numeric(record.get('emv', 0)),
+                to_numeric(record.get('bmv', 0)),
+                to_numeric(record.get('bmv_book', 0)),
+                to_numeric(record.get('cf', 0)),
+                to_numeric(record.get('periodic_return_subcategory', 0)),
+                to_numeric(record.get('cumulative_return_subcategory', 0)),
+                to_numeric(record.get('contribution_percentage', 0)),
+                to_numeric(record.get('periodic_return_contribution', 0)),
+                to_numeric(record.get('cumulative_return_contribution', 0))
+            )
+            for record in data
+        ]
 
     async def insert_simulation_data(self, data: List[Dict], book_id: str, timestamp: datetime) -> int:
         """Insert return simulation data into normalized table"""
-        await self.ensure_connection()
-
         if not data:
             return 0
 
         try:
-            async with self.pool.acquire() as conn:
-                query = """
-                    INSERT INTO exch_us_equity.return_data (
-                        book_id, timestamp, return_id, category, subcategory,
-                        emv, bmv, bmv_book, cf, periodic_return_subcategory,
-                        cumulative_return_subcategory, contribution_percentage,
-                        periodic_return_contribution, cumulative_return_contribution
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14)
-                    ON CONFLICT (book_id, timestamp, return_id) DO UPDATE SET
-                        category = EXCLUDED.category,
-                        subcategory = EXCLUDED.subcategory,
-                        emv = EXCLUDED.emv,
-                        bmv = EXCLUDED.bmv,
-                        bmv_book = EXCLUDED.bmv_book,
-                        cf = EXCLUDED.cf,
-                        periodic_return_subcategory = EXCLUDED.periodic_return_subcategory,
-                        cumulative_return_subcategory = EXCLUDED.cumulative_return_subcategory,
-                        contribution_percentage = EXCLUDED.contribution_percentage,
-                        periodic_return_contribution = EXCLUDED.periodic_return_contribution,
-                        cumulative_return_contribution = EXCLUDED.cumulative_return_contribution
-                """
-
-                records = []
-                for record in data:
-                    records.append((
-                        book_id,
-                        timestamp,
-                        record.get('return_id', f"RET_{uuid.uuid4().hex[:8]}"),
-                        record.get('category', 'TOTAL'),
-                        record.get('subcategory', 'PORTFOLIO'),
-                        Decimal(str(record.get('emv', 0))),
-                        Decimal(str(record.get('bmv', 0))),
-                        Decimal(str(record.get('bmv_book', 0))),
-                        Decimal(str(record.get('cf', 0))),
-                        Decimal(str(record.get('periodic_return_subcategory', 0))),
-                        Decimal(str(record.get('cumulative_return_subcategory', 0))),
-                        Decimal(str(record.get('contribution_percentage', 0))),
-                        Decimal(str(record.get('periodic_return_contribution', 0))),
-                        Decimal(str(record.get('cumulative_return_contribution', 0)))
-                    ))
-
-                await conn.executemany(query, records)
+            records = self.coalesce_records(self.build_records(data, book_id, timestamp))
+            inserted = await self.bulk_insert(records)
 
-                self.logger.info(f"✅ Inserted {len(records)} return records for {book_id}")
-                return len(records)
+            self.logger.info(f"✅ Inserted {inserted} return records for {book_id}")
+            return inserted
 
         except Exception as e:
             self.logger.error(f"❌ Error inserting return simulation data: {e}")
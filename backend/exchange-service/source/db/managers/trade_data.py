@@ -3,13 +3,19 @@ from typing import Dict, List
 from datetime import datetime
 import traceback
 import uuid
-from decimal import Decimal
-from source.db.managers.base_manager import BaseTableManager
+from source.db.managers.base_manager import BulkTableManager, to_numeric
 
 
-class TradeDataManager(BaseTableManager):
+class TradeDataManager(BulkTableManager):
     """Manager for trade data table operations"""
 
+    TABLE_NAME = 'exch_us_equity.trade_data'
+    COLUMNS = ('book_id', 'start_timestamp', 'end_timestamp', 'trade_id',
+               'order_id', 'cl_order_id', 'symbol', 'side', 'currency', 'price',
+               'quantity', 'detail')
+    NUMERIC_COLUMNS = frozenset({'price', 'quantity'})
+    CONFLICT_COLUMNS = ('book_id', 'end_timestamp', 'trade_id')
+
     async def load_book_data(self, book_id: str, timestamp_str: str) -> List[Dict]:
         """Load book trades data from PostgreSQL using normalized schema"""
         await self.ensure_connection()
@@ -53,55 +59,37 @@ class TradeDataManager(BaseTableManager):
             self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
             return []
 
+    def build_records(self, data: List[Dict], book_id: str, timestamp: datetime) -> List[tuple]:
+        """Trade rows ordered as COLUMNS"""
+        return [
+            (
+                book_id,
+                record.get('start_timestamp', timestamp),
+                record.get('end_timestamp', timestamp),
+                record.get('trade_id', f"TRADE_{uuid.uuid4().hex[:8]}"),
+                record.get('order_id', ''),
+                record.get('cl_order_id', ''),
+                record['symbol'],
+                record.get('side', 'BUY'),
+                record.get('currency', 'USD'),
+                to_numeric(record.get('price', 0)),
+                to_numeric(record.get('quantity', 0)),
+                record.get('detail', '')
+            )
+            for record in data
+        ]
+
     async def insert_simulation_data(self, data: List[Dict], book_id: str, timestamp: datetime) -> int:
         """Insert trade simulation data into normalized table"""
-        await self.ensure_connection()
-
         if not data:
             return 0
 
         try:
-            async with self.pool.acquire() as conn:
-                # Insert into normalized trade_data table
-                query = """
-                    INSERT INTO exch_us_equity.trade_data (
-                        book_id, start_timestamp, end_timestamp, trade_id,
-                        order_id, cl_order_id, symbol, side, currency, price,
-                        quantity, detail
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12)
-                    ON CONFLICT (book_id, end_timestamp, trade_id) DO UPDATE SET
-                        start_timestamp = EXCLUDED.start_timestamp,
-                        order_id = EXCLUDED.order_id,
-                        cl_order_id = EXCLUDED.cl_order_id,
-                        symbol = EXCLUDED.symbol,
-                        side = EXCLUDED.side,
-                        currency = EXCLUDED.currency,
-                        price = EXCLUDED.price,
-                        quantity = EXCLUDED.quantity,
-                        detail = EXCLUDED.detail
-                """
-
-                records = []
-                for record in data:
-                    records.append((
-                        book_id,
-                        record.get('start_timestamp', timestamp),
-                        record.get('end_timestamp', timestamp),
-                        record.get('trade_id', f"TRADE_{uuid.uuid4().hex[:8]}"),
-                        record.get('order_id', ''),
-                        record.get('cl_order_id', ''),
-                        record['symbol'],
-                        record.get('side', 'BUY'),
-                        record.get('currency', 'USD'),
-                        Decimal(str(record.get('price', 0))),
-                        Decimal(str(record.get('quantity', 0))),
-                        record.get('detail', '')
-                    ))
-
-                await conn.executemany(query, records)
+            records = self.coalesce_records(self.build_records(data, book_id, timestamp))
+            inserted = await self.bulk_insert(records)
 
-                self.logger.info(f"✅ Inserted {len(records)} trade records for {book_id}")
-                return len(records)
+            self.logger.info(f"✅ Inserted {inserted} trade records for {book_id}")
+            return inserted
 
         except Exception as e:
             self.logger.error(f"❌ Error inserting trade simulation data: {e}")
@@ -1,10 +1,10 @@
 # source/engines/v01/engine.py
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 import traceback
 import numpy as np
-from scipy.optimize import minimize
 
 from source.engines.base_engine import BaseEngine
+from source.engines.v01.solver import BudgetBoxQPSolver
 
 
 class ENGINE_v01(BaseEngine):
@@ -23,6 +23,7 @@ class ENGINE_v01(BaseEngine):
 
     def __init__(self, config: Dict[str, Any] = None):
         super().__init__(engine_id=1, config=config)
+        self.solver = BudgetBoxQPSolver()
 
     def validate_conviction(self, conviction: Dict[str, Any]) -> str:
         """Validate conviction for basic engine."""
@@ -50,51 +51,51 @@ class ENGINE_v01(BaseEngine):
                                             book_id: str,
                                             convictions: List[Dict[str, Any]],
                                             book_context: Any) -> List[Dict[str, Any]]:
-        """Convert convictions to orders using portfolio optimization."""
-        return await self._async_portfolio_optimization(book_id, convictions, book_context)
+        """Convert convictions to orders using portfolio optimization (a batch of one book)."""
+        orders_by_book = await self.convert_books_convictions_to_orders({book_id: (convictions, book_context)})
+        return orders_by_book[book_id]
 
-    async def _async_portfolio_optimization(self,
-                                            book_id: str,
-                                            convictions: List[Dict[str, Any]],
-                                            book_context: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Main optimization workflow using existing managers."""
-
-        try:
-            # Step 1: Get current portfolio from book_context portfolio manager (in base currency)
-            current_portfolio = self.get_current_notional_portfolio_from_manager(book_context)
-            self.logger.info(f"Current portfolio for {book_id}: {len(current_portfolio)}")
-
-            # Step 2: Get target portfolio from convictions (ENGINE SPECIFIC) (in base currency)
-            target_portfolio = self._get_target_notional_portfolio_from_convictions(
-                current_portfolio, convictions, book_context
-            )
-            self.logger.info(f"Target portfolio from convictions: {len(target_portfolio)}")
-
-            # Step 5: Solve optimization problem in base currency
-            optimal_portfolio, optimization_result = self._solve_optimization_problem(
-                book_context=book_context,
-                current_portfolio=current_portfolio,
-                target_portfolio=target_portfolio
-            )
+    async def convert_books_convictions_to_orders(self,
+                                                  book_requests: Dict[str, Tuple[List[Dict[str, Any]], Any]]
+                                                  ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        Batched mode: convert convictions for several books, solving every book's
+        optimization problem in a single solver call.
 
-            print("OK NOW CREATE THE ORDER")
+        book_requests maps book_id -> (convictions, book_context).
+        """
+        problems = {}
+        orders_by_book = {}
 
-            # Step 6: Generate orders from solution (converting back to symbol quantities)
-            orders = self._generate_orders_from_notional_solution(
-                current_portfolio=current_portfolio,
-                optimal_portfolio=optimal_portfolio,
-                book_context=book_context,
-                convictions=convictions
-            )
+        for book_id, (convictions, book_context) in book_requests.items():
+            try:
+                current_portfolio = self.get_current_notional_portfolio_from_manager(book_context)
+                target_portfolio = self._get_target_notional_portfolio_from_convictions(
+                    current_portfolio, convictions, book_context
+                )
+                problems[book_id] = (book_context, current_portfolio, target_portfolio)
+            except Exception as e:
+                self.logger.error(f"Error in portfolio optimization for book {book_id}: {e}")
+                orders_by_book[book_id] = []
 
-            print(f"ORDER: {orders}")
+        solutions = self.solve_books(problems)
 
-            self.logger.info(f"Generated {len(orders)} orders from optimization for {book_id}")
-            return orders
+        for book_id, (book_context, current_portfolio, _) in problems.items():
+            try:
+                optimal_portfolio, _ = solutions[book_id]
+                orders = self._generate_orders_from_notional_solution(
+                    current_portfolio=current_portfolio,
+                    optimal_portfolio=optimal_portfolio,
+                    book_context=book_context,
+                    convictions=book_requests[book_id][0]
+                )
+                self.logger.info(f"Generated {len(orders)} orders from optimization for {book_id}")
+                orders_by_book[book_id] = orders
+            except Exception as e:
+                self.logger.error(f"Error in portfolio optimization for book {book_id}: {e}")
+                orders_by_book[book_id] = []
 
-        except Exception as e:
-            self.logger.error(f"Error in portfolio optimization for book {book_id}: {e}")
-            return []
+        return orders_by_book
 
     def _get_target_notional_portfolio_from_convictions(self,
                                                         current_portfolio: Dict[str, float],
@@ -108,10 +109,7 @@ class ENGINE_v01(BaseEngine):
 
         target_portfolio = {}
 
-
         for conviction in convictions:
-            print(f"CONVICTION: {conviction}")
-
             symbol = conviction.get('instrument_id')
             if not symbol:
                 continue
@@ -128,8 +126,6 @@ class ENGINE_v01(BaseEngine):
                     self.logger.warning(f"No price available for {symbol}, skipping")
                     continue
 
-                print(f"LATEST PRICE: {latest_price}")
-
                 # Calculate notional value in symbol's native currency
                 delta_notional_value = quantity * float(latest_price)
 
@@ -143,8 +139,6 @@ class ENGINE_v01(BaseEngine):
                 if side == 'SELL':
                     delta_notional_value = -delta_notional_value
 
-                print(f"NOTIONAL VALUE: {current_notional} > {delta_notional_value}")
-
                 target_portfolio[symbol] = current_notional + delta_notional_value
 
             except Exception as e:
@@ -153,13 +147,10 @@ class ENGINE_v01(BaseEngine):
 
         return target_portfolio
 
-    def _solve_optimization_problem(self,
-                                    book_context: Any,
-                                    current_portfolio: Dict[str, float],
-                                    target_portfolio: Dict[str, float]
-                                    ) -> Tuple[Dict[str, float], Dict]:
+    def solve_books(self, problems: Dict[Any, Tuple[Any, Dict[str, float], Dict[str, float]]]
+                    ) -> Dict[Any, Tuple[Dict[str, float], Dict]]:
         """
-        Solve portfolio optimization problem using a common framework.
+        Solve the portfolio optimization problem for one or more books in one call.
 
         Framework:
         1. Set up decision variables (positions for each symbol)
@@ -167,241 +158,257 @@ class ENGINE_v01(BaseEngine):
         3. Add constraints (book min/max limits, budget constraint)
         4. Solve using optimization solver
         5. Return optimal portfolio and result metadata
+
+        problems maps book_id -> (book_context, current_portfolio, target_portfolio);
+        returns book_id -> (optimal_portfolio, optimization_result). The default
+        solver is the analytic BudgetBoxQPSolver, which solves every book in one
+        batch; set config['solver'] = 'slsqp' to use scipy SLSQP per book instead.
         """
-        base_currency = book_context.base_currency
-        self.logger.info(f"Setting up optimization problem in {base_currency}")
+        results = {}
+        prepared = {}
+
+        for book_id, (book_context, current_portfolio, target_portfolio) in problems.items():
+            base_currency = book_context.base_currency
+            try:
+                problem = self._setup_optimization_problem(book_context, current_portfolio, target_portfolio)
+                if problem is None:
+                    results[book_id] = ({}, {'status': 'no_symbols', 'message': 'No symbols provided'})
+                else:
+                    prepared[book_id] = problem
+            except Exception as e:
+                self.logger.error(f"❌ Error in optimization: {e}")
+                self.logger.error(f"Full traceback: {traceback.format_exc()}")
+                results[book_id] = self._simple_target_following_fallback(
+                    current_portfolio, target_portfolio, base_currency
+                )
 
-        print(f"CURRENT: {current_portfolio}")
-        print(f"TARGET: {target_portfolio}")
+        if not prepared:
+            return {book_id: results[book_id] for book_id in problems}
 
+        solver_name = self.config.get('solver', 'analytic')
         try:
+            if solver_name == 'slsqp':
+                for book_id, problem in prepared.items():
+                    results[book_id] = self._solve_with_slsqp(problem)
+            else:
+                results.update(self._solve_with_analytic_solver(prepared))
 
-            print("1")
+        except Exception as e:
+            self.logger.error(f"❌ Error in optimization: {e}")
+            self.logger.error(f"Full traceback: {traceback.format_exc()}")
 
-            # ==========================================
-            # STEP 1: SETUP DECISION VARIABLES
-            # ==========================================
+            # Fallback to simple target following
+            for book_id, problem in prepared.items():
+                results[book_id] = self._simple_target_following_fallback(
+                    problem['current_portfolio'], problem['target_portfolio'], problem['base_currency']
+                )
 
-            # Get all unique symbols from current and target portfolios
-            all_symbols = sorted(set(list(current_portfolio.keys()) + list(target_portfolio.keys())))
-            n_symbols = len(all_symbols)
+        return {book_id: results[book_id] for book_id in problems}
 
-            if n_symbols == 0:
-                self.logger.warning("No symbols to optimize")
-                return {}, {'status': 'no_symbols', 'message': 'No symbols provided'}
+    def _setup_optimization_problem(self,
+                                    book_context: Any,
+                                    current_portfolio: Dict[str, float],
+                                    target_portfolio: Dict[str, float]) -> Optional[Dict[str, Any]]:
+        """Build decision variables, budget and bounds for one book (None if there is nothing to solve)"""
+        base_currency = book_context.base_currency
+        self.logger.info(f"Setting up optimization problem in {base_currency}")
 
-            print("2")
+        # ==========================================
+        # STEP 1: SETUP DECISION VARIABLES
+        # ==========================================
 
-            self.logger.info(f"Optimizing {n_symbols} symbols: {all_symbols}")
+        # Get all unique symbols from current and target portfolios
+        all_symbols = sorted(set(current_portfolio) | set(target_portfolio))
+        n_symbols = len(all_symbols)
 
-            # Current positions vector
-            current_positions = np.array([current_portfolio.get(symbol, 0.0) for symbol in all_symbols])
+        if n_symbols == 0:
+            self.logger.warning("No symbols to optimize")
+            return None
 
-            # Target positions vector
-            target_positions = np.array([target_portfolio.get(symbol, 0.0) for symbol in all_symbols])
+        self.logger.info(f"Optimizing {n_symbols} symbols")
 
-            self.logger.info(f"Current total: {np.sum(current_positions):,.2f} {base_currency}")
-            self.logger.info(f"Target total: {np.sum(target_positions):,.2f} {base_currency}")
+        current_positions = np.array([current_portfolio.get(symbol, 0.0) for symbol in all_symbols],
+                                     dtype=np.float64)
+        target_positions = np.array([target_portfolio.get(symbol, 0.0) for symbol in all_symbols],
+                                    dtype=np.float64)
 
-            print(f"3: CURRENT: {current_positions}")
-            print(f"3: TARGET: {target_positions}")
+        self.logger.info(f"Current total: {np.sum(current_positions):,.2f} {base_currency}")
+        self.logger.info(f"Target total: {np.sum(target_positions):,.2f} {base_currency}")
 
-            # ==========================================
-            # STEP 2: DEFINE OBJECTIVE FUNCTION
-            # ==========================================
+        # ==========================================
+        # STEP 2: SETUP CONSTRAINTS
+        # ==========================================
 
-            def objective_function(x):
-                """
-                Minimize squared deviation from target positions.
-                x: vector of optimal positions for each symbol
-                """
-                deviation = x - target_positions
-                return np.sum(deviation ** 2)
+        # A) Budget: get NAV from account manager (this is your total budget)
+        account_manager = book_context.app_state.account_manager
+        if hasattr(account_manager, 'get_nav') or hasattr(account_manager, 'get_total_value'):
+            total_budget = account_manager.get_nav()  # or get_total_value()
+        else:
+            total_budget = book_context.initial_nav
+        total_budget = float(total_budget)
 
-            # ==========================================
-            # STEP 3: SETUP CONSTRAINTS
-            # ==========================================
+        # Budget constraint is "don't exceed budget": sum(x) <= total_budget
+        self.logger.info(f"Budget constraint: total <= {total_budget:,.2f} {base_currency}")
 
-            constraints = []
-            bounds = []
+        # B) book position limits (min/max per symbol)
+        # Symbol-specific limits from book parameters are not wired in yet, so every
+        # symbol is bounded by +/- the budget.
+        lower_bounds = np.full(n_symbols, -total_budget)
+        upper_bounds = np.full(n_symbols, total_budget)
 
-            # Get NAV from account manager (this is your total budget)
-            account_manager = book_context.app_state.account_manager
-            if hasattr(account_manager, 'get_nav') or hasattr(account_manager, 'get_total_value'):
-                total_budget = account_manager.get_nav()  # or get_total_value()
-            else:
-                total_budget = book_context.initial_nav
-
-            print(f"4: TOTAL: {total_budget}")
-
-            # FIXED: Budget constraint should be "don't exceed budget" not "use entire budget"
-            def budget_constraint(x):
-                # Total portfolio value should not exceed available budget
-                # This is an inequality constraint: sum(x) <= total_budget
-                return float(total_budget) - np.sum(x)  # Must be >= 0
-
-            constraints.append({
-                'type': 'ineq',  # FIXED: Changed from 'eq' to 'ineq'
-                'fun': budget_constraint
-            })
-
-            print(f"5: CONSTRAINTS: Budget <= {total_budget}")
-
-            self.logger.info(f"Budget constraint: total = {total_budget:,.2f} {base_currency}")
-
-            print(f"5: BASE CURRENCY: {base_currency}")
-
-            # B) book position limits (min/max constraints per symbol)
-            for i, symbol in enumerate(all_symbols):
-                symbol_min = None
-                symbol_max = None
-
-                # Check book parameters for symbol-specific limits
-                """
-                if book_params:
-                    position_limits = book_params.get('position_limits', {})
-                    if symbol in position_limits:
-                        symbol_min = position_limits[symbol].get('min_position_size_pct')
-                        symbol_max = position_limits[symbol].get('max_position_size_pct')
-
-                    # Global limits as fallback
-                    if symbol_min is None:
-                        symbol_min = book_params.get('min_position_size_pct')
-                    if symbol_max is None:
-                        symbol_max = book_params.get('max_position_size_pct')
-                """
-
-                # Set bounds for this symbol
-                lower_bound = symbol_min if symbol_min is not None else -float(total_budget)# np.inf
-                upper_bound = symbol_max if symbol_max is not None else float(total_budget)# np.inf
-
-                bounds.append((lower_bound, upper_bound))
-
-                if symbol_min is not None or symbol_max is not None:
-                    self.logger.debug(f"Position limits for {symbol}: [{lower_bound}, {upper_bound}]")
-
-            print(f"6: BOUNDS: {bounds}")
-
-            # C) Additional constraints can be added here
-            # - Sector limits
-            # - Risk limits
-            # - Turnover limits
-            # - etc.
-
-            # ==========================================
-            # STEP 4: SOLVE OPTIMIZATION PROBLEM
-            # ==========================================
-
-            # Initial guess: start from current positions
-            x0 = current_positions.copy()
-
-            self.logger.info("Solving optimization problem...")
-            self.logger.info(f"Solver: scipy.optimize.minimize (SLSQP)")
-            self.logger.info(f"Variables: {n_symbols}")
-            self.logger.info(f"Constraints: {len(constraints)}")
-
-            # Solve the optimization problem
-            result = minimize(
-                fun=objective_function,
-                x0=x0,
-                method='SLSQP',  # Sequential Least Squares Programming
-                bounds=bounds,
-                constraints=constraints,
-                options={
-                    'ftol': 1e-8,
-                    'disp': False,
-                    'maxiter': 1000
-                }
-            )
+        # C) Additional constraints can be added here
+        # - Sector limits
+        # - Risk limits
+        # - Turnover limits
+        # - etc.
 
-            print(f"7: {result}")
-
-            # ==========================================
-            # STEP 5: PROCESS RESULTS
-            # ==========================================
-
-            if result.success:
-                # Extract optimal positions
-                optimal_positions = result.x
-
-                # Convert back to dictionary
-                optimal_portfolio = {}
-                for i, symbol in enumerate(all_symbols):
-                    position = optimal_positions[i]
-                    # Only include non-zero positions (with small threshold)
-                    if abs(position) > 0.01:
-                        optimal_portfolio[symbol] = float(position)
-
-                print(f"8: FINAL: {optimal_portfolio}")
-
-                # Calculate metrics
-                total_deviation = np.sum(np.abs(optimal_positions - target_positions))
-                max_deviation = np.max(np.abs(optimal_positions - target_positions))
-
-                optimization_result = {
-                    'status': 'optimal',
-                    'solver': 'scipy.SLSQP',
-                    'objective_value': float(result.fun),
-                    'total_deviation': float(total_deviation),
-                    'max_deviation': float(max_deviation),
-                    'base_currency': base_currency,
-                    'symbols_optimized': len(optimal_portfolio),
-                    'iterations': result.nit,
-                    'function_evaluations': result.nfev,
-                    'message': result.message,
-                    'total_budget': float(total_budget),
-                    'constraints_satisfied': all(
-                        abs(c['fun'](optimal_positions)) < 1e-6 for c in constraints if 'fun' in c)
-                }
-
-                print(f"9: RESULT: {optimization_result}")
-
-                self.logger.info(f"✅ Optimization successful!")
-                self.logger.info(f"   Objective value: {result.fun:.6f}")
-                self.logger.info(f"   Total deviation: {total_deviation:.2f} {base_currency}")
-                self.logger.info(f"   Positions: {len(optimal_portfolio)} symbols")
-                self.logger.info(f"   Iterations: {result.nit}")
-
-                return optimal_portfolio, optimization_result
+        return {
+            'base_currency': base_currency,
+            'current_portfolio': current_portfolio,
+            'target_portfolio': target_portfolio,
+            'symbols': all_symbols,
+            'current_positions': current_positions,
+            'target_positions': target_positions,
+            'total_budget': total_budget,
+            'lower_bounds': lower_bounds,
+            'upper_bounds': upper_bounds,
+        }
 
+    def _solve_with_analytic_solver(self, problems: Dict[Any, Dict[str, Any]]
+                                    ) -> Dict[Any, Tuple[Dict[str, float], Dict]]:
+        """Solve all prepared books with one BudgetBoxQPSolver batch"""
+        book_ids = list(problems.keys())
+        self.logger.info(f"Solving {len(book_ids)} optimization problem(s) with analytic QP solver")
+
+        solutions = self.solver.solve_batch(
+            [problems[book_id]['target_positions'] for book_id in book_ids],
+            [problems[book_id]['total_budget'] for book_id in book_ids],
+            [problems[book_id]['lower_bounds'] for book_id in book_ids],
+            [problems[book_id]['upper_bounds'] for book_id in book_ids],
+        )
+
+        results = {}
+        for book_id, solution in zip(book_ids, solutions):
+            problem = problems[book_id]
+            if solution.success:
+                results[book_id] = self._build_optimal_result(
+                    problem, solution.x, solution.objective_value, 'analytic.BudgetBoxQP',
+                    iterations=solution.iterations, function_evaluations=solution.iterations,
+                    message='Optimal (KKT projection)', budget_multiplier=solution.multiplier
+                )
             else:
-                # Optimization failed
-                self.logger.error(f"❌ Optimization failed: {result.message}")
+                results[book_id] = self._build_failed_result(
+                    problem, 'analytic.BudgetBoxQP', 'Budget is below the sum of lower bounds',
+                    solution.iterations
+                )
+        return results
+
+    def _solve_with_slsqp(self, problem: Dict[str, Any]) -> Tuple[Dict[str, float], Dict]:
+        """Solve one book with scipy SLSQP (finite-difference gradients)"""
+        from scipy.optimize import minimize
+
+        target_positions = problem['target_positions']
+        total_budget = problem['total_budget']
+
+        def objective_function(x):
+            """Minimize squared deviation from target positions"""
+            deviation = x - target_positions
+            return np.sum(deviation ** 2)
+
+        constraints = [{
+            'type': 'ineq',
+            'fun': lambda x: total_budget - np.sum(x)  # Must be >= 0
+        }]
+        bounds = list(zip(problem['lower_bounds'], problem['upper_bounds']))
+
+        self.logger.info("Solving optimization problem...")
+        self.logger.info(f"Solver: scipy.optimize.minimize (SLSQP)")
+        self.logger.info(f"Variables: {len(problem['symbols'])}")
+        self.logger.info(f"Constraints: {len(constraints)}")
+
+        # Initial guess: start from current positions
+        result = minimize(
+            fun=objective_function,
+            x0=problem['current_positions'].copy(),
+            method='SLSQP',  # Sequential Least Squares Programming
+            bounds=bounds,
+            constraints=constraints,
+            options={
+                'ftol': 1e-8,
+                'disp': False,
+                'maxiter': 1000
+            }
+        )
+
+        if result.success:
+            return self._build_optimal_result(
+                problem, result.x, float(result.fun), 'scipy.SLSQP',
+                iterations=result.nit, function_evaluations=result.nfev, message=result.message
+            )
 
-                # Fallback: return target portfolio (or current if target is empty)
-                fallback_portfolio = target_portfolio if target_portfolio else current_portfolio
+        self.logger.error(f"❌ Optimization failed: {result.message}")
+        return self._build_failed_result(problem, 'scipy.SLSQP', result.message,
+                                         result.nit if hasattr(result, 'nit') else 0)
+
+    def _build_optimal_result(self, problem: Dict[str, Any], optimal_positions: np.ndarray,
+                              objective_value: float, solver: str, **details) -> Tuple[Dict[str, float], Dict]:
+        """Convert solved positions back to a portfolio dict plus result metadata"""
+        base_currency = problem['base_currency']
+        target_positions = problem['target_positions']
+
+        # Only include non-zero positions (with small threshold)
+        significant = np.abs(optimal_positions) > 0.01
+        optimal_portfolio = {
+            symbol: float(position)
+            for symbol, position, keep in zip(problem['symbols'], optimal_positions.tolist(), significant.tolist())
+            if keep
+        }
 
-                print("10")
+        deviation = np.abs(optimal_positions - target_positions)
+        total_deviation = float(np.sum(deviation))
+        budget_slack = problem['total_budget'] - float(np.sum(optimal_positions))
 
-                optimization_result = {
-                    'status': 'failed',
-                    'solver': 'scipy.SLSQP',
-                    'error': result.message,
-                    'base_currency': base_currency,
-                    'fallback_used': True,
-                    'symbols_in_fallback': len(fallback_portfolio),
-                    'iterations': result.nit if hasattr(result, 'nit') else 0
-                }
+        optimization_result = {
+            'status': 'optimal',
+            'solver': solver,
+            'objective_value': float(objective_value),
+            'total_deviation': total_deviation,
+            'max_deviation': float(np.max(deviation)),
+            'base_currency': base_currency,
+            'symbols_optimized': len(optimal_portfolio),
+            'iterations': details.pop('iterations', 0),
+            'function_evaluations': details.pop('function_evaluations', 0),
+            'message': details.pop('message', ''),
+            'total_budget': problem['total_budget'],
+            'constraints_satisfied': abs(budget_slack) < 1e-6,
+            **details
+        }
 
-                return fallback_portfolio, optimization_result
+        self.logger.info(f"✅ Optimization successful!")
+        self.logger.info(f"   Objective value: {objective_value:.6f}")
+        self.logger.info(f"   Total deviation: {total_deviation:.2f} {base_currency}")
+        self.logger.info(f"   Positions: {len(optimal_portfolio)} symbols")
+        self.logger.info(f"   Iterations: {optimization_result['iterations']}")
 
-        except ImportError as e:
-            self.logger.error(f"❌ Optimization solver not available: {e}")
-            self.logger.info("💡 Install scipy: pip install scipy")
+        return optimal_portfolio, optimization_result
 
-            # Fallback to simple target following
-            return self._simple_target_following_fallback(
-                current_portfolio, target_portfolio, base_currency
-            )
+    def _build_failed_result(self, problem: Dict[str, Any], solver: str, message: str,
+                             iterations: int) -> Tuple[Dict[str, float], Dict]:
+        """Fallback: return target portfolio (or current if target is empty)"""
+        fallback_portfolio = problem['target_portfolio'] if problem['target_portfolio'] \
+            else problem['current_portfolio']
 
-        except Exception as e:
-            self.logger.error(f"❌ Error in optimization: {e}")
-            self.logger.error(f"Full traceback: {traceback.format_exc()}")
+        optimization_result = {
+            'status': 'failed',
+            'solver': solver,
+            'error': message,
+            'base_currency': problem['base_currency'],
+            'fallback_used': True,
+            'symbols_in_fallback': len(fallback_portfolio),
+            'iterations': iterations
+        }
 
-            # Fallback to simple target following
-            return self._simple_target_following_fallback(
-                current_portfolio, target_portfolio, base_currency
-            )
+        return fallback_portfolio, optimization_result
 
     def _simple_target_following_fallback(self,
                                           current_portfolio: Dict[str, float],
@@ -0,0 +1,189 @@
+# source/engines/v01/solver.py
+"""
+Solver for the ENGINE_v01 portfolio problem:
+
+    minimize    sum((x - target) ** 2)
+    subject to  sum(x) <= budget
+                lower <= x <= upper
+
+The objective is separable and the only coupling constraint is the budget,
+so the KKT conditions give the solution in closed form:
+
+    x(lam) = clip(target - lam, lower, upper)
+
+with lam = 0 if the clipped target already fits the budget, otherwise the
+unique lam > 0 for which sum(x(lam)) == budget. sum(x(lam)) is monotone and
+piecewise linear in lam with breakpoints at target - upper and
+target - lower, so lam is found exactly by sorting the breakpoints.
+
+solve_batch() solves many books at once on one concatenated array, using
+per-book segment sums; only the breakpoint sort runs per book.
+"""
+
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+
+@dataclass
+class QPSolution:
+    """Solution of one budget / box constrained least-squares problem"""
+    x: np.ndarray
+    objective_value: float
+    multiplier: float  # Budget constraint multiplier (0 if the budget is slack)
+    budget_slack: float  # budget - sum(x), >= 0 when feasible
+    iterations: int  # Breakpoints examined for the budget multiplier
+    status: str  # 'optimal' or 'infeasible'
+
+    @property
+    def success(self) -> bool:
+        return self.status == 'optimal'
+
+
+class BudgetBoxQPSolver:
+    """Analytic projection solver for ENGINE_v01's quadratic program"""
+
+    def solve(self, target: np.ndarray, budget: float,
+              lower: np.ndarray, upper: np.ndarray) -> QPSolution:
+        """Solve a single book"""
+        return self.solve_batch([target], [budget], [lower], [upper])[0]
+
+    def solve_batch(self, targets: Sequence[np.ndarray], budgets: Sequence[float],
+                    lowers: Sequence[np.ndarray], uppers: Sequence[np.ndarray]) -> List[QPSolution]:
+        """Solve one problem per book in a single vectorized pass"""
+        if not (len(targets) == len(budgets) == len(lowers) == len(uppers)):
+            raise ValueError("targets, budgets, lowers and uppers must have the same length")
+
+        n_books = len(targets)
+        if n_books == 0:
+            return []
+
+        sizes = np.array([len(t) for t in targets], dtype=np.int64)
+        solutions: List[Optional[QPSolution]] = [None] * n_books
+
+        # Empty books are trivially optimal; the rest are solved on one concatenated array
+        active = np.flatnonzero(sizes > 0)
+        for b in np.flatnonzero(sizes == 0):
+            solutions[b] = QPSolution(x=np.zeros(0), objective_value=0.0, multiplier=0.0,
+                                      budget_slack=float(budgets[b]), iterations=0, status='optimal')
+        if len(active) == 0:
+            return solutions
+
+        target = np.concatenate([np.asarray(targets[b], dtype=np.float64) for b in active])
+        lower = np.concatenate([np.asarray(lowers[b], dtype=np.float64) for b in active])
+        upper = np.concatenate([np.asarray(uppers[b], dtype=np.float64) for b in active])
+        budget = np.array([float(budgets[b]) for b in active])
+
+        if np.any(lower > upper):
+            raise ValueError("Lower bounds must not exceed upper bounds")
+
+        starts = np.concatenate(([0], np.cumsum(sizes[active])[:-1]))
+        segment = np.repeat(np.arange(len(active)), sizes[active])
+
+        def segment_sum(values: np.ndarray) -> np.ndarray:
+            return np.add.reduceat(values, starts)
+
+        # lam = 0 is optimal when the clipped target already fits the budget
+        x = np.clip(target, lower, upper)
+        binding = segment_sum(x) > budget
+
+        # Budget below the sum of lower bounds cannot be met; the closest box point is lower
+        infeasible = segment_sum(lower) > budget
+        binding &= ~infeasible
+
+        lam = np.zeros(len(active))
+        iterations = np.zeros(len(active), dtype=np.int64)
+
+        if binding.any():
+            # Only books whose budget binds need the breakpoint search
+            rows = binding[segment]
+            lam[binding] = self._budget_multiplier(target[rows], lower[rows], upper[rows],
+                                                   budget[binding], sizes[active][binding])
+
+            # Re-solve lam on the identified free set so the budget holds to rounding
+            shifted = target - lam[segment]
+            free = (shifted > lower) & (shifted < upper)
+            n_free = segment_sum(free.astype(np.float64))
+            fixed_total = segment_sum(np.where(free, 0.0, np.clip(shifted, lower, upper)))
+            free_target = segment_sum(np.where(free, target, 0.0))
+            lam = np.divide(free_target + fixed_total - budget, n_free, out=lam, where=n_free > 0)
+
+            lam = np.where(binding, np.maximum(lam, 0.0), 0.0)
+            iterations = np.where(binding, 2 * sizes[active], 0)
+            x = np.clip(target - lam[segment], lower, upper)
+
+        x = np.where(infeasible[segment], lower, x)
+        objective = segment_sum((x - target) ** 2)
+        slack = budget - segment_sum(x)
+
+        for k, b in enumerate(active):
+            start = starts[k]
+            solutions[b] = QPSolution(
+                x=x[start:start + sizes[b]],
+                objective_value=float(objective[k]),
+                multiplier=float(2.0 * lam[k]),
+                budget_slack=float(slack[k]),
+                iterations=int(iterations[k]),
+                status='infeasible' if infeasible[k] else 'optimal'
+            )
+
+        return solutions
+
+    @staticmethod
+    def _budget_multiplier(target: np.ndarray, lower: np.ndarray, upper: np.ndarray,
+                           budget: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+        """Exact lam per segment with sum(clip(target - lam, lower, upper)) == budget.
+
+        Coordinate i is free for lam in (target_i - upper_i, target_i - lower_i),
+        so with events sorted by breakpoint bp_k (s_k = +1 entering, -1 leaving):
+
+            g(lam) = sum(upper) + sum_{bp_k < lam} s_k * (bp_k - lam)
+
+        g is evaluated at every breakpoint with per-segment cumulative sums and
+        the budget crossing is interpolated on the linear piece before it.
+        """
+        starts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+        event_segment = np.repeat(np.arange(len(sizes)), 2 * sizes)
+
+        # Events are laid out segment by segment and sorted by breakpoint within each segment
+        breakpoints = np.empty(2 * len(target))
+        signs = np.empty(2 * len(target))
+        for start, size in zip(starts.tolist(), sizes.tolist()):
+            bp = np.concatenate((target[start:start + size] - upper[start:start + size],
+                                 target[start:start + size] - lower[start:start + size]))
+            order = np.argsort(bp, kind='stable')
+            breakpoints[2 * start:2 * (start + size)] = bp[order]
+            signs[2 * start:2 * (start + size)] = np.where(order < size, 1.0, -1.0)
+
+        # Per-segment inclusive cumulative sums
+        event_starts = np.concatenate(([0], np.cumsum(2 * sizes)[:-1]))
+        c0 = np.cumsum(signs)
+        c1 = np.cumsum(signs * breakpoints)
+        c0_offset = np.concatenate(([0.0], c0))[event_starts]
+        c1_offset = np.concatenate(([0.0], c1))[event_starts]
+        c0 -= c0_offset[event_segment]
+        c1 -= c1_offset[event_segment]
+
+        upper_total = np.add.reduceat(upper, starts)
+        g = upper_total[event_segment] + c1 - breakpoints * c0
+
+        # First breakpoint per segment where g has dropped to the budget
+        n_events = len(breakpoints)
+        crossed = g <= budget[event_segment]
+        first = np.minimum.reduceat(np.where(crossed, np.arange(n_events), n_events), event_starts)
+        first = np.minimum(first, event_starts + 2 * sizes - 1)
+
+        # Linear piece just before the crossing, using events up to first - 1
+        previous = np.maximum(first - 1, event_starts)
+        has_previous = first > event_starts
+        slope = np.where(has_previous, c0[previous], 0.0)
+        intercept = upper_total + np.where(has_previous, c1[previous], 0.0)
+
+        lam = np.divide(intercept - budget, slope, out=breakpoints[first].copy(), where=slope > 0)
+        return np.maximum(lam, 0.0)
+
+    @staticmethod
+    def gradient(x: np.ndarray, target: np.ndarray) -> np.ndarray:
+        """Analytic gradient of the objective"""
+        return 2.0 * (x - target)
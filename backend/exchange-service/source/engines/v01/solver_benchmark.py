@@ -0,0 +1,154 @@
+"""
+Checks and benchmark for ENGINE_v01's analytic QP solver against the SLSQP path.
+
+    python -m source.engines.v01.solver_benchmark --sizes 100 500 1000 2000 5000 --slsqp-symbols 1000
+
+Problems are built the way _setup_optimization_problem builds them: notional targets, a budget and
+box bounds of +/- the budget. The check solves random problems (slack and binding budgets, tight
+and loose boxes) with BudgetBoxQPSolver and asserts each solution is feasible, matches a bisection
+on the budget multiplier, and that solve_books gives every book the same portfolio batched as it
+does solved alone. The benchmark times the analytic solver and SLSQP (when scipy is installed, up to
+--slsqp-symbols) on the same binding problem and reports objective and budget slack for both, then
+times one batch of --books books against solving them one by one.
+"""
+import argparse
+import logging
+import random
+import time
+
+import numpy as np
+
+from source.engines.v01.engine import ENGINE_v01
+from source.engines.v01.solver import BudgetBoxQPSolver
+
+
+def make_problem(n_symbols: int, seed: int = 0, binding: bool = True, box: float = 1.0) -> dict:
+    """A prepared ENGINE_v01 problem; binding puts the budget below the sum of the targets"""
+    rng = np.random.default_rng(seed)
+    target = rng.lognormal(13, 1, n_symbols) * rng.choice([-1, 1], n_symbols, p=[0.2, 0.8])
+    budget = float(target.sum() * (0.7 if binding else 1.3))
+    symbols = [f"S{i:05d}" for i in range(n_symbols)]
+    current = target * rng.uniform(0.5, 1.5, n_symbols)
+    return {
+        'base_currency': 'USD',
+        'current_portfolio': dict(zip(symbols, current.tolist())),
+        'target_portfolio': dict(zip(symbols, target.tolist())),
+        'symbols': symbols,
+        'current_positions': current,
+        'target_positions': target,
+        'total_budget': budget,
+        'lower_bounds': np.full(n_symbols, -abs(budget) * box),
+        'upper_bounds': np.full(n_symbols, abs(budget) * box),
+    }
+
+
+def bisection_reference(problem: dict, iterations: int = 200) -> np.ndarray:
+    """x(lam) = clip(target - lam, lower, upper) with lam found by bisection on the budget"""
+    target, lower, upper = problem['target_positions'], problem['lower_bounds'], problem['upper_bounds']
+    budget = problem['total_budget']
+    if np.clip(target, lower, upper).sum() <= budget:
+        return np.clip(target, lower, upper)
+    low, high = 0.0, float(np.max(target - lower)) + 1.0
+    for _ in range(iterations):
+        lam = (low + high) / 2
+        if np.clip(target - lam, lower, upper).sum() > budget:
+            low = lam
+        else:
+            high = lam
+    return np.clip(target - high, lower, upper)
+
+
+def _engine(solver: str = 'analytic') -> ENGINE_v01:
+    return ENGINE_v01(config={'solver': solver})
+
+
+def check_solutions(n_problems: int, max_symbols: int, seed: int = 0):
+    rng = random.Random(seed)
+    solver = BudgetBoxQPSolver()
+    worst = 0.0
+    problems = {}
+    for k in range(n_problems):
+        problem = make_problem(rng.randrange(1, max_symbols + 1), seed + k, binding=rng.random() < 0.7,
+                               box=rng.choice([0.01, 0.1, 1.0]))
+        solution = solver.solve(problem['target_positions'], problem['total_budget'],
+                                problem['lower_bounds'], problem['upper_bounds'])
+        if not solution.success:
+            continue
+        x, scale = solution.x, abs(problem['total_budget'])
+        assert np.all(x >= problem['lower_bounds'] - 1e-9 * scale) and np.all(x <= problem['upper_bounds'] + 1e-9 * scale)
+        assert x.sum() <= problem['total_budget'] + 1e-9 * scale, k
+        reference = bisection_reference(problem)
+        worst = max(worst, float(np.max(np.abs(x - reference))) / scale)
+        assert worst <= 1e-9, (k, worst)
+        problems[f"BOOK{k:03d}"] = problem
+
+    engine = _engine()
+    batched = engine._solve_with_analytic_solver(problems)
+    for book_id, problem in problems.items():
+        alone = engine._solve_with_analytic_solver({book_id: problem})[book_id]
+        assert batched[book_id][0] == alone[0], book_id
+    print(f"solutions ok: problems={len(problems)} symbols<={max_symbols} "
+          f"max_diff_vs_bisection={worst:.1e} x budget")
+
+
+def _time(function, repeat: int = 3):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark(sizes, slsqp_symbols: int, n_books: int, seed: int = 0):
+    try:
+        import scipy  # noqa: F401
+        have_scipy = True
+    except ImportError:
+        have_scipy = False
+
+    analytic, slsqp = _engine(), _engine('slsqp')
+    print(f"\n{'symbols':>8} {'analytic_ms':>12} {'objective':>14} {'slack':>10} "
+          f"{'slsqp_ms':>10} {'objective':>14} {'slack':>10}")
+    for n_symbols in sizes:
+        problem = make_problem(n_symbols, seed)
+        elapsed, (_, result) = _time(lambda: analytic._solve_with_analytic_solver({0: problem})[0])
+        solution = analytic.solver.solve(problem['target_positions'], problem['total_budget'],
+                                         problem['lower_bounds'], problem['upper_bounds'])
+        row = (f"{n_symbols:>8,} {elapsed * 1000:>12.2f} {result['objective_value']:>14.6e} "
+               f"{problem['total_budget'] - float(solution.x.sum()):>10.3g}")
+
+        if have_scipy and n_symbols <= slsqp_symbols:
+            elapsed, (portfolio, result) = _time(lambda: slsqp._solve_with_slsqp(problem), repeat=1)
+            slack = problem['total_budget'] - sum(portfolio.values())
+            row += f" {elapsed * 1000:>10.1f} {result.get('objective_value', float('nan')):>14.6e} {slack:>10.3g}"
+        else:
+            row += f" {'-':>10} {'-':>14} {'-':>10}"
+        print(row)
+
+    if not have_scipy:
+        print("(scipy not installed: SLSQP columns skipped)")
+
+    problems = {f"BOOK{b:03d}": make_problem(max(sizes), seed + b) for b in range(n_books)}
+    batch, _ = _time(lambda: analytic._solve_with_analytic_solver(problems))
+    loop, _ = _time(lambda: [analytic._solve_with_analytic_solver({book_id: problem})
+                             for book_id, problem in problems.items()])
+    print(f"\n{n_books} books x {max(sizes):,} symbols: batch {batch * 1000:.1f} ms, one by one {loop * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Checks and benchmark for ENGINE_v01's analytic QP solver")
+    parser.add_argument('--check-problems', type=int, default=200, help="random problems to check (0 to skip)")
+    parser.add_argument('--check-symbols', type=int, default=500)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 500, 1000, 2000, 5000])
+    parser.add_argument('--slsqp-symbols', type=int, default=1000, help="largest size SLSQP is timed at")
+    parser.add_argument('--books', type=int, default=50, help="books in the batch timing")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # The engine logs every solve; keep the output about the results
+    logging.disable(logging.WARNING)
+    if args.check_problems:
+        check_solutions(args.check_problems, args.check_symbols, args.seed)
+    benchmark(args.sizes, args.slsqp_symbols, args.books, args.seed)
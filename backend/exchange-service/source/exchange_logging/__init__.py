@@ -18,21 +18,35 @@ Usage:
     with transaction_scope("operation_name", logger, param1=value1):
         # ... your code ...
 
+    # On hot paths, build the parameters only when the scope is traced
+    with transaction_scope("operation_name", logger, lambda: {"param1": value1}):
+        # ... your code ...
+
 Environment Variables:
     EXCHANGE_DETAILED_LOGS: Set to 'true' to enable detailed logging (default: true)
     EXCHANGE_LOG_LEVEL: Set log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
+    EXCHANGE_STRUCTURED_LOGS: Set to 'true' to write structured records to a
+        buffered, off-thread JSON-lines sink instead of formatted text (default: false)
+    EXCHANGE_LOG_SAMPLING: Per-category sampling rates, e.g.
+        'calculation=0.01,state_change=0.1,*=1.0' (default: keep everything)
+    EXCHANGE_TRANSACTION_TRACING: Set to 'true' to record transaction_scope start/end
+        and parameters (default: false, transaction_scope is a no-op)
 """
 
 from .config import ExchangeLoggingConfig
 from .utils import get_exchange_logger, trace_execution
 from .context import transaction_scope, get_current_transaction_id
+from .sink import CategorySampler, StructuredLogSink, configure_structured_logging
 
 __all__ = [
     'ExchangeLoggingConfig',
     'get_exchange_logger',
     'trace_execution',
     'transaction_scope',
-    'get_current_transaction_id'
+    'get_current_transaction_id',
+    'CategorySampler',
+    'StructuredLogSink',
+    'configure_structured_logging'
 ]
 
 # Version info
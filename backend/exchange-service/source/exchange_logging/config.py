@@ -5,6 +5,9 @@ import logging
 import logging.handlers
 from datetime import datetime
 from dataclasses import dataclass
+from typing import Optional
+
+from .sink import CategorySampler, StructuredLogSink, configure_structured_logging
 
 
 @dataclass
@@ -13,6 +16,7 @@ class ExchangeLoggingConfig:
     enable_detailed_logging: bool
     logs_dir: str
     exchange_log_file: str
+    structured_log_file: Optional[str] = None
 
     @staticmethod
     def setup_exchange_logging(enable_detailed_logging: bool = True) -> 'ExchangeLoggingConfig':
@@ -143,16 +147,34 @@ class ExchangeLoggingConfig:
         gap_logger.info("🔍 Gap detection logging initialized")
         gap_logger.info(f"📁 Gap detection log file: gap_detection_{session_id}.log")
 
+        # Optional structured (JSON lines) sink, per-category sampling and transaction tracing
+        structured_log_file = None
+        if os.getenv('EXCHANGE_STRUCTURED_LOGS', 'false').lower() == 'true':
+            structured_log_file = os.path.join(logs_dir, f"exchange_{session_id}.jsonl")
+
+        configure_structured_logging(
+            sink=StructuredLogSink(
+                structured_log_file,
+                batch_size=int(os.getenv('EXCHANGE_STRUCTURED_LOG_BATCH_SIZE', '500')),
+                flush_interval=float(os.getenv('EXCHANGE_STRUCTURED_LOG_FLUSH_SECONDS', '1.0'))
+            ) if structured_log_file else None,
+            sampler=CategorySampler.from_string(os.getenv('EXCHANGE_LOG_SAMPLING', '')),
+            transaction_tracing=os.getenv('EXCHANGE_TRANSACTION_TRACING', 'false').lower() == 'true'
+        )
+
         print(f"🚀 Exchange logging configured:")
         print(f"   📁 Session ID: {session_id}")
         print(f"   📁 Exchange log: {exchange_log_file}")
         print(f"   🔧 Detailed logging: {enable_detailed_logging}")
+        if structured_log_file:
+            print(f"   📁 Structured log: {structured_log_file}")
 
         return ExchangeLoggingConfig(
             session_id=session_id,
             enable_detailed_logging=enable_detailed_logging,
             logs_dir=logs_dir,
-            exchange_log_file=exchange_log_file
+            exchange_log_file=exchange_log_file,
+            structured_log_file=structured_log_file
         )
 
 
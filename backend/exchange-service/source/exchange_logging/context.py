@@ -1,11 +1,13 @@
 # source/logging/context.py
 import logging
 import uuid
-from contextlib import contextmanager
-from typing import Optional, Dict, Any
+from contextlib import contextmanager, nullcontext
+from typing import Optional, Dict, Any, Callable
 from datetime import datetime
 import threading
 
+from .sink import is_transaction_tracing_enabled
+
 
 class TransactionContext:
     """Thread-local context for tracking related operations"""
@@ -51,14 +53,35 @@ class TransactionContext:
 _transaction_context = TransactionContext()
 
 
+# Shared no-op scope handed out when tracing is off; yields None as the transaction id
+_NULL_SCOPE = nullcontext()
+
+
+def transaction_scope(transaction_type: str, logger: logging.Logger,
+                      fields: Optional[Callable[[], Dict[str, Any]]] = None, **kwargs):
+    """Context manager for transaction logging.
+
+    When transaction tracing is disabled, or the logger is not enabled for
+    INFO, a shared no-op scope is returned: no id is generated and nothing is
+    pushed on the thread-local stack. Hot callers pass their parameters as a
+    ``fields`` callable so they are only built when the scope is traced.
+    """
+    if not is_transaction_tracing_enabled() or not logger.isEnabledFor(logging.INFO):
+        return _NULL_SCOPE
+    if fields is not None:
+        kwargs.update(fields())
+    return _traced_transaction_scope(transaction_type, logger, **kwargs)
+
+
 @contextmanager
-def transaction_scope(transaction_type: str, logger: logging.Logger, **kwargs):
+def _traced_transaction_scope(transaction_type: str, logger: logging.Logger, **kwargs):
     """Context manager for transaction logging"""
     transaction_id = _transaction_context.start_transaction(transaction_type, **kwargs)
 
     logger.info(f"TXN_START [{transaction_id}] {transaction_type}")
-    for key, value in kwargs.items():
-        logger.debug(f"TXN_PARAM [{transaction_id}] {key}: {value}")
+    if logger.isEnabledFor(logging.DEBUG):
+        for key, value in kwargs.items():
+            logger.debug(f"TXN_PARAM [{transaction_id}] {key}: {value}")
 
     start_time = datetime.now()
     try:
@@ -0,0 +1,70 @@
+"""
+Cost of logging and transaction tracing on one full market data bin.
+
+    python -m source.exchange_logging.logging_benchmark --books 1 --symbols 500 --minutes 5
+
+Runs whole bins through MarketDataProcessor.process_market_data_bin (see source.orchestration.bin_benchmark)
+with the root logger writing to a file at DEBUG, at INFO and with logging off, each with transaction
+tracing off (the default) and on. The file handler uses the exchange log format, so the timings include
+formatting and writing every record that passes the level check.
+"""
+import argparse
+import logging
+import os
+import tempfile
+
+from source.orchestration.bin_benchmark import build_group, make_bins, run_bins
+from source.exchange_logging.sink import configure_structured_logging
+
+LEVELS = [('DEBUG', logging.DEBUG), ('INFO', logging.INFO), ('OFF', None)]
+
+
+def _configure(log_file: str, level, tracing: bool) -> logging.Handler:
+    """Point the root logger at log_file at the given level (None disables logging)"""
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+
+    handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
+    handler.setFormatter(logging.Formatter('%(asctime)s | %(name)-20s | %(levelname)-8s | %(message)s'))
+    root.addHandler(handler)
+
+    logging.disable(logging.NOTSET if level is not None else logging.CRITICAL)
+    root.setLevel(level or logging.CRITICAL)
+    configure_structured_logging(transaction_tracing=tracing)
+    return handler
+
+
+def benchmark(n_books: int, n_symbols: int, n_minutes: int, seed: int = 0):
+    bins = make_bins(n_symbols, n_minutes, seed)
+    log_file = os.path.join(tempfile.mkdtemp(prefix='logging_benchmark_'), 'exchange.log')
+
+    print(f"\nbooks={n_books} symbols={n_symbols:,} minutes={n_minutes}")
+    print(f"{'level':>6} {'tracing':>8} {'ms/bin':>9} {'log_MB/bin':>11}")
+    try:
+        for name, level in LEVELS:
+            for tracing in (False, True):
+                # Books are built with logging off, so only the bins are logged and timed
+                _configure(log_file, None, False)
+                group = build_group(n_books, n_symbols, seed)
+                handler = _configure(log_file, level, tracing)
+                per_bin = sum(run_bins(group, bins)) / n_minutes
+                handler.close()
+                size = os.path.getsize(log_file) / 1e6 / n_minutes
+                print(f"{name:>6} {'on' if tracing else 'off':>8} {per_bin * 1000:>9.1f} {size:>11.2f}")
+    finally:
+        logging.disable(logging.NOTSET)
+        configure_structured_logging()
+        os.remove(log_file)
+        os.rmdir(os.path.dirname(log_file))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cost of logging and transaction tracing on one market data bin")
+    parser.add_argument('--books', type=int, default=1)
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--minutes', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    benchmark(args.books, args.symbols, args.minutes, args.seed)
@@ -0,0 +1,156 @@
+# source/exchange_logging/sink.py
+"""
+Structured log sink and per-category sampling.
+
+ExchangeLogger's structured helpers (log_calculation, log_state_change,
+log_business_event, log_performance, log_data_flow, trace_method) hand their
+records to the configured sink as plain dicts. The sink only enqueues them;
+a background thread serializes and writes them as JSON lines in batches, so
+the hot path never formats or does file I/O.
+"""
+
+import json
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Categories used by ExchangeLogger structured helpers
+CATEGORIES = ("calculation", "state_change", "business_event", "performance", "data_flow", "trace")
+
+
+class CategorySampler:
+    """Per-category sampling rates in [0, 1] (1 keeps everything, 0 drops everything)"""
+
+    def __init__(self, rates: Optional[Dict[str, float]] = None, default_rate: float = 1.0):
+        self.default_rate = default_rate
+        self.rates = dict(rates or {})
+
+    @classmethod
+    def from_string(cls, spec: str) -> 'CategorySampler':
+        """Parse 'calculation=0.01,performance=0.1,*=1.0'"""
+        rates = {}
+        default_rate = 1.0
+        for item in filter(None, (part.strip() for part in spec.split(','))):
+            category, _, rate = item.partition('=')
+            rate = min(1.0, max(0.0, float(rate)))
+            if category.strip() == '*':
+                default_rate = rate
+            else:
+                rates[category.strip()] = rate
+        return cls(rates, default_rate)
+
+    def should_sample(self, category: str) -> bool:
+        rate = self.rates.get(category, self.default_rate)
+        if rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        return random.random() < rate
+
+
+class StructuredLogSink:
+    """Buffered, off-thread JSON-lines writer for structured log records"""
+
+    def __init__(self, path: str, batch_size: int = 500, flush_interval: float = 1.0,
+                 max_queue_size: int = 100_000):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue_size)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.dropped_records = 0
+        self.written_records = 0
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="StructuredLogSink", daemon=True)
+        self._thread.start()
+
+    def emit(self, record: dict) -> None:
+        """Enqueue a record without blocking; records are dropped when the queue is full"""
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            self.dropped_records += 1
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        with open(self.path, 'a', encoding='utf-8') as f:
+            batch = []
+            last_flush = time.monotonic()
+
+            while not (self._stop_event.is_set() and self._queue.empty()):
+                try:
+                    batch.append(self._queue.get(timeout=self.flush_interval))
+                except queue.Empty:
+                    pass
+
+                if batch and (len(batch) >= self.batch_size or
+                              time.monotonic() - last_flush >= self.flush_interval or
+                              self._stop_event.is_set()):
+                    self._write_batch(f, batch)
+                    batch = []
+                    last_flush = time.monotonic()
+
+            if batch:
+                self._write_batch(f, batch)
+
+    def _write_batch(self, f, batch) -> None:
+        try:
+            f.write(''.join(json.dumps(record, default=str) + '\n' for record in batch))
+            f.flush()
+            self.written_records += len(batch)
+        except Exception as e:
+            logger.error(f"Structured log sink failed to write {len(batch)} records: {e}")
+
+
+# Process-wide configuration read by ExchangeLogger and transaction_scope
+_sink: Optional[StructuredLogSink] = None
+_sampler = CategorySampler()
+_transaction_tracing = os.getenv('EXCHANGE_TRANSACTION_TRACING', 'false').lower() == 'true'
+
+
+def configure_structured_logging(sink: Optional[StructuredLogSink] = None,
+                                 sampler: Optional[CategorySampler] = None,
+                                 transaction_tracing: Optional[bool] = None) -> None:
+    """Install (or remove, with sink=None) the structured sink, sampler and tracing switch"""
+    global _sink, _sampler, _transaction_tracing
+
+    if _sink is not None and _sink is not sink:
+        _sink.stop()
+
+    _sink = sink
+    if _sink is not None:
+        _sink.start()
+
+    if sampler is not None:
+        _sampler = sampler
+    if transaction_tracing is not None:
+        _transaction_tracing = transaction_tracing
+
+
+def get_structured_sink() -> Optional[StructuredLogSink]:
+    return _sink
+
+
+def get_sampler() -> CategorySampler:
+    return _sampler
+
+
+def is_transaction_tracing_enabled() -> bool:
+    return _transaction_tracing
@@ -2,23 +2,66 @@
 import logging
 import functools
 import time
-from typing import Any, Callable, Optional
+from typing import Any, Callable, Optional, Union
 import traceback
 
+from .sink import get_sampler, get_structured_sink
+from .context import get_current_transaction_id
+
+
+def _resolve(value: Any) -> Any:
+    """Evaluate lazily supplied log arguments (zero-argument callables)"""
+    return value() if callable(value) else value
+
 
 class ExchangeLogger:
-    """Enhanced logger with exchange-specific utilities"""
+    """Enhanced logger with exchange-specific utilities.
+
+    Structured helpers check the level and the per-category sampling rate
+    before touching their arguments, and accept zero-argument callables for
+    any dict/result argument so callers can defer building them. When a
+    structured sink is configured, records are handed to it instead of being
+    formatted into text lines.
+    """
 
     def __init__(self, name: str):
         self.logger = logging.getLogger(name)
         self.name = name
 
+    def isEnabledFor(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def _capture(self, level: int, category: str) -> bool:
+        """Whether a record of this level and category should be built at all"""
+        return self.logger.isEnabledFor(level) and get_sampler().should_sample(category)
+
+    def _emit(self, level: int, category: str, event: str, fields: dict) -> bool:
+        """Hand a structured record to the sink; False when no sink is configured"""
+        sink = get_structured_sink()
+        if sink is None:
+            return False
+
+        record = {
+            "ts": time.time(),
+            "level": logging.getLevelName(level),
+            "logger": self.name,
+            "category": category,
+            "event": event,
+            "transaction_id": get_current_transaction_id()
+        }
+        record.update(fields)
+        sink.emit(record)
+        return True
+
     def trace_method(self, include_args: bool = True, include_result: bool = True):
         """Decorator to trace method calls with arguments and results"""
 
         def decorator(func: Callable) -> Callable:
             @functools.wraps(func)
             def wrapper(*args, **kwargs):
+                if not self._capture(logging.DEBUG, "trace"):
+                    return func(*args, **kwargs)
+
                 start_time = time.time()
 
                 # Log method entry
@@ -51,8 +94,17 @@ class ExchangeLogger:
 
         return decorator
 
-    def log_calculation(self, description: str, inputs: dict, result: Any, details: Optional[dict] = None):
+    def log_calculation(self, description: str, inputs: Union[dict, Callable[[], dict]], result: Any,
+                        details: Union[dict, Callable[[], dict], None] = None):
         """Log detailed calculation information"""
+        if not self._capture(logging.INFO, "calculation"):
+            return
+
+        inputs, result, details = _resolve(inputs), _resolve(result), _resolve(details)
+        if self._emit(logging.INFO, "calculation", description,
+                      {"inputs": inputs, "result": result, "details": details}):
+            return
+
         self.logger.info(f"CALC: {description}")
 
         # Log inputs
@@ -67,8 +119,17 @@ class ExchangeLogger:
         # Log result
         self.logger.info(f"  RESULT: {self._format_value(result)}")
 
-    def log_state_change(self, object_name: str, old_state: dict, new_state: dict, change_reason: str = ""):
+    def log_state_change(self, object_name: str, old_state: Union[dict, Callable[[], dict]],
+                         new_state: Union[dict, Callable[[], dict]], change_reason: str = ""):
         """Log state changes with before/after comparison"""
+        if not self._capture(logging.INFO, "state_change"):
+            return
+
+        old_state, new_state = _resolve(old_state), _resolve(new_state)
+        if self._emit(logging.INFO, "state_change", object_name,
+                      {"old_state": old_state, "new_state": new_state, "reason": change_reason}):
+            return
+
         self.logger.info(f"STATE_CHANGE: {object_name} {change_reason}")
 
         # Find differences
@@ -83,16 +144,39 @@ class ExchangeLogger:
 
     def log_data_flow(self, source: str, destination: str, data_type: str, data_summary: str):
         """Log data flow between components"""
+        if not self._capture(logging.DEBUG, "data_flow"):
+            return
+
+        if self._emit(logging.DEBUG, "data_flow", data_type,
+                      {"source": source, "destination": destination, "summary": data_summary}):
+            return
+
         self.logger.debug(f"DATA_FLOW: {source} -> {destination} | {data_type} | {data_summary}")
 
-    def log_business_event(self, event_type: str, details: dict):
+    def log_business_event(self, event_type: str, details: Union[dict, Callable[[], dict]]):
         """Log important business events"""
+        if not self._capture(logging.INFO, "business_event"):
+            return
+
+        details = _resolve(details)
+        if self._emit(logging.INFO, "business_event", event_type, {"details": details}):
+            return
+
         self.logger.info(f"BIZ_EVENT: {event_type}")
         for key, value in details.items():
             self.logger.info(f"  {key}: {self._format_value(value)}")
 
-    def log_performance(self, operation: str, duration_ms: float, additional_metrics: Optional[dict] = None):
+    def log_performance(self, operation: str, duration_ms: float,
+                        additional_metrics: Union[dict, Callable[[], dict], None] = None):
         """Log performance metrics"""
+        if not self._capture(logging.INFO, "performance"):
+            return
+
+        additional_metrics = _resolve(additional_metrics)
+        if self._emit(logging.INFO, "performance", operation,
+                      {"duration_ms": duration_ms, "metrics": additional_metrics}):
+            return
+
         self.logger.info(f"PERF: {operation} took {duration_ms:.2f}ms")
         if additional_metrics:
             for metric, value in additional_metrics.items():
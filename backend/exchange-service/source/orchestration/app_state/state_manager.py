@@ -3,6 +3,8 @@
 Main State Manager - Coordination only
 """
 import logging
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
 from threading import RLock
 from typing import Optional, Dict, Any
 from datetime import datetime
@@ -462,5 +464,44 @@ class AppState:
             self.logger.info("✅ System reset complete")
 
 
-# Global app state instance
-app_state = AppState()
\ No newline at end of file
+# Default app state instance, used outside of any book scope
+default_app_state = AppState()
+
+# AppState of the book being processed by the current thread / asyncio task
+_current_app_state: ContextVar[AppState] = ContextVar('current_app_state')
+
+
+def get_app_state() -> AppState:
+    """Get the AppState bound to the current context (the default instance outside a book scope)"""
+    return _current_app_state.get(default_app_state)
+
+
+def enter_book_scope(book_app_state: AppState) -> Token:
+    """Bind a book's AppState to the current context; pass the token to exit_book_scope"""
+    return _current_app_state.set(book_app_state)
+
+
+def exit_book_scope(token: Token) -> None:
+    """Restore the AppState that was bound before enter_book_scope"""
+    _current_app_state.reset(token)
+
+
+@contextmanager
+def book_scope(book_app_state: AppState):
+    """Run a block with `app_state` resolving to the given book's AppState.
+
+    The binding is a context variable, so concurrent threads or asyncio tasks
+    can each process a different book without swapping a module global.
+    """
+    token = enter_book_scope(book_app_state)
+    try:
+        yield book_app_state
+    finally:
+        exit_book_scope(token)
+
+
+def __getattr__(name: str):
+    # `from ...state_manager import app_state` resolves to the context's AppState
+    if name == 'app_state':
+        return get_app_state()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -0,0 +1,192 @@
+"""
+Harness and benchmark for whole market data bins through MarketDataProcessor.
+
+    python -m source.orchestration.bin_benchmark --check-books 10 --books 1 10 50 200 --workers 1 4
+
+Builds an ExchangeGroupManager the way initialize() does (one AppState and Exchange per book via
+initialize_book_context) without metadata files or a database, seeds every book with positions, cash
+and a share of symbols carrying live VWAP orders, and feeds synthetic minute bars through
+process_market_data_bin with replay detection bypassed. Manager tracking is off, so nothing is written
+to files or queued for the database; everything else (market updates, fills, impact, portfolio,
+accounts, returns, order progress, bin advance) runs as in the service.
+
+The parallel check runs the same bins with one worker and with the most --workers and asserts every
+book ends on the same bin, positions, order progress, NAV and impacts, and that the equity callbacks
+fired once per bin with the same snapshots. The benchmark times a bin at each book count and worker
+count.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+os.environ.setdefault('ENVIRONMENT', 'benchmark')
+
+# The book managers report their missing book context on stdout while app_state is built
+with contextlib.redirect_stdout(io.StringIO()):
+    from source.config import app_config
+    from source.orchestration.app_state import state_manager as app_state_module
+    from source.orchestration.coordination.book_context import initialize_book_context
+    from source.orchestration.coordination.exchange_manager import ExchangeGroupManager
+    from source.orchestration.processors.market_data_processor import MarketDataProcessor
+from source.simulation.core.models.models import EquityBar
+from source.simulation.managers.account import AccountBalance
+
+SESSION_START = datetime(2025, 3, 3, 14, 30, tzinfo=timezone.utc)
+BOOK_CONFIG = {'timezone': 'America/New_York', 'base_currency': 'USD', 'initial_nav': 100_000_000,
+               'operation_id': 0, 'engine_id': 1}
+
+
+def quiet():
+    """The processors, markets and execution print per bin and per symbol; keep stdout for the results"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def make_bins(n_symbols: int, n_minutes: int, seed: int = 0):
+    """EquityBar lists, one per minute, for symbols S00000..."""
+    rng = random.Random(seed)
+    prices = [rng.uniform(5, 500) for _ in range(n_symbols)]
+    bins = []
+    for minute in range(n_minutes):
+        timestamp = (SESSION_START + timedelta(minutes=minute + 1)).isoformat()
+        bars = []
+        for i in range(n_symbols):
+            prices[i] *= 1 + rng.gauss(0, 0.001)
+            price = round(prices[i], 2)
+            bars.append(EquityBar(f"S{i:05d}", timestamp, "USD", price, price, price, price,
+                                  rng.randrange(1_000, 200_000), 100, price, 0.0, 0.0))
+        bins.append(bars)
+    return bins
+
+
+def build_group(n_books: int, n_symbols: int, seed: int = 0, position_share: float = 0.2,
+                order_share: float = 0.02, book_ids=None) -> ExchangeGroupManager:
+    """An exchange group of seeded books, as ExchangeGroupManager.initialize would leave it
+    (books BOOK0000... unless book_ids are given)"""
+    group = ExchangeGroupManager('benchmark')
+    group.last_snap_time = SESSION_START
+    group.market_hours_utc = {'open_utc': SESSION_START, 'close_utc': SESSION_START + timedelta(hours=6, minutes=30)}
+
+    for b in range(n_books):
+        book_id = book_ids[b] if book_ids else f"BOOK{b:04d}"
+        with quiet():
+            book_context = initialize_book_context(book_id, BOOK_CONFIG, SESSION_START, group.market_hours_utc)
+            group.book_contexts[book_id] = book_context
+            with app_state_module.book_scope(book_context.app_state):
+                _seed_book(book_context.app_state, n_symbols, random.Random(seed + b), position_share, order_share)
+    return group
+
+
+def _seed_book(app_state, n_symbols: int, rng: random.Random, position_share: float, order_share: float):
+    app_state.components.set_book_context(app_state.get_book_id())
+    for name, manager in vars(app_state.components).items():
+        if hasattr(manager, 'tracking'):
+            manager.tracking = False
+
+    positions = {}
+    for i in range(n_symbols):
+        if rng.random() < position_share:
+            symbol, quantity, price = f"S{i:05d}", rng.randrange(-5_000, 5_000), rng.uniform(5, 500)
+            positions[symbol] = {'symbol': symbol, 'quantity': quantity, 'currency': 'USD', 'avg_price': price,
+                                 'mtm_value': quantity * price}
+    app_state.portfolio_manager.initialize_portfolio(positions, SESSION_START)
+    app_state.account_manager.initialize_account(
+        {'CREDIT': {'USD': AccountBalance(currency='USD', amount=Decimal('50000000'))}}, SESSION_START)
+
+    app_state.initialize_bin(SESSION_START + timedelta(minutes=1))
+    for i in range(n_symbols):
+        if rng.random() < order_share:
+            qty = rng.randrange(500, 50_000)
+            app_state.order_manager.add_order({
+                'order_id': f"O{i:05d}", 'cl_order_id': f"C{i:05d}", 'symbol': f"S{i:05d}",
+                'side': rng.choice(['BUY', 'SELL']), 'original_qty': qty, 'remaining_qty': qty,
+                'currency': 'USD', 'order_type': 'VWAP_A_ALGO', 'participation_rate': rng.choice([0.05, 0.1, 0.2]),
+                'submit_timestamp': SESSION_START + timedelta(seconds=rng.randrange(0, 600))
+            })
+
+
+def run_bins(group: ExchangeGroupManager, bins, workers: int = 1) -> list:
+    """Process every bin through process_market_data_bin with BOOK_PROCESSING_WORKERS=workers,
+    returning seconds per bin"""
+    app_config.book_processing_workers = workers
+    processor = MarketDataProcessor(group)
+    elapsed = []
+    try:
+        for bars in bins:
+            with quiet():
+                started = time.perf_counter()
+                processor.process_market_data_bin(bars, [], bypass_replay_detection=True)
+                elapsed.append(time.perf_counter() - started)
+    finally:
+        processor.book_processor.shutdown()
+    return elapsed
+
+
+def book_state(group: ExchangeGroupManager) -> dict:
+    """Bin, positions, order progress, cash and impact per book after a run"""
+    state = {}
+    for book_id, book_context in group.book_contexts.items():
+        app_state = book_context.app_state
+        state[book_id] = {
+            "bin": (app_state.get_current_bin(), app_state.get_current_timestamp()),
+            "positions": {symbol: (position.quantity, position.avg_price, position.mtm_value)
+                          for symbol, position in app_state.portfolio_manager.positions.items()},
+            "orders": {order_id: order.remaining_qty for order_id, order in app_state.order_manager.get_all_orders().items()},
+            "nav": app_state.account_manager.compute_nav(),
+            "impact": {symbol: impact.impacted_price for symbol, impact in app_state.impact_manager.get_all_impacts().items()},
+        }
+    return state
+
+
+def check_parallel(n_books: int, n_symbols: int, n_minutes: int, workers: int, seed: int = 0):
+    bins = make_bins(n_symbols, n_minutes, seed)
+
+    results = []
+    for n_workers in (1, workers):
+        group = build_group(n_books, n_symbols, seed)
+        callbacks = []
+        equity_manager = group.book_contexts[group.get_all_books()[0]].app_state.equity_manager
+        equity_manager.register_update_callback(lambda snapshot: callbacks.append(snapshot))
+        run_bins(group, bins, n_workers)
+        results.append((book_state(group), callbacks))
+
+    (serial, serial_callbacks), (parallel, parallel_callbacks) = results
+    for book_id in serial:
+        assert parallel[book_id] == serial[book_id], book_id
+    assert len(serial_callbacks) == n_minutes and parallel_callbacks == serial_callbacks
+    positions = sum(len(book["positions"]) for book in serial.values())
+    print(f"parallel ok: books={n_books} symbols={n_symbols:,} minutes={n_minutes} workers={workers} "
+          f"positions={positions:,} callbacks={len(serial_callbacks)}")
+
+
+def benchmark(books, n_symbols: int, n_minutes: int, workers, seed: int = 0):
+    bins = make_bins(n_symbols, n_minutes, seed)
+    columns = ''.join(f"{f'{n}-worker_ms':>13}" for n in workers)
+    print(f"\n{'books':>6} {'symbols':>8}{columns} {'ms/book':>8}")
+    for n_books in books:
+        per_bin = [sum(run_bins(build_group(n_books, n_symbols, seed), bins, n)) / n_minutes for n in workers]
+        timings = ''.join(f"{value * 1000:>13.1f}" for value in per_bin)
+        print(f"{n_books:>6} {n_symbols:>8,}{timings} {min(per_bin) * 1000 / n_books:>8.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time whole market data bins through MarketDataProcessor")
+    parser.add_argument('--check-books', type=int, default=10, help="books for the parallel check (0 to skip)")
+    parser.add_argument('--books', type=int, nargs='+', default=[1, 10, 50, 200])
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--minutes', type=int, default=3)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 4], help="BOOK_PROCESSING_WORKERS to time")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Every step logs per bin and per symbol, and the books log their missing context while they are
+    # built; keep the output about the results (a failed book still raises out of the bin)
+    logging.disable(logging.ERROR)
+    if args.check_books:
+        check_parallel(args.check_books, args.symbols, args.minutes, max(args.workers), args.seed)
+    benchmark(args.books, args.symbols, args.minutes, args.workers, args.seed)
@@ -1,32 +1,49 @@
 # source/orchestration/persistence/loaders/book_data_loader.py
+import asyncio
 import os
-import json
 import logging
 from datetime import datetime
-from typing import Dict
+from typing import Dict, List, Optional
 from decimal import Decimal
 import traceback
 
+import numpy as np
+
 from source.config import app_config
 from source.simulation.managers.account import AccountBalance
 from source.simulation.managers.portfolio import Position
 from source.simulation.managers.impact import ImpactState
 from source.utils.timezone_utils import parse_iso_timestamp
 from source.orchestration.persistence.loaders.data_path_resolver import DataPathResolver
+from source.orchestration.persistence.loaders.minute_store import SHAPE_MAPPING, ColumnBatch
 from source.simulation.managers.account import AccountManager
 
+# Position fields every stored record has, and the P&L fields that default to 0
+POSITION_FIELDS = ('symbol', 'quantity', 'target_quantity', 'avg_price', 'mtm_value', 'currency')
+POSITION_PNL_FIELDS = ('sod_realized_pnl', 'itd_realized_pnl', 'realized_pnl', 'unrealized_pnl')
+
+
+def _floats(values: np.ndarray) -> List[float]:
+    """float() of every value, a column at a time for numeric columns"""
+    if values.dtype.kind in 'iuf':
+        return values.astype(np.float64).tolist()
+    return [float(value) for value in values.tolist()]
+
 
 class BookDataLoader:
     """Handles loading of book-specific data"""
 
-    def __init__(self):
+    def __init__(self, data_dir: Optional[str] = None):
         self.logger = logging.getLogger(self.__class__.__name__)
 
-        current_file = os.path.abspath(__file__)
-        # Navigate up from source/orchestration/persistence/loaders/book_data_loader.py to project root
-        self.data_dir = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_file))))),
-            f"data")
+        if data_dir is None:
+            current_file = os.path.abspath(__file__)
+            # Navigate up from source/orchestration/persistence/loaders/book_data_loader.py to project root
+            self.data_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_file))))),
+                f"data")
+        else:
+            self.data_dir = data_dir
 
         self.path_resolver = DataPathResolver(self.data_dir)
 
@@ -42,40 +59,58 @@ class BookDataLoader:
 
     async def load_book_data(self, book_id: str, intraday_timestamp_str: str, fallback_date: datetime) -> Dict:
         """Load all book-specific data - environment aware"""
+        books_data = await self.load_books_data([book_id], intraday_timestamp_str, fallback_date)
+        return books_data[book_id]
+
+    async def load_books_data(self, book_ids: List[str], intraday_timestamp_str: str,
+                              fallback_date: datetime) -> Dict[str, Dict]:
+        """Load book-specific data for several books - environment aware"""
         if app_config.is_production:
-            self.logger.info(f"👤 Loading data for book {book_id} from PostgreSQL")
-            return await self._load_book_data_from_postgres(book_id, intraday_timestamp_str)
+            self.logger.info(f"👤 Loading data for {len(book_ids)} books from PostgreSQL")
+            return await self._load_books_data_from_postgres(book_ids, intraday_timestamp_str)
         else:
-            self.logger.info(f"👤 Loading data for book {book_id} from files")
-            return await self._load_book_data_from_files(book_id, intraday_timestamp_str, fallback_date)
+            self.logger.info(f"👤 Loading data for {len(book_ids)} books from files")
+            return await asyncio.to_thread(self._load_books_data_from_files, book_ids,
+                                           intraday_timestamp_str, fallback_date)
 
-    async def _load_book_data_from_postgres(self, book_id: str, intraday_timestamp_str: str) -> Dict:
-        """Load all book-specific data from PostgreSQL (production)"""
+    async def _load_books_data_from_postgres(self, book_ids: List[str], intraday_timestamp_str: str) -> Dict[str, Dict]:
+        """Load all book-specific data from PostgreSQL (production), one query per table for all books"""
         try:
-            # Load all data types from PostgreSQL using correct method names
-            portfolio_data = await self._load_portfolio_data_from_postgres(book_id, intraday_timestamp_str)
-            account_data = await self._load_account_data_from_postgres(book_id, intraday_timestamp_str)
-            impact_data = await self._load_impact_data_from_postgres(book_id, intraday_timestamp_str)
-            order_data = await self._load_order_data_from_postgres(book_id, intraday_timestamp_str)
-            returns_data = await self._load_returns_data_from_postgres(book_id, intraday_timestamp_str)
-
-            book_data = {
-                'portfolio': portfolio_data,
-                'accounts': account_data,
-                'impact': impact_data,
-                'orders': order_data,
-                'returns': returns_data
-            }
-
-            self.logger.info(f"✅ book data loaded from PostgreSQL for {book_id}")
-            return book_data
+            portfolio_data, account_data, impact_data, order_data, returns_data = await asyncio.gather(
+                self._load_portfolio_data_from_postgres(book_ids, intraday_timestamp_str),
+                self._load_account_data_from_postgres(book_ids, intraday_timestamp_str),
+                self._load_impact_data_from_postgres(book_ids, intraday_timestamp_str),
+                self._load_order_data_from_postgres(book_ids, intraday_timestamp_str),
+                self._load_returns_data_from_postgres(book_ids, intraday_timestamp_str)
+            )
+
+            books_data = {}
+            for book_id in book_ids:
+                books_data[book_id] = {
+                    'portfolio': portfolio_data.get(book_id, {}),
+                    'accounts': account_data.get(book_id) or self._create_default_account_data(),
+                    'impact': impact_data.get(book_id, {}),
+                    'orders': order_data.get(book_id, {}),
+                    'returns': returns_data.get(book_id, {})
+                }
+
+            self.logger.info(f"✅ book data loaded from PostgreSQL for {len(book_ids)} books")
+            return books_data
 
         except Exception as e:
-            self.logger.error(f"❌ Error loading book data from PostgreSQL for {book_id}: {e}")
-            return self._get_empty_book_data()
+            self.logger.error(f"❌ Error loading book data from PostgreSQL for {len(book_ids)} books: {e}")
+            return {book_id: self._get_empty_book_data() for book_id in book_ids}
 
-    async def _load_book_data_from_files(self, book_id: str, intraday_timestamp_str: str,
-                                         fallback_date: datetime) -> Dict:
+    def _load_books_data_from_files(self, book_ids: List[str], intraday_timestamp_str: str,
+                                    fallback_date: datetime) -> Dict[str, Dict]:
+        """Load book-specific data for several books from files (development)"""
+        return {
+            book_id: self._load_book_data_from_files(book_id, intraday_timestamp_str, fallback_date)
+            for book_id in book_ids
+        }
+
+    def _load_book_data_from_files(self, book_id: str, intraday_timestamp_str: str,
+                                   fallback_date: datetime) -> Dict:
         """Load all book-specific data from files (development)"""
         try:
             portfolio_data = self._load_portfolio_data_from_files(book_id, intraday_timestamp_str)
@@ -109,49 +144,50 @@ class BookDataLoader:
             'returns': {}
         }
 
-    # PostgreSQL loading methods (production) - FIXED WITH CORRECT METHOD NAMES
-    async def _load_portfolio_data_from_postgres(self, book_id: str, intraday_timestamp_str: str) -> Dict[
-        str, Position]:
+    # PostgreSQL loading methods (production) - each returns {book_id: data} for all requested books
+    async def _load_portfolio_data_from_postgres(self, book_ids: List[str], intraday_timestamp_str: str) -> Dict[
+        str, Dict[str, Position]]:
         """Load portfolio data from PostgreSQL (production)"""
         from source.db.db_manager import db_manager
 
         try:
             await db_manager.initialize()
-            portfolio_data = await db_manager.load_book_portfolio_data(book_id, intraday_timestamp_str)
+            portfolio_data = await db_manager.load_books_portfolio_data(book_ids, intraday_timestamp_str)
 
-            self.logger.info(f"✅ Portfolio data loaded from PostgreSQL for {book_id}: {len(portfolio_data)} positions")
+            self.logger.info(f"✅ Portfolio data loaded from PostgreSQL for {len(portfolio_data)} books")
             return portfolio_data
 
         except Exception as e:
-            self.logger.error(f"❌ Error loading portfolio data from PostgreSQL for {book_id}: {e}")
-            import traceback
+            self.logger.error(f"❌ Error loading portfolio data from PostgreSQL: {e}")
             self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
             return {}
 
-    async def _load_account_data_from_postgres(self, book_id: str, intraday_timestamp_str: str) -> Dict:
+    async def _load_account_data_from_postgres(self, book_ids: List[str], intraday_timestamp_str: str) -> Dict[
+        str, Dict]:
         """Load account data from PostgreSQL (production)"""
         from source.db.db_manager import db_manager
 
         try:
             await db_manager.initialize()
-            account_data = await db_manager.load_book_account_data(book_id, intraday_timestamp_str)
+            books_account_data = await db_manager.load_books_account_data(book_ids, intraday_timestamp_str)
 
             # CRITICAL FIX: Check if account data is empty and create default accounts if needed
-            if not account_data or all(not balances for balances in account_data.values()):
-                self.logger.warning(f"⚠️ No account data found for {book_id} at {intraday_timestamp_str}")
-                # Create default account structure with USD balance
-                default_accounts = self._create_default_account_data()
-                self.logger.info(f"✅ Created default account data for {book_id}")
-                return default_accounts
+            for book_id in book_ids:
+                account_data = books_account_data.get(book_id)
+                if not account_data or all(not balances for balances in account_data.values()):
+                    self.logger.warning(f"⚠️ No account data found for {book_id} at {intraday_timestamp_str}")
+                    # Create default account structure with USD balance
+                    books_account_data[book_id] = self._create_default_account_data()
+                    self.logger.info(f"✅ Created default account data for {book_id}")
 
-            self.logger.info(f"✅ Account data loaded from PostgreSQL for {book_id}")
-            return account_data
+            self.logger.info(f"✅ Account data loaded from PostgreSQL for {len(book_ids)} books")
+            return books_account_data
 
         except Exception as e:
-            self.logger.error(f"❌ Error loading account data from PostgreSQL for {book_id}: {e}")
+            self.logger.error(f"❌ Error loading account data from PostgreSQL: {e}")
             self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
             # Return default account data on error
-            return self._create_default_account_data()
+            return {book_id: self._create_default_account_data() for book_id in book_ids}
 
     def _create_default_account_data(self) -> Dict:
         """Create default account data structure with initial USD balance"""
@@ -173,76 +209,88 @@ class BookDataLoader:
         self.logger.info("✅ Created default account structure with 1M USD balance")
         return accounts
 
-    async def _load_impact_data_from_postgres(self, book_id: str, intraday_timestamp_str: str) -> Dict[
-        str, ImpactState]:
+    async def _load_impact_data_from_postgres(self, book_ids: List[str], intraday_timestamp_str: str) -> Dict[
+        str, Dict[str, ImpactState]]:
         """Load impact data from PostgreSQL (production)"""
         from source.db.db_manager import db_manager
 
         try:
             await db_manager.initialize()
-            impact_data = await db_manager.load_book_impact_data(book_id, intraday_timestamp_str)
+            impact_data = await db_manager.load_books_impact_data(book_ids, intraday_timestamp_str)
 
-            self.logger.info(f"✅ Impact data loaded from PostgreSQL for {book_id}: {len(impact_data)} symbols")
+            self.logger.info(f"✅ Impact data loaded from PostgreSQL for {len(impact_data)} books")
             return impact_data
 
         except Exception as e:
-            self.logger.error(f"❌ Error loading impact data from PostgreSQL for {book_id}: {e}")
+            self.logger.error(f"❌ Error loading impact data from PostgreSQL: {e}")
             return {}
 
-    async def _load_order_data_from_postgres(self, book_id: str, intraday_timestamp_str: str) -> Dict:
+    async def _load_order_data_from_postgres(self, book_ids: List[str], intraday_timestamp_str: str) -> Dict[
+        str, Dict]:
         """Load order data from PostgreSQL (production)"""
         from source.db.db_manager import db_manager
 
         try:
             await db_manager.initialize()
-            order_data_list = await db_manager.load_book_order_data(book_id, intraday_timestamp_str)
-
-            # Convert list to dict with order_id as key (if needed)
-            if isinstance(order_data_list, list):
-                order_data_dict = {}
-                for order_record in order_data_list:
-                    order_id = order_record.get('order_id', '')
-                    if order_id:
-                        order_data_dict[order_id] = order_record
-                order_data = order_data_dict
-            else:
-                order_data = order_data_list
-
-            self.logger.info(f"✅ Order data loaded from PostgreSQL for {book_id}: {len(order_data)} orders")
+            books_order_data = await db_manager.load_books_order_data(book_ids, intraday_timestamp_str)
+
+            order_data = {}
+            for book_id, order_data_list in books_order_data.items():
+                # Convert list to dict with order_id as key
+                order_data[book_id] = {
+                    order_record['order_id']: order_record
+                    for order_record in order_data_list
+                    if order_record.get('order_id', '')
+                }
+
+            self.logger.info(f"✅ Order data loaded from PostgreSQL for {len(order_data)} books")
             return order_data
 
         except Exception as e:
-            self.logger.error(f"❌ Error loading order data from PostgreSQL for {book_id}: {e}")
+            self.logger.error(f"❌ Error loading order data from PostgreSQL: {e}")
             return {}
 
-    async def _load_returns_data_from_postgres(self, book_id: str, intraday_timestamp_str: str) -> Dict:
+    async def _load_returns_data_from_postgres(self, book_ids: List[str], intraday_timestamp_str: str) -> Dict[
+        str, List]:
         """Load returns data from PostgreSQL (production)"""
         from source.db.db_manager import db_manager
 
         try:
             await db_manager.initialize()
-            returns_data = await db_manager.load_book_return_data(book_id, intraday_timestamp_str)
+            returns_data = await db_manager.load_books_return_data(book_ids, intraday_timestamp_str)
 
-            self.logger.info(f"✅ Returns data loaded from PostgreSQL for {book_id}: {len(returns_data)} entries")
+            self.logger.info(f"✅ Returns data loaded from PostgreSQL for {len(returns_data)} books")
             return returns_data
 
         except Exception as e:
-            self.logger.error(f"❌ Error loading returns data from PostgreSQL for {book_id}: {e}")
+            self.logger.error(f"❌ Error loading returns data from PostgreSQL: {e}")
             return {}
 
     # File loading methods (development) - Keep existing implementations
     def _load_portfolio_data_from_files(self, book_id: str, intraday_timestamp_str: str) -> Dict[str, Position]:
         """Load portfolio data from JSON files (development)"""
         file_path = self.path_resolver.get_portfolio_file_path(book_id, intraday_timestamp_str)
-
-        if not self.path_resolver.validate_file_exists(file_path, is_critical=False):
+        stored = self.path_resolver.load_snapshot_columns('portfolio', intraday_timestamp_str, book_id)
+        if (stored is not None and stored.shapes == [SHAPE_MAPPING]
+                and stored.is_plain(POSITION_FIELDS + POSITION_PNL_FIELDS)):
+            try:
+                portfolio = self._positions_from_columns(stored)
+                self.logger.info(f"✅ Portfolio data loaded for {book_id}: {len(portfolio)} positions")
+                return portfolio
+            except Exception as e:
+                self.logger.error(f"❌ Error loading portfolio data for {book_id}: {e}")
+                return {}
+
+        if stored is not None:
+            portfolio_raw = next(stored.payloads())[2]
+        else:
+            portfolio_raw = self.path_resolver.load_snapshot_payload(file_path, 'portfolio', intraday_timestamp_str,
+                                                                     book_id)
+        if portfolio_raw is None:
             self.logger.warning(f"⚠️ Portfolio file not found for {book_id}: {file_path}")
             return {}
 
         try:
-            with open(file_path, 'r') as f:
-                portfolio_raw = json.load(f)
-
             portfolio = {}
             for symbol, pos_data in portfolio_raw.items():
                 position = Position(
@@ -266,18 +314,44 @@ class BookDataLoader:
             self.logger.error(f"❌ Error loading portfolio data for {book_id}: {e}")
             return {}
 
+    @staticmethod
+    def _positions_from_columns(stored: ColumnBatch) -> Dict[str, Position]:
+        """Positions of a stored portfolio (symbol -> position record), built a column at a time"""
+        for name in POSITION_FIELDS:
+            if stored.field(name) is None:
+                raise KeyError(name)
+
+        symbols, currencies = stored.text('symbol'), stored.text('currency')
+        values = {name: _floats(stored.field(name)) for name in POSITION_FIELDS[1:5]}
+        for name in POSITION_PNL_FIELDS:
+            column = stored.field(name)
+            values[name] = _floats(column) if column is not None else [0.0] * stored.row_count
+
+        portfolio = {}
+        for row, key in enumerate(stored.keys.tolist()):
+            portfolio[key] = Position(
+                symbol=symbols[row],
+                quantity=values['quantity'][row],
+                target_quantity=values['target_quantity'][row],
+                avg_price=values['avg_price'][row],
+                mtm_value=values['mtm_value'][row],
+                currency=currencies[row],
+                sod_realized_pnl=values['sod_realized_pnl'][row],
+                itd_realized_pnl=values['itd_realized_pnl'][row],
+                realized_pnl=values['realized_pnl'][row],
+                unrealized_pnl=values['unrealized_pnl'][row]
+            )
+        return portfolio
+
     def _load_account_data_from_files(self, book_id: str, intraday_timestamp_str: str) -> Dict:
         """Load account data from JSON files (development)"""
         file_path = self.path_resolver.get_account_file_path(book_id, intraday_timestamp_str)
-
-        if not self.path_resolver.validate_file_exists(file_path, is_critical=False):
+        account_data = self.path_resolver.load_snapshot_payload(file_path, 'accounts', intraday_timestamp_str, book_id)
+        if account_data is None:
             self.logger.warning(f"⚠️ Account file not found for {book_id}: {file_path}")
             return self._create_default_account_data()
 
         try:
-            with open(file_path, 'r') as f:
-                account_data = json.load(f)
-
             # Initialize account structure
             accounts = {balance_type: {} for balance_type in AccountManager.VALID_TYPES}
 
@@ -304,15 +378,12 @@ class BookDataLoader:
     def _load_impact_data_from_files(self, book_id: str, intraday_timestamp_str: str) -> Dict[str, ImpactState]:
         """Load impact data from JSON files (development)"""
         file_path = self.path_resolver.get_impact_file_path(book_id, intraday_timestamp_str)
-
-        if not self.path_resolver.validate_file_exists(file_path, is_critical=False):
+        impact_raw = self.path_resolver.load_snapshot_payload(file_path, 'impact', intraday_timestamp_str, book_id)
+        if impact_raw is None:
             self.logger.warning(f"⚠️ Impact file not found for {book_id}: {file_path}")
             return {}
 
         try:
-            with open(file_path, 'r') as f:
-                impact_raw = json.load(f)
-
             impact_data = {}
             for symbol, impact_info in impact_raw.items():
                 impact_state = ImpactState(
@@ -333,15 +404,12 @@ class BookDataLoader:
     def _load_order_data_from_files(self, book_id: str, intraday_timestamp_str: str) -> Dict:
         """Load order data from JSON files (development)"""
         file_path = self.path_resolver.get_order_file_path(book_id, intraday_timestamp_str)
-
-        if not self.path_resolver.validate_file_exists(file_path, is_critical=False):
+        order_data = self.path_resolver.load_snapshot_payload(file_path, 'orders', intraday_timestamp_str, book_id)
+        if order_data is None:
             self.logger.warning(f"⚠️ Order file not found for {book_id}: {file_path}")
             return {}
 
         try:
-            with open(file_path, 'r') as f:
-                order_data = json.load(f)
-
             self.logger.info(f"✅ Order data loaded for {book_id}: {len(order_data)} orders")
             return order_data
 
@@ -352,15 +420,12 @@ class BookDataLoader:
     def _load_returns_data_from_files(self, book_id: str, intraday_timestamp_str: str) -> Dict:
         """Load returns data from JSON files (development)"""
         file_path = self.path_resolver.get_returns_file_path(book_id, intraday_timestamp_str)
-
-        if not self.path_resolver.validate_file_exists(file_path, is_critical=False):
+        returns_data = self.path_resolver.load_snapshot_payload(file_path, 'returns', intraday_timestamp_str, book_id)
+        if returns_data is None:
             self.logger.warning(f"⚠️ Returns file not found for {book_id}: {file_path}")
             return {}
 
         try:
-            with open(file_path, 'r') as f:
-                returns_data = json.load(f)
-
             self.logger.info(f"✅ Returns data loaded for {book_id}: {len(returns_data)} entries")
             return returns_data
 
@@ -1,7 +1,10 @@
 # source/orchestration/persistence/loaders/data_path_resolver.py
 import os
+import json
 import logging
-from typing import Dict, List
+from typing import Any, Dict, List, Optional
+
+from source.orchestration.persistence.loaders.minute_store import ColumnBatch, MinuteStore
 
 
 class DataPathResolver:
@@ -10,6 +13,7 @@ class DataPathResolver:
     def __init__(self, data_directory: str):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.data_directory = data_directory
+        self.minute_store = MinuteStore(self.get_minute_store_directory())
         self.logger.info(f"📁 DataPathResolver using directory: {self.data_directory}")
 
     def get_data_directory(self) -> str:
@@ -67,6 +71,39 @@ class DataPathResolver:
         """Get path to returns file (JSON format)"""
         return os.path.join(self.data_directory, book_id, "returns", f"{intraday_timestamp_str}.json")
 
+    def get_minute_store_directory(self) -> str:
+        """Get the columnar minute store root (see minute_store.py)"""
+        return os.path.join(self.data_directory, "store")
+
+    def load_snapshot_columns(self, dataset: str, timestamp_str: str,
+                              book_id: Optional[str] = None) -> Optional[ColumnBatch]:
+        """A minute's rows from the columnar store as typed columns, or None if the store does not have them"""
+        try:
+            if self.minute_store.has_dataset(dataset):
+                return self.minute_store.load_columns(dataset, timestamp_str, book_id)
+        except Exception as e:
+            self.logger.error(f"❌ Error reading stored {dataset} data for {timestamp_str}: {e}")
+        return None
+
+    def load_snapshot_payload(self, file_path: str, dataset: str, timestamp_str: str,
+                              book_id: Optional[str] = None) -> Optional[Any]:
+        """Load a minute's payload from the columnar store, falling back to its per-minute JSON file"""
+        try:
+            if self.minute_store.has_dataset(dataset):
+                payload = self.minute_store.load(dataset, timestamp_str, book_id)
+                if payload is not None:
+                    return payload
+
+            if not os.path.exists(file_path):
+                return None
+
+            with open(file_path, 'r') as f:
+                return json.load(f)
+
+        except Exception as e:
+            self.logger.error(f"❌ Error reading {dataset} data for {timestamp_str}: {e}")
+            return None
+
     def get_exchange_metadata_file_path(self) -> str:
         """Get path to exchange metadata file"""
         return os.path.join(self.data_directory, "exchange_group_metadata.json")
@@ -2,25 +2,31 @@
 import os
 import json
 import logging
-from typing import Dict, List
+from typing import Dict, List, Optional
 import traceback
 from decimal import Decimal
 
 from source.config import app_config
 from source.simulation.managers.fx import FXRate
 from source.orchestration.persistence.loaders.data_path_resolver import DataPathResolver
+from source.orchestration.persistence.loaders.minute_store import SHAPE_LIST, ColumnBatch, convert_distinct
+
+FX_SNAPSHOT_FIELDS = ('base_currency', 'quote_currency', 'rate')
 
 
 class GlobalDataLoader:
     """Handles loading of global data shared across all books"""
 
-    def __init__(self):
+    def __init__(self, data_dir: Optional[str] = None):
         self.logger = logging.getLogger(self.__class__.__name__)
-        current_file = os.path.abspath(__file__)
-        # Navigate up from source/orchestration/persistence/loaders/global_data_loader.py to project root
-        self.data_dir = os.path.join(
-            os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_file))))),
-            f"data")
+        if data_dir is None:
+            current_file = os.path.abspath(__file__)
+            # Navigate up from source/orchestration/persistence/loaders/global_data_loader.py to project root
+            self.data_dir = os.path.join(
+                os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_file))))),
+                f"data")
+        else:
+            self.data_dir = data_dir
 
         self.path_resolver = DataPathResolver(self.data_dir)
 
@@ -143,20 +149,13 @@ class GlobalDataLoader:
         self.logger.info(f"🔍 Looking for equity file (intraday): {file_path}")
         self.logger.info(f"   File exists: {os.path.exists(file_path)}")
 
-        if not self.path_resolver.validate_file_exists(file_path, is_critical=False):
+        equity_data = self.path_resolver.load_snapshot_payload(file_path, 'equity', intraday_timestamp_str)
+        if equity_data is None:
             self.logger.warning(f"⚠️ Equity file not found: {file_path}")
             return []
 
-        try:
-            with open(file_path, 'r') as f:
-                equity_data = json.load(f)
-
-            self.logger.info(f"✅ Equity data loaded: {len(equity_data)} items")
-            return equity_data
-
-        except Exception as e:
-            self.logger.error(f"❌ Error loading equity data: {e}")
-            return []
+        self.logger.info(f"✅ Equity data loaded: {len(equity_data)} items")
+        return equity_data
 
     def _load_fx_data_from_files(self, intraday_timestamp_str: str) -> List[FXRate]:
         """Load FX data from JSON files (development)"""
@@ -165,14 +164,25 @@ class GlobalDataLoader:
         self.logger.info(f"🔍 Looking for FX file (intraday): {file_path}")
         self.logger.info(f"   File exists: {os.path.exists(file_path)}")
 
-        if not self.path_resolver.validate_file_exists(file_path, is_critical=False):
+        stored = self.path_resolver.load_snapshot_columns('fx', intraday_timestamp_str)
+        if stored is not None and stored.shapes == [SHAPE_LIST] and stored.is_plain(FX_SNAPSHOT_FIELDS):
+            try:
+                fx_rates = self._fx_rates_from_columns(stored)
+                self.logger.info(f"✅ FX data loaded: {len(fx_rates)} rates")
+                return fx_rates
+            except Exception as e:
+                self.logger.error(f"❌ Error loading FX data: {e}")
+                return []
+
+        if stored is not None:
+            fx_data_raw = next(stored.payloads())[2]
+        else:
+            fx_data_raw = self.path_resolver.load_snapshot_payload(file_path, 'fx', intraday_timestamp_str)
+        if fx_data_raw is None:
             self.logger.warning(f"⚠️ FX file not found: {file_path}")
             return []
 
         try:
-            with open(file_path, 'r') as f:
-                fx_data_raw = json.load(f)
-
             fx_rates = []
             for item in fx_data_raw:
                 fx_rate = FXRate(
@@ -189,6 +199,18 @@ class GlobalDataLoader:
             self.logger.error(f"❌ Error loading FX data: {e}")
             return []
 
+    @staticmethod
+    def _fx_rates_from_columns(stored: ColumnBatch) -> List[FXRate]:
+        """FX rates of a stored snapshot, built a column at a time"""
+        for name in FX_SNAPSHOT_FIELDS:
+            if stored.field(name) is None:
+                raise KeyError(name)
+
+        rates = convert_distinct(stored.field('rate'), lambda rate: Decimal(str(rate)))
+        return [FXRate(from_currency=from_currency, to_currency=to_currency, rate=rate)
+                for from_currency, to_currency, rate in zip(stored.text('base_currency'),
+                                                            stored.text('quote_currency'), rates)]
+
     # PostgreSQL loading methods
     async def _load_universe_data_from_postgres(self, daily_timestamp_str: str) -> Dict[str, Dict]:
         """Load universe data from PostgreSQL (production)"""
@@ -0,0 +1,486 @@
+# source/orchestration/persistence/loaders/minute_store.py
+"""
+Columnar on-disk store for file-mode minute data.
+
+Replaces the one-file-per-minute layout (data/{book}/{type}/{ts}.json, data/equity/{ts}.json, ...)
+with day-partitioned segments of numpy column files:
+
+    {root}/{dataset}/{YYYYMMDD}/seg_{n:05d}/{column}.npy
+
+Every segment holds many (timestamp, book) payloads as rows sorted by timestamp. Column files are
+plain .npy arrays, so they are memory-mapped on read and a time-range scan only touches the rows it
+returns. Appending writes a new segment; compact() folds a day's segments back into one.
+
+Payloads are the decoded contents of the legacy JSON/CSV files, so the existing loaders interpret
+them unchanged. Integers in a field that also holds floats come back as floats. CSV fields whose text
+is a number that prints back as the same text are stored as int64/float64 columns and turned back into
+that text in payloads.
+
+Loaders that build objects read ColumnBatch instances (scan_columns / load_columns) instead: the
+selected rows of a segment as typed arrays, converted a column at a time rather than a dict per row.
+
+Import an existing data directory with:
+
+    python -m source.orchestration.persistence.loaders.minute_store data/
+"""
+
+import argparse
+import csv
+import json
+import logging
+import os
+import shutil
+import threading
+from collections import OrderedDict, defaultdict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+# Legacy layout: dataset name -> (directory under the data root, file extension)
+GLOBAL_DATASETS = {
+    'equity': ('equity', '.json'),
+    'equity_csv': ('equity', '.csv'),
+    'equity_data': ('equity_data', '.json'),
+    'fx': ('fx', '.json'),
+    'fx_csv': ('fx', '.csv'),
+}
+BOOK_DATASETS = ('portfolio', 'accounts', 'impact', 'orders', 'returns')
+
+# Reserved columns
+TS_COLUMN = '_ts'  # int64 YYYYMMDDHHMM
+BOOK_COLUMN = '_book'  # '' for global datasets
+GROUP_COLUMN = '_group'  # int64, rows of one payload share a group number
+SHAPE_COLUMN = '_shape'  # how the payload's rows are reassembled
+KEY_COLUMN = '_key'  # mapping key for 'mapping' payloads
+RESERVED_COLUMNS = (TS_COLUMN, BOOK_COLUMN, GROUP_COLUMN, SHAPE_COLUMN, KEY_COLUMN)
+
+# Payload shapes
+SHAPE_LIST = 'list'  # list of records
+SHAPE_MAPPING = 'mapping'  # {key: record}
+SHAPE_VALUE = 'value'  # anything else, stored as one record with a 'value' field
+
+SCHEMA_FILE = '_schema.json'
+MISSING = ''  # JSON-encoded cells use '' for a field the record does not have
+
+# Column types: typed values, numbers parsed from text (payloads get the text back), JSON-encoded cells
+PLAIN_TYPES = ('int', 'float', 'str')
+TEXT_NUMBER_TYPES = {'int_text': str, 'float_text': repr}
+JSON_TYPE = 'json'
+
+
+def timestamp_key(timestamp_str: str) -> int:
+    """'YYYYMMDD_HHMM' -> sortable int64 YYYYMMDDHHMM"""
+    return int(timestamp_str[:8] + timestamp_str[9:13])
+
+
+def timestamp_str_from_key(key: int) -> str:
+    """Sortable int64 YYYYMMDDHHMM -> 'YYYYMMDD_HHMM'"""
+    text = str(int(key))
+    return f"{text[:8]}_{text[8:12]}"
+
+
+def _parse_text_numbers(values: List[str]) -> Optional[Tuple[np.ndarray, str]]:
+    """(int64 or float64 column, type) if every text prints back unchanged from its number, else None"""
+    try:
+        integers = [int(value) for value in values]
+        if all(str(number) == value for number, value in zip(integers, values)):
+            return np.asarray(integers, dtype=np.int64), 'int_text'
+    except (ValueError, OverflowError):
+        pass
+    try:
+        floats = [float(value) for value in values]
+        if all(repr(number) == value for number, value in zip(floats, values)):
+            return np.asarray(floats, dtype=np.float64), 'float_text'
+    except ValueError:
+        pass
+    return None
+
+
+def convert_distinct(values: np.ndarray, convert: Callable[[Any], Any]) -> List[Any]:
+    """[convert(value) for value in values], calling convert once per distinct value"""
+    if len(values) == 0:
+        return []
+    # Floats are told apart by their bits so 0.0 and -0.0 (or NaNs) are not merged
+    keys = values.view(np.int64) if values.dtype == np.float64 else values
+    unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    converted = np.empty(len(unique), dtype=object)
+    converted[:] = [convert(value) for value in values[first].tolist()]
+    return converted[inverse.reshape(-1)].tolist()
+
+
+@dataclass
+class ColumnBatch:
+    """
+    Rows of one segment selected by a read, as typed column arrays.
+    Payload i (timestamps[i], book_ids[i]) spans rows bounds[i]:bounds[i + 1].
+    """
+    timestamps: List[str]
+    book_ids: List[str]
+    shapes: List[str]
+    bounds: np.ndarray
+    keys: np.ndarray
+    columns: Dict[str, np.ndarray]
+    types: Dict[str, str]
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    @property
+    def row_count(self) -> int:
+        return int(self.bounds[-1])
+
+    def is_plain(self, names: Iterable[str]) -> bool:
+        """Whether each named field is either absent or present in every row with one type"""
+        return all(name not in self.columns or self.types[name] != JSON_TYPE for name in names)
+
+    def field(self, name: str) -> Optional[np.ndarray]:
+        """Typed values of a plain field (numbers parsed from text included), or None if it is not one"""
+        if name not in self.columns or self.types[name] == JSON_TYPE:
+            return None
+        return self.columns[name]
+
+    def text(self, name: str) -> Optional[List[str]]:
+        """Values of a plain field as the text the payloads hold, or None if it is not one"""
+        values = self.field(name)
+        if values is None:
+            return None
+        if self.types[name] in TEXT_NUMBER_TYPES:
+            return convert_distinct(values, TEXT_NUMBER_TYPES[self.types[name]])
+        return values.tolist()
+
+    def payload_rows(self) -> Iterator[Tuple[int, int, int]]:
+        """(payload index, first row, end row) for each payload"""
+        bounds = self.bounds.tolist()
+        for i in range(len(self.timestamps)):
+            yield i, bounds[i], bounds[i + 1]
+
+    def last(self) -> 'ColumnBatch':
+        """Batch of the last payload only"""
+        start = int(self.bounds[-2])
+        return ColumnBatch(self.timestamps[-1:], self.book_ids[-1:], self.shapes[-1:],
+                           self.bounds[-2:] - start, self.keys[start:],
+                           {name: values[start:] for name, values in self.columns.items()}, self.types)
+
+    def payloads(self) -> Iterator[Tuple[str, str, Any]]:
+        """(timestamp_str, book_id, payload) rebuilt as the legacy files decode"""
+        fields = list(self.columns)
+        json_fields = [name for name in fields if self.types[name] == JSON_TYPE]
+        plain_fields = [name for name in fields if self.types[name] != JSON_TYPE]
+        values = {name: self.text(name) if self.types[name] in TEXT_NUMBER_TYPES else self.columns[name].tolist()
+                  for name in fields}
+        keys = self.keys.tolist()
+
+        for i, start, end in self.payload_rows():
+            records = []
+            for row in range(start, end):
+                record = {name: values[name][row] for name in plain_fields}
+                for name in json_fields:
+                    value = values[name][row]
+                    if value != MISSING:
+                        record[name] = json.loads(value)
+                records.append((keys[row], record))
+
+            if self.shapes[i] == SHAPE_LIST:
+                payload = [record for _, record in records]
+            elif self.shapes[i] == SHAPE_MAPPING:
+                payload = {key: record for key, record in records}
+            else:
+                payload = records[0][1]['value']
+            yield self.timestamps[i], self.book_ids[i], payload
+
+
+class MinuteStore:
+    """Day-partitioned columnar store of per-minute payloads, optionally keyed by book"""
+
+    def __init__(self, root: str, cached_segments: int = 64):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.root = root
+
+        # Segments never change once written (compaction writes a new one), so opened ones are reused
+        self._segments: OrderedDict = OrderedDict()
+        self._segments_lock = threading.Lock()
+        self.cached_segments = cached_segments
+
+    # Discovery
+
+    def has_dataset(self, dataset: str) -> bool:
+        """Whether any segments exist for a dataset"""
+        return os.path.isdir(os.path.join(self.root, dataset))
+
+    def list_days(self, dataset: str) -> List[str]:
+        """Days (YYYYMMDD) with data for a dataset"""
+        dataset_dir = os.path.join(self.root, dataset)
+        if not os.path.isdir(dataset_dir):
+            return []
+        return sorted(day for day in os.listdir(dataset_dir) if day.isdigit())
+
+    def _segment_dirs(self, dataset: str, day: str) -> List[str]:
+        day_dir = os.path.join(self.root, dataset, day)
+        if not os.path.isdir(day_dir):
+            return []
+        return [os.path.join(day_dir, name) for name in sorted(os.listdir(day_dir))
+                if name.startswith('seg_') and not name.endswith('.tmp')]
+
+    # Writing
+
+    def append(self, dataset: str, payloads: Iterable[Tuple[str, Optional[str], Any]]) -> int:
+        """Append (timestamp_str, book_id, payload) entries as new segments, one per day. Returns payloads written."""
+        by_day: Dict[str, List[Tuple[str, str, Any]]] = defaultdict(list)
+        for timestamp_str, book_id, payload in payloads:
+            by_day[timestamp_str[:8]].append((timestamp_str, book_id or '', payload))
+
+        written = 0
+        for day, entries in by_day.items():
+            entries.sort(key=lambda entry: (entry[0], entry[1]))
+            self._write_segment(dataset, day, entries)
+            written += len(entries)
+        return written
+
+    def compact(self, dataset: str, day: str) -> None:
+        """Merge all segments of a day into one"""
+        segment_dirs = self._segment_dirs(dataset, day)
+        if len(segment_dirs) <= 1:
+            return
+
+        entries = []
+        for segment_dir in segment_dirs:
+            entries.extend(self._read_segment(segment_dir))
+        entries.sort(key=lambda entry: (entry[0], entry[1]))
+
+        # Write the merged segment before removing the old ones
+        self._write_segment(dataset, day, entries)
+        for segment_dir in segment_dirs:
+            shutil.rmtree(segment_dir)
+
+    def _write_segment(self, dataset: str, day: str, entries: List[Tuple[str, str, Any]]) -> None:
+        rows: List[Dict[str, Any]] = []
+        ts_values, book_values, group_values, shape_values, key_values = [], [], [], [], []
+
+        for group, (timestamp_str, book_id, payload) in enumerate(entries):
+            shape, records = self._payload_to_records(payload)
+            for key, record in records:
+                ts_values.append(timestamp_key(timestamp_str))
+                book_values.append(book_id)
+                group_values.append(group)
+                shape_values.append(shape)
+                key_values.append(key)
+                rows.append(record)
+
+        columns: Dict[str, np.ndarray] = {
+            TS_COLUMN: np.asarray(ts_values, dtype=np.int64),
+            BOOK_COLUMN: np.asarray(book_values, dtype=str),
+            GROUP_COLUMN: np.asarray(group_values, dtype=np.int64),
+            SHAPE_COLUMN: np.asarray(shape_values, dtype=str),
+            KEY_COLUMN: np.asarray(key_values, dtype=str),
+        }
+        schema: Dict[str, str] = {}
+
+        field_names = list(dict.fromkeys(name for record in rows for name in record))
+        for name in field_names:
+            present = all(name in record for record in rows)
+            values = [record.get(name) for record in rows]
+            if present and all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+                columns[name] = np.asarray(values, dtype=np.int64)
+                schema[name] = 'int'
+            elif present and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+                columns[name] = np.asarray(values, dtype=np.float64)
+                schema[name] = 'float'
+            elif present and all(isinstance(v, str) for v in values):
+                parsed = _parse_text_numbers(values)
+                if parsed is not None:
+                    columns[name], schema[name] = parsed
+                else:
+                    columns[name] = np.asarray(values, dtype=str)
+                    schema[name] = 'str'
+            else:
+                columns[name] = np.asarray(
+                    [json.dumps(record[name]) if name in record else MISSING for record in rows], dtype=str)
+                schema[name] = JSON_TYPE
+
+        day_dir = os.path.join(self.root, dataset, day)
+        os.makedirs(day_dir, exist_ok=True)
+        existing = self._segment_dirs(dataset, day)
+        segment_index = int(os.path.basename(existing[-1])[4:]) + 1 if existing else 0
+        segment_dir = os.path.join(day_dir, f"seg_{segment_index:05d}")
+        tmp_dir = segment_dir + '.tmp'
+        os.makedirs(tmp_dir, exist_ok=True)
+
+        for position, (name, array) in enumerate(columns.items()):
+            np.save(os.path.join(tmp_dir, f"c{position:04d}.npy"), array, allow_pickle=False)
+        with open(os.path.join(tmp_dir, SCHEMA_FILE), 'w') as f:
+            json.dump({'columns': list(columns), 'types': schema}, f)
+
+        # Rename last so readers never see a partially written segment
+        os.replace(tmp_dir, segment_dir)
+
+    @staticmethod
+    def _payload_to_records(payload: Any) -> Tuple[str, List[Tuple[str, Dict]]]:
+        if isinstance(payload, list) and payload and all(isinstance(item, dict) for item in payload):
+            return SHAPE_LIST, [('', item) for item in payload]
+        if (isinstance(payload, dict) and payload
+                and all(isinstance(value, dict) for value in payload.values())):
+            return SHAPE_MAPPING, [(str(key), value) for key, value in payload.items()]
+        return SHAPE_VALUE, [('', {'value': payload})]
+
+    # Reading
+
+    def load(self, dataset: str, timestamp_str: str, book_id: Optional[str] = None) -> Optional[Any]:
+        """Payload for one minute (and book), or None if the store has none. Later appends win."""
+        batch = self.load_columns(dataset, timestamp_str, book_id)
+        if batch is None:
+            return None
+        return next(batch.payloads())[2]
+
+    def load_columns(self, dataset: str, timestamp_str: str, book_id: Optional[str] = None) -> Optional[ColumnBatch]:
+        """Rows of the payload for one minute (and book) as a one-payload ColumnBatch, or None. Later appends win."""
+        result = None
+        for batch in self.scan_columns(dataset, timestamp_str, _next_minute_str(timestamp_str),
+                                       [book_id] if book_id else None):
+            result = batch
+        return result.last() if result is not None else None
+
+    def load_range(self, dataset: str, start_str: str, end_str: str,
+                   book_ids: Optional[List[str]] = None) -> Dict[Tuple[str, str], Any]:
+        """{(timestamp_str, book_id): payload} for minutes in [start_str, end_str)"""
+        return {(timestamp_str, book_id): payload
+                for timestamp_str, book_id, payload in self.scan(dataset, start_str, end_str, book_ids)}
+
+    def scan(self, dataset: str, start_str: str, end_str: str,
+             book_ids: Optional[List[str]] = None) -> Iterator[Tuple[str, str, Any]]:
+        """Yield (timestamp_str, book_id, payload) for minutes in [start_str, end_str), segment by segment"""
+        for batch in self.scan_columns(dataset, start_str, end_str, book_ids):
+            yield from batch.payloads()
+
+    def scan_columns(self, dataset: str, start_str: str, end_str: str,
+                     book_ids: Optional[List[str]] = None) -> Iterator[ColumnBatch]:
+        """Yield one ColumnBatch per segment with rows for minutes in [start_str, end_str)"""
+        start_key, end_key = timestamp_key(start_str), timestamp_key(end_str)
+        start_day, end_day = start_str[:8], end_str[:8]
+
+        for day in self.list_days(dataset):
+            if day < start_day or day > end_day:
+                continue
+            for segment_dir in self._segment_dirs(dataset, day):
+                batch = self._scan_segment(segment_dir, start_key, end_key, book_ids)
+                if batch is not None:
+                    yield batch
+
+    def _scan_segment(self, segment_dir: str, start_key: int, end_key: int,
+                      book_ids: Optional[List[str]]) -> Optional[ColumnBatch]:
+        columns, types = self._open_segment(segment_dir)
+
+        ts = columns[TS_COLUMN]
+        lo, hi = np.searchsorted(ts, start_key, 'left'), np.searchsorted(ts, end_key, 'left')
+        if lo >= hi:
+            return None
+
+        rows = slice(lo, hi)
+        if book_ids is not None:
+            rows = lo + np.flatnonzero(np.isin(columns[BOOK_COLUMN][lo:hi], np.asarray(book_ids, dtype=str)))
+            if rows.size == 0:
+                return None
+
+        return self._batch(columns, types, rows)
+
+    def _read_segment(self, segment_dir: str) -> List[Tuple[str, str, Any]]:
+        columns, types = self._open_segment(segment_dir)
+        return list(self._batch(columns, types, slice(None)).payloads())
+
+    def _open_segment(self, segment_dir: str) -> Tuple[Dict[str, np.ndarray], Dict[str, str]]:
+        with self._segments_lock:
+            if segment_dir in self._segments:
+                self._segments.move_to_end(segment_dir)
+                return self._segments[segment_dir]
+
+        with open(os.path.join(segment_dir, SCHEMA_FILE), 'r') as f:
+            schema = json.load(f)
+        columns = {
+            name: np.load(os.path.join(segment_dir, f"c{position:04d}.npy"), mmap_mode='r', allow_pickle=False)
+            for position, name in enumerate(schema['columns'])
+        }
+
+        with self._segments_lock:
+            self._segments[segment_dir] = (columns, schema['types'])
+            while len(self._segments) > self.cached_segments:
+                self._segments.popitem(last=False)
+        return columns, schema['types']
+
+    @staticmethod
+    def _batch(columns: Dict[str, np.ndarray], types: Dict[str, str], rows) -> ColumnBatch:
+        """ColumnBatch of the selected rows (a slice or sorted row numbers); a payload's rows are contiguous"""
+        ts, groups = np.asarray(columns[TS_COLUMN][rows]), np.asarray(columns[GROUP_COLUMN][rows])
+        starts = np.flatnonzero(np.concatenate(([True], (ts[1:] != ts[:-1]) | (groups[1:] != groups[:-1]))))
+
+        return ColumnBatch(
+            timestamps=[timestamp_str_from_key(key) for key in ts[starts].tolist()],
+            book_ids=np.asarray(columns[BOOK_COLUMN][rows])[starts].tolist(),
+            shapes=np.asarray(columns[SHAPE_COLUMN][rows])[starts].tolist(),
+            bounds=np.append(starts, len(ts)),
+            keys=np.asarray(columns[KEY_COLUMN][rows]),
+            columns={name: np.asarray(array[rows]) for name, array in columns.items() if name not in RESERVED_COLUMNS},
+            types=types,
+        )
+
+
+def _next_minute_str(timestamp_str: str) -> str:
+    minute = datetime.strptime(timestamp_str, '%Y%m%d_%H%M') + timedelta(minutes=1)
+    return minute.strftime('%Y%m%d_%H%M')
+
+
+def _read_legacy_file(file_path: str) -> Any:
+    with open(file_path, 'r', newline='') as f:
+        if file_path.endswith('.csv'):
+            return list(csv.DictReader(f))
+        return json.load(f)
+
+
+def _legacy_files(directory: str, extension: str) -> Iterator[Tuple[str, str]]:
+    """Yield (timestamp_str, path) for YYYYMMDD_HHMM files in a legacy directory"""
+    if not os.path.isdir(directory):
+        return
+    for entry in os.scandir(directory):
+        timestamp_str, ext = os.path.splitext(entry.name)
+        if ext == extension and len(timestamp_str) == 13 and timestamp_str[8] == '_':
+            yield timestamp_str, entry.path
+
+
+def import_file_layout(data_directory: str, store: MinuteStore) -> Dict[str, int]:
+    """Import the legacy per-minute file layout into the store. Returns payloads imported per dataset."""
+    logger = logging.getLogger('MinuteStoreImport')
+    imported: Dict[str, int] = {}
+
+    for dataset, (subdir, extension) in GLOBAL_DATASETS.items():
+        payloads = [(timestamp_str, None, _read_legacy_file(path))
+                    for timestamp_str, path in _legacy_files(os.path.join(data_directory, subdir), extension)]
+        if payloads:
+            imported[dataset] = store.append(dataset, payloads)
+
+    store_root = os.path.abspath(store.root)
+    book_dirs = [entry for entry in os.scandir(data_directory)
+                 if entry.is_dir() and os.path.abspath(entry.path) != store_root and any(os.path.isdir(os.path.join(entry.path, t)) for t in BOOK_DATASETS)]
+    for dataset in BOOK_DATASETS:
+        payloads = []
+        for book_dir in book_dirs:
+            payloads.extend((timestamp_str, book_dir.name, _read_legacy_file(path))
+                            for timestamp_str, path in _legacy_files(os.path.join(book_dir.path, dataset), '.json'))
+        if payloads:
+            imported[dataset] = store.append(dataset, payloads)
+
+    for dataset in imported:
+        for day in store.list_days(dataset):
+            store.compact(dataset, day)
+
+    logger.info(f"✅ Imported {sum(imported.values())} files into {store.root}: {imported}")
+    return imported
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Import the per-minute file layout into the columnar minute store")
+    parser.add_argument('data_directory', help="Data root holding equity/, fx/ and book directories")
+    parser.add_argument('--store', help="Store root (default: {data_directory}/store)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    import_file_layout(args.data_directory, MinuteStore(args.store or os.path.join(args.data_directory, 'store')))
@@ -22,19 +22,13 @@ class BookContextManager:
                 self.logger.error(f"❌ book context not found for {book_id}")
                 return False
 
-            # Store original app_state
-            original_app_state = app_state_module.app_state
-
-            # Switch global app_state to this book's state
-            app_state_module.app_state = book_context.app_state
-            return func()
+            # Bind this book's state for the duration of func
+            with app_state_module.book_scope(book_context.app_state):
+                return func()
 
         except Exception as e:
             self.logger.error(f"❌ Error in book context execution: {e}")
             return False
-        finally:
-            # Restore original app_state
-            app_state_module.app_state = original_app_state
 
     def initialize_book_managers(self, book_id: str, book_data: dict, global_data: dict, manager_initializer) -> bool:
         """Initialize all managers for a specific book"""
@@ -0,0 +1,175 @@
+"""
+Before/after benchmark for loading market data from per-minute files and from the columnar MinuteStore.
+
+    python -m source.orchestration.persistence.minute_store_benchmark --days 1 5 20 --symbols 100
+
+For each history length, writes --days trading days (390 minutes each) of equity and FX bin snap CSVs in
+the per-minute layout (data/equity/{ts}.csv, data/fx/{ts}.csv), imports them into a MinuteStore with
+import_file_layout, and loads them through the replay DataLoader both ways:
+
+    range   every bin of the history with DataLoader.load_range (directory scan + one file per minute,
+            or one scan of the day segments)
+    minute  --sample random minutes one at a time, as live polling and the snapshot loaders read them
+
+Both sources must return the same equity bars and FX rates for every bin. Import and compaction are a
+one-off cost per history and are reported separately. The store parses the CSV numbers into int64/float64
+columns at import, and the loaders build bars and rates from those columns.
+
+Before the timings, portfolio and FX snapshots written as per-minute JSON files must load to the same
+Position and FXRate objects through BookDataLoader and GlobalDataLoader from the files and from the store.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+
+os.environ.setdefault('ENVIRONMENT', 'benchmark')
+
+from source.orchestration.bin_benchmark import SESSION_START, quiet
+from source.orchestration.persistence.loaders.book_data_loader import BookDataLoader
+from source.orchestration.persistence.loaders.global_data_loader import GlobalDataLoader
+from source.orchestration.persistence.loaders.minute_store import MinuteStore, import_file_layout
+
+# The replay package reports the book context it cannot find yet on stdout while it is imported
+with quiet():
+    from source.orchestration.replay.data_loader import DataLoader
+    from source.orchestration.replay_benchmark import write_bins
+
+MINUTES_PER_DAY = 390
+
+
+def trading_minutes(n_days: int) -> list:
+    """Bin times for n_days consecutive weekdays from the benchmark session"""
+    days, day = [], SESSION_START
+    while len(days) < n_days:
+        if day.weekday() < 5:
+            days.append(day)
+        day += timedelta(days=1)
+    return [day + timedelta(minutes=minute + 1) for day in days for minute in range(MINUTES_PER_DAY)]
+
+
+def write_history(data_dir: str, n_days: int, n_symbols: int, seed: int = 0):
+    """Per-minute equity and FX CSVs for every minute of n_days trading days"""
+    for d, day_minutes in enumerate(_by_day(trading_minutes(n_days))):
+        write_bins(data_dir, n_symbols, len(day_minutes), seed + d, start=day_minutes[0] - timedelta(minutes=1))
+
+
+def _by_day(minutes: list) -> list:
+    return [minutes[i:i + MINUTES_PER_DAY] for i in range(0, len(minutes), MINUTES_PER_DAY)]
+
+
+def write_snapshots(data_dir: str, n_books: int, n_positions: int, n_minutes: int, seed: int = 0) -> list:
+    """Portfolio (per book) and FX snapshot JSON files for n_minutes minutes; returns their timestamps"""
+    rng = random.Random(seed)
+    timestamps = [minute.strftime('%Y%m%d_%H%M') for minute in trading_minutes(1)[:n_minutes]]
+    os.makedirs(os.path.join(data_dir, 'fx'), exist_ok=True)
+    for timestamp_str in timestamps:
+        with open(os.path.join(data_dir, 'fx', f"{timestamp_str}.json"), 'w') as f:
+            json.dump([{'base_currency': currency, 'quote_currency': 'USD', 'rate': round(rng.uniform(0.005, 1.5), 6)}
+                       for currency in ('EUR', 'GBP', 'JPY')], f)
+        for book in range(n_books):
+            book_dir = os.path.join(data_dir, f"BOOK{book}", 'portfolio')
+            os.makedirs(book_dir, exist_ok=True)
+            positions = {}
+            for i in range(n_positions):
+                quantity = rng.choice([rng.randrange(-500, 500), float(rng.randrange(-500, 500)), -0.0])
+                price = round(rng.uniform(5, 500), 2)
+                positions[f"S{i:05d}"] = {'symbol': f"S{i:05d}", 'quantity': quantity, 'target_quantity': quantity,
+                                          'avg_price': price, 'mtm_value': round(quantity * price, 2),
+                                          'currency': 'USD', 'realized_pnl': round(rng.uniform(-100, 100), 2)}
+            with open(os.path.join(book_dir, f"{timestamp_str}.json"), 'w') as f:
+                json.dump(positions, f)
+    return timestamps
+
+
+def check_snapshots(n_books: int = 3, n_positions: int = 50, n_minutes: int = 5, seed: int = 0):
+    """Snapshot loaders must build the same objects from the store's columns as from the JSON files"""
+    root = tempfile.mkdtemp(prefix='minute_store_snapshots_')
+    try:
+        files_dir, store_dir = os.path.join(root, 'files'), os.path.join(root, 'store_only')
+        timestamps = write_snapshots(files_dir, n_books, n_positions, n_minutes, seed)
+        os.makedirs(store_dir)
+        import_file_layout(files_dir, MinuteStore(os.path.join(store_dir, 'store')))
+
+        def _load(data_dir):
+            global_loader, book_loader = GlobalDataLoader(data_dir), BookDataLoader(data_dir)
+            return [(global_loader._load_fx_data_from_files(timestamp_str),
+                     [book_loader._load_portfolio_data_from_files(f"BOOK{book}", timestamp_str)
+                      for book in range(n_books)])
+                    for timestamp_str in timestamps]
+
+        expected, actual = _load(files_dir), _load(store_dir)
+        assert all(fx_rates and all(portfolios) for fx_rates, portfolios in expected), "snapshot files did not load"
+        assert actual == expected, "store snapshots differ from the files"
+        print(f"snapshots ok: books={n_books} positions={n_positions} minutes={n_minutes}")
+    finally:
+        shutil.rmtree(root)
+
+
+def _time(function, repeat: int = 3):
+    best, result = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def benchmark(day_counts, n_symbols: int, n_sample: int, repeat: int, seed: int = 0):
+    print(f"\nsymbols={n_symbols:,} minutes/day={MINUTES_PER_DAY} sampled minutes={n_sample}")
+    print(f"{'days':>5} {'bins':>6} {'import_s':>9} {'range_files_s':>14} {'range_store_s':>14} "
+          f"{'minute_files_ms':>16} {'minute_store_ms':>16}")
+
+    for n_days in day_counts:
+        root = tempfile.mkdtemp(prefix='minute_store_benchmark_')
+        try:
+            files_dir, store_dir = os.path.join(root, 'files'), os.path.join(root, 'store_only')
+            write_history(files_dir, n_days, n_symbols, seed)
+            started = time.perf_counter()
+            import_file_layout(files_dir, MinuteStore(os.path.join(store_dir, 'store')))
+            imported = time.perf_counter() - started
+
+            # files_dir has no store, store_dir has nothing but the store
+            files, store = DataLoader(files_dir), DataLoader(store_dir)
+            minutes = trading_minutes(n_days)
+            start, end = minutes[0], minutes[-1] + timedelta(minutes=1)
+
+            range_files, expected = _time(lambda: files.load_range(start, end), repeat)
+            range_store, actual = _time(lambda: store.load_range(start, end), repeat)
+            assert len(expected) == len(minutes) and actual == expected, "store range differs from the files"
+
+            sample = random.Random(seed).sample(minutes, min(n_sample, len(minutes)))
+
+            def _minutes(loader):
+                return [(loader._load_equity_data_for_timestamp(minute), loader._load_fx_data_for_timestamp(minute))
+                        for minute in sample]
+
+            minute_files, expected = _time(lambda: _minutes(files), repeat)
+            minute_store, actual = _time(lambda: _minutes(store), repeat)
+            assert actual == expected, "store minutes differ from the files"
+
+            print(f"{n_days:>5} {len(minutes):>6,} {imported:>9.2f} {range_files:>14.2f} {range_store:>14.2f} "
+                  f"{minute_files / len(sample) * 1000:>16.2f} {minute_store / len(sample) * 1000:>16.2f}")
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-minute files vs columnar MinuteStore load benchmark")
+    parser.add_argument('--days', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--symbols', type=int, default=100)
+    parser.add_argument('--sample', type=int, default=50, help="minutes loaded one at a time")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # The loaders log every bin; keep the output about the results
+    logging.disable(logging.WARNING)
+    check_snapshots(seed=args.seed)
+    benchmark(args.days, args.symbols, args.sample, args.repeat, args.seed)
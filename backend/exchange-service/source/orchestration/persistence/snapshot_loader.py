@@ -1,7 +1,8 @@
 # source/orchestration/persistence/snapshot_loader.py
+import asyncio
 import logging
 from datetime import datetime
-from typing import Dict
+from typing import Awaitable, Callable, Dict, List, Optional
 
 from source.config import app_config
 from source.orchestration.coordination.exchange_manager import ExchangeGroupManager
@@ -19,70 +20,87 @@ from source.orchestration.coordination.metadata_handler import (
 class LastSnapLoader:
     """Main coordinator for loading all Last Snapshot data from files"""
 
-    def __init__(self, exch_id: str):
+    def __init__(self, exch_id: str, data_dir: Optional[str] = None):
         self.logger = logging.getLogger(self.__class__.__name__)
 
         self.exch_id = exch_id
 
-        # data loaders
-        self.global_loader = GlobalDataLoader()
-        self.book_loader = BookDataLoader()
+        # data loaders (data_dir defaults to the project's data directory)
+        self.global_loader = GlobalDataLoader(data_dir)
+        self.book_loader = BookDataLoader(data_dir)
 
         self.validator = DataValidator()
 
     async def load_all_last_snap_data(self, date: datetime, exchange_group_manager: ExchangeGroupManager) -> Dict:
         """Load all Last Snapshot data for the given date - NOW ASYNC"""
         try:
-            date = ensure_timezone_aware(date)
+            global_snap_data = await self.load_global_snap_data(date, exchange_group_manager)
+            book_data = await self.load_book_snap_data(date, exchange_group_manager)
+            return self.compile_last_snap_data(global_snap_data, book_data)
 
-            self.logger.info("=" * 80)
-            self.logger.info("🚀 LOADING LAST SNAPSHOT DATA")
-            self.logger.info("=" * 80)
-            self.logger.info(f"📅 Loading Last Snap data for {date.strftime('%Y-%m-%d')} ({date.tzinfo})")
-
-            # Get timestamp strings
-            daily_timestamp_str = date.strftime('%Y%m%d')
-            intraday_timestamp_str = exchange_group_manager.get_file_timestamp_str()
-
-            self.logger.info(f"📅 Using daily timestamp: {daily_timestamp_str}")
-            self.logger.info(f"📅 Using intraday timestamp: {intraday_timestamp_str}")
-
-            # Load metadata based on environment
-            if app_config.is_production:
-                self.logger.info("🔄 PRODUCTION MODE: Loading metadata from PostgreSQL")
-                exchange_metadata = await load_metadata_from_postgres(self.exch_id)
-            else:
-                self.logger.info("🔄 DEVELOPMENT MODE: Loading metadata from JSON file")
-                exchange_metadata = load_metadata_from_file()
+        except Exception as e:
+            self.logger.error(f"❌ Error loading Last Snapshot data: {e}")
+            raise
 
-            # Load global data - NOW ASYNC
-            global_data = await self.global_loader.load_global_data(daily_timestamp_str, intraday_timestamp_str)
+    async def load_global_snap_data(self, date: datetime, exchange_group_manager: ExchangeGroupManager) -> Dict:
+        """Load exchange metadata and the data shared by every book"""
+        date = ensure_timezone_aware(date)
 
-            # Load book data - NOW ASYNC
-            book_data = await self._load_all_book_data(intraday_timestamp_str, date, exchange_group_manager)
+        self.logger.info("=" * 80)
+        self.logger.info("🚀 LOADING LAST SNAPSHOT DATA")
+        self.logger.info("=" * 80)
+        self.logger.info(f"📅 Loading Last Snap data for {date.strftime('%Y-%m-%d')} ({date.tzinfo})")
 
-            # Compile all data
-            last_snap_data = {
-                'exchange_metadata': exchange_metadata,
-                'global_data': global_data,
-                'book_data': book_data
-            }
+        # Get timestamp strings
+        daily_timestamp_str = date.strftime('%Y%m%d')
+        intraday_timestamp_str = exchange_group_manager.get_file_timestamp_str()
 
-            # Validate and log summary
-            self.validator.validate_last_snap_data(last_snap_data)
-            self.validator.log_last_snap_summary(last_snap_data)
+        self.logger.info(f"📅 Using daily timestamp: {daily_timestamp_str}")
+        self.logger.info(f"📅 Using intraday timestamp: {intraday_timestamp_str}")
 
-            self.logger.info("=" * 80)
-            self.logger.info("✅ LAST SNAPSHOT DATA LOADING COMPLETE")
-            self.logger.info("=" * 80)
+        # Load metadata based on environment
+        if app_config.is_production:
+            self.logger.info("🔄 PRODUCTION MODE: Loading metadata from PostgreSQL")
+            exchange_metadata = await load_metadata_from_postgres(self.exch_id)
+        else:
+            self.logger.info("🔄 DEVELOPMENT MODE: Loading metadata from JSON file")
+            exchange_metadata = load_metadata_from_file()
+
+        # Load global data - NOW ASYNC
+        global_data = await self.global_loader.load_global_data(daily_timestamp_str, intraday_timestamp_str)
+
+        return {
+            'exchange_metadata': exchange_metadata,
+            'global_data': global_data
+        }
+
+    async def load_book_snap_data(self, date: datetime, exchange_group_manager: ExchangeGroupManager,
+                                  on_books_loaded: Optional[Callable[[Dict], Awaitable[None]]] = None) -> Dict:
+        """Load the data of every book; on_books_loaded receives each batch as soon as it arrives"""
+        date = ensure_timezone_aware(date)
+        intraday_timestamp_str = exchange_group_manager.get_file_timestamp_str()
+        return await self._load_all_book_data(intraday_timestamp_str, date, exchange_group_manager, on_books_loaded)
+
+    def compile_last_snap_data(self, global_snap_data: Dict, book_data: Dict) -> Dict:
+        """Combine global and book data, then validate and log a summary"""
+        last_snap_data = {
+            'exchange_metadata': global_snap_data['exchange_metadata'],
+            'global_data': global_snap_data['global_data'],
+            'book_data': book_data
+        }
+
+        # Validate and log summary
+        self.validator.validate_last_snap_data(last_snap_data)
+        self.validator.log_last_snap_summary(last_snap_data)
 
-            return last_snap_data
+        self.logger.info("=" * 80)
+        self.logger.info("✅ LAST SNAPSHOT DATA LOADING COMPLETE")
+        self.logger.info("=" * 80)
 
-        except Exception as e:
-            self.logger.error(f"❌ Error loading Last Snapshot data: {e}")
-            raise
+        return last_snap_data
 
-    async def _load_all_book_data(self, intraday_timestamp_str: str, date: datetime, exchange_group_manager=None) -> Dict:
+    async def _load_all_book_data(self, intraday_timestamp_str: str, date: datetime, exchange_group_manager=None,
+                                  on_books_loaded: Optional[Callable[[Dict], Awaitable[None]]] = None) -> Dict:
         """Load data for all books - NOW ASYNC"""
         all_book_data = {}
 
@@ -91,9 +109,20 @@ class LastSnapLoader:
             books = exchange_group_manager.get_all_books()
             self.logger.info(f"👥 Loading data for {len(books)} books: {books}")
 
-            for book_id in books:
-                book_data = await self.book_loader.load_book_data(book_id, intraday_timestamp_str, date)  # NOW ASYNC
-                all_book_data[book_id] = book_data
+            # Each batch is one set-based query per table; a bounded number of batches are in flight at once
+            batch_size = max(1, app_config.snapshot_restore_batch_size)
+            semaphore = asyncio.Semaphore(max(1, app_config.snapshot_restore_workers))
+
+            async def _load_batch(book_ids: List[str]) -> Dict:
+                async with semaphore:
+                    batch_data = await self.book_loader.load_books_data(book_ids, intraday_timestamp_str, date)
+                if on_books_loaded:
+                    await on_books_loaded(batch_data)
+                return batch_data
+
+            batches = [books[i:i + batch_size] for i in range(0, len(books), batch_size)]
+            for batch_data in await asyncio.gather(*(_load_batch(batch) for batch in batches)):
+                all_book_data.update(batch_data)
         else:
             # Single-book mode: find available book directories
             available_books = None  # self.path_resolver.list_available_books()
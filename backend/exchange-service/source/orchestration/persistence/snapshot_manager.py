@@ -1,7 +1,8 @@
 # source/orchestration/persistence/snapshot_manager.py
 import logging
+import time
 from datetime import datetime
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from source.orchestration.coordination.exchange_manager import ExchangeGroupManager
 
@@ -16,7 +17,7 @@ from source.orchestration.persistence.managers.snapshot_validator import Snapsho
 class SnapshotManager:
     """Unified snapshot management for multi-book scenarios"""
 
-    def __init__(self, exch_id: str = ""):
+    def __init__(self, exch_id: str = "", data_dir: Optional[str] = None):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.exch_id = exch_id
 
@@ -29,7 +30,7 @@ class SnapshotManager:
 
         # Initialize components
         self.exchange_group_manager = None
-        self.last_snap_loader = LastSnapLoader(exch_id)
+        self.last_snap_loader = LastSnapLoader(exch_id, data_dir)
 
         # Initialize specialized modules (will be set up when exchange_group_manager is available)
         self.manager_initializer = ManagerInitializer()
@@ -39,6 +40,7 @@ class SnapshotManager:
 
     async def initialize_multi_book_from_snapshot(self) -> bool:
         """Initialize multi-book exchange from last snapshot - NOW ASYNC"""
+        started = time.perf_counter()
         try:
             self.logger.info("=" * 80)
             self.logger.info("=== MULTI-book SNAPSHOT INITIALIZATION ===")
@@ -55,31 +57,64 @@ class SnapshotManager:
             self.book_context_manager = BookContextManager(self.exchange_group_manager)
             self.shared_data_manager = SharedDataManager(self.book_context_manager)
 
-            # Step 3: Load snapshot data - NOW ASYNC
+            # Step 3: Load shared snapshot data - NOW ASYNC
             snapshot_date = self.exchange_group_manager.last_snap_time
-            last_snap_data = await self.last_snap_loader.load_all_last_snap_data(
+            global_snap_data = await self.last_snap_loader.load_global_snap_data(
                 snapshot_date, self.exchange_group_manager
             )
+            global_data = global_snap_data['global_data']
 
             # Step 4: Initialize shared data across all books
-            if not self.shared_data_manager.initialize_shared_data(last_snap_data['global_data']):
+            if not self.shared_data_manager.initialize_shared_data(global_data):
                 return False
 
-            # Step 5: Initialize each book's managers
-            if not self._initialize_all_books(last_snap_data):
+            # Step 5: Load book data in concurrent batches; each batch's books are initialized as soon as it
+            # arrives, so books become ready independently of the rest
+            self.logger.info("👥 INITIALIZING ALL bookS")
+            self.logger.info("=" * 60)
+
+            book_data, failed_books = await self._load_and_initialize_books(snapshot_date, global_data)
+
+            if failed_books:
+                self.logger.error(f"❌ Failed to initialize {len(failed_books)} books: {failed_books}")
                 return False
+            self.logger.info("✅ All books initialized successfully")
+
+            self.last_snap_loader.compile_last_snap_data(global_snap_data, book_data)
 
             # Step 6: Validate initialization
             if not self.snapshot_validator.validate_initialization_completeness(self.exchange_group_manager):
                 return False
 
-            self.logger.info("=== MULTI-book SNAPSHOT INITIALIZATION COMPLETE ===")
+            self.logger.info(f"=== MULTI-book SNAPSHOT INITIALIZATION COMPLETE "
+                             f"({len(book_data)} books in {time.perf_counter() - started:.2f}s) ===")
             return True
 
         except Exception as e:
             self.logger.error(f"❌ Error during multi-book snapshot initialization: {e}")
             return False
 
+    async def _load_and_initialize_books(self, snapshot_date: datetime, global_data: Dict) -> Tuple[Dict, List[str]]:
+        """Load every book's snapshot data, initializing each batch as it arrives; returns the data and failed books"""
+        failed_books: List[str] = []
+
+        async def _initialize_loaded_books(books_data: Dict) -> None:
+            failed_books.extend(self._initialize_books(books_data, global_data))
+
+        book_data = await self.last_snap_loader.load_book_snap_data(
+            snapshot_date, self.exchange_group_manager, on_books_loaded=_initialize_loaded_books
+        )
+        return book_data, failed_books
+
+    def _initialize_books(self, books_data: Dict, global_data: Dict) -> List[str]:
+        """Initialize a batch of books, returning the ids of books that failed.
+
+        Runs on the event loop thread: initialization is pure Python, so worker threads only add GIL
+        contention (see startup_benchmark.py), while the other batches' loads keep running meanwhile.
+        """
+        return [book_id for book_id in books_data
+                if not self._initialize_book(book_id, books_data[book_id], global_data)]
+
     def _initialize_all_books(self, last_snap_data: Dict) -> bool:
         """Initialize all books with their specific data"""
         try:
@@ -90,29 +125,10 @@ class SnapshotManager:
             global_data = last_snap_data['global_data']
 
             for book_id in books:
-                self.logger.info(f"🔄 Initializing book {book_id}")
-
                 book_data = last_snap_data['book_data'].get(book_id, {})
-                if not book_data:
-                    self.logger.warning(f"⚠️ No data found for book {book_id}, using empty data")
-                    book_data = {
-                        'portfolio': {},
-                        'accounts': {},
-                        'impact': {},
-                        'orders': {},
-                        'returns': {}
-                    }
-
-                success = self.book_context_manager.initialize_book_managers(
-                    book_id, book_data, global_data, self.manager_initializer
-                )
-
-                if not success:
-                    self.logger.error(f"❌ Failed to initialize book {book_id}")
+                if not self._initialize_book(book_id, book_data, global_data):
                     return False
 
-                self.logger.info(f"✅ book {book_id} initialized successfully")
-
             self.logger.info("✅ All books initialized successfully")
             return True
 
@@ -120,6 +136,36 @@ class SnapshotManager:
             self.logger.error(f"❌ Error initializing books: {e}")
             return False
 
+    def _initialize_book(self, book_id: str, book_data: Dict, global_data: Dict) -> bool:
+        """Initialize one book's managers with its snapshot data"""
+        try:
+            self.logger.info(f"🔄 Initializing book {book_id}")
+
+            if not book_data:
+                self.logger.warning(f"⚠️ No data found for book {book_id}, using empty data")
+                book_data = {
+                    'portfolio': {},
+                    'accounts': {},
+                    'impact': {},
+                    'orders': {},
+                    'returns': {}
+                }
+
+            success = self.book_context_manager.initialize_book_managers(
+                book_id, book_data, global_data, self.manager_initializer
+            )
+
+            if not success:
+                self.logger.error(f"❌ Failed to initialize book {book_id}")
+                return False
+
+            self.logger.info(f"✅ book {book_id} initialized successfully")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"❌ Error initializing book {book_id}: {e}")
+            return False
+
     def get_exchange_group_manager(self) -> Optional[ExchangeGroupManager]:
         """Get the exchange group manager"""
         return self.exchange_group_manager
@@ -0,0 +1,199 @@
+"""
+Before/after benchmark for restoring book snapshots at exchange startup.
+
+    python -m source.orchestration.persistence.startup_benchmark --books 1 50 500 --symbols 500
+
+Writes a development snapshot (portfolio, accounts and orders files per book, see BookDataLoader) for
+--books books into a temporary data directory and restores it into freshly built book contexts twice:
+
+    before  every book's files loaded one book after the other, then every book initialized one after
+            the other (_initialize_all_books), as startup did before books were restored concurrently
+    after   SnapshotManager._load_and_initialize_books: books loaded in SNAPSHOT_RESTORE_BATCH_SIZE
+            batches with SNAPSHOT_RESTORE_WORKERS in flight, each batch initialized as soon as it
+            arrives while the others are still loading
+
+Both restores must leave every book with the same positions, balances, orders and markets. Building
+the book contexts (ExchangeGroupManager.initialize) is the same either way and is not timed. Books are
+restored from files, not PostgreSQL, so the "after" column measures the concurrency of the restore
+itself; the set-based snapshot queries that replace five queries per book are not exercised here.
+"""
+import argparse
+import asyncio
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+from decimal import Decimal
+
+os.environ.setdefault('ENVIRONMENT', 'benchmark')
+
+# The book managers report their missing book context on stdout while app_state is built
+with contextlib.redirect_stdout(io.StringIO()):
+    from source.config import app_config
+    from source.orchestration.app_state import state_manager as app_state_module
+    from source.orchestration.bin_benchmark import BOOK_CONFIG, SESSION_START, quiet
+    from source.orchestration.coordination.book_context import initialize_book_context
+    from source.orchestration.coordination.exchange_manager import ExchangeGroupManager
+    from source.orchestration.persistence.managers.book_context_manager import BookContextManager
+    from source.orchestration.persistence.managers.shared_data_manager import SharedDataManager
+    from source.orchestration.persistence.snapshot_manager import SnapshotManager
+from source.simulation.managers.fx import FXRate
+
+
+def write_snapshot(data_dir: str, book_ids, timestamp_str: str, n_symbols: int, seed: int = 0,
+                   position_share: float = 0.2, order_share: float = 0.02):
+    """Per-book portfolio, accounts and orders files in the development snapshot layout"""
+    for b, book_id in enumerate(book_ids):
+        rng = random.Random(seed + b)
+        portfolio, orders = {}, {}
+        for i in range(n_symbols):
+            symbol = f"S{i:05d}"
+            if rng.random() < position_share:
+                quantity, price = rng.randrange(-5_000, 5_000), round(rng.uniform(5, 500), 4)
+                portfolio[symbol] = {'symbol': symbol, 'quantity': quantity, 'target_quantity': quantity,
+                                     'avg_price': price, 'mtm_value': quantity * price, 'currency': 'USD',
+                                     'sod_realized_pnl': 0.0, 'itd_realized_pnl': round(rng.uniform(-1e4, 1e4), 2),
+                                     'realized_pnl': 0.0, 'unrealized_pnl': 0.0}
+            if rng.random() < order_share:
+                qty = rng.randrange(500, 50_000)
+                orders[f"O{b:04d}{i:05d}"] = {
+                    'order_id': f"O{b:04d}{i:05d}", 'cl_order_id': f"C{b:04d}{i:05d}", 'symbol': symbol,
+                    'side': rng.choice(['BUY', 'SELL']), 'original_qty': qty, 'remaining_qty': qty,
+                    'completed_qty': 0, 'currency': 'USD', 'price': 0, 'order_type': 'VWAP_A_ALGO',
+                    'participation_rate': rng.choice([0.05, 0.1, 0.2]),
+                    'submit_timestamp': (SESSION_START - timedelta(seconds=rng.randrange(60, 600))).isoformat()
+                }
+        accounts = {'balances': [{'type': 'CREDIT', 'currency': 'USD', 'amount': '50000000'},
+                                 {'type': 'INVESTOR', 'currency': 'USD', 'amount': '100000000'}]}
+
+        for data_type, payload in (('portfolio', portfolio), ('accounts', accounts), ('orders', orders)):
+            directory = os.path.join(data_dir, book_id, data_type)
+            os.makedirs(directory, exist_ok=True)
+            with open(os.path.join(directory, f"{timestamp_str}.json"), 'w') as f:
+                json.dump(payload, f)
+
+
+def global_data(n_symbols: int, seed: int = 0) -> dict:
+    """Shared snapshot data as GlobalDataLoader returns it"""
+    rng = random.Random(seed)
+    return {
+        'universe': {f"S{i:05d}": {'symbol': f"S{i:05d}", 'currency': 'USD'} for i in range(n_symbols)},
+        'risk_factors': [],
+        'equity': [{'symbol': f"S{i:05d}", 'last_price': round(rng.uniform(5, 500), 2),
+                    'volume': rng.randrange(1_000, 200_000), 'currency': 'USD'} for i in range(n_symbols)],
+        'fx': [FXRate(from_currency='EUR', to_currency='USD', rate=Decimal('1.08'))]
+    }
+
+
+def build_manager(book_ids, data_dir: str, shared: dict) -> SnapshotManager:
+    """A SnapshotManager over fresh book contexts, as initialize_multi_book_from_snapshot has it before step 5"""
+    group = ExchangeGroupManager('benchmark')
+    group.last_snap_time = SESSION_START
+    group.market_hours_utc = {'open_utc': SESSION_START, 'close_utc': SESSION_START + timedelta(hours=6, minutes=30)}
+
+    with quiet():
+        for book_id in book_ids:
+            book_context = initialize_book_context(book_id, BOOK_CONFIG, SESSION_START, group.market_hours_utc)
+            for manager in vars(book_context.app_state.components).values():
+                if hasattr(manager, 'tracking'):
+                    manager.tracking = False
+            group.book_contexts[book_id] = book_context
+
+        manager = SnapshotManager('benchmark', data_dir)
+        manager.exchange_group_manager = group
+        manager.book_context_manager = BookContextManager(group)
+        manager.shared_data_manager = SharedDataManager(manager.book_context_manager)
+        assert manager.shared_data_manager.initialize_shared_data(shared)
+    return manager
+
+
+def restore_before(manager: SnapshotManager, shared: dict) -> bool:
+    """Load every book's files, then initialize every book, one book at a time"""
+    group = manager.exchange_group_manager
+    book_loader = manager.last_snap_loader.book_loader
+    timestamp_str = group.get_file_timestamp_str()
+    book_data = {
+        book_id: book_loader._load_book_data_from_files(book_id, timestamp_str, group.last_snap_time)
+        for book_id in group.get_all_books()
+    }
+    return manager._initialize_all_books({'global_data': shared, 'book_data': book_data})
+
+
+def restore_after(manager: SnapshotManager, shared: dict) -> bool:
+    _, failed_books = asyncio.run(manager._load_and_initialize_books(manager.exchange_group_manager.last_snap_time,
+                                                                      shared))
+    return not failed_books
+
+
+def book_states(manager: SnapshotManager) -> dict:
+    """Positions, balances, orders and market symbols of every book"""
+    states = {}
+    for book_id, book_context in manager.exchange_group_manager.book_contexts.items():
+        app_state = book_context.app_state
+        with app_state_module.book_scope(app_state):
+            states[book_id] = (
+                app_state.portfolio_manager.get_all_positions(),
+                {balance_type: dict(balances) for balance_type, balances in app_state.account_manager.balances.items()},
+                dict(app_state.order_manager._orders),
+                sorted(book_context.exchange.get_symbols()),
+            )
+    return states
+
+
+def _restore(book_ids, data_dir: str, shared: dict, restore):
+    """Seconds to restore into fresh book contexts, and the books' state afterwards"""
+    manager = build_manager(book_ids, data_dir, shared)
+    gc.collect()
+    with quiet():
+        started = time.perf_counter()
+        assert restore(manager, shared), "restore failed"
+        elapsed = time.perf_counter() - started
+        return elapsed, book_states(manager)
+
+
+def benchmark(book_counts, n_symbols: int, repeat: int, seed: int = 0):
+    shared = global_data(n_symbols, seed)
+    data_dir = tempfile.mkdtemp(prefix='startup_benchmark_')
+
+    print(f"\nsymbols={n_symbols:,} batch={app_config.snapshot_restore_batch_size} "
+          f"workers={app_config.snapshot_restore_workers}")
+    print(f"{'books':>6} {'before_s':>9} {'after_s':>9} {'speedup':>8} {'orders':>8}")
+    try:
+        for n_books in book_counts:
+            book_ids = [f"BOOK{b:04d}" for b in range(n_books)]
+            with quiet():
+                timestamp_str = build_manager([], data_dir, shared).exchange_group_manager.get_file_timestamp_str()
+            write_snapshot(data_dir, book_ids, timestamp_str, n_symbols, seed)
+
+            before = after = None
+            for _ in range(repeat):
+                elapsed, before_states = _restore(book_ids, data_dir, shared, restore_before)
+                before = elapsed if before is None else min(before, elapsed)
+                elapsed, after_states = _restore(book_ids, data_dir, shared, restore_after)
+                after = elapsed if after is None else min(after, elapsed)
+                assert after_states == before_states, "concurrent restore left the books in a different state"
+
+            n_orders = sum(len(state[2]) for state in after_states.values())
+            print(f"{n_books:>6} {before:>9.3f} {after:>9.3f} {before / after:>7.2f}x {n_orders:>8,}")
+    finally:
+        shutil.rmtree(data_dir)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Before/after benchmark for restoring book snapshots at startup")
+    parser.add_argument('--books', type=int, nargs='+', default=[1, 50, 500])
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Every manager logs each book it restores; keep the output about the results
+    logging.disable(logging.WARNING)
+    benchmark(args.books, args.symbols, args.repeat, args.seed)
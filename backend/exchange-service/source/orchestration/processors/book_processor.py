@@ -4,10 +4,13 @@ book Processor - Handles processing data for all books
 """
 
 import logging
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import List, Optional
 
+from source.config import app_config
 from source.simulation.core.models.models import EquityBar, FXRate
 from .processing_steps import ProcessingSteps
 
@@ -18,120 +21,130 @@ class BookProcessor:
     def __init__(self):
         self.logger = logging.getLogger(self.__class__.__name__)
         self.processing_steps = ProcessingSteps()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_workers = 0
+        self._executor_lock = threading.Lock()
+
+    def process_books(self, books: List[str], equity_bars: List[EquityBar],
+                      fx: Optional[List[FXRate]], exchange_group_manager,
+                      is_backfill: bool = False) -> None:
+        """Process market data for all books, in parallel when BOOK_PROCESSING_WORKERS > 1"""
+        workers = min(app_config.book_processing_workers, len(books))
+        if workers > 1:
+            self.process_books_in_parallel(books, equity_bars, fx, exchange_group_manager,
+                                           is_backfill, workers)
+        else:
+            self.process_books_sequentially(books, equity_bars, fx, exchange_group_manager, is_backfill)
 
     def process_books_sequentially(self, books: List[str], equity_bars: List[EquityBar],
                                    fx: Optional[List[FXRate]], exchange_group_manager,
                                    is_backfill: bool = False) -> None:
         """Process market data for all books sequentially"""
-        print(f"🔥🔥🔥 ENTERING process_books_sequentially")
-        print(f"🔥🔥🔥 books = {books}")
-        print(f"🔥🔥🔥 equity_bars count = {len(equity_bars) if equity_bars else 0}")
-        print(f"🔥🔥🔥 is_backfill = {is_backfill}")
+        prefix = "🔄 BACKFILL" if is_backfill else "🔥 LIVE"
+        self.logger.info(f"{prefix} - Processing {len(books)} books sequentially...")
+
+        results = [self._process_book(book_id, equity_bars, fx, exchange_group_manager, prefix)
+                   for book_id in books]
 
-        successful_books = 0
-        failed_books = 0
+        self._finish_books(books, results, equity_bars, exchange_group_manager, is_backfill, prefix)
 
+    def process_books_in_parallel(self, books: List[str], equity_bars: List[EquityBar],
+                                  fx: Optional[List[FXRate]], exchange_group_manager,
+                                  is_backfill: bool = False, workers: Optional[int] = None) -> None:
+        """Process market data for all books on a thread pool.
+
+        Each book runs inside its own book_scope, so steps only ever see that
+        book's AppState. Results are collected in book order and callbacks fire
+        once every book is done, exactly as in the sequential path.
+        """
+        workers = workers or app_config.book_processing_workers
         prefix = "🔄 BACKFILL" if is_backfill else "🔥 LIVE"
-        self.logger.info(f"{prefix} - Processing {len(books)} books sequentially...")
+        self.logger.info(f"{prefix} - Processing {len(books)} books in parallel ({workers} workers)...")
+
+        executor = self._get_executor(workers)
+        futures = [executor.submit(self._process_book, book_id, equity_bars, fx, exchange_group_manager, prefix)
+                   for book_id in books]
+        results = [future.result() for future in futures]
+
+        self._finish_books(books, results, equity_bars, exchange_group_manager, is_backfill, prefix)
+
+    def shutdown(self) -> None:
+        """Stop the book worker pool, if one was started"""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+                self._executor_workers = 0
+
+    def _get_executor(self, workers: int) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None or self._executor_workers != workers:
+                if self._executor is not None:
+                    self._executor.shutdown(wait=True)
+                self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="book-worker")
+                self._executor_workers = workers
+            return self._executor
+
+    def _process_book(self, book_id: str, equity_bars: List[EquityBar], fx: Optional[List[FXRate]],
+                      exchange_group_manager, prefix: str) -> bool:
+        """Process one book, returning whether it succeeded"""
+        try:
+            if book_id not in exchange_group_manager.book_contexts:
+                self.logger.error(f"❌ book {book_id} not found in book contexts")
+                return False
+
+            book_context = exchange_group_manager.book_contexts[book_id]
+            self.logger.info(f"{prefix} - Processing book {book_id}...")
+
+            self._process_single_book(book_context, equity_bars, fx)
+            self.logger.info(f"{prefix} - ✅ book {book_id} processed successfully")
+            return True
+
+        except Exception as e:
+            self.logger.error(f"{prefix} - ❌ Failed to process book {book_id}: {e}")
+            return False
+
+    def _finish_books(self, books: List[str], results: List[bool], equity_bars: List[EquityBar],
+                      exchange_group_manager, is_backfill: bool, prefix: str) -> None:
+        """Summarize book results and trigger callbacks once all books are processed"""
+        successful_books = sum(1 for ok in results if ok)
+        failed_books = len(results) - successful_books
 
-        # Process each book
-        for book_id in books:
-            print(f"🔥🔥🔥 Processing book {book_id}")
-            try:
-                if book_id not in exchange_group_manager.book_contexts:
-                    print(f"🔥🔥🔥 book {book_id} NOT IN CONTEXTS!")
-                    self.logger.error(f"❌ book {book_id} not found in book contexts")
-                    failed_books += 1
-                    continue
-
-                book_context = exchange_group_manager.book_contexts[book_id]
-                print(f"🔥🔥🔥 Got book context for {book_id}")
-                self.logger.info(f"{prefix} - Processing book {book_id}...")
-
-                self._process_single_book(book_context, equity_bars, fx)
-                successful_books += 1
-                print(f"🔥🔥🔥 book {book_id} processed successfully")
-                self.logger.info(f"{prefix} - ✅ book {book_id} processed successfully")
-
-            except Exception as e:
-                print(f"🔥🔥🔥 EXCEPTION processing book {book_id}: {e}")
-                failed_books += 1
-                self.logger.error(f"{prefix} - ❌ Failed to process book {book_id}: {e}")
-
-        # Summary
-        print(f"🔥🔥🔥 PROCESSING SUMMARY: Success={successful_books}, Failed={failed_books}")
         self.logger.info(f"{prefix} - ✅ Success: {successful_books}, ❌ Failed: {failed_books}")
 
         if failed_books > 0:
-            print(f"🔥🔥🔥 RAISING EXCEPTION due to failed books")
             raise Exception(f"Failed to process data for {failed_books}/{len(books)} books")
 
-        print(f"🔥🔥🔥 ABOUT TO TRIGGER CALLBACKS")
-        print(f"🔥🔥🔥 Calling _trigger_equity_callbacks with:")
-        print(f"🔥🔥🔥   - books: {books}")
-        print(f"🔥🔥🔥   - equity_bars count: {len(equity_bars)}")
-        print(f"🔥🔥🔥   - is_backfill: {is_backfill}")
-
-        # Trigger callbacks
         self._trigger_equity_callbacks(books, equity_bars, exchange_group_manager, is_backfill)
 
-        print(f"🔥🔥🔥 EXITING process_books_sequentially - COMPLETE")
-
     def _process_single_book(self, book_context, equity_bars: List[EquityBar], fx: Optional[List[FXRate]]):
-        """Process market data for a single book"""
-        print(f"🔥🔥🔥 ENTERING _process_single_book")
-        print(f"🔥🔥🔥 book_context type: {type(book_context)}")
-        print(f"🔥🔥🔥 equity_bars count: {len(equity_bars) if equity_bars else 0}")
-
+        """Process market data for a single book inside that book's scope"""
         import source.orchestration.app_state.state_manager as app_state_module
 
-        original_app_state = app_state_module.app_state
-        print(f"🔥🔥🔥 Saved original app_state")
-
-        try:
-            # Set book's app_state as current
-            app_state_module.app_state = book_context.app_state
-            print(f"🔥🔥🔥 Set book app_state as current")
+        app_state = book_context.app_state
+        steps = self.processing_steps
 
+        with app_state_module.book_scope(app_state):
             # Handle timing for first book only (others share the same timing)
-            if not app_state_module.app_state._received_first_market_data:
-                print(f"🔥🔥🔥 First market data - marking received")
+            if not app_state._received_first_market_data:
                 minute_bar_timestamp = datetime.fromisoformat(equity_bars[0].timestamp)
-                app_state_module.app_state.mark_first_market_data_received(minute_bar_timestamp)
+                app_state.mark_first_market_data_received(minute_bar_timestamp)
 
-            # Process the exchange state
-            print(f"🔥🔥🔥 Processing FX rates")
-            self.processing_steps.process_fx_rates(fx)
+            bar_timestamp = datetime.fromisoformat(equity_bars[0].timestamp)
 
-            print(f"🔥🔥🔥 Processing exchange update")
-            self.processing_steps.process_exchange_update(equity_bars)
+            # Process the exchange state
+            steps.process_fx_rates(app_state, fx)
+            steps.process_exchange_update(app_state, equity_bars)
 
             # Post process the states
-            print(f"🔥🔥🔥 Processing portfolio update")
-            self.processing_steps.process_portfolio_update(equity_bars)
-
-            print(f"🔥🔥🔥 Processing accounts update")
-            self.processing_steps.process_accounts_update()
-
-            print(f"🔥🔥🔥 Processing returns update")
-            self.processing_steps.process_returns_update(datetime.fromisoformat(equity_bars[0].timestamp))
-
-            print(f"🔥🔥🔥 Processing orders update")
-            self.processing_steps.process_order_progress_update(datetime.fromisoformat(equity_bars[0].timestamp))
+            steps.process_portfolio_update(app_state, equity_bars)
+            steps.process_accounts_update(app_state)
+            steps.process_returns_update(app_state, bar_timestamp)
+            steps.process_order_progress_update(app_state, bar_timestamp)
 
             # Advance market bin
-            print(f"🔥🔥🔥 Advancing market bin")
-            self.processing_steps.advance_market_bin()
-
-            print(f"🔥🔥🔥 Saving previous states")
-            self.processing_steps.save_previous_states()
-
-            print(f"🔥🔥🔥 _process_single_book COMPLETE")
-
-        finally:
-            # Restore original app_state
-            app_state_module.app_state = original_app_state
-            print(f"🔥🔥🔥 Restored original app_state")
+            steps.advance_market_bin(app_state)
+            steps.save_previous_states(app_state)
 
     def _trigger_equity_callbacks(self, books: List[str], equity_bars: List[EquityBar],
                                   exchange_group_manager, is_backfill: bool):
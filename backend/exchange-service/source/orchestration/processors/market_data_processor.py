@@ -111,7 +111,7 @@ class MarketDataProcessor:
             self.logger.info(f"📊 Processing {mode} data for {len(books)} books at {market_time}")
 
             # Process for each book
-            self.book_processor.process_books_sequentially(
+            self.book_processor.process_books(
                 books, equity_bars, fx, self.exchange_group_manager, is_backfill
             )
 
@@ -139,7 +139,7 @@ class MarketDataProcessor:
             timestamp = datetime.fromisoformat(equity_bars[0].timestamp)
 
             self.logger.info(f"🎬 Processing replay data for {timestamp}")
-            self.book_processor.process_books_sequentially(
+            self.book_processor.process_books(
                 books, equity_bars, fx, self.exchange_group_manager, is_backfill=True
             )
 
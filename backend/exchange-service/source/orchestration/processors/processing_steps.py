@@ -1,6 +1,9 @@
 # source/orchestration/processors/processing_steps.py
 """
 Processing Steps - Handles individual processing steps for market data
+
+Every step takes the book's AppState explicitly, so books can be processed
+concurrently without relying on the module-level app_state.
 """
 
 import logging
@@ -8,11 +11,14 @@ import time
 from datetime import datetime
 import traceback
 import threading
-from typing import List, Optional
+from typing import List, Optional, TYPE_CHECKING
 from decimal import Decimal
 
 from source.simulation.core.models.models import EquityBar, FXRate
 
+if TYPE_CHECKING:
+    from source.orchestration.app_state.state_manager import AppState
+
 
 class ProcessingSteps:
     """Handles individual processing steps for market data processing"""
@@ -20,10 +26,8 @@ class ProcessingSteps:
     def __init__(self):
         self.logger = logging.getLogger(self.__class__.__name__)
 
-    def process_fx_rates(self, fx: Optional[List[FXRate]]) -> None:
+    def process_fx_rates(self, app_state: 'AppState', fx: Optional[List[FXRate]]) -> None:
         """Process FX rates"""
-        from source.orchestration.app_state.state_manager import app_state
-
         step_start = time.time()
         if fx and app_state.fx_manager:
             self.logger.info("💱 STEP 1: FX RATES UPDATE")
@@ -34,18 +38,17 @@ class ProcessingSteps:
         else:
             self.logger.info("⏭️ STEP 1 SKIPPED: No FX rates to update")
 
-    def process_exchange_update(self, equity_bars: List[EquityBar]) -> None:
+    def process_exchange_update(self, app_state: 'AppState', equity_bars: List[EquityBar]) -> None:
         """Update exchange with equity data"""
-        from source.orchestration.app_state.state_manager import app_state
-
         step_start = time.time()
         if app_state.exchange:
             self.logger.info("🏛️ STEP 2: EXCHANGE MARKET DATA UPDATE")
 
+            minute_bars = []
             for i, bar in enumerate(equity_bars):
                 self.logger.debug(f"     [{i + 1}/{len(equity_bars)}] Processing {bar.symbol}")
 
-                market_data = {
+                minute_bars.append({
                     "symbol": bar.symbol,
                     "timestamp": bar.timestamp,
                     "currency": bar.currency,
@@ -59,9 +62,9 @@ class ProcessingSteps:
                     "price": bar.vwap,
                     "volume": bar.volume,
                     "count": bar.count
-                }
+                })
 
-                app_state.exchange.update_market_data(market_data)
+            app_state.exchange.update_market_data_batch(minute_bars)
 
             step_duration = (time.time() - step_start) * 1000
             self.logger.info(f"✅ STEP 2 COMPLETE: Exchange updated in {step_duration:.2f}ms")
@@ -69,10 +72,8 @@ class ProcessingSteps:
             self.logger.error("❌ STEP 2 FAILED: No exchange available")
             raise ValueError("Exchange not available for market data update")
 
-    def process_risk_update(self, risk_holdings, timestamp: datetime) -> None:
+    def process_risk_update(self, app_state: 'AppState', risk_holdings, timestamp: datetime) -> None:
         """Update risk data"""
-        from source.orchestration.app_state.state_manager import app_state
-
         step_start = time.time()
         if app_state.risk_manager and risk_holdings:
             self.logger.info("📊 STEP 2.5: RISK DATA UPDATE")
@@ -82,10 +83,8 @@ class ProcessingSteps:
         else:
             self.logger.warning("⚠️ STEP 2.5 SKIPPED: Risk manager not available or no risk holdings data")
 
-    def process_portfolio_update(self, equity_bars: List[EquityBar]) -> None:
+    def process_portfolio_update(self, app_state: 'AppState', equity_bars: List[EquityBar]) -> None:
         """Update portfolio with new market prices"""
-        from source.orchestration.app_state.state_manager import app_state
-
         step_start = time.time()
         if app_state.portfolio_manager:
             self.logger.info("💼 STEP 3: PORTFOLIO UPDATE")
@@ -108,10 +107,8 @@ class ProcessingSteps:
         else:
             self.logger.error("❌ STEP 3 FAILED: No portfolio manager available")
 
-    def process_accounts_update(self) -> None:
+    def process_accounts_update(self, app_state: 'AppState') -> None:
         """Update account NAV and balances"""
-        from source.orchestration.app_state.state_manager import app_state
-
         step_start = time.time()
         if app_state.account_manager:
             self.logger.info("🏦 STEP 4: ACCOUNT BALANCES UPDATE")
@@ -121,10 +118,8 @@ class ProcessingSteps:
         else:
             self.logger.error("❌ STEP 4 FAILED: No account manager available")
 
-    def process_cash_flow_update(self, timestamp: datetime) -> None:
+    def process_cash_flow_update(self, app_state: 'AppState', timestamp: datetime) -> None:
         """Save cash flow data"""
-        from source.orchestration.app_state.state_manager import app_state
-
         step_start = time.time()
         if app_state.cash_flow_manager:
             self.logger.info("💰 STEP 4.5: CASH FLOW DATA SAVE")
@@ -145,10 +140,8 @@ class ProcessingSteps:
         else:
             self.logger.warning("⚠️ STEP 4.5 SKIPPED: Cash flow manager not available")
 
-    def process_order_progress_update(self, timestamp: datetime) -> None:
+    def process_order_progress_update(self, app_state: 'AppState', timestamp: datetime) -> None:
         """Update order progress for current market bin"""
-        from source.orchestration.app_state.state_manager import app_state
-
         step_start = time.time()
         if app_state.order_manager:
             self.logger.info("📋 STEP 4.6: ORDER PROGRESS UPDATE")
@@ -158,10 +151,8 @@ class ProcessingSteps:
         else:
             self.logger.warning("⚠️ STEP 4.6 SKIPPED: Order manager not available")
 
-    def process_order_views_update(self, timestamp: datetime) -> None:
+    def process_order_views_update(self, app_state: 'AppState', timestamp: datetime) -> None:
         """Update order views"""
-        from source.orchestration.app_state.state_manager import app_state
-
         step_start = time.time()
         if app_state.order_manager and app_state.order_view_manager:
             self.logger.info("📋 STEP 5: ORDER VIEWS UPDATE")
@@ -171,10 +162,8 @@ class ProcessingSteps:
         else:
             self.logger.warning("⚠️ STEP 5 SKIPPED: Order manager or order view manager not available")
 
-    def process_returns_update(self, timestamp: datetime) -> None:
+    def process_returns_update(self, app_state: 'AppState', timestamp: datetime) -> None:
         """Calculate returns"""
-        from source.orchestration.app_state.state_manager import app_state
-
         step_start = time.time()
         if app_state.returns_manager:
             self.logger.info("📈 STEP 6: RETURNS COMPUTATION")
@@ -184,10 +173,8 @@ class ProcessingSteps:
         else:
             self.logger.warning("⚠️ STEP 6 SKIPPED: Returns manager not available")
 
-    def advance_market_bin(self) -> None:
+    def advance_market_bin(self, app_state: 'AppState') -> None:
         """Advance to next market bin"""
-        from source.orchestration.app_state.state_manager import app_state
-
         step_start = time.time()
 
         # ✅ ADD DETAILED LOGGING
@@ -234,10 +221,8 @@ class ProcessingSteps:
         self.logger.info(f"✅ STEP 7 COMPLETE: Bin advanced in {step_duration:.2f}ms")
         self.logger.info("🚨 ADVANCE_MARKET_BIN COMPLETE! 🚨")
 
-    def save_previous_states(self) -> None:
+    def save_previous_states(self, app_state: 'AppState') -> None:
         """Save current state as previous for next iteration"""
-        from source.orchestration.app_state.state_manager import app_state
-
         step_start = time.time()
         self.logger.info("💾 STEP 8: STATE PRESERVATION")
 
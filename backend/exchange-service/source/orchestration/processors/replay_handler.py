@@ -64,7 +64,7 @@ class ReplayCoordinator:
             self.logger.info(f"🎬 Processing queued data from {timestamp}")
 
             try:
-                book_processor.process_books_sequentially(
+                book_processor.process_books(
                     books, equity_bars, fx, self.exchange_group_manager, is_backfill=False
                 )
 
@@ -6,6 +6,7 @@ Replay functionality modules
 from .replay_types import ReplayModeState, ReplayProgress
 from .gap_detector import GapDetector
 from .data_loader import DataLoader
+from .prefetch_loader import PrefetchingDataLoader
 from .replay_engine import ReplayEngine
 from .replay_utils import ReplayUtils
 from .replay_manager import ReplayManager
@@ -15,6 +16,7 @@ __all__ = [
     'ReplayProgress',
     'GapDetector',
     'DataLoader',
+    'PrefetchingDataLoader',
     'ReplayEngine',
     'ReplayUtils',
     'ReplayManager'
@@ -5,26 +5,95 @@ import csv
 import logging
 import asyncio
 import threading
-from datetime import datetime
-from typing import Optional, List
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Optional, List, Tuple
 from decimal import Decimal
 from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
+
 from source.simulation.managers.equity import EquityBar
 from source.simulation.managers.fx import FXRate
 from source.config import app_config
+from source.orchestration.persistence.loaders.minute_store import (
+    SHAPE_LIST, ColumnBatch, MinuteStore, convert_distinct)
+
+# Columnar store datasets, in the same precedence as the per-minute files (CSV bin snaps before JSON backfill)
+EQUITY_STORE_DATASETS = ('equity_csv', 'equity_data')
+FX_STORE_DATASETS = ('fx_csv', 'fx')
+
+# EquityBar fields read from stored columns: (columns tried in order, default), as _equity_bar_from_dict reads them
+EQUITY_PRICE_COLUMNS = {
+    'open': (('open', 'close'), 100.0),
+    'high': (('high', 'close'), 100.0),
+    'low': (('low', 'close'), 100.0),
+    'close': (('close',), 100.0),
+    'vwap': (('vwap', 'close'), 100.0),
+    'vwas': (('vwas',), 0.0),
+    'vwav': (('vwav',), 0.0),
+}
+EQUITY_COUNT_COLUMNS = {
+    'volume': (('volume', 'last_volume'), 0),
+    'count': (('count',), 0),
+}
+EQUITY_COLUMNS = ('symbol', 'currency', 'open', 'high', 'low', 'close', 'vwap', 'vwas', 'vwav', 'volume',
+                  'last_volume', 'count')
+FX_COLUMNS = ('from_currency', 'to_currency', 'rate')
+EQUITY_BAR_FIELDS = ('symbol', 'timestamp', 'currency', 'open', 'high', 'low', 'close', 'volume', 'count', 'vwap',
+                     'vwas', 'vwav')
+
+
+def _price(value) -> Decimal:
+    """A stored price as EquityBar holds it (float() by the loader, then Decimal(str()))"""
+    return Decimal(str(float(value)))
+
+
+def _rate(value) -> Decimal:
+    return Decimal(str(value))
+
+
+def _source_column(batch: ColumnBatch, names: Tuple[str, ...], default) -> np.ndarray:
+    """Values of the first of names the batch has, or the default for every row"""
+    for name in names:
+        values = batch.field(name)
+        if values is not None:
+            return values
+    return np.full(batch.row_count, default)
+
+
+def _converted_columns(batch: ColumnBatch, fields: Dict[str, Tuple[Tuple[str, ...], object]],
+                       convert: Callable) -> Dict[str, List]:
+    """Each field converted from its source column; columns of one dtype share a single pass over distinct values"""
+    sources = {name: _source_column(batch, names, default) for name, (names, default) in fields.items()}
+    if len({values.dtype for values in sources.values()}) > 1:
+        return {name: convert_distinct(values, convert) for name, values in sources.items()}
+
+    converted = convert_distinct(np.concatenate(list(sources.values())), convert)
+    n = batch.row_count
+    return {name: converted[i * n:(i + 1) * n] for i, name in enumerate(sources)}
+
+
+def _equity_bars(rows: Iterable[tuple]) -> List[EquityBar]:
+    """EquityBars from rows of EQUITY_BAR_FIELDS values that EquityBar.__init__ would leave unchanged"""
+    bars = []
+    for values in rows:
+        bar = EquityBar.__new__(EquityBar)
+        bar.__dict__.update(zip(EQUITY_BAR_FIELDS, values))
+        bars.append(bar)
+    return bars
 
 
 class DataLoader:
     """Environment-aware data loader with proper async/threading isolation"""
 
-    def __init__(self):
+    def __init__(self, data_directory: Optional[str] = None):
         self.logger = logging.getLogger(self.__class__.__name__)
         
         current_file = os.path.abspath(__file__)
-        self.data_directory = os.path.join(
+        self.data_directory = data_directory or os.path.join(
             os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(current_file)))),
             f"data")
+        self.minute_store = MinuteStore(os.path.join(self.data_directory, "store"))
         
         # Thread-local storage for database connections
         self._thread_local = threading.local()
@@ -68,23 +137,7 @@ class DataLoader:
                     db_manager.load_equity_data(timestamp_str)
                 )
                 
-                equity_bars = []
-                for equity_dict in equity_data:
-                    equity_bar = EquityBar(
-                        symbol=equity_dict['symbol'],
-                        timestamp=timestamp.isoformat(),
-                        currency=equity_dict.get('currency', 'USD'),
-                        open=float(equity_dict.get('open', equity_dict.get('close', 100.0))),
-                        high=float(equity_dict.get('high', equity_dict.get('close', 100.0))),
-                        low=float(equity_dict.get('low', equity_dict.get('close', 100.0))),
-                        close=float(equity_dict.get('close', equity_dict.get('close', 100.0))),
-                        volume=int(equity_dict.get('volume', equity_dict.get('last_volume', 0))),
-                        count=int(equity_dict.get('count', 0)),
-                        vwap=float(equity_dict.get('vwap', equity_dict.get('close', 100.0))),
-                        vwas=float(equity_dict.get('vwas', 0.0)),
-                        vwav=float(equity_dict.get('vwav', 0.0))
-                    )
-                    equity_bars.append(equity_bar)
+                equity_bars = [self._equity_bar_from_dict(equity_dict, timestamp) for equity_dict in equity_data]
                 
                 self.logger.debug(f"✅ Loaded {len(equity_bars)} equity bars from PostgreSQL for {timestamp_str}")
                 return equity_bars
@@ -104,6 +157,10 @@ class DataLoader:
         """Load equity data from files (development) - supports both CSV and JSON formats"""
         timestamp_str = timestamp.strftime('%Y%m%d_%H%M')
 
+        stored = self._load_from_minute_store(EQUITY_STORE_DATASETS, timestamp_str)
+        if stored is not None:
+            return self._equity_bars_from_columns(stored, [timestamp])[0]
+
         # Try CSV format first (bin snap files)
         csv_file_path = os.path.join(self.data_directory, "equity", f"{timestamp_str}.csv")
         if os.path.exists(csv_file_path):
@@ -141,24 +198,7 @@ class DataLoader:
                 )
                 
                 # Convert database dictionaries to FXRate objects
-                fx_rates = []
-                for fx_dict in fx_data:
-                    # Handle both dict and record types
-                    if hasattr(fx_dict, 'from_currency'):
-                        # Database record object
-                        fx_rate = FXRate(
-                            from_currency=fx_dict.from_currency,
-                            to_currency=fx_dict.to_currency,
-                            rate=fx_dict.rate
-                        )
-                    else:
-                        # Dictionary
-                        fx_rate = FXRate(
-                            from_currency=fx_dict['from_currency'],
-                            to_currency=fx_dict['to_currency'],
-                            rate=fx_dict['rate']
-                        )
-                    fx_rates.append(fx_rate)
+                fx_rates = [self._fx_rate_from_db(fx_dict) for fx_dict in fx_data]
                 
                 self.logger.debug(f"✅ Loaded {len(fx_rates)} FX rates from PostgreSQL for {timestamp_str}")
                 return fx_rates
@@ -179,6 +219,10 @@ class DataLoader:
         """Load FX data from files (development) - supports both CSV and JSON formats"""
         timestamp_str = timestamp.strftime('%Y%m%d_%H%M')
 
+        stored = self._load_from_minute_store(FX_STORE_DATASETS, timestamp_str)
+        if stored is not None:
+            return self._fx_rates_from_columns(stored)[0]
+
         csv_file_path = os.path.join(self.data_directory, "fx", f"{timestamp_str}.csv")
         if os.path.exists(csv_file_path):
             return self._load_fx_from_csv(csv_file_path)
@@ -226,23 +270,7 @@ class DataLoader:
             with open(json_file_path, 'r') as jsonfile:
                 data = json.load(jsonfile)
 
-            equity_bars = []
-            for equity_dict in data:
-                equity_bar = EquityBar(
-                    symbol=equity_dict['symbol'],
-                    timestamp=timestamp.isoformat(),
-                    currency=equity_dict.get('currency', 'USD'),
-                    open=float(equity_dict.get('open', equity_dict.get('close', 100.0))),
-                    high=float(equity_dict.get('high', equity_dict.get('close', 100.0))),
-                    low=float(equity_dict.get('low', equity_dict.get('close', 100.0))),
-                    close=float(equity_dict.get('close', equity_dict.get('close', 100.0))),
-                    volume=int(equity_dict.get('volume', equity_dict.get('last_volume', 0))),
-                    count=int(equity_dict.get('count', 0)),
-                    vwap=float(equity_dict.get('vwap', equity_dict.get('close', 100.0))),
-                    vwas=float(equity_dict.get('vwas', 0.0)),
-                    vwav=float(equity_dict.get('vwav', 0.0))
-                )
-                equity_bars.append(equity_bar)
+            equity_bars = [self._equity_bar_from_dict(equity_dict, timestamp) for equity_dict in data]
 
             self.logger.debug(f"✅ Loaded {len(equity_bars)} equity bars from JSON: {json_file_path}")
             return equity_bars
@@ -258,13 +286,7 @@ class DataLoader:
             with open(csv_file_path, 'r') as csvfile:
                 reader = csv.DictReader(csvfile)
                 for row in reader:
-                    fx_rate = FXRate(
-                        from_currency=row['from_currency'],
-                        to_currency=row['to_currency'],
-                        rate=Decimal(str(row['rate'])),
-                        timestamp=row['timestamp']
-                    )
-                    fx_rates.append(fx_rate)
+                    fx_rates.append(self._fx_rate_from_file_dict(row))
 
             self.logger.debug(f"✅ Loaded {len(fx_rates)} FX rates from CSV: {csv_file_path}")
             return fx_rates
@@ -279,19 +301,219 @@ class DataLoader:
             with open(json_file_path, 'r') as jsonfile:
                 data = json.load(jsonfile)
 
-            fx_rates = []
-            for fx_dict in data:
-                fx_rate = FXRate(
-                    from_currency=fx_dict['from_currency'],
-                    to_currency=fx_dict['to_currency'],
-                    rate=Decimal(str(fx_dict['rate'])),
-                    timestamp=fx_dict['timestamp']
-                )
-                fx_rates.append(fx_rate)
+            fx_rates = [self._fx_rate_from_file_dict(fx_dict) for fx_dict in data]
 
             self.logger.debug(f"✅ Loaded {len(fx_rates)} FX rates from JSON: {json_file_path}")
             return fx_rates
 
         except Exception as e:
             self.logger.error(f"❌ Error loading FX data from JSON {json_file_path}: {e}")
-            return []
\ No newline at end of file
+            return []
+
+    # Range loading - one query per table (or one directory scan) for a whole window of bins
+
+    def load_range(self, start_time: datetime,
+                   end_time: datetime) -> Dict[str, Tuple[List[EquityBar], Optional[List[FXRate]]]]:
+        """Load every bin in [start_time, end_time), keyed by YYYYMMDD_HHMM. Bins without equity data are omitted."""
+        if app_config.is_production:
+            self.logger.debug(f"🔄 PRODUCTION MODE: Loading bins {start_time} - {end_time} from PostgreSQL")
+            return self._load_range_from_postgres_threadsafe(start_time, end_time)
+        else:
+            self.logger.debug(f"🔄 DEVELOPMENT MODE: Loading bins {start_time} - {end_time} from files")
+            return self._load_range_from_files(start_time, end_time)
+
+    def load_missing_data(self, gap_start: datetime,
+                          gap_end: datetime) -> List[Tuple[datetime, List[EquityBar], Optional[List[FXRate]]]]:
+        """Load all bins of a market gap (both ends inclusive) as (market_timestamp, equity_bars, fx) tuples"""
+        bins = self.load_range(gap_start, gap_end + timedelta(minutes=1))
+        return [
+            (datetime.strptime(timestamp_str, '%Y%m%d_%H%M').replace(tzinfo=timezone.utc), equity_bars, fx_rates)
+            for timestamp_str, (equity_bars, fx_rates) in sorted(bins.items())
+        ]
+
+    def _load_range_from_postgres_threadsafe(self, start_time: datetime, end_time: datetime) -> Dict:
+        """Load a range of bins from PostgreSQL using thread isolation"""
+        def _db_operation():
+            try:
+                db_manager, loop = self._get_thread_db_manager()
+
+                equity_data, fx_data = loop.run_until_complete(asyncio.gather(
+                    db_manager.load_equity_data_range(start_time, end_time),
+                    db_manager.load_fx_data_range(start_time, end_time)
+                ))
+
+                fx_by_bin = {}
+                for bin_time, fx_rows in fx_data.items():
+                    fx_by_bin[bin_time.astimezone(timezone.utc).strftime('%Y%m%d_%H%M')] = [self._fx_rate_from_db(fx_dict) for fx_dict in fx_rows]
+
+                bins = {}
+                for bin_time, equity_rows in equity_data.items():
+                    bin_time = bin_time.astimezone(timezone.utc)
+                    timestamp_str = bin_time.strftime('%Y%m%d_%H%M')
+                    equity_bars = [self._equity_bar_from_dict(equity_dict, bin_time) for equity_dict in equity_rows]
+                    bins[timestamp_str] = (equity_bars, fx_by_bin.get(timestamp_str, []))
+
+                self.logger.debug(f"✅ Loaded {len(bins)} bins from PostgreSQL for {start_time} - {end_time}")
+                return bins
+
+            except Exception as e:
+                self.logger.error(f"❌ Error loading bins from PostgreSQL for {start_time} - {end_time}: {e}")
+                return {}
+
+        try:
+            future = self._db_executor.submit(_db_operation)
+            return future.result(timeout=120)
+        except Exception as e:
+            self.logger.error(f"❌ Error in threaded range load: {e}")
+            return {}
+
+    def _load_range_from_files(self, start_time: datetime, end_time: datetime) -> Dict:
+        """Load a range of bins from the columnar store and/or files (development), one scan per data type"""
+        start_str = start_time.strftime('%Y%m%d_%H%M')
+        end_str = end_time.strftime('%Y%m%d_%H%M')
+
+        # Store segments take precedence over loose files; within each, CSV (bin snap) before JSON (backfill)
+        equity_stored = self._scan_minute_store(EQUITY_STORE_DATASETS, start_str, end_str, self._range_equity_bars)
+        fx_stored = self._scan_minute_store(FX_STORE_DATASETS, start_str, end_str, self._fx_rates_from_columns)
+        equity_files = self._scan_bin_files([("equity", ".csv"), ("equity_data", ".json")], start_str, end_str)
+        fx_files = self._scan_bin_files([("fx", ".csv"), ("fx", ".json")], start_str, end_str)
+
+        bins = {}
+        for timestamp_str in sorted(set(equity_stored) | set(equity_files)):
+            bin_time = datetime.strptime(timestamp_str, '%Y%m%d_%H%M').replace(tzinfo=timezone.utc)
+            if timestamp_str in equity_stored:
+                equity_bars = equity_stored[timestamp_str]
+            elif equity_files[timestamp_str].endswith('.csv'):
+                equity_bars = self._load_equity_from_csv(equity_files[timestamp_str], bin_time)
+            else:
+                equity_bars = self._load_equity_from_json(equity_files[timestamp_str], bin_time)
+
+            fx_rates = None
+            fx_path = fx_files.get(timestamp_str)
+            if timestamp_str in fx_stored:
+                fx_rates = fx_stored[timestamp_str]
+            elif fx_path:
+                fx_rates = self._load_fx_from_csv(fx_path) if fx_path.endswith('.csv') else self._load_fx_from_json(fx_path)
+
+            if equity_bars:
+                bins[timestamp_str] = (equity_bars, fx_rates)
+
+        self.logger.debug(f"✅ Loaded {len(bins)} bins for {start_str} - {end_str}")
+        return bins
+
+    def _load_from_minute_store(self, datasets: Tuple[str, ...], timestamp_str: str) -> Optional[ColumnBatch]:
+        """Stored rows of a minute from the first dataset in precedence order that has them, or None"""
+        for dataset in datasets:
+            if self.minute_store.has_dataset(dataset):
+                batch = self.minute_store.load_columns(dataset, timestamp_str)
+                if batch is not None:
+                    return batch
+        return None
+
+    def _scan_minute_store(self, datasets: Tuple[str, ...], start_str: str, end_str: str,
+                           build: Callable[[ColumnBatch], List[List]]) -> Dict[str, List]:
+        """Map YYYYMMDD_HHMM -> objects built from the stored rows for [start_str, end_str); earlier datasets win"""
+        built = {}
+        for dataset in datasets:
+            if not self.minute_store.has_dataset(dataset):
+                continue
+            for batch in self.minute_store.scan_columns(dataset, start_str, end_str):
+                for timestamp_str, objects in zip(batch.timestamps, build(batch)):
+                    built.setdefault(timestamp_str, objects)
+        return built
+
+    def _scan_bin_files(self, sources: List[Tuple[str, str]], start_str: str, end_str: str) -> Dict[str, str]:
+        """Map YYYYMMDD_HHMM -> file path for bins in [start_str, end_str); earlier sources win"""
+        files = {}
+        for subdir, extension in sources:
+            directory = os.path.join(self.data_directory, subdir)
+            if not os.path.isdir(directory):
+                continue
+
+            for entry in os.scandir(directory):
+                timestamp_str, ext = os.path.splitext(entry.name)
+                if ext == extension and start_str <= timestamp_str < end_str:
+                    files.setdefault(timestamp_str, entry.path)
+        return files
+
+    # Row conversion helpers
+
+    def _range_equity_bars(self, batch: ColumnBatch) -> List[List[EquityBar]]:
+        """Equity bars per stored bin, stamped with the UTC bin time as load_range stamps them"""
+        bin_times = [datetime.strptime(timestamp_str, '%Y%m%d_%H%M').replace(tzinfo=timezone.utc)
+                     for timestamp_str in batch.timestamps]
+        return self._equity_bars_from_columns(batch, bin_times)
+
+    def _equity_bars_from_columns(self, batch: ColumnBatch, timestamps: List[datetime]) -> List[List[EquityBar]]:
+        """Equity bars per payload of a batch, converting each column once; the same bars as _equity_bar_from_dict"""
+        if (not batch.is_plain(EQUITY_COLUMNS) or batch.field('symbol') is None
+                or any(shape != SHAPE_LIST for shape in batch.shapes)):
+            return [[self._equity_bar_from_dict(equity_dict, timestamp) for equity_dict in payload]
+                    for timestamp, (_, _, payload) in zip(timestamps, batch.payloads())]
+
+        symbols = batch.text('symbol')
+        currencies = batch.text('currency') if batch.field('currency') is not None else ['USD'] * batch.row_count
+        row_timestamps = np.repeat(np.array([timestamp.isoformat() for timestamp in timestamps], dtype=object),
+                                   np.diff(batch.bounds)).tolist()
+        prices = _converted_columns(batch, EQUITY_PRICE_COLUMNS, _price)
+        counts = _converted_columns(batch, EQUITY_COUNT_COLUMNS, int)
+
+        bars = _equity_bars(zip(symbols, row_timestamps, currencies, prices['open'], prices['high'], prices['low'],
+                                prices['close'], counts['volume'], counts['count'], prices['vwap'], prices['vwas'],
+                                prices['vwav']))
+        return [bars[start:end] for _, start, end in batch.payload_rows()]
+
+    def _fx_rates_from_columns(self, batch: ColumnBatch) -> List[List[FXRate]]:
+        """FX rates per payload of a batch; the same rates as _fx_rate_from_file_dict"""
+        if (not batch.is_plain(FX_COLUMNS) or any(batch.field(name) is None for name in FX_COLUMNS)
+                or any(shape != SHAPE_LIST for shape in batch.shapes)):
+            return [[self._fx_rate_from_file_dict(fx_dict) for fx_dict in payload]
+                    for _, _, payload in batch.payloads()]
+
+        from_currencies, to_currencies = batch.text('from_currency'), batch.text('to_currency')
+        rates = convert_distinct(batch.field('rate'), _rate)
+        return [[FXRate(from_currency=from_currencies[row], to_currency=to_currencies[row], rate=rates[row])
+                 for row in range(start, end)]
+                for _, start, end in batch.payload_rows()]
+
+    def _equity_bar_from_dict(self, equity_dict, timestamp: datetime) -> EquityBar:
+        """Build an EquityBar from a database row or backfill JSON entry"""
+        return EquityBar(
+            symbol=equity_dict['symbol'],
+            timestamp=timestamp.isoformat(),
+            currency=equity_dict.get('currency', 'USD'),
+            open=float(equity_dict.get('open', equity_dict.get('close', 100.0))),
+            high=float(equity_dict.get('high', equity_dict.get('close', 100.0))),
+            low=float(equity_dict.get('low', equity_dict.get('close', 100.0))),
+            close=float(equity_dict.get('close', equity_dict.get('close', 100.0))),
+            volume=int(equity_dict.get('volume', equity_dict.get('last_volume', 0))),
+            count=int(equity_dict.get('count', 0)),
+            vwap=float(equity_dict.get('vwap', equity_dict.get('close', 100.0))),
+            vwas=float(equity_dict.get('vwas', 0.0)),
+            vwav=float(equity_dict.get('vwav', 0.0))
+        )
+
+    def _fx_rate_from_db(self, fx_dict) -> FXRate:
+        """Build an FXRate from a database row"""
+        # Handle both dict and record types
+        if hasattr(fx_dict, 'from_currency'):
+            # Database record object
+            return FXRate(
+                from_currency=fx_dict.from_currency,
+                to_currency=fx_dict.to_currency,
+                rate=fx_dict.rate
+            )
+        # Dictionary
+        return FXRate(
+            from_currency=fx_dict['from_currency'],
+            to_currency=fx_dict['to_currency'],
+            rate=fx_dict['rate']
+        )
+
+    def _fx_rate_from_file_dict(self, fx_dict) -> FXRate:
+        """Build an FXRate from a CSV row or JSON entry"""
+        return FXRate(
+            from_currency=fx_dict['from_currency'],
+            to_currency=fx_dict['to_currency'],
+            rate=Decimal(str(fx_dict['rate']))
+        )
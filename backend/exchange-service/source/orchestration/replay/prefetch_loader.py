@@ -0,0 +1,105 @@
+# source/orchestration/replay/prefetch_loader.py
+"""
+Sliding-window replay data loader with background prefetch
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from .data_loader import DataLoader
+from source.simulation.managers.equity import EquityBar
+from source.simulation.managers.fx import FXRate
+from source.utils.timezone_utils import ensure_utc
+
+
+class PrefetchingDataLoader:
+    """
+    Serves replay bins from an in-memory window of market data.
+
+    Each window is fetched with one range query per table (or one directory scan),
+    and the next window is fetched in the background once replay is halfway through
+    the current one, so a replay is bound by processing rather than I/O. Bins missing
+    from a window fall back to the per-minute loader, since they may still be arriving.
+    """
+
+    def __init__(self, data_loader: DataLoader, window_minutes: int = 60):
+        self.logger = logging.getLogger(self.__class__.__name__)
+        self.data_loader = data_loader
+        self.window = timedelta(minutes=max(1, window_minutes))
+
+        self._lock = threading.Lock()
+        self._buffer: Dict[str, Tuple[List[EquityBar], Optional[List[FXRate]]]] = {}
+        self._buffered_from: Optional[datetime] = None
+        self._buffered_until: Optional[datetime] = None
+
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending: Optional[Future] = None
+        self._pending_range: Optional[Tuple[datetime, datetime]] = None
+
+    def get_bin(self, minute_time: datetime) -> Tuple[List[EquityBar], Optional[List[FXRate]]]:
+        """Get (equity_bars, fx_rates) for a market minute"""
+        minute_time = ensure_utc(minute_time)
+        timestamp_str = minute_time.strftime('%Y%m%d_%H%M')
+
+        with self._lock:
+            self._ensure_window(minute_time)
+            bin_data = self._buffer.pop(timestamp_str, None)
+            self._maybe_prefetch(minute_time)
+
+        if bin_data is None:
+            self.logger.debug(f"🔍 Bin {timestamp_str} not in prefetch window - loading directly")
+            return (self.data_loader._load_equity_data_for_timestamp(minute_time),
+                    self.data_loader._load_fx_data_for_timestamp(minute_time))
+
+        return bin_data
+
+    def reset(self) -> None:
+        """Drop buffered and in-flight windows"""
+        with self._lock:
+            self._buffer.clear()
+            self._buffered_from = None
+            self._buffered_until = None
+            self._pending = None
+            self._pending_range = None
+
+    def close(self) -> None:
+        """Stop the prefetch worker"""
+        self.reset()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _ensure_window(self, minute_time: datetime) -> None:
+        """Make sure the buffer covers minute_time, using the prefetched window when it does"""
+        if self._pending is not None and self._pending_range[0] <= minute_time < self._pending_range[1]:
+            self._buffer.update(self._pending.result())
+            self._buffered_until = self._pending_range[1]
+            self._pending = None
+            self._pending_range = None
+
+        if (self._buffered_from is not None and self._buffered_from <= minute_time < self._buffered_until):
+            return
+
+        # Jumped outside the buffered range - load a fresh window synchronously
+        self._pending = None
+        self._pending_range = None
+        self._buffer = self.data_loader.load_range(minute_time, minute_time + self.window)
+        self._buffered_from = minute_time
+        self._buffered_until = minute_time + self.window
+        self.logger.info(f"📦 Loaded replay window {minute_time} - {self._buffered_until}: {len(self._buffer)} bins")
+
+    def _maybe_prefetch(self, minute_time: datetime) -> None:
+        """Start fetching the next window once replay is halfway through the current one"""
+        if self._pending is not None or self._buffered_until - minute_time > self.window / 2:
+            return
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ReplayPrefetch")
+
+        start, end = self._buffered_until, self._buffered_until + self.window
+        self._pending_range = (start, end)
+        self._pending = self._executor.submit(self.data_loader.load_range, start, end)
+        self.logger.debug(f"📦 Prefetching replay window {start} - {end}")
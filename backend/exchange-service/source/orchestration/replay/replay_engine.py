@@ -12,6 +12,8 @@ from typing import Optional, Callable, Tuple
 
 from .replay_types import ReplayModeState, ReplayProgress
 from .data_loader import DataLoader
+from .prefetch_loader import PrefetchingDataLoader
+from source.config import app_config
 from source.utils.timezone_utils import ensure_utc
 
 
@@ -39,6 +41,7 @@ class ReplayEngine:
 
         # Initialize data loader (environment-aware)
         self.data_loader = DataLoader()
+        self.prefetch_loader = PrefetchingDataLoader(self.data_loader, app_config.replay_prefetch_minutes)
 
     def enter_replay_mode(self, last_snap_time: datetime, target_live_time: datetime) -> None:
         """Enter replay mode to catch up missing bin snaps"""
@@ -156,6 +159,9 @@ class ReplayEngine:
             print(f"⏰ Starting from: {current_time}")
             print(f"🎯 Target time: {self.latest_live_timestamp}")
 
+            self.prefetch_loader.reset()
+            replay_started = time.perf_counter()
+
             iteration_count = 0
             while not self.stop_event.is_set():
                 iteration_count += 1
@@ -210,9 +216,6 @@ class ReplayEngine:
                     self.logger.info("🎯 TRANSITIONING TO LIVE MODE")
                     break
 
-                # Small delay to prevent tight loop
-                time.sleep(0.1)
-
             # Replay complete - transition to live mode
             print("")
             print("🎬 REPLAY LOOP COMPLETED")
@@ -224,6 +227,11 @@ class ReplayEngine:
             self.logger.info("=" * 100)
             self.logger.info("🎯 REPLAY COMPLETE - TRANSITIONING TO LIVE MODE")
 
+            replay_elapsed = time.perf_counter() - replay_started
+            replayed_minutes = self.current_progress.completed_minutes
+            self.logger.info(f"⏱️ Replayed {replayed_minutes} minutes in {replay_elapsed:.2f}s "
+                             f"({replayed_minutes / max(replay_elapsed, 1e-9):.1f} minutes/s)")
+
             self.state = ReplayModeState.REPLAY_COMPLETE
 
             # Update exchange group manager's last snap time to the final time
@@ -289,8 +297,7 @@ class ReplayEngine:
             print(f"🔍 Initial data check using environment-aware data loader...")
             self.logger.info(f"🔍 Initial data check using environment-aware data loader...")
 
-            equity_bars = self.data_loader._load_equity_data_for_timestamp(minute_time)
-            fx_rates = self.data_loader._load_fx_data_for_timestamp(minute_time)
+            equity_bars, fx_rates = self.prefetch_loader.get_bin(minute_time)
 
             print(f"🔍 Initial data check results:")
             print(f"   🔹 Equity bars: {len(equity_bars) if equity_bars else 0}")
@@ -438,6 +445,7 @@ class ReplayEngine:
             self.replay_thread.join(timeout=10)
             self.logger.info(f"🧵 Thread joined: {not self.replay_thread.is_alive()}")
 
+        self.prefetch_loader.close()
         self.state = ReplayModeState.LIVE
 
     def is_in_replay_mode(self) -> bool:
@@ -0,0 +1,156 @@
+"""
+Before/after replay speed, in market minutes per second.
+
+    python -m source.orchestration.replay_benchmark --books 1 --symbols 500 --minutes 120
+
+Writes --minutes minutes of bin snap files (equity/<YYYYMMDD_HHMM>.csv and fx/<YYYYMMDD_HHMM>.csv) for
+--symbols symbols into a temporary data directory and replays them three ways:
+
+    before          each minute loaded with its own equity and FX lookups, processed, then the 0.1s pause
+                    ReplayEngine used to take between minutes
+    before, no wait the same without the pause, to separate the loader from the pause
+    after           bins served by PrefetchingDataLoader (REPLAY_PREFETCH_MINUTES windows, next window
+                    prefetched in the background), processed with no pause
+
+Minutes are processed by MarketDataProcessor for --books seeded books (see
+source.orchestration.bin_benchmark). The check asserts the prefetching loader serves every minute with
+the same equity bars and FX rates as the per-minute lookups. Load-only rates are reported as well.
+Files stand in for PostgreSQL here; against the database each per-minute lookup is two round trips,
+where a window is two range queries.
+"""
+import argparse
+import csv
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import timedelta
+
+from source.orchestration.bin_benchmark import SESSION_START, build_group, quiet
+
+# The replay package reports the book context it cannot find yet on stdout while it is imported
+with quiet():
+    from source.config import app_config
+    from source.orchestration.processors.market_data_processor import MarketDataProcessor
+    from source.orchestration.replay.data_loader import DataLoader
+    from source.orchestration.replay.prefetch_loader import PrefetchingDataLoader
+
+EQUITY_FIELDS = ['symbol', 'currency', 'open', 'high', 'low', 'close', 'volume', 'count', 'vwap', 'vwas', 'vwav']
+FX_FIELDS = ['from_currency', 'to_currency', 'rate', 'timestamp']
+
+
+def minutes(n_minutes: int, start=SESSION_START) -> list:
+    return [start + timedelta(minutes=minute + 1) for minute in range(n_minutes)]
+
+
+def write_bins(data_dir: str, n_symbols: int, n_minutes: int, seed: int = 0, start=SESSION_START):
+    """Per-minute equity and FX bin snap CSVs for the minutes after start, as the market data service writes them"""
+    rng = random.Random(seed)
+    prices = [rng.uniform(5, 500) for _ in range(n_symbols)]
+    os.makedirs(os.path.join(data_dir, 'equity'), exist_ok=True)
+    os.makedirs(os.path.join(data_dir, 'fx'), exist_ok=True)
+
+    for minute_time in minutes(n_minutes, start):
+        timestamp_str = minute_time.strftime('%Y%m%d_%H%M')
+        with open(os.path.join(data_dir, 'equity', f"{timestamp_str}.csv"), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=EQUITY_FIELDS)
+            writer.writeheader()
+            for i in range(n_symbols):
+                prices[i] *= 1 + rng.gauss(0, 0.001)
+                price = round(prices[i], 2)
+                writer.writerow({'symbol': f"S{i:05d}", 'currency': 'USD', 'open': price, 'high': price,
+                                 'low': price, 'close': price, 'volume': rng.randrange(1_000, 200_000),
+                                 'count': 100, 'vwap': price, 'vwas': 0.0, 'vwav': 0.0})
+
+        with open(os.path.join(data_dir, 'fx', f"{timestamp_str}.csv"), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FX_FIELDS)
+            writer.writeheader()
+            for from_currency in ('EUR', 'GBP', 'JPY'):
+                writer.writerow({'from_currency': from_currency, 'to_currency': 'USD',
+                                 'rate': round(rng.uniform(0.5, 1.5), 6), 'timestamp': minute_time.isoformat()})
+
+
+def per_minute(data_loader: DataLoader):
+    """A minute's bin as ReplayEngine loaded it before the prefetching loader"""
+    return lambda minute_time: (data_loader._load_equity_data_for_timestamp(minute_time),
+                                data_loader._load_fx_data_for_timestamp(minute_time))
+
+
+def check_bins(data_loader: DataLoader, window: int, n_minutes: int):
+    prefetch = PrefetchingDataLoader(data_loader, window)
+    load = per_minute(data_loader)
+    try:
+        for minute_time in minutes(n_minutes):
+            expected, actual = load(minute_time), prefetch.get_bin(minute_time)
+            assert expected[0] and expected[1], minute_time
+            assert actual == expected, f"prefetched bin differs at {minute_time}"
+    finally:
+        prefetch.close()
+    print(f"bins ok: minutes={n_minutes} window={window}")
+
+
+def replay(get_bin, group, n_minutes: int, pause: float = 0.0, process: bool = True) -> float:
+    """Minutes per second replaying every minute through get_bin (and the processor when process)"""
+    processor = MarketDataProcessor(group) if process else None
+    started = time.perf_counter()
+    try:
+        for minute_time in minutes(n_minutes):
+            equity_bars, fx_rates = get_bin(minute_time)
+            if processor:
+                with quiet():
+                    processor.process_market_data_bin(equity_bars, fx_rates or [], bypass_replay_detection=True)
+            if pause:
+                time.sleep(pause)
+    finally:
+        if processor:
+            processor.book_processor.shutdown()
+    return n_minutes / (time.perf_counter() - started)
+
+
+def benchmark(data_loader: DataLoader, window: int, n_books: int, n_symbols: int, n_minutes: int, seed: int = 0):
+    print(f"\nbooks={n_books} symbols={n_symbols:,} minutes={n_minutes} window={window}")
+    print(f"{'replay':>16} {'load_min/s':>11} {'replay_min/s':>13}")
+
+    def prefetched():
+        prefetch = PrefetchingDataLoader(data_loader, window)
+        return prefetch, prefetch.get_bin
+
+    for name, pause, prefetch in (('before', 0.1, False), ('before, no wait', 0.0, False), ('after', 0.0, True)):
+        rates = []
+        # Loading alone is timed best of three; a replay with processing is timed once
+        for process, repeat in ((False, 3), (True, 1)):
+            best = 0.0
+            for _ in range(repeat):
+                loader, get_bin = prefetched() if prefetch else (None, per_minute(data_loader))
+                group = build_group(n_books, n_symbols, seed) if process else None
+                try:
+                    best = max(best, replay(get_bin, group, n_minutes, pause if process else 0.0, process))
+                finally:
+                    if loader:
+                        loader.close()
+            rates.append(best)
+        print(f"{name:>16} {rates[0]:>11,.0f} {rates[1]:>13,.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Before/after replay speed in market minutes per second")
+    parser.add_argument('--books', type=int, default=1)
+    parser.add_argument('--symbols', type=int, default=500)
+    parser.add_argument('--minutes', type=int, default=120)
+    parser.add_argument('--window', type=int, default=None, help="defaults to REPLAY_PREFETCH_MINUTES")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # The loaders and processors log every bin; keep the output about the results
+    logging.disable(logging.WARNING)
+    window = args.window or app_config.replay_prefetch_minutes
+    data_dir = tempfile.mkdtemp(prefix='replay_benchmark_')
+    try:
+        write_bins(data_dir, args.symbols, args.minutes, args.seed)
+        data_loader = DataLoader(data_dir)
+        check_bins(data_loader, window, args.minutes)
+        benchmark(data_loader, window, args.books, args.symbols, args.minutes, args.seed)
+    finally:
+        shutil.rmtree(data_dir)
@@ -95,14 +95,12 @@ class ConvictionServiceImpl(ConvictionExchangeSimulatorServicer):
             book_context = self.exchange_group_manager.book_contexts[book_id]
             self.logger.info(f"✅ Got book context for {book_id}")
 
-            # CRITICAL FIX: Switch global app_state to book's app_state
+            # CRITICAL FIX: Bind book's app_state to this request's context
             import source.orchestration.app_state.state_manager as app_state_module
-            original_app_state = app_state_module.app_state
+            book_scope_token = app_state_module.enter_book_scope(book_context.app_state)
 
             try:
-                # Set book's app_state as current (like book_processor.py does)
-                app_state_module.app_state = book_context.app_state
-                self.logger.info(f"✅ Switched global app_state to book {book_id}'s app_state")
+                self.logger.info(f"✅ Bound book {book_id}'s app_state to the request context")
 
                 # Verify exchange is available
                 if app_state_module.app_state.exchange:
@@ -278,7 +276,7 @@ class ConvictionServiceImpl(ConvictionExchangeSimulatorServicer):
 
             finally:
                 # CRITICAL: Always restore original app_state
-                app_state_module.app_state = original_app_state
+                app_state_module.exit_book_scope(book_scope_token)
                 self.logger.info("✅ Restored original app_state")
 
         except KeyError:
@@ -0,0 +1,267 @@
+# source/orchestration/servers/session/delta_stream.py
+"""
+Per-book delta encoding for the session exchange stream.
+
+Each bin, the state of every book that has at least one subscriber is built
+once into a BookStateFrame: every section of ExchangeDataUpdate (portfolio,
+accounts, fx_rates, impact, returns, risk, universe) serialized once, plus
+orders and trades serialized per item. Streams subscribe to specific books
+and receive, per book, only the sections / orders / trades whose bytes differ
+from the last update sent on that stream (gRPC delivers a stream in order, so
+that is what the client holds once it has applied everything queued).
+
+A full snapshot (is_initial_state=True) is sent when a stream starts, every
+SESSION_SNAPSHOT_INTERVAL updates, when an order or trade disappears (the
+update message has no way to express a removal), and to resync a client whose
+acknowledged sequence (Heartbeat.last_received_sequence) has fallen more than
+SESSION_DELTA_HISTORY updates behind the last one sent.
+"""
+
+import logging
+import queue
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Set
+
+from source.api.grpc.session_exchange_interface_pb2 import ExchangeDataUpdate
+
+# Singular message sections of ExchangeDataUpdate, compared as a whole
+MESSAGE_SECTIONS = ('portfolio', 'accounts', 'fx_rates', 'impact', 'returns', 'risk', 'universe')
+
+
+@dataclass
+class BookStateFrame:
+    """One book's state for one bin, serialized once and shared by every stream"""
+    book_id: str
+    sections: Dict[str, bytes]
+    orders: Dict[str, bytes]
+    trades: Dict[str, bytes]
+
+    @classmethod
+    def from_update(cls, book_id: str, update: ExchangeDataUpdate) -> 'BookStateFrame':
+        """Split a fully populated update into sections"""
+        sections = {
+            name: getattr(update, name).SerializeToString(deterministic=True)
+            for name in MESSAGE_SECTIONS
+            if update.HasField(name)
+        }
+        orders = {order.order_id: order.SerializeToString(deterministic=True) for order in update.orders_data}
+        trades = {trade.trade_id: trade.SerializeToString(deterministic=True) for trade in update.trades}
+        return cls(book_id=str(book_id), sections=sections, orders=orders, trades=trades)
+
+    def fingerprint(self) -> 'FrameFingerprint':
+        return FrameFingerprint(
+            sections={name: hash(data) for name, data in self.sections.items()},
+            orders={order_id: hash(data) for order_id, data in self.orders.items()},
+            trades=set(self.trades)
+        )
+
+
+@dataclass
+class FrameFingerprint:
+    """What a client holds after applying an update: hashes of each section and order, trade ids"""
+    sections: Dict[str, int]
+    orders: Dict[str, int]
+    trades: Set[str]
+
+
+@dataclass
+class BookStreamState:
+    """Sequence and delta bookkeeping for one book on one stream"""
+    next_sequence: int = 1
+    acked_sequence: int = 0
+    snapshot_sequence: int = 0
+    updates_since_snapshot: int = 0
+    last_sent: Optional[FrameFingerprint] = None
+
+    @property
+    def last_sent_sequence(self) -> int:
+        return self.next_sequence - 1
+
+
+class StreamSubscription:
+    """One StreamExchangeData call: its books, queue and per-book delta state"""
+
+    def __init__(self, book_ids: Iterable[str], session_instance_id: str = ""):
+        self.stream_id = str(uuid.uuid4())
+        self.session_instance_id = session_instance_id
+        self.book_ids: List[str] = [str(book_id) for book_id in book_ids]
+        self.queue: queue.Queue = queue.Queue()
+        self.books: Dict[str, BookStreamState] = {book_id: BookStreamState() for book_id in self.book_ids}
+        self.bytes_sent = 0
+        self.updates_sent = 0
+        self.snapshots_sent = 0
+
+
+class DeltaStreamManager:
+    """Tracks stream subscriptions and turns per-book frames into per-stream delta updates"""
+
+    def __init__(self, snapshot_interval: Optional[int] = None, history_size: Optional[int] = None):
+        from source.config import app_config
+
+        self.snapshot_interval = snapshot_interval or app_config.session_snapshot_interval
+        self.history_size = history_size or app_config.session_delta_history
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+        self._lock = threading.RLock()
+        self._subscriptions: Dict[str, StreamSubscription] = {}
+
+        # Per-bin publish statistics
+        self.last_publish_stats: Dict[str, float] = {}
+
+    # ------------------------------------------------------------------
+    # Subscriptions
+    # ------------------------------------------------------------------
+
+    def subscribe(self, book_ids: Iterable[str], session_instance_id: str = "") -> StreamSubscription:
+        subscription = StreamSubscription(book_ids, session_instance_id)
+        with self._lock:
+            self._subscriptions[subscription.stream_id] = subscription
+        self.logger.info(f"🌊 Stream {subscription.stream_id} subscribed to books {subscription.book_ids}")
+        return subscription
+
+    def unsubscribe(self, subscription: StreamSubscription) -> None:
+        with self._lock:
+            self._subscriptions.pop(subscription.stream_id, None)
+        self.logger.info(f"🧹 Stream {subscription.stream_id} unsubscribed "
+                         f"({subscription.updates_sent} updates, {subscription.bytes_sent} bytes)")
+
+    def subscribed_books(self) -> Set[str]:
+        with self._lock:
+            return {book_id for subscription in self._subscriptions.values() for book_id in subscription.book_ids}
+
+    def subscriptions_for_book(self, book_id: str) -> List[StreamSubscription]:
+        book_id = str(book_id)
+        with self._lock:
+            return [s for s in self._subscriptions.values() if book_id in s.books]
+
+    def acknowledge(self, book_id: str, sequence_number: int, session_instance_id: str = "") -> None:
+        """Record the last sequence a client applied for a book"""
+        if sequence_number <= 0:
+            return
+        book_id = str(book_id)
+        with self._lock:
+            for subscription in self._subscriptions.values():
+                if session_instance_id and subscription.session_instance_id != session_instance_id:
+                    continue
+                state = subscription.books.get(book_id)
+                if state is not None and sequence_number > state.acked_sequence:
+                    state.acked_sequence = min(sequence_number, state.last_sent_sequence)
+
+    def next_sequence(self, book_id: str) -> int:
+        """Next sequence number any stream will send for a book (0 if nobody is subscribed)"""
+        states = [s.books[str(book_id)] for s in self.subscriptions_for_book(book_id)]
+        return max((state.next_sequence for state in states), default=0)
+
+    # ------------------------------------------------------------------
+    # Publishing
+    # ------------------------------------------------------------------
+
+    def publish(self, market_update: ExchangeDataUpdate, frames: Dict[str, BookStateFrame],
+                is_replay: bool = False) -> Dict[str, float]:
+        """Queue one update per (stream, subscribed book) carrying only what changed"""
+        cpu_start = time.process_time()
+        total_bytes = 0
+        updates = 0
+        snapshots = 0
+
+        fingerprints = {book_id: frame.fingerprint() for book_id, frame in frames.items()}
+
+        with self._lock:
+            subscriptions = list(self._subscriptions.values())
+
+            for subscription in subscriptions:
+                for book_id in subscription.book_ids:
+                    frame = frames.get(book_id)
+                    if frame is None:
+                        continue
+
+                    update, is_snapshot = self._build_update(subscription.books[book_id], market_update,
+                                                             frame, fingerprints[book_id], is_replay)
+                    size = update.ByteSize()
+                    subscription.queue.put(update)
+                    subscription.bytes_sent += size
+                    subscription.updates_sent += 1
+                    subscription.snapshots_sent += is_snapshot
+
+                    total_bytes += size
+                    updates += 1
+                    snapshots += is_snapshot
+
+        self.last_publish_stats = {
+            'books': len(frames),
+            'streams': len(subscriptions),
+            'updates': updates,
+            'snapshots': snapshots,
+            'bytes': total_bytes,
+            'cpu_ms': (time.process_time() - cpu_start) * 1000
+        }
+        return self.last_publish_stats
+
+    def send_snapshot(self, subscription: StreamSubscription, market_update: ExchangeDataUpdate,
+                      frames: Dict[str, BookStateFrame]) -> None:
+        """Queue a full snapshot of each subscribed book (stream start / explicit resync)"""
+        with self._lock:
+            for book_id in subscription.book_ids:
+                frame = frames.get(book_id)
+                if frame is None:
+                    continue
+                state = subscription.books[book_id]
+                state.updates_since_snapshot = self.snapshot_interval  # Forces a snapshot
+                update, _ = self._build_update(state, market_update, frame, frame.fingerprint(), False)
+                subscription.queue.put(update)
+                subscription.bytes_sent += update.ByteSize()
+                subscription.updates_sent += 1
+                subscription.snapshots_sent += 1
+
+    def _delta_base(self, state: BookStreamState) -> Optional[FrameFingerprint]:
+        """Client state the delta is computed against (None forces a snapshot)"""
+        if state.last_sent is None or state.updates_since_snapshot >= self.snapshot_interval:
+            return None
+        # Acks only decide when to resync: a client that has acknowledged the last snapshot (so is not
+        # still waiting for it) but lags too far behind the stream gets a fresh one
+        if (state.acked_sequence >= state.snapshot_sequence
+                and state.last_sent_sequence - state.acked_sequence >= self.history_size):
+            return None
+        return state.last_sent
+
+    def _build_update(self, state: BookStreamState, market_update: ExchangeDataUpdate, frame: BookStateFrame,
+                      fingerprint: FrameFingerprint, is_replay: bool):
+        update = ExchangeDataUpdate()
+        update.CopyFrom(market_update)
+        update.book_id = frame.book_id
+        update.is_replay_data = is_replay
+        update.sequence_number = state.next_sequence
+
+        base = self._delta_base(state)
+        if base is not None and (base.orders.keys() - fingerprint.orders.keys() or base.trades - fingerprint.trades):
+            base = None  # Something was removed; only a snapshot can express that
+
+        if base is None:
+            update.is_initial_state = True
+            for name, data in frame.sections.items():
+                getattr(update, name).MergeFromString(data)
+            for data in frame.orders.values():
+                update.orders_data.add().MergeFromString(data)
+            for data in frame.trades.values():
+                update.trades.add().MergeFromString(data)
+            state.snapshot_sequence = state.next_sequence
+            state.updates_since_snapshot = 0
+        else:
+            for name, data in frame.sections.items():
+                if base.sections.get(name) != fingerprint.sections[name]:
+                    getattr(update, name).MergeFromString(data)
+            for order_id, data in frame.orders.items():
+                if base.orders.get(order_id) != fingerprint.orders[order_id]:
+                    update.orders_data.add().MergeFromString(data)
+            for trade_id, data in frame.trades.items():
+                if trade_id not in base.trades:
+                    update.trades.add().MergeFromString(data)
+            state.updates_since_snapshot += 1
+
+        state.last_sent = fingerprint
+        state.next_sequence += 1
+
+        return update, base is None
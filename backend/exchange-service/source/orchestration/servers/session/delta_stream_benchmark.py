@@ -0,0 +1,220 @@
+"""
+Load test for the per-book session exchange stream: bytes and CPU per bin, checked against the
+state the session-service client reconstructs.
+
+    python -m source.orchestration.servers.session.delta_stream_benchmark --books 1 20 100 --minutes 10
+
+For each book count an exchange group is built as bin_benchmark builds it (a real AppState, managers and
+Exchange per book; UUID book ids, as StreamExchangeData requires) and served by
+MultiBookSessionServiceImpl on a local gRPC port. The session-service half
+(backend/session-service, python -m source.clients.exchange_stream_benchmark) runs in its own process
+and opens one stream per book with ExchangeClient.stream_exchange_data, as sessions do, acknowledging
+with ExchangeClient.send_heartbeat. The bins then go through process_market_data_bin, and the equity
+callback builds every book's frame and queues the per-stream updates.
+
+Each book count runs twice: with a snapshot interval of 0 (the full book state every bin) and with
+SESSION_SNAPSHOT_INTERVAL (deltas). Per bin the table shows the CPU of the session callback - collecting
+and serializing the book states, then diffing and queueing (that last part alone in brackets) - the
+bytes queued, split into the market data every update carries and the book state per book, and the CPU
+of the client process.
+
+The check: after every update the client digests the book state ExchangeClient._apply_exchange_update
+left, which must equal the digest of the frame the server published at that sequence, for every book
+and sequence; and each book's final heartbeat must have been matched to its stream, acknowledging the
+last sequence sent.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+
+os.environ.setdefault('ENVIRONMENT', 'benchmark')
+
+from source.config import app_config
+from source.orchestration.bin_benchmark import build_group, make_bins, quiet, run_bins
+from source.orchestration.servers.session.delta_stream import BookStateFrame, DeltaStreamManager
+from source.orchestration.servers.session.session_server_impl import MultiBookSessionServiceImpl
+
+SESSION_SERVICE = Path(__file__).resolve().parents[5] / 'session-service'
+
+
+def state_digest(sections: dict, orders: dict, trades: dict) -> str:
+    """Digest of a book state; session-service exchange_stream_benchmark digests client state the same way"""
+    digest = hashlib.sha256()
+    for kind, items in (('section', sections), ('order', orders), ('trade', trades)):
+        for key in sorted(items):
+            data = items[key]
+            digest.update(f"{kind}:{key}:{len(data)}:".encode())
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def frame_digest(frame: BookStateFrame) -> str:
+    return state_digest(frame.sections, frame.orders, frame.trades)
+
+
+class RecordingSessionService(MultiBookSessionServiceImpl):
+    """The session service, recording what it publishes per book and sequence and its cost per bin"""
+
+    def __init__(self, exchange_group_manager, snapshot_interval: int):
+        super().__init__(exchange_group_manager)
+        self._delta_streams = DeltaStreamManager()
+        self._delta_streams.snapshot_interval = snapshot_interval  # 0 (a snapshot every bin) is not the default
+        self._record_lock = threading.Lock()
+        self._frames = {}
+        self.published = {}  # (book_id, sequence) -> frame digest
+        self.acked = {}  # book_id -> highest acknowledged sequence
+        self.bin_stats = []
+
+    def _build_book_frames(self, book_ids):
+        self._frames = super()._build_book_frames(book_ids)
+        return self._frames
+
+    def _record_published(self, book_ids):
+        for book_id in book_ids:
+            frame = self._frames.get(book_id)
+            for subscription in self._delta_streams.subscriptions_for_book(book_id):
+                self.published[(book_id, subscription.books[book_id].last_sent_sequence)] = frame_digest(frame)
+
+    def _send_initial_state_for_books(self, subscription):
+        with self._record_lock:
+            super()._send_initial_state_for_books(subscription)
+            self._record_published(subscription.book_ids)
+
+    def _on_market_data_update(self, update_data):
+        with self._record_lock:
+            started = time.thread_time()
+            super()._on_market_data_update(update_data)
+            cpu = time.thread_time() - started
+            self._record_published(list(self._frames))
+
+        stats = dict(self._delta_streams.last_publish_stats)
+        stats['callback_cpu'] = cpu
+        stats['market_bytes'] = stats['updates'] * self._latest_market_update.ByteSize()
+        self.bin_stats.append(stats)
+
+    def Heartbeat(self, request, context):
+        response = super().Heartbeat(request, context)
+        for subscription in self._delta_streams.subscriptions_for_book(request.book_id):
+            acked = subscription.books[request.book_id].acked_sequence
+            self.acked[request.book_id] = max(self.acked.get(request.book_id, 0), acked)
+        return response
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('localhost', 0))
+        return s.getsockname()[1]
+
+
+def _wait_for_streams(service: RecordingSessionService, client: subprocess.Popen, book_ids: list,
+                      timeout: float = 120.0):
+    """Until every book has a stream whose initial snapshot is queued"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if client.poll() is not None:
+            raise RuntimeError(f"client exited before subscribing:\n{client.stderr.read()}")
+        if all(any(s.updates_sent for s in service._delta_streams.subscriptions_for_book(book_id))
+               for book_id in book_ids):
+            return
+        time.sleep(0.05)
+    raise TimeoutError(f"{len(book_ids)} streams not subscribed within {timeout:.0f}s")
+
+
+def run(n_books: int, n_symbols: int, n_minutes: int, snapshot_interval: int, heartbeat_every: int,
+        seed: int = 0) -> dict:
+    """Serve n_books to the session-service client over n_minutes bins; checked stats for the run"""
+    rng = random.Random(seed)
+    book_ids = [str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(n_books)]
+    group = build_group(n_books, n_symbols, seed, book_ids=book_ids)
+    bins = make_bins(n_symbols, n_minutes, seed)
+    final_sequence = n_minutes + 1  # Initial snapshot, then one update per bin
+
+    port = _free_port()
+    with quiet():
+        service = RecordingSessionService(group, snapshot_interval)
+        service.start_sync_server(port)
+
+    client = subprocess.Popen(
+        [sys.executable, '-m', 'source.clients.exchange_stream_benchmark', '--endpoint', f"localhost:{port}",
+         '--books', ','.join(book_ids), '--final-sequence', str(final_sequence),
+         '--heartbeat-every', str(heartbeat_every)],
+        cwd=SESSION_SERVICE, env={**os.environ, 'PYTHONPATH': str(SESSION_SERVICE)},
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True
+    )
+    try:
+        with quiet():
+            _wait_for_streams(service, client, book_ids)
+        run_bins(group, bins)
+        stdout, stderr = client.communicate(timeout=300)
+        if client.returncode:
+            raise RuntimeError(f"client failed:\n{stderr}")
+    finally:
+        if client.poll() is None:
+            client.kill()
+        with quiet():
+            service.stop()
+
+    received = json.loads(stdout.strip().splitlines()[-1])
+    for book_id in book_ids:
+        digests = received['digests'].get(book_id, {})
+        assert sorted(map(int, digests)) == list(range(1, final_sequence + 1)), f"book {book_id} missed updates"
+        for sequence, digest in digests.items():
+            assert digest == service.published[(book_id, int(sequence))], \
+                f"book {book_id}: client state differs from the published frame at sequence {sequence}"
+        assert service.acked.get(book_id) == final_sequence, \
+            f"book {book_id}: heartbeats acknowledged {service.acked.get(book_id, 0)} of {final_sequence}"
+
+    stats = service.bin_stats
+    assert len(stats) == n_minutes, f"{len(stats)} callbacks for {n_minutes} bins"
+    return {
+        'callback_ms': sum(s['callback_cpu'] for s in stats) / n_minutes * 1000,
+        'publish_ms': sum(s['cpu_ms'] for s in stats) / n_minutes,
+        'bytes': sum(s['bytes'] for s in stats) / n_minutes,
+        'market_bytes': sum(s['market_bytes'] for s in stats) / n_minutes,
+        'snapshots': sum(s['snapshots'] for s in stats),
+        'client_ms': received['cpu'] / n_minutes * 1000,
+        'updates': received['updates'],
+        'heartbeats': received['heartbeats']
+    }
+
+
+def benchmark(books, n_symbols: int, n_minutes: int, heartbeat_every: int, seed: int = 0):
+    interval = app_config.session_snapshot_interval
+    print(f"symbols={n_symbols} minutes={n_minutes} snapshot interval={interval} "
+          f"heartbeat every {heartbeat_every} updates")
+    print(f"\n{'books':>6} {'mode':>9} {'callback ms/bin':>18} {'KB/bin':>8} {'market KB':>9} "
+          f"{'book KB/book':>12} {'snapshots':>9} {'client ms/bin':>13}")
+    for n_books in books:
+        for mode, snapshot_interval in (('snapshot', 0), ('delta', interval)):
+            result = run(n_books, n_symbols, n_minutes, snapshot_interval, heartbeat_every, seed)
+            book_kb = (result['bytes'] - result['market_bytes']) / n_books / 1024
+            callback = f"{result['callback_ms']:.1f} ({result['publish_ms']:.1f})"
+            print(f"{n_books:>6} {mode:>9} {callback:>18} {result['bytes'] / 1024:>8.1f} "
+                  f"{result['market_bytes'] / 1024:>9.1f} {book_kb:>12.2f} {result['snapshots']:>9} "
+                  f"{result['client_ms']:>13.1f}")
+    print("\nclient reconstruction ok: every book state matched the published frame at every sequence, "
+          "heartbeats acknowledged the last sequence of every stream")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Session exchange stream load test with client reconstruction")
+    parser.add_argument('--books', type=int, nargs='+', default=[1, 20, 100])
+    parser.add_argument('--symbols', type=int, default=200)
+    parser.add_argument('--minutes', type=int, default=10)
+    parser.add_argument('--heartbeat-every', type=int, default=3, help="updates between client heartbeats")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # The session service and the book managers log per bin, per book and per item
+    logging.disable(logging.ERROR)
+    benchmark(args.books, args.symbols, args.minutes, args.heartbeat_every, args.seed)
@@ -1,6 +1,9 @@
 # source/orchestration/servers/session/session_server_impl.py
 """
 COMPLETE Session Server Implementation - FIXED BATCHING
+
+Streams subscribe to specific books (StreamRequest.book_id, comma-separated
+for several) and receive per-book delta updates; see delta_stream.py.
 """
 
 import logging
@@ -30,6 +33,7 @@ from source.api.grpc.session_exchange_interface_pb2 import SessionStatusResponse
 
 # Import the new state managers
 from .state_managers import CompositeStateManager
+from .delta_stream import BookStateFrame, DeltaStreamManager, StreamSubscription
 
 
 class MultiBookSessionServiceImpl(SessionExchangeSimulatorServicer, BaseServiceImpl):
@@ -40,7 +44,6 @@ class MultiBookSessionServiceImpl(SessionExchangeSimulatorServicer, BaseServiceI
 
         self.exchange_group_manager = exchange_group_manager
         self.snapshot_manager = snapshot_manager
-        self._sequence_counter = 0
 
         # Initialize composite state manager
         try:
@@ -54,9 +57,10 @@ class MultiBookSessionServiceImpl(SessionExchangeSimulatorServicer, BaseServiceI
             print(f"🔥🔥🔥 SESSION SERVICE: Composite state manager not available: {e}")
             self.logger.warning(f"🔧 SESSION SERVICE: Composite state manager not available: {e}")
 
-        # Per-book stream queues
-        self._book_stream_queues: Dict[str, queue.Queue] = {}
-        self._active_streams: Dict[str, grpc.ServicerContext] = {}
+        # Per-book delta streams
+        self._delta_streams = DeltaStreamManager()
+        self._active_streams: Dict[str, StreamSubscription] = {}
+        self._latest_market_update = ExchangeDataUpdate()
 
         # gRPC Server components
         self.server = None
@@ -76,7 +80,9 @@ class MultiBookSessionServiceImpl(SessionExchangeSimulatorServicer, BaseServiceI
         """Start the session service gRPC server synchronously"""
         self.logger.info("🚀 SESSION SERVICE: Starting gRPC server")
         try:
-            self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+            # A StreamExchangeData call holds a worker thread while it streams: one per book, plus the unary calls
+            books = self.exchange_group_manager.get_all_books()
+            self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=len(books) + 10))
             add_SessionExchangeSimulatorServicer_to_server(self, self.server)
             self.server.add_insecure_port(f'[::]:{port}')
             self.server.start()
@@ -84,7 +90,6 @@ class MultiBookSessionServiceImpl(SessionExchangeSimulatorServicer, BaseServiceI
             self.port = port
             self.running = True
 
-            books = self.exchange_group_manager.get_all_books()
             self.logger.info(f"✅ Session Service: STARTED on port {port}")
             self.logger.info(f"🔗 Session Service: Ready for up to {len(books)} concurrent book connections")
 
@@ -98,13 +103,15 @@ class MultiBookSessionServiceImpl(SessionExchangeSimulatorServicer, BaseServiceI
 
             response = SessionStatusResponse()
             response.book_id = request.book_id
-            response.is_connected = request.book_id in self._active_streams
-            response.connection_count = 1 if response.is_connected else 0
+            subscriptions = self._delta_streams.subscriptions_for_book(request.book_id)
+            response.is_connected = bool(subscriptions)
+            response.connection_count = len(subscriptions)
             response.last_update_timestamp = int(datetime.now().timestamp() * 1000)
-            response.next_sequence_number = 0
-            
-            if response.is_connected:
-                response.active_session_instances.append(request.session_instance_id)
+            response.next_sequence_number = self._delta_streams.next_sequence(request.book_id)
+
+            for subscription in subscriptions:
+                response.active_session_instances.append(
+                    subscription.session_instance_id or request.session_instance_id)
             
             self.logger.info(f"📊 SESSION_STATUS: book {request.book_id} - connected: {response.is_connected}")
             return response
@@ -155,54 +162,56 @@ class MultiBookSessionServiceImpl(SessionExchangeSimulatorServicer, BaseServiceI
             return response
 
     def StreamExchangeData(self, request: StreamRequest, context: grpc.ServicerContext):
-        """Stream exchange data to client"""
-        book_id_str = request.book_id
+        """Stream per-book delta updates for the requested books to client"""
+        book_ids = [book_id.strip() for book_id in request.book_id.split(',') if book_id.strip()]
 
-        try:
-            book_id = uuid.UUID(book_id_str)
-        except ValueError:
-            context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Invalid book ID format: {book_id_str}")
-            return
+        for book_id_str in book_ids:
+            try:
+                uuid.UUID(book_id_str)
+            except ValueError:
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Invalid book ID format: {book_id_str}")
+                return
 
-        self.logger.info(f"🌊 STREAM REQUEST: New stream request from book: {book_id}")
+        self.logger.info(f"🌊 STREAM REQUEST: New stream request for books: {book_ids}")
 
         if not self.exchange_group_manager or not hasattr(self.exchange_group_manager, 'book_contexts'):
             context.abort(grpc.StatusCode.INTERNAL, "No book contexts available")
             return
 
-        if book_id not in self.exchange_group_manager.book_contexts:
-            context.abort(grpc.StatusCode.NOT_FOUND, f"book {book_id} not found")
+        known_books = {str(book_id) for book_id in self.exchange_group_manager.book_contexts}
+        missing = [book_id for book_id in book_ids if book_id not in known_books]
+        if not book_ids or missing:
+            context.abort(grpc.StatusCode.NOT_FOUND, f"book {', '.join(missing) or request.book_id} not found")
             return
 
         # Track this stream
-        self._active_streams[book_id] = context
-        book_queue = self._get_or_create_book_queue(book_id)
+        subscription = self._delta_streams.subscribe(book_ids, request.session_instance_id)
+        self._active_streams[subscription.stream_id] = subscription
 
         try:
-            self.logger.info(f"🌊 STREAM REQUEST: Starting stream for book {book_id}")
-            self._send_initial_state_for_book(book_id)
+            self.logger.info(f"🌊 STREAM REQUEST: Starting stream {subscription.stream_id} for books {book_ids}")
+            if request.request_initial_state:
+                self._send_initial_state_for_books(subscription)
 
             # Stream updates
             while context.is_active():
                 try:
-                    update = book_queue.get(timeout=1.0)
+                    update = subscription.queue.get(timeout=1.0)
                     yield update
                 except queue.Empty:
                     continue
                 except Exception as e:
-                    self.logger.error(f"❌ Error sending update to book {book_id}: {e}")
+                    self.logger.error(f"❌ Error sending update to stream {subscription.stream_id}: {e}")
                     break
 
         except grpc.RpcError as e:
-            self.logger.info(f"🔌 Stream disconnected for book {book_id}: {e}")
+            self.logger.info(f"🔌 Stream {subscription.stream_id} disconnected for books {book_ids}: {e}")
         except Exception as e:
-            self.logger.error(f"❌ Unexpected error in stream for book {book_id}: {e}")
+            self.logger.error(f"❌ Unexpected error in stream for books {book_ids}: {e}")
         finally:
-            if book_id in self._active_streams:
-                del self._active_streams[book_id]
-            if book_id in self._book_stream_queues:
-                del self._book_stream_queues[book_id]
-            self.logger.info(f"🧹 Cleaned up stream for book {book_id}")
+            self._active_streams.pop(subscription.stream_id, None)
+            self._delta_streams.unsubscribe(subscription)
+            self.logger.info(f"🧹 Cleaned up stream {subscription.stream_id} for books {book_ids}")
 
     def _setup_master_callback(self):
         """Register with first book's equity manager as master trigger"""
@@ -233,133 +242,104 @@ class MultiBookSessionServiceImpl(SessionExchangeSimulatorServicer, BaseServiceI
         except Exception as e:
             print(f"🔥🔥🔥 SESSION SERVICE: EXCEPTION in callback setup: {e}")
 
-    def _get_next_sequence(self) -> int:
-        """Get next sequence number for messages"""
-        self._sequence_counter += 1
-        return self._sequence_counter
+    def _send_initial_state_for_books(self, subscription: StreamSubscription):
+        """Send a full snapshot of each subscribed book"""
+        self.logger.info(f"📤 INITIAL STATE: Sending to books {subscription.book_ids}")
 
-    def _get_or_create_book_queue(self, book_id: str) -> queue.Queue:
-        """Get or create queue for book"""
-        if book_id not in self._book_stream_queues:
-            self._book_stream_queues[book_id] = queue.Queue()
-        return self._book_stream_queues[book_id]
+        market_update = ExchangeDataUpdate()
+        market_update.CopyFrom(self._latest_market_update)
+        if not market_update.timestamp:
+            market_update.timestamp = int(datetime.now().timestamp() * 1000)
 
-    def _send_initial_state_for_book(self, book_id: str):
-        """Send initial state to book"""
-        self.logger.info(f"📤 INITIAL STATE: Sending to book {book_id}")
+        frames = self._build_book_frames(subscription.book_ids)
+        self._delta_streams.send_snapshot(subscription, market_update, frames)
 
     def _on_market_data_update(self, update_data):
-        """Handle market data updates - MAIN CALLBACK - FIXED FOR BATCHING"""
-        print(f"🔥🔥🔥 SESSION SERVICE: _on_market_data_update CALLED!")
-        print(f"🔥🔥🔥 SESSION SERVICE: Received {len(update_data) if update_data else 0} updates")
-
+        """Handle market data updates - MAIN CALLBACK - per-book delta streams"""
         try:
             if not update_data:
                 return
 
-            # FIXED: Create a SINGLE batched exchange update with ALL equity data
-            batched_exchange_update = self._create_batched_exchange_update(update_data)
-
-            # Queue the SINGLE batched update for all active books
-            for book_id in self._active_streams:
-                book_exchange_update = ExchangeDataUpdate()
-                book_exchange_update.CopyFrom(batched_exchange_update)
-                book_exchange_update.book_id = str(book_id)  # Convert UUID to string
+            # Market data part is shared by every book; book state is built once per subscribed book
+            market_update = self._create_market_update(update_data)
+            self._latest_market_update = market_update
 
-                if book_id in self._book_stream_queues:
-                    self._book_stream_queues[book_id].put(book_exchange_update)
+            frames = self._build_book_frames(self._delta_streams.subscribed_books())
+            stats = self._delta_streams.publish(market_update, frames)
 
             self.logger.info(
-                f"✅ SESSION SERVICE: Queued 1 BATCHED update (containing {len(update_data)} equity updates) for {len(self._active_streams)} active streams")
+                f"✅ SESSION SERVICE: Queued {stats['updates']} book updates ({stats['snapshots']} snapshots, "
+                f"{stats['bytes']} bytes, {stats['cpu_ms']:.1f}ms) for {stats['streams']} active streams")
 
         except Exception as e:
-            print(f"🔥🔥🔥 SESSION SERVICE: EXCEPTION in _on_market_data_update: {e}")
-            print(f"🔥🔥🔥 SESSION SERVICE: Traceback:\n{traceback.format_exc()}")
-
-    def _create_batched_exchange_update(self, update_data_list: List) -> ExchangeDataUpdate:
-        """FIXED: Create a SINGLE ExchangeDataUpdate with ALL equity data batched together"""
-        print(f"🔥🔥🔥 SESSION SERVICE: Creating BATCHED exchange update from {len(update_data_list)} market data items")
-
-        try:
-            update = ExchangeDataUpdate()
-
-            # Set common fields from first update item
-            first_update = update_data_list[0] if update_data_list else {}
-            
-            # Set timestamp from first market data item
-            if 'timestamp' in first_update:
-                timestamp_str = first_update['timestamp']
-                try:
-                    if isinstance(timestamp_str, str):
-                        market_dt = parse(timestamp_str)
-                        update.timestamp = int(market_dt.timestamp() * 1000)
-                    else:
-                        update.timestamp = int(timestamp_str)
-                except:
-                    update.timestamp = int(datetime.now().timestamp() * 1000)
+            self.logger.error(f"❌ SESSION SERVICE: Error in _on_market_data_update: {e}")
+            self.logger.error(f"❌ SESSION SERVICE: Traceback:\n{traceback.format_exc()}")
+
+    def _build_book_frames(self, book_ids) -> Dict[str, BookStateFrame]:
+        """Collect and serialize the state of each requested book once"""
+        book_contexts = {str(book_id): book_context
+                         for book_id, book_context in self.exchange_group_manager.book_contexts.items()}
+
+        frames = {}
+        for book_id in book_ids:
+            book_context = book_contexts.get(str(book_id))
+            if not book_context or not book_context.app_state:
+                continue
+
+            book_update = ExchangeDataUpdate()
+            if self._composite_state_manager:
+                self._composite_state_manager.add_book_state(book_update, book_context)
             else:
-                update.timestamp = int(datetime.now().timestamp() * 1000)
-
-            # Set sequence number
-            update.sequence_number = self._get_next_sequence()
-
-            # Generate unique broadcast ID
-            update.broadcast_id = str(uuid.uuid4())
-
-            # FIXED: Add ALL equity data to the SAME message
-            for market_data in update_data_list:
-                if 'symbol' in market_data:
-                    equity = update.equity_data.add()  # Add to repeated field
-                    equity.symbol = market_data.get('symbol', '')
-                    equity.open = float(market_data.get('open', 0))
-                    equity.high = float(market_data.get('high', 0))
-                    equity.low = float(market_data.get('low', 0))
-                    equity.close = float(market_data.get('close', 0))
-                    equity.volume = int(market_data.get('volume', 0))
-                    equity.vwap = float(market_data.get('vwap', 0))
-                    equity.currency = market_data.get('currency', 'USD')
-                    
-                    print(f"🔥🔥🔥 SESSION SERVICE: Added equity data for {equity.symbol}")
-
-            print(f"🔥🔥🔥 SESSION SERVICE: BATCHED update contains {len(update.equity_data)} equity entries")
-
-            # FIXED: Add complete exchange state for all books
-            books = self.exchange_group_manager.get_all_books()
+                # Fallback to manual collection
+                self._add_complete_book_state_FIXED(book_update, book_context)
 
-            for book_id in books:
-                book_context = self.exchange_group_manager.book_contexts.get(book_id)
-                if book_context and book_context.app_state:
-                    # Use composite state manager if available
-                    if self._composite_state_manager:
-                        self._composite_state_manager.add_book_state(update, book_context)
-                    else:
-                        # Fallback to manual collection
-                        self._add_complete_book_state_FIXED(update, book_context)
+            frames[str(book_id)] = BookStateFrame.from_update(str(book_id), book_update)
 
-            print(f"🔥🔥🔥 SESSION SERVICE: COMPLETE exchange update created with seq#{update.sequence_number}")
-            return update
+        return frames
 
-        except Exception as e:
-            print(f"🔥🔥🔥 SESSION SERVICE: EXCEPTION creating batched exchange update: {e}")
-            print(f"🔥🔥🔥 SESSION SERVICE: Traceback:\n{traceback.format_exc()}")
-            raise
+    def _create_market_update(self, update_data_list: List) -> ExchangeDataUpdate:
+        """Create the book-independent part of an update: timestamp, broadcast ID and equity data"""
+        update = ExchangeDataUpdate()
 
-    def _create_exchange_update_FIXED(self, market_data):
-        """LEGACY METHOD - REPLACED BY _create_batched_exchange_update"""
-        # This method is kept for compatibility but should no longer be used
-        # The new batching approach is in _create_batched_exchange_update
-        return self._create_batched_exchange_update([market_data])
+        # Set timestamp from first market data item
+        first_update = update_data_list[0] if update_data_list else {}
+        if 'timestamp' in first_update:
+            timestamp_str = first_update['timestamp']
+            try:
+                if isinstance(timestamp_str, str):
+                    market_dt = parse(timestamp_str)
+                    update.timestamp = int(market_dt.timestamp() * 1000)
+                else:
+                    update.timestamp = int(timestamp_str)
+            except:
+                update.timestamp = int(datetime.now().timestamp() * 1000)
+        else:
+            update.timestamp = int(datetime.now().timestamp() * 1000)
+
+        # Generate unique broadcast ID
+        update.broadcast_id = str(uuid.uuid4())
+
+        for market_data in update_data_list:
+            if 'symbol' in market_data:
+                equity = update.equity_data.add()
+                equity.symbol = market_data.get('symbol', '')
+                equity.open = float(market_data.get('open', 0))
+                equity.high = float(market_data.get('high', 0))
+                equity.low = float(market_data.get('low', 0))
+                equity.close = float(market_data.get('close', 0))
+                equity.volume = int(market_data.get('volume', 0))
+                equity.vwap = float(market_data.get('vwap', 0))
+                equity.currency = market_data.get('currency', 'USD')
+
+        return update
 
     def _add_complete_book_state_FIXED(self, update, book_context):
         """FIXED: Add complete book state to the exchange update"""
         print(f"🔥🔥🔥 SESSION SERVICE: Adding COMPLETE state for book {book_context.book_id}")
 
         import source.orchestration.app_state.state_manager as app_state_module
-        original_app_state = app_state_module.app_state
-
-        try:
-            app_state_module.app_state = book_context.app_state
 
+        with app_state_module.book_scope(book_context.app_state):
             # Add all state components
             self._add_portfolio_state_FIXED(update, book_context.app_state)
             self._add_account_state_FIXED(update, book_context.app_state)
@@ -367,9 +347,6 @@ class MultiBookSessionServiceImpl(SessionExchangeSimulatorServicer, BaseServiceI
             self._add_trade_state_FIXED(update, book_context.app_state)
             self._add_fx_state_FIXED(update, book_context.app_state)
 
-        finally:
-            app_state_module.app_state = original_app_state
-
     def _add_portfolio_state_FIXED(self, update, app_state):
         """FIXED: Add current portfolio state"""
         try:
@@ -570,12 +547,15 @@ class MultiBookSessionServiceImpl(SessionExchangeSimulatorServicer, BaseServiceI
             response.next_bin = "next"
             response.market_state = "OPEN"
             
-            # Optional: Add connection info
-            if hasattr(response, 'connection_info') and response.connection_info:
-                response.connection_info.active_connections = 1
-                response.connection_info.next_expected_sequence = 0
-                response.connection_info.last_sent_timestamp = response.timestamp
-                response.connection_info.is_primary_connection = True
+            # Acknowledge what the client has applied; deltas are computed from there
+            self._delta_streams.acknowledge(request.book_id, request.last_received_sequence,
+                                            request.session_instance_id)
+
+            subscriptions = self._delta_streams.subscriptions_for_book(request.book_id)
+            response.connection_info.active_connections = len(subscriptions)
+            response.connection_info.next_expected_sequence = self._delta_streams.next_sequence(request.book_id)
+            response.connection_info.last_sent_timestamp = response.timestamp
+            response.connection_info.is_primary_connection = True
             
             self.logger.info(f"🏥 HEARTBEAT: Responding with status {response.status} for book {request.book_id}")
             return response
@@ -36,13 +36,10 @@ class CompositeStateManager:
 
     def add_book_state(self, update: ExchangeDataUpdate, book_context):
         """Add state from a single book using all state managers"""
-        # Temporarily set app_state to get data
+        # Temporarily bind the book's app_state to get data
         import source.orchestration.app_state.state_manager as app_state_module
-        original_app_state = app_state_module.app_state
-
-        try:
-            app_state_module.app_state = book_context.app_state
 
+        with app_state_module.book_scope(book_context.app_state):
             # Use all state managers to populate the update
             self.order_manager.add_current_orders_state(update)
             self.portfolio_manager.add_current_portfolio_state(update)
@@ -52,7 +49,4 @@ class CompositeStateManager:
             self.universe_manager.add_current_universe_state(update)
             self.risk_manager.add_current_risk_state(update)
             self.returns_manager.add_current_returns_state(update)
-            self.impact_manager.add_current_impact_state(update)
-
-        finally:
-            app_state_module.app_state = original_app_state
\ No newline at end of file
+            self.impact_manager.add_current_impact_state(update)
\ No newline at end of file
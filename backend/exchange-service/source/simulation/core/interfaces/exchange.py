@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Dict
+from typing import Dict, List
 from source.simulation.core.interfaces.market import Market_ABC
 
 
@@ -14,6 +14,11 @@ class Exchange_ABC(ABC):
         """Update market data for an instrument with new minute bar"""
         pass
 
+    @abstractmethod
+    def update_market_data_batch(self, minute_bars: List[Dict]) -> None:
+        """Update market data for every instrument of one minute"""
+        pass
+
     @abstractmethod
     def get_symbols(self) -> list[str]:
         """Get list of all symbols/instruments currently in the exchange"""
@@ -1,32 +1,30 @@
-from typing import Dict, List
+from decimal import Decimal
+from typing import Dict, List, Optional
 import logging
 from threading import RLock
 
+import numpy as np
+
+from source.config import app_config
 from source.simulation.core.interfaces.exchange import Exchange_ABC
 from source.simulation.core.interfaces.market import Market_ABC
 from source.simulation.exchange.market_impl import Market
+from source.simulation.exchange.execution.kernel import ExecutionKernel
+from source.utils.timezone_utils import ensure_timezone_aware
 
 logger = logging.getLogger(__name__)
 
 
 class Exchange(Exchange_ABC):
-    _instance = None
-    _lock = RLock()
-
-    def __new__(cls):
-        with cls._lock:
-            if cls._instance is None:
-                cls._instance = super(Exchange, cls).__new__(cls)
-                cls._instance._initialized = False
-            return cls._instance
+    """Per-book exchange: each book context owns its own markets"""
 
     def __init__(self):
-        if not self._initialized:  # Only initialize once
-            super().__init__()
-            self.instrument_to_market: Dict[str, Market] = {}
-            self._market_lock = RLock()
-            self.logger = logging.getLogger(self.__class__.__name__)
-            self._initialized = True
+        super().__init__()
+        self.instrument_to_market: Dict[str, Market] = {}
+        self._lock = RLock()
+        self._market_lock = RLock()
+        self._kernel: Optional[ExecutionKernel] = None
+        self.logger = logging.getLogger(self.__class__.__name__)
 
     def get_market(self, instrument: str) -> Market_ABC:
         """Get or create a VWAP market for an instrument"""
@@ -57,13 +55,146 @@ class Exchange(Exchange_ABC):
         except Exception as e:
             raise ValueError(f"Error updating market data: {e}")
 
+    def update_market_data_batch(self, minute_bars: List[dict]) -> None:
+        """Update market data for every instrument of one minute.
+
+        With EXECUTION_KERNEL enabled, markets without open orders are decayed
+        by the execution kernel in one columnar pass; markets with orders or
+        cancel requests still run Market.update_market_state, with their
+        impact state handed over to and from the kernel around it.
+        """
+        if not app_config.execution_kernel:
+            for minute_bar in minute_bars:
+                self.update_market_data(minute_bar)
+            return
+
+        try:
+            from source.orchestration.app_state.state_manager import app_state
+
+            start_bin_timestamp = ensure_timezone_aware(app_state.get_current_timestamp())
+            stop_bin_timestamp = ensure_timezone_aware(app_state.get_next_timestamp())
+
+            symbols = [minute_bar.get('symbol') for minute_bar in minute_bars]
+            if not all(symbols):
+                raise ValueError("Missing symbol in minute bar data")
+
+            markets = [self.get_market(symbol) for symbol in symbols]
+            kernel = self._get_kernel(symbols)
+
+            prices = kernel.price.copy()
+            volumes = np.zeros(len(kernel.symbols), dtype=np.int64)
+            idle = np.zeros(len(kernel.symbols), dtype=bool)
+            idle_bars = []
+
+            for symbol, market, minute_bar in zip(symbols, markets, minute_bars):
+                if market.has_open_orders():
+                    self._sync_market_impact(kernel, symbol, market)
+                    market.update_market_state(minute_bar)
+                    snapshot = market.impact.get_impact_state(symbol)
+                    if snapshot is not None:
+                        kernel.impact_model.load_snapshot(symbol, snapshot)
+                    continue
+
+                market.update_idle_market_state(minute_bar, stop_bin_timestamp)
+                i = kernel.index_of(symbol)
+                idle[i] = True
+                prices[i] = float(minute_bar['price'])
+                volumes[i] = int(minute_bar['volume'])
+                idle_bars.append(minute_bar)
+
+            if idle_bars:
+                kernel.process_minute(start_bin_timestamp, stop_bin_timestamp, prices, volumes, mask=idle)
+                self._publish_kernel_impacts(kernel, idle_bars, start_bin_timestamp, stop_bin_timestamp)
+
+        except Exception as e:
+            raise ValueError(f"Error updating market data: {e}")
+
+    def _get_kernel(self, symbols: List[str]) -> ExecutionKernel:
+        """The exchange's kernel, rebuilt (carrying its state over) when new symbols appear"""
+        with self._market_lock:
+            if self._kernel is not None and self._kernel.covers(symbols):
+                return self._kernel
+
+            self._release_kernel()
+            self._kernel = ExecutionKernel(list(self.instrument_to_market.keys()))
+            for symbol, market in self.instrument_to_market.items():
+                snapshot = market.impact.get_impact_state(symbol)
+                if snapshot is not None:
+                    self._kernel.impact_model.load_snapshot(symbol, snapshot)
+            return self._kernel
+
+    def _release_kernel(self) -> None:
+        """Hand all kernel-held impact state back to the markets and drop the kernel"""
+        with self._market_lock:
+            kernel, self._kernel = self._kernel, None
+            if kernel is None:
+                return
+            for symbol in kernel.symbols:
+                market = self.instrument_to_market.get(symbol)
+                if market is not None:
+                    self._sync_market_impact(kernel, symbol, market)
+
+    @staticmethod
+    def _sync_market_impact(kernel: ExecutionKernel, symbol: str, market: Market) -> None:
+        """Hand the kernel's impact state to the Market when the kernel has decayed it further"""
+        snapshot = kernel.impact_model.get_snapshot(symbol)
+        if snapshot is None:
+            return
+        current = market.impact.get_impact_state(symbol)
+        if current is None or ensure_timezone_aware(current.end_timestamp) < snapshot.end_timestamp:
+            market.impact.set_impact_state(symbol, snapshot)
+
+    @staticmethod
+    def _publish_kernel_impacts(kernel: ExecutionKernel, minute_bars: List[dict],
+                                start_bin_timestamp, stop_bin_timestamp) -> None:
+        """Report kernel-decayed impact to the impact manager, as ImpactState does per bucket"""
+        from source.orchestration.app_state.state_manager import app_state
+        if not app_state.impact_manager:
+            return
+
+        for minute_bar in minute_bars:
+            symbol = minute_bar['symbol']
+            base_price = Decimal(str(minute_bar['price']))
+            current_impact = kernel.impact_model.get_impact(symbol) or Decimal('0')
+            app_state.impact_manager.update_impact(
+                symbol=symbol,
+                currency=str(minute_bar['currency']),
+                base_price=base_price,
+                impacted_price=round(base_price * (Decimal('1') + current_impact), 2),
+                trade_volume=0,
+                total_volume=int(minute_bar['volume']),
+                start_timestamp=start_bin_timestamp,
+                end_timestamp=stop_bin_timestamp,
+                trade_id="0",
+                impact_type="decay"
+            )
+
+    def build_execution_kernel(self, symbols: Optional[List[str]] = None,
+                               tolerance: float = 1e-6) -> ExecutionKernel:
+        """Build a columnar execution kernel seeded from the current per-Market state"""
+        with self._market_lock:
+            symbols = symbols if symbols is not None else list(self.instrument_to_market.keys())
+            kernel = ExecutionKernel(symbols, tolerance=tolerance)
+            kernel.load_from_markets(self.instrument_to_market)
+
+        from source.orchestration.app_state.state_manager import app_state
+        if app_state.portfolio_manager:
+            kernel.set_positions({
+                symbol: position.quantity
+                for symbol, position in app_state.portfolio_manager.get_all_positions().items()
+            })
+
+        return kernel
+
     def remove_market(self, instrument: str) -> None:
         """Remove a market (mainly for testing/cleanup)"""
         with self._lock:
             if instrument in self.instrument_to_market:
+                self._release_kernel()
                 del self.instrument_to_market[instrument]
 
     def cleanup(self) -> None:
         """Cleanup all markets (for shutdown)"""
         with self._lock:
-            self.instrument_to_market.clear()
\ No newline at end of file
+            self.instrument_to_market.clear()
+            self._kernel = None
\ No newline at end of file
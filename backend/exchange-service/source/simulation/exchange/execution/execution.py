@@ -1,11 +1,14 @@
 # source/exchange/impl/sim/execution.py
 from decimal import Decimal
 from datetime import datetime
+import bisect
+import heapq
+import itertools
 import uuid
 import time
 from threading import RLock
 from datetime import timedelta
-from typing import Dict
+from typing import Dict, List, Tuple
 
 from source.simulation.core.enums.side import Side, LS
 from source.simulation.core.interfaces.market import Market_ABC
@@ -25,7 +28,13 @@ class ExecutionManager:
         self.logger = get_exchange_logger(f"{__name__}:{instrument}")
         self._lock = RLock()
         self.account = Account()
-        self._pending_executions = {}
+
+        # Time-ordered heap of (timestamp, bucket_seq, seq, action, order) entries.
+        # bucket_seq is the sequence number of the first event scheduled at that
+        # timestamp, so popped events can be replayed in scheduling order.
+        self._pending_executions = []
+        self._pending_bucket_seq: Dict[datetime, int] = {}
+        self._pending_seq = itertools.count()
 
         # Execution statistics
         self._total_executions = 0
@@ -52,11 +61,8 @@ class ExecutionManager:
                 self.logger.info(f"   Remaining Qty: {order.get_remaining_qty()}")
                 self.logger.info(f"   Transaction ID: {txn_id}")
 
-                if timestamp not in self._pending_executions:
-                    self._pending_executions[timestamp] = []
-
                 # Store the cancellation request
-                self._pending_executions[timestamp].append(('CANCEL', order, timestamp))
+                self._push_pending('CANCEL', order, timestamp)
 
                 self.logger.log_business_event("CANCELLATION_SCHEDULED", {
                     "order_id": order.get_order_id(),
@@ -85,10 +91,7 @@ class ExecutionManager:
                 self.logger.info(f"   Participation Rate: {order.get_participation_rate()}")
                 self.logger.info(f"   Transaction ID: {txn_id}")
 
-                if timestamp not in self._pending_executions:
-                    self._pending_executions[timestamp] = []
-
-                self._pending_executions[timestamp].append(('FILL', order, timestamp))
+                self._push_pending('FILL', order, timestamp)
 
                 self.logger.log_business_event("EXECUTION_SCHEDULED", {
                     "order_id": order.get_order_id(),
@@ -113,17 +116,12 @@ class ExecutionManager:
         print(f"🔥🔥🔥 Instrument: {self.instrument}")
         print(f"🔥🔥🔥 Time window: {prv_time} to {current_time}")
         print(f"🔥🔥🔥 Price: {price}, Currency: {currency}")
-        print(f"🔥🔥🔥 Pending executions buckets: {len(self._pending_executions)}")
-
-        for exec_time, executions in self._pending_executions.items():
-            print(f"🔥🔥🔥 Bucket {exec_time}: {len(executions)} executions")
-            for action, order, timestamp in executions:
-                print(f"🔥🔥🔥   - {action}: {order.get_order_id()}")
+        print(f"🔥🔥🔥 Pending executions: {len(self._pending_executions)}")
 
         with transaction_scope("process_executions", self.logger,
-                               instrument=self.instrument, prv_time=to_iso_string(prv_time),
-                               current_time=to_iso_string(current_time), currency=currency,
-                               price=str(price)) as master_txn_id:
+                               lambda: {"instrument": self.instrument, "prv_time": to_iso_string(prv_time),
+                                        "current_time": to_iso_string(current_time), "currency": currency,
+                                        "price": str(price)}) as master_txn_id:
 
             start_time = time.time()
             self._execution_start_time = datetime.now()
@@ -134,42 +132,38 @@ class ExecutionManager:
                 self.logger.info("=" * 120)
                 self.logger.info(f"⏰ Time Window: {prv_time} to {current_time}")
                 self.logger.info(f"💰 Market Data: Price={price}, Currency={currency}")
-                self.logger.info(f"📊 Pending Executions: {len(self._pending_executions)} time buckets")
-
-                # Collect all relevant executions
-                relevant_executions = []
-                bucket_times = [prv_time, current_time]
-
-                self.logger.info(f"🔍 SCANNING_PENDING_EXECUTIONS:")
-                for exec_time, executions in self._pending_executions.items():
-                    exec_time = ensure_timezone_aware(exec_time)
-                    current_time_tz = ensure_timezone_aware(current_time)
-
-                    # Convert to same timezone for comparison
-                    if exec_time.tzinfo != current_time_tz.tzinfo:
-                        exec_time = exec_time.astimezone(current_time_tz.tzinfo)
-
-                    if exec_time <= current_time_tz:
-                        self.logger.info(f"   Found {len(executions)} executions at {exec_time}")
-
-                        for action, order, timestamp in executions:
-                            timestamp = ensure_timezone_aware(timestamp)
-                            prv_time_tz = ensure_timezone_aware(prv_time)
-
-                            if action == "CANCEL":
-                                self.logger.info(f"     CANCEL: {order.get_order_id()} at {timestamp}")
-                                relevant_executions.append((timestamp, action, order))
-                                bucket_times.append(max(prv_time_tz, timestamp))
-                            else:  # FILL
-                                order_start = ensure_timezone_aware(order.get_start_timestamp())
-                                self.logger.info(f"     FILL: {order.get_order_id()} at {order_start}")
-                                relevant_executions.append((order_start, action, order))
-                                bucket_times.append(max(prv_time_tz, order_start))
-
-                bucket_times = sorted(list(set(bucket_times)))
+                self.logger.info(f"📊 Pending Executions: {len(self._pending_executions)} events")
+
+                # Pop only the events due by current_time, in scheduling order
+                self.logger.info(f"🔍 POPPING_DUE_EXECUTIONS:")
+                due_executions = self._pop_due_executions(current_time)
+
+                # Split into fills (in scheduling order) and cancels keyed by bucket end
+                fill_events = []
+                cancels_by_time: Dict[datetime, list] = {}
+                bucket_times = {prv_time, current_time}
+
+                for action, order, timestamp in due_executions:
+                    if action == "CANCEL":
+                        self.logger.info(f"     CANCEL: {order.get_order_id()} at {timestamp}")
+                        cancels_by_time.setdefault(timestamp, []).append(order.get_order_id())
+                        bucket_times.add(max(prv_time, timestamp))
+                    else:  # FILL
+                        order_start = ensure_timezone_aware(order.get_start_timestamp())
+                        self.logger.info(f"     FILL: {order.get_order_id()} at {order_start}")
+                        fill_events.append((order_start, order))
+                        bucket_times.add(max(prv_time, order_start))
+
+                bucket_times = sorted(bucket_times)
                 self.logger.info(f"📅 PROCESSING_BUCKETS: {len(bucket_times) - 1} time buckets")
                 self.logger.debug(f"   Bucket Times: {bucket_times}")
 
+                # Fills become eligible once their start precedes the bucket end; sweep
+                # them in start order while keeping scheduling order among eligible fills
+                fill_sweep = sorted(range(len(fill_events)), key=lambda idx: fill_events[idx][0])
+                sweep_pos = 0
+                eligible_fills = []
+
                 # Process each bucket within the current minute bar
                 execution_count = 0
                 cancellation_count = 0
@@ -188,26 +182,20 @@ class ExecutionManager:
                     self.logger.info(f"   Bucket Volume: {bucket_volume:,}")
 
                     # Get active orders in this bucket
+                    while sweep_pos < len(fill_sweep) and fill_events[fill_sweep[sweep_pos]][0] < bucket_end:
+                        bisect.insort(eligible_fills, fill_sweep[sweep_pos])
+                        sweep_pos += 1
+
                     bucket_orders = []
-                    bucket_cancel_orders = []
-
-                    for exec_time, action, order in relevant_executions:
-                        exec_time = ensure_timezone_aware(exec_time)
-                        bucket_end_tz = ensure_timezone_aware(bucket_end)
-
-                        # Convert to same timezone for comparison
-                        if exec_time.tzinfo != bucket_end_tz.tzinfo:
-                            exec_time = exec_time.astimezone(bucket_end_tz.tzinfo)
-
-                        if action == "FILL":
-                            if exec_time < bucket_end_tz:
-                                if order.get_remaining_qty() > 0:
-                                    bucket_orders.append((order, exec_time))
-                                    self.logger.debug(f"     Added FILL: {order.get_order_id()}")
-                        elif action == "CANCEL":
-                            if exec_time == bucket_end_tz:
-                                bucket_cancel_orders.append(order.get_order_id())
-                                self.logger.debug(f"     Added CANCEL: {order.get_order_id()}")
+                    for idx in eligible_fills:
+                        exec_time, order = fill_events[idx]
+                        if order.get_remaining_qty() > 0:
+                            bucket_orders.append((order, exec_time))
+                            self.logger.debug(f"     Added FILL: {order.get_order_id()}")
+
+                    bucket_cancel_orders = cancels_by_time.get(bucket_end, [])
+                    for cancel_order_id in bucket_cancel_orders:
+                        self.logger.debug(f"     Added CANCEL: {cancel_order_id}")
 
                     self.logger.info(
                         f"   Bucket Contents: {len(bucket_orders)} executions, {len(bucket_cancel_orders)} cancellations")
@@ -321,11 +309,36 @@ class ExecutionManager:
 
                 self.logger.info("=" * 120)
 
+    def _push_pending(self, action: str, order: Order, timestamp: datetime) -> None:
+        """Push a scheduled event onto the pending heap (caller holds the lock)"""
+        # Naive and aware datetimes cannot be ordered against each other in the heap
+        timestamp = ensure_timezone_aware(timestamp)
+        seq = next(self._pending_seq)
+        bucket_seq = self._pending_bucket_seq.setdefault(timestamp, seq)
+        heapq.heappush(self._pending_executions, (timestamp, bucket_seq, seq, action, order))
+
+    def _pop_due_executions(self, current_time: datetime) -> List[Tuple[str, Order, datetime]]:
+        """Pop every pending event scheduled at or before current_time.
+
+        Events are returned in the order they were scheduled, grouped by
+        timestamp, matching the iteration order of the former dict-of-lists queue.
+        """
+        due = []
+        while self._pending_executions and self._pending_executions[0][0] <= current_time:
+            due.append(heapq.heappop(self._pending_executions))
+
+        for timestamp, _, _, _, _ in due:
+            self._pending_bucket_seq.pop(timestamp, None)
+
+        due.sort(key=lambda entry: (entry[1], entry[2]))
+        return [(action, order, timestamp) for timestamp, _, _, action, order in due]
+
     def clear_pending_executions(self):
         """Clear completed executions and consolidate remaining active orders"""
         with self._lock:
             cleared_count = len(self._pending_executions)
-            self._pending_executions = {}
+            self._pending_executions = []
+            self._pending_bucket_seq = {}
 
             self.logger.info(f"🧹 CLEARED_PENDING_EXECUTIONS: {cleared_count} entries")
             self.logger.debug(f"   Execution manager ready for next market data")
@@ -339,8 +352,8 @@ class ExecutionManager:
         end_timestamp = ensure_timezone_aware(end_timestamp)
 
         with transaction_scope("execute_none_impact_decay", self.logger,
-                               instrument=self.instrument, price=str(price),
-                               volume=bucket_volume) as txn_id:
+                               lambda: {"instrument": self.instrument, "price": str(price),
+                                        "volume": bucket_volume}) as txn_id:
             self.logger.info(f"🔄 IMPACT_DECAY_PROCESSING: {self.instrument}")
             self.logger.info(f"   Time Window: {start_timestamp} -> {end_timestamp}")
             self.logger.info(f"   No trades in this bucket")
@@ -387,8 +400,8 @@ class ExecutionManager:
         end_timestamp = ensure_timezone_aware(end_timestamp)
 
         with transaction_scope("execute_fill", self.logger,
-                               order_id=order.get_order_id(), instrument=self.instrument,
-                               volume_allocation=volume_allocation, price=str(price)) as txn_id:
+                               lambda: {"order_id": order.get_order_id(), "instrument": self.instrument,
+                                        "volume_allocation": volume_allocation, "price": str(price)}) as txn_id:
 
             fill_start_time = time.time()
 
@@ -583,8 +596,8 @@ class ExecutionManager:
         end_timestamp = ensure_timezone_aware(end_timestamp)
 
         with transaction_scope("single_fill", self.logger,
-                               trade_id=trade_id, fill_qty=str(fill_qty),
-                               is_risk_off=is_risk_off, order_id=order.get_order_id()) as txn_id:
+                               lambda: {"trade_id": trade_id, "fill_qty": str(fill_qty),
+                                        "is_risk_off": is_risk_off, "order_id": order.get_order_id()}) as txn_id:
 
             fill_start_time = time.time()
 
@@ -1008,7 +1021,7 @@ class ExecutionManager:
                 'total_cancellations': self._total_cancellations,
                 'total_trade_volume': str(self._total_trade_volume),
                 'pending_executions_count': len(self._pending_executions),
-                'pending_executions_times': [to_iso_string(ts) for ts in self._pending_executions.keys()],
+                'pending_executions_times': [to_iso_string(ts) for ts in sorted(self._pending_bucket_seq)],
                 'uptime_seconds': uptime,
                 'execution_start_time': to_iso_string(
                     self._execution_start_time) if self._execution_start_time else None,
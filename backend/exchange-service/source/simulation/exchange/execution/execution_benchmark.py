@@ -0,0 +1,400 @@
+"""
+Replay regression check and benchmark for ExecutionManager's pending-event heap.
+
+    python -m source.simulation.exchange.execution.execution_benchmark --check-minutes 300 --orders 10 100 1000
+
+Drives two execution managers through the same synthetic session, minute by minute, the way
+Market.update_market_data does: schedule cancellations and fills, process_executions, then
+clear_pending_executions. LegacyExecutionManager keeps the original dict-of-lists queue and rescans
+every bucket; the other uses the heap. Timestamps arrive naive, aware UTC and aware New York time.
+Fill/cancel/decay calls are recorded instead of touching the account and impact state. The check
+asserts both managers make the same calls in the same order with the same bucket boundaries. The
+benchmark then times process_executions at growing numbers of pending orders per minute.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import random
+import time
+import zoneinfo
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+from source.exchange_logging.context import transaction_scope
+from source.simulation.core.enums.side import Side
+from source.simulation.exchange.execution.execution import ExecutionManager
+from source.simulation.exchange.order_impl import Order
+from source.utils.timezone_utils import ensure_timezone_aware, to_iso_string
+
+NEW_YORK = zoneinfo.ZoneInfo("America/New_York")
+SESSION_START = datetime(2025, 3, 3, 14, 30)
+
+
+class _VolumeTracker:
+    def get_current_minute_volume(self) -> int:
+        return 50_000
+
+    def get_available_volume(self, start_timestamp: datetime, end_timestamp: datetime) -> int:
+        return 1_000
+
+
+class _Market:
+    volume_tracker = _VolumeTracker()
+
+
+def _utc(timestamp: datetime) -> datetime:
+    return ensure_timezone_aware(timestamp).astimezone(timezone.utc)
+
+
+class RecordingMixin:
+    """Record fills, cancels and decay steps instead of applying them"""
+
+    def _record(self, *call):
+        self.calls.append(call)
+
+    def _execute_none(self, start_timestamp, end_timestamp, currency, price, bucket_volume):
+        self._record('NONE', _utc(start_timestamp), _utc(end_timestamp))
+
+    def _execute_fill(self, order, timestamp, currency, price, volume_allocation, bucket_volume,
+                      start_timestamp, end_timestamp):
+        quantity = min(order.get_remaining_qty(), 100)
+        order.set_remaining_qty(order.get_remaining_qty() - quantity)
+        self._record('FILL', order.get_order_id(), _utc(start_timestamp), _utc(end_timestamp), quantity)
+        return Decimal(quantity), [f"T{len(self.calls)}"]
+
+    def _execute_cancel(self, order, timestamp):
+        order.set_remaining_qty(0)
+        self._record('CANCEL', order.get_order_id(), _utc(timestamp))
+
+
+class HeapExecutionManager(RecordingMixin, ExecutionManager):
+    def __init__(self, instrument, market):
+        super().__init__(instrument, market)
+        self.calls = []
+
+
+class LegacyExecutionManager(RecordingMixin, ExecutionManager):
+    """The original dict-of-lists queue: every bucket rescans every pending event (process_executions verbatim)"""
+
+    def __init__(self, instrument, market):
+        super().__init__(instrument, market)
+        self.calls = []
+        self._pending_executions = {}
+
+    def _push_pending(self, action, order, timestamp):
+        self._pending_executions.setdefault(timestamp, []).append((action, order, timestamp))
+
+    def clear_pending_executions(self):
+        self._pending_executions = {}
+
+    def process_executions(self, prv_time: datetime, current_time: datetime, currency: str, price: Decimal):
+        """Process all scheduled executions for the current time window"""
+
+        # Ensure timezone-aware timestamps
+        prv_time = ensure_timezone_aware(prv_time)
+        current_time = ensure_timezone_aware(current_time)
+
+        print(f"🔥🔥🔥 EXECUTION MANAGER: process_executions CALLED")
+        print(f"🔥🔥🔥 Instrument: {self.instrument}")
+        print(f"🔥🔥🔥 Time window: {prv_time} to {current_time}")
+        print(f"🔥🔥🔥 Price: {price}, Currency: {currency}")
+        print(f"🔥🔥🔥 Pending executions buckets: {len(self._pending_executions)}")
+
+        for exec_time, executions in self._pending_executions.items():
+            print(f"🔥🔥🔥 Bucket {exec_time}: {len(executions)} executions")
+            for action, order, timestamp in executions:
+                print(f"🔥🔥🔥   - {action}: {order.get_order_id()}")
+
+        with transaction_scope("process_executions", self.logger,
+                               instrument=self.instrument, prv_time=to_iso_string(prv_time),
+                               current_time=to_iso_string(current_time), currency=currency,
+                               price=str(price)) as master_txn_id:
+
+            start_time = time.time()
+            self._execution_start_time = datetime.now()
+
+            with self._lock:
+                self.logger.info("=" * 120)
+                self.logger.info(f"⚡ EXECUTION_PROCESSING_START: {self.instrument}")
+                self.logger.info("=" * 120)
+                self.logger.info(f"⏰ Time Window: {prv_time} to {current_time}")
+                self.logger.info(f"💰 Market Data: Price={price}, Currency={currency}")
+                self.logger.info(f"📊 Pending Executions: {len(self._pending_executions)} time buckets")
+
+                # Collect all relevant executions
+                relevant_executions = []
+                bucket_times = [prv_time, current_time]
+
+                self.logger.info(f"🔍 SCANNING_PENDING_EXECUTIONS:")
+                for exec_time, executions in self._pending_executions.items():
+                    exec_time = ensure_timezone_aware(exec_time)
+                    current_time_tz = ensure_timezone_aware(current_time)
+
+                    # Convert to same timezone for comparison
+                    if exec_time.tzinfo != current_time_tz.tzinfo:
+                        exec_time = exec_time.astimezone(current_time_tz.tzinfo)
+
+                    if exec_time <= current_time_tz:
+                        self.logger.info(f"   Found {len(executions)} executions at {exec_time}")
+
+                        for action, order, timestamp in executions:
+                            timestamp = ensure_timezone_aware(timestamp)
+                            prv_time_tz = ensure_timezone_aware(prv_time)
+
+                            if action == "CANCEL":
+                                self.logger.info(f"     CANCEL: {order.get_order_id()} at {timestamp}")
+                                relevant_executions.append((timestamp, action, order))
+                                bucket_times.append(max(prv_time_tz, timestamp))
+                            else:  # FILL
+                                order_start = ensure_timezone_aware(order.get_start_timestamp())
+                                self.logger.info(f"     FILL: {order.get_order_id()} at {order_start}")
+                                relevant_executions.append((order_start, action, order))
+                                bucket_times.append(max(prv_time_tz, order_start))
+
+                bucket_times = sorted(list(set(bucket_times)))
+                self.logger.info(f"📅 PROCESSING_BUCKETS: {len(bucket_times) - 1} time buckets")
+                self.logger.debug(f"   Bucket Times: {bucket_times}")
+
+                # Process each bucket within the current minute bar
+                execution_count = 0
+                cancellation_count = 0
+                total_fill_quantity = Decimal('0')
+                trades_generated = []
+
+                for i in range(len(bucket_times) - 1):
+                    bucket_start = bucket_times[i]
+                    bucket_end = bucket_times[i + 1]
+
+                    current_minute = bucket_start.replace(second=0, microsecond=0)
+                    bucket_volume = self._market.volume_tracker.get_current_minute_volume()
+
+                    self.logger.info(f"🪣 PROCESSING_BUCKET [{i + 1}/{len(bucket_times) - 1}]:")
+                    self.logger.info(f"   Time Range: {bucket_start} -> {bucket_end}")
+                    self.logger.info(f"   Bucket Volume: {bucket_volume:,}")
+
+                    # Get active orders in this bucket
+                    bucket_orders = []
+                    bucket_cancel_orders = []
+
+                    for exec_time, action, order in relevant_executions:
+                        exec_time = ensure_timezone_aware(exec_time)
+                        bucket_end_tz = ensure_timezone_aware(bucket_end)
+
+                        # Convert to same timezone for comparison
+                        if exec_time.tzinfo != bucket_end_tz.tzinfo:
+                            exec_time = exec_time.astimezone(bucket_end_tz.tzinfo)
+
+                        if action == "FILL":
+                            if exec_time < bucket_end_tz:
+                                if order.get_remaining_qty() > 0:
+                                    bucket_orders.append((order, exec_time))
+                                    self.logger.debug(f"     Added FILL: {order.get_order_id()}")
+                        elif action == "CANCEL":
+                            if exec_time == bucket_end_tz:
+                                bucket_cancel_orders.append(order.get_order_id())
+                                self.logger.debug(f"     Added CANCEL: {order.get_order_id()}")
+
+                    self.logger.info(
+                        f"   Bucket Contents: {len(bucket_orders)} executions, {len(bucket_cancel_orders)} cancellations")
+
+                    if len(bucket_orders) == 0:
+                        # No orders to execute - just handle impact decay
+                        self.logger.info("   🔄 PROCESSING_IMPACT_DECAY (no orders)")
+                        self._execute_none(
+                            start_timestamp=bucket_start,
+                            end_timestamp=bucket_end,
+                            currency=currency,
+                            price=price,
+                            bucket_volume=bucket_volume
+                        )
+                    else:
+                        # Process orders
+                        self.logger.info(f"   ⚡ PROCESSING_ORDER_EXECUTIONS:")
+                        for j, (order, _) in enumerate(bucket_orders):
+                            self.logger.info(f"     [{j + 1}/{len(bucket_orders)}] Processing {order.get_order_id()}")
+
+                            volume_allocation = self._market.volume_tracker.get_available_volume(
+                                bucket_start,
+                                bucket_end
+                            )
+
+                            if order.get_remaining_qty() <= 0:
+                                self.logger.warning(f"       ⚠️ SKIPPING: No remaining quantity")
+                                self._execute_none(
+                                    start_timestamp=bucket_start,
+                                    end_timestamp=bucket_end,
+                                    currency=currency,
+                                    price=price,
+                                    bucket_volume=bucket_volume
+                                )
+                                continue
+
+                            if order.get_remaining_qty() > 0:
+                                self.logger.info(f"       ⚡ EXECUTING_FILL: {order.get_order_id()}")
+                                fill_result = self._execute_fill(
+                                    order=order,
+                                    timestamp=bucket_end,
+                                    currency=currency,
+                                    price=price,
+                                    volume_allocation=volume_allocation,
+                                    bucket_volume=bucket_volume,
+                                    start_timestamp=bucket_start,
+                                    end_timestamp=bucket_end,
+                                )
+
+                                if fill_result:
+                                    execution_count += 1
+                                    fill_qty, trade_ids = fill_result
+                                    total_fill_quantity += fill_qty
+                                    trades_generated.extend(trade_ids)
+
+                                    self.logger.info(
+                                        f"       ✅ FILL_EXECUTED: {fill_qty} shares, {len(trade_ids)} trades")
+
+                            # Handle cancellations
+                            if order.get_order_id() in bucket_cancel_orders:
+                                self.logger.info(f"       🚫 EXECUTING_CANCELLATION: {order.get_order_id()}")
+                                self._execute_cancel(order, bucket_end)
+                                cancellation_count += 1
+                                self.logger.info(f"       ✅ CANCELLATION_EXECUTED")
+
+                # Update statistics
+                self._total_executions += execution_count
+                self._total_cancellations += cancellation_count
+                self._total_trade_volume += total_fill_quantity
+
+                # Log execution summary
+                total_time = (time.time() - start_time) * 1000
+
+                self.logger.info("=" * 120)
+                self.logger.info(f"✅ EXECUTION_PROCESSING_COMPLETE: {self.instrument}")
+                self.logger.info("=" * 120)
+                self.logger.info(f"📊 EXECUTION_SUMMARY:")
+                self.logger.info(f"   Executions Processed: {execution_count}")
+                self.logger.info(f"   Cancellations Processed: {cancellation_count}")
+                self.logger.info(f"   Total Fill Quantity: {total_fill_quantity}")
+                self.logger.info(f"   Trades Generated: {len(trades_generated)}")
+                self.logger.info(f"   Time Buckets Processed: {len(bucket_times) - 1}")
+                self.logger.info(f"   Processing Time: {total_time:.2f}ms")
+                self.logger.info(f"   Bucket Volume: {bucket_volume:,}")
+                self.logger.info(f"   Market Price: ${price}")
+
+                self.logger.info(f"📈 LIFETIME_STATISTICS:")
+                self.logger.info(f"   Total Executions: {self._total_executions}")
+                self.logger.info(f"   Total Cancellations: {self._total_cancellations}")
+                self.logger.info(f"   Total Trade Volume: {self._total_trade_volume}")
+
+                if trades_generated:
+                    self.logger.info(f"🎯 TRADES_GENERATED:")
+                    for trade_id in trades_generated[-5:]:  # Show last 5 trades
+                        self.logger.info(f"     {trade_id}")
+
+                self.logger.log_performance(
+                    operation=f"process_executions[{self.instrument}]",
+                    duration_ms=total_time,
+                    additional_metrics={
+                        "executions_processed": execution_count,
+                        "cancellations_processed": cancellation_count,
+                        "buckets_processed": len(bucket_times) - 1,
+                        "bucket_volume": bucket_volume,
+                        "price": str(price),
+                        "total_fill_quantity": str(total_fill_quantity),
+                        "trades_generated": len(trades_generated),
+                        "master_transaction_id": master_txn_id
+                    }
+                )
+
+                self.logger.info("=" * 120)
+
+
+def _as_received(rng: random.Random, timestamp: datetime) -> datetime:
+    """The same instant as a naive UTC, aware UTC or aware New York timestamp"""
+    roll = rng.random()
+    if roll < 0.4:
+        return timestamp
+    if roll < 0.7:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp.replace(tzinfo=timezone.utc).astimezone(NEW_YORK)
+
+
+def replay(manager_class, n_minutes: int, new_orders_per_minute: int, seed: int = 0):
+    """Run one synthetic session through a manager, returning it and the seconds spent in process_executions"""
+    rng = random.Random(seed)
+    manager = manager_class("BENCH", _Market())
+    orders = []
+    processing = 0.0
+
+    # process_executions prints per call; keep it off stdout
+    with contextlib.redirect_stdout(io.StringIO()):
+        for minute in range(n_minutes):
+            processing += _replay_minute(manager, orders, rng, minute, new_orders_per_minute)
+
+    return manager, processing
+
+
+def _replay_minute(manager, orders, rng, minute: int, new_orders_per_minute: int) -> float:
+    """One Market.update_market_data step: schedule, process, clear. Returns seconds in process_executions"""
+    start_bin = SESSION_START + timedelta(minutes=minute)
+    stop_bin = start_bin + timedelta(minutes=1)
+
+    for _ in range(new_orders_per_minute):
+        submitted = start_bin + timedelta(seconds=rng.randrange(60), microseconds=rng.choice([0, 500_000]))
+        orders.append(Order(submit_timestamp=_as_received(rng, submitted), symbol="BENCH",
+                            order_id=f"O{len(orders)}", cl_order_id=f"C{len(orders)}", side=Side.Buy,
+                            original_qty=1_000, remaining_qty=rng.choice([100, 250, 1_000]), completed_qty=0,
+                            currency="USD", price=None, participation_rate=0.1))
+
+    live = [order for order in orders if order.get_remaining_qty() > 0]
+    for order in live:
+        if rng.random() < 0.05:
+            cancel_at = start_bin + timedelta(seconds=rng.choice([0, 15, 30, 59]))
+            manager.schedule_cancellation(order, _as_received(rng, rng.choice([cancel_at, stop_bin])))
+
+    for order in live:
+        order_start = _utc(order.get_start_timestamp())
+        if order_start <= stop_bin.replace(tzinfo=timezone.utc):
+            exec_time = start_bin if order_start < start_bin.replace(tzinfo=timezone.utc) else order_start
+            manager.schedule_execution(order, _as_received(rng, exec_time.replace(tzinfo=None)))
+
+    started = time.perf_counter()
+    manager.process_executions(prv_time=_as_received(rng, start_bin), current_time=_as_received(rng, stop_bin),
+                               currency="USD", price=Decimal("100"))
+    processing = time.perf_counter() - started
+    manager.clear_pending_executions()
+    return processing
+
+
+def check_replay(n_minutes: int, seed: int = 0):
+    """Assert the heap-backed manager replays a session exactly like the dict-of-lists queue"""
+    for trial in range(3):
+        expected, _ = replay(LegacyExecutionManager, n_minutes, 4, seed + trial)
+        actual, _ = replay(HeapExecutionManager, n_minutes, 4, seed + trial)
+        assert actual.calls == expected.calls, f"trial {trial}"
+    counts = {kind: sum(call[0] == kind for call in actual.calls) for kind in ('FILL', 'CANCEL', 'NONE')}
+    print(f"replay ok: minutes={n_minutes:,} fills={counts['FILL']:,} cancels={counts['CANCEL']:,} "
+          f"decay_steps={counts['NONE']:,}")
+
+
+def benchmark(order_counts, n_minutes: int, seed: int = 0):
+    print(f"\n{'orders/min':>10} {'legacy_ms/min':>14} {'heap_ms/min':>12}")
+    for n_orders in order_counts:
+        _, legacy = replay(LegacyExecutionManager, n_minutes, n_orders, seed)
+        _, heap = replay(HeapExecutionManager, n_minutes, n_orders, seed)
+        print(f"{n_orders:>10,} {legacy / n_minutes * 1000:>14.2f} {heap / n_minutes * 1000:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay check and benchmark for the execution pending-event heap")
+    parser.add_argument('--check-minutes', type=int, default=300, help="minutes for the replay check (0 to skip)")
+    parser.add_argument('--orders', type=int, nargs='+', default=[10, 100, 1000],
+                        help="new orders per minute for the benchmark")
+    parser.add_argument('--minutes', type=int, default=5)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # The manager logs per event; keep the output about the results
+    logging.disable(logging.CRITICAL)
+    if args.check_minutes:
+        check_replay(args.check_minutes, args.seed)
+    benchmark(args.orders, args.minutes, args.seed)
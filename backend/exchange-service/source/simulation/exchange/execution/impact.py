@@ -1,13 +1,20 @@
 import math
 import time
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timezone
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Sequence
 from threading import RLock
 
+import numpy as np
+
 from source.exchange_logging.utils import get_exchange_logger
 from source.exchange_logging.context import transaction_scope
+from source.utils.timezone_utils import ensure_timezone_aware
+
+# Decimal precision used when float impact leaves the vectorized model
+IMPACT_QUANTUM = Decimal('0.000000000001')
+PRICE_QUANTUM = Decimal('0.01')
 
 
 @dataclass
@@ -20,11 +27,28 @@ class ImpactSnapshot:
     trade_volume: int  # Volume traded in current bin
 
 
+@dataclass
+class ImpactStep:
+    """One decay-and-trade step of a symbol's impact (floats, for logging)"""
+    previous_impact: Optional[float]  # None when the symbol had no state
+    bins_elapsed: float
+    volume_ratio: float
+    decay_factor: float
+    trade_impact: float
+    impact: float
+
+
 class ImpactState:
+    """Per-order impact calculations backed by a VectorImpactModel.
+
+    Every call updates the symbol's float64 slot in the model; impact is
+    quantized to Decimal for the impacted price, the impact manager and the
+    ImpactSnapshots handed out by get_impact_state() / get_all_impacts().
+    """
+
     def __init__(self, decay_rate: float = 0.1):
         self._lock = RLock()
-        self._decay_rate = Decimal(str(decay_rate))
-        self._impact_states: Dict[str, ImpactSnapshot] = {}
+        self._model = VectorImpactModel([], decay_rate=decay_rate)
         self.logger = get_exchange_logger(__name__)
 
         self.logger.info(f"ImpactState initialized with decay_rate: {decay_rate}")
@@ -37,52 +61,36 @@ class ImpactState:
         """Calculate price impact with comprehensive logging"""
 
         with transaction_scope("calculate_price_impact", self.logger,
-                               symbol=symbol, trade_volume=trade_volume, total_volume=total_volume,
-                               trade_id=trade_id, is_buy=is_buy) as txn_id:
+                               lambda: {"symbol": symbol, "trade_volume": trade_volume, "total_volume": total_volume,
+                                        "trade_id": trade_id, "is_buy": is_buy}) as txn_id:
 
             calculation_start_time = time.time()
 
             with self._lock:
-                prev_state = self._impact_states.get(symbol)
-                current_impact = Decimal('0')
-                permanent_impact = Decimal('0')
-                impact_type = "decay"
-
                 self.logger.debug(f"Starting impact calculation for {symbol}")
                 self.logger.debug(
                     f"Input params: base_price={base_price}, trade_vol={trade_volume}, total_vol={total_volume}")
 
-                # Step 1: Calculate decay from previous state
-                if prev_state:
-                    self.logger.debug(f"Found previous impact state: {prev_state.current_impact}")
-
-                    # Calculate time and volume decay factors
-                    time_diff = Decimal(str((end_timestamp - prev_state.end_timestamp).total_seconds() / 60))
-                    bins_elapsed = max(Decimal('1'), time_diff)
-                    volume_ratio = (Decimal(str(total_volume)) / Decimal(str(prev_state.bin_volume))
-                                    if prev_state.bin_volume > 0 else Decimal('1'))
-
-                    # Start with previous impact
-                    current_impact = prev_state.current_impact
-
-                    # Apply decay based on time and volume
-                    decay = -self._decay_rate * bins_elapsed
-                    decay_factor = Decimal(str(math.exp(float(decay)))) * volume_ratio
-                    current_impact = current_impact * decay_factor
+                # Decay from the previous state, then add the trade's temporary + permanent impact
+                direction = 1.0 if is_buy else -1.0
+                step = self._model.apply_trade(symbol, trade_volume, total_volume, direction,
+                                               ensure_timezone_aware(start_timestamp).timestamp(),
+                                               ensure_timezone_aware(end_timestamp).timestamp())
+                current_impact = Decimal(repr(step.impact)).quantize(IMPACT_QUANTUM)
+                impact_type = "decay"
 
+                if step.previous_impact is not None:
                     self.logger.log_calculation(
                         description="Impact decay calculation",
-                        inputs={
-                            "previous_impact": str(prev_state.current_impact),
-                            "time_diff_minutes": str(time_diff),
-                            "bins_elapsed": str(bins_elapsed),
-                            "volume_ratio": str(volume_ratio),
-                            "decay_rate": str(self._decay_rate)
+                        inputs=lambda: {
+                            "previous_impact": repr(step.previous_impact),
+                            "bins_elapsed": repr(step.bins_elapsed),
+                            "volume_ratio": repr(step.volume_ratio),
+                            "decay_rate": repr(self._model.decay_rate)
                         },
-                        result=str(current_impact),
-                        details={
-                            "decay_factor": str(decay_factor),
-                            "decay_exponent": str(decay),
+                        result=lambda: repr(step.previous_impact * step.decay_factor),
+                        details=lambda: {
+                            "decay_factor": repr(step.decay_factor),
                             "symbol": symbol,
                             "trade_id": trade_id or "0",
                             "transaction_id": txn_id
@@ -91,43 +99,20 @@ class ImpactState:
                 else:
                     self.logger.debug(f"No previous impact state found for {symbol} - starting from zero")
 
-                # Step 2: Handle new trade impact if there's volume
                 if trade_volume > 0 and total_volume > 0:
-                    trade_vol_dec = Decimal(str(trade_volume))
-                    total_vol_dec = Decimal(str(total_volume))
-                    volume_ratio = trade_vol_dec / total_vol_dec
-
-                    direction = Decimal('1') if is_buy else Decimal('-1')
-
-                    # Calculate new temporary impact (higher impact)
-                    sqrt_ratio = Decimal(str(math.sqrt(float(volume_ratio))))
-                    temp_impact = direction * Decimal('0.1') * sqrt_ratio
-
-                    # Calculate new permanent impact (lower impact)
-                    perm_impact = direction * Decimal('0.05') * volume_ratio
-                    permanent_impact = perm_impact
-
-                    # Add both impacts to current
-                    new_trade_impact = temp_impact + permanent_impact
-                    current_impact += new_trade_impact
-
-                    # Set impact type based on direction
                     impact_type = "fill_inc" if is_buy else "fill_dec"
 
                     self.logger.log_calculation(
                         description="New trade impact calculation",
-                        inputs={
+                        inputs=lambda: {
                             "trade_volume": trade_volume,
                             "total_volume": total_volume,
-                            "volume_ratio": str(volume_ratio),
-                            "direction": str(direction),
+                            "volume_ratio": repr(trade_volume / total_volume),
+                            "direction": repr(direction),
                             "is_buy": is_buy
                         },
-                        result=str(new_trade_impact),
-                        details={
-                            "temporary_impact": str(temp_impact),
-                            "permanent_impact": str(permanent_impact),
-                            "sqrt_volume_ratio": str(sqrt_ratio),
+                        result=lambda: repr(step.trade_impact),
+                        details=lambda: {
                             "impact_type": impact_type,
                             "symbol": symbol,
                             "trade_id": trade_id or "0",
@@ -135,20 +120,10 @@ class ImpactState:
                         }
                     )
 
-                elif prev_state:
+                elif step.previous_impact is not None:
                     # No trade volume - just decay
-                    impact_type = "decay"
                     self.logger.debug(f"No trade volume - applying decay only for {symbol}")
 
-                # Step 3: Save new state
-                self._impact_states[symbol] = ImpactSnapshot(
-                    start_timestamp=start_timestamp,
-                    end_timestamp=end_timestamp,
-                    current_impact=current_impact,
-                    bin_volume=total_volume,
-                    trade_volume=trade_volume
-                )
-
                 # Calculate final impacted price
                 impacted_price = round(base_price * (Decimal('1') + current_impact), 2)
                 impact_bps = current_impact * Decimal('10000')  # Convert to basis points
@@ -156,13 +131,12 @@ class ImpactState:
                 # Log the final calculation
                 self.logger.log_calculation(
                     description="Final price impact result",
-                    inputs={
+                    inputs=lambda: {
                         "base_price": str(base_price),
-                        "current_impact_pct": str(current_impact),
-                        "permanent_impact": str(permanent_impact)
+                        "current_impact_pct": str(current_impact)
                     },
-                    result=str(impacted_price),
-                    details={
+                    result=lambda: str(impacted_price),
+                    details=lambda: {
                         "impact_bps": str(impact_bps),
                         "impact_type": impact_type,
                         "symbol": symbol,
@@ -193,12 +167,12 @@ class ImpactState:
                 self.logger.log_performance(
                     operation=f"price_impact_calculation[{symbol}]",
                     duration_ms=calculation_duration,
-                    additional_metrics={
+                    additional_metrics=lambda: {
                         "trade_volume": trade_volume,
                         "total_volume": total_volume,
                         "impact_bps": f"{float(impact_bps):.4f}",
                         "impact_type": impact_type,
-                        "has_previous_state": prev_state is not None,
+                        "has_previous_state": step.previous_impact is not None,
                         "trade_id": trade_id or "0"
                     }
                 )
@@ -223,37 +197,274 @@ class ImpactState:
     def get_current_impact(self, symbol: str) -> Optional[Decimal]:
         """Get current impact for a symbol"""
         with self._lock:
-            state = self._impact_states.get(symbol)
-            if state:
-                return state.current_impact
-            return None
+            return self._model.get_impact(symbol) if symbol in self._model else None
 
     def get_impact_state(self, symbol: str) -> Optional[ImpactSnapshot]:
         """Get complete impact state for a symbol"""
         with self._lock:
-            return self._impact_states.get(symbol)
+            return self._model.get_snapshot(symbol) if symbol in self._model else None
+
+    def set_impact_state(self, symbol: str, snapshot: ImpactSnapshot) -> None:
+        """Replace the impact state for a symbol (e.g. with state carried by the execution kernel)"""
+        with self._lock:
+            self._model.add_symbol(symbol)
+            self._model.load_snapshot(symbol, snapshot)
 
     def reset_impact(self, symbol: str):
         """Reset impact state for a symbol"""
         with self._lock:
-            if symbol in self._impact_states:
-                old_impact = self._impact_states[symbol].current_impact
-                del self._impact_states[symbol]
+            old_impact = self.get_current_impact(symbol)
+            if old_impact is not None:
+                self._model.reset(symbol)
                 self.logger.info(f"Impact state reset for {symbol} - was {old_impact}")
 
     def get_all_impacts(self) -> Dict[str, ImpactSnapshot]:
         """Get all current impact states"""
         with self._lock:
-            return self._impact_states.copy()
+            return self._model.to_snapshots()
 
     def log_impact_summary(self):
         """Log summary of all current impacts"""
         with self._lock:
-            if not self._impact_states:
+            impact_states = self._model.to_snapshots()
+            if not impact_states:
                 self.logger.info("No active impact states")
                 return
 
-            self.logger.info(f"=== Impact Summary for {len(self._impact_states)} symbols ===")
-            for symbol, state in self._impact_states.items():
+            self.logger.info(f"=== Impact Summary for {len(impact_states)} symbols ===")
+            for symbol, state in impact_states.items():
                 impact_bps = state.current_impact * Decimal('10000')
-                self.logger.info(f"{symbol}: {impact_bps:.2f} bps (vol: {state.trade_volume}/{state.bin_volume})")
\ No newline at end of file
+                self.logger.info(f"{symbol}: {impact_bps:.2f} bps (vol: {state.trade_volume}/{state.bin_volume})")
+
+
+class VectorImpactModel:
+    """Float64 impact state for every symbol in a book.
+
+    Evaluates the temporary (sqrt), permanent (linear) and exponential decay
+    terms as array operations over all symbols at once (apply_trades) or for
+    one symbol (apply_trade, which ImpactState.calculate_price_impact runs
+    on), without allocating an ImpactSnapshot per symbol per bin. Values stay
+    float64 internally and are quantized to Decimal only by get_snapshot() /
+    to_snapshots() / get_impact(), i.e. at the persistence and reporting
+    boundary.
+    """
+
+    # Slot value for a symbol without state: impact, volumes 0, timestamps nan (end_ts nan = no state)
+    _FIELDS = (('impact', np.float64, 0.0), ('bin_volume', np.int64, 0), ('trade_volume', np.int64, 0),
+               ('start_ts', np.float64, np.nan), ('end_ts', np.float64, np.nan))
+
+    def __init__(self, symbols: Sequence[str], decay_rate: float = 0.1,
+                 temporary_impact_coef: float = 0.1, permanent_impact_coef: float = 0.05):
+        self.symbols: List[str] = list(symbols)
+        self._index: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.decay_rate = decay_rate
+        self.temporary_impact_coef = temporary_impact_coef
+        self.permanent_impact_coef = permanent_impact_coef
+
+        # The per-symbol arrays are views of the first len(symbols) slots of buffers that grow
+        # geometrically, so adding symbols one at a time stays amortized O(1) per symbol
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._reserve(len(self.symbols))
+        self._resize_views()
+
+    def _reserve(self, capacity: int) -> None:
+        """Make room for at least capacity symbols, doubling the buffers when they are full"""
+        current = len(self._buffers['impact']) if self._buffers else 0
+        if self._buffers and capacity <= current:
+            return
+        capacity = max(capacity, 2 * current, 16)
+        n = len(self.symbols)
+        for name, dtype, empty in self._FIELDS:
+            buffer = np.full(capacity, empty, dtype=dtype)
+            if name in self._buffers:
+                buffer[:n] = self._buffers[name][:n]
+            self._buffers[name] = buffer
+
+    def _resize_views(self) -> None:
+        n = len(self.symbols)
+        for name, _, _ in self._FIELDS:
+            setattr(self, name, self._buffers[name][:n])
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    def has_state(self) -> np.ndarray:
+        return ~np.isnan(self.end_ts)
+
+    def add_symbol(self, symbol: str) -> int:
+        """Index of a symbol, appending a slot without state for a new one"""
+        i = self._index.get(symbol)
+        if i is None:
+            i = len(self.symbols)
+            self._reserve(i + 1)
+            self.symbols.append(symbol)
+            self._index[symbol] = i
+            self._resize_views()
+        return i
+
+    def reset(self, symbol: str) -> None:
+        """Drop a symbol's impact state"""
+        i = self._index[symbol]
+        self.impact[i] = 0.0
+        self.bin_volume[i] = 0
+        self.trade_volume[i] = 0
+        self.start_ts[i] = np.nan
+        self.end_ts[i] = np.nan
+
+    def load_snapshot(self, symbol: str, snapshot: ImpactSnapshot) -> None:
+        """Seed one symbol from a Decimal ImpactSnapshot"""
+        i = self._index[symbol]
+        self.impact[i] = float(snapshot.current_impact)
+        self.bin_volume[i] = int(snapshot.bin_volume)
+        self.trade_volume[i] = int(snapshot.trade_volume)
+        self.start_ts[i] = ensure_timezone_aware(snapshot.start_timestamp).timestamp()
+        self.end_ts[i] = ensure_timezone_aware(snapshot.end_timestamp).timestamp()
+
+    def load_impact_state(self, impact_state: ImpactState) -> None:
+        """Seed every known symbol from a Decimal ImpactState"""
+        for symbol, snapshot in impact_state.get_all_impacts().items():
+            if symbol in self._index:
+                self.load_snapshot(symbol, snapshot)
+
+    def decay(self, mask: np.ndarray, start_ts: np.ndarray, end_ts: np.ndarray,
+              total_volume: np.ndarray) -> None:
+        """Decay masked symbols to end_ts and record the bin they were evaluated in"""
+        decaying = mask & self.has_state()
+        if decaying.any():
+            bins_elapsed = np.maximum(1.0, (end_ts[decaying] - self.end_ts[decaying]) / 60.0)
+            prev_volume = self.bin_volume[decaying]
+            volume_ratio = np.where(prev_volume > 0,
+                                    total_volume[decaying] / np.where(prev_volume > 0, prev_volume, 1),
+                                    1.0)
+            self.impact[decaying] *= np.exp(-self.decay_rate * bins_elapsed) * volume_ratio
+
+        self.start_ts[mask] = start_ts[mask]
+        self.end_ts[mask] = end_ts[mask]
+        self.bin_volume[mask] = total_volume[mask]
+        self.trade_volume[mask] = 0
+
+    def apply_trades(self, mask: np.ndarray, trade_volume: np.ndarray, total_volume: np.ndarray,
+                     direction: np.ndarray, start_ts: np.ndarray, end_ts: np.ndarray) -> None:
+        """Decay, then add temporary + permanent impact of one trade per masked symbol"""
+        self.decay(mask, start_ts, end_ts, total_volume)
+
+        trading = mask & (trade_volume > 0) & (total_volume > 0)
+        if trading.any():
+            ratio = trade_volume[trading] / total_volume[trading]
+            self.impact[trading] += direction[trading] * (self.temporary_impact_coef * np.sqrt(ratio) +
+                                                          self.permanent_impact_coef * ratio)
+            self.trade_volume[trading] = trade_volume[trading]
+
+    def apply_trade(self, symbol: str, trade_volume: int, total_volume: int, direction: float,
+                    start_ts: float, end_ts: float) -> ImpactStep:
+        """apply_trades for a single symbol in scalar float64 (adds a slot for a new symbol)"""
+        i = self.add_symbol(symbol)
+
+        previous_impact = None
+        bins_elapsed = volume_ratio = decay_factor = 1.0
+        impact = 0.0
+        if not math.isnan(self.end_ts[i]):
+            previous_impact = float(self.impact[i])
+            bins_elapsed = max(1.0, (end_ts - float(self.end_ts[i])) / 60.0)
+            prev_volume = int(self.bin_volume[i])
+            volume_ratio = total_volume / prev_volume if prev_volume > 0 else 1.0
+            decay_factor = math.exp(-self.decay_rate * bins_elapsed) * volume_ratio
+            impact = previous_impact * decay_factor
+
+        trade_impact = 0.0
+        traded = trade_volume > 0 and total_volume > 0
+        if traded:
+            ratio = trade_volume / total_volume
+            trade_impact = direction * (self.temporary_impact_coef * math.sqrt(ratio) +
+                                        self.permanent_impact_coef * ratio)
+            impact += trade_impact
+
+        self.impact[i] = impact
+        self.start_ts[i] = start_ts
+        self.end_ts[i] = end_ts
+        self.bin_volume[i] = total_volume
+        self.trade_volume[i] = trade_volume if traded else 0
+
+        return ImpactStep(previous_impact=previous_impact, bins_elapsed=bins_elapsed, volume_ratio=volume_ratio,
+                          decay_factor=decay_factor, trade_impact=trade_impact, impact=impact)
+
+    def impacted_prices(self, base_price: np.ndarray) -> np.ndarray:
+        """Impacted prices (rounded to cents) for every symbol"""
+        return np.round(base_price * (1.0 + self.impact), 2)
+
+    def get_impact(self, symbol: str) -> Optional[Decimal]:
+        """Current impact for a symbol, quantized to Decimal"""
+        i = self._index[symbol]
+        if np.isnan(self.end_ts[i]):
+            return None
+        return Decimal(repr(float(self.impact[i]))).quantize(IMPACT_QUANTUM)
+
+    def get_snapshot(self, symbol: str) -> Optional[ImpactSnapshot]:
+        """Quantize one symbol's float state into an ImpactSnapshot (None if it has no state yet)"""
+        i = self._index[symbol]
+        if np.isnan(self.end_ts[i]):
+            return None
+        return ImpactSnapshot(
+            start_timestamp=datetime.fromtimestamp(self.start_ts[i], tz=timezone.utc),
+            end_timestamp=datetime.fromtimestamp(self.end_ts[i], tz=timezone.utc),
+            current_impact=Decimal(repr(float(self.impact[i]))).quantize(IMPACT_QUANTUM),
+            bin_volume=int(self.bin_volume[i]),
+            trade_volume=int(self.trade_volume[i])
+        )
+
+    def to_snapshots(self) -> Dict[str, ImpactSnapshot]:
+        """Quantize the float state into ImpactSnapshots for persistence and reporting"""
+        return {self.symbols[i]: self.get_snapshot(self.symbols[i]) for i in np.flatnonzero(self.has_state())}
+
+    def accuracy_report(self, impact_state,
+                        base_prices: Optional[Dict[str, Decimal]] = None) -> dict:
+        """Side-by-side comparison against a Decimal reference.
+
+        impact_state is anything with get_all_impacts() returning Decimal
+        ImpactSnapshots, such as impact_benchmark.DecimalImpactState (the
+        former all-Decimal ImpactState). Both must have processed the same trades. Returns per-symbol
+        float/Decimal impact, absolute error and error in basis points, plus
+        the worst-case totals and (when base_prices is given) the number of
+        symbols whose cent-rounded impacted price differs.
+        """
+        rows = {}
+        max_abs_error = 0.0
+        price_mismatches = 0
+
+        decimal_states = impact_state.get_all_impacts()
+        for symbol, snapshot in decimal_states.items():
+            i = self._index.get(symbol)
+            if i is None:
+                continue
+
+            decimal_impact = snapshot.current_impact
+            float_impact = float(self.impact[i])
+            abs_error = abs(float_impact - float(decimal_impact))
+            max_abs_error = max(max_abs_error, abs_error)
+
+            row = {
+                "decimal_impact": str(decimal_impact),
+                "float_impact": repr(float_impact),
+                "abs_error": abs_error,
+                "error_bps": abs_error * 10000
+            }
+
+            if base_prices and symbol in base_prices:
+                base_price = base_prices[symbol]
+                decimal_price = round(base_price * (Decimal('1') + decimal_impact), 2)
+                float_price = Decimal(repr(float(np.round(float(base_price) * (1.0 + float_impact), 2))))
+                float_price = float_price.quantize(PRICE_QUANTUM)
+                row["decimal_price"] = str(decimal_price)
+                row["float_price"] = str(float_price)
+                if decimal_price != float_price:
+                    price_mismatches += 1
+
+            rows[symbol] = row
+
+        return {
+            "symbols_compared": len(rows),
+            "max_abs_error": max_abs_error,
+            "max_error_bps": max_abs_error * 10000,
+            "price_mismatches": price_mismatches,
+            "symbols": rows
+        }
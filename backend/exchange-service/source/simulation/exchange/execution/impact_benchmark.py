@@ -0,0 +1,344 @@
+"""
+Accuracy check and per-bin microbenchmark for the float64 impact path.
+
+    python -m source.simulation.exchange.execution.impact_benchmark --check-symbols 500 --sizes 10 100 1000 10000
+
+DecimalImpactState is the former all-Decimal ImpactState (calculate_price_impact verbatim). The check
+drives it and ImpactState, which now runs on a VectorImpactModel, through the same random session of
+decay-only and trading bins, then compares every impacted price they returned and runs
+VectorImpactModel.accuracy_report on the final state. The benchmark times one bin at growing numbers
+of impacted symbols for the Decimal calls, the float64 per-order calls the Market path makes, and one
+VectorImpactModel.apply_trades pass over the whole book, and growing an empty model one symbol at a
+time (as ImpactState does on first sight of a symbol) to each size.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import math
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Dict, Optional
+
+import numpy as np
+
+from source.exchange_logging.context import transaction_scope
+from source.simulation.exchange.execution.impact import ImpactSnapshot, ImpactState, VectorImpactModel
+
+# The book managers report their missing book context on stdout while app_state is built
+with contextlib.redirect_stdout(io.StringIO()):
+    from source.orchestration.app_state.state_manager import app_state
+
+SESSION_START = datetime(2025, 3, 3, 14, 30, tzinfo=timezone.utc)
+
+
+class DecimalImpactState(ImpactState):
+    """The former ImpactState: Decimal state with an ImpactSnapshot allocated per call"""
+
+    def __init__(self, decay_rate: float = 0.1):
+        super().__init__(decay_rate)
+        self._decay_rate = Decimal(str(decay_rate))
+        self._impact_states: Dict[str, ImpactSnapshot] = {}
+
+    def get_impact_state(self, symbol: str) -> Optional[ImpactSnapshot]:
+        return self._impact_states.get(symbol)
+
+    def get_all_impacts(self) -> Dict[str, ImpactSnapshot]:
+        return self._impact_states.copy()
+
+    def calculate_price_impact(self, symbol: str, currency: str, base_price: Decimal,
+                               trade_volume: int, total_volume: int,
+                               start_timestamp: datetime, end_timestamp: datetime,
+                               trade_id: Optional[str] = None,
+                               is_buy: bool = True) -> Decimal:
+        """Calculate price impact with comprehensive logging"""
+
+        with transaction_scope("calculate_price_impact", self.logger,
+                               symbol=symbol, trade_volume=trade_volume, total_volume=total_volume,
+                               trade_id=trade_id, is_buy=is_buy) as txn_id:
+
+            calculation_start_time = time.time()
+
+            with self._lock:
+                prev_state = self._impact_states.get(symbol)
+                current_impact = Decimal('0')
+                permanent_impact = Decimal('0')
+                impact_type = "decay"
+
+                self.logger.debug(f"Starting impact calculation for {symbol}")
+                self.logger.debug(
+                    f"Input params: base_price={base_price}, trade_vol={trade_volume}, total_vol={total_volume}")
+
+                # Step 1: Calculate decay from previous state
+                if prev_state:
+                    self.logger.debug(f"Found previous impact state: {prev_state.current_impact}")
+
+                    # Calculate time and volume decay factors
+                    time_diff = Decimal(str((end_timestamp - prev_state.end_timestamp).total_seconds() / 60))
+                    bins_elapsed = max(Decimal('1'), time_diff)
+                    volume_ratio = (Decimal(str(total_volume)) / Decimal(str(prev_state.bin_volume))
+                                    if prev_state.bin_volume > 0 else Decimal('1'))
+
+                    # Start with previous impact
+                    current_impact = prev_state.current_impact
+
+                    # Apply decay based on time and volume
+                    decay = -self._decay_rate * bins_elapsed
+                    decay_factor = Decimal(str(math.exp(float(decay)))) * volume_ratio
+                    current_impact = current_impact * decay_factor
+
+                    self.logger.log_calculation(
+                        description="Impact decay calculation",
+                        inputs=lambda: {
+                            "previous_impact": str(prev_state.current_impact),
+                            "time_diff_minutes": str(time_diff),
+                            "bins_elapsed": str(bins_elapsed),
+                            "volume_ratio": str(volume_ratio),
+                            "decay_rate": str(self._decay_rate)
+                        },
+                        result=lambda: str(current_impact),
+                        details=lambda: {
+                            "decay_factor": str(decay_factor),
+                            "decay_exponent": str(decay),
+                            "symbol": symbol,
+                            "trade_id": trade_id or "0",
+                            "transaction_id": txn_id
+                        }
+                    )
+                else:
+                    self.logger.debug(f"No previous impact state found for {symbol} - starting from zero")
+
+                # Step 2: Handle new trade impact if there's volume
+                if trade_volume > 0 and total_volume > 0:
+                    trade_vol_dec = Decimal(str(trade_volume))
+                    total_vol_dec = Decimal(str(total_volume))
+                    volume_ratio = trade_vol_dec / total_vol_dec
+
+                    direction = Decimal('1') if is_buy else Decimal('-1')
+
+                    # Calculate new temporary impact (higher impact)
+                    sqrt_ratio = Decimal(str(math.sqrt(float(volume_ratio))))
+                    temp_impact = direction * Decimal('0.1') * sqrt_ratio
+
+                    # Calculate new permanent impact (lower impact)
+                    perm_impact = direction * Decimal('0.05') * volume_ratio
+                    permanent_impact = perm_impact
+
+                    # Add both impacts to current
+                    new_trade_impact = temp_impact + permanent_impact
+                    current_impact += new_trade_impact
+
+                    # Set impact type based on direction
+                    impact_type = "fill_inc" if is_buy else "fill_dec"
+
+                    self.logger.log_calculation(
+                        description="New trade impact calculation",
+                        inputs=lambda: {
+                            "trade_volume": trade_volume,
+                            "total_volume": total_volume,
+                            "volume_ratio": str(volume_ratio),
+                            "direction": str(direction),
+                            "is_buy": is_buy
+                        },
+                        result=lambda: str(new_trade_impact),
+                        details=lambda: {
+                            "temporary_impact": str(temp_impact),
+                            "permanent_impact": str(permanent_impact),
+                            "sqrt_volume_ratio": str(sqrt_ratio),
+                            "impact_type": impact_type,
+                            "symbol": symbol,
+                            "trade_id": trade_id or "0",
+                            "transaction_id": txn_id
+                        }
+                    )
+
+                elif prev_state:
+                    # No trade volume - just decay
+                    impact_type = "decay"
+                    self.logger.debug(f"No trade volume - applying decay only for {symbol}")
+
+                # Step 3: Save new state
+                self._impact_states[symbol] = ImpactSnapshot(
+                    start_timestamp=start_timestamp,
+                    end_timestamp=end_timestamp,
+                    current_impact=current_impact,
+                    bin_volume=total_volume,
+                    trade_volume=trade_volume
+                )
+
+                # Calculate final impacted price
+                impacted_price = round(base_price * (Decimal('1') + current_impact), 2)
+                impact_bps = current_impact * Decimal('10000')  # Convert to basis points
+
+                # Log the final calculation
+                self.logger.log_calculation(
+                    description="Final price impact result",
+                    inputs=lambda: {
+                        "base_price": str(base_price),
+                        "current_impact_pct": str(current_impact),
+                        "permanent_impact": str(permanent_impact)
+                    },
+                    result=lambda: str(impacted_price),
+                    details=lambda: {
+                        "impact_bps": str(impact_bps),
+                        "impact_type": impact_type,
+                        "symbol": symbol,
+                        "trade_id": trade_id or "0",
+                        "transaction_id": txn_id
+                    }
+                )
+
+                # Update impact manager in app state
+                from source.orchestration.app_state.state_manager import app_state
+                if app_state.impact_manager:
+                    app_state.impact_manager.update_impact(
+                        symbol=symbol,
+                        currency=currency,
+                        base_price=base_price,
+                        impacted_price=impacted_price,
+                        trade_volume=trade_volume,
+                        total_volume=total_volume,
+                        start_timestamp=start_timestamp,
+                        end_timestamp=end_timestamp,
+                        trade_id=trade_id,
+                        impact_type=impact_type
+                    )
+
+                # Performance logging
+                calculation_duration = (time.time() - calculation_start_time) * 1000
+
+                self.logger.log_performance(
+                    operation=f"price_impact_calculation[{symbol}]",
+                    duration_ms=calculation_duration,
+                    additional_metrics=lambda: {
+                        "trade_volume": trade_volume,
+                        "total_volume": total_volume,
+                        "impact_bps": f"{float(impact_bps):.4f}",
+                        "impact_type": impact_type,
+                        "has_previous_state": prev_state is not None,
+                        "trade_id": trade_id or "0"
+                    }
+                )
+
+                # Log business event for significant impacts
+                if abs(impact_bps) > Decimal('1'):  # More than 1 basis point
+                    self.logger.log_business_event("SIGNIFICANT_PRICE_IMPACT", {
+                        "symbol": symbol,
+                        "trade_id": trade_id or "0",
+                        "base_price": str(base_price),
+                        "impacted_price": str(impacted_price),
+                        "impact_bps": str(impact_bps),
+                        "trade_volume": trade_volume,
+                        "total_volume": total_volume,
+                        "impact_type": impact_type,
+                        "direction": "BUY" if is_buy else "SELL",
+                        "transaction_id": txn_id
+                    })
+
+                return impacted_price
+
+
+def make_session(n_symbols: int, n_bins: int, seed: int = 0, trade_share: float = 0.3):
+    """Per bin: (start, end, [(symbol, base_price, trade_volume, total_volume, is_buy)])"""
+    rng = random.Random(seed)
+    prices = [Decimal(f"{rng.uniform(5, 500):.2f}") for _ in range(n_symbols)]
+    bins = []
+    end = SESSION_START
+    for _ in range(n_bins):
+        start, end = end, end + timedelta(minutes=rng.choice([1, 1, 1, 2]))
+        rows = []
+        for i in range(n_symbols):
+            total_volume = rng.randrange(1_000, 200_000)
+            trade_volume = int(total_volume * rng.uniform(0.01, 0.2)) if rng.random() < trade_share else 0
+            rows.append((f"S{i:05d}", prices[i], trade_volume, total_volume, rng.random() < 0.5))
+        bins.append((start, end, rows))
+    return bins
+
+
+def run_calls(impact_state: ImpactState, bins) -> list:
+    """Per-order calls as ExecutionManager makes them, returning every impacted price"""
+    prices = []
+    for start, end, rows in bins:
+        for symbol, base_price, trade_volume, total_volume, is_buy in rows:
+            prices.append(impact_state.calculate_price_impact(symbol, "USD", base_price, trade_volume, total_volume,
+                                                              start, end, trade_id="0", is_buy=is_buy))
+    return prices
+
+
+def check_accuracy(n_symbols: int, n_bins: int, seed: int = 0):
+    bins = make_session(n_symbols, n_bins, seed)
+    reference, routed = DecimalImpactState(), ImpactState()
+    expected, actual = run_calls(reference, bins), run_calls(routed, bins)
+
+    mismatched = sum(1 for a, b in zip(actual, expected) if a != b)
+    base_prices = {symbol: base_price for symbol, base_price, _, _, _ in bins[-1][2]}
+    report = routed._model.accuracy_report(reference, base_prices)
+    assert report["symbols_compared"] == n_symbols
+    assert report["max_abs_error"] < 1e-9, report["max_abs_error"]
+    assert mismatched <= len(expected) * 1e-3, mismatched
+    print(f"accuracy ok: symbols={n_symbols:,} bins={n_bins} calls={len(expected):,} "
+          f"max_error_bps={report['max_error_bps']:.2e} price_mismatches={mismatched} "
+          f"final_price_mismatches={report['price_mismatches']}")
+
+
+def benchmark(sizes, n_bins: int, seed: int = 0):
+    print(f"\n{'symbols':>10} {'decimal_ms':>11} {'float_ms':>9} {'vector_ms':>10} {'float_x':>8} {'vector_x':>9}")
+    for n_symbols in sizes:
+        bins = make_session(n_symbols, n_bins, seed)
+
+        timings = []
+        for impact_state in (DecimalImpactState(), ImpactState()):
+            started = time.perf_counter()
+            run_calls(impact_state, bins)
+            timings.append(time.perf_counter() - started)
+
+        model = VectorImpactModel([f"S{i:05d}" for i in range(n_symbols)])
+        mask = np.ones(n_symbols, dtype=bool)
+        columns = []
+        for start, end, rows in bins:
+            columns.append((np.full(n_symbols, start.timestamp()), np.full(n_symbols, end.timestamp()),
+                            np.array([row[2] for row in rows], dtype=np.float64),
+                            np.array([row[3] for row in rows], dtype=np.int64),
+                            np.array([1.0 if row[4] else -1.0 for row in rows])))
+        started = time.perf_counter()
+        for start_ts, end_ts, trade_volume, total_volume, direction in columns:
+            model.apply_trades(mask, trade_volume, total_volume, direction, start_ts, end_ts)
+        timings.append(time.perf_counter() - started)
+
+        decimal_ms, float_ms, vector_ms = (value / n_bins * 1000 for value in timings)
+        print(f"{n_symbols:>10,} {decimal_ms:>11.2f} {float_ms:>9.2f} {vector_ms:>10.3f} "
+              f"{decimal_ms / float_ms:>7.1f}x {decimal_ms / vector_ms:>8.0f}x")
+
+
+def benchmark_growth(sizes):
+    """Grow an empty VectorImpactModel one symbol at a time; amortized cost per symbol should stay flat"""
+    print(f"\n{'symbols':>10} {'add_ms':>9} {'us/symbol':>10}")
+    for n_symbols in sizes:
+        symbols = [f"S{i:06d}" for i in range(n_symbols)]
+        model = VectorImpactModel([])
+        started = time.perf_counter()
+        for symbol in symbols:
+            model.add_symbol(symbol)
+        elapsed = time.perf_counter() - started
+        assert len(model.impact) == n_symbols and not model.has_state().any()
+        print(f"{n_symbols:>10,} {elapsed * 1000:>9.2f} {elapsed / n_symbols * 1e6:>10.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Accuracy check and per-bin microbenchmark for the float64 impact path")
+    parser.add_argument('--check-symbols', type=int, default=500, help="symbols for the accuracy check (0 to skip)")
+    parser.add_argument('--check-bins', type=int, default=120)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 100, 1000, 10000])
+    parser.add_argument('--bins', type=int, default=5, help="bins timed per size")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Impact calculations log per call; keep the output about the results
+    logging.disable(logging.WARNING)
+    app_state.impact_manager.tracking = False
+    if args.check_symbols:
+        check_accuracy(args.check_symbols, args.check_bins, args.seed)
+    benchmark(args.sizes, args.bins, args.seed)
+    benchmark_growth(args.sizes + [100_000])
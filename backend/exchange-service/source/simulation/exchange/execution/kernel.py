@@ -0,0 +1,390 @@
+# source/simulation/exchange/execution/kernel.py
+"""
+Columnar execution kernel.
+
+Holds every instrument's price, bin volume, impact state and resting order
+in NumPy arrays so a whole minute can be filled for the whole universe in a
+few array passes, instead of driving one Market (and one Decimal
+ExecutionManager / ImpactState pair) per instrument.
+
+The kernel mirrors the per-Market path for the one-active-order-per-symbol
+book that Market.add_order enforces:
+  - the bin is split into buckets at the start of an order starting inside
+    it and at every cancel request falling inside it, as
+    ExecutionManager.process_executions does
+  - each bucket fills the order over its share of the bin volume, or only
+    decays impact (with its own max(1, bins_elapsed) step) when the order has
+    not started, is done, or no order rests
+  - a fill that flips the position is split into a risk-off and a risk-on
+    trade, each of which decays and re-applies impact
+
+Exchange.update_market_data_batch() uses it behind the EXECUTION_KERNEL flag
+to decay every symbol without order activity in one pass; the kernel can also
+run a whole book standalone via Exchange.build_execution_kernel().
+"""
+
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from threading import RLock
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from source.simulation.core.enums.side import Side
+from source.simulation.exchange.execution.impact import VectorImpactModel
+from source.exchange_logging.utils import get_exchange_logger
+from source.utils.timezone_utils import ensure_timezone_aware
+
+
+@dataclass
+class KernelMinuteResult:
+    """Per-instrument outcome of one kernel minute (arrays aligned with kernel.symbols)"""
+    start_timestamp: datetime
+    end_timestamp: datetime
+    fill_qty: np.ndarray  # Total filled quantity (unsigned)
+    risk_off_qty: np.ndarray  # Portion that reduced an existing position
+    risk_on_qty: np.ndarray  # Portion that opened/increased a position
+    risk_off_price: np.ndarray  # Impacted price of the risk-off trade (nan if none)
+    risk_on_price: np.ndarray  # Impacted price of the risk-on trade (nan if none)
+    impact: np.ndarray  # Impact after the minute
+    impacted_price: np.ndarray  # Price implied by the impact after the minute
+
+    def filled_symbols(self, symbols: Sequence[str]) -> List[str]:
+        """Symbols that traded in this minute"""
+        return [symbols[i] for i in np.flatnonzero(self.fill_qty > 0)]
+
+
+class ExecutionKernel:
+    """Vectorized execution and impact state for a whole instrument universe"""
+
+    def __init__(self, symbols: Sequence[str], decay_rate: float = 0.1,
+                 temporary_impact_coef: float = 0.1, permanent_impact_coef: float = 0.05,
+                 tolerance: float = 1e-6):
+        self._lock = RLock()
+        self.logger = get_exchange_logger(__name__)
+
+        self.symbols: List[str] = list(symbols)
+        self._index: Dict[str, int] = {symbol: i for i, symbol in enumerate(self.symbols)}
+        self.tolerance = tolerance
+
+        n = len(self.symbols)
+
+        # Market data
+        self.price = np.zeros(n, dtype=np.float64)
+        self.volume = np.zeros(n, dtype=np.int64)
+
+        # Impact state
+        self.impact_model = VectorImpactModel(self.symbols, decay_rate=decay_rate,
+                                              temporary_impact_coef=temporary_impact_coef,
+                                              permanent_impact_coef=permanent_impact_coef)
+
+        # Resting orders (at most one active order per symbol)
+        self.remaining_qty = np.zeros(n, dtype=np.int64)
+        self.side = np.zeros(n, dtype=np.int8)  # +1 buy, -1 sell, 0 none
+        self.participation_rate = np.zeros(n, dtype=np.float64)
+        self.order_start = np.full(n, np.inf, dtype=np.float64)
+        self.order_ids: List[Optional[str]] = [None] * n
+
+        # Pending cancel request timestamps by symbol index (they only split buckets)
+        self.cancel_times: Dict[int, List[float]] = {}
+
+        # Positions used to split risk-off / risk-on fills
+        self.position = np.zeros(n, dtype=np.float64)
+
+        self.logger.info(f"ExecutionKernel initialized for {n} instruments (decay_rate={decay_rate})")
+
+    def index_of(self, symbol: str) -> int:
+        return self._index[symbol]
+
+    def covers(self, symbols: Sequence[str]) -> bool:
+        """Whether every symbol has a slot in the kernel"""
+        return all(symbol in self._index for symbol in symbols)
+
+    @property
+    def impact(self) -> np.ndarray:
+        return self.impact_model.impact
+
+    # ------------------------------------------------------------------
+    # State loading
+    # ------------------------------------------------------------------
+
+    def set_order(self, symbol: str, order_id: str, side: Side, remaining_qty: int,
+                  participation_rate: float, start_timestamp: datetime) -> None:
+        """Register the active order for a symbol"""
+        with self._lock:
+            i = self._index[symbol]
+            self.order_ids[i] = order_id
+            self.side[i] = 1 if side == Side.Buy else -1
+            self.remaining_qty[i] = int(remaining_qty)
+            self.participation_rate[i] = float(participation_rate)
+            self.order_start[i] = ensure_timezone_aware(start_timestamp).timestamp()
+
+    def clear_order(self, symbol: str) -> None:
+        """Remove the active order for a symbol (cancelled or completed)"""
+        with self._lock:
+            i = self._index[symbol]
+            self.order_ids[i] = None
+            self.side[i] = 0
+            self.remaining_qty[i] = 0
+            self.participation_rate[i] = 0.0
+            self.order_start[i] = np.inf
+
+    def add_cancel(self, symbol: str, timestamp: datetime) -> None:
+        """Register a cancel request for a symbol's order"""
+        with self._lock:
+            i = self._index[symbol]
+            self.cancel_times.setdefault(i, []).append(ensure_timezone_aware(timestamp).timestamp())
+
+    def set_positions(self, positions: Dict[str, Decimal]) -> None:
+        """Load current positions (symbols missing from the dict are flat)"""
+        with self._lock:
+            self.position[:] = 0.0
+            for symbol, quantity in positions.items():
+                i = self._index.get(symbol)
+                if i is not None:
+                    self.position[i] = float(quantity)
+
+    def load_from_markets(self, markets: Dict[str, "Market"]) -> None:
+        """Copy impact state, the active order and cancel requests of every Market into the arrays"""
+        with self._lock:
+            for symbol, market in markets.items():
+                if symbol not in self._index:
+                    continue
+
+                snapshot = market.impact.get_impact_state(symbol)
+                if snapshot is not None:
+                    self.impact_model.load_snapshot(symbol, snapshot)
+
+                self.clear_order(symbol)
+                for order in market.get_active_orders():
+                    self.set_order(symbol, order.get_order_id(), order.get_side(),
+                                   order.get_remaining_qty(), order.get_participation_rate(),
+                                   order.get_start_timestamp())
+                    break
+
+                self.cancel_times.pop(self._index[symbol], None)
+                for order, submit_timestamp in market.get_cancel_orders():
+                    if order.get_remaining_qty() > 0:
+                        self.add_cancel(symbol, submit_timestamp)
+
+    # ------------------------------------------------------------------
+    # Minute processing
+    # ------------------------------------------------------------------
+
+    def _apply_trade(self, mask: np.ndarray, trade_qty: np.ndarray, direction: np.ndarray,
+                     start_ts: np.ndarray, end_ts: np.ndarray) -> np.ndarray:
+        """Decay then add new trade impact for masked symbols, returning impacted prices"""
+        self.impact_model.apply_trades(mask, trade_qty, self.volume, direction, start_ts, end_ts)
+
+        prices = np.full_like(self.price, np.nan)
+        prices[mask] = self.impact_model.impacted_prices(self.price)[mask]
+        return prices
+
+    def _bucket_boundaries(self, active: np.ndarray, scheduled: np.ndarray, fill_start: np.ndarray,
+                           start_ts: float, end_ts: float) -> np.ndarray:
+        """Sorted bucket boundaries per symbol, padded with end_ts.
+
+        Same set as ExecutionManager.process_executions builds: bin start and
+        end, the start of a scheduled fill and every cancel request falling
+        inside the bin. Repeated boundaries give empty buckets, which are skipped.
+        """
+        n = len(self.symbols)
+        cancel_rows = {i: [ts for ts in times if start_ts < ts < end_ts]
+                       for i, times in self.cancel_times.items() if active[i]}
+        width = max((len(times) for times in cancel_rows.values()), default=0)
+
+        boundaries = np.full((n, 3 + width), end_ts, dtype=np.float64)
+        boundaries[:, 0] = start_ts
+        boundaries[:, 1] = np.where(scheduled & (fill_start < end_ts), fill_start, end_ts)
+        for i, times in cancel_rows.items():
+            boundaries[i, 3:3 + len(times)] = times
+
+        boundaries.sort(axis=1)
+        return boundaries
+
+    def process_minute(self, start_timestamp: datetime, end_timestamp: datetime,
+                       prices: np.ndarray, volumes: np.ndarray,
+                       mask: Optional[np.ndarray] = None) -> KernelMinuteResult:
+        """Fill one minute bin for the whole universe (or the masked symbols).
+
+        prices, volumes and mask are aligned with self.symbols. Each symbol's
+        bin is split into the same buckets as the per-Market path, and every
+        bucket either fills the resting order or decays impact with its own
+        max(1, bins_elapsed) step. Quantities are summed over the buckets;
+        trade prices are those of the last bucket that traded.
+        """
+        process_start = time.time()
+        start_timestamp = ensure_timezone_aware(start_timestamp)
+        end_timestamp = ensure_timezone_aware(end_timestamp)
+        start_ts = start_timestamp.timestamp()
+        end_ts = end_timestamp.timestamp()
+
+        with self._lock:
+            n = len(self.symbols)
+            active = np.ones(n, dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+            self.price[active] = np.asarray(prices, dtype=np.float64)[active]
+            self.volume[active] = np.asarray(volumes, dtype=np.int64)[active]
+
+            # Orders the Market would schedule: active, started by bin end, non-zero participation
+            participation_qty = np.minimum(self.remaining_qty,
+                                           np.trunc(self.volume * self.participation_rate).astype(np.int64))
+            scheduled = active & (self.remaining_qty > 0) & (self.order_start <= end_ts) & (participation_qty > 0)
+            fill_start = np.maximum(self.order_start, start_ts)
+
+            boundaries = self._bucket_boundaries(active, scheduled, fill_start, start_ts, end_ts)
+            direction = self.side.astype(np.float64)
+
+            fill_qty = np.zeros(n, dtype=np.int64)
+            risk_off = np.zeros(n, dtype=np.int64)
+            risk_on = np.zeros(n, dtype=np.int64)
+            risk_off_price = np.full(n, np.nan)
+            risk_on_price = np.full(n, np.nan)
+            flips = np.zeros(n, dtype=bool)
+
+            for j in range(boundaries.shape[1] - 1):
+                bucket_start = boundaries[:, j]
+                bucket_end = boundaries[:, j + 1]
+                in_bucket = active & (bucket_end > bucket_start)
+                if not in_bucket.any():
+                    continue
+
+                # Fills become eligible once the order starts before the bucket end
+                eligible = in_bucket & scheduled & (self.order_start < bucket_end) & (self.remaining_qty > 0)
+
+                # Buckets without an eligible fill only decay impact
+                self.impact_model.decay(in_bucket & ~eligible, bucket_start, bucket_end, self.volume)
+
+                # Fill quantity from the bucket's share of the bin volume; a zero fill leaves impact untouched
+                seconds = np.clip(np.trunc(bucket_end - bucket_start), 0, 60)
+                available = self.volume * (seconds / 60.0)
+                bucket_qty = np.where(eligible,
+                                      np.minimum(np.trunc(available * self.participation_rate), self.remaining_qty),
+                                      0).astype(np.int64)
+                traded = bucket_qty > 0
+                if not traded.any():
+                    continue
+
+                # Split into risk-off (reduce existing position) and risk-on portions
+                reducing = traded & (self.position != 0) & (np.sign(self.position) == -direction)
+                bucket_off = np.where(reducing, np.minimum(bucket_qty, np.abs(self.position)), 0).astype(np.int64)
+                bucket_on = bucket_qty - bucket_off
+
+                first = bucket_off > 0
+                if first.any():
+                    prices_off = self._apply_trade(first, bucket_off.astype(np.float64), direction,
+                                                   bucket_start, bucket_end)
+                    risk_off_price[first] = prices_off[first]
+
+                second = bucket_on > 0
+                if second.any():
+                    prices_on = self._apply_trade(second, bucket_on.astype(np.float64), direction,
+                                                  bucket_start, bucket_end)
+                    risk_on_price[second] = prices_on[second]
+
+                # Book keeping for resting orders and positions
+                self.remaining_qty -= bucket_qty
+                self.position += direction * bucket_qty
+                fill_qty += bucket_qty
+                risk_off += bucket_off
+                risk_on += bucket_on
+                flips |= first & second
+
+            traded = fill_qty > 0
+            completed = traded & (self.remaining_qty <= 0)
+            self.side[completed] = 0
+            self.order_start[completed] = np.inf
+
+            # Cancel requests at or before the bin end can no longer split a later bin
+            for i in np.flatnonzero(active):
+                times = self.cancel_times.get(i)
+                if times:
+                    pending = [ts for ts in times if ts > end_ts]
+                    if pending:
+                        self.cancel_times[i] = pending
+                    else:
+                        del self.cancel_times[i]
+
+            impacted_price = self.impact_model.impacted_prices(self.price)
+
+        duration_ms = (time.time() - process_start) * 1000
+        self.logger.log_performance(
+            operation="execution_kernel_minute",
+            duration_ms=duration_ms,
+            additional_metrics={
+                "instruments": int(active.sum()),
+                "buckets": boundaries.shape[1] - 1,
+                "fills": int(traded.sum()),
+                "flips": int(flips.sum()),
+                "total_fill_quantity": int(fill_qty.sum())
+            }
+        )
+
+        return KernelMinuteResult(
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+            fill_qty=fill_qty,
+            risk_off_qty=risk_off,
+            risk_on_qty=risk_on,
+            risk_off_price=risk_off_price,
+            risk_on_price=risk_on_price,
+            impact=self.impact.copy(),
+            impacted_price=impacted_price
+        )
+
+    def process_minute_bars(self, start_timestamp: datetime, end_timestamp: datetime,
+                            minute_bars: List[dict]) -> KernelMinuteResult:
+        """Fill one minute from the same minute-bar dicts Exchange.update_market_data takes"""
+        prices = self.price.copy()
+        volumes = np.zeros(len(self.symbols), dtype=np.int64)
+
+        for bar in minute_bars:
+            i = self._index.get(bar.get('symbol'))
+            if i is None:
+                continue
+            prices[i] = float(bar['price'])
+            volumes[i] = int(bar['volume'])
+
+        return self.process_minute(start_timestamp, end_timestamp, prices, volumes)
+
+    # ------------------------------------------------------------------
+    # Parity with the per-Market path
+    # ------------------------------------------------------------------
+
+    def reconcile_with_markets(self, markets: Dict[str, "Market"],
+                               tolerance: Optional[float] = None) -> Dict[str, dict]:
+        """Compare kernel state with per-Market state after both processed the same bars.
+
+        Returns {symbol: {field: (kernel_value, market_value)}} for every
+        symbol whose impact or remaining quantity differs by more than tolerance.
+        """
+        tolerance = self.tolerance if tolerance is None else tolerance
+        mismatches: Dict[str, dict] = {}
+
+        with self._lock:
+            for symbol, market in markets.items():
+                i = self._index.get(symbol)
+                if i is None:
+                    continue
+
+                diffs = {}
+                snapshot = market.impact.get_impact_state(symbol)
+                market_impact = float(snapshot.current_impact) if snapshot else 0.0
+                if abs(self.impact[i] - market_impact) > tolerance:
+                    diffs['impact'] = (float(self.impact[i]), market_impact)
+
+                order_id = self.order_ids[i]
+                if order_id is not None:
+                    order = market.get_order(order_id)
+                    if order is not None and int(order.get_remaining_qty()) != int(self.remaining_qty[i]):
+                        diffs['remaining_qty'] = (int(self.remaining_qty[i]), int(order.get_remaining_qty()))
+
+                if diffs:
+                    mismatches[symbol] = diffs
+
+        if mismatches:
+            self.logger.warning(f"ExecutionKernel diverged from Market state for {len(mismatches)} symbols "
+                                f"(tolerance={tolerance})")
+
+        return mismatches
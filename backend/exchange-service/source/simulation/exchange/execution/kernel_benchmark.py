@@ -0,0 +1,242 @@
+"""
+Parity check and benchmark for the columnar execution kernel.
+
+    python -m source.simulation.exchange.execution.kernel_benchmark --check-symbols 500 --sizes 500 5000 20000
+
+Builds a book where a share of the symbols carry orders starting inside a minute (so fills begin
+mid-bin), some of them against an opposite position (so fills flip it), and a share carry cancel
+requests, half of them followed by a new order, so bins split into several buckets. Fills run through
+the real Market, ExecutionManager and ImpactState; PositionOnlyExecutionManager only leaves out the
+account checks, order/trade managers and storage.
+
+The standalone check runs ExecutionKernel.process_minute next to the per-Market path and reconciles
+impact and remaining quantity every minute. The hybrid check runs Exchange.update_market_data_batch
+with EXECUTION_KERNEL off and on and compares impact, remaining quantities, positions and the prices
+published to the impact manager. The benchmark times one minute of the book per path at each size; the
+per-Market path is only timed up to --legacy-symbols.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+
+os.environ.setdefault('ENVIRONMENT', 'benchmark')
+
+from source.config import app_config
+from source.simulation.core.enums.side import Side
+from source.simulation.exchange.exchange_impl import Exchange
+from source.simulation.exchange.execution.execution import ExecutionManager
+
+# The book managers report their missing book context on stdout while app_state is built
+with contextlib.redirect_stdout(io.StringIO()):
+    from source.orchestration.app_state.state_manager import app_state
+
+SESSION_START = datetime(2025, 3, 3, 14, 30, tzinfo=timezone.utc)
+
+
+def _quiet():
+    """Market and ExecutionManager print per symbol per minute; keep stdout for the results"""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+class PositionOnlyExecutionManager(ExecutionManager):
+    """Fills move impact, the order and the position only (no account, order/trade managers or storage)"""
+
+    def _execute_single_fill(self, order, fill_qty, is_risk_off, initial_side, timestamp, currency, price,
+                             bucket_volume, start_timestamp, end_timestamp, trade_id):
+        is_buy = order.get_side() == Side.Buy
+        impacted_price = self._market.impact.calculate_price_impact(
+            symbol=self.instrument,
+            currency=currency,
+            base_price=price,
+            trade_volume=int(fill_qty),
+            total_volume=bucket_volume,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+            trade_id=trade_id,
+            is_buy=is_buy
+        )
+        order.record_fill(int(fill_qty), impacted_price, timestamp)
+        app_state.portfolio_manager.update_position(self.instrument, fill_qty if is_buy else -fill_qty,
+                                                    currency, impacted_price)
+
+
+def make_bars(n_symbols: int, n_minutes: int, seed: int = 0):
+    """Minute bars per minute, in the dict form Exchange.update_market_data takes"""
+    rng = random.Random(seed)
+    prices = [rng.uniform(5, 500) for _ in range(n_symbols)]
+    minutes = []
+    for minute in range(n_minutes):
+        bars = []
+        for i in range(n_symbols):
+            prices[i] *= 1 + rng.gauss(0, 0.001)
+            price = round(prices[i], 2)
+            bars.append({
+                "symbol": f"S{i:05d}",
+                "timestamp": SESSION_START + timedelta(minutes=minute + 1),
+                "currency": "USD",
+                "open": price, "high": price, "low": price, "close": price,
+                "vwap": price, "vwas": 0.0, "vwav": 0.0,
+                "price": price,
+                "volume": rng.randrange(1_000, 200_000),
+                "count": 100
+            })
+        minutes.append(bars)
+    return minutes
+
+
+def build_exchange(n_symbols: int, n_minutes: int, seed: int = 0, order_share: float = 0.02,
+                   cancel_share: float = 0.01) -> Exchange:
+    """A fresh exchange wired into app_state with orders, positions and cancel requests"""
+    rng = random.Random(seed + 1)
+    exchange = Exchange()
+    app_state.exchange = exchange
+    app_state.portfolio_manager.tracking = False
+    app_state.portfolio_manager.positions.clear()
+    app_state.impact_manager.tracking = False
+    app_state.impact_manager.impacts.clear()
+    app_state.market_open = SESSION_START
+    app_state.initialize_bin(SESSION_START + timedelta(minutes=1))
+
+    def in_session():
+        return SESSION_START + timedelta(seconds=rng.randrange(-60, n_minutes * 60))
+
+    for i in range(n_symbols):
+        symbol = f"S{i:05d}"
+        with _quiet():
+            _add_orders(exchange, symbol, i, rng, in_session, order_share, cancel_share)
+    return exchange
+
+
+def _add_orders(exchange, symbol, i, rng, in_session, order_share, cancel_share):
+    market = exchange.get_market(symbol)
+    market.execution_manager = PositionOnlyExecutionManager(symbol, market)
+
+    draw = rng.random()
+    if draw < order_share:
+        side = rng.choice([Side.Buy, Side.Sell])
+        if rng.random() < 0.5:
+            held = rng.randrange(100, 5_000) * (-1 if side == Side.Buy else 1)
+            app_state.portfolio_manager.update_position(symbol, Decimal(held), "USD", Decimal('100'))
+        market.add_order(in_session(), side, rng.randrange(500, 50_000), "USD", None, f"C{i}", "VWAP_A_ALGO",
+                         participation_rate=rng.choice([0.05, 0.1, 0.2]), skip_order_manager=True)
+    elif draw < order_share + cancel_share:
+        order_id = market.add_order(in_session(), rng.choice([Side.Buy, Side.Sell]), 10_000, "USD", None,
+                                    f"C{i}", "VWAP_A_ALGO", skip_order_manager=True)
+        market.delete_order(order_id, in_session())
+        if rng.random() < 0.5:
+            market.add_order(in_session(), rng.choice([Side.Buy, Side.Sell]), rng.randrange(500, 50_000),
+                             "USD", None, f"D{i}", "VWAP_A_ALGO", skip_order_manager=True)
+
+
+def book_state(exchange: Exchange) -> dict:
+    """Impact, remaining quantities, positions and published prices after a run"""
+    exchange._release_kernel()
+    impact, remaining = {}, {}
+    for symbol, market in exchange.instrument_to_market.items():
+        snapshot = market.impact.get_impact_state(symbol)
+        impact[symbol] = float(snapshot.current_impact) if snapshot else 0.0
+        for order in market.get_buy_orders() + market.get_sell_orders():
+            remaining[order.get_cl_ord_id()] = int(order.get_remaining_qty())
+    positions = {symbol: position.quantity for symbol, position in app_state.portfolio_manager.positions.items()}
+    prices = {symbol: state.impacted_price for symbol, state in app_state.impact_manager.get_all_impacts().items()}
+    return {"impact": impact, "remaining": remaining, "positions": positions, "prices": prices}
+
+
+def run_batches(exchange: Exchange, minutes, use_kernel: bool) -> float:
+    """Feed every minute through update_market_data_batch, returning seconds spent in it"""
+    app_config.execution_kernel = use_kernel
+    elapsed = 0.0
+    for bars in minutes:
+        with _quiet():
+            started = time.perf_counter()
+            exchange.update_market_data_batch(bars)
+            elapsed += time.perf_counter() - started
+            app_state.advance_bin()
+    return elapsed
+
+
+def check_standalone(n_symbols: int, n_minutes: int, seed: int = 0):
+    minutes = make_bars(n_symbols, n_minutes, seed)
+    exchange = build_exchange(n_symbols, n_minutes, seed)
+    kernel = exchange.build_execution_kernel(tolerance=1e-9)
+    app_config.execution_kernel = False
+
+    fills = 0
+    for minute, bars in enumerate(minutes):
+        start, end = app_state.get_current_timestamp(), app_state.get_next_timestamp()
+        with _quiet():
+            exchange.update_market_data_batch(bars)
+        result = kernel.process_minute_bars(start, end, bars)
+        fills += int((result.fill_qty > 0).sum())
+        mismatches = kernel.reconcile_with_markets(exchange.instrument_to_market)
+        assert not mismatches, f"minute {minute}: {dict(list(mismatches.items())[:5])}"
+        app_state.advance_bin()
+
+    split = sum(1 for market in exchange.instrument_to_market.values() if market.get_cancel_orders())
+    print(f"standalone ok: symbols={n_symbols:,} minutes={n_minutes} fills={fills:,} cancel-split symbols={split}")
+
+
+def check_hybrid(n_symbols: int, n_minutes: int, seed: int = 0):
+    minutes = make_bars(n_symbols, n_minutes, seed)
+
+    run_batches(build_exchange(n_symbols, n_minutes, seed), minutes, use_kernel=False)
+    expected = book_state(app_state.exchange)
+    run_batches(build_exchange(n_symbols, n_minutes, seed), minutes, use_kernel=True)
+    actual = book_state(app_state.exchange)
+
+    worst = max(abs(actual["impact"][symbol] - value) for symbol, value in expected["impact"].items())
+    assert worst <= 1e-9, worst
+    for field in ("remaining", "positions", "prices"):
+        assert actual[field] == expected[field], field
+    print(f"hybrid ok: symbols={n_symbols:,} minutes={n_minutes} max_impact_diff={worst:.1e} "
+          f"positions={len(actual['positions'])}")
+
+
+def benchmark(sizes, n_minutes: int, legacy_symbols: int, seed: int = 0):
+    print(f"\n{'symbols':>10} {'per-market_ms':>14} {'hybrid_ms':>10} {'kernel_ms':>10} {'speedup':>8}")
+    for n_symbols in sizes:
+        minutes = make_bars(n_symbols, n_minutes, seed)
+
+        legacy = None
+        if n_symbols <= legacy_symbols:
+            legacy = run_batches(build_exchange(n_symbols, n_minutes, seed), minutes, use_kernel=False)
+        hybrid = run_batches(build_exchange(n_symbols, n_minutes, seed), minutes, use_kernel=True)
+
+        exchange = build_exchange(n_symbols, n_minutes, seed)
+        kernel = exchange.build_execution_kernel()
+        standalone = 0.0
+        for bars in minutes:
+            started = time.perf_counter()
+            kernel.process_minute_bars(app_state.get_current_timestamp(), app_state.get_next_timestamp(), bars)
+            standalone += time.perf_counter() - started
+            app_state.advance_bin()
+
+        per_minute = [f"{value / n_minutes * 1000:.1f}" if value is not None else '-'
+                      for value in (legacy, hybrid, standalone)]
+        speedup = f"{legacy / hybrid:.1f}x" if legacy is not None else '-'
+        print(f"{n_symbols:>10,} {per_minute[0]:>14} {per_minute[1]:>10} {per_minute[2]:>10} {speedup:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parity check and benchmark for the columnar execution kernel")
+    parser.add_argument('--check-symbols', type=int, default=500, help="symbols for the checks (0 to skip)")
+    parser.add_argument('--check-minutes', type=int, default=30)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 5000, 20000])
+    parser.add_argument('--minutes', type=int, default=3, help="minutes timed per size")
+    parser.add_argument('--legacy-symbols', type=int, default=20000,
+                        help="largest size the per-Market path is timed at")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Markets, execution and impact log per symbol per minute; keep the output about the results
+    logging.disable(logging.WARNING)
+    if args.check_symbols:
+        check_standalone(args.check_symbols, args.check_minutes, args.seed)
+        check_hybrid(args.check_symbols, args.check_minutes, args.seed)
+    benchmark(args.sizes, args.minutes, args.legacy_symbols, args.seed)
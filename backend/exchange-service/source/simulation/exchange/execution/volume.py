@@ -1,203 +1,210 @@
-import time
-from datetime import datetime
+from datetime import datetime, timezone
 from threading import RLock
+from types import MappingProxyType
+from typing import Dict, Mapping, Optional
 
 from source.exchange_logging.utils import get_exchange_logger
-from source.exchange_logging.context import transaction_scope
 from source.utils.timezone_utils import ensure_timezone_aware, to_iso_string
 
 
 class EnhancedVolumeTracker:
-    """Enhanced volume tracking with time-based calculations and comprehensive logging"""
+    """Enhanced volume tracking with time-based calculations over a bounded lookback.
+
+    Minute volumes live in a fixed-capacity ring buffer indexed by absolute
+    minute number (epoch seconds // 60) modulo the capacity, so memory stays
+    flat for the lifetime of a session and every per-minute lookup, update
+    and participation query is O(1). Only the lookback_minutes minutes up to
+    the latest update are retained: when the latest minute advances, slots
+    holding minutes that fell out of that window are evicted even if no
+    newer minute has reused them (e.g. across overnight gaps).
+    """
+
+    def __init__(self, lookback_minutes: Optional[int] = None):
+        if lookback_minutes is None:
+            from source.config import app_config
+            lookback_minutes = app_config.volume_lookback_minutes
+
+        if lookback_minutes <= 0:
+            raise ValueError(f"lookback_minutes must be positive, got {lookback_minutes}")
 
-    def __init__(self):
         self._lock = RLock()
-        self.minute_volume = {}  # Dict[datetime, int]
+        self._capacity = lookback_minutes
+
+        # Ring buffer slots: absolute minute index held by the slot and its volume
+        self._slot_minutes = [None] * lookback_minutes
+        self._slot_volumes = [0] * lookback_minutes
+        self._minute_volume: Dict[datetime, int] = {}  # Retained volumes keyed by UTC minute
+        self._retained_minutes = 0
+        self._retained_volume = 0
+        self._latest_minute: Optional[int] = None
+
         self.current_bin_volume = 0
         self.total_volume = 0
         self.logger = get_exchange_logger(__name__)
 
-        self.logger.info("EnhancedVolumeTracker initialized")
+        self.logger.info(f"EnhancedVolumeTracker initialized (lookback: {lookback_minutes} minutes)")
+
+    @staticmethod
+    def _minute_index(timestamp: datetime) -> int:
+        return int(ensure_timezone_aware(timestamp).timestamp()) // 60
+
+    @property
+    def lookback_minutes(self) -> int:
+        return self._capacity
+
+    @staticmethod
+    def _minute_key(minute: int) -> datetime:
+        return datetime.fromtimestamp(minute * 60, tz=timezone.utc)
+
+    @property
+    def minute_volume(self) -> Mapping[datetime, int]:
+        """Retained minute volumes keyed by UTC minute (read-only view, kept up to date)"""
+        return MappingProxyType(self._minute_volume)
+
+    def _evict_slot(self, slot: int) -> None:
+        """Drop the minute held by a slot (caller holds the lock)"""
+        minute = self._slot_minutes[slot]
+        if minute is None:
+            return
+        self._retained_minutes -= 1
+        self._retained_volume -= self._slot_volumes[slot]
+        del self._minute_volume[self._minute_key(minute)]
+        self._slot_minutes[slot] = None
+        self._slot_volumes[slot] = 0
+
+    def _advance_window(self, minute: int) -> None:
+        """Move the latest minute forward, evicting minutes that left the lookback (caller holds the lock)"""
+        if self._latest_minute is not None:
+            # Minutes in (old latest - capacity, new latest - capacity] fall out of the window
+            first_expired = self._latest_minute - self._capacity + 1
+            last_expired = minute - self._capacity
+            if last_expired - first_expired + 1 >= self._capacity:
+                for slot, slot_minute in enumerate(self._slot_minutes):
+                    if slot_minute is not None and slot_minute <= last_expired:
+                        self._evict_slot(slot)
+            else:
+                for expired in range(first_expired, last_expired + 1):
+                    slot = expired % self._capacity
+                    if self._slot_minutes[slot] == expired:
+                        self._evict_slot(slot)
+        self._latest_minute = minute
 
     def update_volume(self, timestamp: datetime, volume: int):
-        """Update volume for a specific timestamp with detailed logging"""
-
-        # Ensure timezone-aware timestamp
-        timestamp = ensure_timezone_aware(timestamp)
-
-        with transaction_scope("update_volume", self.logger,
-                               timestamp=to_iso_string(timestamp), volume=volume) as txn_id:
-
-            update_start_time = time.time()
-
-            with self._lock:
-                try:
-                    # Store previous state for logging
-                    prev_current_volume = self.current_bin_volume
-                    prev_total_volume = self.total_volume
-
-                    # Update current state
-                    self.current_bin_volume = volume
-                    self.total_volume += volume
-
-                    # Update minute-level tracking
-                    key = timestamp.replace(second=0, microsecond=0)
-                    prev_minute_volume = self.minute_volume.get(key, 0)
-
-                    if key not in self.minute_volume:
-                        self.minute_volume[key] = 0
-                    self.minute_volume[key] += volume
-
-                    # Log the volume update
-                    self.logger.log_state_change(
-                        object_name="VolumeTracker",
-                        old_state={
-                            "current_bin_volume": prev_current_volume,
-                            "total_volume": prev_total_volume,
-                            "minute_volume": prev_minute_volume
-                        },
-                        new_state={
-                            "current_bin_volume": self.current_bin_volume,
-                            "total_volume": self.total_volume,
-                            "minute_volume": self.minute_volume[key]
-                        },
-                        change_reason=f"volume_update[{txn_id}]"
-                    )
-
-                    # Log significant volume changes
-                    if volume > 10000:  # Log large volume updates
-                        self.logger.log_business_event("LARGE_VOLUME_UPDATE", {
-                            "timestamp": to_iso_string(timestamp),
-                            "volume": volume,
-                            "minute_key": to_iso_string(key),
-                            "cumulative_minute_volume": self.minute_volume[key],
-                            "total_session_volume": self.total_volume,
-                            "transaction_id": txn_id
-                        })
-
-                    # Performance logging
-                    update_duration = (time.time() - update_start_time) * 1000
-
-                    self.logger.log_performance(
-                        operation="volume_update",
-                        duration_ms=update_duration,
-                        additional_metrics={
-                            "volume": volume,
-                            "minute_entries": len(self.minute_volume),
-                            "total_volume": self.total_volume
-                        }
-                    )
-
-                    self.logger.debug(f"Volume updated: {prev_current_volume} -> {volume} at {timestamp}")
-
-                except Exception as e:
-                    self.logger.error(f"Error updating volume for {timestamp}: {e}")
-                    raise ValueError(f"Error updating volume: {e}")
+        """Update volume for a specific timestamp"""
+
+        with self._lock:
+            try:
+                minute = self._minute_index(timestamp)
+
+                self.current_bin_volume = volume
+                self.total_volume += volume
+
+                # Minutes older than the lookback window only count toward the session total
+                if self._latest_minute is not None and minute <= self._latest_minute - self._capacity:
+                    self.logger.debug(f"Volume for {timestamp} is outside the {self._capacity} minute lookback")
+                    return
+
+                if self._latest_minute is None or minute > self._latest_minute:
+                    self._advance_window(minute)
+
+                slot = minute % self._capacity
+                if self._slot_minutes[slot] != minute:
+                    # Evict whatever older minute still occupies this slot
+                    self._evict_slot(slot)
+                    self._slot_minutes[slot] = minute
+                    self._retained_minutes += 1
+
+                self._slot_volumes[slot] += volume
+                self._retained_volume += volume
+                self._minute_volume[self._minute_key(minute)] = self._slot_volumes[slot]
+
+                # Log significant volume changes
+                if volume > 10000:  # Log large volume updates
+                    self.logger.log_business_event("LARGE_VOLUME_UPDATE", {
+                        "timestamp": to_iso_string(timestamp),
+                        "volume": volume,
+                        "cumulative_minute_volume": self._slot_volumes[slot],
+                        "total_session_volume": self.total_volume
+                    })
+
+                self.logger.debug(f"Volume updated: {volume} at {timestamp}")
+
+            except Exception as e:
+                self.logger.error(f"Error updating volume for {timestamp}: {e}")
+                raise ValueError(f"Error updating volume: {e}")
 
     def get_current_minute_volume(self) -> int:
-        """Get total volume for current minute with logging"""
+        """Get total volume for current minute"""
         with self._lock:
-            volume = self.current_bin_volume
-            self.logger.debug(f"Retrieved current minute volume: {volume}")
-            return volume
+            return self.current_bin_volume
 
     def get_minute_volume(self, timestamp: datetime) -> int:
-        """Get volume for a specific minute"""
+        """Get volume for a specific minute (0 if outside the lookback)"""
         with self._lock:
-            # Ensure timezone-aware timestamp
-            timestamp = ensure_timezone_aware(timestamp)
-            key = timestamp.replace(second=0, microsecond=0)
-            volume = self.minute_volume.get(key, 0)
-            self.logger.debug(f"Retrieved volume for {key}: {volume}")
-            return volume
+            minute = self._minute_index(timestamp)
+            slot = minute % self._capacity
+            if self._slot_minutes[slot] == minute:
+                return self._slot_volumes[slot]
+            return 0
 
     def get_available_volume(self, start_time: datetime, end_time: datetime) -> float:
-        """Calculate available volume based on remaining time in bin with detailed logging"""
+        """Calculate available volume based on remaining time in bin"""
 
         # Ensure timezone-aware timestamps
         start_time = ensure_timezone_aware(start_time)
         end_time = ensure_timezone_aware(end_time)
 
-        with transaction_scope("calculate_available_volume", self.logger,
-                               start_time=to_iso_string(start_time),
-                               end_time=to_iso_string(end_time)) as txn_id:
-
-            calculation_start_time = time.time()
-
-            with self._lock:
-                try:
-                    # Convert to same timezone for calculation
-                    if start_time.tzinfo != end_time.tzinfo:
-                        start_time = start_time.astimezone(end_time.tzinfo)
-
-                    # INCLUDE START_TIME, DO NOT INCLUDE END_TIME
-                    remaining_seconds = int((end_time - start_time).total_seconds())
-                    remaining_seconds = min(60, max(0, remaining_seconds))
-
-                    # Calculate proportional volume available
-                    proportion = remaining_seconds / 60.0
-                    available = self.current_bin_volume * proportion
-
-                    self.logger.log_calculation(
-                        description="Available volume calculation",
-                        inputs={
-                            "start_time": to_iso_string(start_time),
-                            "end_time": to_iso_string(end_time),
-                            "current_bin_volume": self.current_bin_volume,
-                            "remaining_seconds": remaining_seconds
-                        },
-                        result=available,
-                        details={
-                            "time_proportion": proportion,
-                            "total_seconds_in_minute": 60,
-                            "transaction_id": txn_id
-                        }
-                    )
-
-                    # Log warning for unusual time calculations
-                    if remaining_seconds <= 0:
-                        self.logger.warning(f"Zero or negative remaining seconds: {remaining_seconds}")
-                    elif remaining_seconds > 60:
-                        self.logger.warning(f"Remaining seconds exceeds 60: {remaining_seconds}")
-
-                    # Performance logging
-                    calculation_duration = (time.time() - calculation_start_time) * 1000
-
-                    self.logger.log_performance(
-                        operation="available_volume_calculation",
-                        duration_ms=calculation_duration,
-                        additional_metrics={
-                            "remaining_seconds": remaining_seconds,
-                            "proportion": f"{proportion:.4f}",
-                            "available_volume": f"{available:.2f}"
-                        }
-                    )
-
-                    self.logger.debug(
-                        f"Available volume: {available:.2f} = {self.current_bin_volume} * ({remaining_seconds}/60)")
-
-                    return available
-
-                except Exception as e:
-                    self.logger.error(f"Error calculating available volume: {e}")
-                    raise ValueError(f"Error calculating available volume: {e}")
+        with self._lock:
+            try:
+                # INCLUDE START_TIME, DO NOT INCLUDE END_TIME
+                remaining_seconds = int((end_time - start_time).total_seconds())
+                if remaining_seconds <= 0:
+                    self.logger.warning(f"Zero or negative remaining seconds: {remaining_seconds}")
+                elif remaining_seconds > 60:
+                    self.logger.warning(f"Remaining seconds exceeds 60: {remaining_seconds}")
+                remaining_seconds = min(60, max(0, remaining_seconds))
+
+                # Calculate proportional volume available
+                available = self.current_bin_volume * (remaining_seconds / 60.0)
+
+                self.logger.debug(
+                    f"Available volume: {available:.2f} = {self.current_bin_volume} * ({remaining_seconds}/60)")
+
+                return available
+
+            except Exception as e:
+                self.logger.error(f"Error calculating available volume: {e}")
+                raise ValueError(f"Error calculating available volume: {e}")
+
+    def get_average_minute_volume(self) -> float:
+        """Average volume per retained minute in the lookback window"""
+        with self._lock:
+            return self._retained_volume / max(1, self._retained_minutes)
+
+    def get_participation_rate(self, quantity: int, timestamp: Optional[datetime] = None) -> float:
+        """Share of a minute's volume represented by quantity (current bin if no timestamp)"""
+        with self._lock:
+            volume = self.current_bin_volume if timestamp is None else self.get_minute_volume(timestamp)
+            return quantity / volume if volume > 0 else 0.0
 
     def get_total_volume(self) -> int:
         """Get total cumulative volume"""
         with self._lock:
-            self.logger.debug(f"Retrieved total session volume: {self.total_volume}")
             return self.total_volume
 
     def get_volume_stats(self) -> dict:
         """Get comprehensive volume statistics"""
         with self._lock:
+            retained = [self._slot_volumes[slot] for slot, minute in enumerate(self._slot_minutes)
+                        if minute is not None]
             stats = {
                 "current_bin_volume": self.current_bin_volume,
                 "total_session_volume": self.total_volume,
-                "minute_entries": len(self.minute_volume),
-                "avg_minute_volume": self.total_volume / max(1, len(self.minute_volume)),
-                "max_minute_volume": max(self.minute_volume.values()) if self.minute_volume else 0,
-                "min_minute_volume": min(self.minute_volume.values()) if self.minute_volume else 0
+                "lookback_minutes": self._capacity,
+                "minute_entries": self._retained_minutes,
+                "avg_minute_volume": self._retained_volume / max(1, self._retained_minutes),
+                "max_minute_volume": max(retained) if retained else 0,
+                "min_minute_volume": min(retained) if retained else 0
             }
 
             self.logger.debug(f"Volume statistics: {stats}")
@@ -208,7 +215,12 @@ class EnhancedVolumeTracker:
         with self._lock:
             old_stats = self.get_volume_stats()
 
-            self.minute_volume.clear()
+            self._slot_minutes = [None] * self._capacity
+            self._slot_volumes = [0] * self._capacity
+            self._minute_volume = {}
+            self._retained_minutes = 0
+            self._retained_volume = 0
+            self._latest_minute = None
             self.current_bin_volume = 0
             self.total_volume = 0
 
@@ -225,15 +237,15 @@ class EnhancedVolumeTracker:
             self.logger.info("=== Volume Tracker Summary ===")
             self.logger.info(f"Current bin volume: {stats['current_bin_volume']:,}")
             self.logger.info(f"Total session volume: {stats['total_session_volume']:,}")
-            self.logger.info(f"Minutes tracked: {stats['minute_entries']}")
+            self.logger.info(f"Minutes tracked: {stats['minute_entries']} (lookback {stats['lookback_minutes']})")
             self.logger.info(f"Average per minute: {stats['avg_minute_volume']:,.0f}")
             self.logger.info(f"Max minute volume: {stats['max_minute_volume']:,}")
             self.logger.info(f"Min minute volume: {stats['min_minute_volume']:,}")
 
-            if self.minute_volume:
+            minute_volume = self.minute_volume
+            if minute_volume:
                 self.logger.info("Recent minute volumes:")
                 # Show last 5 minutes
-                recent_minutes = sorted(self.minute_volume.keys())[-5:]
+                recent_minutes = sorted(minute_volume.keys())[-5:]
                 for minute in recent_minutes:
-                    volume = self.minute_volume[minute]
-                    self.logger.info(f"  {minute.strftime('%H:%M')}: {volume:,}")
\ No newline at end of file
+                    self.logger.info(f"  {minute.strftime('%H:%M')}: {minute_volume[minute]:,}")
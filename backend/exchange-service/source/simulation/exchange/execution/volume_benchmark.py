@@ -0,0 +1,107 @@
+"""
+Lookback-window check and week-long memory soak for EnhancedVolumeTracker.
+
+    python -m source.simulation.exchange.execution.volume_benchmark --check-minutes 20000 --instruments 50 --days 7
+
+The window check feeds one tracker minute bars with overnight and weekend gaps and some repeated and
+late minutes, and compares every retained minute, minute_volume and the average against a plain dict
+filtered to the lookback after each update. The soak feeds a book of trackers a week of 24-hour
+sessions and asserts that traced Python memory after each day stays within --tolerance of day one.
+"""
+import argparse
+import gc
+import logging
+import random
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from source.simulation.exchange.execution.volume import EnhancedVolumeTracker
+
+SESSION_START = datetime(2025, 3, 3, 0, 0, tzinfo=timezone.utc)
+MINUTES_PER_DAY = 24 * 60
+
+
+def _minute_stream(n_minutes: int, seed: int = 0):
+    """Minute timestamps with overnight and weekend gaps, repeats and late bars"""
+    rng = random.Random(seed)
+    minute = 0
+    for _ in range(n_minutes):
+        draw = rng.random()
+        if draw < 0.002:
+            minute += rng.randrange(600, 4000)  # overnight / weekend gap
+        elif draw < 0.05:
+            minute -= rng.randrange(0, 30)  # repeated or late bar
+        else:
+            minute += 1
+        yield SESSION_START + timedelta(minutes=minute)
+
+
+def check_window(n_minutes: int, lookback: int, seed: int = 0):
+    rng = random.Random(seed)
+    tracker = EnhancedVolumeTracker(lookback_minutes=lookback)
+    reference = {}
+    latest = None
+
+    for timestamp in _minute_stream(n_minutes, seed):
+        volume = rng.randrange(0, 50_000)
+        tracker.update_volume(timestamp, volume)
+
+        latest = timestamp if latest is None else max(latest, timestamp)
+        floor = latest - timedelta(minutes=lookback)
+        if timestamp > floor:
+            reference[timestamp] = reference.get(timestamp, 0) + volume
+        reference = {minute: value for minute, value in reference.items() if minute > floor}
+
+        assert dict(tracker.minute_volume) == reference, timestamp
+        assert tracker.get_minute_volume(timestamp) == reference.get(timestamp, 0)
+        expected_average = sum(reference.values()) / max(1, len(reference))
+        assert abs(tracker.get_average_minute_volume() - expected_average) < 1e-9
+
+    print(f"window ok: minutes={n_minutes:,} lookback={lookback} retained={len(reference)}")
+
+
+def soak(n_instruments: int, n_days: int, lookback: int, tolerance: float, seed: int = 0):
+    rng = random.Random(seed)
+    trackers = [EnhancedVolumeTracker(lookback_minutes=lookback) for _ in range(n_instruments)]
+
+    gc.collect()
+    tracemalloc.start()
+    baseline = None
+    print(f"\n{'day':>4} {'updates':>11} {'traced_KB':>10} {'vs_day1':>8}")
+    try:
+        for day in range(n_days):
+            for minute in range(day * MINUTES_PER_DAY, (day + 1) * MINUTES_PER_DAY):
+                timestamp = SESSION_START + timedelta(minutes=minute)
+                for tracker in trackers:
+                    tracker.update_volume(timestamp, rng.randrange(0, 50_000))
+
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            baseline = baseline or current
+            growth = current / baseline - 1
+            updates = (day + 1) * MINUTES_PER_DAY * n_instruments
+            print(f"{day + 1:>4} {updates:>11,} {current / 1024:>10.0f} {growth:>+8.1%}")
+            assert growth <= tolerance, f"memory grew {growth:.1%} by day {day + 1}"
+    finally:
+        tracemalloc.stop()
+
+    retained = {tracker.get_volume_stats()["minute_entries"] for tracker in trackers}
+    assert retained == {lookback}, retained
+    print(f"soak ok: instruments={n_instruments} days={n_days} retained minutes per instrument={lookback}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Lookback-window check and week-long memory soak for the volume tracker")
+    parser.add_argument('--check-minutes', type=int, default=20000, help="minutes for the window check (0 to skip)")
+    parser.add_argument('--instruments', type=int, default=50)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--lookback', type=int, default=390)
+    parser.add_argument('--tolerance', type=float, default=0.02, help="allowed traced memory growth over day one")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # The tracker logs large volume updates; keep the output about the results
+    logging.disable(logging.WARNING)
+    if args.check_minutes:
+        check_window(args.check_minutes, args.lookback, args.seed)
+    soak(args.instruments, args.days, args.lookback, args.tolerance, args.seed)
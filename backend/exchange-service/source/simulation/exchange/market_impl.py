@@ -194,8 +194,8 @@ class Market(Market_ABC):
         """Update market state and process orders"""
 
         with transaction_scope("market_data_update", self.logger,
-                               instrument=self.instrument, price=market_data.get('price'),
-                               volume=market_data.get('volume')) as txn_id:
+                               lambda: {"instrument": self.instrument, "price": market_data.get('price'),
+                                        "volume": market_data.get('volume')}) as txn_id:
 
             update_start_time = time.time()
 
@@ -384,6 +384,17 @@ class Market(Market_ABC):
                         f"Error updating market state for {self.instrument} after {update_duration:.2f}ms: {e}")
                     raise ValueError(f"Error updating market state: {e}")
 
+    def update_idle_market_state(self, market_data: dict, stop_bin_timestamp: datetime) -> None:
+        """Record a minute bar for a market without open orders.
+
+        Used when the execution kernel handles impact decay for the minute:
+        only the volume tracker and last price move, as update_market_state
+        would leave them.
+        """
+        with self._lock:
+            self.volume_tracker.update_volume(ensure_timezone_aware(stop_bin_timestamp), int(market_data['volume']))
+            self._last_price = Decimal(str(market_data['price']))
+
     def get_instrument(self) -> str:
         return self.instrument
 
@@ -408,12 +419,22 @@ class Market(Market_ABC):
             self.logger.debug(f"Retrieved {len(sell_orders)} sell orders")
             return sell_orders
 
+    def get_active_orders(self) -> List[Order_ABC]:
+        with self._lock:
+            return [o for o in self._orders.values()
+                    if o.get_remaining_qty() > 0 and o.get_order_id() not in self._cancelled_orders]
+
     def get_cancel_orders(self) -> List:
         with self._lock:
             cancel_orders = [o for o in self._cancelled_orders.values()]
             self.logger.debug(f"Retrieved {len(cancel_orders)} pending cancellation orders")
             return cancel_orders
 
+    def has_open_orders(self) -> bool:
+        """Whether any order (active or pending cancellation) still has quantity left"""
+        with self._lock:
+            return any(o.get_remaining_qty() > 0 for o in self._orders.values())
+
     def parse_timestamp(self, timestamp_str: str) -> datetime:
         """Parse timestamp string to timezone-aware datetime object"""
         try:
@@ -4,6 +4,9 @@ from datetime import datetime
 import traceback
 from dataclasses import dataclass, field
 
+from source.simulation.managers.risk_engine import (
+    FACTORS, PortfolioRiskEngine, PortfolioRiskResult, RiskExposureMatrix
+)
 from source.simulation.managers.utils import TrackingManager, CallbackManager
 
 
@@ -149,6 +152,7 @@ class RiskManager(TrackingManager, CallbackManager):
 
         self.symbol_risk_data: Dict[str, RiskSnapshot] = {}
         self.portfolio_risk_data: Optional[PortfolioRiskSnapshot] = None
+        self.risk_engine = PortfolioRiskEngine()
 
     def evaluate_portfolio_risk(self, timestamp: datetime) -> None:
         """
@@ -173,126 +177,21 @@ class RiskManager(TrackingManager, CallbackManager):
             if hasattr(app_state, 'universe_manager'):
                 universe_data = app_state.universe_manager.get_all_symbols()
 
-            # Calculate total portfolio value
-            total_value = sum(abs(float(pos.mtm_value)) for pos in positions.values())
-            net_value = sum(float(pos.mtm_value) for pos in positions.values())
-
-            # CREATE SYMBOL-LEVEL RISK DATA for session service
-            for symbol, position in positions.items():
-                symbol_data = universe_data.get(symbol, {})
-                position_weight = float(position.mtm_value) / total_value if total_value > 0 else 0
-
-                # Calculate time to liquidate for this symbol
-                position_value = abs(float(position.mtm_value))
-                avg_daily_volume = symbol_data.get('avg_daily_volume', 10000000)
-                price = float(getattr(position, 'avg_price', 100))
-                daily_dollar_volume = avg_daily_volume * price
-                days_to_liquidate = position_value / (daily_dollar_volume * 0.20) if daily_dollar_volume > 0 else 999
-
-                # Create a risk snapshot for each symbol
-                risk_snapshot = RiskSnapshot(
-                    timestamp=timestamp.isoformat(),
-                    symbol=symbol,
-                    sector=symbol_data.get('sector', 'Technology'),
-                    industry=symbol_data.get('industry', 'Technology'),
-                    market_cap=symbol_data.get('market_cap', 1000000000),
-                    country=symbol_data.get('country', 'US'),
-                    currency=symbol_data.get('currency', 'USD'),
-                    avg_daily_volume=symbol_data.get('avg_daily_volume', 10000000),
-                    beta=symbol_data.get('beta', 1.2),
-                    growth=symbol_data.get('exposures', {}).get('growth', 0.1),
-                    momentum=symbol_data.get('exposures', {}).get('momentum', 0.05),
-                    quality=symbol_data.get('exposures', {}).get('quality', 0.08),
-                    value=symbol_data.get('exposures', {}).get('value', -0.02),
-                    size=symbol_data.get('exposures', {}).get('size', 0.0),
-                    volatility=symbol_data.get('volatility', 0.25),
-                    volatility_1d=0.15,
-                    volatility_5d=0.20,
-                    volatility_30d=0.25,
-                    var_95=symbol_data.get('volatility', 0.25) * 1.645,
-                    cvar_95=symbol_data.get('volatility', 0.25) * 2.0,
-                    tracking_error=symbol_data.get('tracking_error', 0.05),
-                    sharpe_ratio=1.0,
-                    information_ratio=0.5,
-                    max_drawdown=0.15,
-                    weight=position_weight,
-                    pnl=float(position.unrealized_pnl)
-                )
-                self.symbol_risk_data[symbol] = risk_snapshot
-
-            # Calculate portfolio beta (weighted average)
-            portfolio_beta = 0.0
-            total_weight = 0.0
-
-            if total_value > 0:
-                for symbol, position in positions.items():
-                    weight = abs(float(position.mtm_value)) / total_value
-                    symbol_data = universe_data.get(symbol, {})
-                    beta = symbol_data.get('beta', 1.0)
-                    portfolio_beta += weight * beta
-                    total_weight += weight
-
-                portfolio_beta = portfolio_beta / total_weight if total_weight > 0 else 1.0
-
-            # Calculate time to liquidate metrics
-            liquidation_times = []
-            for symbol, position in positions.items():
-                symbol_data = universe_data.get(symbol, {})
-                position_value = abs(float(position.mtm_value))
-                avg_daily_volume = symbol_data.get('avg_daily_volume', 0)
-
-                if avg_daily_volume > 0:
-                    price = float(getattr(position, 'avg_price', 100))
-                    daily_dollar_volume = avg_daily_volume * price
-                    days_to_liquidate = position_value / (daily_dollar_volume * 0.20)  # 20% participation
-                    liquidation_times.append(min(days_to_liquidate, 999))
-                else:
-                    liquidation_times.append(999)
-
-            max_ttl = max(liquidation_times) if liquidation_times else 0
-            avg_ttl = sum(liquidation_times) / len(liquidation_times) if liquidation_times else 0
-
-            # Calculate sector and country weights
-            sector_weights = {}
-            country_weights = {}
-            for symbol, position in positions.items():
-                symbol_data = universe_data.get(symbol, {})
-                weight = abs(float(position.mtm_value)) / total_value if total_value > 0 else 0
-
-                sector = symbol_data.get('sector', 'Unknown')
-                sector_weights[sector] = sector_weights.get(sector, 0) + weight
-
-                country = symbol_data.get('country', 'US')
-                country_weights[country] = country_weights.get(country, 0) + weight
-
-            # Calculate factor exposures
-            factor_exposures = {
-                'growth': 0.0, 'momentum': 0.0, 'quality': 0.0,
-                'value': 0.0, 'size': 0.0, 'volatility': 0.0
-            }
-
-            for symbol, position in positions.items():
-                symbol_data = universe_data.get(symbol, {})
-                weight = float(position.mtm_value) / total_value if total_value > 0 else 0
-                exposures = symbol_data.get('exposures', {})
-
-                for factor in factor_exposures.keys():
-                    factor_exposures[factor] += weight * exposures.get(factor, 0)
-
-            # Calculate concentration HHI
-            weights = [abs(float(pos.mtm_value)) / total_value for pos in positions.values()] if total_value > 0 else []
-            concentration_hhi = sum(w ** 2 for w in weights)
-
-            # Portfolio VaR (simplified)
-            portfolio_var = 0.0
-            for symbol, position in positions.items():
-                symbol_data = universe_data.get(symbol, {})
-                weight = float(position.mtm_value) / total_value if total_value > 0 else 0
-                volatility = symbol_data.get('volatility', 0.20)
-                var_95 = volatility * 1.645  # 95% confidence
-                portfolio_var += (weight ** 2) * (var_95 ** 2)
-
-            portfolio_var_95 = (portfolio_var ** 0.5) if portfolio_var > 0 else 0
+            # Build the exposure matrix once and compute every aggregate from it
+            matrix = self.risk_engine.build_matrix(positions, universe_data)
+            result = self.risk_engine.evaluate(matrix)
+            self._update_symbol_risk(matrix, result, timestamp)
+
+            total_value = result.total_value
+            net_value = result.net_value
+            portfolio_beta = result.portfolio_beta
+            max_ttl = result.max_time_to_liquidate
+            avg_ttl = result.avg_time_to_liquidate
+            sector_weights = result.sector_weights
+            country_weights = result.country_weights
+            factor_exposures = result.factor_exposures
+            concentration_hhi = result.concentration_hhi
+            portfolio_var_95 = result.portfolio_var_95
 
             # CREATE OR UPDATE portfolio risk data for session service
             if self.portfolio_risk_data:
@@ -318,7 +217,7 @@ class RiskManager(TrackingManager, CallbackManager):
                     net_exposure=net_value,
                     gross_exposure=total_value,
                     leverage=total_value / abs(net_value) if net_value != 0 else 1.0,
-                    concentration=max(weights) if weights else 0,
+                    concentration=result.concentration,
                     sector_weights=sector_weights,
                     country_weights=country_weights,
                     portfolio_beta=portfolio_beta,
@@ -333,12 +232,63 @@ class RiskManager(TrackingManager, CallbackManager):
                 )
 
             self.logger.info(f"Portfolio Beta: {portfolio_beta:.3f}, Max TTL: {max_ttl:.1f} days, "
-                             f"Symbols: {len(self.symbol_risk_data)}, HHI: {concentration_hhi:.3f}")
+                             f"Symbols: {len(self.symbol_risk_data)}, HHI: {concentration_hhi:.3f}, "
+                             f"VaR95 ({result.var_method}): {portfolio_var_95:.4f}")
 
         except Exception as e:
             self.logger.error(f"Error in portfolio risk evaluation: {e}")
             self.logger.error(f"Risk evaluation traceback: {traceback.format_exc()}")
 
+    def _update_symbol_risk(self, matrix: RiskExposureMatrix, result: PortfolioRiskResult,
+                            timestamp: datetime) -> None:
+        """Create symbol-level risk snapshots for the session service.
+
+        Universe fields are read from each symbol's entry with the snapshot
+        defaults applied only where the field is absent; weight and pnl come
+        from the matrix.
+        """
+        timestamp_str = timestamp.isoformat()
+        weights = result.weights.tolist()
+        pnl = matrix.unrealized_pnl.tolist()
+
+        for i, symbol in enumerate(matrix.symbols):
+            symbol_data = matrix.universe.refs[i] or {}
+            exposures = symbol_data.get('exposures', {})
+            volatility = symbol_data.get('volatility', 0.25)
+            self.symbol_risk_data[symbol] = RiskSnapshot(
+                timestamp=timestamp_str,
+                symbol=symbol,
+                sector=symbol_data.get('sector', 'Technology'),
+                industry=symbol_data.get('industry', 'Technology'),
+                market_cap=symbol_data.get('market_cap', 1000000000),
+                country=symbol_data.get('country', 'US'),
+                currency=symbol_data.get('currency', 'USD'),
+                avg_daily_volume=symbol_data.get('avg_daily_volume', 10000000),
+                beta=symbol_data.get('beta', 1.2),
+                growth=exposures.get('growth', 0.1),
+                momentum=exposures.get('momentum', 0.05),
+                quality=exposures.get('quality', 0.08),
+                value=exposures.get('value', -0.02),
+                size=exposures.get('size', 0.0),
+                volatility=volatility,
+                volatility_1d=0.15,
+                volatility_5d=0.20,
+                volatility_30d=0.25,
+                var_95=volatility * 1.645,
+                cvar_95=volatility * 2.0,
+                tracking_error=symbol_data.get('tracking_error', 0.05),
+                sharpe_ratio=1.0,
+                information_ratio=0.5,
+                max_drawdown=0.15,
+                weight=weights[i],
+                pnl=pnl[i]
+            )
+
+    def set_factor_covariance(self, factor_covariance, factors=FACTORS) -> None:
+        """Switch portfolio VaR to the full factor-covariance model (None reverts to diagonal)"""
+        self.risk_engine.set_factor_covariance(factor_covariance, factors)
+        self.logger.info(f"Risk VaR method: {'factor_covariance' if factor_covariance is not None else 'diagonal'}")
+
     def _prepare_symbol_risk_data(self) -> List[Dict]:
         """Prepare symbol risk data for storage"""
         return [snapshot.to_dict() for snapshot in self.symbol_risk_data.values()]
@@ -0,0 +1,333 @@
+"""
+Parity check and benchmark for the array-based portfolio risk evaluation.
+
+    python -m source.simulation.managers.risk_benchmark --check-books 30 --sizes 50 500 2000 10000
+
+Builds books of long and short positions against a sparse universe: symbols with no entry, entries
+missing individual fields or exposures, and sector/industry/country/currency present but None or
+empty. LegacyRiskManager keeps the original per-position evaluate_portfolio_risk verbatim. The check
+runs both on the same books and asserts every symbol snapshot carries the same values (weights to
+float rounding) and the portfolio snapshot has the same sector/country/factor keys in the same order
+and the same aggregates. The factor VaR check sets a random factor covariance on RiskManager and
+asserts portfolio_var_95 matches Z_95 * sqrt(w' S w) with S = B F B' + D built as a dense
+positions x positions NumPy matrix, that a zero covariance reproduces the diagonal VaR and that
+clearing the covariance falls back to it. The benchmark times one evaluation per size for both, the
+array path in steady state (universe columns cached from the previous bin), diagonal and factor VaR.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import math
+import os
+import random
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+os.environ.setdefault('ENVIRONMENT', 'benchmark')
+
+from source.simulation.managers.portfolio import Position
+from source.simulation.managers.risk import PortfolioRiskSnapshot, RiskManager, RiskSnapshot
+from source.simulation.managers.risk_engine import Z_95, PortfolioRiskEngine
+
+# The book managers report their missing book context on stdout while app_state is built
+with contextlib.redirect_stdout(io.StringIO()):
+    from source.orchestration.app_state.state_manager import app_state
+
+TIMESTAMP = datetime(2025, 3, 3, 15, 0, tzinfo=timezone.utc)
+SECTORS = ['Technology', 'Financials', 'Health Care', 'Energy', 'Utilities', None, '']
+COUNTRIES = ['US', 'US', 'CA', 'GB', 'JP', None, '']
+FACTORS = ['growth', 'momentum', 'quality', 'value', 'size', 'volatility']
+
+
+class LegacyRiskManager(RiskManager):
+    """The original evaluate_portfolio_risk: one pass over the positions per aggregate"""
+
+    def evaluate_portfolio_risk(self, timestamp: datetime) -> None:
+        positions = app_state.portfolio_manager.get_all_positions()
+        if not positions:
+            return
+        universe_data = app_state.universe_manager.get_all_symbols()
+
+        total_value = sum(abs(float(pos.mtm_value)) for pos in positions.values())
+        net_value = sum(float(pos.mtm_value) for pos in positions.values())
+
+        for symbol, position in positions.items():
+            symbol_data = universe_data.get(symbol, {})
+            position_weight = float(position.mtm_value) / total_value if total_value > 0 else 0
+
+            position_value = abs(float(position.mtm_value))
+            avg_daily_volume = symbol_data.get('avg_daily_volume', 10000000)
+            price = float(getattr(position, 'avg_price', 100))
+            daily_dollar_volume = avg_daily_volume * price
+            days_to_liquidate = position_value / (daily_dollar_volume * 0.20) if daily_dollar_volume > 0 else 999
+
+            risk_snapshot = RiskSnapshot(
+                timestamp=timestamp.isoformat(),
+                symbol=symbol,
+                sector=symbol_data.get('sector', 'Technology'),
+                industry=symbol_data.get('industry', 'Technology'),
+                market_cap=symbol_data.get('market_cap', 1000000000),
+                country=symbol_data.get('country', 'US'),
+                currency=symbol_data.get('currency', 'USD'),
+                avg_daily_volume=symbol_data.get('avg_daily_volume', 10000000),
+                beta=symbol_data.get('beta', 1.2),
+                growth=symbol_data.get('exposures', {}).get('growth', 0.1),
+                momentum=symbol_data.get('exposures', {}).get('momentum', 0.05),
+                quality=symbol_data.get('exposures', {}).get('quality', 0.08),
+                value=symbol_data.get('exposures', {}).get('value', -0.02),
+                size=symbol_data.get('exposures', {}).get('size', 0.0),
+                volatility=symbol_data.get('volatility', 0.25),
+                volatility_1d=0.15,
+                volatility_5d=0.20,
+                volatility_30d=0.25,
+                var_95=symbol_data.get('volatility', 0.25) * 1.645,
+                cvar_95=symbol_data.get('volatility', 0.25) * 2.0,
+                tracking_error=symbol_data.get('tracking_error', 0.05),
+                sharpe_ratio=1.0,
+                information_ratio=0.5,
+                max_drawdown=0.15,
+                weight=position_weight,
+                pnl=float(position.unrealized_pnl)
+            )
+            self.symbol_risk_data[symbol] = risk_snapshot
+
+        portfolio_beta = 0.0
+        total_weight = 0.0
+        if total_value > 0:
+            for symbol, position in positions.items():
+                weight = abs(float(position.mtm_value)) / total_value
+                symbol_data = universe_data.get(symbol, {})
+                beta = symbol_data.get('beta', 1.0)
+                portfolio_beta += weight * beta
+                total_weight += weight
+            portfolio_beta = portfolio_beta / total_weight if total_weight > 0 else 1.0
+
+        liquidation_times = []
+        for symbol, position in positions.items():
+            symbol_data = universe_data.get(symbol, {})
+            position_value = abs(float(position.mtm_value))
+            avg_daily_volume = symbol_data.get('avg_daily_volume', 0)
+            if avg_daily_volume > 0:
+                price = float(getattr(position, 'avg_price', 100))
+                daily_dollar_volume = avg_daily_volume * price
+                days_to_liquidate = position_value / (daily_dollar_volume * 0.20)
+                liquidation_times.append(min(days_to_liquidate, 999))
+            else:
+                liquidation_times.append(999)
+
+        max_ttl = max(liquidation_times) if liquidation_times else 0
+        avg_ttl = sum(liquidation_times) / len(liquidation_times) if liquidation_times else 0
+
+        sector_weights = {}
+        country_weights = {}
+        for symbol, position in positions.items():
+            symbol_data = universe_data.get(symbol, {})
+            weight = abs(float(position.mtm_value)) / total_value if total_value > 0 else 0
+            sector = symbol_data.get('sector', 'Unknown')
+            sector_weights[sector] = sector_weights.get(sector, 0) + weight
+            country = symbol_data.get('country', 'US')
+            country_weights[country] = country_weights.get(country, 0) + weight
+
+        factor_exposures = {
+            'growth': 0.0, 'momentum': 0.0, 'quality': 0.0,
+            'value': 0.0, 'size': 0.0, 'volatility': 0.0
+        }
+        for symbol, position in positions.items():
+            symbol_data = universe_data.get(symbol, {})
+            weight = float(position.mtm_value) / total_value if total_value > 0 else 0
+            exposures = symbol_data.get('exposures', {})
+            for factor in factor_exposures.keys():
+                factor_exposures[factor] += weight * exposures.get(factor, 0)
+
+        weights = [abs(float(pos.mtm_value)) / total_value for pos in positions.values()] if total_value > 0 else []
+        concentration_hhi = sum(w ** 2 for w in weights)
+
+        portfolio_var = 0.0
+        for symbol, position in positions.items():
+            symbol_data = universe_data.get(symbol, {})
+            weight = float(position.mtm_value) / total_value if total_value > 0 else 0
+            volatility = symbol_data.get('volatility', 0.20)
+            var_95 = volatility * 1.645
+            portfolio_var += (weight ** 2) * (var_95 ** 2)
+
+        portfolio_var_95 = (portfolio_var ** 0.5) if portfolio_var > 0 else 0
+
+        self.portfolio_risk_data = PortfolioRiskSnapshot(
+            timestamp=timestamp.isoformat(),
+            total_exposure=total_value,
+            net_exposure=net_value,
+            gross_exposure=total_value,
+            leverage=total_value / abs(net_value) if net_value != 0 else 1.0,
+            concentration=max(weights) if weights else 0,
+            sector_weights=sector_weights,
+            country_weights=country_weights,
+            portfolio_beta=portfolio_beta,
+            portfolio_var_95=portfolio_var_95,
+            portfolio_tracking_error=0.05,
+            portfolio_sharpe_ratio=1.0,
+            max_time_to_liquidate=max_ttl,
+            avg_time_to_liquidate=avg_ttl,
+            factor_exposures=factor_exposures,
+            correlation_risk=max(sector_weights.values()) if sector_weights else 0,
+            concentration_hhi=concentration_hhi
+        )
+
+
+def make_book(n_positions: int, seed: int = 0):
+    """Positions and a sparse universe: absent entries, absent fields, and None/empty labels"""
+    rng = random.Random(seed)
+    positions, universe = {}, {}
+    for i in range(n_positions):
+        symbol = f"S{i:05d}"
+        price = rng.uniform(5, 500)
+        quantity = rng.choice([-1, 1]) * rng.randrange(10, 50_000)
+        positions[symbol] = Position(symbol, quantity, quantity, price, quantity * price * rng.uniform(0.9, 1.1),
+                                     'USD', unrealized_pnl=rng.uniform(-1e5, 1e5))
+        if rng.random() < 0.1:
+            continue
+
+        fields = {
+            'sector': rng.choice(SECTORS),
+            'industry': rng.choice(['Software', 'Banks', None, '']),
+            'country': rng.choice(COUNTRIES),
+            'currency': rng.choice(['USD', 'CAD', None, '']),
+            'market_cap': rng.randrange(10**8, 10**12),
+            'avg_daily_volume': rng.choice([0, rng.randrange(10_000, 50_000_000)]),
+            'beta': rng.uniform(0.3, 2.0),
+            'volatility': rng.uniform(0.1, 0.8),
+            'tracking_error': rng.uniform(0.01, 0.1),
+            'exposures': {factor: rng.uniform(-2, 2) for factor in FACTORS if rng.random() < 0.8},
+        }
+        universe[symbol] = {key: value for key, value in fields.items() if rng.random() < 0.85}
+    return positions, universe
+
+
+def _evaluate(manager: RiskManager, positions, universe) -> float:
+    """Evaluate the book through app_state, returning seconds spent"""
+    app_state.portfolio_manager.positions = positions
+    app_state.universe_manager._universe = universe
+    started = time.perf_counter()
+    manager.evaluate_portfolio_risk(TIMESTAMP)
+    return time.perf_counter() - started
+
+
+def _close(a, b, tolerance: float = 1e-9) -> bool:
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=tolerance, abs_tol=tolerance)
+    return a == b
+
+
+def check_parity(n_books: int, max_positions: int, seed: int = 0):
+    rng = random.Random(seed)
+    worst = 0.0
+    for book in range(n_books):
+        positions, universe = make_book(rng.randrange(1, max_positions + 1), seed + book)
+        legacy, current = LegacyRiskManager(), RiskManager()
+        _evaluate(legacy, positions, universe)
+        _evaluate(current, positions, universe)
+
+        assert list(current.symbol_risk_data) == list(legacy.symbol_risk_data), book
+        for symbol, expected in legacy.symbol_risk_data.items():
+            actual = current.symbol_risk_data[symbol].to_dict()
+            for key, value in expected.to_dict().items():
+                assert type(actual[key]) is type(value) and _close(actual[key], value), (book, symbol, key)
+
+        expected, actual = legacy.portfolio_risk_data.to_dict(), current.portfolio_risk_data.to_dict()
+        assert list(actual) == list(expected), book
+        for key, value in expected.items():
+            if isinstance(value, dict):
+                assert list(actual[key]) == list(value), (book, key)
+                pairs = [(actual[key][k], v) for k, v in value.items()]
+            else:
+                pairs = [(actual[key], value)]
+            for a, b in pairs:
+                assert _close(a, b), (book, key, a, b)
+                if isinstance(b, float):
+                    worst = max(worst, abs(a - b))
+    print(f"parity ok: books={n_books} positions<={max_positions} max_abs_diff={worst:.1e}")
+
+
+def make_factor_covariance(seed: int = 0) -> np.ndarray:
+    """Random positive semi-definite annualized covariance over FACTORS (factor vols around 5-20%)"""
+    rng = np.random.default_rng(seed)
+    loadings = rng.normal(0, 0.08, (len(FACTORS), len(FACTORS)))
+    return loadings @ loadings.T
+
+
+def dense_factor_var(positions, universe, factor_covariance: np.ndarray) -> float:
+    """Z_95 * sqrt(w' (B F B' + D) w) with the positions x positions covariance built explicitly"""
+    symbols = list(positions)
+    mtm = np.array([float(positions[symbol].mtm_value) for symbol in symbols])
+    weights = mtm / np.abs(mtm).sum()
+
+    entries = [universe.get(symbol) or {} for symbol in symbols]
+    loadings = np.array([[float((entry.get('exposures') or {}).get(factor) or 0.0) for factor in FACTORS]
+                         for entry in entries])
+    volatility = np.array([float(entry['volatility']) if entry.get('volatility') is not None
+                           else PortfolioRiskEngine.DEFAULT_VOLATILITY for entry in entries])
+
+    factor_part = loadings @ factor_covariance @ loadings.T
+    covariance = factor_part + np.diag(np.maximum(volatility ** 2 - np.diag(factor_part), 0.0))
+    variance = float(weights @ covariance @ weights)
+    return Z_95 * variance ** 0.5 if variance > 0 else 0.0
+
+
+def check_factor_var(n_books: int, max_positions: int, seed: int = 0):
+    rng = random.Random(seed)
+    worst = 0.0
+    for book in range(n_books):
+        positions, universe = make_book(rng.randrange(1, max_positions + 1), seed + book)
+        covariance = make_factor_covariance(seed + book)
+
+        manager = RiskManager()
+        _evaluate(manager, positions, universe)
+        diagonal = manager.portfolio_risk_data.portfolio_var_95
+
+        manager.set_factor_covariance(covariance)
+        _evaluate(manager, positions, universe)
+        actual, expected = manager.portfolio_risk_data.portfolio_var_95, dense_factor_var(positions, universe, covariance)
+        assert math.isclose(actual, expected, rel_tol=1e-10, abs_tol=1e-15), (book, actual, expected)
+        worst = max(worst, abs(actual - expected) / expected if expected else 0.0)
+
+        manager.set_factor_covariance(np.zeros((len(FACTORS), len(FACTORS))))
+        _evaluate(manager, positions, universe)
+        assert math.isclose(manager.portfolio_risk_data.portfolio_var_95, diagonal, rel_tol=1e-12), book
+
+        manager.set_factor_covariance(None)
+        _evaluate(manager, positions, universe)
+        assert manager.portfolio_risk_data.portfolio_var_95 == diagonal, book
+    print(f"factor VaR ok: books={n_books} positions<={max_positions} max_rel_diff_vs_dense={worst:.1e}")
+
+
+def benchmark(sizes, seed: int = 0):
+    print(f"\n{'positions':>10} {'legacy_ms':>10} {'array_ms':>9} {'speedup':>8} {'factor_var_ms':>14}")
+    for n_positions in sizes:
+        positions, universe = make_book(n_positions, seed)
+        legacy = min(_evaluate(LegacyRiskManager(), positions, universe) for _ in range(3))
+
+        manager = RiskManager()
+        _evaluate(manager, positions, universe)
+        current = min(_evaluate(manager, positions, universe) for _ in range(3))
+        manager.set_factor_covariance(make_factor_covariance(seed))
+        factor = min(_evaluate(manager, positions, universe) for _ in range(3))
+        print(f"{n_positions:>10,} {legacy * 1000:>10.2f} {current * 1000:>9.2f} {legacy / current:>7.1f}x "
+              f"{factor * 1000:>14.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parity check and benchmark for portfolio risk evaluation")
+    parser.add_argument('--check-books', type=int, default=30, help="random books for the parity check (0 to skip)")
+    parser.add_argument('--check-positions', type=int, default=300, help="largest book in the parity check")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[50, 500, 2000, 10000])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # The risk manager logs every evaluation; keep the output about the results
+    logging.disable(logging.ERROR)
+    if args.check_books:
+        check_parity(args.check_books, args.check_positions, args.seed)
+        check_factor_var(args.check_books, args.check_positions, args.seed)
+    benchmark(args.sizes, args.seed)
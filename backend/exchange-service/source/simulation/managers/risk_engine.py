@@ -0,0 +1,291 @@
+# source/simulation/managers/risk_engine.py
+"""
+Array-based portfolio risk engine.
+
+Positions and universe metadata are gathered once per bin into a
+RiskExposureMatrix (one row per position), and every portfolio aggregate
+(beta, sector / country weights, factor exposures, HHI, liquidation times
+and VaR) is computed from it with array operations.
+
+Missing numeric universe fields are kept as NaN in the matrix and replaced by
+the portfolio defaults when aggregating. The universe part of the matrix is
+reused across bins as long as the position symbols and universe entries are
+the same, so a steady-state bin only re-reads position values.
+"""
+
+import operator
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Style factors carried in universe 'exposures'
+FACTORS = ('growth', 'momentum', 'quality', 'value', 'size', 'volatility')
+
+# One-sided 95% normal quantile
+Z_95 = 1.645
+
+# Share of daily volume assumed tradable when liquidating
+LIQUIDATION_PARTICIPATION = 0.20
+MAX_DAYS_TO_LIQUIDATE = 999.0
+
+# Labels used when a symbol has no sector / country entry in the universe
+DEFAULT_SECTOR = 'Unknown'
+DEFAULT_COUNTRY = 'US'
+
+
+def _column(universe: Dict[str, Dict], symbols: Sequence[str], key: str) -> np.ndarray:
+    """Float column for a universe field, NaN where the symbol or field is missing"""
+    values = np.full(len(symbols), np.nan)
+    for i, symbol in enumerate(symbols):
+        value = universe.get(symbol, {}).get(key)
+        if value is not None:
+            values[i] = float(value)
+    return values
+
+
+def _group_weights(labels: Sequence, weights: np.ndarray) -> Dict:
+    """Sum weights per label, keyed in order of first appearance (labels are used as-is, None included)"""
+    grouped = {}
+    for label, weight in zip(labels, weights.tolist()):
+        grouped[label] = grouped.get(label, 0) + weight
+    return grouped
+
+
+@dataclass
+class UniverseColumns:
+    """Universe metadata for a symbol list, reusable while the universe entries are unchanged"""
+    symbols: Tuple[str, ...]
+    refs: List[Optional[Dict]]
+    beta: np.ndarray
+    volatility: np.ndarray
+    tracking_error: np.ndarray
+    avg_daily_volume: np.ndarray
+    market_cap: np.ndarray
+    exposures: np.ndarray  # (symbols, len(FACTORS)), NaN where missing
+    sector: List[Optional[str]]  # DEFAULT_SECTOR where the entry has no sector
+    country: List[Optional[str]]  # DEFAULT_COUNTRY where the entry has no country
+
+    @classmethod
+    def build(cls, symbols: Sequence[str], universe: Dict[str, Dict]) -> 'UniverseColumns':
+        refs = [universe.get(symbol) for symbol in symbols]
+        exposures = np.full((len(symbols), len(FACTORS)), np.nan)
+        sector, country = [], []
+
+        for i, symbol_data in enumerate(refs):
+            symbol_data = symbol_data or {}
+            symbol_exposures = symbol_data.get('exposures', {})
+            for k, factor in enumerate(FACTORS):
+                value = symbol_exposures.get(factor)
+                if value is not None:
+                    exposures[i, k] = float(value)
+
+            sector.append(symbol_data.get('sector', DEFAULT_SECTOR))
+            country.append(symbol_data.get('country', DEFAULT_COUNTRY))
+
+        return cls(
+            symbols=tuple(symbols),
+            refs=refs,
+            beta=_column(universe, symbols, 'beta'),
+            volatility=_column(universe, symbols, 'volatility'),
+            tracking_error=_column(universe, symbols, 'tracking_error'),
+            avg_daily_volume=_column(universe, symbols, 'avg_daily_volume'),
+            market_cap=_column(universe, symbols, 'market_cap'),
+            exposures=exposures,
+            sector=sector,
+            country=country,
+        )
+
+    def matches(self, symbols: Sequence[str], universe: Dict[str, Dict]) -> bool:
+        """True if built for these symbols from the same universe entries"""
+        return (len(symbols) == len(self.symbols) and tuple(symbols) == self.symbols and
+                all(map(operator.is_, map(universe.get, symbols), self.refs)))
+
+
+@dataclass
+class RiskExposureMatrix:
+    """Per-position columns for one bin (rows aligned with symbols)"""
+    symbols: List[str]
+    mtm_value: np.ndarray
+    unrealized_pnl: np.ndarray
+    avg_price: np.ndarray
+    universe: UniverseColumns
+
+    @classmethod
+    def build(cls, positions: Dict, universe: Dict[str, Dict],
+              universe_columns: Optional[UniverseColumns] = None) -> 'RiskExposureMatrix':
+        symbols = list(positions.keys())
+        if universe_columns is None or not universe_columns.matches(symbols, universe):
+            universe_columns = UniverseColumns.build(symbols, universe)
+
+        values = positions.values()
+        return cls(
+            symbols=symbols,
+            mtm_value=np.array([float(position.mtm_value) for position in values], dtype=np.float64),
+            unrealized_pnl=np.array([float(position.unrealized_pnl) for position in values], dtype=np.float64),
+            avg_price=np.array([float(getattr(position, 'avg_price', 100)) for position in values],
+                               dtype=np.float64),
+            universe=universe_columns,
+        )
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+
+@dataclass
+class PortfolioRiskResult:
+    """Portfolio aggregates for one bin"""
+    total_value: float
+    net_value: float
+    weights: np.ndarray  # Signed mtm / gross
+    abs_weights: np.ndarray
+    portfolio_beta: float
+    days_to_liquidate: np.ndarray
+    max_time_to_liquidate: float
+    avg_time_to_liquidate: float
+    sector_weights: Dict[str, float]
+    country_weights: Dict[str, float]
+    factor_exposures: Dict[str, float]
+    concentration: float
+    concentration_hhi: float
+    portfolio_var_95: float
+    diagonal_var_95: float
+    var_method: str = 'diagonal'
+    factor_var_share: float = 0.0
+
+
+class PortfolioRiskEngine:
+    """Computes portfolio risk aggregates from a RiskExposureMatrix.
+
+    VaR is the full factor-model VaR when a factor covariance has been set:
+    w' (B F B' + D) w, where B are the position factor exposures, F the
+    factor covariance and D the specific variance left after removing each
+    symbol's factor variance from its total volatility. Without a covariance
+    it falls back to the diagonal approximation (independent positions).
+    """
+
+    DEFAULT_VOLATILITY = 0.20
+    DEFAULT_BETA = 1.0
+
+    def __init__(self, factor_covariance: Optional[np.ndarray] = None,
+                 factors: Sequence[str] = FACTORS):
+        self.factor_covariance: Optional[np.ndarray] = None
+        self._factor_index: Optional[np.ndarray] = None
+        self._universe_columns: Optional[UniverseColumns] = None
+        if factor_covariance is not None:
+            self.set_factor_covariance(factor_covariance, factors)
+
+    def set_factor_covariance(self, factor_covariance, factors: Sequence[str] = FACTORS) -> None:
+        """Use a (len(factors) x len(factors)) annualized covariance for VaR; None reverts to diagonal"""
+        if factor_covariance is None:
+            self.factor_covariance = None
+            self._factor_index = None
+            return
+
+        covariance = np.asarray(factor_covariance, dtype=np.float64)
+        if covariance.shape != (len(factors), len(factors)):
+            raise ValueError(f"Factor covariance shape {covariance.shape} does not match {len(factors)} factors")
+        if not np.allclose(covariance, covariance.T):
+            raise ValueError("Factor covariance must be symmetric")
+
+        unknown = [factor for factor in factors if factor not in FACTORS]
+        if unknown:
+            raise ValueError(f"Unknown risk factors: {unknown}")
+
+        self.factor_covariance = covariance
+        self._factor_index = np.array([FACTORS.index(factor) for factor in factors])
+
+    def build_matrix(self, positions: Dict, universe: Dict[str, Dict]) -> RiskExposureMatrix:
+        """Exposure matrix for this bin, reusing universe columns while positions and universe are unchanged"""
+        matrix = RiskExposureMatrix.build(positions, universe, self._universe_columns)
+        self._universe_columns = matrix.universe
+        return matrix
+
+    def evaluate(self, matrix: RiskExposureMatrix) -> PortfolioRiskResult:
+        mtm = matrix.mtm_value
+        abs_mtm = np.abs(mtm)
+        total_value = float(abs_mtm.sum())
+        net_value = float(mtm.sum())
+
+        if total_value > 0:
+            weights = mtm / total_value
+            abs_weights = abs_mtm / total_value
+        else:
+            weights = np.zeros(len(matrix))
+            abs_weights = np.zeros(len(matrix))
+
+        # Beta: gross-weighted average
+        beta = np.where(np.isnan(matrix.universe.beta), self.DEFAULT_BETA, matrix.universe.beta)
+        weight_sum = abs_weights.sum()
+        if total_value > 0:
+            portfolio_beta = float(abs_weights @ beta / weight_sum) if weight_sum > 0 else 1.0
+        else:
+            portfolio_beta = 0.0
+
+        days_to_liquidate = self.days_to_liquidate(matrix)
+
+        sector_weights = _group_weights(matrix.universe.sector, abs_weights)
+        country_weights = _group_weights(matrix.universe.country, abs_weights)
+
+        exposures = np.nan_to_num(matrix.universe.exposures, nan=0.0)
+        factor_exposures = dict(zip(FACTORS, (weights @ exposures).tolist())) if len(matrix) else \
+            dict.fromkeys(FACTORS, 0.0)
+
+        volatility = np.where(np.isnan(matrix.universe.volatility), self.DEFAULT_VOLATILITY, matrix.universe.volatility)
+        diagonal_variance = float(np.sum((weights * volatility * Z_95) ** 2))
+        diagonal_var_95 = diagonal_variance ** 0.5 if diagonal_variance > 0 else 0.0
+
+        portfolio_var_95 = diagonal_var_95
+        var_method = 'diagonal'
+        factor_var_share = 0.0
+        if self.factor_covariance is not None and len(matrix):
+            portfolio_var_95, factor_var_share = self._factor_var(weights, exposures, volatility)
+            var_method = 'factor_covariance'
+
+        return PortfolioRiskResult(
+            total_value=total_value,
+            net_value=net_value,
+            weights=weights,
+            abs_weights=abs_weights,
+            portfolio_beta=portfolio_beta,
+            days_to_liquidate=days_to_liquidate,
+            max_time_to_liquidate=float(days_to_liquidate.max()) if len(matrix) else 0,
+            avg_time_to_liquidate=float(days_to_liquidate.mean()) if len(matrix) else 0,
+            sector_weights=sector_weights,
+            country_weights=country_weights,
+            factor_exposures=factor_exposures,
+            concentration=float(abs_weights.max()) if total_value > 0 and len(matrix) else 0,
+            concentration_hhi=float(abs_weights @ abs_weights),
+            portfolio_var_95=portfolio_var_95,
+            diagonal_var_95=diagonal_var_95,
+            var_method=var_method,
+            factor_var_share=factor_var_share,
+        )
+
+    @staticmethod
+    def days_to_liquidate(matrix: RiskExposureMatrix) -> np.ndarray:
+        """Days to exit each position at the liquidation participation rate (capped)"""
+        adv = np.nan_to_num(matrix.universe.avg_daily_volume, nan=0.0)
+        daily_dollar_volume = adv * matrix.avg_price * LIQUIDATION_PARTICIPATION
+        liquid = (adv > 0) & (daily_dollar_volume > 0)
+
+        days = np.full(len(matrix), MAX_DAYS_TO_LIQUIDATE)
+        np.divide(np.abs(matrix.mtm_value), daily_dollar_volume, out=days, where=liquid)
+        return np.minimum(days, MAX_DAYS_TO_LIQUIDATE)
+
+    def _factor_var(self, weights: np.ndarray, exposures: np.ndarray, volatility: np.ndarray):
+        """Full factor-covariance VaR and the share of variance explained by factors"""
+        loadings = exposures[:, self._factor_index]
+        covariance = self.factor_covariance
+
+        # Specific variance is what remains of total variance after the factor part
+        symbol_factor_variance = np.einsum('ij,jk,ik->i', loadings, covariance, loadings)
+        specific_variance = np.maximum(volatility ** 2 - symbol_factor_variance, 0.0)
+
+        portfolio_exposure = weights @ loadings
+        factor_variance = float(portfolio_exposure @ covariance @ portfolio_exposure)
+        total_variance = max(factor_variance, 0.0) + float(np.sum(weights ** 2 * specific_variance))
+
+        if total_variance <= 0:
+            return 0.0, 0.0
+        return Z_95 * total_variance ** 0.5, max(factor_variance, 0.0) / total_variance
@@ -5,13 +5,15 @@ import logging
 import os
 import traceback
 import queue
+import time
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from threading import RLock, Thread
-from typing import Dict, List, Optional, Callable, Any, TypeVar, Generic
+from typing import Dict, List, Optional, Callable, Any, TypeVar, Generic, TYPE_CHECKING
 
-from source.db.db_manager import DatabaseManager
+if TYPE_CHECKING:
+    from source.db.db_manager import DatabaseManager
 
 # Global database queue instance
 _db_queue = None
@@ -22,11 +24,22 @@ class DatabaseQueue:
     """Handles async database writes in a separate thread"""
 
     def __init__(self):
+        from source.config import app_config
+
         self.logger = logging.getLogger(self.__class__.__name__)
         self._queue = queue.Queue()
         self._shutdown = False
         self._worker_thread = None
         self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="DBWriter")
+
+        # Writes are drained into batches of up to batch_size rows, flushed at least every flush_interval seconds
+        self.batch_size = app_config.database.write_batch_size
+        self.flush_interval = app_config.database.write_flush_interval
+        # Failed writes are retried with backoff, then requeued behind newer writes rather than dropped
+        self.retry_attempts = app_config.database.write_retry_attempts
+        self.retry_backoff = app_config.database.write_retry_backoff
+        self.last_queue_lag = 0.0
+        self.requeued_writes = 0
         self.start_worker()
 
     def start_worker(self):
@@ -42,7 +55,9 @@ class DatabaseQueue:
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
 
-        # Initialize database manager
+        # Initialize database manager (imported here: source.db imports the managers that import this module)
+        from source.db.db_manager import DatabaseManager
+
         db_manager = None
         try:
             db_manager = DatabaseManager()
@@ -52,28 +67,22 @@ class DatabaseQueue:
             self.logger.error(f"❌ Database worker initialization failed: {e}")
             return
 
-        while not self._shutdown:
+        stopping = False
+        # Writes requeued after failing are still written after the shutdown signal
+        while not stopping or not self._queue.empty():
             try:
-                # Get item from queue with timeout
-                try:
-                    item = self._queue.get(timeout=1.0)
-                except queue.Empty:
+                batch, stopping = self._next_batch()
+                if not batch:
                     continue
 
-                if item is None:  # Shutdown signal
-                    break
-
-                table_name, data, book_id, timestamp = item
-
-                # Process the database write
                 try:
-                    loop.run_until_complete(self._write_to_database(db_manager, table_name, data, book_id, timestamp))
-                    self.logger.info(f"✅ Successfully wrote {len(data)} records to {table_name}")
+                    loop.run_until_complete(self._write_batch(db_manager, batch))
                 except Exception as e:
-                    self.logger.error(f"❌ Database write error for {table_name}: {e}")
+                    self.logger.error(f"❌ Database batch write error: {e}")
                     self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
                 finally:
-                    self._queue.task_done()
+                    for _ in batch:
+                        self._queue.task_done()
 
             except Exception as e:
                 self.logger.error(f"❌ Worker thread error: {e}")
@@ -87,6 +96,101 @@ class DatabaseQueue:
 
         loop.close()
 
+    def _next_batch(self):
+        """Drain queued writes until batch_size rows or flush_interval elapses; returns (batch, stopping)"""
+        batch = []
+        rows = 0
+
+        try:
+            item = self._queue.get(timeout=1.0)
+        except queue.Empty:
+            return batch, self._shutdown
+
+        deadline = time.monotonic() + self.flush_interval
+        while True:
+            if item is None:  # Shutdown signal
+                self._queue.task_done()
+                return batch, True
+
+            batch.append(item)
+            rows += len(item[1])
+            if rows >= self.batch_size:
+                return batch, False
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return batch, False
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                return batch, False
+
+    async def _write_batch(self, db_manager: 'DatabaseManager', batch: List[tuple]):
+        """Group a batch by table and bin, coalesce repeated upserts and bulk load each group once"""
+        if not db_manager.connected:
+            raise Exception("Database not connected")
+
+        grouped: Dict[tuple, List[tuple]] = {}
+        for item in batch:
+            grouped.setdefault((item[0], item[3]), []).append(item)
+
+        for (table_name, timestamp), items in grouped.items():
+            table_manager = db_manager.get_table_manager(table_name)
+
+            if table_manager is not None and table_manager.supports_bulk_insert:
+                # One COPY + merge transaction per group, so a failed attempt leaves nothing behind to retry over
+                written, failed = await self._write_with_retry(
+                    table_name, timestamp, items, lambda items=items: self._bulk_write(table_manager, items))
+            else:
+                written, failed = 0, []
+                for item in items:
+                    item_written, item_failed = await self._write_with_retry(
+                        table_name, timestamp, [item],
+                        lambda item=item: self._write_to_database(db_manager, table_name, item[1], item[2], item[3]))
+                    written += item_written or 0
+                    failed.extend(item_failed)
+
+            if failed:
+                self._requeue(failed)
+            failed_ids = {id(item) for item in failed}
+            written_items = [item for item in items if id(item) not in failed_ids]
+            if written_items:
+                self.last_queue_lag = time.monotonic() - min(item[4] for item in written_items)
+                self.logger.info(f"✅ Successfully wrote {written} records to {table_name} for {timestamp} "
+                                 f"({len(written_items)} writes, lag {self.last_queue_lag:.3f}s)")
+
+    async def _bulk_write(self, table_manager, items: List[tuple]) -> int:
+        records = []
+        for _, data, book_id, timestamp, _ in items:
+            records.extend(table_manager.build_records(data, book_id, timestamp))
+        return await table_manager.bulk_insert(table_manager.coalesce_records(records))
+
+    async def _write_with_retry(self, table_name: str, timestamp: datetime, items: List[tuple],
+                                write: Callable) -> tuple:
+        """Run write, retrying with exponential backoff; returns (rows written, items still unwritten)"""
+        for attempt in range(self.retry_attempts + 1):
+            try:
+                return await write(), []
+            except Exception as e:
+                if attempt == self.retry_attempts:
+                    self.logger.error(f"❌ Database write error for {table_name} at {timestamp} "
+                                      f"after {attempt + 1} attempts: {e}")
+                    self.logger.error(f"❌ Full traceback: {traceback.format_exc()}")
+                    return 0, items
+
+                delay = self.retry_backoff * 2 ** attempt
+                self.logger.warning(f"⚠️ Database write error for {table_name} at {timestamp}, "
+                                    f"retrying in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+
+    def _requeue(self, items: List[tuple]):
+        """Put unwritten items back behind newer writes; they keep their enqueue time so the lag shows the delay"""
+        self.requeued_writes += len(items)
+        rows = sum(len(item[1]) for item in items)
+        self.logger.warning(f"⚠️ Requeued {len(items)} writes ({rows} rows) for {items[0][0]}")
+        for item in items:
+            self._queue.put(item)
+
     async def _write_to_database(self, db_manager: 'DatabaseManager', table_name: str, data: List[Dict], book_id: str,
                                  timestamp: datetime):
         """Write data to database using the manager"""
@@ -101,7 +205,11 @@ class DatabaseQueue:
         """Enqueue a database write operation"""
         if not self._shutdown:
             self.logger.debug(f"🔄 Enqueuing {len(data)} records for {table_name}")
-            self._queue.put((table_name, data, book_id, timestamp))
+            self._queue.put((table_name, data, book_id, timestamp, time.monotonic()))
+
+    def flush(self):
+        """Block until every queued write has been persisted"""
+        self._queue.join()
 
     def shutdown(self):
         """Shutdown the database queue"""
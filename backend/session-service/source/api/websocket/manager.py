@@ -227,8 +227,10 @@ class WebSocketManager:
         if not self.active_connections:
             return
 
-        # Convert to dictionary for processing
+        # Convert to dictionary for processing; the delta manager encodes each distinct frame once
         data_dict = data.to_dict()
+        if self.delta_manager:
+            self.delta_manager.publish(data_dict)
         data_id = f"{data.timestamp}-{data.update_id}"
         
         processing_type = self._get_processing_description()
@@ -242,7 +244,7 @@ class WebSocketManager:
             if not ws.closed:
                 if self.delta_manager:
                     send_tasks.append(
-                        asyncio.ensure_future(self._send_processed_message(ws, device_id, data_dict))
+                        asyncio.ensure_future(self._send_processed_message(ws, device_id))
                     )
                 else:
                     send_tasks.append(
@@ -282,35 +284,20 @@ class WebSocketManager:
         else:
             return "RAW"
 
-    async def _send_processed_message(self, ws: web.WebSocketResponse, device_id: str, data_dict: Dict[str, Any]):
-        """Send exchange data using delta manager (with delta and/or compression)"""
+    async def _send_processed_message(self, ws: web.WebSocketResponse, device_id: str):
+        """Send the latest exchange data frame for this device (delta and/or compression)"""
         try:
-            # Process message through delta manager
-            delta_message = self.delta_manager.process_message(device_id, data_dict)
-            
-            # Create WebSocket payload
-            payload = {
-                'type': 'exchange_data',
-                'deltaType': delta_message.type.value,  # FULL or DELTA
-                'sequence': delta_message.sequence,
-                'timestamp': delta_message.timestamp,
-                'data': delta_message.payload,
-                'compressed': delta_message.compressed,  # zlib compression flag
-                'deltaEnabled': self.delta_enabled,
-                'compressionEnabled': self.compression_enabled
-            }
-            
-            # Add compression metadata if available
-            if delta_message.compression_ratio:
-                payload['compressionRatio'] = delta_message.compression_ratio
-            if delta_message.delta_size and delta_message.original_size:
-                payload['dataSavings'] = f"{((1 - delta_message.delta_size/delta_message.original_size) * 100):.1f}%"
+            # Shared frame for this device's base version: compressed frames go out as binary
+            frame = self.delta_manager.frame_for_client(device_id)
+
+            if frame.binary:
+                await ws.send_bytes(frame.data)
+            else:
+                await ws.send_str(frame.data.decode('utf-8'))
 
-            await ws.send_json(payload)
-            
             # Track message type
-            track_websocket_message("sent", f"{delta_message.type.value.lower()}{'_compressed' if delta_message.compressed else ''}")
-            
+            track_websocket_message("sent", f"{frame.type.value.lower()}{'_compressed' if frame.compressed else ''}")
+
         except Exception as e:
             self.logger.error(f"Error sending processed message to device {device_id}: {e}")
             # Reset client state on error to force full payload next time
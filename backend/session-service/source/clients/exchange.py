@@ -28,6 +28,9 @@ from source.api.grpc.session_exchange_interface_pb2_grpc import SessionExchangeS
 
 logger = logging.getLogger('exchange_client')
 
+# Singular sections of ExchangeDataUpdate; absent from a delta update means unchanged
+EXCHANGE_STATE_SECTIONS = ('portfolio', 'accounts', 'fx_rates', 'impact', 'returns', 'risk', 'universe')
+
 
 class ExchangeClient(BaseClient):
     """Client for the exchange simulator gRPC service."""
@@ -52,6 +55,11 @@ class ExchangeClient(BaseClient):
         # Default exchange type
         self.default_exchange_type = ExchangeType.EQUITIES
 
+        # Last exchange update sequence applied per book, acknowledged in heartbeats
+        self.last_received_sequences: Dict[str, int] = {}
+        # session_instance_id each book's stream was opened with; heartbeats acknowledge under the same id
+        self.session_instance_ids: Dict[str, str] = {}
+
     async def get_channel(self, endpoint: str) -> Tuple[grpc.aio.Channel, SessionExchangeSimulatorStub]:
         """Get or create gRPC channel for the given endpoint with DNS retry."""
         logger.info(f"DEBUG: get_channel called with endpoint: {endpoint}")
@@ -164,8 +172,8 @@ class ExchangeClient(BaseClient):
         request = HeartbeatRequest(
             client_id=client_id,
             book_id=book_id,
-            session_instance_id=f"session-{book_id}",
-            last_received_sequence=0
+            session_instance_id=self.session_instance_ids.get(book_id, f"session-{book_id}"),
+            last_received_sequence=self.last_received_sequences.get(book_id, 0)
         )
 
         logger.info(f"DETAILED: Created HeartbeatRequest:")
@@ -243,6 +251,7 @@ class ExchangeClient(BaseClient):
                     session_instance_id=f"session-{session_id}",
                     request_initial_state=True
                 )
+                self.session_instance_ids[book_id] = request.session_instance_id
 
                 try:
                     stream = stub.StreamExchangeData(request, wait_for_ready=True)
@@ -253,9 +262,12 @@ class ExchangeClient(BaseClient):
                     raise
 
                 try:
+                    book_state = ExchangeDataUpdate()
                     async for data in stream:
                         logger.debug(f"Received raw exchange data update")
-                        standardized_data = await adapter.convert_from_protobuf(data)
+                        self._apply_exchange_update(book_state, data)
+                        self.last_received_sequences[book_id] = data.sequence_number
+                        standardized_data = await adapter.convert_from_protobuf(book_state)
                         standardized_data.exchange_type = exchange_type
                         yield standardized_data
                         
@@ -281,6 +293,39 @@ class ExchangeClient(BaseClient):
                 span.set_attribute("error", str(e))
                 raise
 
+    @staticmethod
+    def _apply_exchange_update(book_state: ExchangeDataUpdate, update: ExchangeDataUpdate):
+        """Merge a per-book exchange update into the cached book state.
+
+        Full snapshots (is_initial_state) replace the state; deltas carry only
+        changed sections, changed orders and new trades, merged by order_id and
+        trade_id so a trade the exchange sends again is not duplicated.
+        """
+        if update.is_initial_state:
+            book_state.CopyFrom(update)
+            return
+
+        orders = {order.order_id: order for order in book_state.orders_data}
+        for order in update.orders_data:
+            orders[order.order_id] = order
+        trades = {trade.trade_id: trade for trade in book_state.trades}
+        for trade in update.trades:
+            trades[trade.trade_id] = trade
+
+        sections = {name: getattr(book_state, name) for name in EXCHANGE_STATE_SECTIONS
+                    if book_state.HasField(name) and not update.HasField(name)}
+
+        merged = ExchangeDataUpdate()
+        merged.CopyFrom(update)
+        for name, section in sections.items():
+            getattr(merged, name).CopyFrom(section)
+        del merged.orders_data[:]
+        merged.orders_data.extend(orders.values())
+        del merged.trades[:]
+        merged.trades.extend(trades.values())
+
+        book_state.CopyFrom(merged)
+
     async def _close_endpoint_channel(self, endpoint: str):
         """
         Close a specific endpoint channel.
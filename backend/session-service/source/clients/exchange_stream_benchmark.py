@@ -0,0 +1,120 @@
+"""
+Client half of the session stream load test in the exchange service
+(source/orchestration/servers/session/delta_stream_benchmark.py there), which starts it as
+
+    python -m source.clients.exchange_stream_benchmark --endpoint localhost:PORT --books ID,ID --final-sequence N
+
+Opens one stream per book with ExchangeClient.stream_exchange_data, as a session does, so every update
+goes through ExchangeClient._apply_exchange_update and the adapter. After each update the cached book
+state is reduced to a digest of its sections, orders and trades - the digest the load test takes of the
+frame it published - so the two sides can be compared per book and sequence. Every --heartbeat-every
+updates, and once more when a book reaches --final-sequence, ExchangeClient.send_heartbeat acknowledges
+the last sequence applied. Prints one JSON line: CPU seconds (without the digests), updates, bytes,
+heartbeats and the digests.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+from source.clients.exchange import EXCHANGE_STATE_SECTIONS, ExchangeClient
+
+
+def state_digest(sections: dict, orders: dict, trades: dict) -> str:
+    """Digest of a book state; the exchange-service load test digests its frames the same way"""
+    digest = hashlib.sha256()
+    for kind, items in (('section', sections), ('order', orders), ('trade', trades)):
+        for key in sorted(items):
+            data = items[key]
+            digest.update(f"{kind}:{key}:{len(data)}:".encode())
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def book_state_digest(book_state) -> str:
+    return state_digest(
+        {name: getattr(book_state, name).SerializeToString(deterministic=True)
+         for name in EXCHANGE_STATE_SECTIONS if book_state.HasField(name)},
+        {order.order_id: order.SerializeToString(deterministic=True) for order in book_state.orders_data},
+        {trade.trade_id: trade.SerializeToString(deterministic=True) for trade in book_state.trades}
+    )
+
+
+class RecordingExchangeClient(ExchangeClient):
+    """ExchangeClient that digests each book's state after applying an update"""
+
+    def __init__(self):
+        super().__init__()
+        self.digests = {}  # book_id -> {sequence: digest}
+        self.updates_received = 0
+        self.bytes_received = 0
+        self.check_seconds = 0.0
+
+    def _apply_exchange_update(self, book_state, update):
+        super()._apply_exchange_update(book_state, update)
+        self.updates_received += 1
+        self.bytes_received += update.ByteSize()
+
+        started = time.process_time()
+        self.digests.setdefault(update.book_id, {})[update.sequence_number] = book_state_digest(book_state)
+        self.check_seconds += time.process_time() - started
+
+
+async def follow_book(client: RecordingExchangeClient, endpoint: str, book_id: str, final_sequence: int,
+                      heartbeat_every: int) -> int:
+    """Apply one book's stream until final_sequence, acknowledging as a session does; returns heartbeats sent"""
+    client_id = f"benchmark-client-{book_id}"
+    stream = client.stream_exchange_data(endpoint, session_id=f"benchmark-{book_id}", client_id=client_id,
+                                         book_id=book_id)
+    heartbeats = received = 0
+    try:
+        async for _ in stream:
+            received += 1
+            done = client.last_received_sequences.get(book_id, 0) >= final_sequence
+            if done or received % heartbeat_every == 0:
+                response = await client.send_heartbeat(endpoint, book_id, client_id)
+                if not response.get('success'):
+                    raise RuntimeError(f"heartbeat for {book_id} failed: {response}")
+                heartbeats += 1
+            if done:
+                break
+    finally:
+        await stream.aclose()
+    return heartbeats
+
+
+async def main(endpoint: str, book_ids: list, final_sequence: int, heartbeat_every: int) -> dict:
+    client = RecordingExchangeClient()
+    started = time.process_time()
+    try:
+        heartbeats = await asyncio.gather(*(follow_book(client, endpoint, book_id, final_sequence, heartbeat_every)
+                                            for book_id in book_ids))
+    finally:
+        await client.close()
+    return {
+        'cpu': time.process_time() - started - client.check_seconds,
+        'updates': client.updates_received,
+        'bytes': client.bytes_received,
+        'heartbeats': sum(heartbeats),
+        'digests': client.digests
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Client half of the exchange-service session stream load test")
+    parser.add_argument('--endpoint', required=True)
+    parser.add_argument('--books', required=True, help="comma-separated book ids, one stream each")
+    parser.add_argument('--final-sequence', type=int, required=True, help="stop a book after this sequence")
+    parser.add_argument('--heartbeat-every', type=int, default=5, help="updates between heartbeats")
+    args = parser.parse_args()
+
+    # The client logs every update and heartbeat; stdout carries only the result
+    logging.disable(logging.CRITICAL)
+    # Not asyncio.run: with ~100 streams closed while updates are in flight, closing the loop can block
+    # on grpc.aio's poller thread; the process exits without it
+    loop = asyncio.new_event_loop()
+    result = loop.run_until_complete(main(args.endpoint, args.books.split(','), args.final_sequence,
+                                          args.heartbeat_every))
+    print(json.dumps(result), flush=True)
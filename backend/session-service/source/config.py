@@ -74,7 +74,7 @@ class WebSocketConfig(BaseModel):
     
     # CORRECTED: Separate flags for delta and compression
     enable_delta: bool = Field(default=True)  # Enable/disable delta calculation (FULL vs DELTA)
-    enable_compression: bool = Field(default=True)  # Enable/disable zlib compression
+    enable_compression: bool = Field(default=False)  # Enable/disable zlib compression (binary frames)
     compression_threshold: int = Field(default=500)  # Minimum payload size to compress
     compression_level: int = Field(default=6)  # zlib compression level (1-9)
 
@@ -162,6 +162,7 @@ class Config(BaseModel):
                 ssl_key_path=os.getenv('WS_SSL_KEY_PATH'),
                 # CORRECTED: Separate environment variables
                 enable_delta=os.getenv('WS_ENABLE_DELTA', 'true').lower() == 'true',
+                # Compressed frames are binary zlib; the browser socket client inflates them with DecompressionStream
                 enable_compression=os.getenv('WS_ENABLE_COMPRESSION', 'true').lower() == 'true',
                 compression_threshold=int(os.getenv('WS_COMPRESSION_THRESHOLD', '500')),
                 compression_level=int(os.getenv('WS_COMPRESSION_LEVEL', '6'))
@@ -6,7 +6,9 @@ from source.models.exchange_data import (
     ExchangeDataUpdate, ExchangeType, EquityDataItem, 
     OrderItem, PositionItem, PortfolioItem
 )
-from source.api.grpc.session_exchange_interface_pb2 import ExchangeDataUpdate as GrpcExchangeDataUpdate
+from source.api.grpc.session_exchange_interface_pb2 import (
+    ExchangeDataUpdate as GrpcExchangeDataUpdate, OrderStateEnum
+)
 
 class DefaultExchangeAdapter(ExchangeAdapter):
     """Adapter for the default exchange simulator"""
@@ -14,8 +16,6 @@ class DefaultExchangeAdapter(ExchangeAdapter):
     async def convert_from_protobuf(self, protobuf_data: GrpcExchangeDataUpdate) -> ExchangeDataUpdate:
         """Convert protobuf message directly to standardized format in one step"""
         
-        print(f"PROTOBUF DATA: {protobuf_data}")
-
         # Create the base exchange data update
         exchange_data = ExchangeDataUpdate(
             timestamp=protobuf_data.timestamp,
@@ -43,9 +43,9 @@ class DefaultExchangeAdapter(ExchangeAdapter):
                 OrderItem(
                     order_id=item.order_id,
                     symbol=item.symbol,
-                    status=item.status,
-                    filled_quantity=item.filled_quantity,
-                    average_price=item.average_price,
+                    status=OrderStateEnum.Name(item.order_state),
+                    filled_quantity=int(item.completed_qty),
+                    average_price=item.price,
                 )
             )
         
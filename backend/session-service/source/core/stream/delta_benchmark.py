@@ -0,0 +1,295 @@
+"""
+Fan-out benchmark and client reconstruction check for DeltaManager.
+
+    python -m source.core.stream.delta_benchmark
+    python -m source.core.stream.delta_benchmark --clients 1 100 1000 --updates 40 --symbols 300
+    python -m source.core.stream.delta_benchmark --record session.jsonl
+    python -m source.core.stream.delta_benchmark --replay session.jsonl
+
+A recording is a JSON lines file with one ExchangeDataUpdate.to_dict() per line - the dict
+WebSocketManager.broadcast_exchange_data publishes. Without --replay a session is recorded first:
+minute bars for every symbol, orders that are placed, fill over a few bins and drop out, and a
+portfolio whose positions move with the fills and prices (--record keeps it for later replays).
+
+Every update is broadcast to 1/100/1,000 clients the way WebSocketManager does it:
+
+    raw         send_json of the whole update per client (delta and compression off)
+    delta       publish once, frame_for_client per client, text frames
+    delta+zlib  the same with WS_COMPRESSION_THRESHOLD / WS_COMPRESSION_LEVEL, binary frames
+
+Clients join during the first quarter of the session, and one in ten is slow and misses half of
+the updates, so frames against older bases and FULL resyncs are part of the mix. The table shows
+CPU per update for the whole fan-out, frames encoded per update and bytes sent per client and
+update. Every frame each client receives is then decoded the way the browser does it (inflate
+binary frames, JSON parse, mergeDelta from @trading-app/websocket delta-utils.ts for DELTA) and the
+client's state must equal the published update after every frame.
+"""
+import argparse
+import json
+import random
+import time
+import zlib
+from typing import Any, Dict, List
+
+from source.core.stream.delta_manager import DeltaManager, DeltaType, KEYED_MARKER
+from source.models.exchange_data import (
+    EquityDataItem, ExchangeDataUpdate, ExchangeType, OrderItem, PortfolioItem, PositionItem
+)
+
+SESSION_START_MS = 1_741_012_200_000
+MODES = ('raw', 'delta', 'delta+zlib')
+
+
+def record_session(n_updates: int, n_symbols: int, n_orders: int, n_positions: int, seed: int = 0) -> List[dict]:
+    """Exchange updates of a synthetic session, as broadcast_exchange_data publishes them"""
+    rng = random.Random(seed)
+    symbols = [f"SYM{i:04d}" for i in range(n_symbols)]
+    prices = {symbol: rng.uniform(5, 500) for symbol in symbols}
+    held = rng.sample(symbols, min(n_positions, n_symbols))
+    positions = {symbol: rng.randrange(-50, 50) * 100 for symbol in held}
+    orders: Dict[str, dict] = {}
+    cash = 1_000_000.0
+    next_order = 0
+
+    updates = []
+    for i in range(n_updates):
+        equity = []
+        for symbol in symbols:
+            open_price = prices[symbol]
+            close = round(open_price * (1 + rng.gauss(0, 0.002)), 2)
+            high = round(max(open_price, close) * (1 + abs(rng.gauss(0, 0.001))), 2)
+            low = round(min(open_price, close) * (1 - abs(rng.gauss(0, 0.001))), 2)
+            equity.append(EquityDataItem(
+                symbol=symbol, open=round(open_price, 2), high=high, low=low, close=close,
+                volume=rng.randrange(100, 50_000), trade_count=rng.randrange(1, 500),
+                vwap=round((high + low + close) / 3, 2), exchange_type=ExchangeType.EQUITIES
+            ))
+            prices[symbol] = close
+
+        # Done orders stay one bin, working orders fill over a few bins, a few new orders each bin
+        for order_id in [order_id for order_id, order in orders.items() if order['done']]:
+            del orders[order_id]
+        for order in orders.values():
+            fill = min(order['quantity'] - order['filled'], rng.randrange(0, order['quantity'] + 1))
+            if fill:
+                price = prices[order['symbol']]
+                order['average_price'] = round(
+                    (order['average_price'] * order['filled'] + price * fill) / (order['filled'] + fill), 4)
+                order['filled'] += fill
+                positions[order['symbol']] = positions.get(order['symbol'], 0) + fill * order['side']
+                cash -= fill * order['side'] * price
+            order['status'] = 'FILLED' if order['filled'] == order['quantity'] else \
+                'PARTIALLY_FILLED' if order['filled'] else 'NEW'
+            order['done'] = order['status'] == 'FILLED'
+        while len(orders) < n_orders and rng.random() < 0.7:
+            next_order += 1
+            orders[f"order-{next_order:06d}"] = {
+                'symbol': rng.choice(symbols), 'side': rng.choice((1, -1)), 'quantity': rng.randrange(1, 20) * 100,
+                'filled': 0, 'average_price': 0.0, 'status': 'NEW', 'done': False
+            }
+
+        position_items = [
+            PositionItem(symbol=symbol, quantity=quantity, average_cost=round(prices[symbol], 2),
+                         market_value=round(quantity * prices[symbol], 2), exchange_type=ExchangeType.EQUITIES)
+            for symbol, quantity in positions.items()
+        ]
+        update = ExchangeDataUpdate(
+            update_id=f"{seed}-{i}",
+            timestamp=SESSION_START_MS + i * 60_000,
+            exchange_type=ExchangeType.EQUITIES,
+            equity_data=equity,
+            orders=[OrderItem(order_id=order_id, symbol=order['symbol'], status=order['status'],
+                              filled_quantity=order['filled'], average_price=order['average_price'],
+                              exchange_type=ExchangeType.EQUITIES)
+                    for order_id, order in orders.items()],
+            portfolio=PortfolioItem(positions=position_items, cash_balance=round(cash, 2),
+                                    total_value=round(cash + sum(p.market_value for p in position_items), 2),
+                                    exchange_type=ExchangeType.EQUITIES)
+        )
+        updates.append(json.loads(json.dumps(update.to_dict(), default=str)))
+    return updates
+
+
+def write_recording(path: str, updates: List[dict]):
+    with open(path, 'w') as f:
+        for update in updates:
+            f.write(json.dumps(update, separators=(',', ':')) + '\n')
+
+
+def read_recording(path: str) -> List[dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def client_schedule(n_clients: int, n_updates: int, seed: int = 0) -> List[List[int]]:
+    """Update indexes each client receives: late joiners, and one slow client in ten missing half"""
+    rng = random.Random(seed)
+    schedule = []
+    for client in range(n_clients):
+        join = 0 if client == 0 else rng.randrange(max(1, n_updates // 4))
+        slow = client % 10 == 9
+        schedule.append([i for i in range(join, n_updates) if not slow or rng.random() < 0.5])
+    return schedule
+
+
+# ----------------------------------------------------------------------
+# Client side
+# ----------------------------------------------------------------------
+
+def merge_delta(previous: Any, delta: Any) -> Any:
+    """mergeDelta from frontend/packages/websocket/src/utils/delta-utils.ts"""
+    if isinstance(delta, dict) and isinstance(delta.get(KEYED_MARKER), str):
+        key = delta[KEYED_MARKER]
+        items = {str(item.get(key)): item for item in (previous if isinstance(previous, list) else [])}
+        for item in delta.get('upsert') or []:
+            items[str(item.get(key))] = item
+        for removed in delta.get('remove') or []:
+            items.pop(str(removed), None)
+        return list(items.values())
+    if isinstance(delta, dict) and isinstance(previous, dict):
+        merged = dict(previous)
+        for key, value in delta.items():
+            merged[key] = merge_delta(previous.get(key), value)
+        return merged
+    return delta
+
+
+def decode_frame(data: bytes, binary: bool) -> dict:
+    """What the browser socket client does: inflate binary frames, then JSON parse"""
+    return json.loads(zlib.decompress(data) if binary else data)
+
+
+def _comparable(value: Any) -> Any:
+    """Removed keys arrive as null and keyed lists keep the client's order: compare without either"""
+    if isinstance(value, dict):
+        return {k: _comparable(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        items = [_comparable(item) for item in value]
+        if all(isinstance(item, dict) for item in items):
+            items.sort(key=lambda item: json.dumps(item, sort_keys=True))
+        return items
+    return value
+
+
+def check_reconstruction(updates: List[dict], schedule: List[List[int]], received: List[list]) -> int:
+    """Replay every client's frames through the client-side decoding; returns frames checked"""
+    expected = [_comparable(update) for update in updates]
+    applied: Dict[tuple, Any] = {}  # (state, frame) -> state, so clients on the same path share the work
+    checked = 0
+    for indexes, frames in zip(schedule, received):
+        state, state_key, sequence = None, None, None
+        for index, (data, binary) in zip(indexes, frames):
+            memo_key = (state_key, data)
+            if memo_key not in applied:
+                message = decode_frame(data, binary)
+                if message['deltaType'] == DeltaType.DELTA.value:
+                    assert message['baseSequence'] == sequence, "delta against a version the client does not hold"
+                    new_state = merge_delta(state, message['data'])
+                else:
+                    new_state = message['data']
+                assert _comparable(new_state) == expected[index], f"client state differs at update {index}"
+                applied[memo_key] = (new_state, message['sequence'])
+            state, sequence = applied[memo_key]
+            state_key = memo_key
+            checked += 1
+    return checked
+
+
+# ----------------------------------------------------------------------
+# Fan-out
+# ----------------------------------------------------------------------
+
+def fan_out(mode: str, updates: List[dict], schedule: List[List[int]], threshold: int, level: int,
+            keep_frames: bool = False) -> dict:
+    """Broadcast every update to the clients scheduled for it; CPU, frames and bytes"""
+    receivers: List[List[int]] = [[] for _ in updates]
+    for client, indexes in enumerate(schedule):
+        for index in indexes:
+            receivers[index].append(client)
+
+    manager = None if mode == 'raw' else DeltaManager(
+        enable_delta=True, enable_compression=mode == 'delta+zlib',
+        compression_threshold=threshold, compression_level=level
+    )
+    client_ids = [f"device-{client}" for client in range(len(schedule))]
+    received: List[list] = [[] for _ in schedule]
+    sent_bytes = messages = 0
+
+    started = time.process_time()
+    for index, update in enumerate(updates):
+        clients = receivers[index]
+        if manager is None:
+            for client in clients:
+                payload = {'type': 'exchange_data', 'timestamp': int(time.time() * 1000), 'data': update,
+                           'deltaType': 'FULL', 'compressed': False, 'deltaEnabled': False,
+                           'compressionEnabled': False}
+                text = json.dumps(payload)  # aiohttp send_json
+                sent_bytes += len(text.encode('utf-8'))
+            messages += len(clients)
+            continue
+
+        manager.publish(update)
+        for client in clients:
+            frame = manager.frame_for_client(client_ids[client])
+            if not frame.binary:
+                frame.data.decode('utf-8')  # send_str; binary frames go out as they are with send_bytes
+            sent_bytes += len(frame.data)
+            if keep_frames:
+                received[client].append((frame.data, frame.binary))
+        messages += len(clients)
+    cpu = time.process_time() - started
+
+    return {
+        'cpu': cpu,
+        'messages': messages,
+        'bytes': sent_bytes,
+        'frames': manager.stats['frames_encoded'] if manager else messages,
+        'received': received
+    }
+
+
+def benchmark(updates: List[dict], client_counts: List[int], threshold: int, level: int, seed: int = 0):
+    n_updates = len(updates)
+    full_kb = sum(len(json.dumps(update)) for update in updates) / n_updates / 1024
+    print(f"updates={n_updates} symbols={len(updates[0]['equityData'])} "
+          f"raw update {full_kb:.1f} KB, threshold={threshold} level={level}")
+    print(f"\n{'clients':>7} {'mode':>10} {'cpu ms/update':>13} {'frames/update':>13} "
+          f"{'KB/client/update':>16} {'bytes vs raw':>12}")
+
+    for n_clients in client_counts:
+        schedule = client_schedule(n_clients, n_updates, seed)
+        raw_bytes = None
+        for mode in MODES:
+            result = fan_out(mode, updates, schedule, threshold, level, keep_frames=mode != 'raw')
+            if mode == 'raw':
+                raw_bytes = result['bytes']
+            else:
+                checked = check_reconstruction(updates, schedule, result['received'])
+                assert checked == result['messages']
+            print(f"{n_clients:>7} {mode:>10} {result['cpu'] / n_updates * 1e3:>13.2f} "
+                  f"{result['frames'] / n_updates:>13.1f} {result['bytes'] / result['messages'] / 1024:>16.2f} "
+                  f"{result['bytes'] / raw_bytes:>12.1%}")
+    print("\nclient reconstruction ok: every frame of every client decoded to the published update")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="DeltaManager fan-out benchmark against recorded exchange updates")
+    parser.add_argument('--replay', help="recording to replay (JSON lines of ExchangeDataUpdate.to_dict())")
+    parser.add_argument('--record', help="write the recorded session here")
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 100, 1000])
+    parser.add_argument('--updates', type=int, default=40)
+    parser.add_argument('--symbols', type=int, default=300)
+    parser.add_argument('--orders', type=int, default=40)
+    parser.add_argument('--positions', type=int, default=60)
+    parser.add_argument('--threshold', type=int, default=500, help="WS_COMPRESSION_THRESHOLD")
+    parser.add_argument('--level', type=int, default=6, help="WS_COMPRESSION_LEVEL")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.replay:
+        session = read_recording(args.replay)
+    else:
+        session = record_session(args.updates, args.symbols, args.orders, args.positions, args.seed)
+        if args.record:
+            write_recording(args.record, session)
+    benchmark(session, args.clients, args.threshold, args.level, args.seed)
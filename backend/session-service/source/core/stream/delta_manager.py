@@ -1,18 +1,38 @@
 # source/core/stream/delta_manager.py
 """
 Delta compression manager for exchange data streaming.
-FIXED: Does exactly what's configured - no fallback logic.
+
+Each exchange update is published once and becomes a new version. Clients
+only remember which version they last received; the frame a client needs
+(FULL, or DELTA against its base version) is encoded - JSON serialized and
+optionally zlib compressed - once per distinct base version and the same
+bytes are sent to every client at that base.
+
+Lists of records are diffed by a stable key (order_id, symbol, ...) rather
+than replaced whole:
+
+    "orders": {"__keyed__": "order_id", "upsert": [...], "remove": [...]}
+
+Frames above the compression threshold are sent as binary websocket frames
+holding the zlib compressed JSON message (the browser socket client inflates
+them with DecompressionStream('deflate')); smaller frames are sent as text.
 """
 import json
 import logging
 import zlib
 import time
-from typing import Dict, Any, Optional, Tuple, Set
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Sequence, Set
 from dataclasses import dataclass
 from enum import Enum
 
 logger = logging.getLogger('delta_manager')
 
+# Fields tried, in order, as the stable key of list items
+DEFAULT_LIST_KEYS = ('order_id', 'orderId', 'trade_id', 'tradeId', 'symbol', 'id')
+
+KEYED_MARKER = '__keyed__'
+
 
 class DeltaType(str, Enum):
     """Types of delta operations"""
@@ -21,49 +41,67 @@ class DeltaType(str, Enum):
 
 
 @dataclass
-class DeltaMessage:
-    """Container for delta messages with optional compression"""
+class DeltaFrame:
+    """One encoded websocket message, shared by every client at the same base version"""
     type: DeltaType
     sequence: int
-    timestamp: int
-    payload: Dict[str, Any]
+    base_sequence: Optional[int]
+    data: bytes
+    binary: bool
     compressed: bool = False
     compression_ratio: Optional[float] = None
     delta_size: Optional[int] = None
     original_size: Optional[int] = None
 
 
+@dataclass
+class _Version:
+    """A published state, indexed for keyed diffing"""
+    sequence: int
+    timestamp: int
+    state: Dict[str, Any]
+    full_json: Optional[bytes] = None
+
+
 class DeltaManager:
     """
     Manages delta calculation and optional compression for exchange data streaming.
-    FIXED: No fallback logic - does exactly what's configured.
+    Encodes each distinct frame once and shares it across clients.
     """
 
-    def __init__(self, 
+    def __init__(self,
                  enable_delta: bool = True,
-                 enable_compression: bool = True, 
-                 compression_threshold: int = 100, 
-                 compression_level: int = 6):
+                 enable_compression: bool = True,
+                 compression_threshold: int = 100,
+                 compression_level: int = 6,
+                 history_size: int = 8,
+                 list_keys: Sequence[str] = DEFAULT_LIST_KEYS):
         """
         Initialize delta manager
-        
+
         Args:
             enable_delta: Whether to calculate deltas (FULL vs DELTA)
             enable_compression: Whether to apply zlib compression
             compression_threshold: Minimum payload size to apply compression
             compression_level: zlib compression level (1-9, higher = better compression)
+            history_size: Number of past versions clients can receive deltas against
+            list_keys: Fields tried, in order, as the stable key of list items
         """
         self.enable_delta = enable_delta
         self.enable_compression = enable_compression
         self.compression_threshold = compression_threshold
         self.compression_level = compression_level
-        
-        # Store last complete state for each client (only if delta enabled)
-        self.client_states: Dict[str, Dict[str, Any]] = {}
-        
-        # Sequence tracking
-        self.client_sequences: Dict[str, int] = {}
-        
+        self.history_size = max(1, history_size)
+        self.list_keys = tuple(list_keys)
+
+        # Published versions (bounded) and the frames encoded for the latest one, by base version
+        self._versions: 'OrderedDict[int, _Version]' = OrderedDict()
+        self._frames: Dict[Optional[int], DeltaFrame] = {}
+        self._sequence = 0
+
+        # Last version sent to each client
+        self.client_versions: Dict[str, int] = {}
+
         # Statistics tracking
         self.stats = {
             'messages_processed': 0,
@@ -72,192 +110,220 @@ class DeltaManager:
             'compressed_messages_sent': 0,
             'total_original_bytes': 0,
             'total_transmitted_bytes': 0,
-            'compression_ratio_sum': 0.0
+            'compression_ratio_sum': 0.0,
+            'frames_encoded': 0,
+            'frames_shared': 0
         }
-        
+
         logger.info(f"Delta manager initialized - Delta: {'ON' if enable_delta else 'OFF'}, Compression: {'ON' if enable_compression else 'OFF'}")
 
-    def process_message(self, client_id: str, data: Dict[str, Any]) -> DeltaMessage:
+    # ------------------------------------------------------------------
+    # Publishing and per-client frames
+    # ------------------------------------------------------------------
+
+    def publish(self, data: Dict[str, Any]) -> int:
+        """Record a new complete exchange data message; returns its sequence"""
+        self._sequence += 1
+        version = _Version(
+            sequence=self._sequence,
+            timestamp=int(time.time() * 1000),
+            state=self._index(data)
+        )
+
+        self._versions[version.sequence] = version
+        while len(self._versions) > self.history_size:
+            self._versions.popitem(last=False)
+        self._frames = {}
+
+        return version.sequence
+
+    def frame_for_client(self, client_id: str) -> DeltaFrame:
+        """Frame taking a client from its last version to the latest one"""
+        if not self._versions:
+            raise ValueError("No exchange data has been published")
+
+        latest = next(reversed(self._versions.values()))
+        base_sequence = self.client_versions.get(client_id) if self.enable_delta else None
+        if base_sequence not in self._versions or base_sequence == latest.sequence:
+            # First message, reset, fell out of history, or already current: resync with the full state
+            base_sequence = None
+
+        frame = self._frames.get(base_sequence)
+        if frame is None:
+            frame = self._encode_frame(latest, base_sequence)
+            self._frames[base_sequence] = frame
+        else:
+            self.stats['frames_shared'] += 1
+
+        if base_sequence is None and self.enable_delta:
+            logger.debug(f"Sending FULL payload for client {client_id} (sequence: {latest.sequence})")
+
+        self.client_versions[client_id] = latest.sequence
+        self._record_sent(frame)
+        return frame
+
+    def process_message(self, client_id: str, data: Dict[str, Any]) -> DeltaFrame:
         """
-        Process incoming exchange data and create delta message
-        FIXED: No fallback logic - strictly follows configuration
-        
-        Args:
-            client_id: Unique identifier for the client connection
-            data: Complete exchange data message
-            
-        Returns:
-            DeltaMessage with delta or full payload, optionally compressed
+        Publish a message and return the frame for a single client.
+
+        Broadcasters should call publish() once per message and
+        frame_for_client() per client instead, so frames are shared.
         """
-        current_sequence = self.client_sequences.get(client_id, 0) + 1
-        self.client_sequences[client_id] = current_sequence
-        
-        # Get original size for statistics
-        original_json = json.dumps(data, separators=(',', ':'))
-        original_size = len(original_json.encode('utf-8'))
-        self.stats['total_original_bytes'] += original_size
-        self.stats['messages_processed'] += 1
-        
-        # STEP 1: Determine if this should be FULL or DELTA
-        if not self.enable_delta:
-            # Delta disabled - always send full
-            logger.debug(f"Delta disabled - sending FULL payload for client {client_id}")
-            return self._create_message(client_id, data, DeltaType.FULL, current_sequence, original_size)
-        
-        # Delta enabled - check if this is the first message for this client
-        if client_id not in self.client_states:
-            logger.info(f"First message for client {client_id} - sending FULL payload (sequence: {current_sequence})")
-            return self._create_message(client_id, data, DeltaType.FULL, current_sequence, original_size)
-        
-        # Calculate delta from previous state
-        previous_state = self.client_states[client_id]
-        delta_payload = self._calculate_delta(previous_state, data)
-        
-        # Update stored state
-        self.client_states[client_id] = data.copy()
-        
-        # SEND DELTA - NO FALLBACK LOGIC
-        logger.debug(f"Sending DELTA payload for client {client_id}")
-        return self._create_message(client_id, delta_payload, DeltaType.DELTA, current_sequence, original_size)
+        self.publish(data)
+        return self.frame_for_client(client_id)
+
+    # ------------------------------------------------------------------
+    # Keyed state and diffing
+    # ------------------------------------------------------------------
+
+    def _list_key(self, items: List[Any]) -> Optional[str]:
+        """Stable key shared by every item of a list of records, if any"""
+        if not items or not all(isinstance(item, dict) for item in items):
+            return None
+        for key in self.list_keys:
+            if all(key in item for item in items):
+                return key
+        return None
+
+    def _index(self, value: Any) -> Any:
+        """Convert lists of keyed records to {key: item} so they diff by key"""
+        if isinstance(value, dict):
+            return {k: self._index(v) for k, v in value.items()}
+        if isinstance(value, list):
+            key = self._list_key(value)
+            if key is not None:
+                items = {item[key]: item for item in value}
+                if len(items) == len(value):
+                    return _KeyedList(key, items)
+        return value
 
     def _calculate_delta(self, previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
         """
-        Calculate delta between two data states
-        
+        Calculate delta between two indexed data states
+
         Args:
             previous: Previous complete state
             current: Current complete state
-            
+
         Returns:
             Dictionary containing only the changes
         """
         delta = {}
-        
-        # Track all keys that exist in either version
-        all_keys = set(previous.keys()) | set(current.keys())
-        
-        for key in all_keys:
+
+        for key, curr_value in current.items():
             prev_value = previous.get(key)
-            curr_value = current.get(key)
-            
-            if prev_value != curr_value:
-                if curr_value is None:
-                    # Key was deleted
-                    delta[key] = None
-                elif isinstance(curr_value, dict) and isinstance(prev_value, dict):
-                    # Nested dictionary - recurse
-                    nested_delta = self._calculate_delta(prev_value, curr_value)
-                    if nested_delta:
-                        delta[key] = nested_delta
-                elif isinstance(curr_value, list) and isinstance(prev_value, list):
-                    # List comparison - replace entire list if different
-                    delta[key] = curr_value
-                else:
-                    # Value changed or added
-                    delta[key] = curr_value
-        
+            if prev_value is curr_value or prev_value == curr_value:
+                continue
+
+            if curr_value is None:
+                # Key was deleted
+                delta[key] = None
+            elif isinstance(curr_value, dict) and isinstance(prev_value, dict):
+                # Nested dictionary - recurse
+                nested_delta = self._calculate_delta(prev_value, curr_value)
+                if nested_delta:
+                    delta[key] = nested_delta
+            elif isinstance(curr_value, _KeyedList) and isinstance(prev_value, _KeyedList) \
+                    and curr_value.key == prev_value.key:
+                delta[key] = curr_value.diff(prev_value)
+            else:
+                # Value changed or added
+                delta[key] = _plain(curr_value)
+
+        for key in previous.keys() - current.keys():
+            delta[key] = None
+
         return delta
 
-    def _create_message(self, client_id: str, payload: Dict[str, Any], 
-                       delta_type: DeltaType, sequence: int, original_size: int) -> DeltaMessage:
-        """Create a message with optional compression"""
-        
-        # Store the complete state if this is a FULL message and delta is enabled
-        if delta_type == DeltaType.FULL and self.enable_delta:
-            self.client_states[client_id] = payload.copy()
-        
-        # STEP 2: Apply compression if enabled
-        final_payload = payload.copy()
-        compressed = False
-        compression_ratio = None
-        
-        payload_json = json.dumps(payload, separators=(',', ':'))
-        payload_size = len(payload_json.encode('utf-8'))
-        transmitted_size = payload_size
-        
-        # COMPRESS IF ENABLED AND ABOVE THRESHOLD - NO FALLBACK
-        if self.enable_compression and payload_size > self.compression_threshold:
-            compressed_payload, compression_ratio = self._compress_payload(payload)
-            if compressed_payload:  # Use compression if it worked
-                final_payload = compressed_payload
-                compressed = True
-                transmitted_size = len(json.dumps(final_payload, separators=(',', ':')).encode('utf-8'))
-                logger.debug(f"Compressed {delta_type.value} payload: {payload_size}→{transmitted_size} bytes")
-        
-        # Update statistics
-        if delta_type == DeltaType.FULL:
-            self.stats['full_messages_sent'] += 1
+    # ------------------------------------------------------------------
+    # Encoding
+    # ------------------------------------------------------------------
+
+    def _full_json(self, version: _Version) -> bytes:
+        """Full state of a version, serialized once"""
+        if version.full_json is None:
+            version.full_json = _dumps(_plain(version.state))
+        return version.full_json
+
+    def _encode_frame(self, version: _Version, base_sequence: Optional[int]) -> DeltaFrame:
+        if base_sequence is None:
+            delta_type = DeltaType.FULL
+            payload_json = self._full_json(version)
         else:
-            self.stats['delta_messages_sent'] += 1
-            
-        if compressed:
-            self.stats['compressed_messages_sent'] += 1
-            
-        self.stats['total_transmitted_bytes'] += transmitted_size
-        
-        return DeltaMessage(
+            delta_type = DeltaType.DELTA
+            payload_json = _dumps(self._calculate_delta(self._versions[base_sequence].state, version.state))
+
+        header = {
+            'type': 'exchange_data',
+            'deltaType': delta_type.value,
+            'sequence': version.sequence,
+            'baseSequence': base_sequence,
+            'timestamp': version.timestamp,
+            'deltaEnabled': self.enable_delta,
+            'compressionEnabled': self.enable_compression
+        }
+
+        message = _dumps(header)[:-1] + b',"data":' + payload_json + b'}'
+        original_size = len(self._full_json(version)) if self.enable_delta else len(payload_json)
+
+        frame = DeltaFrame(
             type=delta_type,
-            sequence=sequence,
-            timestamp=int(time.time() * 1000),
-            payload=final_payload,
-            compressed=compressed,
-            compression_ratio=compression_ratio,
+            sequence=version.sequence,
+            base_sequence=base_sequence,
+            data=message,
+            binary=False,
             original_size=original_size,
-            delta_size=transmitted_size
+            delta_size=len(message)
         )
 
-    def _compress_payload(self, payload: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], Optional[float]]:
-        """
-        Compress payload using zlib
-        
-        Args:
-            payload: Dictionary to compress
-            
-        Returns:
-            Tuple of (compressed_payload_dict, compression_ratio) or (None, None) if compression failed
-        """
-        try:
-            # Serialize to JSON
-            json_str = json.dumps(payload, separators=(',', ':'))
-            original_bytes = json_str.encode('utf-8')
-            original_size = len(original_bytes)
-            
-            # Compress
-            compressed_bytes = zlib.compress(original_bytes, level=self.compression_level)
-            compressed_size = len(compressed_bytes)
-            
-            # Calculate compression ratio
-            compression_ratio = original_size / compressed_size if compressed_size > 0 else 1.0
-            
-            # Return compressed data as base64-encoded string in a wrapper
-            import base64
-            compressed_payload = {
-                '__compressed__': True,
-                '__algorithm__': 'zlib',
-                '__original_size__': original_size,
-                '__data__': base64.b64encode(compressed_bytes).decode('ascii')
-            }
-            
-            return compressed_payload, compression_ratio
-            
-        except Exception as e:
-            logger.error(f"Compression failed: {e}")
-            return None, None
+        # COMPRESS IF ENABLED AND ABOVE THRESHOLD - sent as a binary frame
+        if self.enable_compression and len(message) > self.compression_threshold:
+            try:
+                compressed = zlib.compress(message, level=self.compression_level)
+                frame.compression_ratio = len(message) / len(compressed) if compressed else 1.0
+                frame.data = compressed
+                frame.binary = True
+                frame.compressed = True
+                frame.delta_size = len(compressed)
+                logger.debug(f"Compressed {delta_type.value} frame: {len(message)}→{len(compressed)} bytes")
+            except Exception as e:
+                logger.error(f"Compression failed: {e}")
+
+        self.stats['frames_encoded'] += 1
+        return frame
+
+    def _record_sent(self, frame: DeltaFrame):
+        self.stats['messages_processed'] += 1
+        self.stats['total_original_bytes'] += frame.original_size or 0
+        self.stats['total_transmitted_bytes'] += frame.delta_size or 0
+
+        if frame.type == DeltaType.FULL:
+            self.stats['full_messages_sent'] += 1
+        else:
+            self.stats['delta_messages_sent'] += 1
+
+        if frame.compressed:
+            self.stats['compressed_messages_sent'] += 1
+            self.stats['compression_ratio_sum'] += frame.compression_ratio or 0.0
+
+    # ------------------------------------------------------------------
+    # Client management and statistics
+    # ------------------------------------------------------------------
 
     def reset_client(self, client_id: str):
         """Reset client state - next message will be full payload"""
-        if client_id in self.client_states:
-            del self.client_states[client_id]
-        if client_id in self.client_sequences:
-            del self.client_sequences[client_id]
+        if client_id in self.client_versions:
+            del self.client_versions[client_id]
         logger.info(f"Reset delta state for client {client_id}")
 
     def get_client_info(self, client_id: str) -> Dict[str, Any]:
         """Get information about a client's delta state"""
+        sequence = self.client_versions.get(client_id, 0)
+        version = self._versions.get(sequence)
         return {
-            'has_state': client_id in self.client_states,
-            'sequence': self.client_sequences.get(client_id, 0),
-            'state_keys': list(self.client_states.get(client_id, {}).keys()),
+            'has_state': version is not None,
+            'sequence': sequence,
+            'state_keys': list(version.state.keys()) if version else [],
             'delta_enabled': self.enable_delta,
             'compression_enabled': self.enable_compression
         }
@@ -270,13 +336,13 @@ class DeltaManager:
                 'delta_enabled': self.enable_delta,
                 'compression_enabled': self.enable_compression
             }
-        
-        avg_compression_ratio = (self.stats['compression_ratio_sum'] / 
+
+        avg_compression_ratio = (self.stats['compression_ratio_sum'] /
                                max(1, self.stats['compressed_messages_sent']))
-        
-        overall_compression = (self.stats['total_original_bytes'] / 
+
+        overall_compression = (self.stats['total_original_bytes'] /
                              max(1, self.stats['total_transmitted_bytes']))
-        
+
         return {
             **self.stats,
             'delta_enabled': self.enable_delta,
@@ -289,9 +355,42 @@ class DeltaManager:
 
     def cleanup_old_clients(self, active_client_ids: Set[str]):
         """Remove state for clients that are no longer active"""
-        clients_to_remove = set(self.client_states.keys()) - active_client_ids
+        clients_to_remove = set(self.client_versions.keys()) - active_client_ids
         for client_id in clients_to_remove:
             self.reset_client(client_id)
-        
+
         if clients_to_remove:
-            logger.info(f"Cleaned up delta state for {len(clients_to_remove)} inactive clients")
\ No newline at end of file
+            logger.info(f"Cleaned up delta state for {len(clients_to_remove)} inactive clients")
+
+
+class _KeyedList:
+    """A list of records indexed by a stable key, preserving the original order"""
+    __slots__ = ('key', 'items')
+
+    def __init__(self, key: str, items: Dict[Any, Any]):
+        self.key = key
+        self.items = items
+
+    def __eq__(self, other):
+        return isinstance(other, _KeyedList) and self.key == other.key and self.items == other.items
+
+    def diff(self, previous: '_KeyedList') -> Dict[str, Any]:
+        prev_items = previous.items
+        return {
+            KEYED_MARKER: self.key,
+            'upsert': [item for k, item in self.items.items() if prev_items.get(k) != item],
+            'remove': [k for k in prev_items if k not in self.items]
+        }
+
+
+def _plain(value: Any) -> Any:
+    """Indexed state back to plain JSON-compatible values"""
+    if isinstance(value, _KeyedList):
+        return list(value.items.values())
+    if isinstance(value, dict):
+        return {k: _plain(v) for k, v in value.items()}
+    return value
+
+
+def _dumps(value: Any) -> bytes:
+    return json.dumps(value, separators=(',', ':'), default=str).encode('utf-8')
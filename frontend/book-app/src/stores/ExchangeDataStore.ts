@@ -1,6 +1,7 @@
 // frontend_dist/book-app/src/stores/ExchangeDataStore.ts
 import { BehaviorSubject, Observable } from 'rxjs';
 import { getLogger } from '@trading-app/logging';
+import { listDeltaChanges, mergeDelta } from '@trading-app/websocket';
 import { 
   ExchangeDataMessage, 
   ExchangeData, 
@@ -11,6 +12,9 @@ import {
 
 const logger = getLogger('ExchangeDataStore');
 
+// Orders are keyed by the session service's order_id
+const orderKey = (order: OrderDataItem): string => String(order.orderId ?? (order as any).order_id);
+
 export class ExchangeDataStore {
   private static instance: ExchangeDataStore;
   
@@ -101,8 +105,8 @@ export class ExchangeDataStore {
       sequence: message.sequence,
       timestamp: message.timestamp,
       compressed: message.compressed,
-      equityCount: message.data.equityData.length,
-      orderCount: message.data.orders.length,
+      equityCount: message.data.equityData?.length || 0,
+      orderCount: message.data.orders?.length || 0,
       hasPortfolio: !!message.data.portfolio,
       currentSequence: this.sequenceSubject.value,
       currentEquityCount: this.equityDataMap.size,
@@ -110,7 +114,7 @@ export class ExchangeDataStore {
     });
     
     // Log sample equity data
-    if (message.data.equityData.length > 0) {
+    if (message.data.equityData?.length > 0) {
       logger.info('🏪 STORE: Sample equity data from message', {
         sampleEquities: message.data.equityData.slice(0, 3).map(e => ({
           symbol: e.symbol,
@@ -194,7 +198,7 @@ export class ExchangeDataStore {
    
    // Process orders
    data.orders.forEach((order, index) => {
-     this.ordersMap.set(order.orderId, order);
+     this.ordersMap.set(orderKey(order), order);
      if (index < 3) { // Log first 3 for debugging
        logger.debug(`🏪 STORE: FULL - Added order ${index + 1}:`, {
          orderId: order.orderId,
@@ -231,9 +235,14 @@ export class ExchangeDataStore {
  }
  
  private handleDeltaUpdate(data: ExchangeData): void {
+   // DELTA messages omit unchanged lists and send changed ones whole or as keyed
+   // patches ({"__keyed__", "upsert", "remove"})
+   const equityChanges = listDeltaChanges<EquityDataItem>(data.equityData);
+   const orderChanges = listDeltaChanges<OrderDataItem>(data.orders);
+
    logger.info('🏪 STORE: DELTA UPDATE START', {
-     equityUpdates: data.equityData.length,
-     orderUpdates: data.orders.length,
+     equityUpdates: equityChanges.upsert.length + equityChanges.remove.length,
+     orderUpdates: orderChanges.upsert.length + orderChanges.remove.length,
      beforeEquityCount: this.equityDataMap.size,
      beforeOrderCount: this.ordersMap.size
    });
@@ -241,9 +250,10 @@ export class ExchangeDataStore {
    // Update equity data
    let equityUpdatedCount = 0;
    let equityAddedCount = 0;
+   let equityRemovedCount = 0;
    
    logger.info('🏪 STORE: DELTA - Processing equity updates...');
-   data.equityData.forEach((equity, index) => {
+   equityChanges.upsert.forEach((equity, index) => {
      const existed = this.equityDataMap.has(equity.symbol);
      this.equityDataMap.set(equity.symbol, equity);
      
@@ -259,10 +269,16 @@ export class ExchangeDataStore {
        }
      }
    });
+   equityChanges.remove.forEach(symbol => {
+     if (this.equityDataMap.delete(symbol)) {
+       equityRemovedCount++;
+     }
+   });
    
    logger.info('🏪 STORE: DELTA - Equity processing complete', {
      updated: equityUpdatedCount,
      added: equityAddedCount,
+     removed: equityRemovedCount,
      total: this.equityDataMap.size
    });
    
@@ -272,33 +288,39 @@ export class ExchangeDataStore {
    let orderRemovedCount = 0;
    
    logger.info('🏪 STORE: DELTA - Processing order updates...');
-   data.orders.forEach((order, index) => {
+   orderChanges.upsert.forEach((order, index) => {
+     const orderId = orderKey(order);
      if (order.status === 'CANCELLED' || order.status === 'REJECTED') {
-       const existed = this.ordersMap.has(order.orderId);
-       this.ordersMap.delete(order.orderId);
+       const existed = this.ordersMap.has(orderId);
+       this.ordersMap.delete(orderId);
        if (existed) {
          orderRemovedCount++;
          if (index < 3) {
-           logger.debug(`🏪 STORE: DELTA - Removed order: ${order.orderId} (${order.status})`);
+           logger.debug(`🏪 STORE: DELTA - Removed order: ${orderId} (${order.status})`);
          }
        }
      } else {
-       const existed = this.ordersMap.has(order.orderId);
-       this.ordersMap.set(order.orderId, order);
+       const existed = this.ordersMap.has(orderId);
+       this.ordersMap.set(orderId, order);
        
        if (existed) {
          orderUpdatedCount++;
          if (index < 3) {
-           logger.debug(`🏪 STORE: DELTA - Updated order: ${order.orderId}`);
+           logger.debug(`🏪 STORE: DELTA - Updated order: ${orderId}`);
          }
        } else {
          orderAddedCount++;
          if (index < 3) {
-           logger.debug(`🏪 STORE: DELTA - Added new order: ${order.orderId}`);
+           logger.debug(`🏪 STORE: DELTA - Added new order: ${orderId}`);
          }
        }
      }
    });
+   orderChanges.remove.forEach(orderId => {
+     if (this.ordersMap.delete(orderId)) {
+       orderRemovedCount++;
+     }
+   });
    
    logger.info('🏪 STORE: DELTA - Order processing complete', {
      updated: orderUpdatedCount,
@@ -307,14 +329,15 @@ export class ExchangeDataStore {
      total: this.ordersMap.size
    });
    
-   // Update portfolio if provided
+   // Update portfolio if provided (only the changed fields and positions are sent)
    if (data.portfolio) {
+     const portfolio = mergeDelta<PortfolioData>(this.portfolioSubject.value, data.portfolio);
      logger.info('🏪 STORE: DELTA - Updating portfolio data', {
-       cashBalance: data.portfolio.cash_balance,
-       totalValue: data.portfolio.total_value,
-       positionCount: data.portfolio.positions?.length || 0
+       cashBalance: portfolio.cash_balance,
+       totalValue: portfolio.total_value,
+       positionCount: portfolio.positions?.length || 0
      });
-     this.portfolioSubject.next(data.portfolio);
+     this.portfolioSubject.next(portfolio);
    } else {
      logger.debug('🏪 STORE: DELTA - No portfolio data in message');
    }
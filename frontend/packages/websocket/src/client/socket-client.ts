@@ -8,6 +8,7 @@ import { EventEmitter } from '@trading-app/utils';
 
 import { WebSocketMessage } from '../types/message-types';
 import { SocketClientOptions, ConfigService } from '../types/connection-types';
+import { inflateFrame } from '../utils/compression-utils';
 
 // 🚨 NEW: Instance counter for debugging
 let socketClientInstanceCounter = 0;
@@ -27,6 +28,10 @@ export class SocketClient implements Disposable {
   private options: Required<SocketClientOptions>;
   private readonly instanceId: number;
 
+  // Compressed (binary) frames inflate asynchronously; messages are still emitted in arrival order
+  private inbound: Promise<void> = Promise.resolve();
+  private inboundPending = 0;
+
   constructor(
     private tokenManager: TokenManager,
     private configService: ConfigService,
@@ -150,6 +155,7 @@ export class SocketClient implements Disposable {
       });
 
       this.socket = new WebSocket(wsUrl);
+      this.socket.binaryType = 'arraybuffer';
       
       return new Promise<boolean>((resolve) => {
         const timeoutId = setTimeout(() => {
@@ -307,24 +313,44 @@ export class SocketClient implements Disposable {
 
   // Handle incoming messages
   private handleMessage = (event: MessageEvent): void => {
+    if (typeof event.data === 'string' && this.inboundPending === 0) {
+      this.emitMessage(event.data);
+      return;
+    }
+
+    // Binary frame, or a text frame behind one still inflating: queue it so deltas apply in order
+    this.inboundPending++;
+    const text = typeof event.data === 'string' ? Promise.resolve(event.data) : inflateFrame(event.data);
+    const done = () => { this.inboundPending--; };
+    this.inbound = this.inbound
+      .then(() => text)
+      .then(data => this.emitMessage(data), error => this.reportMessageError(error, event.data))
+      .then(done, done);
+  };
+
+  private emitMessage(data: string): void {
     try {
-      const message = JSON.parse(event.data) as WebSocketMessage;
+      const message = JSON.parse(data) as WebSocketMessage;
       this.logger.debug(`📥 SocketClient #${this.instanceId}: Message received`, {
         messageType: message.type,
         timestamp: message.timestamp,
         hasRequestId: !!message.requestId,
-        dataLength: event.data.length
+        dataLength: data.length
       });
       this.events.emit('message', message);
     } catch (error: any) {
-      this.logger.error(`SocketClient #${this.instanceId}: Error parsing message`, {
-        error: error instanceof Error ? error.message : String(error),
-        data: typeof event.data === 'string' ? event.data.substring(0, 100) : 'non-string data',
-        dataType: typeof event.data
-      });
-      this.events.emit('error', error instanceof Error ? error : new Error(String(error)));
+      this.reportMessageError(error, data);
     }
-  };
+  }
+
+  private reportMessageError(error: any, data: any): void {
+    this.logger.error(`SocketClient #${this.instanceId}: Error parsing message`, {
+      error: error instanceof Error ? error.message : String(error),
+      data: typeof data === 'string' ? data.substring(0, 100) : 'non-string data',
+      dataType: typeof data
+    });
+    this.events.emit('error', error instanceof Error ? error : new Error(String(error)));
+  }
 
   // Handle connection close
   private handleClose = (event: CloseEvent): void => {
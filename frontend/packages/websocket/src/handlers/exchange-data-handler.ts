@@ -4,6 +4,7 @@ import { getLogger } from '@trading-app/logging';
 import { SocketClient } from '../client/socket-client';
 import { ServerExchangeDataMessage, WebSocketMessage } from '../types/message-types';
 import { StateManager } from '../types/connection-types';
+import { listDeltaChanges, mergeDelta } from '../utils/delta-utils';
 
 // Global registry for additional exchange data handlers
 interface ExchangeDataHandlerInterface {
@@ -79,11 +80,15 @@ class ExchangeDataHandlerRegistry {
 // Export global registry
 export const exchangeDataHandlerRegistry = new ExchangeDataHandlerRegistry();
 
+// Orders are keyed by the session service's order_id
+const orderKey = (order: any): string => String(order.orderId ?? order.order_id);
+
 export class ExchangeDataHandler {
   private logger = getLogger('ExchangeDataHandler');
   private sequenceNumber = 0;
   private equityDataMap = new Map<string, any>();
   private ordersMap = new Map<string, any>();
+  private portfolio: any = null;
   
   constructor(private client: SocketClient, private stateManager: StateManager) {
     this.setupListeners();
@@ -218,7 +223,7 @@ export class ExchangeDataHandler {
     // FIXED: Handle missing orders
     if (data.orders) {
       data.orders.forEach((order: any) => {
-        this.ordersMap.set(order.orderId, order);
+        this.ordersMap.set(orderKey(order), order);
       });
     }
     
@@ -227,6 +232,7 @@ export class ExchangeDataHandler {
     this.emitUpdatedData();
     
     // Update portfolio directly if provided
+    this.portfolio = data.portfolio || null;
     if (data.portfolio) {
       this.logger.info('💰 HANDLER: FULL UPDATE - Updating portfolio data', {
         cashBalance: data.portfolio.cash_balance,
@@ -242,9 +248,13 @@ export class ExchangeDataHandler {
   }
 
   private handleDeltaUpdate(data: any): void {
+    // Lists arrive whole or as keyed patches ({"__keyed__", "upsert", "remove"})
+    const equityChanges = listDeltaChanges(data.equityData);
+    const orderChanges = listDeltaChanges(data.orders);
+
     this.logger.info('📊 HANDLER: DELTA UPDATE START', {
-      equityUpdates: data.equityData?.length || 0,
-      orderUpdates: data.orders?.length || 0,
+      equityUpdates: equityChanges.upsert.length + equityChanges.remove.length,
+      orderUpdates: orderChanges.upsert.length + orderChanges.remove.length,
       beforeEquityCount: this.equityDataMap.size,
       beforeOrderCount: this.ordersMap.size
     });
@@ -253,9 +263,11 @@ export class ExchangeDataHandler {
     let equityUpdatedCount = 0;
     let equityAddedCount = 0;
     
+    let equityRemovedCount = 0;
+    
     // FIXED: Handle missing equityData in DELTA
-    if (data.equityData && data.equityData.length > 0) {
-      data.equityData.forEach((equity: any) => {
+    if (equityChanges.upsert.length > 0) {
+      equityChanges.upsert.forEach((equity: any) => {
         const existed = this.equityDataMap.has(equity.symbol);
         this.equityDataMap.set(equity.symbol, equity);
         
@@ -268,10 +280,16 @@ export class ExchangeDataHandler {
         }
       });
     }
+    equityChanges.remove.forEach((symbol: string) => {
+      if (this.equityDataMap.delete(symbol)) {
+        equityRemovedCount++;
+      }
+    });
     
     this.logger.info('📊 HANDLER: DELTA - Equity processing complete', {
       updated: equityUpdatedCount,
       added: equityAddedCount,
+      removed: equityRemovedCount,
       total: this.equityDataMap.size
     });
     
@@ -281,29 +299,36 @@ export class ExchangeDataHandler {
     let orderRemovedCount = 0;
     
     // FIXED: Handle missing orders in DELTA
-    if (data.orders && data.orders.length > 0) {
-      data.orders.forEach((order: any) => {
+    if (orderChanges.upsert.length > 0) {
+      orderChanges.upsert.forEach((order: any) => {
+        const orderId = orderKey(order);
         if (order.status === 'CANCELLED' || order.status === 'REJECTED') {
-          const existed = this.ordersMap.has(order.orderId);
-          this.ordersMap.delete(order.orderId);
+          const existed = this.ordersMap.has(orderId);
+          this.ordersMap.delete(orderId);
           if (existed) {
             orderRemovedCount++;
-            this.logger.debug(`📊 HANDLER: DELTA - Removed order: ${order.orderId} (${order.status})`);
+            this.logger.debug(`📊 HANDLER: DELTA - Removed order: ${orderId} (${order.status})`);
           }
         } else {
-          const existed = this.ordersMap.has(order.orderId);
-          this.ordersMap.set(order.orderId, order);
+          const existed = this.ordersMap.has(orderId);
+          this.ordersMap.set(orderId, order);
           
           if (existed) {
             orderUpdatedCount++;
-            this.logger.debug(`📊 HANDLER: DELTA - Updated order: ${order.orderId}`);
+            this.logger.debug(`📊 HANDLER: DELTA - Updated order: ${orderId}`);
           } else {
             orderAddedCount++;
-            this.logger.debug(`📊 HANDLER: DELTA - Added new order: ${order.orderId}`);
+            this.logger.debug(`📊 HANDLER: DELTA - Added new order: ${orderId}`);
           }
         }
       });
     }
+    orderChanges.remove.forEach((orderId: string) => {
+      if (this.ordersMap.delete(orderId)) {
+        orderRemovedCount++;
+        this.logger.debug(`📊 HANDLER: DELTA - Removed order: ${orderId}`);
+      }
+    });
     
     this.logger.info('📊 HANDLER: DELTA - Order processing complete', {
       updated: orderUpdatedCount,
@@ -316,14 +341,15 @@ export class ExchangeDataHandler {
     this.logger.info('📤 HANDLER: DELTA UPDATE - Pushing data to global state...');
     this.emitUpdatedData();
     
-    // Update portfolio if provided
+    // Update portfolio if provided (a DELTA carries only the changed fields and positions)
     if (data.portfolio) {
+      this.portfolio = mergeDelta(this.portfolio, data.portfolio);
       this.logger.info('💰 HANDLER: DELTA UPDATE - Updating portfolio data', {
-        cashBalance: data.portfolio.cash_balance,
-        totalValue: data.portfolio.total_value,
-        positionCount: data.portfolio.positions?.length || 0
+        cashBalance: this.portfolio.cash_balance,
+        totalValue: this.portfolio.total_value,
+        positionCount: this.portfolio.positions?.length || 0
       });
-      this.stateManager.updatePortfolioData(data.portfolio);
+      this.stateManager.updatePortfolioData(this.portfolio);
     } else {
       this.logger.debug('💰 HANDLER: DELTA UPDATE - No portfolio data in message');
     }
@@ -363,6 +389,7 @@ export class ExchangeDataHandler {
     
     this.equityDataMap.clear();
     this.ordersMap.clear();
+    this.portfolio = null;
     this.sequenceNumber = 0;
     
     // Notify registered handlers of disconnection
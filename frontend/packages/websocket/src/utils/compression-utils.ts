@@ -0,0 +1,21 @@
+// src/utils/compression-utils.ts
+
+// With WS_ENABLE_COMPRESSION the session service sends exchange_data messages
+// above its compression threshold as binary websocket frames holding the zlib
+// compressed JSON message; smaller messages stay text frames. The 'deflate'
+// format of DecompressionStream is zlib (RFC 1950), what Python's
+// zlib.compress produces.
+
+export function canInflateFrames(): boolean {
+  return typeof (globalThis as any).DecompressionStream === 'function';
+}
+
+// Inflate a binary frame back to the JSON text of the message
+export async function inflateFrame(data: ArrayBuffer | Blob): Promise<string> {
+  const Decompression = (globalThis as any).DecompressionStream;
+  if (typeof Decompression !== 'function') {
+    throw new Error('Received a compressed frame but this browser has no DecompressionStream');
+  }
+  const blob = data instanceof Blob ? data : new Blob([data]);
+  return new Response(blob.stream().pipeThrough(new Decompression('deflate'))).text();
+}
@@ -0,0 +1,54 @@
+// src/utils/delta-utils.ts
+
+// In DELTA exchange_data messages the session service sends lists of records
+// (equityData, orders, portfolio positions, ...) as a keyed patch against the
+// client's previous state rather than as the whole list:
+//   {"__keyed__": "symbol", "upsert": [...changed or new items], "remove": [...keys]}
+// Lists that cannot be keyed, and every list in a FULL message, are sent whole.
+export const KEYED_MARKER = '__keyed__';
+
+export interface KeyedListDelta<T = any> {
+  __keyed__: string;
+  upsert: T[];
+  remove: Array<string | number>;
+}
+
+export function isKeyedListDelta<T = any>(value: any): value is KeyedListDelta<T> {
+  return !!value && typeof value === 'object' && !Array.isArray(value) && typeof value[KEYED_MARKER] === 'string';
+}
+
+// Items to add or replace and keys to remove, for a list value that is either whole or a keyed patch
+export function listDeltaChanges<T = any>(
+  value: T[] | KeyedListDelta<T> | null | undefined
+): { upsert: T[]; remove: string[] } {
+  if (isKeyedListDelta<T>(value)) {
+    return { upsert: value.upsert || [], remove: (value.remove || []).map(String) };
+  }
+  return { upsert: value || [], remove: [] };
+}
+
+function isPlainObject(value: any): value is Record<string, any> {
+  return !!value && typeof value === 'object' && !Array.isArray(value);
+}
+
+// Apply a DELTA value to the previous one: objects merge key by key, keyed
+// patches upsert / remove by their key, anything else (including null for a
+// removed key) replaces the previous value.
+export function mergeDelta<T = any>(previous: any, delta: any): T {
+  if (isKeyedListDelta(delta)) {
+    const key = delta[KEYED_MARKER];
+    const items = new Map<string, any>();
+    (Array.isArray(previous) ? previous : []).forEach(item => items.set(String(item?.[key]), item));
+    (delta.upsert || []).forEach(item => items.set(String(item?.[key]), item));
+    (delta.remove || []).forEach(removed => items.delete(String(removed)));
+    return Array.from(items.values()) as any;
+  }
+  if (isPlainObject(delta) && isPlainObject(previous)) {
+    const merged: Record<string, any> = { ...previous };
+    Object.entries(delta).forEach(([key, value]) => {
+      merged[key] = mergeDelta(previous[key], value);
+    });
+    return merged as T;
+  }
+  return delta;
+}
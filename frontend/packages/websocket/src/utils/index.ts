@@ -1,2 +1,4 @@
 // src/utils/index.ts
-export * from './connection-utils';
\ No newline at end of file
+export * from './compression-utils';
+export * from './connection-utils';
+export * from './delta-utils';
@@ -32,6 +32,10 @@ class MasterSymbologyConfig:
         self.data_dir = os.path.join(self.save_dir, 'data')
         self.debug_dir = os.path.join(self.save_dir, 'debug')
 
+        # Normalized provider frames keyed by input content hash (shared across days)
+        self.cache_dir = os.getenv('PROVIDER_CACHE_DIR', os.path.join(os.getenv('SAVE_DIR'), 'cache'))
+        self.provider_workers = int(os.getenv('PROVIDER_WORKERS', '4'))
+
         # Provider-specific data paths (derived from SOURCE_DIR)
         self.alpaca_data_path = os.path.join(self.source_dir, 'alpaca')  # UPDATE
         self.alphavantage_data_path = os.path.join(self.source_dir, 'alphavantage')  # UPDATE
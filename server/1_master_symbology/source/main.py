@@ -3,19 +3,10 @@ import numpy as np
 from datetime import datetime
 from source.config import config
 
-from source.providers.alpaca import load_alpaca_data
-from source.providers.alphavantage import load_alphavantage_data
-from source.providers.eodhd import load_eodhd_data
-from source.providers.finance_db import load_fd_data
-from source.providers.fmp import load_fmp_data
-from source.providers.intrinio import load_intrinio_data
-from source.providers.nasdaq import load_nasdaq_data
-from source.providers.nyse import load_nyse_data
-from source.providers.poly import load_poly_data
-from source.providers.sharadar import load_sharadar_data
+from source.providers.provider_cache import load_providers
 
 from source.providers.utils import (
-    merge_and_prioritize, average_or_keep, process_location, clean_branding_url,
+    merge_and_prioritize, average_market_capital, process_locations, clean_branding_url,
     create_debug_directory, validate_and_debug_dataframe, generate_cross_provider_analysis, generate_debug_summary
 )
 
@@ -30,56 +21,31 @@ def main_with_debugging():
     provider_debugs = {}
 
     try:
-        # Load data with debugging
-        print("\nLoading Nasdaq data...")
-        nasdaq_df = load_nasdaq_data()
-        provider_debugs['nasdaq'] = validate_and_debug_dataframe(nasdaq_df, 'nasdaq', debug_dir)
-        print(f"Loaded Nasdaq data with shape: {nasdaq_df.shape}")
+        # Load providers in parallel, serving unchanged ones from the cache
+        print("\nLoading provider data...")
+        frames, _ = load_providers()
+
+        nasdaq_df = frames['nasdaq']
+        nyse_df = frames['nyse']
+        fmp_df = frames['fmp']
+        intrinio_df = frames['intrinio']
+        poly_df = frames['poly']
+        av_df = frames['alphavantage']
+        eodhd_df = frames['eodhd']
+        alpaca_df = frames['alpaca']
+        sharadar_df = frames['sharadar']
+        fd_df = frames['financedatabase']
 
-        print("\nLoading NYSE data...")
-        nyse_df = load_nyse_data()
+        provider_debugs['nasdaq'] = validate_and_debug_dataframe(nasdaq_df, 'nasdaq', debug_dir)
         provider_debugs['nyse'] = validate_and_debug_dataframe(nyse_df, 'nyse', debug_dir)
-        print(f"Loaded NYSE data with shape: {nyse_df.shape}")
-
-        print("Loading FMP data...")
-        fmp_df = load_fmp_data()
         provider_debugs['fmp'] = validate_and_debug_dataframe(fmp_df, 'fmp', debug_dir)
-        print(f"Loaded FMP data with shape: {fmp_df.shape}")
-
-        print("\nLoading Intrinio data...")
-        intrinio_df = load_intrinio_data()
         provider_debugs['intrinio'] = validate_and_debug_dataframe(intrinio_df, 'intrinio', debug_dir)
-        print(f"Loaded Intrinio data with shape: {intrinio_df.shape}")
-
-        print("\nLoading Poly data...")
-        poly_df = load_poly_data()
         provider_debugs['poly'] = validate_and_debug_dataframe(poly_df, 'poly', debug_dir)
-        print(f"Loaded Poly data with shape: {poly_df.shape}")
-
-        print("\nLoading Alpha Vantage data...")
-        av_df = load_alphavantage_data()
         provider_debugs['alphavantage'] = validate_and_debug_dataframe(av_df, 'alphavantage', debug_dir)
-        print(f"Loaded Alpha Vantage data with shape: {av_df.shape}")
-
-        print("\nLoading EODHD data...")
-        eodhd_df = load_eodhd_data()
         provider_debugs['eodhd'] = validate_and_debug_dataframe(eodhd_df, 'eodhd', debug_dir)
-        print(f"Loaded EODHD data with shape: {eodhd_df.shape}")
-
-        print("\nLoading Alpaca data...")
-        alpaca_df = load_alpaca_data()
         provider_debugs['alpaca'] = validate_and_debug_dataframe(alpaca_df, 'alpaca', debug_dir)
-        print(f"Loaded Alpaca data with shape: {alpaca_df.shape}")
-
-        print("\nLoading Sharadar data...")
-        sharadar_df = load_sharadar_data()
         provider_debugs['sharadar'] = validate_and_debug_dataframe(sharadar_df, 'sharadar', debug_dir)
-        print(f"Loaded Sharadar data with shape: {sharadar_df.shape}")
-
-        print("\nLoading FinanceDatabase data...")
-        fd_df = load_fd_data()
         provider_debugs['fd'] = validate_and_debug_dataframe(fd_df, 'financedatabase', debug_dir)
-        print(f"Loaded FinanceDatabase data with shape: {fd_df.shape}")
 
         dataframes = {
             't1': nasdaq_df,
@@ -142,7 +108,7 @@ def main_with_debugging():
 
         # Calculate market capital if the source columns exist
         if 'market_capital_1' in df.columns or 'market_capital_2' in df.columns:
-            df['market_capital'] = df.apply(average_or_keep, axis=1)
+            df['market_capital'] = average_market_capital(df)
             # Remove source columns
             columns_to_drop = [col for col in ['market_capital_1', 'market_capital_2'] if col in df.columns]
             if columns_to_drop:
@@ -151,7 +117,7 @@ def main_with_debugging():
         # Process location and branding
         print("\nProcessing location and branding data...")
         if 'location' in df.columns:
-            df['location'] = df['location'].apply(process_location)
+            df['location'] = process_locations(df['location'])
 
         if 'branding' in df.columns:
             df['branding'] = df['branding'].apply(clean_branding_url)
@@ -0,0 +1,105 @@
+"""
+Benchmark for merge_and_prioritize and the vectorized post-merge steps on a synthetic universe.
+
+    python -m source.providers.merge_benchmark --symbols 500000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from source.providers.utils import (
+    PROVIDER_PREFIX_MAP, merge_and_prioritize, average_market_capital, process_locations
+)
+
+# Fields each synthetic provider carries besides its symbol column
+PROVIDER_FIELDS = {
+    'na': ['name', 'status', 'lot'],
+    'ny': ['name', 'type'],
+    'fd': ['name', 'sector', 'industry', 'country', 'isin'],
+    'it': ['name', 'figi', 'composite_figi'],
+    'ed': ['name', 'type', 'currency', 'isin'],
+    'pl': ['name', 'type', 'location', 'market_capital_2', 'cik', 'homepage_url'],
+    'sh': ['name', 'sector', 'industry', 'market_capital_1'],
+    'fp': ['name', 'type'],
+    'av': ['name', 'type', 'status'],
+    'al': ['name', 'shortable', 'marginable', 'tradable'],
+}
+
+# Share of the universe each table covers (t1 and t2 split the listed universe)
+COVERAGE = {'t3': 0.6, 't4': 0.8, 't5': 0.9, 't6': 0.85, 't7': 0.7, 't8': 0.9, 't9': 0.75, 't10': 0.95}
+
+
+def _field_values(field, rng, n, symbols):
+    if field.startswith('market_capital'):
+        values = rng.lognormal(20, 2, n).round()
+        return np.where(rng.random(n) < 0.1, np.nan, values)
+    if field in ('shortable', 'marginable', 'tradable'):
+        return rng.random(n) < 0.8
+    if field == 'location':
+        cities = np.array(['New York', 'Boston', 'Austin', 'Toronto'])
+        countries = np.array(['US', 'USA', 'Canada', ''])
+        picks = rng.integers(0, 4, n)
+        return [
+            None if i % 17 == 0 else
+            {'address1': f"{i} Main St", 'city': cities[picks[i]], 'state': 'NY' if picks[i] == 0 else '',
+             'postal_code': f"{10000 + i % 89999}", 'country': countries[picks[i]]}
+            for i in range(n)
+        ]
+    values = np.char.add(f"{field}_", symbols)
+    return np.where(rng.random(n) < 0.05, None, values.astype(object))
+
+
+def make_synthetic_providers(n_symbols, seed=0):
+    """Ten provider frames shaped like the loaders' output, keyed on (standardized_symbol, exchange)"""
+    rng = np.random.default_rng(seed)
+    symbols = np.char.add('S', np.arange(n_symbols).astype(str))
+    exchanges = np.where(np.arange(n_symbols) % 2 == 0, 'XNAS', 'XNYS')
+
+    frames = {}
+    for table, prefix in PROVIDER_PREFIX_MAP.items():
+        if table == 't1':
+            rows = np.flatnonzero(exchanges == 'XNAS')
+        elif table == 't2':
+            rows = np.flatnonzero(exchanges == 'XNYS')
+        else:
+            rows = np.flatnonzero(rng.random(n_symbols) < COVERAGE[table])
+
+        df = pd.DataFrame({f'{prefix}_symbol': symbols[rows]})
+        for field in PROVIDER_FIELDS[prefix]:
+            df[f'{prefix}_{field}'] = _field_values(field, rng, len(rows), symbols[rows])
+        df['exchange'] = exchanges[rows]
+        df['standardized_symbol'] = symbols[rows]
+        frames[table] = df
+    return frames
+
+
+def benchmark(n_symbols, seed=0):
+    """Time the merge, market capital average and location normalization"""
+    frames = make_synthetic_providers(n_symbols, seed)
+    priorities = list(PROVIDER_PREFIX_MAP)
+
+    started = time.perf_counter()
+    df, _ = merge_and_prioritize(frames, priorities, required_tables=['t1', 't2'],
+                                 merge_keys=['standardized_symbol', 'exchange'])
+    merged = time.perf_counter()
+    df['market_capital'] = average_market_capital(df)
+    averaged = time.perf_counter()
+    df['location'] = process_locations(df['location'])
+    located = time.perf_counter()
+
+    print(f"\nsymbols={n_symbols:,} rows={len(df):,} columns={df.shape[1]}")
+    print(f"merge_and_prioritize   {merged - started:8.3f}s")
+    print(f"average_market_capital {averaged - merged:8.3f}s")
+    print(f"process_locations      {located - averaged:8.3f}s")
+    print(f"total                  {located - started:8.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark master symbology merge on a synthetic universe")
+    parser.add_argument('--symbols', type=int, default=500000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    benchmark(args.symbols, args.seed)
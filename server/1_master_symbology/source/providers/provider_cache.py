@@ -0,0 +1,209 @@
+"""
+Parallel, cached loading of provider frames.
+
+Each provider's normalized DataFrame is cached on disk as parquet, keyed by a content hash of
+the provider's raw input files plus the code that normalizes them. An unchanged provider is read
+back from the cache; changed providers are re-parsed in a process pool.
+
+Benchmark cold vs warm loads with:
+
+    python -m source.providers.provider_cache --benchmark
+"""
+import argparse
+import glob
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from source.config import config
+from source.providers.alpaca import load_alpaca_data
+from source.providers.alphavantage import load_alphavantage_data
+from source.providers.eodhd import load_eodhd_data
+from source.providers.finance_db import load_fd_data
+from source.providers.fmp import load_fmp_data
+from source.providers.intrinio import load_intrinio_data
+from source.providers.nasdaq import load_nasdaq_data
+from source.providers.nyse import load_nyse_data
+from source.providers.poly import load_poly_data
+from source.providers.sharadar import load_sharadar_data
+
+PROVIDERS_DIR = Path(__file__).parent
+
+# provider name -> (loader, normalizing module, config attribute holding its raw data path)
+PROVIDERS = {
+    'nasdaq': (load_nasdaq_data, 'nasdaq.py', 'nasdaq_data_path'),
+    'nyse': (load_nyse_data, 'nyse.py', 'nyse_data_path'),
+    'fmp': (load_fmp_data, 'fmp.py', 'fmp_data_path'),
+    'intrinio': (load_intrinio_data, 'intrinio.py', 'intrinio_data_path'),
+    'poly': (load_poly_data, 'poly.py', 'polygon_data_path'),
+    'alphavantage': (load_alphavantage_data, 'alphavantage.py', 'alphavantage_data_path'),
+    'eodhd': (load_eodhd_data, 'eodhd.py', 'eodhd_data_path'),
+    'alpaca': (load_alpaca_data, 'alpaca.py', 'alpaca_data_path'),
+    'sharadar': (load_sharadar_data, 'sharadar.py', 'sharadar_data_path'),
+    # Fetched through the financedatabase package; keyed on the raw CSV the loader saves under the day's
+    # source directory, so the cache expires with the day and follows whatever the fetch returned
+    'financedatabase': (load_fd_data, 'finance_db.py', 'financedatabase_data_path'),
+}
+
+# Shared inputs that change every provider's normalized output
+SHARED_INPUTS = [PROVIDERS_DIR / 'utils.py', PROVIDERS_DIR / '../standards/types.csv']
+
+JSON_COLUMNS_KEY = 'json_columns'
+
+
+def _hash_file(hasher, path):
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            hasher.update(chunk)
+
+
+def provider_fingerprint(name):
+    """Content hash of a provider's raw inputs and normalizing code, or None if it has no local inputs yet"""
+    _, module_file, path_attr = PROVIDERS[name]
+    hasher = hashlib.blake2b(digest_size=16)
+
+    for path in [PROVIDERS_DIR / module_file] + SHARED_INPUTS:
+        _hash_file(hasher, path)
+
+    data_path = getattr(config, path_attr)
+    files = sorted(p for p in glob.glob(os.path.join(data_path, '**', '*'), recursive=True) if os.path.isfile(p))
+    if not files:
+        # Nothing on disk yet - the loader has to fetch, so there is nothing to key a cache on
+        return None
+
+    for path in files:
+        hasher.update(os.path.relpath(path, data_path).encode())
+        _hash_file(hasher, path)
+    return hasher.hexdigest()
+
+
+def _cache_paths(name, fingerprint, cache_dir):
+    provider_dir = os.path.join(cache_dir, name)
+    return provider_dir, os.path.join(provider_dir, f"{fingerprint}.parquet"), os.path.join(provider_dir, f"{fingerprint}.json")
+
+
+def read_cached_frame(name, fingerprint, cache_dir=None):
+    """Return the cached frame for this fingerprint, or None on a miss"""
+    if fingerprint is None:
+        return None
+    _, frame_path, meta_path = _cache_paths(name, fingerprint, cache_dir or config.cache_dir)
+    if not (os.path.exists(frame_path) and os.path.exists(meta_path)):
+        return None
+
+    with open(meta_path, 'r') as f:
+        meta = json.load(f)
+    df = pd.read_parquet(frame_path)
+    for column in meta[JSON_COLUMNS_KEY]:
+        df[column] = df[column].map(lambda v: json.loads(v) if isinstance(v, str) else v)
+    return df
+
+
+def write_cached_frame(name, fingerprint, df, cache_dir=None):
+    """Store a provider frame under its fingerprint and drop older entries for the provider"""
+    if fingerprint is None:
+        return
+    provider_dir, frame_path, meta_path = _cache_paths(name, fingerprint, cache_dir or config.cache_dir)
+    os.makedirs(provider_dir, exist_ok=True)
+
+    # Parquet needs one type per column; JSON-encode object columns holding anything but strings
+    encoded = df.copy()
+    json_columns = []
+    for column in encoded.columns:
+        if encoded[column].dtype != object:
+            continue
+        values = encoded[column].dropna()
+        if values.map(lambda v: isinstance(v, str)).all():
+            continue
+        encoded[column] = encoded[column].map(lambda v: None if v is None else json.dumps(v, default=str))
+        json_columns.append(column)
+
+    tmp_path = frame_path + '.tmp'
+    encoded.to_parquet(tmp_path)
+    with open(meta_path, 'w') as f:
+        json.dump({JSON_COLUMNS_KEY: json_columns, 'rows': len(df)}, f)
+    os.replace(tmp_path, frame_path)
+
+    for stale in glob.glob(os.path.join(provider_dir, '*')):
+        if not os.path.basename(stale).startswith(fingerprint):
+            os.remove(stale)
+
+
+def _load_and_cache(name, cache_dir):
+    """Process-pool worker: run a provider's loader and cache the result"""
+    started = time.perf_counter()
+    df = PROVIDERS[name][0]()
+    # Loaders that fetch write their raw file first, so fingerprint afterwards
+    write_cached_frame(name, provider_fingerprint(name), df, cache_dir)
+    return df, time.perf_counter() - started
+
+
+def load_providers(names=None, max_workers=None, cache_dir=None, use_cache=True):
+    """
+    Load providers, serving unchanged ones from the cache and parsing the rest in parallel.
+    Returns ({name: DataFrame}, {name: {'seconds': float, 'cached': bool}}).
+    """
+    names = list(names or PROVIDERS)
+    cache_dir = cache_dir or config.cache_dir
+    frames, timings = {}, {}
+
+    misses = []
+    for name in names:
+        started = time.perf_counter()
+        df = read_cached_frame(name, provider_fingerprint(name), cache_dir) if use_cache else None
+        if df is None:
+            misses.append(name)
+            continue
+        frames[name] = df
+        timings[name] = {'seconds': time.perf_counter() - started, 'cached': True}
+        print(f"Loaded {name} from cache with shape: {df.shape} ({timings[name]['seconds']:.3f}s)")
+
+    if misses:
+        workers = min(len(misses), max_workers or config.provider_workers)
+        print(f"\nParsing {len(misses)} provider(s) in {workers} process(es): {', '.join(misses)}")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_load_and_cache, name, cache_dir): name for name in misses}
+            for future in as_completed(futures):
+                name = futures[future]
+                df, seconds = future.result()
+                frames[name] = df
+                timings[name] = {'seconds': seconds, 'cached': False}
+                print(f"Loaded {name} data with shape: {df.shape} ({seconds:.2f}s)")
+
+    return {name: frames[name] for name in names}, timings
+
+
+def benchmark(max_workers=None):
+    """Report cold (empty cache) and warm (cache hit) load timings per provider"""
+    cache_dir = tempfile.mkdtemp(prefix='provider_cache_')
+    try:
+        cold_started = time.perf_counter()
+        _, cold = load_providers(max_workers=max_workers, cache_dir=cache_dir)
+        cold_total = time.perf_counter() - cold_started
+
+        warm_started = time.perf_counter()
+        _, warm = load_providers(max_workers=max_workers, cache_dir=cache_dir)
+        warm_total = time.perf_counter() - warm_started
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"\n{'provider':<16} {'cold_s':>9} {'warm_s':>9} {'warm_hit':>9}")
+    for name in PROVIDERS:
+        print(f"{name:<16} {cold[name]['seconds']:>9.3f} {warm[name]['seconds']:>9.3f} {str(warm[name]['cached']):>9}")
+    print(f"{'pipeline':<16} {cold_total:>9.3f} {warm_total:>9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Provider cache utilities")
+    parser.add_argument('--benchmark', action='store_true', help="time cold and warm provider loads")
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.benchmark:
+        benchmark(max_workers=args.workers)
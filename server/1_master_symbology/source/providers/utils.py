@@ -1,4 +1,5 @@
 import re
+import numpy as np
 import pandas as pd
 import json
 import os
@@ -75,6 +76,67 @@ def format_address_dict(addr_dict):
     return ', '.join(parts) if parts else None
 
 
+ADDRESS_FIELDS = ['address1', 'address2', 'city', 'state', 'postal_code']
+DOMESTIC_COUNTRIES = ['USA', 'US', 'UNITED STATES']
+
+
+def format_address_frame(addresses):
+    """
+    Vectorized format_address_dict over a DataFrame with one row per address dictionary.
+
+    Returns:
+        Series of formatted address strings (None where no component is present)
+    """
+    parts = []
+    for field in ADDRESS_FIELDS:
+        if field in addresses.columns:
+            values = addresses[field]
+            parts.append(values.where(values.notna() & (values != '')))
+
+    if 'country' in addresses.columns:
+        country = addresses['country']
+        foreign = country.notna() & (country != '') & ~country.astype(str).str.upper().isin(DOMESTIC_COUNTRIES)
+        parts.append(country.where(foreign))
+
+    # Join the present components in field order
+    formatted = np.full(len(addresses), None, dtype=object)
+    for part in parts:
+        values = part.to_numpy(dtype=object)
+        present = part.notna().to_numpy()
+        extend = present & (formatted != None)
+        start = present & ~extend
+        formatted[extend] = formatted[extend] + ', ' + values[extend]
+        formatted[start] = values[start]
+    return pd.Series(formatted, index=addresses.index, dtype=object)
+
+
+def process_locations(locations):
+    """
+    Vectorized process_location over a Series.
+    Dictionaries are formatted column-wise; strings are mapped through a dictionary of their unique values.
+    """
+    values = locations.to_numpy(dtype=object)
+    result = np.full(len(values), None, dtype=object)
+
+    is_dict = np.fromiter((isinstance(v, dict) for v in values), dtype=bool, count=len(values))
+    is_str = np.fromiter((isinstance(v, str) for v in values), dtype=bool, count=len(values))
+    is_other = ~(is_dict | is_str) & ~pd.isna(locations).to_numpy()
+
+    if is_dict.any():
+        addresses = pd.DataFrame.from_records(list(values[is_dict]))
+        result[is_dict] = format_address_frame(addresses).to_numpy(dtype=object)
+
+    if is_str.any():
+        strings = pd.Series(values[is_str])
+        mapping = {value: process_location(value) for value in strings.unique()}
+        result[is_str] = strings.map(mapping).to_numpy(dtype=object)
+
+    if is_other.any():
+        result[is_other] = [str(v) for v in values[is_other]]
+
+    return pd.Series(result, index=locations.index, dtype=object)
+
+
 def clean_branding_url(branding_url):
     """
     Extract the path component after the base Polygon branding URL for storage efficiency.
@@ -117,51 +179,52 @@ def standardize(symbol):
     return re.sub(r'[^A-Z]', '', symbol.upper())
 
 
-def average_or_keep(row):
-    """Calculate average of two market cap values or keep the available one."""
-    val1 = row.get('market_capital_1')
-    val2 = row.get('market_capital_2')
-
-    # Check if both values are not None/NaN
-    if pd.notna(val1) and pd.notna(val2):
-        return round((val1 + val2) / 2)
-
-    # If only one is not None/NaN, return that value
-    elif pd.notna(val1):
-        return round(val1)
-
-    elif pd.notna(val2):
-        return round(val2)
-
-    # If both are None/NaN, return None
-    else:
-        return None
-
-
-def consolidate_column(df, base_variable, priority_map):
+def average_market_capital(df):
     """
-    Consolidates a column based on a priority map.
-
-    Args:
-       df (pd.DataFrame): The merged DataFrame.
-       base_variable (str): The base name of the column to consolidate (e.g., 'name').
-       priority_map (list): A list of tuples, where each tuple is (table_indicator, col_prefix).
-       The order of the list defines the priority.
-
-    Returns:
-       pd.Series: The consolidated column.
+    Calculate average of the two market cap values or keep the available one, rounded to an integer.
     """
-    consolidated = pd.Series(index=df.index, dtype=object)
-
-    for table_indicator, col_prefix in priority_map:
-        indicator_col = f"_in_{table_indicator}"
-        source_col = f"{col_prefix}_{base_variable}"
-
-        if indicator_col in df.columns and source_col in df.columns:
-            mask = (df[indicator_col] == 1) & (consolidated.isnull())
-            consolidated.loc[mask] = df.loc[mask, source_col]
+    missing = pd.Series(np.nan, index=df.index)
+    cap_1 = pd.to_numeric(df['market_capital_1']) if 'market_capital_1' in df.columns else missing
+    cap_2 = pd.to_numeric(df['market_capital_2']) if 'market_capital_2' in df.columns else missing
+
+    average = np.where(cap_1.notna() & cap_2.notna(), (cap_1 + cap_2) / 2, cap_1.fillna(cap_2))
+    rounded = pd.Series(np.round(average.astype(float)), index=df.index)
+
+    # Integers when every row has a value, floats with NaN otherwise
+    if rounded.notna().all() and len(rounded):
+        return rounded.astype('int64')
+    return rounded
+
+
+PROVIDER_PREFIX_MAP = {
+    't1': 'na',
+    't2': 'ny',
+    't3': 'fd',
+    't4': 'it',
+    't5': 'ed',
+    't6': 'pl',
+    't7': 'sh',
+    't8': 'fp',
+    't9': 'av',
+    't10': 'al',
+}
+
+
+def resolve_first_valid(candidates):
+    """
+    Resolve one field from provider columns stacked in priority order: each row takes the value of
+    the first provider whose value is not null (NaN where none is).
+    """
+    valid = np.column_stack([column.notna().to_numpy() for column in candidates])
+    winner = valid.argmax(axis=1)
+    has_value = valid.any(axis=1)
 
-    return consolidated
+    resolved = np.full(valid.shape[0], np.nan, dtype=object)
+    for rank, column in enumerate(candidates):
+        take = has_value & (winner == rank)
+        if take.any():
+            resolved[take] = column.to_numpy(dtype=object)[take]
+    return resolved
 
 
 def merge_and_prioritize(dataframes, priorities, required_tables, merge_keys=['standardized_symbol', 'exchange']):
@@ -169,6 +232,10 @@ def merge_and_prioritize(dataframes, priorities, required_tables, merge_keys=['s
     Merges a list of DataFrames based on a common set of keys, calculates a confidence score,
     and prioritizes columns based on a given order.
 
+    Rows are aligned with key-only joins (outer on the required tables, left for the rest), carrying
+    just each provider's row position. Provider columns are then gathered by position and each field
+    is resolved as the first valid value across providers stacked in priority order.
+
     Args:
         dataframes (dict): A dictionary of pandas DataFrames, with keys as table names.
         priorities (list): A list of table names in descending order of priority.
@@ -182,84 +249,92 @@ def merge_and_prioritize(dataframes, priorities, required_tables, merge_keys=['s
     for name, df in dataframes.items():
         df[f'_in_{name}'] = 1
 
-    # Step 1: OUTER merge all required tables first to establish the base universe
-    required_dfs = [dataframes[table] for table in required_tables if table in dataframes]
-
-    if not required_dfs:
+    # Encode the merge keys once as integer codes ordered like the key tuples, so every join below
+    # compares one int64 column instead of re-hashing the string keys
+    all_keys = pd.concat([df[merge_keys] for df in dataframes.values()], ignore_index=True)
+    combined = np.zeros(len(all_keys), dtype=np.int64)
+    level_uniques = []
+    for key in merge_keys:
+        codes, uniques = pd.factorize(all_keys[key], sort=True, use_na_sentinel=False)
+        combined = combined * len(uniques) + codes
+        level_uniques.append(uniques)
+    combined_uniques, key_codes = np.unique(combined, return_inverse=True)
+    offsets = np.cumsum([0] + [len(df) for df in dataframes.values()])
+    table_codes = {name: key_codes[offsets[i]:offsets[i + 1]] for i, name in enumerate(dataframes)}
+
+    def key_frame(name):
+        df = dataframes[name]
+        return pd.DataFrame({
+            '_key': table_codes[name],
+            f'_in_{name}': df[f'_in_{name}'].to_numpy(),
+            f'_row_{name}': np.arange(len(df)),
+        }, index=df.index)
+
+    # Step 1: OUTER join the required tables' keys to establish the base universe
+    required = [table for table in required_tables if table in dataframes]
+    if not required:
         raise ValueError("No required tables found in dataframes")
 
-    # Start with first required table
-    merged_df = required_dfs[0].copy()
-
-    # OUTER merge with remaining required tables
-    for df in required_dfs[1:]:
-        merged_df = pd.merge(merged_df, df, on=merge_keys, how='outer')
+    aligned = key_frame(required[0])
+    for table in required[1:]:
+        aligned = pd.merge(aligned, key_frame(table), on='_key', how='outer')
 
-    print(f"After OUTER merge of required tables: {merged_df.shape[0]:,} records")
+    print(f"After OUTER merge of required tables: {aligned.shape[0]:,} records")
 
-    # Step 2: LEFT merge all remaining tables to the required base
+    # Step 2: LEFT join the remaining tables' keys to the required base
     remaining_tables = [table for table in dataframes.keys() if table not in required_tables]
-
     for table in remaining_tables:
-        if table in dataframes:
-            merged_df = pd.merge(merged_df, dataframes[table], on=merge_keys, how='left')
-            print(f"After LEFT merge with {table}: {merged_df.shape[0]:,} records")
+        aligned = pd.merge(aligned, key_frame(table), on='_key', how='left')
+        print(f"After LEFT merge with {table}: {aligned.shape[0]:,} records")
+
+    # Restore the key columns from their codes
+    remainder = combined_uniques[aligned['_key'].to_numpy()]
+    for key, uniques in reversed(list(zip(merge_keys, level_uniques))):
+        aligned[key] = np.asarray(uniques, dtype=object)[remainder % len(uniques)]
+        remainder = remainder // len(uniques)
 
     # Calculate confidence score
     indicator_cols = [f'_in_{name}' for name in dataframes.keys()]
-
-    # Fill NaNs in indicator columns with 0
     for col in indicator_cols:
-        if col in merged_df.columns:
-            merged_df[col] = merged_df[col].fillna(0)
+        aligned[col] = aligned[col].fillna(0)
 
-    merged_df['confidence_score'] = merged_df[indicator_cols].sum(axis=1)
+    aligned['confidence_score'] = aligned[indicator_cols].sum(axis=1)
 
     # Since we did OUTER merge on required tables, all records should have confidence > 0
-    # But let's verify required tables are present
     required_indicator_cols = [f'_in_{name}' for name in required_tables]
-    required_condition = merged_df[required_indicator_cols].sum(axis=1) > 0
+    required_condition = aligned[required_indicator_cols].sum(axis=1) > 0
+    print(f"Records meeting required table condition: {required_condition.sum():,} / {len(aligned):,}")
 
-    # This should be 100% since we did OUTER merge, but let's be safe
-    print(f"Records meeting required table condition: {required_condition.sum():,} / {len(merged_df):,}")
+    # Gather every provider-prefixed column onto the aligned rows (missing rows become NaN)
+    provider_columns = {}
+    for table in required + remaining_tables:
+        df = dataframes[table]
+        positions = aligned[f'_row_{table}'].fillna(-1).to_numpy(dtype=np.int64)
+        prefixed = [col for col in df.columns if re.match(r'^[a-z]{2}_', col)]
+        if prefixed:
+            gathered = df[prefixed].reset_index(drop=True).reindex(positions)
+            gathered.index = aligned.index
+            provider_columns.update(gathered.items())
 
     # Define the base variables to be consolidated
-    base_variables = {re.sub(r'^[a-z]{2}_', '', col) for col in merged_df.columns if re.match(r'^[a-z]{2}_', col)}
-
-    # Define the mapping from table names to column prefixes
-    prefix_map = {
-        't1': 'na',
-        't2': 'ny',
-        't3': 'fd',
-        't4': 'it',
-        't5': 'ed',
-        't6': 'pl',
-        't7': 'sh',
-        't8': 'fp',
-        't9': 'av',
-        't10': 'al',
-    }
-
-    # Create the priority map for consolidation
-    priority_map = [(table, prefix_map.get(table)) for table in priorities if table in prefix_map]
-
-    # Collect all consolidated columns efficiently
+    base_variables = {re.sub(r'^[a-z]{2}_', '', col) for col in provider_columns}
+
+    # Resolve each base variable from the providers that carry it, in priority order
+    priority_prefixes = [PROVIDER_PREFIX_MAP[table] for table in priorities if table in PROVIDER_PREFIX_MAP]
     consolidated_columns = {}
     for base_variable in base_variables:
-        consolidated_columns[base_variable] = consolidate_column(merged_df, base_variable, priority_map)
-
-    # KEEP ALL PROVIDER COLUMNS - Don't drop the original al_symbol, av_symbol, etc.
-    # Get all provider columns (columns that start with provider prefixes)
-    provider_columns = {}
-    for col in merged_df.columns:
-        if re.match(r'^[a-z]{2}_', col):  # This matches al_symbol, av_symbol, etc.
-            provider_columns[col] = merged_df[col]
-
-    # Create final dataframe efficiently using pd.concat
+        candidates = [provider_columns[f"{prefix}_{base_variable}"] for prefix in priority_prefixes
+                      if f"{prefix}_{base_variable}" in provider_columns]
+        if candidates:
+            consolidated_columns[base_variable] = resolve_first_valid(candidates)
+        else:
+            consolidated_columns[base_variable] = np.full(len(aligned), np.nan, dtype=object)
+
+    # Keep all provider columns (al_symbol, av_symbol, etc.) alongside the consolidated ones
     final_df_parts = [
-        merged_df[merge_keys + indicator_cols + ['confidence_score']],
-        pd.DataFrame(consolidated_columns, index=merged_df.index),
-        pd.DataFrame(provider_columns, index=merged_df.index)
+        aligned[merge_keys + indicator_cols + ['confidence_score']],
+        pd.DataFrame(consolidated_columns, index=aligned.index, dtype=object),
+        pd.DataFrame(provider_columns, index=aligned.index)
     ]
     final_df = pd.concat(final_df_parts, axis=1)
 
@@ -3,12 +3,12 @@
 Master file comparison engine with USE_PREV functionality and primary/secondary diff categorization
 """
 
+import numpy as np
 import pandas as pd
-from typing import Dict, Tuple, Any
+from typing import Dict, List, Tuple, Any
 import logging
 from datetime import datetime
 from pathlib import Path
-from collections import defaultdict
 from source.config import config
 from source.master.utils import (
     ensure_output_directory,
@@ -20,6 +20,303 @@ from source.master.utils import (
 
 logger = logging.getLogger(__name__)
 
+# Current-row fields copied onto each data change summary record for context
+SUMMARY_CONTEXT_FIELDS = ['name', 'status', 'type', 'currency']
+
+
+def normalize_numeric(value: Any) -> str:
+    """Normalize a single numeric column value for comparison"""
+    try:
+        # Handle empty/null values
+        if pd.isna(value) or value == '' or value == 'nan':
+            return '0'
+
+        # Convert to float first
+        float_val = float(str(value).replace(',', ''))
+
+        # If it's a whole number, return as integer string
+        if float_val.is_integer():
+            return str(int(float_val))
+        else:
+            # Round to avoid floating point precision issues
+            return f"{float_val:.10g}"  # Use general format to avoid unnecessary decimals
+
+    except (ValueError, TypeError) as e:
+        logger.debug(f"Could not convert '{value}' to numeric: {e}")
+        return str(value) if pd.notna(value) else ''
+
+
+def _text_values(values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """str() of every value as an object array, plus the missing-value mask"""
+    if pd.api.types.infer_dtype(values, skipna=False) == 'string':
+        # All plain strings (the loaded master files): nothing to convert and nothing missing
+        return values, np.zeros(len(values), dtype=bool)
+    return pd.Series(values, dtype=object).astype(str).to_numpy(dtype=object), pd.isna(values)
+
+
+def display_values(values: np.ndarray) -> np.ndarray:
+    """Column-at-once str(value), with '' for missing values"""
+    text, missing = _text_values(values)
+    if missing.any():
+        text = text.copy()
+        text[missing] = ''
+    return text
+
+
+def _format_floats(floats: np.ndarray) -> np.ndarray:
+    """Whole numbers as integer strings, everything else with 10 significant digits"""
+    formatted = np.empty(len(floats), dtype=object)
+    whole = np.isfinite(floats) & (np.floor(floats) == floats)
+    fits_int64 = whole & (np.abs(floats) < 2.0 ** 63)
+    formatted[fits_int64] = floats[fits_int64].astype(np.int64).astype(str)
+
+    rest = np.flatnonzero(~fits_int64)
+    formatted[rest] = [str(int(v)) if w else f"{v:.10g}" for v, w in zip(floats[rest], whole[rest])]
+    return formatted
+
+
+def normalize_numeric_values(raw: np.ndarray) -> np.ndarray:
+    """Column-at-once normalize_numeric: parses the column in bulk and produces identical strings"""
+    text, missing = _text_values(raw)
+    normalized = np.empty(len(raw), dtype=object)
+
+    empty = missing | (raw == '') | (raw == 'nan')
+    normalized[empty] = '0'
+
+    pending = np.flatnonzero(~empty)
+    cleaned = pd.Series(text[pending], dtype=object).str.replace(',', '', regex=False)
+    # to_numeric only picks the candidates; the floats themselves come from float() so they match exactly
+    parsed = pd.to_numeric(cleaned, errors='coerce').notna().to_numpy()
+    try:
+        floats = cleaned.to_numpy(dtype=object)[parsed].astype(np.float64)
+    except (ValueError, TypeError):
+        parsed[:] = False
+    if parsed.any():
+        normalized[pending[parsed]] = _format_floats(floats)
+
+    # Anything pandas would not parse (text, 'NaN', '1_000', ...) goes through the scalar path once per value
+    fallback = pending[~parsed]
+    if len(fallback):
+        codes, uniques = pd.factorize(raw[fallback])
+        normalized[fallback] = np.asarray([normalize_numeric(v) for v in uniques], dtype=object)[codes]
+    return normalized
+
+
+def _is_blank(text: np.ndarray) -> np.ndarray:
+    return pd.Series(text, dtype=object).str.strip().isin(['', 'nan']).to_numpy()
+
+
+def _join_fields(mask: np.ndarray, names: List[str]) -> np.ndarray:
+    """', '-joined names of the set columns of each mask row, joined once per distinct row pattern"""
+    patterns, inverse = np.unique(mask, axis=0, return_inverse=True)
+    joined = [', '.join(name for name, is_set in zip(names, pattern) if is_set) for pattern in patterns]
+    return np.asarray(joined, dtype=object)[inverse.reshape(-1)]
+
+
+def _align_common_keys(previous_keys: pd.Series, current_keys: pd.Series) -> Tuple[np.ndarray, np.ndarray, int]:
+    """
+    Row positions pairing each key found exactly once in both snapshots, in current snapshot order.
+    Also returns how many common keys were left out because a snapshot repeats them.
+    """
+    codes, uniques = pd.factorize(pd.concat([previous_keys, current_keys], ignore_index=True))
+    prev_codes, curr_codes = codes[:len(previous_keys)], codes[len(previous_keys):]
+    prev_counts = np.bincount(prev_codes, minlength=len(uniques))
+    curr_counts = np.bincount(curr_codes, minlength=len(uniques))
+
+    prev_position = np.zeros(len(uniques), dtype=np.int64)
+    prev_position[prev_codes] = np.arange(len(prev_codes))
+    paired = (prev_counts == 1) & (curr_counts == 1)
+
+    curr_rows = np.flatnonzero(paired[curr_codes])
+    prev_rows = prev_position[curr_codes[curr_rows]]
+    skipped = int(((prev_counts > 0) & (curr_counts > 0)).sum()) - len(curr_rows)
+    return prev_rows, curr_rows, skipped
+
+
+def compare_common_records(previous_df: pd.DataFrame, current_df: pd.DataFrame, previous_date: str,
+                           current_date: str) -> Tuple[pd.DataFrame, Dict[str, pd.DataFrame],
+Dict[str, pd.DataFrame], Dict[str, pd.DataFrame]]:
+    """
+    Columnar detailed comparison of the records present in both snapshots.
+
+    Both frames (with composite_key) are aligned on the key, every comparable column is normalized in bulk
+    into one (records x columns) change mask, and the column and summary change records are emitted from it.
+    Keys duplicated in either snapshot are skipped, as the row-by-row comparison did. Records come out in
+    current snapshot order.
+
+    Returns:
+        Tuple of (summary_df, all_column_changes, primary_column_changes, secondary_column_changes)
+    """
+    prev_rows, curr_rows, skipped = _align_common_keys(previous_df['composite_key'], current_df['composite_key'])
+    if skipped:
+        logger.warning(f"Skipping {skipped} common keys that are duplicated in a snapshot")
+
+    def aligned(df: pd.DataFrame, rows: np.ndarray, col: str) -> np.ndarray:
+        return df[col].to_numpy(dtype=object)[rows]
+
+    columns = [col for col in previous_df.columns
+               if col != 'composite_key' and col not in config.IGNORE_COLUMNS and col in current_df.columns]
+    n_records = len(curr_rows)
+    changed = np.zeros((n_records, len(columns)), dtype=bool)
+    backfilled = np.zeros((n_records, len(columns)), dtype=bool)
+    column_changes: Dict[str, Dict[str, np.ndarray]] = {}
+    ignored_due_to_numeric = 0
+
+    for j, col in enumerate(columns):
+        is_numeric = col in config.NUMERIC_COLUMNS
+        prev_column = aligned(previous_df, prev_rows, col)
+        curr_column = aligned(current_df, curr_rows, col)
+        prev_text, prev_missing = _text_values(prev_column)
+        curr_text, curr_missing = _text_values(curr_column)
+
+        # Identical non-missing text always normalizes identically, so only the rest needs normalizing
+        candidates = np.flatnonzero((prev_text != curr_text) | prev_missing | curr_missing)
+        if not len(candidates):
+            continue
+        prev_values = prev_column[candidates]
+        curr_values = curr_column[candidates]
+
+        if is_numeric:
+            prev_display = normalize_numeric_values(prev_values)
+            curr_display = normalize_numeric_values(curr_values)
+        else:
+            prev_display = display_values(prev_values)
+            curr_display = display_values(curr_values)
+        differs = prev_display != curr_display
+
+        if is_numeric:
+            # Track numeric normalizations for debugging
+            ignored_due_to_numeric += int((~differs & (prev_text[candidates] != curr_text[candidates])).sum())
+
+        rows = candidates[differs]
+        if not len(rows):
+            continue
+        changed[rows, j] = True
+
+        prev_original = display_values(prev_values)[differs]
+        curr_original = display_values(curr_values)[differs]
+        if col in config.USE_PREV_COLUMNS:
+            # USE_PREV related if previous was empty and current has value
+            is_backfill = _is_blank(prev_original) & ~_is_blank(curr_original)
+            backfilled[rows[is_backfill], j] = True
+        else:
+            is_backfill = np.zeros(len(rows), dtype=bool)
+
+        column_changes[col] = {
+            'rows': rows,
+            'previous_value': prev_display[differs],
+            'current_value': curr_display[differs],
+            'original_previous_value': prev_original,
+            'original_current_value': curr_original,
+            'importance': np.where(is_backfill, 'secondary', 'primary').astype(object),
+        }
+
+    change_timestamp = datetime.now().isoformat()
+    changed_records = np.flatnonzero(changed.any(axis=1))
+    keys = aligned(current_df, curr_rows, 'composite_key')
+
+    # symbol/exchange come from the key, split once per changed record
+    position = np.full(n_records, -1, dtype=np.int64)
+    position[changed_records] = np.arange(len(changed_records))
+    key_parts = pd.Series(keys[changed_records], dtype=object).str.split(':', n=1)
+    symbols = key_parts.str[0].to_numpy(dtype=object)
+    exchanges = key_parts.str[1].to_numpy(dtype=object)
+
+    all_column_dfs, primary_column_dfs, secondary_column_dfs = {}, {}, {}
+    for col, changes in column_changes.items():
+        rows = changes['rows']
+        changes_df = pd.DataFrame({
+            'symbol': symbols[position[rows]],
+            'exchange': exchanges[position[rows]],
+            'composite_key': keys[rows],
+            'previous_value': changes['previous_value'],
+            'current_value': changes['current_value'],
+            'original_previous_value': changes['original_previous_value'],
+            'original_current_value': changes['original_current_value'],
+            'is_numeric_column': col in config.NUMERIC_COLUMNS,
+            'is_use_prev_column': col in config.USE_PREV_COLUMNS,
+            'importance': changes['importance'],
+            'previous_date': previous_date,
+            'current_date': current_date,
+            'change_timestamp': change_timestamp
+        })
+        all_column_dfs[col] = changes_df
+
+        is_primary = changes['importance'] == 'primary'
+        if is_primary.any():
+            primary_column_dfs[col] = changes_df[is_primary].reset_index(drop=True)
+        if not is_primary.all():
+            secondary_column_dfs[col] = changes_df[~is_primary].reset_index(drop=True)
+
+    if len(changed_records):
+        # Field lists are joined in sorted column order
+        order = sorted(range(len(columns)), key=columns.__getitem__)
+        names = [columns[j] for j in order]
+        record_changed = changed[changed_records][:, order]
+        record_secondary = backfilled[changed_records][:, order]
+        record_primary = record_changed & ~record_secondary
+
+        primary_counts = record_primary.sum(axis=1)
+        secondary_counts = record_secondary.sum(axis=1)
+        summary = {
+            'symbol': symbols,
+            'exchange': exchanges,
+            'composite_key': keys[changed_records],
+            'change_type': 'DATA_CHANGE',
+            'change_timestamp': change_timestamp,
+            'previous_date': previous_date,
+            'current_date': current_date,
+            'changed_fields': _join_fields(record_changed, names),
+            'primary_fields': _join_fields(record_primary, names),
+            'secondary_fields': _join_fields(record_secondary, names),
+            'primary_change_count': primary_counts,
+            'secondary_change_count': secondary_counts,
+            'total_change_count': record_changed.sum(axis=1),
+            'has_primary_changes': primary_counts > 0,
+            'has_secondary_changes': secondary_counts > 0,
+            'change_category': np.where(primary_counts > 0, 'primary', 'secondary').astype(object)
+        }
+
+        # Add some key current values for context
+        for field in SUMMARY_CONTEXT_FIELDS:
+            if field in current_df.columns and field != 'composite_key':
+                summary[field] = _text_values(aligned(current_df, curr_rows[changed_records], field))[0]
+
+        summary_df = pd.DataFrame(summary)
+    else:
+        summary_df = pd.DataFrame()
+
+    primary_changes_count = int((changed & ~backfilled).sum())
+    secondary_changes_count = int(backfilled.sum())
+
+    logger.info(f"Numeric normalizations prevented {ignored_due_to_numeric} false positives")
+    logger.info(f"Found {len(summary_df)} records with data changes")
+    logger.info(f"Primary changes: {primary_changes_count} field changes across {len(primary_column_dfs)} columns")
+    logger.info(
+        f"Secondary changes: {secondary_changes_count} field changes across {len(secondary_column_dfs)} columns")
+
+    if len(changed_records):
+        # Log top changed columns by category
+        primary_column_counts = [(col, len(df)) for col, df in primary_column_dfs.items()]
+        secondary_column_counts = [(col, len(df)) for col, df in secondary_column_dfs.items()]
+
+        primary_column_counts.sort(key=lambda x: x[1], reverse=True)
+        secondary_column_counts.sort(key=lambda x: x[1], reverse=True)
+
+        if primary_column_counts:
+            logger.info("Top 5 PRIMARY changed columns:")
+            for col, count in primary_column_counts[:5]:
+                logger.info(f"  {col}: {count} changes")
+
+        if secondary_column_counts:
+            logger.info("Top 5 SECONDARY changed columns:")
+            for col, count in secondary_column_counts[:5]:
+                logger.info(f"  {col}: {count} changes")
+    else:
+        logger.info("No data changes found")
+
+    return summary_df, all_column_dfs, primary_column_dfs, secondary_column_dfs
+
 
 class MasterFileComparator:
     """Compare two master files and identify all differences with USE_PREV functionality"""
@@ -84,25 +381,7 @@ class MasterFileComparator:
         """Normalize numeric values for comparison"""
         if column_name not in config.NUMERIC_COLUMNS:
             return str(value) if pd.notna(value) else ''
-
-        try:
-            # Handle empty/null values
-            if pd.isna(value) or value == '' or value == 'nan':
-                return '0'
-
-            # Convert to float first
-            float_val = float(str(value).replace(',', ''))
-
-            # If it's a whole number, return as integer string
-            if float_val.is_integer():
-                return str(int(float_val))
-            else:
-                # Round to avoid floating point precision issues
-                return f"{float_val:.10g}"  # Use general format to avoid unnecessary decimals
-
-        except (ValueError, TypeError) as e:
-            logger.debug(f"Could not convert '{value}' to numeric for column '{column_name}': {e}")
-            return str(value) if pd.notna(value) else ''
+        return normalize_numeric(value)
 
     def values_are_equal(self, val1: Any, val2: Any, column_name: str) -> bool:
         """Compare two values, handling numeric columns specially"""
@@ -189,166 +468,10 @@ class MasterFileComparator:
             logger.info("No common keys found for comparison")
             return pd.DataFrame(), {}, {}, {}
 
-        # Create indexed DataFrames for efficient comparison
-        prev_indexed = self.previous_df.set_index('composite_key')
-        curr_indexed = self.current_df.set_index('composite_key')
-
-        # Track changes by column and importance
-        all_column_changes = defaultdict(list)
-        primary_column_changes = defaultdict(list)
-        secondary_column_changes = defaultdict(list)
-        summary_changes = []
-
         logger.info(f"Comparing {len(common_keys)} common records for data changes...")
         logger.info(f"Ignoring columns: {sorted(list(config.IGNORE_COLUMNS))}")
 
-        ignored_due_to_numeric = 0
-        total_comparisons = 0
-        primary_changes_count = 0
-        secondary_changes_count = 0
-
-        for i, key in enumerate(common_keys):
-            if i % 5000 == 0:  # Progress indicator
-                logger.info(f"Processed {i}/{len(common_keys)} records")
-
-            try:
-                prev_row = prev_indexed.loc[key]
-                curr_row = curr_indexed.loc[key]
-
-                symbol, exchange = key.split(':', 1)
-
-                # Find differences
-                row_changes = {}
-                primary_fields = []
-                secondary_fields = []
-
-                for col in prev_row.index:
-                    if col in config.IGNORE_COLUMNS:
-                        continue
-
-                    if col in curr_row.index:
-                        total_comparisons += 1
-                        prev_val = prev_row[col]
-                        curr_val = curr_row[col]
-
-                        if not self.values_are_equal(prev_val, curr_val, col):
-                            # Get display values
-                            prev_display = self.get_display_value(prev_val, col)
-                            curr_display = self.get_display_value(curr_val, col)
-
-                            # Categorize change importance
-                            importance = self.categorize_change_importance(col, prev_val, curr_val)
-
-                            row_changes[col] = {
-                                'previous_value': prev_display,
-                                'current_value': curr_display,
-                                'original_previous': str(prev_val) if pd.notna(prev_val) else '',
-                                'original_current': str(curr_val) if pd.notna(curr_val) else '',
-                                'importance': importance
-                            }
-
-                            if importance == 'primary':
-                                primary_fields.append(col)
-                                primary_changes_count += 1
-                            else:
-                                secondary_fields.append(col)
-                                secondary_changes_count += 1
-
-                            # Create change record for column tracking
-                            change_record = {
-                                'symbol': symbol,
-                                'exchange': exchange,
-                                'composite_key': key,
-                                'previous_value': prev_display,
-                                'current_value': curr_display,
-                                'original_previous_value': str(prev_val) if pd.notna(prev_val) else '',
-                                'original_current_value': str(curr_val) if pd.notna(curr_val) else '',
-                                'is_numeric_column': col in config.NUMERIC_COLUMNS,
-                                'is_use_prev_column': col in config.USE_PREV_COLUMNS,
-                                'importance': importance,
-                                'previous_date': self.previous_date,
-                                'current_date': self.current_date,
-                                'change_timestamp': datetime.now().isoformat()
-                            }
-
-                            # Add to appropriate tracking dictionaries
-                            all_column_changes[col].append(change_record)
-
-                            if importance == 'primary':
-                                primary_column_changes[col].append(change_record)
-                            else:
-                                secondary_column_changes[col].append(change_record)
-
-                        else:
-                            # Track numeric normalizations for debugging
-                            if col in config.NUMERIC_COLUMNS and str(prev_val) != str(curr_val):
-                                ignored_due_to_numeric += 1
-
-                if row_changes:
-                    # Create a summary record for this symbol
-                    change_record = {
-                        'symbol': symbol,
-                        'exchange': exchange,
-                        'composite_key': key,
-                        'change_type': 'DATA_CHANGE',
-                        'change_timestamp': datetime.now().isoformat(),
-                        'previous_date': self.previous_date,
-                        'current_date': self.current_date,
-                        'changed_fields': ', '.join(sorted(row_changes.keys())),
-                        'primary_fields': ', '.join(sorted(primary_fields)),
-                        'secondary_fields': ', '.join(sorted(secondary_fields)),
-                        'primary_change_count': len(primary_fields),
-                        'secondary_change_count': len(secondary_fields),
-                        'total_change_count': len(row_changes),
-                        'has_primary_changes': len(primary_fields) > 0,
-                        'has_secondary_changes': len(secondary_fields) > 0,
-                        'change_category': 'primary' if len(primary_fields) > 0 else 'secondary'
-                    }
-
-                    # Add some key current values for context
-                    for field in ['name', 'status', 'type', 'currency']:
-                        if field in curr_row.index:
-                            change_record[field] = str(curr_row[field])
-
-                    summary_changes.append(change_record)
-
-            except Exception as e:
-                logger.warning(f"Error comparing key {key}: {e}")
-                continue
-
-        # Convert to DataFrames
-        summary_df = pd.DataFrame(summary_changes) if summary_changes else pd.DataFrame()
-        all_column_dfs = {col: pd.DataFrame(changes) for col, changes in all_column_changes.items()}
-        primary_column_dfs = {col: pd.DataFrame(changes) for col, changes in primary_column_changes.items()}
-        secondary_column_dfs = {col: pd.DataFrame(changes) for col, changes in secondary_column_changes.items()}
-
-        logger.info(f"Numeric normalizations prevented {ignored_due_to_numeric} false positives")
-        logger.info(f"Found {len(summary_df)} records with data changes")
-        logger.info(f"Primary changes: {primary_changes_count} field changes across {len(primary_column_dfs)} columns")
-        logger.info(
-            f"Secondary changes: {secondary_changes_count} field changes across {len(secondary_column_dfs)} columns")
-
-        if summary_changes:
-            # Log top changed columns by category
-            primary_column_counts = [(col, len(df)) for col, df in primary_column_dfs.items()]
-            secondary_column_counts = [(col, len(df)) for col, df in secondary_column_dfs.items()]
-
-            primary_column_counts.sort(key=lambda x: x[1], reverse=True)
-            secondary_column_counts.sort(key=lambda x: x[1], reverse=True)
-
-            if primary_column_counts:
-                logger.info("Top 5 PRIMARY changed columns:")
-                for col, count in primary_column_counts[:5]:
-                    logger.info(f"  {col}: {count} changes")
-
-            if secondary_column_counts:
-                logger.info("Top 5 SECONDARY changed columns:")
-                for col, count in secondary_column_counts[:5]:
-                    logger.info(f"  {col}: {count} changes")
-        else:
-            logger.info("No data changes found")
-
-        return summary_df, all_column_dfs, primary_column_dfs, secondary_column_dfs
+        return compare_common_records(self.previous_df, self.current_df, self.previous_date, self.current_date)
 
     def create_column_changes_summary(self, column_dfs: Dict[str, pd.DataFrame],
                                       output_prefix: str, category: str = "all") -> pd.DataFrame:
@@ -0,0 +1,215 @@
+"""
+Benchmark and parity check for the columnar detailed comparison on synthetic master snapshots.
+
+    python -m source.master.compare_benchmark --rows 1000000 --churn 0.01
+
+The parity check replays the original row-by-row comparison on a smaller pair of snapshots and
+asserts that compare_common_records emits the same summary and column change records.
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from source.config import config
+from source.master.compare import compare_common_records, normalize_numeric, SUMMARY_CONTEXT_FIELDS
+
+# Value pools for the synthetic snapshots: (column, values)
+TEXT_POOLS = {
+    'status': ['active', 'inactive', 'delisted'],
+    'type': ['CS', 'ETF', 'ADRC', 'PFD', 'WARRANT'],
+    'currency': ['USD', 'CAD', 'EUR'],
+    'gics_sector': ['Energy', 'Materials', 'Industrials', 'Utilities', 'Financials', ''],
+    'fama_industry': ['Banks', 'Chips', 'Drugs', 'Oil', 'Retail', ''],
+}
+
+
+def make_snapshots(n_rows, churn=0.01, seed=0):
+    """Previous/current master frames (all strings, like load_master_file) with `churn` of the rows changed"""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(n_rows).astype(str)
+    previous = pd.DataFrame({
+        'symbol': np.char.add('S', ids).astype(object),
+        'exchange': np.where(np.arange(n_rows) % 3 == 0, 'XNYS', 'XNAS').astype(object),
+        'name': np.char.add('Company ', ids).astype(object),
+        'isin': np.char.add('US', np.char.zfill(ids, 10)).astype(object),
+        'lot': np.full(n_rows, '100', dtype=object),
+        'sic_code': rng.integers(1000, 9999, n_rows).astype(str).astype(object),
+        'margin_requirement_long': np.round(rng.uniform(0.25, 1.0, n_rows), 2).astype(str).astype(object),
+        'market_capital': rng.lognormal(20, 2, n_rows).round().astype(str).astype(object),
+    })
+    for column, pool in TEXT_POOLS.items():
+        previous[column] = np.asarray(pool, dtype=object)[rng.integers(0, len(pool), n_rows)]
+
+    current = previous.copy()
+    churned = rng.choice(n_rows, size=int(n_rows * churn), replace=False)
+    kinds = rng.integers(0, 6, len(churned))
+
+    renamed = churned[kinds == 0]
+    current.loc[renamed, 'name'] = current.loc[renamed, 'name'] + ' Inc'
+    relisted = churned[kinds == 1]
+    current.loc[relisted, 'status'] = 'inactive'
+    # Formatting-only numeric changes the comparison must not report
+    reformatted = churned[kinds == 2]
+    current.loc[reformatted, 'lot'] = '100.0'
+    current.loc[reformatted, 'sic_code'] = current.loc[reformatted, 'sic_code'].str[:1] + ',' + \
+        current.loc[reformatted, 'sic_code'].str[1:]
+    rescaled = churned[kinds == 3]
+    current.loc[rescaled, 'margin_requirement_long'] = '0.3333333333333'
+    current.loc[rescaled, 'lot'] = 'n/a'
+    # Previously blank USE_PREV fields that now have a value
+    backfilled = churned[kinds == 4]
+    current.loc[backfilled, 'gics_sector'] = np.where(previous.loc[backfilled, 'gics_sector'] == '',
+                                                      'Technology', 'Health Care')
+    ignored = churned[kinds == 5]
+    current.loc[ignored, 'market_capital'] = '1'
+
+    # A few listings come and go between snapshots, and one key is duplicated
+    gone = rng.choice(n_rows, size=max(1, n_rows // 1000), replace=False)
+    current = current.drop(index=gone)
+    added = previous.head(max(1, n_rows // 1000)).copy()
+    added['symbol'] = 'NEW' + added['symbol']
+    current = pd.concat([current, added, previous.tail(1)], ignore_index=True)
+
+    for df in (previous, current):
+        df['composite_key'] = df['symbol'].astype(str) + ':' + df['exchange'].astype(str)
+    return previous, current
+
+
+def _display(value, column):
+    if column in config.NUMERIC_COLUMNS:
+        return normalize_numeric(value)
+    return str(value) if pd.notna(value) else ''
+
+
+def reference_data_changes(previous_df, current_df, previous_date, current_date):
+    """The original row-by-row comparison, kept here only to check parity"""
+    common_keys = set(previous_df['composite_key']) & set(current_df['composite_key'])
+    prev_indexed = previous_df.set_index('composite_key')
+    curr_indexed = current_df.set_index('composite_key')
+    summary, columns = [], {}
+
+    for key in common_keys:
+        try:
+            prev_row = prev_indexed.loc[key]
+            curr_row = curr_indexed.loc[key]
+            symbol, exchange = key.split(':', 1)
+            primary_fields, secondary_fields = [], []
+
+            for col in prev_row.index:
+                if col in config.IGNORE_COLUMNS or col not in curr_row.index:
+                    continue
+                prev_val, curr_val = prev_row[col], curr_row[col]
+                prev_display, curr_display = _display(prev_val, col), _display(curr_val, col)
+                if prev_display == curr_display:
+                    continue
+
+                prev_str = str(prev_val).strip() if pd.notna(prev_val) else ''
+                curr_str = str(curr_val).strip() if pd.notna(curr_val) else ''
+                secondary = (col in config.USE_PREV_COLUMNS and prev_str in ('', 'nan')
+                             and curr_str not in ('', 'nan'))
+                (secondary_fields if secondary else primary_fields).append(col)
+                columns.setdefault(col, []).append({
+                    'symbol': symbol,
+                    'exchange': exchange,
+                    'composite_key': key,
+                    'previous_value': prev_display,
+                    'current_value': curr_display,
+                    'original_previous_value': str(prev_val) if pd.notna(prev_val) else '',
+                    'original_current_value': str(curr_val) if pd.notna(curr_val) else '',
+                    'is_numeric_column': col in config.NUMERIC_COLUMNS,
+                    'is_use_prev_column': col in config.USE_PREV_COLUMNS,
+                    'importance': 'secondary' if secondary else 'primary',
+                    'previous_date': previous_date,
+                    'current_date': current_date,
+                })
+
+            fields = primary_fields + secondary_fields
+            if fields:
+                record = {
+                    'symbol': symbol,
+                    'exchange': exchange,
+                    'composite_key': key,
+                    'change_type': 'DATA_CHANGE',
+                    'previous_date': previous_date,
+                    'current_date': current_date,
+                    'changed_fields': ', '.join(sorted(fields)),
+                    'primary_fields': ', '.join(sorted(primary_fields)),
+                    'secondary_fields': ', '.join(sorted(secondary_fields)),
+                    'primary_change_count': len(primary_fields),
+                    'secondary_change_count': len(secondary_fields),
+                    'total_change_count': len(fields),
+                    'has_primary_changes': len(primary_fields) > 0,
+                    'has_secondary_changes': len(secondary_fields) > 0,
+                    'change_category': 'primary' if primary_fields else 'secondary'
+                }
+                for field in SUMMARY_CONTEXT_FIELDS:
+                    if field in curr_row.index:
+                        record[field] = str(curr_row[field])
+                summary.append(record)
+        except Exception:
+            # Duplicated keys come back as frames and were skipped
+            continue
+
+    return pd.DataFrame(summary), {col: pd.DataFrame(records) for col, records in columns.items()}
+
+
+def _canonical(df):
+    """Drop the wall-clock column and order by key so outputs can be compared"""
+    df = df.drop(columns=['change_timestamp'], errors='ignore')
+    return df.sort_values('composite_key').reset_index(drop=True)
+
+
+def check_parity(n_rows, churn, seed):
+    """Assert the columnar comparison matches the row-by-row reference on a synthetic pair"""
+    previous, current = make_snapshots(n_rows, churn, seed)
+
+    started = time.perf_counter()
+    expected_summary, expected_columns = reference_data_changes(previous, current, 'prev', 'curr')
+    reference_seconds = time.perf_counter() - started
+
+    started = time.perf_counter()
+    summary, all_columns, primary_columns, secondary_columns = compare_common_records(
+        previous, current, 'prev', 'curr')
+    columnar_seconds = time.perf_counter() - started
+
+    pd.testing.assert_frame_equal(_canonical(summary), _canonical(expected_summary), check_dtype=False)
+    assert set(all_columns) == set(expected_columns), (sorted(all_columns), sorted(expected_columns))
+    for col, expected in expected_columns.items():
+        pd.testing.assert_frame_equal(_canonical(all_columns[col]), _canonical(expected), check_dtype=False)
+        split = primary_columns if col in primary_columns else secondary_columns
+        assert sum(len(d.get(col, [])) for d in (primary_columns, secondary_columns)) == len(expected), col
+        assert (split[col]['importance'] == ('primary' if split is primary_columns else 'secondary')).all(), col
+
+    print(f"parity ok: rows={n_rows:,} changed_records={len(summary):,} columns={len(all_columns)} "
+          f"row-by-row={reference_seconds:.3f}s columnar={columnar_seconds:.3f}s")
+
+
+def benchmark(n_rows, churn, seed):
+    """Time the columnar comparison on two synthetic snapshots"""
+    previous, current = make_snapshots(n_rows, churn, seed)
+
+    started = time.perf_counter()
+    summary, all_columns, primary_columns, secondary_columns = compare_common_records(
+        previous, current, 'prev', 'curr')
+    elapsed = time.perf_counter() - started
+
+    print(f"\nrows={n_rows:,} churn={churn:.2%} changed_records={len(summary):,}")
+    print(f"columns changed: all={len(all_columns)} primary={len(primary_columns)} "
+          f"secondary={len(secondary_columns)}")
+    print(f"compare_common_records {elapsed:8.3f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the columnar master snapshot comparison")
+    parser.add_argument('--rows', type=int, default=1000000)
+    parser.add_argument('--churn', type=float, default=0.01)
+    parser.add_argument('--check-rows', type=int, default=20000,
+                        help="snapshot size for the row-by-row parity check (0 to skip)")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.check_rows:
+        check_parity(args.check_rows, args.churn, args.seed)
+    benchmark(args.rows, args.churn, args.seed)
@@ -4,9 +4,9 @@ from decimal import Decimal
 import logging
 import os
 from collections import defaultdict
-import glob
-from source.actions.utils import ConfidenceCalculator, FieldConfidence
+from source.actions.utils import ConfidenceCalculator, FieldConfidence, group_by_anchor, relative_tolerance_window
 from source.actions.symbol_mapper import SymbolMapper
+from source.actions.master_symbols import MasterSymbolTable, load_master_symbols
 import json
 import pandas as pd
 from datetime import datetime
@@ -14,6 +14,10 @@ from source.config import config
 
 logger = logging.getLogger(__name__)
 
+# Pipeline declarations (see source/pipeline.py). Provider inputs are passed to run() in this order.
+INPUTS = ['alpaca', 'fmp', 'poly', 'sharadar', 'master_symbols']
+OUTPUTS = ['unified_cash_dividends']
+
 
 @dataclass
 class SymbolMappingInfo:
@@ -114,9 +118,9 @@ class EnhancedCashDividendProcessor:
         'sharadar': 6
     }
 
-    def __init__(self, master_csv_path: str):
+    def __init__(self, master_symbols: MasterSymbolTable):
         self.confidence_calculator = ConfidenceCalculator()
-        self.symbol_mapper = SymbolMapper(master_csv_path)
+        self.symbol_mapper = SymbolMapper(master_symbols)
         self.debug_results = []
 
     def process_all_sources(self, source_data_dict: Dict[str, List[Dict[str, Any]]]) -> List[DividendMatchResult]:
@@ -281,27 +285,11 @@ class EnhancedCashDividendProcessor:
     def _group_similar_dividends(self, dividends: List[UnifiedCashDividend]) -> List[List[UnifiedCashDividend]]:
         """Group dividends that appear to be the same event."""
 
-        groups = []
-        remaining_dividends = dividends.copy()
-
-        while remaining_dividends:
-            current = remaining_dividends.pop(0)
-            current_group = [current]
-
-            # Find similar dividends
-            to_remove = []
-            for i, dividend in enumerate(remaining_dividends):
-                if self._are_dividends_similar(current, dividend):
-                    current_group.append(dividend)
-                    to_remove.append(i)
-
-            # Remove grouped dividends
-            for i in reversed(to_remove):
-                remaining_dividends.pop(i)
-
-            groups.append(current_group)
-
-        return groups
+        # Only dividends sharing an ex_date can match; within a date, amounts are swept in sorted order
+        return group_by_anchor(dividends, self._are_dividends_similar,
+                               key=lambda dividend: dividend.ex_date or None,
+                               value=lambda dividend: dividend.dividend_amount or None,
+                               window=relative_tolerance_window(0.01))
 
     def _are_dividends_similar(self, div1: UnifiedCashDividend, div2: UnifiedCashDividend) -> bool:
         """Check if two dividends are likely the same event."""
@@ -554,13 +542,9 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
     # Ensure directories exist
     config.ensure_directories()
 
-    # Find master files using configured path
-    master_files = glob.glob(os.path.join(config.master_files_dir, '*_MASTER_UPDATED.csv'))
-    if not master_files:
-        raise FileNotFoundError(f"No master CSV files found in {config.master_files_dir}")
-
-    master_file = max(master_files)  # Get the most recent master file
-    print(f"Using master file: {master_file}")
+    # Shared master symbol table, read once per pipeline run
+    master_symbols = load_master_symbols(config.master_files_dir)
+    print(f"Using master file: {master_symbols.path}")
 
     # Extract cash dividend data from all sources
     print("Extracting cash dividend data from sources...")
@@ -571,7 +555,7 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
         print(f"  - {source}: {len(data)} cash dividend records extracted")
 
     # Initialize processor
-    processor = EnhancedCashDividendProcessor(master_file)
+    processor = EnhancedCashDividendProcessor(master_symbols)
 
     # Process all sources
     print("Processing dividends from all sources...")
@@ -1,5 +1,4 @@
 import os
-import glob
 import pandas as pd
 import json
 from datetime import datetime
@@ -9,11 +8,16 @@ from decimal import Decimal
 import logging
 from collections import defaultdict
 from source.config import config
-from source.actions.utils import ConfidenceCalculator, FieldConfidence
+from source.actions.utils import ConfidenceCalculator, FieldConfidence, group_by_anchor
 from source.actions.symbol_mapper import SymbolMapper
+from source.actions.master_symbols import MasterSymbolTable, load_master_symbols
 
 logger = logging.getLogger(__name__)
 
+# Pipeline declarations (see source/pipeline.py). Provider inputs are passed to run() in this order.
+INPUTS = ['alpaca', 'fmp', 'poly', 'sharadar', 'nasdaq', 'prv_master_symbols']
+OUTPUTS = ['unified_delistings']
+
 
 @dataclass
 class SymbolMappingInfo:
@@ -94,9 +98,9 @@ class EnhancedDelistingProcessor:
         'sharadar': 9
     }
 
-    def __init__(self, master_csv_path: str):
+    def __init__(self, master_symbols: MasterSymbolTable):
         self.confidence_calculator = ConfidenceCalculator()
-        self.symbol_mapper = SymbolMapper(master_csv_path)
+        self.symbol_mapper = SymbolMapper(master_symbols)
         self.debug_results = []
 
     def process_all_sources(self, source_data_dict: Dict[str, List[Dict[str, Any]]]) -> List[DelistingMatchResult]:
@@ -263,27 +267,9 @@ class EnhancedDelistingProcessor:
     def _group_similar_delistings(self, delistings: List[UnifiedDelisting]) -> List[List[UnifiedDelisting]]:
         """Group delistings that appear to be the same event."""
 
-        groups = []
-        remaining_delistings = delistings.copy()
-
-        while remaining_delistings:
-            current = remaining_delistings.pop(0)
-            current_group = [current]
-
-            # Find similar delistings
-            to_remove = []
-            for i, delisting in enumerate(remaining_delistings):
-                if self._are_delistings_similar(current, delisting):
-                    current_group.append(delisting)
-                    to_remove.append(i)
-
-            # Remove grouped delistings
-            for i in reversed(to_remove):
-                remaining_delistings.pop(i)
-
-            groups.append(current_group)
-
-        return groups
+        # Only delistings on the same date can match; undated ones share the '' key
+        return group_by_anchor(delistings, self._are_delistings_similar,
+                               key=lambda delisting: delisting.delisting_date or '')
 
     def _are_delistings_similar(self, del1: UnifiedDelisting, del2: UnifiedDelisting) -> bool:
         """Check if two delistings are likely the same event."""
@@ -544,13 +530,9 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
     # Ensure directories exist
     config.ensure_directories()
 
-    # Find master files using configured path
-    master_files = glob.glob(os.path.join(config.master_files_prv_dir, '*_MASTER_UPDATED.csv'))
-    if not master_files:
-        raise FileNotFoundError(f"No master CSV files found in {config.master_files_prv_dir}")
-
-    master_file = max(master_files)  # Get the most recent master file
-    print(f"Using master file: {master_file}")
+    # Shared master symbol table, read once per pipeline run
+    master_symbols = load_master_symbols(config.master_files_prv_dir)
+    print(f"Using master file: {master_symbols.path}")
 
     # Extract delisting data from all sources
     print("Extracting delisting data from sources...")
@@ -566,7 +548,7 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
         return
 
     # Initialize processor
-    processor = EnhancedDelistingProcessor(master_file)
+    processor = EnhancedDelistingProcessor(master_symbols)
 
     # Process all sources
     print("Processing delistings from all sources...")
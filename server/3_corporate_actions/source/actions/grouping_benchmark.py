@@ -0,0 +1,229 @@
+"""
+Parity check and scaling benchmark for near-duplicate grouping in the action modules.
+
+    python -m source.actions.grouping_benchmark --check-records 3000 --max-records 1000000
+
+The parity check replays the original all-pairs anchor loop on synthetic records for every action
+module (plus the confidence date/amount clustering) and asserts group_by_anchor returns the same
+groups, record for record. The benchmark then times split grouping from 1k up to --max-records
+candidates; the all-pairs loop is only timed up to --legacy-records.
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+if 'source.config' not in sys.modules:
+    # Action modules read their directories from the environment at import time
+    from source.pipeline_benchmark import configure_environment
+    configure_environment(tempfile.mkdtemp(prefix='grouping_benchmark_'))
+
+import pandas as pd
+
+from source.actions import (cash_dividends, delistings, ipos, mergers, rights, spinoffs, splits, stock_dividends,
+                            symbol_changes)
+from source.actions.master_symbols import MasterSymbolTable
+from source.actions.utils import ConfidenceCalculator
+
+SOURCES = ['alpaca', 'fmp', 'poly', 'sharadar']
+
+
+def legacy_group(items, similar):
+    """The original grouping loop every action module used"""
+    groups = []
+    remaining = list(items)
+    while remaining:
+        current = remaining.pop(0)
+        current_group = [current]
+        to_remove = []
+        for i, item in enumerate(remaining):
+            if similar(current, item):
+                current_group.append(item)
+                to_remove.append(i)
+        for i in reversed(to_remove):
+            remaining.pop(i)
+        groups.append(current_group)
+    return groups
+
+
+def _empty_table():
+    return MasterSymbolTable(pd.DataFrame(columns=['symbol', 'al_symbol', 'pl_symbol', 'fp_symbol', 'sh_symbol']))
+
+
+def _date(rng, n_dates):
+    """A date out of a small pool (so records collide), occasionally missing"""
+    if rng.random() < 0.05:
+        return rng.choice([None, ''])
+    return (datetime(2024, 1, 1) + timedelta(days=rng.randrange(n_dates))).strftime('%Y-%m-%d')
+
+
+def _near(rng, base, tolerance):
+    """A value equal to, just inside, just outside or far from base; sometimes missing or zero"""
+    roll = rng.random()
+    if roll < 0.05:
+        return None
+    if roll < 0.08:
+        return Decimal('0')
+    if roll < 0.5:
+        return base
+    if roll < 0.9:
+        return base * (1 + Decimal(str(rng.uniform(-1.5, 1.5) * tolerance)))
+    return base * Decimal(str(rng.choice([0.5, 2, 3, 10])))
+
+
+def make_records(module, n, seed=0):
+    """Synthetic unified records for one action module, dense enough that most records have near-duplicates"""
+    rng = random.Random(seed)
+    n_dates = max(1, n // 8)
+    symbols = [f"S{i}" for i in range(max(2, n // 50))]
+    records = []
+    for _ in range(n):
+        source = rng.choice(SOURCES)
+        date = _date(rng, n_dates)
+        base = Decimal(rng.choice(['0.5', '2', '3', '0.1', '0.25']))
+        if module is splits:
+            records.append(splits.UnifiedStockSplit('M', source, ex_date=date, split_ratio=_near(rng, base, 0.01)))
+        elif module is cash_dividends:
+            records.append(cash_dividends.UnifiedCashDividend('M', source, ex_date=date,
+                                                              dividend_amount=_near(rng, base, 0.01)))
+        elif module is stock_dividends:
+            records.append(stock_dividends.UnifiedStockDividend('M', source, ex_date=date,
+                                                                dividend_ratio=_near(rng, base, 0.0002)))
+        elif module is rights:
+            records.append(rights.UnifiedRightsOffering('M', source, ex_date=date,
+                                                        rights_symbol=rng.choice([None, 'R1', 'R2']),
+                                                        rights_ratio=_near(rng, base, 0.0002)))
+        elif module is spinoffs:
+            records.append(spinoffs.UnifiedSpinoff('M', source, ex_date=date, new_symbol=rng.choice([None] + symbols)))
+        elif module is mergers:
+            pair = rng.sample(symbols, 2)
+            records.append(mergers.UnifiedMerger('M', source, ex_date=date, acquiree_symbol=pair[0],
+                                                 acquirer_symbol=rng.choice([pair[1], pair[0], None])))
+        elif module is symbol_changes:
+            pair = rng.sample(symbols[:10], 2)
+            rng.shuffle(pair)
+            records.append(symbol_changes.UnifiedSymbolChange('M', source, change_date=date,
+                                                              process_date=_date(rng, n_dates),
+                                                              old_symbol=pair[0], new_symbol=pair[1]))
+        elif module is delistings:
+            records.append(delistings.UnifiedDelisting('M', source, delisting_date=date))
+        elif module is ipos:
+            records.append(ipos.UnifiedIPO('M', source, listing_date=date))
+    return records
+
+
+# module -> (processor class, grouping method, similarity method)
+GROUPINGS = {
+    splits: (splits.EnhancedStockSplitProcessor, '_group_similar_splits', '_are_splits_similar'),
+    cash_dividends: (cash_dividends.EnhancedCashDividendProcessor, '_group_similar_dividends',
+                     '_are_dividends_similar'),
+    stock_dividends: (stock_dividends.EnhancedStockDividendProcessor, '_group_similar_dividends',
+                      '_are_dividends_similar'),
+    rights: (rights.EnhancedRightsOfferingProcessor, '_group_similar_rights', '_are_rights_similar'),
+    spinoffs: (spinoffs.EnhancedSpinoffProcessor, '_group_similar_spinoffs', '_are_spinoffs_similar'),
+    mergers: (mergers.EnhancedMergerProcessor, '_group_similar_mergers', '_are_mergers_similar'),
+    symbol_changes: (symbol_changes.EnhancedSymbolChangeProcessor, '_group_similar_changes', '_are_changes_similar'),
+    delistings: (delistings.EnhancedDelistingProcessor, '_group_similar_delistings', '_are_delistings_similar'),
+    ipos: (ipos.EnhancedIPOProcessor, '_group_similar_ipos', '_are_ipos_similar'),
+}
+
+
+def _identities(groups):
+    return [[id(item) for item in group] for group in groups]
+
+
+def _legacy_cluster_dates(date_objects, tolerance_days):
+    groups = legacy_group(list(date_objects.items()),
+                          lambda anchor, other: abs((other[1] - anchor[1]).days) <= tolerance_days)
+    return [[source for source, _ in group] for group in groups]
+
+
+def _legacy_cluster_amounts(float_values, tolerance_percent):
+    def similar(anchor, other):
+        if anchor[1] == 0:
+            return other[1] == 0
+        return abs(other[1] - anchor[1]) / anchor[1] * 100 <= tolerance_percent
+    return [[source for source, _ in group] for group in legacy_group(list(float_values.items()), similar)]
+
+
+def check_parity(n_records, seed=0):
+    """Assert every module's grouping matches the all-pairs loop on synthetic records"""
+    table = _empty_table()
+    for module, (processor_class, group_method, similar_method) in GROUPINGS.items():
+        processor = processor_class(table)
+        for trial in range(3):
+            records = make_records(module, n_records, seed + trial)
+            expected = legacy_group(records, getattr(processor, similar_method))
+            actual = getattr(processor, group_method)(records)
+            assert _identities(actual) == _identities(expected), module.__name__
+        name = module.__name__.rsplit('.', 1)[1]
+        print(f"parity ok: {name:<16} records={n_records:,} groups={len(actual):,}")
+
+    calculator = ConfidenceCalculator()
+    rng = random.Random(seed)
+    for _ in range(2000):
+        n = rng.randint(1, 12)
+        dates = {f"source{i}": datetime(2024, 1, 1) + timedelta(days=rng.randrange(10)) for i in range(n)}
+        clusters = calculator._cluster_dates(dates, calculator.date_tolerance_days)
+        assert [c['sources'] for c in clusters] == _legacy_cluster_dates(dates, calculator.date_tolerance_days)
+
+        amounts = {f"source{i}": rng.choice([0.0, -1.0, 1.0, 1.02, 1.03, 1.04, 0.97, 2.0, float('nan')])
+                   for i in range(n)}
+        clusters = calculator._cluster_amounts(amounts, calculator.amount_tolerance_percent)
+        assert [c['sources'] for c in clusters] == _legacy_cluster_amounts(amounts,
+                                                                           calculator.amount_tolerance_percent)
+    print("parity ok: confidence date/amount clustering")
+
+
+def make_split_candidates(n, seed=0):
+    """Split candidates spread like several years of provider reports: ~4 sources per event"""
+    rng = random.Random(seed)
+    n_events = max(1, n // 4)
+    events = [((datetime(2000, 1, 1) + timedelta(days=rng.randrange(9000))).strftime('%Y-%m-%d'),
+               Decimal(rng.choice(['2', '3', '4', '0.1', '0.5', '1.5', '10'])))
+              for _ in range(n_events)]
+    records = []
+    for _ in range(n):
+        date, ratio = events[rng.randrange(n_events)]
+        if rng.random() < 0.1:
+            ratio = ratio * Decimal('1.005')
+        records.append(splits.UnifiedStockSplit('M', rng.choice(SOURCES), ex_date=date,
+                                                split_ratio=None if rng.random() < 0.02 else ratio))
+    return records
+
+
+def benchmark(max_records, legacy_records, seed=0):
+    processor = splits.EnhancedStockSplitProcessor(_empty_table())
+    print(f"\n{'records':>10} {'groups':>10} {'all-pairs_s':>12} {'grouped_s':>10}")
+    n = 1000
+    while n <= max_records:
+        records = make_split_candidates(n, seed)
+        started = time.perf_counter()
+        groups = processor._group_similar_splits(records)
+        grouped = time.perf_counter() - started
+
+        legacy = '-'
+        if n <= legacy_records:
+            started = time.perf_counter()
+            legacy_group(records, processor._are_splits_similar)
+            legacy = f"{time.perf_counter() - started:.3f}"
+        print(f"{n:>10,} {len(groups):>10,} {legacy:>12} {grouped:>10.3f}")
+        n *= 10
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parity check and scaling benchmark for action grouping")
+    parser.add_argument('--check-records', type=int, default=3000,
+                        help="records per module for the all-pairs parity check (0 to skip)")
+    parser.add_argument('--max-records', type=int, default=1000000)
+    parser.add_argument('--legacy-records', type=int, default=10000,
+                        help="largest size the all-pairs loop is timed at")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.check_records:
+        check_parity(args.check_records, args.seed)
+    benchmark(args.max_records, args.legacy_records, args.seed)
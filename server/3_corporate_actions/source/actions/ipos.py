@@ -1,5 +1,4 @@
 import os
-import glob
 import pandas as pd
 import json
 from datetime import datetime
@@ -9,11 +8,16 @@ from decimal import Decimal
 import logging
 from collections import defaultdict
 from source.config import config
-from source.actions.utils import ConfidenceCalculator, FieldConfidence
+from source.actions.utils import ConfidenceCalculator, FieldConfidence, group_by_anchor
 from source.actions.symbol_mapper import SymbolMapper
+from source.actions.master_symbols import MasterSymbolTable, load_master_symbols
 
 logger = logging.getLogger(__name__)
 
+# Pipeline declarations (see source/pipeline.py). Provider inputs are passed to run() in this order.
+INPUTS = ['alpaca', 'fmp', 'poly', 'sharadar', 'nasdaq', 'master_symbols']
+OUTPUTS = ['unified_ipos']
+
 
 @dataclass
 class SymbolMappingInfo:
@@ -105,9 +109,9 @@ class EnhancedIPOProcessor:
         'sharadar': 7
     }
 
-    def __init__(self, master_csv_path: str):
+    def __init__(self, master_symbols: MasterSymbolTable):
         self.confidence_calculator = ConfidenceCalculator()
-        self.symbol_mapper = SymbolMapper(master_csv_path)
+        self.symbol_mapper = SymbolMapper(master_symbols)
         self.debug_results = []
 
     def process_all_sources(self, source_data_dict: Dict[str, List[Dict[str, Any]]]) -> List[IPOMatchResult]:
@@ -290,27 +294,8 @@ class EnhancedIPOProcessor:
     def _group_similar_ipos(self, ipos: List[UnifiedIPO]) -> List[List[UnifiedIPO]]:
         """Group IPOs that appear to be the same event."""
 
-        groups = []
-        remaining_ipos = ipos.copy()
-
-        while remaining_ipos:
-            current = remaining_ipos.pop(0)
-            current_group = [current]
-
-            # Find similar IPOs
-            to_remove = []
-            for i, ipo in enumerate(remaining_ipos):
-                if self._are_ipos_similar(current, ipo):
-                    current_group.append(ipo)
-                    to_remove.append(i)
-
-            # Remove grouped IPOs
-            for i in reversed(to_remove):
-                remaining_ipos.pop(i)
-
-            groups.append(current_group)
-
-        return groups
+        # Only IPOs on the same listing date can match; undated ones share the '' key
+        return group_by_anchor(ipos, self._are_ipos_similar, key=lambda ipo: ipo.listing_date or '')
 
     def _are_ipos_similar(self, ipo1: UnifiedIPO, ipo2: UnifiedIPO) -> bool:
         """Check if two IPOs are likely the same event."""
@@ -578,13 +563,9 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
     # Ensure directories exist
     config.ensure_directories()
 
-    # Find master files using configured path
-    master_files = glob.glob(os.path.join(config.master_files_dir, '*_MASTER_UPDATED.csv'))
-    if not master_files:
-        raise FileNotFoundError(f"No master CSV files found in {config.master_files_dir}")
-
-    master_file = max(master_files)  # Get the most recent master file
-    print(f"Using master file: {master_file}")
+    # Shared master symbol table, read once per pipeline run
+    master_symbols = load_master_symbols(config.master_files_dir)
+    print(f"Using master file: {master_symbols.path}")
 
     # Extract IPO data from all sources
     print("Extracting IPO data from sources...")
@@ -600,7 +581,7 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
         return
 
     # Initialize processor
-    processor = EnhancedIPOProcessor(master_file)
+    processor = EnhancedIPOProcessor(master_symbols)
 
     # Process all sources
     print("Processing IPOs from all sources...")
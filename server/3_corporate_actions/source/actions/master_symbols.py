@@ -0,0 +1,168 @@
+import glob
+import logging
+import os
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Lookup kind -> master column holding that identifier
+ID_COLUMNS = {
+    'ticker': 'symbol',
+    'figi': 'figi',
+    'composite_figi': 'composite_figi',
+    'share_class_figi': 'share_class_figi',
+    'cik': 'cik',
+    'isin': 'isin',
+    # Provider-specific ids
+    'alpaca': 'al_symbol',
+    'alphavantage': 'av_symbol',
+    'eodhd': 'ed_symbol',
+    'financedatabase': 'fd_symbol',
+    'fmp': 'fp_symbol',
+    'intrinio': 'it_symbol',
+    'poly': 'pl_symbol',
+    'sharadar': 'sh_symbol',
+}
+
+# Provider ids resolve to the last master row carrying them (as SymbolMapper's dicts always did);
+# every other identifier resolves to the first
+PROVIDER_ID_KINDS = {'alpaca', 'alphavantage', 'eodhd', 'financedatabase', 'fmp', 'intrinio', 'poly', 'sharadar'}
+
+
+class MasterSymbolTable:
+    """
+    Read-only master symbology table with a hash index per identifier kind.
+    Built once per pipeline run and shared by every action module; nothing on it mutates after construction.
+    """
+
+    def __init__(self, master_df: pd.DataFrame, path: Optional[str] = None):
+        self.path = path
+        self._frame = master_df.reset_index(drop=True)
+        self._columns = list(self._frame.columns)
+        self._column_positions = {column: i for i, column in enumerate(self._columns)}
+        self._values = self._frame.to_numpy(dtype=object)
+        self._values.setflags(write=False)
+
+        # kind -> Series of row positions indexed by identifier (unique, hash-backed)
+        self._indexes: Dict[str, pd.Series] = {}
+        # kind -> plain dict of the same mapping for scalar lookups
+        self._dicts: Dict[str, Dict[str, int]] = {}
+        for kind, column in ID_COLUMNS.items():
+            if column not in self._frame.columns:
+                logger.debug(f"Column {column} not found in master CSV for lookup kind {kind}")
+                continue
+            ids = self._frame[column]
+            present = ids.notna() & (ids != '')
+            keep = 'last' if kind in PROVIDER_ID_KINDS else 'first'
+            positions = pd.Series(np.flatnonzero(present.to_numpy()), index=ids[present].to_numpy())
+            positions = positions[~positions.index.duplicated(keep=keep)]
+            self._indexes[kind] = positions
+            self._dicts[kind] = positions.to_dict()
+
+    @classmethod
+    def from_csv(cls, master_csv_path: str) -> 'MasterSymbolTable':
+        master_df = pd.read_csv(master_csv_path, sep='|', dtype=str, keep_default_na=False, na_values=[])
+        return cls(master_df, master_csv_path)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    @property
+    def kinds(self) -> List[str]:
+        return list(self._indexes)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Copy of the underlying master rows"""
+        return self._frame.copy()
+
+    def position(self, value: str, by: str = 'ticker') -> Optional[int]:
+        """Row position of an identifier, or None"""
+        return self._dicts.get(by, {}).get(value)
+
+    def lookup(self, value: str, by: str = 'ticker') -> Dict:
+        """Full master row for an identifier ({} when unknown)"""
+        position = self.position(value, by)
+        if position is None:
+            return {}
+        return dict(zip(self._columns, self._values[position]))
+
+    def master_symbol(self, value: str, by: str = 'ticker') -> Optional[str]:
+        """Master ticker for an identifier, or None"""
+        position = self.position(value, by)
+        if position is None:
+            return None
+        return self._values[position, self._column_positions['symbol']]
+
+    def positions(self, values: Iterable, by: str = 'ticker') -> np.ndarray:
+        """Row positions for many identifiers at once (-1 where unknown)"""
+        index = self._indexes.get(by)
+        values = pd.Index(values if isinstance(values, (pd.Series, pd.Index, np.ndarray)) else list(values))
+        if index is None:
+            return np.full(len(values), -1, dtype=np.int64)
+        found = index.index.get_indexer(values)
+        return np.where(found >= 0, index.to_numpy()[found], -1)
+
+    def join(self, frame: pd.DataFrame, on: str, by: str = 'ticker', fields: Optional[Sequence[str]] = None,
+             prefix: str = 'master_') -> pd.DataFrame:
+        """
+        Attach master fields to every row of an action frame with a single hash join.
+        Rows whose identifier is unknown get missing values.
+        """
+        fields = list(fields) if fields is not None else self._columns
+        positions = self.positions(frame[on].to_numpy(dtype=object), by)
+
+        joined = frame.copy()
+        for field in fields:
+            joined[f"{prefix}{field}"] = self.values_at(positions, field)
+        return joined
+
+    def values_at(self, positions: np.ndarray, field: str) -> np.ndarray:
+        """One master field for many row positions (None where the position is -1)"""
+        matched = positions >= 0
+        values = np.full(len(positions), None, dtype=object)
+        values[matched] = self._values[positions[matched], self._column_positions[field]]
+        return values
+
+
+# Tables already loaded in this process, keyed by (path, mtime) so a rewritten file is re-read
+_loaded_tables: Dict[tuple, MasterSymbolTable] = {}
+
+
+def find_master_file(directory: str, pattern: str = '*_MASTER_UPDATED.csv') -> str:
+    """Most recent master file in a directory"""
+    master_files = glob.glob(os.path.join(directory, pattern))
+    if not master_files:
+        raise FileNotFoundError(f"No master CSV files found in {directory}")
+    return max(master_files)
+
+
+def load_master_symbols(directory: str, pattern: str = '*_MASTER_UPDATED.csv') -> MasterSymbolTable:
+    """Shared master symbol table for the latest master file in a directory, read at most once per process"""
+    master_file = find_master_file(directory, pattern)
+    key = (os.path.abspath(master_file), os.path.getmtime(master_file))
+    table = _loaded_tables.get(key)
+    if table is None:
+        table = MasterSymbolTable.from_csv(master_file)
+        _loaded_tables[key] = table
+        logger.info(f"Loaded master symbol table {master_file}: {len(table)} rows")
+    return table
+
+
+def register_master_symbols(path: str, frame_loader: Callable[[], pd.DataFrame]) -> MasterSymbolTable:
+    """
+    Seed this process's cache for a master file from rows loaded elsewhere (e.g. shared pipeline frames),
+    so load_master_symbols skips the CSV read. frame_loader is only called if the table isn't cached yet.
+    """
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    table = _loaded_tables.get(key)
+    if table is None:
+        table = MasterSymbolTable(frame_loader(), path)
+        _loaded_tables[key] = table
+    return table
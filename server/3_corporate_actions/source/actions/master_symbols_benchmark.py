@@ -0,0 +1,123 @@
+"""
+Benchmark the shared master symbol table against per-module CSV reads and DataFrame-scan lookups.
+
+    python -m source.actions.master_symbols_benchmark --rows 60000 --actions 20000
+
+Reports master load time for the nine action modules (one CSV read each vs one shared table),
+per-lookup latency for each identifier kind, and a batched join of a whole action frame.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from source.actions.master_symbols import ID_COLUMNS, load_master_symbols
+
+ACTION_MODULES = 9
+
+
+def make_master_file(directory, n_rows, seed=0):
+    """Write a synthetic *_MASTER_UPDATED.csv shaped like the master symbology output"""
+    rng = np.random.default_rng(seed)
+    ids = np.arange(n_rows).astype(str)
+    master = pd.DataFrame({'symbol': np.char.add('S', ids)})
+    for column in ID_COLUMNS.values():
+        if column == 'symbol':
+            continue
+        values = np.char.add(f"{column.upper()}", ids).astype(object)
+        # Providers don't cover every symbol
+        values[rng.random(n_rows) < 0.2] = ''
+        master[column] = values
+    master['exchange'] = np.where(np.arange(n_rows) % 2 == 0, 'XNAS', 'XNYS')
+    master['name'] = np.char.add('Company ', ids)
+    master['type'] = 'CS'
+
+    path = os.path.join(directory, '20250101_MASTER_UPDATED.csv')
+    master.to_csv(path, sep='|', index=False)
+    return path
+
+
+def _legacy_load(path):
+    """What every action module used to do: read the CSV and build per-source dicts"""
+    master_df = pd.read_csv(path, sep='|', dtype=str, keep_default_na=False, na_values=[])
+    tables = {}
+    for column in ('al_symbol', 'pl_symbol', 'fp_symbol', 'sh_symbol'):
+        tables[column] = master_df[master_df[column].notna()].set_index(column)['symbol'].to_dict()
+    return master_df, tables
+
+
+def _per_lookup_us(fn, values):
+    started = time.perf_counter()
+    for value in values:
+        fn(value)
+    return (time.perf_counter() - started) / len(values) * 1e6
+
+
+def benchmark(n_rows, n_actions, n_lookups, seed=0):
+    directory = tempfile.mkdtemp(prefix='master_symbols_')
+    try:
+        path = make_master_file(directory, n_rows, seed)
+
+        started = time.perf_counter()
+        for _ in range(ACTION_MODULES):
+            master_df, legacy_tables = _legacy_load(path)
+        legacy_load = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for _ in range(ACTION_MODULES):
+            table = load_master_symbols(directory)
+        shared_load = time.perf_counter() - started
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+    print(f"\nmaster rows={n_rows:,} action modules={ACTION_MODULES}")
+    print(f"master load, per-module CSV reads  {legacy_load:8.3f}s")
+    print(f"master load, shared table          {shared_load:8.3f}s")
+
+    rng = np.random.default_rng(seed + 1)
+    frame = table.to_frame()
+    sample = rng.integers(0, n_rows, n_lookups)
+
+    print(f"\n{'lookup':<18} {'legacy_us':>10} {'table_us':>10}")
+    symbols = frame['symbol'].to_numpy()[sample]
+    legacy = _per_lookup_us(lambda s: master_df[master_df['symbol'] == s].iloc[0].to_dict(),
+                            symbols[:max(1, n_lookups // 100)])
+    print(f"{'symbol info':<18} {legacy:>10.2f} {_per_lookup_us(table.lookup, symbols):>10.2f}")
+    for kind in table.kinds:
+        column = ID_COLUMNS[kind]
+        values = frame[column].to_numpy()[sample]
+        legacy = f"{_per_lookup_us(legacy_tables[column].get, values):.2f}" if column in legacy_tables else '-'
+        print(f"{kind:<18} {legacy:>10} {_per_lookup_us(lambda v: table.master_symbol(v, by=kind), values):>10.2f}")
+
+    # A whole action frame: mostly known provider symbols plus some unknown ones
+    actions = pd.DataFrame({'symbol': np.where(rng.random(n_actions) < 0.9,
+                                               frame['al_symbol'].to_numpy()[rng.integers(0, n_rows, n_actions)],
+                                               'UNKNOWN')})
+    started = time.perf_counter()
+    joined = table.join(actions, on='symbol', by='alpaca', fields=['symbol', 'exchange', 'figi', 'cik'])
+    batched = time.perf_counter() - started
+
+    started = time.perf_counter()
+    per_row = [table.lookup(s, by='alpaca') for s in actions['symbol']]
+    row_by_row = time.perf_counter() - started
+
+    matched = joined['master_symbol'].notna().sum()
+    print(f"\naction frame rows={n_actions:,} matched={matched:,}")
+    print(f"batched join                       {batched:8.3f}s")
+    print(f"row-by-row lookups                 {row_by_row:8.3f}s")
+    assert matched == sum(1 for row in per_row if row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the shared master symbol table")
+    parser.add_argument('--rows', type=int, default=60000)
+    parser.add_argument('--actions', type=int, default=20000)
+    parser.add_argument('--lookups', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    benchmark(args.rows, args.actions, args.lookups, args.seed)
@@ -1,5 +1,4 @@
 import os
-import glob
 import pandas as pd
 import json
 from datetime import datetime
@@ -9,11 +8,16 @@ from decimal import Decimal
 import logging
 from collections import defaultdict
 from source.config import config
-from source.actions.utils import ConfidenceCalculator, FieldConfidence
+from source.actions.utils import ConfidenceCalculator, FieldConfidence, group_by_anchor
 from source.actions.symbol_mapper import SymbolMapper
+from source.actions.master_symbols import MasterSymbolTable, load_master_symbols
 
 logger = logging.getLogger(__name__)
 
+# Pipeline declarations (see source/pipeline.py). Provider inputs are passed to run() in this order.
+INPUTS = ['alpaca', 'fmp', 'poly', 'sharadar', 'master_symbols']
+OUTPUTS = ['unified_mergers']
+
 
 @dataclass
 class SymbolMappingInfo:
@@ -148,9 +152,9 @@ class EnhancedMergerProcessor:
         'sharadar_mergerto': 7
     }
 
-    def __init__(self, master_csv_path: str):
+    def __init__(self, master_symbols: MasterSymbolTable):
         self.confidence_calculator = ConfidenceCalculator()
-        self.symbol_mapper = SymbolMapper(master_csv_path)
+        self.symbol_mapper = SymbolMapper(master_symbols)
         self.debug_results = []
 
     def process_all_sources(self, source_data_dict: Dict[str, List[Dict[str, Any]]]) -> List[MergerMatchResult]:
@@ -336,27 +340,13 @@ class EnhancedMergerProcessor:
     def _group_similar_mergers(self, mergers: List[UnifiedMerger]) -> List[List[UnifiedMerger]]:
         """Group mergers that appear to be the same event."""
 
-        groups = []
-        remaining_mergers = mergers.copy()
-
-        while remaining_mergers:
-            current = remaining_mergers.pop(0)
-            current_group = [current]
-
-            # Find similar mergers
-            to_remove = []
-            for i, merger in enumerate(remaining_mergers):
-                if self._are_mergers_similar(current, merger):
-                    current_group.append(merger)
-                    to_remove.append(i)
-
-            # Remove grouped mergers
-            for i in reversed(to_remove):
-                remaining_mergers.pop(i)
-
-            groups.append(current_group)
+        def key(merger):
+            # The same pair of companies matches in either direction
+            if merger.ex_date:
+                return merger.ex_date, frozenset((merger.acquiree_symbol, merger.acquirer_symbol))
+            return None
 
-        return groups
+        return group_by_anchor(mergers, self._are_mergers_similar, key=key)
 
     def _are_mergers_similar(self, merger1: UnifiedMerger, merger2: UnifiedMerger) -> bool:
         """Check if two mergers are likely the same event."""
@@ -653,13 +643,9 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
     # Ensure directories exist
     config.ensure_directories()
 
-    # Find master files using configured path
-    master_files = glob.glob(os.path.join(config.master_files_dir, '*_MASTER_UPDATED.csv'))
-    if not master_files:
-        raise FileNotFoundError(f"No master CSV files found in {config.master_files_dir}")
-
-    master_file = max(master_files)  # Get the most recent master file
-    print(f"Using master file: {master_file}")
+    # Shared master symbol table, read once per pipeline run
+    master_symbols = load_master_symbols(config.master_files_dir)
+    print(f"Using master file: {master_symbols.path}")
 
     # Extract merger data from all sources
     print("Extracting merger data from sources...")
@@ -675,7 +661,7 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
         return
 
     # Initialize processor
-    processor = EnhancedMergerProcessor(master_file)
+    processor = EnhancedMergerProcessor(master_symbols)
 
     # Process all sources
     print("Processing mergers from all sources...")
@@ -1,5 +1,4 @@
 import os
-import glob
 import pandas as pd
 import json
 from datetime import datetime
@@ -9,11 +8,16 @@ from decimal import Decimal
 import logging
 from collections import defaultdict
 from source.config import config
-from source.actions.utils import ConfidenceCalculator, FieldConfidence
+from source.actions.utils import ConfidenceCalculator, FieldConfidence, group_by_anchor
 from source.actions.symbol_mapper import SymbolMapper
+from source.actions.master_symbols import MasterSymbolTable, load_master_symbols
 
 logger = logging.getLogger(__name__)
 
+# Pipeline declarations (see source/pipeline.py). Provider inputs are passed to run() in this order.
+INPUTS = ['alpaca', 'fmp', 'poly', 'sharadar', 'master_symbols']
+OUTPUTS = ['unified_rights']
+
 
 @dataclass
 class SymbolMappingInfo:
@@ -96,9 +100,9 @@ class EnhancedRightsOfferingProcessor:
         'sharadar': 7
     }
 
-    def __init__(self, master_csv_path: str):
+    def __init__(self, master_symbols: MasterSymbolTable):
         self.confidence_calculator = ConfidenceCalculator()
-        self.symbol_mapper = SymbolMapper(master_csv_path)
+        self.symbol_mapper = SymbolMapper(master_symbols)
         self.debug_results = []
 
     def process_all_sources(self, source_data_dict: Dict[str, List[Dict[str, Any]]]) -> List[RightsOfferingMatchResult]:
@@ -270,27 +274,10 @@ class EnhancedRightsOfferingProcessor:
 
     def _group_similar_rights(self, rights: List[UnifiedRightsOffering]) -> List[List[UnifiedRightsOffering]]:
         """Group rights offerings that appear to be the same event."""
-        groups = []
-        remaining_rights = rights.copy()
-
-        while remaining_rights:
-            current = remaining_rights.pop(0)
-            current_group = [current]
-
-            # Find similar rights offerings
-            to_remove = []
-            for i, rights_offering in enumerate(remaining_rights):
-                if self._are_rights_similar(current, rights_offering):
-                    current_group.append(rights_offering)
-                    to_remove.append(i)
-
-            # Remove grouped rights offerings
-            for i in reversed(to_remove):
-                remaining_rights.pop(i)
 
-            groups.append(current_group)
-
-        return groups
+        # Only offerings sharing an ex_date can match
+        return group_by_anchor(rights, self._are_rights_similar,
+                               key=lambda rights_offering: rights_offering.ex_date or None)
 
     def _are_rights_similar(self, rights1: UnifiedRightsOffering, rights2: UnifiedRightsOffering) -> bool:
         """Check if two rights offerings are likely the same event."""
@@ -558,13 +545,9 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
     # Ensure directories exist
     config.ensure_directories()
 
-    # Find master files using configured path
-    master_files = glob.glob(os.path.join(config.master_files_dir, '*_MASTER_UPDATED.csv'))
-    if not master_files:
-        raise FileNotFoundError(f"No master CSV files found in {config.master_files_dir}")
-
-    master_file = max(master_files)  # Get the most recent master file
-    print(f"Using master file: {master_file}")
+    # Shared master symbol table, read once per pipeline run
+    master_symbols = load_master_symbols(config.master_files_dir)
+    print(f"Using master file: {master_symbols.path}")
 
     # Extract rights offering data from all sources
     print("Extracting rights offering data from sources...")
@@ -580,7 +563,7 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
         return
 
     # Initialize processor
-    processor = EnhancedRightsOfferingProcessor(master_file)
+    processor = EnhancedRightsOfferingProcessor(master_symbols)
 
     # Process all sources
     print("Processing rights offerings from all sources...")
@@ -607,15 +590,11 @@ if __name__ == "__main__":
     # Test run with sample data
     config.ensure_directories()
 
-    # Find master files using configured path
-    master_files = glob.glob(os.path.join(config.master_files_dir, '*.csv'))
-    if not master_files:
-        raise FileNotFoundError(f"No master CSV files found in {config.master_files_dir}")
-
-    master_file = max(master_files)
-    print(f"Using master file: {master_file}")
+    # Shared master symbol table, read once per pipeline run
+    master_symbols = load_master_symbols(config.master_files_dir, '*.csv')
+    print(f"Using master file: {master_symbols.path}")
 
-    processor = EnhancedRightsOfferingProcessor(master_file)
+    processor = EnhancedRightsOfferingProcessor(master_symbols)
 
     # Sample test data
     source_data = {
@@ -1,5 +1,4 @@
 import os
-import glob
 import pandas as pd
 import json
 from datetime import datetime
@@ -9,11 +8,16 @@ from decimal import Decimal
 import logging
 from collections import defaultdict
 from source.config import config
-from source.actions.utils import ConfidenceCalculator, FieldConfidence
+from source.actions.utils import ConfidenceCalculator, FieldConfidence, group_by_anchor
 from source.actions.symbol_mapper import SymbolMapper
+from source.actions.master_symbols import MasterSymbolTable, load_master_symbols
 
 logger = logging.getLogger(__name__)
 
+# Pipeline declarations (see source/pipeline.py). Provider inputs are passed to run() in this order.
+INPUTS = ['alpaca', 'fmp', 'poly', 'sharadar', 'master_symbols']
+OUTPUTS = ['unified_spinoffs']
+
 
 @dataclass
 class SymbolMappingInfo:
@@ -100,9 +104,9 @@ class EnhancedSpinoffProcessor:
         'sharadar_spinoff': 7
     }
 
-    def __init__(self, master_csv_path: str):
+    def __init__(self, master_symbols: MasterSymbolTable):
         self.confidence_calculator = ConfidenceCalculator()
-        self.symbol_mapper = SymbolMapper(master_csv_path)
+        self.symbol_mapper = SymbolMapper(master_symbols)
         self.debug_results = []
 
     def process_all_sources(self, source_data_dict: Dict[str, List[Dict[str, Any]]]) -> List[SpinoffMatchResult]:
@@ -281,27 +285,12 @@ class EnhancedSpinoffProcessor:
     def _group_similar_spinoffs(self, spinoffs: List[UnifiedSpinoff]) -> List[List[UnifiedSpinoff]]:
         """Group spinoffs that appear to be the same event."""
 
-        groups = []
-        remaining_spinoffs = spinoffs.copy()
-
-        while remaining_spinoffs:
-            current = remaining_spinoffs.pop(0)
-            current_group = [current]
-
-            # Find similar spinoffs
-            to_remove = []
-            for i, spinoff in enumerate(remaining_spinoffs):
-                if self._are_spinoffs_similar(current, spinoff):
-                    current_group.append(spinoff)
-                    to_remove.append(i)
-
-            # Remove grouped spinoffs
-            for i in reversed(to_remove):
-                remaining_spinoffs.pop(i)
-
-            groups.append(current_group)
+        def key(spinoff):
+            if spinoff.ex_date and spinoff.new_symbol:
+                return spinoff.ex_date, spinoff.new_symbol
+            return None
 
-        return groups
+        return group_by_anchor(spinoffs, self._are_spinoffs_similar, key=key)
 
     def _are_spinoffs_similar(self, spinoff1: UnifiedSpinoff, spinoff2: UnifiedSpinoff) -> bool:
         """Check if two spinoffs are likely the same event."""
@@ -560,13 +549,9 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
     # Ensure directories exist
     config.ensure_directories()
 
-    # Find master files using configured path
-    master_files = glob.glob(os.path.join(config.master_files_dir, '*_MASTER_UPDATED.csv'))
-    if not master_files:
-        raise FileNotFoundError(f"No master CSV files found in {config.master_files_dir}")
-
-    master_file = max(master_files)  # Get the most recent master file
-    print(f"Using master file: {master_file}")
+    # Shared master symbol table, read once per pipeline run
+    master_symbols = load_master_symbols(config.master_files_dir)
+    print(f"Using master file: {master_symbols.path}")
 
     # Extract spinoff data from all sources
     print("Extracting spinoff data from sources...")
@@ -582,7 +567,7 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
         return
 
     # Initialize processor
-    processor = EnhancedSpinoffProcessor(master_file)
+    processor = EnhancedSpinoffProcessor(master_symbols)
 
     # Process all sources
     print("Processing spinoffs from all sources...")
@@ -1,5 +1,4 @@
 import os
-import glob
 import pandas as pd
 import json
 from datetime import datetime
@@ -9,11 +8,16 @@ from decimal import Decimal
 import logging
 from collections import defaultdict
 from source.config import config
-from source.actions.utils import ConfidenceCalculator, FieldConfidence
+from source.actions.utils import ConfidenceCalculator, FieldConfidence, group_by_anchor, relative_tolerance_window
 from source.actions.symbol_mapper import SymbolMapper
+from source.actions.master_symbols import MasterSymbolTable, load_master_symbols
 
 logger = logging.getLogger(__name__)
 
+# Pipeline declarations (see source/pipeline.py). Provider inputs are passed to run() in this order.
+INPUTS = ['alpaca', 'fmp', 'poly', 'sharadar', 'master_symbols']
+OUTPUTS = ['unified_stock_splits']
+
 
 @dataclass
 class SymbolMappingInfo:
@@ -125,9 +129,9 @@ class EnhancedStockSplitProcessor:
         'sharadar_split': 6
     }
 
-    def __init__(self, master_csv_path: str):
+    def __init__(self, master_symbols: MasterSymbolTable):
         self.confidence_calculator = ConfidenceCalculator()
-        self.symbol_mapper = SymbolMapper(master_csv_path)
+        self.symbol_mapper = SymbolMapper(master_symbols)
         self.debug_results = []
 
     def process_all_sources(self, source_data_dict: Dict[str, List[Dict[str, Any]]]) -> List[SplitMatchResult]:
@@ -321,27 +325,11 @@ class EnhancedStockSplitProcessor:
     def _group_similar_splits(self, splits: List[UnifiedStockSplit]) -> List[List[UnifiedStockSplit]]:
         """Group splits that appear to be the same event."""
 
-        groups = []
-        remaining_splits = splits.copy()
-
-        while remaining_splits:
-            current = remaining_splits.pop(0)
-            current_group = [current]
-
-            # Find similar splits
-            to_remove = []
-            for i, split in enumerate(remaining_splits):
-                if self._are_splits_similar(current, split):
-                    current_group.append(split)
-                    to_remove.append(i)
-
-            # Remove grouped splits
-            for i in reversed(to_remove):
-                remaining_splits.pop(i)
-
-            groups.append(current_group)
-
-        return groups
+        # Only splits sharing an ex_date can match; within a date, ratios are swept in sorted order
+        return group_by_anchor(splits, self._are_splits_similar,
+                               key=lambda split: split.ex_date or None,
+                               value=lambda split: split.split_ratio or None,
+                               window=relative_tolerance_window(0.01))
 
     def _are_splits_similar(self, split1: UnifiedStockSplit, split2: UnifiedStockSplit) -> bool:
         """Check if two splits are likely the same event."""
@@ -620,13 +608,9 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
     # Ensure directories exist
     config.ensure_directories()
 
-    # Find master files using configured path
-    master_files = glob.glob(os.path.join(config.master_files_dir, '*_MASTER_UPDATED.csv'))
-    if not master_files:
-        raise FileNotFoundError(f"No master CSV files found in {config.master_files_dir}")
-
-    master_file = max(master_files)  # Get the most recent master file
-    print(f"Using master file: {master_file}")
+    # Shared master symbol table, read once per pipeline run
+    master_symbols = load_master_symbols(config.master_files_dir)
+    print(f"Using master file: {master_symbols.path}")
 
     # Extract split data from all sources
     print("Extracting split data from sources...")
@@ -642,7 +626,7 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
         return
 
     # Initialize processor
-    processor = EnhancedStockSplitProcessor(master_file)
+    processor = EnhancedStockSplitProcessor(master_symbols)
 
     # Process all sources
     print("Processing splits from all sources...")
@@ -1,5 +1,4 @@
 import os
-import glob
 import pandas as pd
 import json
 from datetime import datetime
@@ -9,11 +8,16 @@ from decimal import Decimal
 import logging
 from collections import defaultdict
 from source.config import config
-from source.actions.utils import ConfidenceCalculator, FieldConfidence
+from source.actions.utils import ConfidenceCalculator, FieldConfidence, group_by_anchor, absolute_tolerance_window
 from source.actions.symbol_mapper import SymbolMapper
+from source.actions.master_symbols import MasterSymbolTable, load_master_symbols
 
 logger = logging.getLogger(__name__)
 
+# Pipeline declarations (see source/pipeline.py). Provider inputs are passed to run() in this order.
+INPUTS = ['alpaca', 'fmp', 'poly', 'sharadar', 'master_symbols']
+OUTPUTS = ['unified_stock_dividends']
+
 
 @dataclass
 class SymbolMappingInfo:
@@ -89,9 +93,9 @@ class EnhancedStockDividendProcessor:
         'sharadar': 7
     }
 
-    def __init__(self, master_csv_path: str):
+    def __init__(self, master_symbols: MasterSymbolTable):
         self.confidence_calculator = ConfidenceCalculator()
-        self.symbol_mapper = SymbolMapper(master_csv_path)
+        self.symbol_mapper = SymbolMapper(master_symbols)
         self.debug_results = []
 
     def process_all_sources(self, source_data_dict: Dict[str, List[Dict[str, Any]]]) -> List[StockDividendMatchResult]:
@@ -263,27 +267,18 @@ class EnhancedStockDividendProcessor:
 
     def _group_similar_dividends(self, dividends: List[UnifiedStockDividend]) -> List[List[UnifiedStockDividend]]:
         """Group stock dividends that appear to be the same event."""
-        groups = []
-        remaining_dividends = dividends.copy()
-
-        while remaining_dividends:
-            current = remaining_dividends.pop(0)
-            current_group = [current]
-
-            # Find similar dividends
-            to_remove = []
-            for i, dividend in enumerate(remaining_dividends):
-                if self._are_dividends_similar(current, dividend):
-                    current_group.append(dividend)
-                    to_remove.append(i)
 
-            # Remove grouped dividends
-            for i in reversed(to_remove):
-                remaining_dividends.pop(i)
+        def key(dividend):
+            if not dividend.ex_date:
+                return None
+            # Missing ratios only match equal ones; present ratios are swept in sorted order
+            if dividend.dividend_ratio:
+                return dividend.ex_date, True
+            return dividend.ex_date, False, dividend.dividend_ratio
 
-            groups.append(current_group)
-
-        return groups
+        return group_by_anchor(dividends, self._are_dividends_similar, key=key,
+                               value=lambda dividend: dividend.dividend_ratio or None,
+                               window=absolute_tolerance_window(0.001))
 
     def _are_dividends_similar(self, div1: UnifiedStockDividend, div2: UnifiedStockDividend) -> bool:
         """Check if two stock dividends are likely the same event."""
@@ -535,13 +530,9 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
     # Ensure directories exist
     config.ensure_directories()
 
-    # Find master files using configured path
-    master_files = glob.glob(os.path.join(config.master_files_dir, '*_MASTER_UPDATED.csv'))
-    if not master_files:
-        raise FileNotFoundError(f"No master CSV files found in {config.master_files_dir}")
-
-    master_file = max(master_files)  # Get the most recent master file
-    print(f"Using master file: {master_file}")
+    # Shared master symbol table, read once per pipeline run
+    master_symbols = load_master_symbols(config.master_files_dir)
+    print(f"Using master file: {master_symbols.path}")
 
     # Extract stock dividend data from all sources
     print("Extracting stock dividend data from sources...")
@@ -557,7 +548,7 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
         return
 
     # Initialize processor
-    processor = EnhancedStockDividendProcessor(master_file)
+    processor = EnhancedStockDividendProcessor(master_symbols)
 
     # Process all sources
     print("Processing stock dividends from all sources...")
@@ -584,15 +575,11 @@ if __name__ == "__main__":
     # Test run with sample data
     config.ensure_directories()
 
-    # Find master files using configured path
-    master_files = glob.glob(os.path.join(config.master_files_dir, '*.csv'))
-    if not master_files:
-        raise FileNotFoundError(f"No master CSV files found in {config.master_files_dir}")
-
-    master_file = max(master_files)
-    print(f"Using master file: {master_file}")
+    # Shared master symbol table, read once per pipeline run
+    master_symbols = load_master_symbols(config.master_files_dir, '*.csv')
+    print(f"Using master file: {master_symbols.path}")
 
-    processor = EnhancedStockDividendProcessor(master_file)
+    processor = EnhancedStockDividendProcessor(master_symbols)
 
     # Sample test data
     source_data = {
@@ -1,5 +1,4 @@
 import os
-import glob
 import pandas as pd
 import json
 from datetime import datetime
@@ -9,11 +8,16 @@ from decimal import Decimal
 import logging
 from collections import defaultdict
 from source.config import config
-from source.actions.utils import ConfidenceCalculator, FieldConfidence
+from source.actions.utils import ConfidenceCalculator, FieldConfidence, group_by_anchor
 from source.actions.symbol_mapper import SymbolMapper
+from source.actions.master_symbols import MasterSymbolTable, load_master_symbols
 
 logger = logging.getLogger(__name__)
 
+# Pipeline declarations (see source/pipeline.py). Provider inputs are passed to run() in this order.
+INPUTS = ['alpaca', 'fmp', 'poly', 'sharadar', 'master_symbols']
+OUTPUTS = ['unified_symbol_changes']
+
 
 @dataclass
 class SymbolMappingInfo:
@@ -101,9 +105,9 @@ class EnhancedSymbolChangeProcessor:
         'sharadar': 7
     }
 
-    def __init__(self, master_csv_path: str):
+    def __init__(self, master_symbols: MasterSymbolTable):
         self.confidence_calculator = ConfidenceCalculator()
-        self.symbol_mapper = SymbolMapper(master_csv_path)
+        self.symbol_mapper = SymbolMapper(master_symbols)
         self.debug_results = []
 
     def process_all_sources(self, source_data_dict: Dict[str, List[Dict[str, Any]]]) -> List[SymbolChangeMatchResult]:
@@ -263,27 +267,10 @@ class EnhancedSymbolChangeProcessor:
 
     def _group_similar_changes(self, changes: List[UnifiedSymbolChange]) -> List[List[UnifiedSymbolChange]]:
         """Group symbol changes that appear to be the same event."""
-        groups = []
-        remaining_changes = changes.copy()
-
-        while remaining_changes:
-            current = remaining_changes.pop(0)
-            current_group = [current]
-
-            # Find similar symbol changes
-            to_remove = []
-            for i, change in enumerate(remaining_changes):
-                if self._are_changes_similar(current, change):
-                    current_group.append(change)
-                    to_remove.append(i)
-
-            # Remove grouped changes
-            for i in reversed(to_remove):
-                remaining_changes.pop(i)
 
-            groups.append(current_group)
-
-        return groups
+        # Only changes between the same pair of symbols (in either direction) can match
+        return group_by_anchor(changes, self._are_changes_similar,
+                               key=lambda change: frozenset((change.old_symbol, change.new_symbol)))
 
     def _are_changes_similar(self, change1: UnifiedSymbolChange, change2: UnifiedSymbolChange) -> bool:
         """Check if two symbol changes are likely the same event."""
@@ -542,13 +529,9 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
     # Ensure directories exist
     config.ensure_directories()
 
-    # Find master files using configured path
-    master_files = glob.glob(os.path.join(config.master_files_dir, '*_MASTER_UPDATED.csv'))
-    if not master_files:
-        raise FileNotFoundError(f"No master CSV files found in {config.master_files_dir}")
-
-    master_file = max(master_files)  # Get the most recent master file
-    print(f"Using master file: {master_file}")
+    # Shared master symbol table, read once per pipeline run
+    master_symbols = load_master_symbols(config.master_files_dir)
+    print(f"Using master file: {master_symbols.path}")
 
     # Extract symbol change data from all sources
     print("Extracting symbol change data from sources...")
@@ -564,7 +547,7 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
         return
 
     # Initialize processor
-    processor = EnhancedSymbolChangeProcessor(master_file)
+    processor = EnhancedSymbolChangeProcessor(master_symbols)
 
     # Process all sources
     print("Processing symbol changes from all sources...")
@@ -596,13 +579,9 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
     # Ensure directories exist
     config.ensure_directories()
 
-    # Find master files using configured path
-    master_files = glob.glob(os.path.join(config.master_files_dir, '*_MASTER_UPDATED.csv'))
-    if not master_files:
-        raise FileNotFoundError(f"No master CSV files found in {config.master_files_dir}")
-
-    master_file = max(master_files)  # Get the most recent master file
-    print(f"Using master file: {master_file}")
+    # Shared master symbol table, read once per pipeline run
+    master_symbols = load_master_symbols(config.master_files_dir)
+    print(f"Using master file: {master_symbols.path}")
 
     # Extract symbol change data from all sources
     print("Extracting symbol change data from sources...")
@@ -618,7 +597,7 @@ def run(alpaca_data: Dict[str, pd.DataFrame],
         return
 
     # Initialize processor
-    processor = EnhancedSymbolChangeProcessor(master_file)
+    processor = EnhancedSymbolChangeProcessor(master_symbols)
 
     # Process all sources
     print("Processing symbol changes from all sources...")
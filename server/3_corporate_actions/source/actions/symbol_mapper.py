@@ -1,7 +1,8 @@
-import pandas as pd
-from typing import Dict, Optional
+import numpy as np
+from typing import Dict, Iterable, Optional, Union
 import logging
 from source.config import config
+from source.actions.master_symbols import MasterSymbolTable, load_master_symbols
 
 logger = logging.getLogger(__name__)
 
@@ -9,16 +10,15 @@ logger = logging.getLogger(__name__)
 class SymbolMapper:
     """Maps symbols from different sources to master symbols."""
 
-    def __init__(self, master_csv_path: str = None):
-        if master_csv_path is None:
+    def __init__(self, master_symbols: Union[MasterSymbolTable, str, None] = None):
+        if master_symbols is None:
             # Use default master file from config
-            import glob
-            master_files = glob.glob(os.path.join(config.master_files_dir, '*.csv'))
-            if not master_files:
-                raise FileNotFoundError(f"No master CSV files found in {config.master_files_dir}")
-            master_csv_path = max(master_files)
-            
-        self.master_df = pd.read_csv(master_csv_path, sep='|', dtype=str, keep_default_na=False, na_values=[])
+            master_symbols = load_master_symbols(config.master_files_dir, '*.csv')
+        elif isinstance(master_symbols, str):
+            master_symbols = MasterSymbolTable.from_csv(master_symbols)
+
+        # Shared, read-only table: lookups go through its per-source hash indexes
+        self.master_symbols = master_symbols
         self.source_mappings = {
             'alpaca': 'al_symbol',
             'poly': 'pl_symbol',
@@ -26,26 +26,24 @@ class SymbolMapper:
             'sharadar': 'sh_symbol'
         }
 
-        # Create lookup dictionaries for fast mapping
-        self.lookup_tables = {}
         for source, column in self.source_mappings.items():
-            if column in self.master_df.columns:
-                # Create mapping from source symbol to master symbol
-                mapping = self.master_df[self.master_df[column].notna()].set_index(column)['symbol'].to_dict()
-                self.lookup_tables[source] = mapping
-            else:
+            if source not in master_symbols.kinds:
                 logger.warning(f"Column {column} not found in master CSV for source {source}")
-                self.lookup_tables[source] = {}
 
     def map_to_master_symbol(self, source: str, source_symbol: str) -> Optional[str]:
         """Map a source symbol to master symbol."""
-        if source not in self.lookup_tables:
+        if source not in self.source_mappings:
             return None
-        return self.lookup_tables[source].get(source_symbol)
+        return self.master_symbols.master_symbol(source_symbol, by=source)
+
+    def map_to_master_symbols(self, source: str, source_symbols: Iterable[str]) -> np.ndarray:
+        """Map many source symbols at once (None where unmapped)."""
+        source_symbols = list(source_symbols)
+        if source not in self.source_mappings:
+            return np.full(len(source_symbols), None, dtype=object)
+        positions = self.master_symbols.positions(source_symbols, by=source)
+        return self.master_symbols.values_at(positions, 'symbol')
 
     def get_symbol_info(self, master_symbol: str) -> Dict:
         """Get full symbol information from master CSV."""
-        row = self.master_df[self.master_df['symbol'] == master_symbol]
-        if row.empty:
-            return {}
-        return row.iloc[0].to_dict()
\ No newline at end of file
+        return self.master_symbols.lookup(master_symbol, by='ticker')
@@ -1,11 +1,135 @@
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Callable, Dict, Hashable, List, Optional, Any, Sequence, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 from decimal import Decimal
+from bisect import bisect_left
+import math
 import statistics
 from collections import defaultdict
 
 
+def group_by_anchor(items: Sequence[Any], similar: Callable[[Any, Any], bool],
+                    key: Optional[Callable[[Any], Optional[Hashable]]] = None,
+                    value: Optional[Callable[[Any], Any]] = None,
+                    window: Optional[Callable[[float], Tuple[float, float]]] = None) -> List[List[Any]]:
+    """
+    Group near-duplicate records: the first ungrouped record anchors a group and takes every later
+    ungrouped record for which similar(anchor, record) holds, until none are left. Groups come back in
+    anchor order with members in input order - the same result as scanning all remaining records per anchor.
+
+    key(record) must be equal for any two similar records (None marks a record similar to nothing), so
+    only records sharing a key are compared. With value and window, records in a key are also sorted by
+    value(record) and an anchor only tests records inside window(anchor value), which must contain every
+    value that can be similar to it. Records without a finite value are tested against every anchor.
+    """
+    buckets = defaultdict(list)
+    groups = []
+    for position, item in enumerate(items):
+        bucket_key = key(item) if key else ()
+        if bucket_key is None:
+            groups.append((position, [item]))
+        else:
+            buckets[bucket_key].append(position)
+
+    for positions in buckets.values():
+        groups.extend(_group_bucket(items, positions, similar, value if window else None, window))
+
+    groups.sort(key=lambda group: group[0])
+    return [members for _, members in groups]
+
+
+def _finite_value(raw) -> Optional[float]:
+    if raw is None:
+        return None
+    try:
+        number = float(raw)
+    except (TypeError, ValueError, ArithmeticError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+def _group_bucket(items, positions, similar, value, window) -> List[Tuple[int, List[Any]]]:
+    """Anchor grouping for the records of one key, positions ascending"""
+    if len(positions) == 1:
+        return [(positions[0], [items[positions[0]]])]
+
+    loose, swept = [], []
+    for position in positions:
+        number = _finite_value(value(items[position])) if value else None
+        if number is None:
+            loose.append(position)
+        else:
+            swept.append((number, position))
+    swept.sort()
+    swept_values = [number for number, _ in swept]
+    swept_positions = [position for _, position in swept]
+    swept_index = {position: i for i, position in enumerate(swept_positions)}
+
+    # next_alive[i]: smallest index >= i still ungrouped in the sorted records (path-compressed)
+    next_alive = list(range(len(swept) + 1))
+
+    def alive_from(i):
+        root = i
+        while next_alive[root] != root:
+            root = next_alive[root]
+        while next_alive[i] != root:
+            next_alive[i], i = root, next_alive[i]
+        return root
+
+    grouped = set()
+    groups = []
+    for anchor in positions:
+        if anchor in grouped:
+            continue
+        grouped.add(anchor)
+        if anchor in swept_index:
+            next_alive[swept_index[anchor]] = swept_index[anchor] + 1
+        members = [anchor]
+
+        loose = [position for position in loose if position not in grouped]
+        for position in loose:
+            if similar(items[anchor], items[position]):
+                members.append(position)
+                grouped.add(position)
+
+        if swept:
+            if anchor in swept_index:
+                low, high = window(swept_values[swept_index[anchor]])
+                i = alive_from(bisect_left(swept_values, low))
+            else:
+                high, i = math.inf, alive_from(0)
+            while i < len(swept) and swept_values[i] <= high:
+                position = swept_positions[i]
+                if similar(items[anchor], items[position]):
+                    members.append(position)
+                    grouped.add(position)
+                    next_alive[i] = i + 1
+                i = alive_from(i + 1)
+
+        members.sort()
+        groups.append((anchor, [items[position] for position in members]))
+
+    return groups
+
+
+def relative_tolerance_window(tolerance: float) -> Callable[[float], Tuple[float, float]]:
+    """Window for similar(a, b) = |a - b| / max(a, b) < tolerance on positive values"""
+    def window(anchor: float) -> Tuple[float, float]:
+        if anchor <= 0:
+            return -math.inf, math.inf
+        # Padded so float rounding of Decimal values can't push a similar record outside
+        return anchor * (1 - tolerance) * (1 - 1e-9), anchor / (1 - tolerance) * (1 + 1e-9)
+    return window
+
+
+def absolute_tolerance_window(tolerance: float) -> Callable[[float], Tuple[float, float]]:
+    """Window for similar(a, b) = |a - b| < tolerance"""
+    def window(anchor: float) -> Tuple[float, float]:
+        padding = tolerance + abs(anchor) * 1e-9
+        return anchor - padding, anchor + padding
+    return window
+
+
 @dataclass
 class FieldConfidence:
     """Confidence metrics for individual fields."""
@@ -174,62 +298,44 @@ class ConfidenceCalculator:
 
     def _cluster_dates(self, date_objects: Dict[str, datetime], tolerance_days: int) -> List[Dict]:
         """Cluster dates that are within tolerance of each other."""
-        clusters = []
-        remaining_dates = date_objects.copy()
-
-        while remaining_dates:
-            anchor_source, anchor_date = next(iter(remaining_dates.items()))
-            cluster_sources = [anchor_source]
-            del remaining_dates[anchor_source]
-
-            to_remove = []
-            for source, date_obj in remaining_dates.items():
-                if abs((date_obj - anchor_date).days) <= tolerance_days:
-                    cluster_sources.append(source)
-                    to_remove.append(source)
-
-            for source in to_remove:
-                del remaining_dates[source]
-
-            cluster_dates = [date_objects[source] for source in cluster_sources]
-            cluster_dates.sort()
-            representative_date = cluster_dates[len(cluster_dates) // 2]
+        def within_tolerance(anchor, other):
+            return abs((other[1] - anchor[1]).days) <= tolerance_days
 
+        # Window one day wider than the tolerance since .days truncates
+        day_seconds = 86400
+        clusters = []
+        for members in group_by_anchor(list(date_objects.items()), within_tolerance,
+                                       value=lambda item: (item[1] - datetime.min).total_seconds(),
+                                       window=absolute_tolerance_window((tolerance_days + 1) * day_seconds)):
+            cluster_dates = sorted(date_obj for _, date_obj in members)
             clusters.append({
-                'sources': cluster_sources,
-                'representative_date': representative_date
+                'sources': [source for source, _ in members],
+                'representative_date': cluster_dates[len(cluster_dates) // 2]
             })
 
         return clusters
 
     def _cluster_amounts(self, float_values: Dict[str, float], tolerance_percent: float) -> List[Dict]:
         """Cluster amounts that are within percentage tolerance of each other."""
-        clusters = []
-        remaining_amounts = float_values.copy()
-
-        while remaining_amounts:
-            anchor_source, anchor_amount = next(iter(remaining_amounts.items()))
-            cluster_sources = [anchor_source]
-            del remaining_amounts[anchor_source]
-
-            to_remove = []
-            for source, amount in remaining_amounts.items():
-                if anchor_amount == 0:
-                    if amount == 0:
-                        cluster_sources.append(source)
-                        to_remove.append(source)
-                else:
-                    percent_diff = abs(amount - anchor_amount) / anchor_amount * 100
-                    if percent_diff <= tolerance_percent:
-                        cluster_sources.append(source)
-                        to_remove.append(source)
-
-            for source in to_remove:
-                del remaining_amounts[source]
+        def within_tolerance(anchor, other):
+            anchor_amount, amount = anchor[1], other[1]
+            if anchor_amount == 0:
+                return amount == 0
+            return abs(amount - anchor_amount) / anchor_amount * 100 <= tolerance_percent
+
+        def window(anchor_amount):
+            if anchor_amount < 0:
+                # Negative anchors pass every amount through the percentage check
+                return -math.inf, math.inf
+            spread = anchor_amount * tolerance_percent / 100
+            return absolute_tolerance_window(spread)(anchor_amount)
 
+        clusters = []
+        for members in group_by_anchor(list(float_values.items()), within_tolerance,
+                                       value=lambda item: item[1], window=window):
             clusters.append({
-                'sources': cluster_sources,
-                'representative_amount': anchor_amount
+                'sources': [source for source, _ in members],
+                'representative_amount': members[0][1]
             })
 
         return clusters
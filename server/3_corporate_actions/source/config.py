@@ -52,6 +52,10 @@ class CorporateActionsConfig:
         self.poly_schema_file = os.getenv('POLY_SCHEMA_FILE')
         self.sharadar_schema_file = os.getenv('SHARADAR_SCHEMA_FILE')
 
+        # Pipeline runner: process pool size and where provider frames are shared as Arrow files
+        self.action_workers = int(os.getenv('ACTION_WORKERS') or os.cpu_count() or 1)
+        self.shared_frames_dir = os.getenv('SHARED_FRAMES_DIR') or ('/dev/shm' if os.path.isdir('/dev/shm') else None)
+
     def ensure_directories(self):
         """Create all necessary directories if they don't exist"""
         directories = [
@@ -1,76 +1,23 @@
-from source.config import config
-from source.providers import fmp, poly, sharadar, alpaca, nasdaq
+import argparse
 
-from source.actions import cash_dividends
-from source.actions import delistings
-from source.actions import ipos
-from source.actions import mergers
-from source.actions import rights
-from source.actions import spinoffs
-from source.actions import splits
-from source.actions import stock_dividends
-from source.actions import symbol_changes
+from source.config import config
+from source.pipeline import print_timings, run_pipeline
 
 
 def main():
-    """Main function to load data from all sources."""
+    """Main function to load data from all sources and run every corporate action module."""
+    parser = argparse.ArgumentParser(description="Build the unified corporate actions files")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="worker processes for the pipeline (default: ACTION_WORKERS or CPU count)")
+    parser.add_argument('--serial', action='store_true',
+                        help="run every step in this process, one after another")
+    args = parser.parse_args()
+
     # Ensure directories exist
     config.ensure_directories()
 
-    print("Loading data from FMP...")
-    fmp_data = fmp.load_data()
-    print("FMP data loaded:")
-    for action_type, df in fmp_data.items():
-        print(f"  - {action_type}: {len(df)} records")
-
-    print("\nLoading data from Polygon...")
-    poly_data = poly.load_data()
-    print("Polygon data loaded:")
-    for action_type, df in poly_data.items():
-        print(f"  - {action_type}: {len(df)} records")
-
-    print("\nLoading data from Sharadar...")
-    sharadar_data = sharadar.load_data()
-    print(f"Loaded {len(sharadar_data)} records from Sharadar.")
-
-    print("\nLoading data from Alpaca...")
-    alpaca_data = alpaca.load_data()
-    print("Alpaca data loaded:")
-    for action_type, df in alpaca_data.items():
-        print(f"  - {action_type}: {len(df)} records")
-
-    print("\nLoading data from NASDAQ...")
-    nasdaq_data = nasdaq.load_data()
-    print("NASDAQ data loaded:")
-    for action_type, df in nasdaq_data.items():
-        print(f"  - {action_type}: {len(df)} records")
-
-    print("\nAnalyzing Cash Dividends...")
-    cash_dividends.run(alpaca_data, fmp_data, poly_data, sharadar_data)
-
-    print("\nAnalyzing Delisting...")
-    delistings.run(alpaca_data, fmp_data, poly_data, sharadar_data, nasdaq_data)
-
-    print("\nAnalyzing IPOS...")
-    ipos.run(alpaca_data, fmp_data, poly_data, sharadar_data, nasdaq_data)
-
-    print("\nAnalyzing Mergers...")
-    mergers.run(alpaca_data, fmp_data, poly_data, sharadar_data)
-
-    print("\nAnalyzing Rights...")
-    rights.run(alpaca_data, fmp_data, poly_data, sharadar_data)
-
-    print("\nAnalyzing Spinoffs...")
-    spinoffs.run(alpaca_data, fmp_data, poly_data, sharadar_data)
-
-    print("\nAnalyzing Splits...")
-    splits.run(alpaca_data, fmp_data, poly_data, sharadar_data)
-
-    print("\nAnalyzing Stock Dividends...")
-    stock_dividends.run(alpaca_data, fmp_data, poly_data, sharadar_data)
-
-    print("\nAnalyzing Symbol Changes...")
-    symbol_changes.run(alpaca_data, fmp_data, poly_data, sharadar_data)
+    timings = run_pipeline(workers=args.workers, serial=args.serial)
+    print_timings(timings)
 
 
 if __name__ == "__main__":
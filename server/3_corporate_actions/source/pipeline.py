@@ -0,0 +1,344 @@
+"""
+Dependency-driven runner for the corporate actions pipeline.
+
+Provider loads, master symbol tables and action modules are nodes with declared inputs and outputs
+(action modules declare INPUTS/OUTPUTS at module level). Each node runs in a process pool as soon as
+everything it reads has been produced, so independent action modules run side by side.
+
+Provider frames and master tables cross process boundaries as Arrow IPC files in a shared directory
+(/dev/shm by default) that readers memory-map, rather than being pickled through the pool.
+Arrow keeps NaN and None in object columns as the same null, so the rows that held NaN are recorded
+in the schema metadata and put back on read.
+"""
+import importlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from source.config import config
+from source.actions.master_symbols import load_master_symbols, register_master_symbols
+
+# Provider name -> module exposing load_data()
+PROVIDER_MODULES = {
+    'fmp': 'source.providers.fmp',
+    'poly': 'source.providers.poly',
+    'sharadar': 'source.providers.sharadar',
+    'alpaca': 'source.providers.alpaca',
+    'nasdaq': 'source.providers.nasdaq',
+}
+
+# Master table name -> config attribute holding its directory
+MASTER_DIRECTORIES = {
+    'master_symbols': 'master_files_dir',
+    'prv_master_symbols': 'master_files_prv_dir',
+}
+
+ACTION_MODULES = [
+    'source.actions.cash_dividends',
+    'source.actions.delistings',
+    'source.actions.ipos',
+    'source.actions.mergers',
+    'source.actions.rights',
+    'source.actions.spinoffs',
+    'source.actions.splits',
+    'source.actions.stock_dividends',
+    'source.actions.symbol_changes',
+]
+
+# Key used when a provider returns a single DataFrame instead of a dict of them
+SINGLE_FRAME_KEY = '__frame__'
+
+
+@dataclass
+class PipelineNode:
+    """One unit of work: a provider load, a master table load or an action module run."""
+    name: str
+    kind: str  # 'provider', 'master' or 'action'
+    target: str
+    inputs: List[str] = field(default_factory=list)
+    outputs: List[str] = field(default_factory=list)
+
+
+# Schema metadata key listing, per object column, the rows that held NaN rather than None
+NAN_ROWS_KEY = b'pipeline.nan_rows'
+
+
+def _nan_rows(df: pd.DataFrame) -> Dict[int, List[int]]:
+    """Object column position -> rows holding a float NaN. Arrow stores NaN and None both as null."""
+    rows = {}
+    for i in range(df.shape[1]):
+        values = df.iloc[:, i]
+        if values.dtype == object:
+            nan = [isinstance(value, float) and value != value for value in values]
+            if any(nan):
+                rows[i] = np.flatnonzero(nan).tolist()
+    return rows
+
+
+def _write_frame(df: pd.DataFrame, base_path: str) -> str:
+    try:
+        table = pa.Table.from_pandas(df)
+    except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+        # Mixed-type object columns have no Arrow type; those frames fall back to a pickle file
+        path = base_path + '.pkl'
+        df.to_pickle(path)
+        return path
+
+    nan_rows = _nan_rows(df)
+    if nan_rows:
+        table = table.replace_schema_metadata({**table.schema.metadata, NAN_ROWS_KEY: json.dumps(nan_rows)})
+    path = base_path + '.arrow'
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return path
+
+
+def _read_frame(path: str) -> pd.DataFrame:
+    if not path.endswith('.arrow'):
+        return pd.read_pickle(path)
+    table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    df = table.to_pandas()
+    # to_pandas() turns every null in an object column into None; put back the NaN the writer saw,
+    # so workers get the same frame a serial run passes along
+    for i, rows in json.loads((table.schema.metadata or {}).get(NAN_ROWS_KEY, b'{}')).items():
+        values = df.iloc[:, int(i)].to_numpy(dtype=object, copy=True)
+        values[rows] = np.nan
+        df.isetitem(int(i), values)
+    return df
+
+
+class SharedFrameStore:
+    """
+    Provider datasets (a DataFrame or a dict of them) stored as Arrow files in a shared directory.
+    Only the directory and the small manifest travel to worker processes.
+    """
+
+    def __init__(self, directory: str, manifest: Optional[Dict[str, Dict[str, Any]]] = None):
+        self.directory = directory
+        self.manifest = manifest or {}
+
+    def put(self, name: str, data, **meta) -> Dict[str, Any]:
+        frames = {SINGLE_FRAME_KEY: data} if isinstance(data, pd.DataFrame) else data
+        dataset_dir = os.path.join(self.directory, name)
+        os.makedirs(dataset_dir, exist_ok=True)
+
+        entry = {
+            'files': {key: _write_frame(df, os.path.join(dataset_dir, str(i))) for i, (key, df) in enumerate(frames.items())},
+            'rows': {key: len(df) for key, df in frames.items()},
+            **meta
+        }
+        self.manifest[name] = entry
+        return entry
+
+    def get(self, name: str):
+        files = self.manifest[name]['files']
+        if list(files) == [SINGLE_FRAME_KEY]:
+            return _read_frame(files[SINGLE_FRAME_KEY])
+        return {key: _read_frame(path) for key, path in files.items()}
+
+    def subset(self, names: Iterable[str]) -> 'SharedFrameStore':
+        return SharedFrameStore(self.directory, {name: self.manifest[name] for name in names if name in self.manifest})
+
+
+class InProcessFrameStore(SharedFrameStore):
+    """Same interface, objects kept in memory - used for serial runs"""
+
+    def __init__(self, manifest: Optional[Dict[str, Dict[str, Any]]] = None):
+        super().__init__(directory='', manifest=manifest)
+
+    def put(self, name: str, data, **meta) -> Dict[str, Any]:
+        frames = {SINGLE_FRAME_KEY: data} if isinstance(data, pd.DataFrame) else data
+        entry = {'data': data, 'rows': {key: len(df) for key, df in frames.items()}, **meta}
+        self.manifest[name] = entry
+        return entry
+
+    def get(self, name: str):
+        return self.manifest[name]['data']
+
+    def subset(self, names: Iterable[str]) -> 'InProcessFrameStore':
+        return self
+
+
+def build_nodes(preloaded: Iterable[str] = ()) -> Dict[str, PipelineNode]:
+    """Pipeline nodes, skipping loaders for datasets that are already available"""
+    preloaded = set(preloaded)
+    nodes = {}
+    for name, module in PROVIDER_MODULES.items():
+        if name not in preloaded:
+            nodes[f"load_{name}"] = PipelineNode(f"load_{name}", 'provider', module, [], [name])
+    for name, attribute in MASTER_DIRECTORIES.items():
+        if name not in preloaded:
+            nodes[f"load_{name}"] = PipelineNode(f"load_{name}", 'master', attribute, [], [name])
+    for module_name in ACTION_MODULES:
+        module = importlib.import_module(module_name)
+        name = module_name.rsplit('.', 1)[1]
+        nodes[name] = PipelineNode(name, 'action', module_name, list(module.INPUTS), list(module.OUTPUTS))
+    return nodes
+
+
+def build_dependency_graph(nodes: Dict[str, PipelineNode], available: Iterable[str] = ()) -> Dict[str, Set[str]]:
+    """Map each node to the nodes producing its inputs. Rejects unknown inputs, duplicate outputs and cycles."""
+    available = set(available)
+    producers = {}
+    for node in nodes.values():
+        for output in node.outputs:
+            if output in producers or output in available:
+                raise ValueError(f"{output} is produced by both {producers.get(output, 'preloaded data')} and {node.name}")
+            producers[output] = node.name
+
+    graph = {}
+    for node in nodes.values():
+        dependencies = set()
+        for name in node.inputs:
+            if name in available:
+                continue
+            if name not in producers:
+                raise ValueError(f"{node.name} reads {name}, which no pipeline node produces")
+            dependencies.add(producers[name])
+        graph[node.name] = dependencies
+
+    topological_order(graph)
+    return graph
+
+
+def topological_order(graph: Dict[str, Set[str]]) -> List[str]:
+    """Nodes ordered so every node comes after its dependencies (insertion order among ready nodes)"""
+    order, done = [], set()
+    remaining = dict(graph)
+    while remaining:
+        ready = [name for name, dependencies in remaining.items() if dependencies <= done]
+        if not ready:
+            raise ValueError(f"Dependency cycle between pipeline nodes: {sorted(remaining)}")
+        for name in ready:
+            order.append(name)
+            done.add(name)
+            del remaining[name]
+    return order
+
+
+def _execute_node(node: PipelineNode, store: SharedFrameStore):
+    """Run one node (in a pool worker or in-process). Returns (new manifest entries, seconds)."""
+    started = time.perf_counter()
+    entries = {}
+
+    if node.kind == 'provider':
+        data = importlib.import_module(node.target).load_data()
+        entries[node.outputs[0]] = store.put(node.outputs[0], data)
+
+    elif node.kind == 'master':
+        table = load_master_symbols(getattr(config, node.target))
+        entries[node.outputs[0]] = store.put(node.outputs[0], table.to_frame(), path=table.path)
+
+    else:
+        module = importlib.import_module(node.target)
+        args = []
+        for name in node.inputs:
+            if name in MASTER_DIRECTORIES:
+                # The module loads the table itself; seed this process's cache from the shared frame
+                register_master_symbols(store.manifest[name]['path'], lambda name=name: store.get(name))
+            elif name in PROVIDER_MODULES:
+                args.append(store.get(name))
+        module.run(*args)
+
+    return entries, time.perf_counter() - started
+
+
+def _report_node(node: PipelineNode, entries: Dict[str, Dict[str, Any]], seconds: float):
+    for name, entry in entries.items():
+        rows = entry['rows']
+        if list(rows) == [SINGLE_FRAME_KEY]:
+            print(f"Loaded {name}: {rows[SINGLE_FRAME_KEY]} records ({seconds:.2f}s)")
+        else:
+            print(f"Loaded {name} ({seconds:.2f}s):")
+            for key, count in rows.items():
+                print(f"  - {key}: {count} records")
+    if node.kind == 'action':
+        print(f"Finished {node.name} ({seconds:.2f}s)")
+
+
+def _run_serial(nodes: Dict[str, PipelineNode], graph: Dict[str, Set[str]], store: SharedFrameStore) -> Dict[str, float]:
+    timings = {}
+    for name in topological_order(graph):
+        entries, seconds = _execute_node(nodes[name], store)
+        store.manifest.update(entries)
+        timings[name] = seconds
+        _report_node(nodes[name], entries, seconds)
+    return timings
+
+
+def _run_parallel(nodes: Dict[str, PipelineNode], graph: Dict[str, Set[str]], store: SharedFrameStore,
+                  workers: int) -> Dict[str, float]:
+    timings, done = {}, set()
+    pending = dict(graph)
+    running = {}
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for name in [name for name, dependencies in pending.items() if dependencies <= done]:
+                del pending[name]
+                node = nodes[name]
+                running[pool.submit(_execute_node, node, store.subset(node.inputs))] = name
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    entries, seconds = future.result()
+                except Exception:
+                    pool.shutdown(wait=True, cancel_futures=True)
+                    raise
+                store.manifest.update(entries)
+                timings[name] = seconds
+                done.add(name)
+                _report_node(nodes[name], entries, seconds)
+
+    return timings
+
+
+def run_pipeline(workers: Optional[int] = None, provider_data: Optional[Dict[str, Any]] = None,
+                 serial: bool = False) -> Dict[str, float]:
+    """
+    Load providers and master tables, then run every action module once its inputs are ready.
+    provider_data may supply already-loaded provider datasets by name (their loaders are skipped).
+    Returns per-node seconds plus the wall-clock total under 'total'.
+    """
+    provider_data = provider_data or {}
+    nodes = build_nodes(preloaded=provider_data)
+    graph = build_dependency_graph(nodes, available=provider_data)
+    workers = max(1, workers or config.action_workers)
+
+    started = time.perf_counter()
+    store_dir = None if serial else tempfile.mkdtemp(prefix='corporate_actions_', dir=config.shared_frames_dir)
+    try:
+        store = InProcessFrameStore() if serial else SharedFrameStore(store_dir)
+        for name, data in provider_data.items():
+            store.put(name, data)
+
+        if serial:
+            timings = _run_serial(nodes, graph, store)
+        else:
+            print(f"Running {len(nodes)} pipeline nodes in {workers} process(es)")
+            timings = _run_parallel(nodes, graph, store, workers)
+    finally:
+        if store_dir:
+            shutil.rmtree(store_dir, ignore_errors=True)
+
+    timings['total'] = time.perf_counter() - started
+    return timings
+
+
+def print_timings(timings: Dict[str, float]):
+    print("\nCorporate actions runtime:")
+    for name, seconds in timings.items():
+        if name != 'total':
+            print(f"  - {name}: {seconds:.2f}s")
+    print(f"  - Wall clock: {timings['total']:.2f}s")
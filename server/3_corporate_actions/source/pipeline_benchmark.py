@@ -0,0 +1,257 @@
+"""
+Wall-clock benchmark of the corporate actions pipeline on synthetic provider data.
+
+    python -m source.pipeline_benchmark --symbols 12000 --workers 8
+
+Builds provider datasets shaped like the real loaders' output for a US-listed universe over one year
+(quarterly dividends from every provider, plus splits, mergers, symbol changes, delistings, IPOs,
+rights, spinoffs and stock dividends) and master files for today and the previous day, then runs the
+pipeline serially and through the process pool. Everything is written under a temporary directory.
+
+Some optional text fields are missing, half as None and half as NaN, the way pd.read_json leaves null
+fields and absent keys. Both runs must write byte-identical data and debug files.
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+def configure_environment(root):
+    """Point every config directory at a scratch tree; must happen before source.config is imported"""
+    ymd = datetime.today().strftime("%Y%m%d")
+    for name in ('SOURCE_SYMBOLS_DIR', 'SOURCE_CA_DIR', 'MASTER_FILES_DIR', 'CORPORATE_ACTIONS_DIR'):
+        os.environ[name] = os.path.join(root, name.lower())
+    # config takes the second newest SOURCE_CA_DIR entry as the previous day
+    for day in ('19700101', ymd):
+        os.makedirs(os.path.join(os.environ['SOURCE_CA_DIR'], day), exist_ok=True)
+    for name in ('CASH_DIVIDENDS', 'DELISTING', 'IPOS', 'MERGERS', 'RIGHTS', 'SPINOFFS', 'STOCK_SPLITS',
+                 'STOCK_DIVIDENDS', 'SYMBOL_CHANGES'):
+        os.environ.setdefault(f"UNIFIED_{name}_FILE", f"unified_{name.lower()}.csv")
+
+
+def _dates(rng, n, start='2024-01-01', days=365):
+    return (pd.Timestamp(start) + pd.to_timedelta(rng.integers(0, days, n), unit='D')).strftime('%Y-%m-%d').to_numpy()
+
+
+def _shift(dates, days):
+    return (pd.to_datetime(dates) + pd.Timedelta(days=days)).strftime('%Y-%m-%d').to_numpy()
+
+
+def _gaps(rng, values, share=0.2):
+    """
+    values as an object array with a share of them missing, spelled the way pd.read_json / pd.DataFrame(records)
+    spell them: None for a null field, NaN for an absent key
+    """
+    values = np.array(values, dtype=object)
+    draw = rng.random(len(values))
+    values[draw < share] = None
+    values[draw < share / 2] = np.nan
+    return values
+
+
+def make_provider_data(symbols, seed=0):
+    """Provider datasets keyed like the pipeline inputs, in the shapes the provider loaders return"""
+    rng = np.random.default_rng(seed)
+    n_symbols = len(symbols)
+
+    def pick(n):
+        return symbols[rng.integers(0, n_symbols, n)]
+
+    # ~45% of the universe pays quarterly; every provider reports most of those events
+    payers = symbols[rng.random(n_symbols) < 0.45]
+    dividend_symbols = np.repeat(payers, 4)
+    first_ex_dates = pd.to_datetime(np.repeat(_dates(rng, len(payers), days=90), 4))
+    quarter = pd.to_timedelta(np.tile(np.arange(4) * 91, len(payers)), unit='D')
+    ex_dates = (first_ex_dates + quarter).strftime('%Y-%m-%d').to_numpy()
+    amounts = np.round(np.repeat(rng.uniform(0.05, 2.0, len(payers)), 4), 4)
+    n_dividends = len(dividend_symbols)
+
+    def covered(share):
+        return rng.random(n_dividends) < share
+
+    def splits(n):
+        sample = pick(n)
+        ratio = rng.choice([2, 3, 4, 10], n)
+        reverse = rng.random(n) < 0.4
+        return sample, _dates(rng, n), np.where(reverse, 1, ratio), np.where(reverse, ratio, 1)
+
+    split_symbols, split_dates, split_to, split_from = splits(max(1, n_symbols // 40))
+    merger_n, change_n, delist_n, ipo_n = (max(1, n_symbols // k) for k in (30, 25, 20, 40))
+
+    mask = covered(0.95)
+    fmp = {
+        'dividends': pd.DataFrame({
+            'symbol': dividend_symbols[mask], 'date': ex_dates[mask], 'recordDate': _shift(ex_dates[mask], 1),
+            'paymentDate': _shift(ex_dates[mask], 14), 'declarationDate': _shift(ex_dates[mask], -20),
+            'dividend': amounts[mask]}),
+        'splits': pd.DataFrame({'symbol': split_symbols, 'date': split_dates,
+                                'numerator': split_to, 'denominator': split_from}),
+        'symbol_changes': pd.DataFrame({'date': _dates(rng, change_n),
+                                        'name': _gaps(rng, [f"Company {i}" for i in range(change_n)]),
+                                        'oldSymbol': pick(change_n), 'newSymbol': np.char.add(pick(change_n), 'N')}),
+        'mergers': pd.DataFrame({'symbol': pick(merger_n), 'targetedSymbol': pick(merger_n),
+                                 'cik': rng.integers(1, 10**7, merger_n).astype(str),
+                                 'targetedCik': rng.integers(1, 10**7, merger_n).astype(str),
+                                 'transactionDate': _dates(rng, merger_n), 'acceptedDate': _dates(rng, merger_n),
+                                 'link': _gaps(rng, ['https://www.sec.gov/Archives/edgar/data'] * merger_n)}),
+    }
+
+    mask = covered(0.9)
+    ipo_symbols = np.char.add('IPO', np.arange(ipo_n).astype(str))
+    ipo_dates = _dates(rng, ipo_n)
+    poly = {
+        'dividends': pd.DataFrame({
+            'ticker': dividend_symbols[mask], 'ex_dividend_date': ex_dates[mask],
+            'record_date': _shift(ex_dates[mask], 1), 'pay_date': _shift(ex_dates[mask], 14),
+            'declaration_date': _shift(ex_dates[mask], -20), 'cash_amount': amounts[mask],
+            'currency': 'USD', 'frequency': 4}),
+        'splits': pd.DataFrame({'ticker': split_symbols, 'execution_date': split_dates,
+                                'split_from': split_from, 'split_to': split_to}),
+        'ipos': pd.DataFrame({'ticker': ipo_symbols, 'listing_date': ipo_dates, 'announced_date': _shift(ipo_dates, -30),
+                              'issuer_name': _gaps(rng, np.char.add('Issuer ', ipo_symbols)),
+                              'isin': '',
+                              'primary_exchange': 'XNAS', 'max_shares_offered': 10_000_000,
+                              'final_issue_price': np.round(rng.uniform(5, 40, ipo_n), 2), 'security_type': 'CS'}),
+    }
+
+    mask = covered(0.85)
+    sharadar_parts = [pd.DataFrame({'action': 'dividend', 'date': ex_dates[mask], 'ticker': dividend_symbols[mask],
+                                    'value': amounts[mask].astype(str)})]
+    sharadar_parts.append(pd.DataFrame({'action': 'split', 'date': split_dates, 'ticker': split_symbols,
+                                        'value': np.round(split_to / split_from, 6).astype(str)}))
+    for action, n in (('mergerfrom', merger_n), ('mergerto', merger_n), ('namechange', change_n),
+                      ('delisted', delist_n), ('ipo', ipo_n), ('rights', max(1, n_symbols // 400)),
+                      ('spinoff', max(1, n_symbols // 200)), ('stockdividend', max(1, n_symbols // 100))):
+        sharadar_parts.append(pd.DataFrame({'action': action, 'date': _dates(rng, n), 'ticker': pick(n),
+                                            'value': np.round(rng.uniform(0.01, 1, n), 4).astype(str),
+                                            'contraticker': pick(n)}))
+    sharadar = pd.concat(sharadar_parts, ignore_index=True)
+    sharadar['name'] = 'Company ' + sharadar['ticker']
+    sharadar['contraname'] = 'Company ' + sharadar['contraticker'].fillna('')
+    sharadar = sharadar.fillna('')[['action', 'date', 'ticker', 'name', 'value', 'contraticker', 'contraname']]
+
+    mask = covered(0.9)
+    alpaca_dividends = pd.DataFrame({
+        'symbol': dividend_symbols[mask], 'ex_date': ex_dates[mask], 'record_date': _shift(ex_dates[mask], 1),
+        'payable_date': _shift(ex_dates[mask], 14), 'rate': amounts[mask], 'foreign': False, 'special': False,
+        'process_date': _shift(ex_dates[mask], 14), 'cusip': ''})
+    forward = split_to > split_from
+    alpaca = {
+        'cash_dividends': alpaca_dividends,
+        'forward_splits': pd.DataFrame({'symbol': split_symbols[forward], 'ex_date': split_dates[forward],
+                                        'old_rate': split_from[forward], 'new_rate': split_to[forward]}),
+        'reverse_splits': pd.DataFrame({'symbol': split_symbols[~forward], 'ex_date': split_dates[~forward],
+                                        'old_rate': split_from[~forward], 'new_rate': split_to[~forward],
+                                        'old_cusip': '', 'new_cusip': ''}),
+        'cash_mergers': pd.DataFrame({'acquiree_symbol': pick(merger_n), 'acquirer_symbol': pick(merger_n),
+                                      'rate': np.round(rng.uniform(5, 100, merger_n), 2),
+                                      'effective_date': _dates(rng, merger_n)}),
+        'stock_mergers': pd.DataFrame({'acquiree_symbol': pick(merger_n), 'acquirer_symbol': pick(merger_n),
+                                       'acquiree_rate': 1, 'acquirer_rate': np.round(rng.uniform(0.1, 3, merger_n), 4),
+                                       'effective_date': _dates(rng, merger_n)}),
+        'name_changes': pd.DataFrame({'old_symbol': pick(change_n), 'new_symbol': np.char.add(pick(change_n), 'N'),
+                                      'process_date': _dates(rng, change_n)}),
+        'worthless_removals': pd.DataFrame({'symbol': pick(delist_n), 'process_date': _dates(rng, delist_n)}),
+        'rights_distributions': pd.DataFrame({'source_symbol': pick(n_symbols // 400 or 1),
+                                              'new_symbol': 'RT', 'rate': 0.1,
+                                              'ex_date': _dates(rng, n_symbols // 400 or 1)}),
+        'spinoffs': pd.DataFrame({'source_symbol': pick(n_symbols // 200 or 1), 'new_symbol': pick(n_symbols // 200 or 1),
+                                  'source_rate': 1, 'new_rate': 0.5, 'ex_date': _dates(rng, n_symbols // 200 or 1)}),
+        'stock_dividends': pd.DataFrame({'symbol': pick(n_symbols // 100 or 1), 'rate': 0.05,
+                                         'ex_date': _dates(rng, n_symbols // 100 or 1)}),
+    }
+
+    nasdaq = {
+        'ipos': pd.DataFrame({'Symbol': ipo_symbols[:ipo_n // 4], 'Company Name': np.char.add('Issuer ', ipo_symbols[:ipo_n // 4]),
+                              'issue_event': 'Security Additions', 'listing_date': ipo_dates[:ipo_n // 4],
+                              'source': 'nasdaq'}),
+        'delistings': pd.DataFrame({'symbol': pick(delist_n // 4), 'company_name': 'Company',
+                                    'issue_event': 'Issue Deletions', 'delisting_date': _dates(rng, delist_n // 4),
+                                    'delisting_reason': 'Voluntary', 'source': 'nasdaq'}),
+    }
+
+    return {'alpaca': alpaca, 'fmp': fmp, 'poly': poly, 'sharadar': sharadar, 'nasdaq': nasdaq}
+
+
+def read_outputs(directory):
+    """Every file the pipeline wrote under directory, as bytes"""
+    outputs = {}
+    for folder, _, files in os.walk(directory):
+        for name in files:
+            path = os.path.join(folder, name)
+            with open(path, 'rb') as f:
+                outputs[os.path.relpath(path, directory)] = f.read()
+    return outputs
+
+
+def check_outputs(expected, actual):
+    """Assert two runs wrote the same files, byte for byte"""
+    assert sorted(actual) == sorted(expected), sorted(set(expected) ^ set(actual))
+    different = [name for name, content in expected.items() if actual[name] != content]
+    assert not different, f"files differ: {sorted(different)}"
+    print(f"outputs ok: byte-identical files={len(expected)}")
+
+
+def _count(data):
+    return len(data) if isinstance(data, pd.DataFrame) else sum(len(df) for df in data.values())
+
+
+def benchmark(n_symbols, workers, seed=0, quiet=True):
+    root = tempfile.mkdtemp(prefix='corporate_actions_benchmark_')
+    try:
+        configure_environment(root)
+
+        from source.actions.master_symbols_benchmark import make_master_file
+        from source.config import config
+        from source.pipeline import run_pipeline
+
+        config.ensure_directories()
+        for directory in (config.master_files_dir, config.master_files_prv_dir):
+            make_master_file(directory, n_symbols, seed)
+        # make_master_file names symbols S0..Sn, which is also the provider universe
+        symbols = np.char.add('S', np.arange(n_symbols).astype(str))
+        provider_data = make_provider_data(symbols, seed)
+
+        print(f"symbols={n_symbols:,} " + " ".join(f"{name}={_count(data):,}" for name, data in provider_data.items()))
+
+        results, outputs = {}, {}
+        for label, options in (('serial', {'serial': True}), (f"parallel ({workers} workers)", {'workers': workers})):
+            stdout = sys.stdout
+            if quiet:
+                sys.stdout = open(os.devnull, 'w')
+            try:
+                results[label] = run_pipeline(provider_data=provider_data, **options)
+            finally:
+                if quiet:
+                    sys.stdout.close()
+                    sys.stdout = stdout
+            # Start each run from an empty output tree so a file only one run writes is caught
+            outputs[label] = read_outputs(config.corporate_actions_dir)
+            shutil.rmtree(config.corporate_actions_dir)
+            config.ensure_directories()
+
+        check_outputs(*outputs.values())
+
+        names = [name for name in results['serial'] if name != 'total']
+        print(f"\n{'node':<26}" + "".join(f"{label:>24}" for label in results))
+        for name in names:
+            print(f"{name:<26}" + "".join(f"{timings.get(name, 0):>23.2f}s" for timings in results.values()))
+        print(f"{'wall clock':<26}" + "".join(f"{timings['total']:>23.2f}s" for timings in results.values()))
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the corporate actions pipeline runner")
+    parser.add_argument('--symbols', type=int, default=12000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--verbose', action='store_true', help="show the action modules' own output")
+    args = parser.parse_args()
+
+    benchmark(args.symbols, args.workers, args.seed, quiet=not args.verbose)
@@ -4,6 +4,7 @@ Enhanced Corporate Actions Validator with portfolio impact checking
 """
 
 import os
+import numpy as np
 import pandas as pd
 import logging
 from pathlib import Path
@@ -47,6 +48,9 @@ class CorporateActionsValidator:
         # Load unified corporate actions
         self.load_unified_corporate_actions()
 
+        # (frame name, key column) -> (frame, index of first-occurrence keys, their row positions)
+        self._reference_indexes = {}
+
         # Validation results
         self.validation_results: List[ValidationResult] = []
         self.portfolio_impacted_results: List[ValidationResult] = []
@@ -115,260 +119,239 @@ class CorporateActionsValidator:
             else:
                 self.logger.warning(f"Unified file not found: {file_path}")
 
+    # Rules tried in order for each entry: (reference frame, column matched against the entry symbol, result builder).
+    # The first rule with a match explains the entry, using the first matching reference row.
+    NEW_ENTRY_RULES = [
+        ('symbol_changes_df', 'new_symbol', '_symbol_change_new_result'),
+        ('ipos_df', 'master_symbol', '_ipo_result'),
+        ('spinoffs_df', 'spinoff_symbol', '_spinoff_new_result'),
+    ]
+    MISSING_ENTRY_RULES = [
+        ('symbol_changes_df', 'old_symbol', '_symbol_change_missing_result'),
+        ('delistings_df', 'master_symbol', '_delisting_result'),
+        ('mergers_df', 'acquiree_symbol', '_merger_missing_result'),
+    ]
+
     def validate_new_entries(self) -> List[ValidationResult]:
         """Validate new entries against corporate actions with legitimacy checks"""
-        results = []
-
         self.logger.info(f"Validating {len(self.new_entries_df)} new entries...")
-
-        for _, row in self.new_entries_df.iterrows():
-            symbol = row.get('symbol', '')
-            type_val = row.get('type', '')
-            al_symbol = row.get('al_symbol', '')
-            composite_key = row.get('composite_key', '')
-
-            # Check for symbol changes (new symbol appearing)
-            symbol_change_explanation = self.check_for_symbol_change_new(symbol, row)
-            if symbol_change_explanation:
-                # Apply legitimacy check
-                symbol_change_explanation = self.legitimacy_checker.apply_legitimacy_check(symbol_change_explanation)
-                results.append(symbol_change_explanation)
-                continue
-
-            # Check for IPOs
-            ipo_explanation = self.check_for_ipo(symbol, row)
-            if ipo_explanation:
-                # Apply legitimacy check
-                ipo_explanation = self.legitimacy_checker.apply_legitimacy_check(ipo_explanation)
-                results.append(ipo_explanation)
-                continue
-
-            # Check for spinoffs (new symbol from spinoff)
-            spinoff_explanation = self.check_for_spinoff_new(symbol, row)
-            if spinoff_explanation:
-                # Apply legitimacy check
-                spinoff_explanation = self.legitimacy_checker.apply_legitimacy_check(spinoff_explanation)
-                results.append(spinoff_explanation)
-                continue
-
-            # If no explanation found
-            unexplained_result = ValidationResult(
-                symbol=symbol,
-                type=type_val,
-                al_symbol=al_symbol,
-                composite_key=composite_key,
-                change_type='NEW_ENTRY',
-                explanation='No corporate action found to explain new entry',
-                explained=False,
-                confidence=0.0,
-                legitimacy_passed=True  # No corporate action to validate
-            )
-            results.append(unexplained_result)
-
-        return results
+        return self._validate_entries(self.new_entries_df, 'NEW_ENTRY', self.NEW_ENTRY_RULES,
+                                      'No corporate action found to explain new entry')
 
     def validate_missing_entries(self) -> List[ValidationResult]:
         """Validate missing entries against corporate actions with legitimacy checks"""
-        results = []
-
         self.logger.info(f"Validating {len(self.missing_entries_df)} missing entries...")
+        return self._validate_entries(self.missing_entries_df, 'MISSING_ENTRY', self.MISSING_ENTRY_RULES,
+                                      'No corporate action found to explain missing entry')
+
+    def _validate_entries(self, entries_df: pd.DataFrame, change_type: str, rules: list,
+                          unexplained_explanation: str) -> List[ValidationResult]:
+        """Explain every entry with one keyed join per rule, then run legitimacy checks on all explained results"""
+        def column(name):
+            if name in entries_df.columns:
+                return entries_df[name].to_numpy(dtype=object)
+            return np.full(len(entries_df), '', dtype=object)
+
+        symbols, types, al_symbols, composite_keys = (column(name) for name in
+                                                       ('symbol', 'type', 'al_symbol', 'composite_key'))
+
+        # Rule and reference row explaining each entry (-1: none)
+        matched_rule = np.full(len(entries_df), -1)
+        matched_row = np.full(len(entries_df), -1)
+        for rule, (frame_name, key_column, _) in enumerate(rules):
+            positions = self._first_match_positions(frame_name, key_column, symbols)
+            take = (matched_rule < 0) & (positions >= 0)
+            matched_rule[take] = rule
+            matched_row[take] = positions[take]
+
+        # Matched reference rows as dicts, converted once per distinct row
+        actions = {}
+        for rule, (frame_name, _, _) in enumerate(rules):
+            rows = np.unique(matched_row[matched_rule == rule])
+            if len(rows):
+                records = getattr(self, frame_name).iloc[rows].to_dict('records')
+                actions[rule] = dict(zip(rows.tolist(), records))
+
+        builders = [getattr(self, builder) for _, _, builder in rules]
+        results, explained_results = [], []
+        for i in range(len(entries_df)):
+            row = {'type': types[i], 'al_symbol': al_symbols[i], 'composite_key': composite_keys[i]}
+            rule = matched_rule[i]
+            if rule >= 0:
+                result = builders[rule](symbols[i], row, dict(actions[rule][matched_row[i]]))
+                explained_results.append(result)
+            else:
+                result = ValidationResult(
+                    symbol=symbols[i],
+                    type=types[i],
+                    al_symbol=al_symbols[i],
+                    composite_key=composite_keys[i],
+                    change_type=change_type,
+                    explanation=unexplained_explanation,
+                    explained=False,
+                    confidence=0.0,
+                    legitimacy_passed=True  # No corporate action to validate
+                )
+            results.append(result)
 
-        for _, row in self.missing_entries_df.iterrows():
-            symbol = row.get('symbol', '')
-            type_val = row.get('type', '')
-            al_symbol = row.get('al_symbol', '')
-            composite_key = row.get('composite_key', '')
-
-            # Check for symbol changes (old symbol disappearing)
-            symbol_change_explanation = self.check_for_symbol_change_missing(symbol, row)
-            if symbol_change_explanation:
-                # Apply legitimacy check
-                symbol_change_explanation = self.legitimacy_checker.apply_legitimacy_check(symbol_change_explanation)
-                results.append(symbol_change_explanation)
-                continue
-
-            # Check for delistings
-            delisting_explanation = self.check_for_delisting(symbol, row)
-            if delisting_explanation:
-                # Apply legitimacy check
-                delisting_explanation = self.legitimacy_checker.apply_legitimacy_check(delisting_explanation)
-                results.append(delisting_explanation)
-                continue
-
-            # Check for mergers (target company)
-            merger_explanation = self.check_for_merger_missing(symbol, row)
-            if merger_explanation:
-                # Apply legitimacy check
-                merger_explanation = self.legitimacy_checker.apply_legitimacy_check(merger_explanation)
-                results.append(merger_explanation)
-                continue
-
-            # If no explanation found
-            unexplained_result = ValidationResult(
-                symbol=symbol,
-                type=type_val,
-                al_symbol=al_symbol,
-                composite_key=composite_key,
-                change_type='MISSING_ENTRY',
-                explanation='No corporate action found to explain missing entry',
-                explained=False,
-                confidence=0.0,
-                legitimacy_passed=True  # No corporate action to validate
-            )
-            results.append(unexplained_result)
-
+        self.legitimacy_checker.apply_legitimacy_checks(explained_results)
         return results
 
-    # ... (keep all the existing check methods: check_for_ipo, check_for_symbol_change_new, etc.)
+    def _first_match_positions(self, frame_name: str, key_column: str, symbols) -> np.ndarray:
+        """Row position of the first reference row whose key equals each symbol (-1 where none)"""
+        reference = getattr(self, frame_name)
+        if reference.empty:
+            return np.full(len(symbols), -1)
+
+        cache_key = (frame_name, key_column)
+        cached = self._reference_indexes.get(cache_key)
+        if cached is None or cached[0] is not reference:
+            keys = reference[key_column]
+            first = ~keys.duplicated(keep='first').to_numpy()
+            cached = (reference, pd.Index(keys.to_numpy()[first]), np.flatnonzero(first))
+            self._reference_indexes[cache_key] = cached
+
+        _, index, rows = cached
+        found = index.get_indexer(pd.Index(symbols, dtype=object))
+        return np.where(found >= 0, rows[found], -1)
+
+    def _first_match(self, frame_name: str, key_column: str, symbol: str):
+        """First reference row (as a dict) whose key equals symbol, or None"""
+        position = self._first_match_positions(frame_name, key_column, [symbol])[0]
+        if position < 0:
+            return None
+        return getattr(self, frame_name).iloc[position].to_dict()
 
     def check_for_ipo(self, symbol: str, row: pd.Series) -> ValidationResult:
         """Check if new entry can be explained by an IPO"""
-        if not self.ipos_df.empty:
-            ipo_matches = self.ipos_df[self.ipos_df['master_symbol'] == symbol]
-
-            if not ipo_matches.empty:
-                ipo_action = ipo_matches.iloc[0]
-                return ValidationResult(
-                    symbol=symbol,
-                    type=row.get('type', ''),
-                    al_symbol=row.get('al_symbol', ''),
-                    composite_key=row.get('composite_key', ''),
-                    change_type='NEW_ENTRY',
-                    explanation=f'IPO detected: {symbol} went public',
-                    explained=True,
-                    corporate_action_type='IPO',
-                    corporate_action_date=ipo_action.get('list_date', ''),
-                    confidence=float(ipo_action.get('overall_confidence', 0.8)),
-                    details={'source': ipo_action.get('source'), 'ipo_data': ipo_action.to_dict()}
-                )
-
-        return None
+        ipo_action = self._first_match('ipos_df', 'master_symbol', symbol)
+        return self._ipo_result(symbol, row, ipo_action) if ipo_action is not None else None
 
     def check_for_symbol_change_new(self, symbol: str, row: pd.Series) -> ValidationResult:
         """Check if new entry can be explained by a symbol change"""
-        if not self.symbol_changes_df.empty:
-            # Look for symbol changes where this is the new symbol
-            symbol_changes = self.symbol_changes_df[self.symbol_changes_df['new_symbol'] == symbol]
-
-            if not symbol_changes.empty:
-                change_action = symbol_changes.iloc[0]
-                return ValidationResult(
-                    symbol=symbol,
-                    type=row.get('type', ''),
-                    al_symbol=row.get('al_symbol', ''),
-                    composite_key=row.get('composite_key', ''),
-                    change_type='NEW_ENTRY',
-                    explanation=f'Symbol change detected: {change_action.get("old_symbol", "unknown")} changed to {symbol}',
-                    explained=True,
-                    corporate_action_type='SYMBOL_CHANGE',
-                    corporate_action_date=change_action.get('change_date', ''),
-                    confidence=float(change_action.get('overall_confidence', 0.9)),
-                    details={'source': change_action.get('source'), 'old_symbol': change_action.get('old_symbol'),
-                             'new_symbol': symbol, 'action_data': change_action.to_dict()}
-                )
-
-        return None
+        # Look for symbol changes where this is the new symbol
+        change_action = self._first_match('symbol_changes_df', 'new_symbol', symbol)
+        return self._symbol_change_new_result(symbol, row, change_action) if change_action is not None else None
 
     def check_for_spinoff_new(self, symbol: str, row: pd.Series) -> ValidationResult:
         """Check if new entry can be explained by a spinoff"""
-        if not self.spinoffs_df.empty:
-            # Look for spinoffs where this symbol is the spun-off company
-            spinoff_matches = self.spinoffs_df[self.spinoffs_df['spinoff_symbol'] == symbol]
-
-            if not spinoff_matches.empty:
-                spinoff_action = spinoff_matches.iloc[0]
-                return ValidationResult(
-                    symbol=symbol,
-                    type=row.get('type', ''),
-                    al_symbol=row.get('al_symbol', ''),
-                    composite_key=row.get('composite_key', ''),
-                    change_type='NEW_ENTRY',
-                    explanation=f'Spinoff detected: {symbol} spun off from {spinoff_action.get("master_symbol", "unknown")}',
-                    explained=True,
-                    corporate_action_type='SPINOFF',
-                    corporate_action_date=spinoff_action.get('ex_date', ''),
-                    confidence=float(spinoff_action.get('overall_confidence', 0.85)),
-                    details={'source': spinoff_action.get('source'),
-                             'parent_company': spinoff_action.get('master_symbol'),
-                             'action_data': spinoff_action.to_dict()}
-                )
-
-        return None
+        # Look for spinoffs where this symbol is the spun-off company
+        spinoff_action = self._first_match('spinoffs_df', 'spinoff_symbol', symbol)
+        return self._spinoff_new_result(symbol, row, spinoff_action) if spinoff_action is not None else None
 
     def check_for_delisting(self, symbol: str, row: pd.Series) -> ValidationResult:
         """Check if missing entry can be explained by a delisting"""
-        if not self.delistings_df.empty:
-            delisting_matches = self.delistings_df[self.delistings_df['master_symbol'] == symbol]
-
-            if not delisting_matches.empty:
-                delisting_action = delisting_matches.iloc[0]
-                return ValidationResult(
-                    symbol=symbol,
-                    type=row.get('type', ''),
-                    al_symbol=row.get('al_symbol', ''),
-                    composite_key=row.get('composite_key', ''),
-                    change_type='MISSING_ENTRY',
-                    explanation=f'Delisting detected: {symbol} - {delisting_action.get("delisting_reason", "delisted")}',
-                    explained=True,
-                    corporate_action_type='DELISTING',
-                    corporate_action_date=delisting_action.get('delisting_date', ''),
-                    confidence=float(delisting_action.get('overall_confidence', 0.9)),
-                    details={'source': delisting_action.get('source'),
-                             'delisting_reason': delisting_action.get('delisting_reason'),
-                             'action_data': delisting_action.to_dict()}
-                )
-
-        return None
+        delisting_action = self._first_match('delistings_df', 'master_symbol', symbol)
+        return self._delisting_result(symbol, row, delisting_action) if delisting_action is not None else None
 
     def check_for_merger_missing(self, symbol: str, row: pd.Series) -> ValidationResult:
         """Check if missing entry can be explained by a merger (target company)"""
-        if not self.mergers_df.empty:
-            # Look for mergers where this symbol is the target (acquiree)
-            merger_matches = self.mergers_df[self.mergers_df['acquiree_symbol'] == symbol]
-
-            if not merger_matches.empty:
-                merger_action = merger_matches.iloc[0]
-                return ValidationResult(
-                    symbol=symbol,
-                    type=row.get('type', ''),
-                    al_symbol=row.get('al_symbol', ''),
-                    composite_key=row.get('composite_key', ''),
-                    change_type='MISSING_ENTRY',
-                    explanation=f'Merger detected: {symbol} was acquired by {merger_action.get("acquirer_symbol", "unknown")}',
-                    explained=True,
-                    corporate_action_type='MERGER',
-                    corporate_action_date=merger_action.get('ex_date', ''),
-                    confidence=float(merger_action.get('overall_confidence', 0.9)),
-                    details={'source': merger_action.get('source'), 'acquirer': merger_action.get('acquirer_symbol'),
-                             'action_data': merger_action.to_dict()}
-                )
-
-        return None
+        # Look for mergers where this symbol is the target (acquiree)
+        merger_action = self._first_match('mergers_df', 'acquiree_symbol', symbol)
+        return self._merger_missing_result(symbol, row, merger_action) if merger_action is not None else None
 
     def check_for_symbol_change_missing(self, symbol: str, row: pd.Series) -> ValidationResult:
         """Check if missing entry can be explained by a symbol change"""
-        if not self.symbol_changes_df.empty:
-            # Look for symbol changes where this is the old symbol
-            symbol_changes = self.symbol_changes_df[self.symbol_changes_df['old_symbol'] == symbol]
-
-            if not symbol_changes.empty:
-                change_action = symbol_changes.iloc[0]
-                return ValidationResult(
-                    symbol=symbol,
-                    type=row.get('type', ''),
-                    al_symbol=row.get('al_symbol', ''),
-                    composite_key=row.get('composite_key', ''),
-                    change_type='MISSING_ENTRY',
-                    explanation=f'Symbol change detected: {symbol} changed to {change_action.get("new_symbol", "unknown")}',
-                    explained=True,
-                    corporate_action_type='SYMBOL_CHANGE',
-                    corporate_action_date=change_action.get('change_date', ''),
-                    confidence=float(change_action.get('overall_confidence', 0.9)),
-                    details={'source': change_action.get('source'), 'new_symbol': change_action.get('new_symbol'),
-                             'old_symbol': symbol, 'action_data': change_action.to_dict()}
-                )
+        # Look for symbol changes where this is the old symbol
+        change_action = self._first_match('symbol_changes_df', 'old_symbol', symbol)
+        return self._symbol_change_missing_result(symbol, row, change_action) if change_action is not None else None
+
+    def _ipo_result(self, symbol: str, row, ipo_action: dict) -> ValidationResult:
+        return ValidationResult(
+            symbol=symbol,
+            type=row.get('type', ''),
+            al_symbol=row.get('al_symbol', ''),
+            composite_key=row.get('composite_key', ''),
+            change_type='NEW_ENTRY',
+            explanation=f'IPO detected: {symbol} went public',
+            explained=True,
+            corporate_action_type='IPO',
+            corporate_action_date=ipo_action.get('list_date', ''),
+            confidence=float(ipo_action.get('overall_confidence', 0.8)),
+            details={'source': ipo_action.get('source'), 'ipo_data': ipo_action}
+        )
+
+    def _symbol_change_new_result(self, symbol: str, row, change_action: dict) -> ValidationResult:
+        return ValidationResult(
+            symbol=symbol,
+            type=row.get('type', ''),
+            al_symbol=row.get('al_symbol', ''),
+            composite_key=row.get('composite_key', ''),
+            change_type='NEW_ENTRY',
+            explanation=f'Symbol change detected: {change_action.get("old_symbol", "unknown")} changed to {symbol}',
+            explained=True,
+            corporate_action_type='SYMBOL_CHANGE',
+            corporate_action_date=change_action.get('change_date', ''),
+            confidence=float(change_action.get('overall_confidence', 0.9)),
+            details={'source': change_action.get('source'), 'old_symbol': change_action.get('old_symbol'),
+                     'new_symbol': symbol, 'action_data': change_action}
+        )
+
+    def _spinoff_new_result(self, symbol: str, row, spinoff_action: dict) -> ValidationResult:
+        return ValidationResult(
+            symbol=symbol,
+            type=row.get('type', ''),
+            al_symbol=row.get('al_symbol', ''),
+            composite_key=row.get('composite_key', ''),
+            change_type='NEW_ENTRY',
+            explanation=f'Spinoff detected: {symbol} spun off from {spinoff_action.get("master_symbol", "unknown")}',
+            explained=True,
+            corporate_action_type='SPINOFF',
+            corporate_action_date=spinoff_action.get('ex_date', ''),
+            confidence=float(spinoff_action.get('overall_confidence', 0.85)),
+            details={'source': spinoff_action.get('source'),
+                     'parent_company': spinoff_action.get('master_symbol'),
+                     'action_data': spinoff_action}
+        )
+
+    def _delisting_result(self, symbol: str, row, delisting_action: dict) -> ValidationResult:
+        return ValidationResult(
+            symbol=symbol,
+            type=row.get('type', ''),
+            al_symbol=row.get('al_symbol', ''),
+            composite_key=row.get('composite_key', ''),
+            change_type='MISSING_ENTRY',
+            explanation=f'Delisting detected: {symbol} - {delisting_action.get("delisting_reason", "delisted")}',
+            explained=True,
+            corporate_action_type='DELISTING',
+            corporate_action_date=delisting_action.get('delisting_date', ''),
+            confidence=float(delisting_action.get('overall_confidence', 0.9)),
+            details={'source': delisting_action.get('source'),
+                     'delisting_reason': delisting_action.get('delisting_reason'),
+                     'action_data': delisting_action}
+        )
+
+    def _merger_missing_result(self, symbol: str, row, merger_action: dict) -> ValidationResult:
+        return ValidationResult(
+            symbol=symbol,
+            type=row.get('type', ''),
+            al_symbol=row.get('al_symbol', ''),
+            composite_key=row.get('composite_key', ''),
+            change_type='MISSING_ENTRY',
+            explanation=f'Merger detected: {symbol} was acquired by {merger_action.get("acquirer_symbol", "unknown")}',
+            explained=True,
+            corporate_action_type='MERGER',
+            corporate_action_date=merger_action.get('ex_date', ''),
+            confidence=float(merger_action.get('overall_confidence', 0.9)),
+            details={'source': merger_action.get('source'), 'acquirer': merger_action.get('acquirer_symbol'),
+                     'action_data': merger_action}
+        )
 
-        return None
+    def _symbol_change_missing_result(self, symbol: str, row, change_action: dict) -> ValidationResult:
+        return ValidationResult(
+            symbol=symbol,
+            type=row.get('type', ''),
+            al_symbol=row.get('al_symbol', ''),
+            composite_key=row.get('composite_key', ''),
+            change_type='MISSING_ENTRY',
+            explanation=f'Symbol change detected: {symbol} changed to {change_action.get("new_symbol", "unknown")}',
+            explained=True,
+            corporate_action_type='SYMBOL_CHANGE',
+            corporate_action_date=change_action.get('change_date', ''),
+            confidence=float(change_action.get('overall_confidence', 0.9)),
+            details={'source': change_action.get('source'), 'new_symbol': change_action.get('new_symbol'),
+                     'old_symbol': symbol, 'action_data': change_action}
+        )
 
     def run_validation(self) -> tuple[List[ValidationResult], List[ValidationResult]]:
         """Run complete validation process with enhanced priority assignment"""
@@ -4,7 +4,8 @@ Legitimacy checker for corporate actions validation
 """
 
 import logging
-from typing import Tuple
+from typing import List, Tuple
+import numpy as np
 from master_loader import MasterFileLoader
 from validation_result import ValidationResult
 
@@ -146,4 +147,104 @@ class LegitimacyChecker:
         validation_result.legitimacy_passed = legitimacy_passed
         validation_result.legitimacy_issues = legitimacy_issues if not legitimacy_passed else None
 
-        return validation_result
\ No newline at end of file
+        return validation_result
+
+    def apply_legitimacy_checks(self, validation_results: List[ValidationResult]) -> List[ValidationResult]:
+        """
+        apply_legitimacy_check for many results at once: each rule runs as one membership lookup
+        against the master symbol indexes over all results of that corporate action type
+        """
+        if not validation_results:
+            return validation_results
+
+        symbols = np.array([r.symbol for r in validation_results], dtype=object)
+        action_types = np.array([r.corporate_action_type if r.explained else None for r in validation_results],
+                                dtype=object)
+        new_entry = np.array([r.change_type == "NEW_ENTRY" for r in validation_results], dtype=bool)
+        details = [r.details or {} for r in validation_results]
+
+        passed = np.ones(len(validation_results), dtype=bool)  # unexplained and unknown types pass
+        issues = np.full(len(validation_results), None, dtype=object)
+
+        def detail(rows, name):
+            return np.array([details[i].get(name, '') for i in rows], dtype=object)
+
+        def fail(rows, failed, message):
+            # message(j) builds the issue text for rows[j]; only called for failing rows
+            failing = np.flatnonzero(failed)
+            passed[rows[failing]] = False
+            for j in failing:
+                issues[rows[j]] = message(j)
+
+        rules = {
+            "SPINOFF": self._check_spinoffs,
+            "SYMBOL_CHANGE": self._check_symbol_changes,
+            "MERGER": self._check_mergers,
+            "IPO": self._check_ipos,
+            "DELISTING": self._check_delistings,
+        }
+        for action_type, rule in rules.items():
+            rows = np.flatnonzero(action_types == action_type)
+            if not len(rows):
+                continue
+            try:
+                rule(rows, symbols[rows], new_entry[rows], detail, fail)
+            except Exception as e:
+                for i in rows:
+                    self.logger.error(f"Error during legitimacy check for {symbols[i]}: {e}")
+                passed[rows] = False
+                issues[rows] = f"Error during legitimacy check: {str(e)}"
+            self.logger.info(f"{action_type} legitimacy checks: {int(passed[rows].sum())}/{len(rows)} passed")
+
+        for result, result_passed, result_issues in zip(validation_results, passed, issues):
+            if not result.explained:
+                result.legitimacy_passed = True
+                continue
+            result.legitimacy_passed = bool(result_passed)
+            result.legitimacy_issues = result_issues if not result_passed else None
+
+        return validation_results
+
+    def _check_spinoffs(self, rows, symbols, new_entry, detail, fail):
+        parents = detail(rows, 'parent_company')
+        has_parent = np.array([bool(parent) for parent in parents], dtype=bool)
+        fail(rows, ~has_parent, lambda j: "No parent symbol provided for spinoff")
+        existed = np.ones(len(rows), dtype=bool)
+        existed[has_parent] = self.master_loader.symbols_existed_previous_day(parents[has_parent])
+        fail(rows, ~existed, lambda j: f"Parent symbol '{parents[j]}' did not exist in previous day's master list")
+
+    def _check_symbol_changes(self, rows, symbols, new_entry, detail, fail):
+        # New entries check the old symbol from the action; missing entries are the old symbol
+        old_symbols = np.where(new_entry, detail(rows, 'old_symbol'), symbols)
+        existed = self.master_loader.symbols_existed_previous_day(old_symbols)
+
+        def message(j):
+            if new_entry[j]:
+                return (f"Old symbol '{old_symbols[j]}' did not exist in previous day's master list "
+                        f"for symbol change to '{symbols[j]}'")
+            return f"Symbol '{old_symbols[j]}' did not exist in previous day's master list for symbol change"
+
+        fail(rows, ~existed, message)
+
+    def _check_mergers(self, rows, symbols, new_entry, detail, fail):
+        acquirers = detail(rows, 'acquirer')
+        acquiree_existed = self.master_loader.symbols_existed_previous_day(symbols)
+        acquirer_exists = self.master_loader.symbols_exist_current_day(acquirers)
+
+        def message(j):
+            merger_issues = []
+            if not acquiree_existed[j]:
+                merger_issues.append(f"Acquiree symbol '{symbols[j]}' did not exist in previous day's master list")
+            if not acquirer_exists[j]:
+                merger_issues.append(f"Acquirer symbol '{acquirers[j]}' does not exist in current day's master list")
+            return "; ".join(merger_issues)
+
+        fail(rows, ~(acquiree_existed & acquirer_exists), message)
+
+    def _check_ipos(self, rows, symbols, new_entry, detail, fail):
+        existed = self.master_loader.symbols_existed_previous_day(symbols)
+        fail(rows, existed, lambda j: f"IPO symbol '{symbols[j]}' already existed in previous day's master list")
+
+    def _check_delistings(self, rows, symbols, new_entry, detail, fail):
+        existed = self.master_loader.symbols_existed_previous_day(symbols)
+        fail(rows, ~existed, lambda j: f"Delisted symbol '{symbols[j]}' did not exist in previous day's master list")
@@ -3,9 +3,11 @@
 Master file loader for validation legitimacy checks
 """
 
+import numpy as np
 import pandas as pd
 import logging
 from pathlib import Path
+from typing import Iterable
 from config import config
 
 
@@ -16,6 +18,8 @@ class MasterFileLoader:
         self.logger = logging.getLogger(__name__)
         self.prev_master_df = pd.DataFrame()
         self.current_master_df = pd.DataFrame()
+        # id(frame) -> hash index of its symbols, rebuilt if a frame is replaced
+        self._symbol_indexes = {}
         self.load_master_files()
 
     def load_master_files(self):
@@ -42,17 +46,39 @@ class MasterFileLoader:
             self.logger.error(f"Error loading {description} from {file_path}: {e}")
             return pd.DataFrame()
 
+    def _symbol_index(self, master_df: pd.DataFrame) -> pd.Index:
+        """Unique symbols of a master frame as a hash index (built once per frame)"""
+        cached = self._symbol_indexes.get(id(master_df))
+        if cached is None or cached[0] is not master_df:
+            cached = (master_df, pd.Index(master_df['symbol'].unique()))
+            self._symbol_indexes[id(master_df)] = cached
+        return cached[1]
+
+    def _symbols_in(self, master_df: pd.DataFrame, symbols: Iterable) -> np.ndarray:
+        symbols = list(symbols)
+        if master_df.empty:
+            return np.zeros(len(symbols), dtype=bool)
+        return pd.Series(symbols, dtype=object).isin(self._symbol_index(master_df)).to_numpy()
+
     def symbol_existed_previous_day(self, symbol: str) -> bool:
         """Check if symbol existed in previous day's master file"""
         if self.prev_master_df.empty:
             return False
-        return symbol in self.prev_master_df['symbol'].values
+        return symbol in self._symbol_index(self.prev_master_df)
 
     def symbol_exists_current_day(self, symbol: str) -> bool:
         """Check if symbol exists in current day's master file"""
         if self.current_master_df.empty:
             return False
-        return symbol in self.current_master_df['symbol'].values
+        return symbol in self._symbol_index(self.current_master_df)
+
+    def symbols_existed_previous_day(self, symbols: Iterable) -> np.ndarray:
+        """Vectorized symbol_existed_previous_day: one boolean per symbol"""
+        return self._symbols_in(self.prev_master_df, symbols)
+
+    def symbols_exist_current_day(self, symbols: Iterable) -> np.ndarray:
+        """Vectorized symbol_exists_current_day: one boolean per symbol"""
+        return self._symbols_in(self.current_master_df, symbols)
 
     def get_symbol_info_previous_day(self, symbol: str) -> pd.Series:
         """Get symbol information from previous day's master file"""
@@ -5,6 +5,7 @@ Enhanced priority assignment for corporate actions validation
 
 import logging
 from typing import List
+import numpy as np
 from validation_result import ValidationResult
 
 
@@ -24,25 +25,42 @@ class PriorityAssigner:
         LOW: No price data and unexplained (low operational impact)
         """
 
-        for result in validation_results:
-            # Start with base priority
-            result.priority_for_review = self._calculate_base_priority(result)
-
-            # Portfolio holdings override everything else
-            if result.portfolio_holding:
-                result.priority_for_review = "ULTRA_HIGH"
-                result.portfolio_impact_reason = self._determine_portfolio_impact_reason(result)
-
-                self.logger.critical(
-                    f"PORTFOLIO IMPACT: {result.symbol} ({result.change_type}) - "
-                    f"{result.portfolio_impact_reason}"
-                )
-
-            # Log high-priority non-portfolio items
-            elif result.priority_for_review == "HIGH":
-                self.logger.warning(
-                    f"HIGH PRIORITY: {result.symbol} - Unexplained with price data"
-                )
+        if not validation_results:
+            return validation_results
+
+        explained = np.array([r.explained for r in validation_results], dtype=bool)
+        legitimate = np.array([r.legitimacy_passed for r in validation_results], dtype=bool)
+        has_price_data = np.array([r.has_price_data for r in validation_results], dtype=bool)
+        portfolio = np.array([r.portfolio_holding for r in validation_results], dtype=bool)
+
+        # Same rules as _calculate_base_priority, on whole columns
+        base_priority = np.select(
+            [explained & legitimate, explained & ~legitimate, ~explained & has_price_data],
+            ["EXPLAINED", "MEDIUM", "HIGH"],
+            default="LOW"
+        ).astype(object)
+
+        for result, priority in zip(validation_results, base_priority):
+            result.priority_for_review = priority
+
+        # Portfolio holdings override everything else
+        for i in np.flatnonzero(portfolio):
+            result = validation_results[i]
+            result.priority_for_review = "ULTRA_HIGH"
+            result.portfolio_impact_reason = self._determine_portfolio_impact_reason(result)
+
+            self.logger.critical(
+                f"PORTFOLIO IMPACT: {result.symbol} ({result.change_type}) - "
+                f"{result.portfolio_impact_reason}"
+            )
+
+        # Log high-priority non-portfolio items
+        high_priority = np.flatnonzero(~portfolio & (base_priority == "HIGH"))
+        if len(high_priority):
+            self.logger.warning(f"HIGH PRIORITY: {len(high_priority)} symbols unexplained with price data")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                for i in high_priority:
+                    self.logger.debug(f"HIGH PRIORITY: {validation_results[i].symbol} - Unexplained with price data")
 
         return validation_results
 
@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+Parity check and scaling benchmark for corporate actions validation.
+
+    python validation_benchmark.py --check-rows 5000 --sizes 10000 100000 1000000
+
+Writes synthetic new/missing entries, unified corporate actions and master files into a temporary
+directory laid out the way config expects, then runs the validator. The parity check replays the
+original row-by-row validation (boolean-mask lookups, per-result legitimacy checks and per-result
+priorities) and asserts every ValidationResult matches field for field, so the exported files match too.
+The row-by-row path is only timed up to --legacy-rows.
+"""
+
+import argparse
+import logging
+import os
+import random
+import tempfile
+import time
+from dataclasses import asdict
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+ROOT = tempfile.mkdtemp(prefix='validation_benchmark_')
+YMD = datetime.strftime(datetime.today(), "%Y%m%d")
+PREV_YMD = datetime.strftime(datetime.today() - timedelta(days=1), "%Y%m%d")
+DIFF_DIR = os.path.join(ROOT, 'master', YMD, 'diff')
+CA_DATA_DIR = os.path.join(ROOT, 'corporate_actions', YMD, 'data')
+NEW_ENTRIES_FILE = os.path.join(DIFF_DIR, 'new_entries.csv')
+MISSING_ENTRIES_FILE = os.path.join(DIFF_DIR, 'missing_entries.csv')
+PREV_MASTER_FILE = os.path.join(ROOT, 'master', PREV_YMD, 'master_symbology_benchmark.csv')
+CURRENT_MASTER_FILE = os.path.join(ROOT, 'master', YMD, 'master_symbology_benchmark.csv')
+
+# config resolves its input files at import time, so the layout has to exist first
+for directory in (DIFF_DIR, CA_DATA_DIR, os.path.dirname(PREV_MASTER_FILE)):
+    os.makedirs(directory, exist_ok=True)
+for path in (NEW_ENTRIES_FILE, MISSING_ENTRIES_FILE, PREV_MASTER_FILE, CURRENT_MASTER_FILE):
+    open(path, 'a').close()
+os.environ.update({
+    'MASTER_FILES_DIR': os.path.join(ROOT, 'master'),
+    'CORPORATE_ACTIONS_DIR': os.path.join(ROOT, 'corporate_actions'),
+    'NEW_ENTRIES_FILE': os.path.basename(NEW_ENTRIES_FILE),
+    'MISSING_ENTRIES_FILE': os.path.basename(MISSING_ENTRIES_FILE),
+})
+
+from corporate_actions_validator import CorporateActionsValidator
+from master_loader import MasterFileLoader
+from priority_assigner import PriorityAssigner
+from validation_result import ValidationResult
+
+SOURCES = ['alpaca', 'fmp', 'poly', 'sharadar']
+
+
+def _write(df: pd.DataFrame, path: str):
+    df.to_csv(path, sep='|', index=False)
+
+
+def write_inputs(n_rows: int, seed: int = 0):
+    """
+    Synthetic inputs with n_rows entries split between new and missing entries, and about as many
+    unified corporate action rows. Reference symbols repeat (so first-match order matters), overlap
+    between action types (so rule order matters) and are only partly present in the master files.
+    """
+    rng = random.Random(seed)
+    universe = [f"S{i}" for i in range(max(10, n_rows))]
+
+    def symbol():
+        return rng.choice(universe)
+
+    def maybe_blank(value):
+        return '' if rng.random() < 0.03 else value
+
+    def date():
+        return (datetime(2024, 1, 1) + timedelta(days=rng.randrange(365))).strftime('%Y-%m-%d')
+
+    def confidence():
+        return f"{rng.uniform(0.5, 1.0):.4f}"
+
+    def entries(n):
+        return pd.DataFrame({
+            'symbol': [symbol() for _ in range(n)],
+            'type': [rng.choice(['CS', 'ETF', 'PFD']) for _ in range(n)],
+            'al_symbol': [rng.choice(['', 'X', ' ']) if rng.random() < 0.4 else f"A{i}" for i in range(n)],
+            'composite_key': [f"K{i}" for i in range(n)],
+        })
+
+    n_actions = max(1, n_rows // 5)
+    _write(entries(n_rows // 2), NEW_ENTRIES_FILE)
+    _write(entries(n_rows - n_rows // 2), MISSING_ENTRIES_FILE)
+    _write(pd.DataFrame({
+        'old_symbol': [maybe_blank(symbol()) for _ in range(n_actions)],
+        'new_symbol': [symbol() for _ in range(n_actions)],
+        'change_date': [date() for _ in range(n_actions)],
+        'source': [rng.choice(SOURCES) for _ in range(n_actions)],
+        'overall_confidence': [confidence() for _ in range(n_actions)],
+    }), os.path.join(CA_DATA_DIR, 'unified_symbol_changes.csv'))
+    _write(pd.DataFrame({
+        'master_symbol': [symbol() for _ in range(n_actions)],
+        'list_date': [date() for _ in range(n_actions)],
+        'source': [rng.choice(SOURCES) for _ in range(n_actions)],
+        'overall_confidence': [confidence() for _ in range(n_actions)],
+    }), os.path.join(CA_DATA_DIR, 'unified_ipos.csv'))
+    _write(pd.DataFrame({
+        'master_symbol': [maybe_blank(symbol()) for _ in range(n_actions)],
+        'spinoff_symbol': [symbol() for _ in range(n_actions)],
+        'ex_date': [date() for _ in range(n_actions)],
+        'source': [rng.choice(SOURCES) for _ in range(n_actions)],
+        'overall_confidence': [confidence() for _ in range(n_actions)],
+    }), os.path.join(CA_DATA_DIR, 'unified_spinoffs.csv'))
+    _write(pd.DataFrame({
+        'master_symbol': [symbol() for _ in range(n_actions)],
+        'delisting_date': [date() for _ in range(n_actions)],
+        'delisting_reason': [rng.choice(['', 'acquired', 'bankruptcy', 'voluntary']) for _ in range(n_actions)],
+        'source': [rng.choice(SOURCES) for _ in range(n_actions)],
+        'overall_confidence': [confidence() for _ in range(n_actions)],
+    }), os.path.join(CA_DATA_DIR, 'unified_delistings.csv'))
+    _write(pd.DataFrame({
+        'acquiree_symbol': [symbol() for _ in range(n_actions)],
+        'acquirer_symbol': [maybe_blank(symbol()) for _ in range(n_actions)],
+        'ex_date': [date() for _ in range(n_actions)],
+        'source': [rng.choice(SOURCES) for _ in range(n_actions)],
+        'overall_confidence': [confidence() for _ in range(n_actions)],
+    }), os.path.join(CA_DATA_DIR, 'unified_mergers.csv'))
+    _write(pd.DataFrame({'symbol': [s for s in universe if rng.random() < 0.6]}), PREV_MASTER_FILE)
+    _write(pd.DataFrame({'symbol': [s for s in universe if rng.random() < 0.6]}), CURRENT_MASTER_FILE)
+
+
+class LegacyMasterFileLoader(MasterFileLoader):
+    """Master lookups as a linear scan of the symbol column per call"""
+
+    def symbol_existed_previous_day(self, symbol: str) -> bool:
+        if self.prev_master_df.empty:
+            return False
+        return symbol in self.prev_master_df['symbol'].values
+
+    def symbol_exists_current_day(self, symbol: str) -> bool:
+        if self.current_master_df.empty:
+            return False
+        return symbol in self.current_master_df['symbol'].values
+
+
+class LegacyValidator(CorporateActionsValidator):
+    """The row-by-row validation flow: iterrows, a boolean mask per rule and per-result checks and priorities"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.legitimacy_checker.master_loader = LegacyMasterFileLoader()
+
+    def _mask_match(self, frame_name: str, key_column: str, symbol: str):
+        reference = getattr(self, frame_name)
+        if not reference.empty:
+            matches = reference[reference[key_column] == symbol]
+            if not matches.empty:
+                return matches.iloc[0].to_dict()
+        return None
+
+    def _validate_entries(self, entries_df, change_type, rules, unexplained_explanation):
+        results = []
+        for _, row in entries_df.iterrows():
+            symbol = row.get('symbol', '')
+            for frame_name, key_column, builder in rules:
+                action = self._mask_match(frame_name, key_column, symbol)
+                if action is not None:
+                    result = getattr(self, builder)(symbol, row, action)
+                    results.append(self.legitimacy_checker.apply_legitimacy_check(result))
+                    break
+            else:
+                results.append(ValidationResult(
+                    symbol=symbol,
+                    type=row.get('type', ''),
+                    al_symbol=row.get('al_symbol', ''),
+                    composite_key=row.get('composite_key', ''),
+                    change_type=change_type,
+                    explanation=unexplained_explanation,
+                    explained=False,
+                    confidence=0.0,
+                    legitimacy_passed=True
+                ))
+        return results
+
+    def run_validation(self):
+        new_results = self.validate_new_entries()
+        missing_results = self.validate_missing_entries()
+        self.validation_results = new_results + missing_results
+
+        assigner = PriorityAssigner()
+        for result in self.validation_results:
+            result.priority_for_review = assigner._calculate_base_priority(result)
+            if result.portfolio_holding:
+                result.priority_for_review = "ULTRA_HIGH"
+                result.portfolio_impact_reason = assigner._determine_portfolio_impact_reason(result)
+        return new_results, missing_results
+
+
+def _run(validator_class):
+    logging.disable(logging.NOTSET)
+    validator = validator_class()
+    # Validation logs per symbol in places; keep the timings about the work itself
+    logging.disable(logging.CRITICAL)
+    started = time.perf_counter()
+    validator.run_validation()
+    return validator.validation_results, time.perf_counter() - started
+
+
+def check_parity(n_rows: int, seed: int = 0):
+    """Assert the indexed validator reproduces the row-by-row results exactly"""
+    for trial in range(3):
+        write_inputs(n_rows, seed + trial)
+        expected, _ = _run(LegacyValidator)
+        actual, _ = _run(CorporateActionsValidator)
+        assert [asdict(r) for r in actual] == [asdict(r) for r in expected], f"trial {trial}"
+    explained = sum(r.explained for r in actual)
+    failed = sum(r.explained and not r.legitimacy_passed for r in actual)
+    print(f"parity ok: rows={n_rows:,} explained={explained:,} failed_legitimacy={failed:,}")
+
+
+def benchmark(sizes, legacy_rows: int, seed: int = 0):
+    print(f"\n{'rows':>10} {'explained':>10} {'row-by-row_s':>13} {'indexed_s':>10}")
+    for n_rows in sizes:
+        write_inputs(n_rows, seed)
+        results, indexed = _run(CorporateActionsValidator)
+
+        legacy = '-'
+        if n_rows <= legacy_rows:
+            _, seconds = _run(LegacyValidator)
+            legacy = f"{seconds:.3f}"
+        explained = sum(r.explained for r in results)
+        print(f"{n_rows:>10,} {explained:>10,} {legacy:>13} {indexed:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parity check and scaling benchmark for validation")
+    parser.add_argument('--check-rows', type=int, default=5000,
+                        help="entry rows for the row-by-row parity check (0 to skip)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--legacy-rows', type=int, default=10000,
+                        help="largest size the row-by-row flow is timed at")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.check_rows:
+        check_parity(args.check_rows, args.seed)
+    benchmark(args.sizes, args.legacy_rows, args.seed)
@@ -18,6 +18,8 @@ logger = logging.getLogger(__name__)
 class CashDividendsHandler:
     """Complete cash dividends handler - loading, portfolio actions, account actions"""
 
+    ACTION_TYPE = 'CASH_DIVIDEND'
+
     def __init__(self):
         self.actions: List[CashDividend] = []
 
@@ -120,6 +122,10 @@ class CashDividendsHandler:
             cash_adjustments=cash_adjustments
         )
 
+    def can_handle(self, action) -> bool:
+        """Check if this handler can process the given action"""
+        return getattr(action, 'action_type', None) == self.ACTION_TYPE
+
     def _is_payable_date(self, action: CashDividend, current_date: str) -> bool:
         """Check if current date is the payable date"""
         try:
@@ -18,6 +18,8 @@ logger = logging.getLogger(__name__)
 class DelistingsHandler:
     """Complete delistings handler - loading, portfolio actions, account actions"""
 
+    ACTION_TYPE = 'DELISTING'
+
     def __init__(self):
         self.actions: List[Delisting] = []
 
@@ -110,6 +112,10 @@ class DelistingsHandler:
             cash_adjustments=cash_adjustments
         )
 
+    def can_handle(self, action) -> bool:
+        """Check if this handler can process the given action"""
+        return getattr(action, 'action_type', None) == self.ACTION_TYPE
+
     def _safe_get_date(self, row, date_field: str) -> str:
         """Safely extract date field"""
         try:
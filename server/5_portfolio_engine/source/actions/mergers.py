@@ -18,6 +18,8 @@ logger = logging.getLogger(__name__)
 class MergersHandler:
     """Complete mergers handler - loading, portfolio actions, account actions"""
 
+    ACTION_TYPE = 'MERGER'
+
     def __init__(self):
         self.actions: List[Merger] = []
 
@@ -139,7 +141,7 @@ class MergersHandler:
 
     def can_handle(self, action) -> bool:
         """Check if this handler can process the given action"""
-        return hasattr(action, 'action_type') and action.action_type == 'MERGER'
+        return getattr(action, 'action_type', None) == self.ACTION_TYPE
 
     def _build_merger_components(self, row) -> List[MergerComponent]:
         """Build merger components from unified merger row"""
@@ -18,6 +18,8 @@ logger = logging.getLogger(__name__)
 class StockDividendsHandler:
     """Complete stock dividends handler - loading, portfolio actions, account actions"""
 
+    ACTION_TYPE = 'STOCK_DIVIDEND'
+
     def __init__(self):
         self.actions: List[StockDividend] = []
 
@@ -143,6 +145,10 @@ class StockDividendsHandler:
             cash_adjustments=cash_adjustments
         )
 
+    def can_handle(self, action) -> bool:
+        """Check if this handler can process the given action"""
+        return getattr(action, 'action_type', None) == self.ACTION_TYPE
+
     def _is_payable_date(self, action: StockDividend, current_date: str) -> bool:
         """Check if current date is the payable date"""
         try:
@@ -18,6 +18,8 @@ logger = logging.getLogger(__name__)
 class StockSplitsHandler:
     """Complete stock splits handler - loading, portfolio actions, account actions"""
 
+    ACTION_TYPE = 'STOCK_SPLIT'
+
     def __init__(self):
         self.actions: List[StockSplit] = []
 
@@ -107,6 +109,10 @@ class StockSplitsHandler:
             cash_adjustments=cash_adjustments
         )
 
+    def can_handle(self, action) -> bool:
+        """Check if this handler can process the given action"""
+        return getattr(action, 'action_type', None) == self.ACTION_TYPE
+
     def _calculate_split_ratio(self, row) -> Decimal:
         """Calculate split ratio from various possible fields"""
         # Try direct split_ratio field first
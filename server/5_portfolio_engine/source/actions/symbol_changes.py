@@ -18,6 +18,8 @@ logger = logging.getLogger(__name__)
 class SymbolChangesHandler:
     """Complete symbol changes handler - loading, portfolio actions, account actions"""
 
+    ACTION_TYPE = 'SYMBOL_CHANGE'
+
     def __init__(self):
         self.actions: List[SymbolChange] = []
 
@@ -106,6 +108,10 @@ class SymbolChangesHandler:
             cash_adjustments=cash_adjustments
         )
 
+    def can_handle(self, action) -> bool:
+        """Check if this handler can process the given action"""
+        return getattr(action, 'action_type', None) == self.ACTION_TYPE
+
     def _safe_get_date(self, row, date_field: str) -> str:
         """Safely extract date field"""
         try:
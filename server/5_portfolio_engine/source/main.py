@@ -3,9 +3,11 @@
 Main entry point for portfolio corporate actions processing
 """
 
+import argparse
 import sys
 from datetime import datetime
 import logging
+from source.portfolio.columnar import ColumnarPortfolioEngine, FixedPointRangeError
 from source.portfolio.engine import MultiUserPortfolioEngine
 from source.config import config
 
@@ -24,11 +26,50 @@ def setup_logging():
     # Reduce verbosity for specific modules
     logging.getLogger('source.actions').setLevel(logging.WARNING)  # Only show warnings/errors for actions
     logging.getLogger('source.portfolio.engine').setLevel(logging.INFO)  # Keep engine logs
+    logging.getLogger('source.portfolio.columnar').setLevel(logging.INFO)
 
 
 
+def print_columnar_summary(engine: ColumnarPortfolioEngine):
+    """Per-user summary from the columnar engine's result frames"""
+    balances = engine.final_accounts.groupby('user_id', sort=False)
+    for row in engine.summary.itertuples(index=False):
+        print(f"\nUser: {row.user_id}")
+        print(f"  Original positions: {row.original_positions}")
+        print(f"  Final positions: {row.final_positions}")
+        print(f"  Corporate actions applied: {row.corporate_actions_applied}")
+        print(f"  Account balances:")
+        if row.final_accounts:
+            for account in balances.get_group(row.user_id).itertuples(index=False):
+                print(f"    {account.currency}: {account.balance}")
+
+
+def load_and_process(engine_class, logger):
+    """Load the day's corporate actions and every user, apply them. Returns (engine, user updates)."""
+    engine = engine_class(current_ymd=config.PROCESSING_YMD)
+
+    # Load corporate actions
+    logger.info("Loading corporate actions...")
+    corporate_actions = engine.load_corporate_actions()
+    logger.info(f"Loaded {len(corporate_actions)} corporate actions")
+
+    # Load user portfolios
+    logger.info("Loading user portfolios...")
+    engine.load_users(config.SOD_DIR)
+
+    # Process all users
+    logger.info("Processing corporate actions for all users...")
+    return engine, engine.process_all_users()
+
+
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description="Apply the day's corporate actions to every user portfolio")
+    parser.add_argument('--engine', choices=['columnar', 'decimal'], default='columnar',
+                        help="columnar: all users at once in exact fixed-point frames (default); "
+                             "decimal: position by position with Decimal arithmetic")
+    args = parser.parse_args()
+
     # Setup logging
     setup_logging()
     logger = logging.getLogger(__name__)
@@ -41,22 +82,13 @@ def main():
         logger.info(f"SOD directory: {config.SOD_DIR}")
         logger.info(f"CA data directory: {config.CA_DATA_DIR}")
 
-        # Initialize engine
-        engine = MultiUserPortfolioEngine(current_ymd=config.PROCESSING_YMD)
-
-        # Load corporate actions
-        logger.info("Loading corporate actions...")
-        corporate_actions = engine.load_corporate_actions()
-        logger.info(f"Loaded {len(corporate_actions)} corporate actions")
-
-        # Load user portfolios
-        logger.info("Loading user portfolios...")
-        user_portfolios = engine.load_users(config.SOD_DIR)
-        logger.info(f"Loaded portfolios for {len(user_portfolios)} users")
-
-        # Process all users
-        logger.info("Processing corporate actions for all users...")
-        user_updates = engine.process_all_users()
+        engine_class = ColumnarPortfolioEngine if args.engine == 'columnar' else MultiUserPortfolioEngine
+        try:
+            engine, user_updates = load_and_process(engine_class, logger)
+        except FixedPointRangeError as e:
+            # Both engines write the same files; the Decimal one also handles values beyond int64
+            logger.warning(f"Columnar engine cannot hold today's values exactly ({e}), using the decimal engine")
+            engine, user_updates = load_and_process(MultiUserPortfolioEngine, logger)
 
         # Save results
         logger.info("Saving results...")
@@ -67,14 +99,17 @@ def main():
         print("PROCESSING SUMMARY")
         print("=" * 80)
 
-        for user_id, user_update in user_updates.items():
-            print(f"\nUser: {user_id}")
-            print(f"  Original positions: {len(user_update.original_portfolio.positions)}")
-            print(f"  Final positions: {len([q for q in user_update.final_positions.values() if q != 0])}")
-            print(f"  Corporate actions applied: {len(user_update.updates)}")
-            print(f"  Account balances:")
-            for currency, balance in user_update.final_accounts.items():
-                print(f"    {currency}: {balance}")
+        if isinstance(engine, ColumnarPortfolioEngine):
+            print_columnar_summary(engine)
+        else:
+            for user_id, user_update in user_updates.items():
+                print(f"\nUser: {user_id}")
+                print(f"  Original positions: {len(user_update.original_portfolio.positions)}")
+                print(f"  Final positions: {len([q for q in user_update.final_positions.values() if q != 0])}")
+                print(f"  Corporate actions applied: {len(user_update.updates)}")
+                print(f"  Account balances:")
+                for currency, balance in user_update.final_accounts.items():
+                    print(f"    {currency}: {balance}")
 
         print(f"\nResults saved to: {config.SOD_DIR}")
         logger.info("Portfolio processing completed successfully")
@@ -0,0 +1,549 @@
+#!/usr/bin/env python3
+"""
+Columnar portfolio corporate actions engine for multiple users
+
+All users' holdings live in one frame, one row per (user, position, branch). Each corporate action
+type is applied to every affected holding at once: holdings are joined to that type's action table on
+the position's original symbol, and the transform registered for the type in ACTION_TRANSFORMS
+produces the resulting holdings and cash movements.
+
+Quantities, rates and cash amounts are exact decimals, held as an int64 coefficient, a per-row scale
+and a sign (see Parts), so every value is the one MultiUserPortfolioEngine computes with
+Decimal and the saved files are byte-identical to its files. Values an int64 coefficient cannot hold
+exactly raise FixedPointRangeError.
+"""
+
+import io
+import os
+import logging
+from collections import defaultdict
+from decimal import Decimal
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from source.portfolio.engine import HANDLER_CLASSES
+from source.portfolio.models import CorporateAction
+
+logger = logging.getLogger(__name__)
+
+
+def _decimal_columns(name: str) -> List[str]:
+    """Columns of an exact decimal value: int64 coefficient, scale and sign"""
+    return [name, f"{name}_scale", f"{name}_negative"]
+
+
+# Holding rows: user code, original position (global row number), its original symbol (the key actions
+# are looked up by), branch (order among the holdings that position has turned into), current symbol, quantity
+HOLDING_COLUMNS = ['user', 'row', 'origin', 'branch', 'symbol'] + _decimal_columns('quantity')
+# Cash movements: where in the processing order they happen, and the amount per currency
+CASH_COLUMNS = ['user', 'row', 'step', 'branch', 'component', 'currency'] + _decimal_columns('amount')
+
+DEFAULT_ACCOUNTS = {'USD': Decimal('100000')}
+
+# Largest coefficient allowed; keeps a margin below 2**63 for the float64 range estimates
+MAX_COEFFICIENT = 2 ** 62
+# Powers of ten that float64 holds exactly
+FLOAT_POWERS_OF_TEN = np.array([float(10 ** k) for k in range(23)])
+
+
+class FixedPointRangeError(ArithmeticError):
+    """A value is NaN, infinite or too large for an int64 coefficient; use MultiUserPortfolioEngine"""
+
+
+# An exact decimal as arrays: value = coefficient * 10 ** -scale. The sign is kept separately because
+# Decimal keeps it for zero too (-50 * 0.0 is Decimal('-0.0'), saved as -0.0).
+Parts = Tuple[np.ndarray, np.ndarray, np.ndarray]
+
+
+def _check_range(magnitude: np.ndarray, what: str):
+    if len(magnitude) and not float(np.max(magnitude)) < MAX_COEFFICIENT:
+        raise FixedPointRangeError(f"{what} exceeds the int64 fixed-point range")
+
+
+def _normalized(coefficient: np.ndarray, scale: np.ndarray, negative: np.ndarray) -> Parts:
+    """Strip trailing zeros from the coefficients so scales (and later products) stay as small as possible"""
+    coefficient, scale = coefficient.astype(np.int64), scale.astype(np.int64)
+    scale[coefficient == 0] = 0
+    while True:
+        strip = (scale > 0) & (coefficient % 10 == 0)
+        if not strip.any():
+            return coefficient, scale, negative.astype(bool)
+        coefficient[strip] //= 10
+        scale[strip] -= 1
+
+
+def _decimal_parts(values: Iterable[Decimal]) -> Parts:
+    """Exact parts of Decimal values"""
+    coefficients, scales, negatives = [], [], []
+    for value in values:
+        if not value.is_finite():
+            raise FixedPointRangeError(f"{value} has no fixed-point value")
+        sign, digits, exponent = value.as_tuple()
+        coefficient = int(''.join(map(str, digits))) * 10 ** max(exponent, 0)
+        if coefficient >= MAX_COEFFICIENT:
+            raise FixedPointRangeError(f"{value} exceeds the int64 fixed-point range")
+        coefficients.append(-coefficient if sign else coefficient)
+        scales.append(max(-exponent, 0))
+        negatives.append(bool(sign))
+    return _normalized(np.array(coefficients, dtype=np.int64), np.array(scales, dtype=np.int64),
+                       np.array(negatives, dtype=bool))
+
+
+def _float_parts(values) -> Parts:
+    """Exact parts of parsed CSV numbers, as Decimal(str(value)) reads them"""
+    values = np.asarray(values, dtype=float)
+    if not np.isfinite(values).all():
+        raise FixedPointRangeError("NaN or infinite values have no fixed-point value")
+    unique, inverse = np.unique(values, return_inverse=True)
+    coefficient, scale, _ = _decimal_parts(Decimal(str(value)) for value in unique.tolist())
+    # np.unique folds -0.0 into 0.0; the sign comes from each value
+    return coefficient[inverse], scale[inverse], np.signbit(values)
+
+
+def _parts(frame: pd.DataFrame, name: str) -> Parts:
+    return tuple(frame[column].to_numpy() for column in _decimal_columns(name))
+
+
+def _assign(frame: pd.DataFrame, name: str, parts: Parts) -> pd.DataFrame:
+    for column, values in zip(_decimal_columns(name), parts):
+        frame[column] = values
+    return frame
+
+
+def _multiply(left: Parts, right: Parts) -> Parts:
+    """Elementwise product (Decimal's sign rule: the signs are xor-ed, zero included)"""
+    _check_range(np.abs(left[0].astype(float)) * np.abs(right[0].astype(float)), "A product")
+    return _normalized(left[0] * right[0], left[1] + right[1], left[2] ^ right[2])
+
+
+def _aligned(coefficient: np.ndarray, scale: np.ndarray, target: np.ndarray) -> np.ndarray:
+    """Coefficients rewritten at a (larger or equal) target scale"""
+    shift = target - scale
+    if len(shift) and shift.max() > 18:
+        raise FixedPointRangeError("Scales too far apart for the int64 fixed-point range")
+    factor = 10 ** shift.astype(np.int64)
+    _check_range(np.abs(coefficient.astype(float)) * factor, "An aligned value")
+    return coefficient * factor
+
+
+def _add(left: Parts, right: Parts) -> Parts:
+    """Elementwise sum; an exact zero is negative only when both terms are negative zeros"""
+    target = np.maximum(left[1], right[1])
+    a, b = _aligned(left[0], left[1], target), _aligned(right[0], right[1], target)
+    _check_range(np.abs(a.astype(float)) + np.abs(b.astype(float)), "A sum")
+    total = a + b
+    negative = np.where(total == 0, left[2] & right[2] & (a == 0) & (b == 0), total < 0)
+    return _normalized(total, target, negative)
+
+
+def _group_sum(frame: pd.DataFrame, keys: List[str], name: str, from_zero: bool = False) -> pd.DataFrame:
+    """
+    Sum a decimal column per group (groups in order of first appearance), as Decimal additions would.
+    A zero sum is negative when every term is a negative zero, unless the sum starts from_zero (a positive
+    Decimal('0'), as defaultdict(Decimal) does).
+    """
+    coefficient, scale, negative = _parts(frame, name)
+    target = frame.groupby(keys, sort=False, dropna=False)[f"{name}_scale"].transform('max').to_numpy()
+    aligned = _aligned(coefficient, scale, target)
+
+    work = frame[keys].copy()
+    work['coefficient'] = aligned
+    work['magnitude'] = np.abs(aligned.astype(float))
+    work['scale'] = target
+    work['negative_zero'] = (coefficient == 0) & negative & (not from_zero)
+    sums = work.groupby(keys, sort=False, dropna=False).agg(
+        coefficient=('coefficient', 'sum'), magnitude=('magnitude', 'sum'),
+        scale=('scale', 'first'), negative_zero=('negative_zero', 'all')).reset_index()
+    _check_range(sums['magnitude'].to_numpy(), "A sum")
+
+    total = sums['coefficient'].to_numpy(dtype=np.int64)
+    negative = np.where(total == 0, sums['negative_zero'].to_numpy(dtype=bool), total < 0)
+    return _assign(sums[keys].copy(), name, _normalized(total, sums['scale'].to_numpy(), negative))
+
+
+def _to_float(parts: Parts) -> np.ndarray:
+    """Nearest float64 to each value, as float(Decimal) gives it"""
+    coefficient, scale, negative = parts
+    # Two exactly representable floats divide with a single, correct rounding
+    exact = (np.abs(coefficient) <= 2 ** 53) & (scale < len(FLOAT_POWERS_OF_TEN))
+    values = coefficient / FLOAT_POWERS_OF_TEN[np.where(exact, scale, 0)]
+    for i in np.flatnonzero(~exact):
+        values[i] = float(Decimal(int(coefficient[i])).scaleb(-int(scale[i])))
+    return np.where((coefficient == 0) & negative, -0.0, values)
+
+
+def _holdings(joined: pd.DataFrame, symbol=None, quantity: Optional[Parts] = None) -> pd.DataFrame:
+    """Holding rows from joined rows, with the symbol and/or quantity replaced"""
+    holdings = joined[HOLDING_COLUMNS].copy()
+    if symbol is not None:
+        holdings['symbol'] = symbol
+    if quantity is not None:
+        _assign(holdings, 'quantity', quantity)
+    return holdings
+
+
+def _cash(joined: pd.DataFrame, currency, amount: Parts, component=0) -> pd.DataFrame:
+    cash = pd.DataFrame({
+        'user': joined['user'].to_numpy(),
+        'row': joined['row'].to_numpy(),
+        'step': 0,
+        'branch': joined['branch'].to_numpy(),
+        'component': component,
+        'currency': np.asarray(currency, dtype=object),
+    })
+    return _assign(cash, 'amount', tuple(np.asarray(values) for values in amount))[CASH_COLUMNS]
+
+
+def _no_cash(joined: pd.DataFrame) -> pd.DataFrame:
+    empty = joined.iloc[:0]
+    return _cash(empty, [], (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=bool)))
+
+
+def _rate_table(table: pd.DataFrame, name: str, values: Iterable[Decimal]) -> pd.DataFrame:
+    return _assign(table, name, _decimal_parts(values))
+
+
+def _cash_dividend_table(actions, handler, current_ymd) -> pd.DataFrame:
+    table = pd.DataFrame({
+        'action': range(len(actions)),
+        'payable': [handler._is_payable_date(action, current_ymd) for action in actions],
+        'currency': [action.currency for action in actions],
+    })
+    return _rate_table(table, 'rate', (action.dividend_per_share for action in actions))
+
+
+def _apply_cash_dividends(joined: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Position kept; quantity * dividend credited once payable"""
+    paid = joined[joined['payable'].to_numpy(dtype=bool)]
+    return _holdings(joined), _cash(paid, paid['currency'], _multiply(_parts(paid, 'quantity'), _parts(paid, 'rate')))
+
+
+def _delisting_table(actions, handler, current_ymd) -> pd.DataFrame:
+    table = pd.DataFrame({
+        'action': range(len(actions)),
+        'currency': [action.currency for action in actions],
+    })
+    return _rate_table(table, 'value', (action.value_per_share for action in actions))
+
+
+def _apply_delistings(joined: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Position removed; positive delisting value credited"""
+    amount = _multiply(_parts(joined, 'quantity'), _parts(joined, 'value'))
+    credited = amount[0] > 0
+    return (_holdings(joined.iloc[:0]),
+            _cash(joined[credited], joined['currency'][credited], tuple(part[credited] for part in amount)))
+
+
+def _merger_table(actions, handler, current_ymd) -> pd.DataFrame:
+    # One row per merger component
+    rows = [(i, j, component.type, component.parent, component.currency or 'USD')
+            for i, action in enumerate(actions) for j, component in enumerate(action.components)]
+    table = pd.DataFrame(rows, columns=['action', 'component', 'kind', 'parent', 'currency'])
+    return _rate_table(table, 'value', (component.value for action in actions for component in action.components))
+
+
+def _apply_mergers(joined: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Position replaced by a holding per stock component; cash components credited"""
+    stock = joined[(joined['kind'] == 'stock').to_numpy()]
+    holdings = _holdings(stock, symbol=stock['parent'].to_numpy(),
+                         quantity=_multiply(_parts(stock, 'quantity'), _parts(stock, 'value')))
+    holdings['component'] = stock['component'].to_numpy()
+
+    cash = joined[(joined['kind'] == 'cash').to_numpy()]
+    return holdings, _cash(cash, cash['currency'], _multiply(_parts(cash, 'quantity'), _parts(cash, 'value')),
+                           cash['component'].to_numpy())
+
+
+def _stock_split_table(actions, handler, current_ymd) -> pd.DataFrame:
+    table = pd.DataFrame({'action': range(len(actions))})
+    return _rate_table(table, 'ratio', (action.split_ratio for action in actions))
+
+
+def _apply_stock_splits(joined: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Quantity multiplied by the split ratio"""
+    quantity = _multiply(_parts(joined, 'quantity'), _parts(joined, 'ratio'))
+    return _holdings(joined, quantity=quantity), _no_cash(joined)
+
+
+def _stock_dividend_table(actions, handler, current_ymd) -> pd.DataFrame:
+    table = pd.DataFrame({
+        'action': range(len(actions)),
+        'payable': [handler._is_payable_date(action, current_ymd) for action in actions],
+    })
+    return _rate_table(table, 'ratio', (action.dividend_ratio for action in actions))
+
+
+def _apply_stock_dividends(joined: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Long positions (zero included) receive quantity * ratio shares once payable; short ones are unchanged"""
+    quantity = tuple(part.copy() for part in _parts(joined, 'quantity'))
+    receives = joined['payable'].to_numpy(dtype=bool) & (quantity[0] >= 0)
+    current = tuple(part[receives] for part in quantity)
+    received = _add(current, _multiply(current, _parts(joined[receives], 'ratio')))
+    for part, values in zip(quantity, received):
+        part[receives] = values
+    return _holdings(joined, quantity=quantity), _no_cash(joined)
+
+
+def _symbol_change_table(actions, handler, current_ymd) -> pd.DataFrame:
+    return pd.DataFrame({
+        'action': range(len(actions)),
+        'new_symbol': [action.new_symbol for action in actions],
+    })
+
+
+def _apply_symbol_changes(joined: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """Symbol replaced, quantity unchanged"""
+    return _holdings(joined, symbol=joined['new_symbol'].to_numpy()), _no_cash(joined)
+
+
+# Action type -> (builds the type's action table from loaded actions, applies it to joined holdings)
+ACTION_TRANSFORMS: Dict[str, Tuple[Callable, Callable]] = {
+    'CASH_DIVIDEND': (_cash_dividend_table, _apply_cash_dividends),
+    'DELISTING': (_delisting_table, _apply_delistings),
+    'MERGER': (_merger_table, _apply_mergers),
+    'STOCK_SPLIT': (_stock_split_table, _apply_stock_splits),
+    'STOCK_DIVIDEND': (_stock_dividend_table, _apply_stock_dividends),
+    'SYMBOL_CHANGE': (_symbol_change_table, _apply_symbol_changes),
+}
+
+
+def _read_user_csvs(paths: List[Tuple[int, str]], dtype: Dict[str, type]) -> pd.DataFrame:
+    """
+    Read many small CSV files into one frame with a 'user' column, parsing each distinct header once
+    instead of calling read_csv per file. Rows keep their per-file order.
+    """
+    files_by_header = defaultdict(list)
+    for user, path in paths:
+        with open(path, 'rb') as f:
+            lines = f.read().splitlines()
+        if lines:
+            files_by_header[lines[0]].append((b'%d,' % user, lines[1:]))
+
+    frames = []
+    for header, files in files_by_header.items():
+        buffer = b'\n'.join([b'user,' + header] +
+                            [prefix + line for prefix, lines in files for line in lines if line])
+        frames.append(pd.read_csv(io.BytesIO(buffer), dtype=dtype))
+    if not frames:
+        return pd.DataFrame(columns=['user'])
+    return pd.concat(frames, ignore_index=True).sort_values('user', kind='stable', ignore_index=True)
+
+
+def _write_user_csvs(frame: pd.DataFrame, columns: List[str], user_ids: List[str], output_dir: str, suffix: str):
+    """
+    Write one CSV per user from a frame sorted by user code, formatting every row in a single to_csv call.
+    Files are identical to DataFrame.to_csv(index=False) on each user's rows.
+    """
+    lines = frame[columns].to_csv(index=False, header=False, lineterminator='\n').split('\n')[:-1]
+    counts = np.bincount(frame['user'].to_numpy(dtype=np.int64), minlength=len(user_ids))
+    ends = np.cumsum(counts)
+    header = ','.join(columns)
+
+    for user, user_id in enumerate(user_ids):
+        end = ends[user]
+        start = end - counts[user]
+        content = '\n'.join([header] + lines[start:end]) + '\n' if counts[user] else '\n'
+        with open(os.path.join(output_dir, f"{user_id}{suffix}"), 'w', newline=os.linesep) as f:
+            f.write(content)
+
+
+class ColumnarPortfolioEngine:
+    """Applies corporate actions to all user portfolios at once, one vectorized transform per action type"""
+
+    def __init__(self, current_ymd: str = None):
+        self.current_ymd = current_ymd
+        self.corporate_actions: List[CorporateAction] = []
+        self.handlers = [handler_class() for handler_class in HANDLER_CLASSES]
+
+        # Action type -> action table with 'origin' (the symbol it applies to) and 'occurrence'
+        # (how many earlier actions of the same type that symbol has)
+        self.action_tables: Dict[str, pd.DataFrame] = {}
+
+        # Loaded positions and opening balances, quantity and balance as exact decimal columns
+        self.user_ids: List[str] = []
+        self.positions = pd.DataFrame(columns=['user', 'symbol'] + _decimal_columns('quantity'))
+        self.accounts = pd.DataFrame(columns=['user', 'currency'] + _decimal_columns('balance'))
+
+        # Results of process_all_users, quantity and balance as the float64 values saved to the files
+        self.final_positions = pd.DataFrame(columns=['user', 'user_id', 'symbol', 'quantity'])
+        self.final_accounts = pd.DataFrame(columns=['user', 'user_id', 'currency', 'balance'])
+        self.summary = pd.DataFrame()
+
+    def load_corporate_actions(self) -> List[CorporateAction]:
+        """Load all corporate actions for the day and build one action table per type"""
+        all_actions = []
+        self.action_tables = {}
+
+        for handler in self.handlers:
+            actions = handler.load_all_data()
+            all_actions.extend(actions)
+            if not actions:
+                continue
+
+            build_table, _ = ACTION_TRANSFORMS[handler.ACTION_TYPE]
+            table = build_table(actions, handler, self.current_ymd)
+            origins = pd.Series([action.symbol for action in actions])
+            table['origin'] = origins.to_numpy()[table['action'].to_numpy()]
+            table['occurrence'] = origins.groupby(origins).cumcount().to_numpy()[table['action'].to_numpy()]
+            self.action_tables[handler.ACTION_TYPE] = table
+
+        self.corporate_actions = all_actions
+
+        logger.info("Corporate actions loaded:")
+        for action_type, table in self.action_tables.items():
+            logger.info(f"  {action_type}: {table['action'].nunique()}")
+
+        return self.corporate_actions
+
+    def load_users(self, sod_dir: str) -> pd.DataFrame:
+        """Load portfolios and accounts for all users into two frames keyed by user code"""
+        logger.info(f"Loading user data from {sod_dir}")
+
+        if not os.path.exists(sod_dir):
+            raise ValueError(f"SOD directory does not exist: {sod_dir}")
+
+        self.user_ids = [u for u in os.listdir(sod_dir) if os.path.isdir(os.path.join(sod_dir, u))]
+
+        portfolio_paths, accounts_paths = [], []
+        default_accounts = []
+        for user, user_id in enumerate(self.user_ids):
+            portfolio_path = os.path.join(sod_dir, user_id, 'portfolio.csv')
+            if os.path.exists(portfolio_path):
+                portfolio_paths.append((user, portfolio_path))
+
+            accounts_path = os.path.join(sod_dir, user_id, 'accounts.csv')
+            if os.path.exists(accounts_path):
+                accounts_paths.append((user, accounts_path))
+            else:
+                default_accounts.append(user)
+
+        positions = _read_user_csvs(portfolio_paths, dtype={'symbol': str})
+        positions = positions.reindex(columns=['user', 'symbol', 'quantity'])
+        self.positions = _assign(positions, 'quantity', _float_parts(positions['quantity']))
+
+        accounts = _read_user_csvs(accounts_paths, dtype={'currency': str})
+        accounts = accounts.reindex(columns=['user', 'currency', 'balance'])
+        accounts = _assign(accounts, 'balance', _float_parts(accounts['balance']))
+        defaults = pd.DataFrame([(user, currency) for user in default_accounts for currency in DEFAULT_ACCOUNTS],
+                                columns=['user', 'currency'])
+        defaults = _assign(defaults, 'balance',
+                           _decimal_parts(DEFAULT_ACCOUNTS[currency] for currency in defaults['currency']))
+        accounts = pd.concat([accounts, defaults], ignore_index=True)
+
+        # A repeated currency keeps its first position and its last balance (as dict assignment does)
+        accounts['order'] = accounts.groupby(['user', 'currency'], sort=False, dropna=False).ngroup()
+        accounts = accounts.drop_duplicates(['user', 'currency'], keep='last')
+        self.accounts = (accounts.sort_values(['user', 'order'], kind='stable', ignore_index=True)
+                         .drop(columns='order'))
+
+        logger.info(f"Loaded {len(self.positions)} positions and {len(self.accounts)} accounts "
+                    f"for {len(self.user_ids)} users")
+        return self.positions
+
+    def process_all_users(self) -> pd.DataFrame:
+        """Apply corporate actions to every user's holdings. Returns the per-user summary."""
+        logger.info("=== STARTING USER PROCESSING ===")
+
+        if not self.corporate_actions:
+            self.load_corporate_actions()
+
+        holdings = self.positions[['user', 'symbol'] + _decimal_columns('quantity')].copy()
+        holdings['user'] = holdings['user'].astype(np.int64)
+        holdings['row'] = np.arange(len(holdings))
+        holdings['origin'] = holdings['symbol']
+        holdings['branch'] = 0
+        holdings = holdings[HOLDING_COLUMNS]
+
+        n_users = len(self.user_ids)
+        updates = np.zeros(n_users, dtype=np.int64)
+        cash_frames = []
+        step = 0
+
+        # Each symbol's actions apply in load order: by handler, then in order within a handler.
+        # Step k of a type applies the k-th action of that type for each symbol.
+        for handler_class in HANDLER_CLASSES:
+            action_type = handler_class.ACTION_TYPE
+            table = self.action_tables.get(action_type)
+            if table is None:
+                continue
+            _, transform = ACTION_TRANSFORMS[action_type]
+
+            for occurrence in range(table['occurrence'].max() + 1):
+                step_table = table[table['occurrence'] == occurrence].drop(columns=['action', 'occurrence'])
+                hit = holdings['origin'].isin(step_table['origin']).to_numpy()
+                if not hit.any():
+                    continue
+
+                applied = holdings[hit]
+                updates += np.bincount(applied['user'].to_numpy(), minlength=n_users)
+                joined = applied.merge(step_table, on='origin', how='left')
+                new_holdings, cash = transform(joined)
+                cash['step'] = step
+                cash_frames.append(cash)
+                holdings = self._merge_holdings(holdings[~hit], new_holdings)
+                step += 1
+
+                logger.info(f"Applied {action_type} #{occurrence + 1} to {hit.sum()} holdings")
+
+        holdings = holdings.sort_values(['row', 'branch'], kind='stable')
+        positions = _group_sum(holdings, ['user', 'symbol'], 'quantity', from_zero=True)
+        self.final_positions = positions[['user', 'symbol']].assign(quantity=_to_float(_parts(positions, 'quantity')))
+        self.final_accounts = self._final_accounts(cash_frames)
+
+        for frame in (self.final_positions, self.final_accounts):
+            frame.insert(1, 'user_id', np.asarray(self.user_ids, dtype=object)[frame['user'].to_numpy(dtype=np.int64)])
+
+        self.summary = pd.DataFrame({
+            'user_id': self.user_ids,
+            'original_positions': self._count_by_user(self.positions),
+            'final_positions': self._count_by_user(self.final_positions[self.final_positions['quantity'] != 0]),
+            'corporate_actions_applied': updates,
+            'original_accounts': self._count_by_user(self.accounts),
+            'final_accounts': self._count_by_user(self.final_accounts)
+        })
+
+        logger.info("=== PROCESSING COMPLETE ===")
+        logger.info(f"Total actions applied across all users: {updates.sum()}")
+        return self.summary
+
+    @staticmethod
+    def _merge_holdings(unchanged: pd.DataFrame, changed: pd.DataFrame) -> pd.DataFrame:
+        """Recombine untouched and transformed holdings, renumbering branches where a holding split in two"""
+        if 'component' not in changed.columns:
+            return pd.concat([unchanged, changed], ignore_index=True)
+
+        changed = changed.sort_values(['row', 'branch', 'component'], kind='stable', ignore_index=True)
+        changed['branch'] = changed.groupby('row').cumcount()
+        return pd.concat([unchanged, changed.drop(columns='component')], ignore_index=True)
+
+    def _final_accounts(self, cash_frames: List[pd.DataFrame]) -> pd.DataFrame:
+        """Opening balances plus cash movements; new currencies are added in the order they first move"""
+        columns = ['user', 'currency'] + _decimal_columns('amount')
+        opening = self.accounts.rename(columns=dict(zip(_decimal_columns('balance'), _decimal_columns('amount'))))
+        movements = pd.concat(cash_frames, ignore_index=True) if cash_frames else pd.DataFrame(columns=CASH_COLUMNS)
+        movements = movements.sort_values(['row', 'step', 'branch', 'component'], kind='stable')
+
+        ledger = pd.concat([opening[columns], movements[columns]], ignore_index=True)
+        ledger = ledger.astype({'user': np.int64, 'amount': np.int64, 'amount_scale': np.int64,
+                                'amount_negative': bool})
+        ledger = ledger.sort_values('user', kind='stable')
+        balances = _group_sum(ledger, ['user', 'currency'], 'amount')
+        return balances[['user', 'currency']].assign(balance=_to_float(_parts(balances, 'amount')))
+
+    def _count_by_user(self, frame: pd.DataFrame) -> np.ndarray:
+        return np.bincount(frame['user'].to_numpy(dtype=np.int64), minlength=len(self.user_ids))
+
+    def save_results(self, output_dir: str):
+        """Save per-user portfolios and accounts plus the processing summary"""
+        logger.info("=== SAVING RESULTS ===")
+        os.makedirs(output_dir, exist_ok=True)
+
+        non_zero = self.final_positions[self.final_positions['quantity'] != 0]
+        _write_user_csvs(non_zero, ['symbol', 'quantity'], self.user_ids, output_dir, '_final_portfolio.csv')
+        _write_user_csvs(self.final_accounts, ['currency', 'balance'], self.user_ids, output_dir,
+                         '_final_accounts.csv')
+
+        self.summary.to_csv(os.path.join(output_dir, "processing_summary.csv"), index=False)
+        logger.info(f"Saved results for {len(self.user_ids)} users to {output_dir}")
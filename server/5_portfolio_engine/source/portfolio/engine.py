@@ -20,6 +20,16 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Handlers in the order their corporate actions are loaded (and so applied to each position)
+HANDLER_CLASSES = [
+    CashDividendsHandler,
+    DelistingsHandler,
+    MergersHandler,
+    StockSplitsHandler,
+    StockDividendsHandler,
+    SymbolChangesHandler
+]
+
 
 class MultiUserPortfolioEngine:
     """Applies corporate actions to multiple user portfolios"""
@@ -32,14 +42,10 @@ class MultiUserPortfolioEngine:
         self.unexplained_positions: List[UnexplainedPosition] = []
 
         # Initialize action handlers
-        self.handlers = [
-            CashDividendsHandler(),
-            DelistingsHandler(),
-            MergersHandler(),
-            StockSplitsHandler(),
-            StockDividendsHandler(),
-            SymbolChangesHandler()
-        ]
+        self.handlers = [handler_class() for handler_class in HANDLER_CLASSES]
+
+        # Action type -> handler, so dispatch is one lookup per action
+        self.handlers_by_type = {handler.ACTION_TYPE: handler for handler in self.handlers}
 
     def load_corporate_actions(self) -> List[CorporateAction]:
         """Load all corporate actions for the day"""
@@ -147,6 +153,10 @@ class MultiUserPortfolioEngine:
         if not self.corporate_actions:
             self.load_corporate_actions()
 
+        # Group corporate actions by symbol once for all users
+        ca_lookup = self._group_actions_by_symbol()
+        logger.info(f"Corporate actions available for {len(ca_lookup)} symbols")
+
         # Process each user
         total_actions_applied = 0
         for user_id, user_portfolio in self.user_portfolios.items():
@@ -154,7 +164,7 @@ class MultiUserPortfolioEngine:
             logger.info(f"Starting accounts: {user_portfolio.accounts}")
             logger.info(f"Starting positions: {len(user_portfolio.positions)}")
 
-            user_update = self._process_user_portfolio(user_portfolio)
+            user_update = self._process_user_portfolio(user_portfolio, ca_lookup)
             self.user_updates[user_id] = user_update
             total_actions_applied += len(user_update.updates)
 
@@ -171,7 +181,15 @@ class MultiUserPortfolioEngine:
 
         return self.user_updates
 
-    def _process_user_portfolio(self, user_portfolio: UserPortfolio) -> UserUpdate:
+    def _group_actions_by_symbol(self) -> Dict[str, List[CorporateAction]]:
+        """Corporate actions per symbol, in load order"""
+        ca_lookup = defaultdict(list)
+        for action in self.corporate_actions:
+            ca_lookup[action.symbol].append(action)
+        return ca_lookup
+
+    def _process_user_portfolio(self, user_portfolio: UserPortfolio,
+                                ca_lookup: Dict[str, List[CorporateAction]] = None) -> UserUpdate:
         """Process corporate actions for a single user"""
         logger.info(f"Processing portfolio for user {user_portfolio.user_id}")
 
@@ -181,12 +199,8 @@ class MultiUserPortfolioEngine:
 
         logger.info(f"Initial final_accounts (copy): {final_accounts}")
 
-        # Group corporate actions by symbol
-        ca_lookup = defaultdict(list)
-        for action in self.corporate_actions:
-            ca_lookup[action.symbol].append(action)
-
-        logger.info(f"Corporate actions available for {len(ca_lookup)} symbols")
+        if ca_lookup is None:
+            ca_lookup = self._group_actions_by_symbol()
 
         # Process each position
         actions_applied = 0
@@ -252,11 +266,7 @@ class MultiUserPortfolioEngine:
         """Apply corporate action to a position using appropriate handler"""
 
         # Find appropriate handler
-        handler = None
-        for h in self.handlers:
-            if hasattr(h, 'can_handle') and h.can_handle(action):
-                handler = h
-                break
+        handler = self.handlers_by_type.get(action.action_type)
 
         if not handler:
             logger.warning(f"No handler found for action type: {action.action_type}")
@@ -327,7 +337,4 @@ class MultiUserPortfolioEngine:
 
     def can_handle(self, action: CorporateAction) -> bool:
         """Check if any handler can process the given action (for backward compatibility)"""
-        for handler in self.handlers:
-            if hasattr(handler, 'can_handle') and handler.can_handle(action):
-                return True
-        return False
\ No newline at end of file
+        return action.action_type in self.handlers_by_type
\ No newline at end of file
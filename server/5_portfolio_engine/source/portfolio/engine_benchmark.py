@@ -0,0 +1,217 @@
+"""
+Parity check and benchmark for the columnar portfolio engine.
+
+    python -m source.portfolio.engine_benchmark --check-users 500 --users 10000
+
+Writes synthetic corporate actions (unified files plus manual overrides) and a start-of-day directory
+of user portfolios into a temporary directory laid out the way config expects. The parity check runs
+MultiUserPortfolioEngine (Decimal, position by position) and ColumnarPortfolioEngine on the same users
+and asserts they produce the same summary, the same final positions and balances and byte-identical
+saved files. The benchmark then times loading, processing and saving with both engines;
+the Decimal engine is only timed up to --legacy-users.
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = tempfile.mkdtemp(prefix='portfolio_engine_benchmark_')
+os.environ['CA_DATA_DIR'] = os.path.join(ROOT, 'corporate_actions')
+os.environ['SOD_DIR'] = os.path.join(ROOT, 'sod')
+
+import pandas as pd
+
+from source.config import config
+from source.portfolio.columnar import ColumnarPortfolioEngine
+from source.portfolio.engine import MultiUserPortfolioEngine
+
+CURRENT_DATE = datetime.today().strftime('%Y-%m-%d')
+SOURCES = ['alpaca', 'fmp', 'poly', 'sharadar']
+
+
+def _date(days):
+    return (datetime.today() + timedelta(days=days)).strftime('%Y-%m-%d') if days is not None else ''
+
+
+def write_corporate_actions(n_symbols: int, seed: int = 0):
+    """
+    Unified and manual corporate actions over a universe of n_symbols. Some symbols get several actions
+    of one type, several types, or chains (a symbol change into a symbol that also has actions).
+    """
+    rng = random.Random(seed)
+    symbols = [f"S{i}" for i in range(n_symbols)]
+
+    def pick(share):
+        return rng.sample(symbols, max(1, int(n_symbols * share)))
+
+    for directory in (config.CA_DATA_DIR, config.MANUAL_CA_DIR):
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+
+    def write(frame_rows, directory, name):
+        pd.DataFrame(frame_rows).to_csv(os.path.join(directory, name), index=False)
+
+    def payable():
+        return _date(rng.choice([None, -3, 0, 5]))
+
+    cash_symbols = pick(0.05)
+    write([{'master_symbol': s, 'source': rng.choice(SOURCES), 'rate': rng.choice([0.1, 0.25, 0.333, 1.05]),
+            'currency': rng.choice(['USD', 'USD', 'CAD']), 'ex_date': _date(-1), 'payable_date': payable()}
+           for s in cash_symbols + cash_symbols[:len(cash_symbols) // 4]],
+          config.CA_DATA_DIR, 'unified_cash_dividends.csv')
+    write([{'symbol': s, 'dividend_per_share': 0.5, 'currency': 'EUR', 'account': 'Credit', 'payable_date': _date(-1)}
+           for s in pick(0.005)], config.MANUAL_CA_DIR, 'cash_dividends.csv')
+
+    write([{'master_symbol': s, 'source': rng.choice(SOURCES), 'delisting_date': _date(0)}
+           for s in pick(0.01)], config.CA_DATA_DIR, 'unified_delisting.csv')
+    write([{'symbol': s, 'currency': 'USD', 'account': 'Credit', 'value': rng.choice([0.0, 1.5, 12.25])}
+           for s in pick(0.005)], config.MANUAL_CA_DIR, 'delistings.csv')
+
+    write([{'acquiree_symbol': s, 'source': rng.choice(SOURCES), 'ex_date': _date(0),
+            'acquirer_symbol': rng.choice(symbols), 'acquirer_rate': rng.choice([0.0, 0.5, 1.25, None]),
+            'cash_rate': rng.choice([0.0, 10.0, 33.3, None])}
+           for s in pick(0.01)], config.CA_DATA_DIR, 'unified_mergers.csv')
+    manual_mergers = []
+    for s in pick(0.003):
+        manual_mergers += [{'symbol': s, 'type': 'stock', 'parent': rng.choice(symbols), 'currency': None, 'value': 0.34},
+                           {'symbol': s, 'type': 'stock', 'parent': rng.choice(symbols), 'currency': None, 'value': 0.1},
+                           {'symbol': s, 'type': 'cash', 'parent': 'Credit', 'currency': 'EUR', 'value': 10.0},
+                           {'symbol': s, 'type': 'cash', 'parent': 'Credit', 'currency': None, 'value': 2.5}]
+    write(manual_mergers, config.MANUAL_CA_DIR, 'mergers.csv')
+
+    split_symbols = pick(0.02)
+    write([{'master_symbol': s, 'source': rng.choice(SOURCES), 'ex_date': _date(0),
+            'split_ratio': rng.choice([2.0, 3.0, 0.1, 1.5, None])}
+           for s in split_symbols + split_symbols[:len(split_symbols) // 3]],
+          config.CA_DATA_DIR, 'unified_stock_splits.csv')
+
+    write([{'master_symbol': s, 'source': rng.choice(SOURCES), 'ex_date': _date(0),
+            'dividend_ratio': rng.choice([0.05, 0.1, 0.02]), 'payable_date': payable()}
+           for s in pick(0.01)], config.CA_DATA_DIR, 'unified_stock_dividends.csv')
+
+    write([{'old_symbol': s, 'new_symbol': rng.choice(symbols), 'source': rng.choice(SOURCES),
+            'change_date': _date(0)}
+           for s in pick(0.02)], config.CA_DATA_DIR, 'unified_symbol_changes.csv')
+
+
+def write_users(n_users: int, n_symbols: int, positions_per_user: int = 20, seed: int = 0):
+    """A start-of-day directory with one portfolio.csv and accounts.csv per user (a few have neither)"""
+    rng = random.Random(seed)
+    shutil.rmtree(config.SOD_DIR, ignore_errors=True)
+    os.makedirs(config.SOD_DIR)
+
+    for u in range(n_users):
+        user_dir = os.path.join(config.SOD_DIR, f"user_{u:05d}")
+        os.makedirs(user_dir)
+        if rng.random() > 0.01:
+            lines = ['symbol,quantity']
+            for _ in range(rng.randint(0, positions_per_user * 2)):
+                quantity = rng.choice([100, 250, 1000, -50, 0, -0.0, 33.5, 12.75])
+                lines.append(f"S{rng.randrange(n_symbols)},{quantity}")
+            with open(os.path.join(user_dir, 'portfolio.csv'), 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+        if rng.random() > 0.05:
+            lines = ['currency,balance', f"USD,{rng.choice([0, 5000.5, 100000])}"]
+            if rng.random() < 0.2:
+                lines.append('CAD,250.25')
+            if rng.random() < 0.05:
+                lines.append('USD,42')
+            with open(os.path.join(user_dir, 'accounts.csv'), 'w') as f:
+                f.write('\n'.join(lines) + '\n')
+
+
+def _run(engine_class, output_dir: str):
+    """Load, process and save with one engine. Returns (engine, seconds per phase)."""
+    shutil.rmtree(output_dir, ignore_errors=True)
+    timings = {}
+    started = time.perf_counter()
+    engine = engine_class(current_ymd=CURRENT_DATE)
+    engine.load_corporate_actions()
+    engine.load_users(config.SOD_DIR)
+    timings['load'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    engine.process_all_users()
+    timings['process'] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    engine.save_results(output_dir)
+    timings['save'] = time.perf_counter() - started
+    return engine, timings
+
+
+def _assert_equal(expected: dict, actual: dict, what: str):
+    """Decimal results against the columnar floats: same keys in the same order, float(Decimal) values"""
+    assert list(expected) == list(actual), f"{what}: {list(expected)} != {list(actual)}"
+    for key, value in expected.items():
+        assert repr(float(value)) == repr(float(actual[key])), f"{what} {key}: {value} != {actual[key]}"
+
+
+def check_parity(n_users: int, n_symbols: int, seed: int = 0):
+    """Assert the columnar engine reproduces the Decimal engine's results and files"""
+    write_corporate_actions(n_symbols, seed)
+    write_users(n_users, n_symbols, seed=seed)
+    decimal_dir, columnar_dir = os.path.join(ROOT, 'out_decimal'), os.path.join(ROOT, 'out_columnar')
+    decimal, _ = _run(MultiUserPortfolioEngine, decimal_dir)
+    columnar, _ = _run(ColumnarPortfolioEngine, columnar_dir)
+
+    expected_summary = pd.read_csv(os.path.join(decimal_dir, 'processing_summary.csv'))
+    pd.testing.assert_frame_equal(columnar.summary.reset_index(drop=True), expected_summary, check_dtype=False)
+
+    positions = {user_id: dict(zip(group['symbol'], group['quantity']))
+                 for user_id, group in columnar.final_positions.groupby('user_id', sort=False)}
+    accounts = {user_id: dict(zip(group['currency'], group['balance']))
+                for user_id, group in columnar.final_accounts.groupby('user_id', sort=False)}
+    for user_id, update in decimal.user_updates.items():
+        _assert_equal(update.final_positions, positions.get(user_id, {}), f"{user_id} positions")
+        _assert_equal(update.final_accounts, accounts.get(user_id, {}), f"{user_id} accounts")
+
+    expected_files, actual_files = sorted(os.listdir(decimal_dir)), sorted(os.listdir(columnar_dir))
+    assert actual_files == expected_files, sorted(set(expected_files) ^ set(actual_files))
+    for name in expected_files:
+        with open(os.path.join(decimal_dir, name), 'rb') as f:
+            expected_bytes = f.read()
+        with open(os.path.join(columnar_dir, name), 'rb') as f:
+            assert f.read() == expected_bytes, f"{name} differs from the Decimal engine's file"
+
+    applied = int(columnar.summary['corporate_actions_applied'].sum())
+    print(f"parity ok: users={n_users:,} actions_applied={applied:,} byte-identical files={len(expected_files):,}")
+
+
+def benchmark(n_users: int, n_symbols: int, legacy_users: int, seed: int = 0):
+    write_corporate_actions(n_symbols, seed)
+    write_users(n_users, n_symbols, seed=seed)
+    print(f"\nusers={n_users:,} positions/user~20 symbols={n_symbols:,}")
+    print(f"{'engine':>10} {'load_s':>8} {'process_s':>10} {'save_s':>8} {'total_s':>8}")
+
+    engines = [('columnar', ColumnarPortfolioEngine)]
+    if n_users <= legacy_users:
+        engines.insert(0, ('decimal', MultiUserPortfolioEngine))
+    for name, engine_class in engines:
+        _, timings = _run(engine_class, os.path.join(ROOT, f"out_{name}"))
+        print(f"{name:>10} {timings['load']:>8.2f} {timings['process']:>10.2f} {timings['save']:>8.2f} "
+              f"{sum(timings.values()):>8.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parity check and benchmark for the columnar portfolio engine")
+    parser.add_argument('--check-users', type=int, default=500, help="users for the parity check (0 to skip)")
+    parser.add_argument('--users', type=int, default=10000)
+    parser.add_argument('--symbols', type=int, default=5000)
+    parser.add_argument('--legacy-users', type=int, default=10000,
+                        help="largest user count the Decimal engine is timed at")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Both engines log per position or per step; keep the timings about the work itself
+    logging.disable(logging.WARNING)
+    try:
+        if args.check_users:
+            check_parity(args.check_users, args.symbols, args.seed)
+        benchmark(args.users, args.symbols, args.legacy_users, args.seed)
+    finally:
+        shutil.rmtree(ROOT, ignore_errors=True)
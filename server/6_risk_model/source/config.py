@@ -51,6 +51,7 @@ class Config(BaseModel):
     master_data: MasterDataConfig = Field(default_factory=MasterDataConfig)
     db: DatabaseConfig = Field(default_factory=DatabaseConfig)
     output_dir: str = Field(default="output")
+    random_seed: Optional[int] = Field(default=None)
 
     # Master data cache
     _master_data: Optional[pd.DataFrame] = None
@@ -62,6 +63,7 @@ class Config(BaseModel):
             environment=os.getenv('ENVIRONMENT'),
             log_level=os.getenv('LOG_LEVEL'),
             output_dir=os.getenv('OUTPUT_DIR'),
+            random_seed=os.getenv('RANDOM_SEED') or None,
             master_data=MasterDataConfig(
                 master_dir=os.getenv('MASTER_DIR')
             ),
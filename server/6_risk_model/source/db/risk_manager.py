@@ -24,10 +24,9 @@ class RiskManager(BaseManager):
         overwriting existing data for the given date, model, and symbol.
 
         Args:
-            data (list of dict): A list of dictionaries, where each dict
-                                 represents a row of data to be inserted.
+            data (pd.DataFrame or list of dict): The rows of data to be inserted.
         """
-        if not data:
+        if data is None or len(data) == 0:
             logging.warning("No data provided to load.")
             return
 
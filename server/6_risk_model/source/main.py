@@ -35,8 +35,10 @@ def main():
             return False
 
         # Step 2: Generate the risk model data
-        risk_model = RandomRiskModel(model=model_name, master_data=master_data)
+        risk_model = RandomRiskModel(model=model_name, master_data=master_data, seed=config.random_seed)
         risk_model.generate_exposures(date=today)
+        risk_model.generate_factor_covariance(date=today)
+        risk_model.generate_specific_risk(date=today)
 
         # Step 3: Load the data into the database
         #risk_manager = RiskManager()
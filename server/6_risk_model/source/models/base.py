@@ -4,7 +4,6 @@ from abc import ABC, abstractmethod
 import os
 from pathlib import Path
 from datetime import date
-from typing import List, Dict, Any
 from source.config import config
 import pandas as pd
 
@@ -20,33 +19,59 @@ class BaseRiskModel(ABC):
 
         Args:
             model (str): The name of the risk model (e.g., 'RANDOM', 'BASIC').
-            symbols (List[str]): A list of security symbols to generate data for.
+            master_data (pd.DataFrame): Master data for the symbol universe.
         """
         self.model = model
         self.master_data = master_data
         self.exposures = pd.DataFrame()
+        self.factor_covariance = pd.DataFrame()
+        self.specific_risk = pd.DataFrame()
 
     @abstractmethod
-    def generate_exposures(self, date: date) -> List[Dict[str, Any]]:
+    def generate_exposures(self, date: date) -> pd.DataFrame:
         """
-        Generates risk factor data for a specific date.
+        Generates risk factor exposures for a specific date.
 
         Args:
             date (date): The date for which to generate the data.
 
         Returns:
-            List[Dict[str, Any]]: A list of dictionaries containing the risk factor data.
+            pd.DataFrame: One row per symbol and factor.
         """
         pass
 
-    def save_file(self) -> None:
+    @abstractmethod
+    def generate_factor_covariance(self, date: date) -> pd.DataFrame:
+        """
+        Generates the factor covariance matrix for a specific date.
+
+        Args:
+            date (date): The date for which to generate the data.
+
+        Returns:
+            pd.DataFrame: One row per factor pair.
+        """
+        pass
+
+    @abstractmethod
+    def generate_specific_risk(self, date: date) -> pd.DataFrame:
         """
-        Saves the generated exposures to a CSV file.
+        Generates the specific risk for a specific date.
 
         Args:
-            output_dir (str): Base output directory path. Defaults to "OUTPUT_DIR".
+            date (date): The date for which to generate the data.
+
+        Returns:
+            pd.DataFrame: One row per symbol.
+        """
+        pass
+
+    def save_file(self) -> None:
+        """
+        Saves the generated exposures, factor covariance and specific risk to Parquet files
+        in OUTPUT_DIR/YYYYMMDD/model_name/.
         """
-        if not self.exposures:
+        if self.exposures.empty:
             logging.warning("No exposures data to save. Run generate_exposures() first.")
             return
 
@@ -55,16 +80,22 @@ class BaseRiskModel(ABC):
             model_dir = Path(os.path.join(config.get_output_dir(), self.model.lower()))
             model_dir.mkdir(parents=True, exist_ok=True)
 
-            # Create the output file path
-            output_file = model_dir / "exposures.csv"
+            outputs = {
+                "exposures": self.exposures,
+                "factor_covariance": self.factor_covariance,
+                "specific_risk": self.specific_risk,
+            }
+            for name, df in outputs.items():
+                if df.empty:
+                    logging.warning(f"No {name} data to save.")
+                    continue
 
-            # Convert exposures to DataFrame and save to CSV
-            df = pd.DataFrame(self.exposures)
-            df.to_csv(output_file, index=False, sep="|")
+                output_file = model_dir / f"{name}.parquet"
+                df.to_parquet(output_file, index=False)
 
-            logging.info(f"Exposures saved successfully to: {output_file}")
-            logging.info(f"Saved {len(df)} rows of exposure data.")
+                logging.info(f"{name} saved successfully to: {output_file}")
+                logging.info(f"Saved {len(df)} rows of {name} data.")
 
         except Exception as e:
-            logging.error(f"Failed to save exposures file: {e}")
-            raise
\ No newline at end of file
+            logging.error(f"Failed to save risk model files: {e}")
+            raise
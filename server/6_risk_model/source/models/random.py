@@ -1,7 +1,7 @@
 from source.models.base import BaseRiskModel
 from datetime import date
-from typing import List, Dict, Any
-import random
+from typing import List, Optional
+import numpy as np
 import pandas as pd
 import logging
 
@@ -17,15 +17,25 @@ class RandomRiskModel(BaseRiskModel):
     ALL risk model structure and factor definitions are contained here.
     """
 
-    def __init__(self, model: str, master_data: pd.DataFrame):
+    # Master data column behind each factor type whose exposures sum to 1
+    FACTOR_TYPE_COLUMNS = {
+        "Sector": "sector",
+        "Region": "region",
+        "Currency": "currency",
+        "MarketCap": "scalemarketcap",
+    }
+
+    def __init__(self, model: str, master_data: pd.DataFrame, seed: Optional[int] = None):
         """
         Initializes the Random risk model.
 
         Args:
             model (str): The name of the risk model.
-            symbol_manager (SymbolManager): Symbol manager containing master data.
+            master_data (pd.DataFrame): Master data for the symbol universe.
+            seed (Optional[int]): Seed for the random generator; None draws fresh entropy.
         """
         super().__init__(model, master_data)
+        self.rng = np.random.default_rng(seed)
 
         # Get the master data from symbol manager and update all mappings
         self.master_data = update_sectors(master_data)
@@ -94,7 +104,18 @@ class RandomRiskModel(BaseRiskModel):
         logging.info(f"  Currency factors: {len(self.currency_factors)}")
         logging.info(f"  Market Cap factors: {len(self.mktcap_factors)}")
 
-        self.exposures = pd.DataFrame()
+        # Every factor as (factor1, factor2), in exposure matrix and covariance column order
+        self.factors = [(factor_type, factor_name)
+                        for factor_types in (self.factor_types_cum_eq_1, self.factor_types_cum_neq_1)
+                        for factor_type, factor_names in factor_types.items()
+                        for factor_name in factor_names]
+
+        # One master row per symbol (the first), so symbol lookups are index hits instead of scans
+        self.symbol_data = self._index_symbol_data()
+
+        self.symbols = []
+        self.exposure_matrix = np.empty((0, len(self.factors)))
+        self.factor_covariance_matrix = np.empty((0, 0))
 
     def _extract_sectors(self) -> List[str]:
         """Extract unique sectors from master data"""
@@ -180,265 +201,190 @@ class RandomRiskModel(BaseRiskModel):
 
         raise ValueError("No market cap scale column found in master data")
 
-    def get_symbol_sector(self, symbol: str) -> str:
-        """Get sector for a specific symbol from master data"""
-        # Try to find the symbol in master data
-        symbol_columns = ["symbol"]
-        sector_columns = ["sector"]
+    def _index_symbol_data(self) -> pd.DataFrame:
+        """Master data reduced to the first row per symbol, indexed by symbol"""
+        if "symbol" not in self.master_data.columns:
+            return pd.DataFrame(index=pd.Index([], name="symbol"))
 
-        symbol_col = None
-        sector_col = None
+        symbol_data = self.master_data[self.master_data["symbol"].notna()]
+        return symbol_data.drop_duplicates(subset="symbol").set_index("symbol")
 
-        for col in symbol_columns:
-            if col in self.master_data.columns:
-                symbol_col = col
-                break
+    def _get_symbol_value(self, symbol: str, column: str) -> str:
+        """Get a master data value for a specific symbol, 'UNKNOWN' if missing"""
+        if column in self.symbol_data.columns and symbol in self.symbol_data.index:
+            value = self.symbol_data.at[symbol, column]
+            if pd.notna(value) and value != 'UNKNOWN':
+                return value
 
-        for col in sector_columns:
-            if col in self.master_data.columns:
-                sector_col = col
-                break
+        return 'UNKNOWN'
 
-        if symbol_col and sector_col:
-            symbol_data = self.master_data[self.master_data[symbol_col] == symbol]
-            if not symbol_data.empty:
-                sector = symbol_data[sector_col].iloc[0]
-                if pd.notna(sector) and sector != 'UNKNOWN':
-                    return sector
+    def _get_symbol_values(self, symbols: List[str], column: str) -> np.ndarray:
+        """_get_symbol_value for many symbols at once"""
+        if column not in self.symbol_data.columns:
+            return np.full(len(symbols), 'UNKNOWN', dtype=object)
 
-        # Fallback to random sector
-        return 'UNKNOWN'
+        values = self.symbol_data[column].reindex(symbols)
+        return values.where(values.notna() & (values != 'UNKNOWN'), 'UNKNOWN').to_numpy(dtype=object)
+
+    def get_symbol_sector(self, symbol: str) -> str:
+        """Get sector for a specific symbol from master data"""
+        return self._get_symbol_value(symbol, "sector")
 
     def get_symbol_region(self, symbol: str) -> str:
         """Get region for a specific symbol from master data"""
         if self.master_data.empty:
-            return random.choice(self.region_factors)
-
-        # Similar logic as get_symbol_sector but for region
-        symbol_columns = ["symbol"]
-        region_columns = ["region"]
-
-        symbol_col = None
-        region_col = None
+            return str(self.rng.choice(self.region_factors))
 
-        for col in symbol_columns:
-            if col in self.master_data.columns:
-                symbol_col = col
-                break
-
-        for col in region_columns:
-            if col in self.master_data.columns:
-                region_col = col
-                break
-
-        if symbol_col and region_col:
-            symbol_data = self.master_data[self.master_data[symbol_col] == symbol]
-            if not symbol_data.empty:
-                region = symbol_data[region_col].iloc[0]
-                if pd.notna(region) and region != 'UNKNOWN':
-                    return region
-
-        return 'UNKNOWN'
+        return self._get_symbol_value(symbol, "region")
 
     def get_symbol_currency(self, symbol: str) -> str:
         """Get currency for a specific symbol from master data"""
-        # Similar logic as get_symbol_sector but for currency
-        symbol_columns = ["symbol"]
-        currency_columns = ["currency"]
-
-        symbol_col = None
-        currency_col = None
-
-        for col in symbol_columns:
-            if col in self.master_data.columns:
-                symbol_col = col
-                break
-
-        for col in currency_columns:
-            if col in self.master_data.columns:
-                currency_col = col
-                break
-
-        if symbol_col and currency_col:
-            symbol_data = self.master_data[self.master_data[symbol_col] == symbol]
-            if not symbol_data.empty:
-                currency = symbol_data[currency_col].iloc[0]
-                if pd.notna(currency) and currency != 'UNKNOWN':
-                    return currency
-
-        return 'UNKNOWN'
+        return self._get_symbol_value(symbol, "currency")
 
     def get_symbol_mktcap(self, symbol: str) -> str:
         """Get market cap scale for a specific symbol from master data"""
-        # Similar logic as get_symbol_sector but for market cap scale
-        symbol_columns = ["symbol"]
-        mktcap_columns = ["scalemarketcap"]
-
-        symbol_col = None
-        mktcap_col = None
-
-        for col in symbol_columns:
-            if col in self.master_data.columns:
-                symbol_col = col
-                break
-
-        for col in mktcap_columns:
-            if col in self.master_data.columns:
-                mktcap_col = col
-                break
-
-        if symbol_col and mktcap_col:
-            symbol_data = self.master_data[self.master_data[symbol_col] == symbol]
-            if not symbol_data.empty:
-                mktcap = symbol_data[mktcap_col].iloc[0]
-                if pd.notna(mktcap) and mktcap != 'UNKNOWN':
-                    return mktcap
-
-        return 'UNKNOWN'
+        return self._get_symbol_value(symbol, "scalemarketcap")
 
     def _get_symbols_from_master_data(self) -> List[str]:
         """Extract symbols from master data"""
-        # Try common symbol column names
-        symbol_columns = ["symbol"]
-
-        for col in symbol_columns:
-            if col in self.master_data.columns:
-                symbols = self.master_data[col].dropna().unique().tolist()
-                if symbols:
-                    logging.info(f"Found {len(symbols)} symbols in column '{col}'")
-                    return symbols
-
-        logging.warning("No symbol column found in master data")
-        return []
-
-    def generate_exposures(self, date: date) -> List[Dict[str, Any]]:
+        symbols = self.symbol_data.index.tolist()
+        if symbols:
+            logging.info(f"Found {len(symbols)} symbols in column 'symbol'")
+        else:
+            logging.warning("No symbol column found in master data")
+        return symbols
+
+    def _one_hot(self, values: np.ndarray, factor_names: List[str]) -> np.ndarray:
+        """1.0 in the column of each symbol's own factor, 0.0 elsewhere (all zeros if it has none)"""
+        codes = pd.Categorical(values, categories=factor_names).codes
+        block = np.zeros((len(values), len(factor_names)))
+        has_factor = np.flatnonzero(codes >= 0)
+        block[has_factor, codes[has_factor]] = 1.0
+        return block
+
+    def _random_simplex(self, n_symbols: int, n_factors: int) -> np.ndarray:
+        """Non-negative random values per symbol that sum to 1 (gaps between sorted uniform points)"""
+        points = np.sort(self.rng.uniform(0, 1, (n_symbols, n_factors - 1)), axis=1)
+        edges = np.hstack([np.zeros((n_symbols, 1)), points, np.ones((n_symbols, 1))])
+        return np.diff(edges, axis=1)
+
+    def generate_exposures(self, date: date) -> pd.DataFrame:
         """
         Generates random risk factor data for the given symbols and date.
         For factors where the cumulative sum must equal one, it generates non-negative
         values that sum to 1. For other factors, it generates random values.
 
+        The full symbols x factors matrix is built at once and kept in exposure_matrix;
+        the returned frame holds its non-zero entries, one row per symbol and factor.
+
         Args:
             date (date): The date for which to generate the data.
 
         Returns:
-            List[Dict[str, Any]]: A list of dictionaries with the generated data.
+            pd.DataFrame: date, model, symbol, factor1, factor2, factor3 and value columns.
         """
-        data = []
-
         # Get symbols from master data
         symbols = self._get_symbols_from_master_data()
 
         if not symbols:
             logging.error("No symbols found in master data")
-            return data
-
-        for symbol in symbols:
-            # Generate factors where the cumulative sum must equal 1 and values are non-negative
-            for factor_type, factor_names in self.factor_types_cum_eq_1.items():
-                if factor_type == "Sector":
-                    # For sectors, assign 1.0 to the symbol's actual sector, 0.0 to others
-                    symbol_sector = self.get_symbol_sector(symbol)
-                    for factor_name in factor_names:
-                        value = 1.0 if factor_name == symbol_sector else 0.0
-                        row = {
-                            "date": date,
-                            "model": self.model,
-                            "symbol": symbol,
-                            "factor1": factor_type,
-                            "factor2": factor_name,
-                            "factor3": "",
-                            "value": round(value, 6)
-                        }
-                        data.append(row)
-
-                elif factor_type == "Region":
-                    # For regions, assign 1.0 to the symbol's actual region, 0.0 to others
-                    symbol_region = self.get_symbol_region(symbol)
-                    for factor_name in factor_names:
-                        value = 1.0 if factor_name == symbol_region else 0.0
-                        row = {
-                            "date": date,
-                            "model": self.model,
-                            "symbol": symbol,
-                            "factor1": factor_type,
-                            "factor2": factor_name,
-                            "factor3": "",
-                            "value": round(value, 6)
-                        }
-                        data.append(row)
-
-                elif factor_type == "Currency":
-                    # For currencies, assign 1.0 to the symbol's actual currency, 0.0 to others
-                    symbol_currency = self.get_symbol_currency(symbol)
-                    for factor_name in factor_names:
-                        value = 1.0 if factor_name == symbol_currency else 0.0
-                        row = {
-                            "date": date,
-                            "model": self.model,
-                            "symbol": symbol,
-                            "factor1": factor_type,
-                            "factor2": factor_name,
-                            "factor3": "",
-                            "value": round(value, 6)
-                        }
-                        data.append(row)
-
-                elif factor_type == "MarketCap":
-                    # For market cap, assign 1.0 to the symbol's actual market cap scale, 0.0 to others
-                    symbol_mktcap = self.get_symbol_mktcap(symbol)
-                    for factor_name in factor_names:
-                        value = 1.0 if factor_name == symbol_mktcap else 0.0
-                        row = {
-                            "date": date,
-                            "model": self.model,
-                            "symbol": symbol,
-                            "factor1": factor_type,
-                            "factor2": factor_name,
-                            "factor3": "",
-                            "value": round(value, 6)
-                        }
-                        data.append(row)
-
-                else:
-                    # For other factor types, generate random values that sum to 1
-                    num_factors = len(factor_names)
-                    random_points = sorted([random.uniform(0, 1) for _ in range(num_factors - 1)])
-
-                    values_to_sum = [random_points[0]]
-                    for i in range(num_factors - 2):
-                        values_to_sum.append(random_points[i + 1] - random_points[i])
-                    values_to_sum.append(1 - random_points[-1])
-
-                    for factor_name, value in zip(factor_names, values_to_sum):
-                        row = {
-                            "date": date,
-                            "model": self.model,
-                            "symbol": symbol,
-                            "factor1": factor_type,
-                            "factor2": factor_name,
-                            "factor3": "",
-                            "value": round(value, 6)
-                        }
-                        data.append(row)
-
-            # Generate factors where the cumulative sum does not have to equal 1
-            for factor_type, factor_names in self.factor_types_cum_neq_1.items():
-                for factor_name in factor_names:
-                    value = round(random.uniform(-1.0, 1.0), 6)  # Random value between -1 and 1
-                    row = {
-                        "date": date,
-                        "model": self.model,
-                        "symbol": symbol,
-                        "factor1": factor_type,
-                        "factor2": factor_name,
-                        "factor3": "",
-                        "value": value
-                    }
-                    data.append(row)
+            return self.exposures
+
+        blocks = []
+
+        # Generate factors where the cumulative sum must equal 1 and values are non-negative
+        for factor_type, factor_names in self.factor_types_cum_eq_1.items():
+            if factor_type in self.FACTOR_TYPE_COLUMNS:
+                # Assign 1.0 to the symbol's actual sector/region/currency/market cap, 0.0 to others
+                values = self._get_symbol_values(symbols, self.FACTOR_TYPE_COLUMNS[factor_type])
+                blocks.append(self._one_hot(values, factor_names))
+            else:
+                # For other factor types, generate random values that sum to 1
+                blocks.append(self._random_simplex(len(symbols), len(factor_names)))
+
+        # Generate factors where the cumulative sum does not have to equal 1
+        for factor_type, factor_names in self.factor_types_cum_neq_1.items():
+            blocks.append(self.rng.uniform(-1.0, 1.0, (len(symbols), len(factor_names))))
+
+        self.symbols = symbols
+        self.exposure_matrix = np.hstack(blocks).round(6)
 
         # Filter out zero exposures for cleaner output
-        data = [row for row in data if row['value'] != 0.0]
+        rows, columns = np.nonzero(self.exposure_matrix)
+        factor1, factor2 = (np.array(names, dtype=object) for names in zip(*self.factors))
+        self.exposures = pd.DataFrame({
+            "date": date,
+            "model": self.model,
+            "symbol": np.array(symbols, dtype=object)[rows],
+            "factor1": factor1[columns],
+            "factor2": factor2[columns],
+            "factor3": "",
+            "value": self.exposure_matrix[rows, columns],
+        })
+
+        logging.info(f"Generated {len(self.exposures)} non-zero exposure records for {len(symbols)} symbols")
+        return self.exposures
+
+    def generate_factor_covariance(self, date: date) -> pd.DataFrame:
+        """
+        Generates a random positive-definite factor covariance matrix.
 
-        self.exposures = data
+        Correlations come from a few random latent drivers plus a positive idiosyncratic
+        diagonal, rescaled to unit diagonal, so the matrix is positive-definite by construction.
+        Factor volatilities are drawn between 5% and 25%.
 
-        logging.info(f"Generated {len(data)} non-zero exposure records for {len(symbols)} symbols")
\ No newline at end of file
+        Args:
+            date (date): The date for which to generate the data.
+
+        Returns:
+            pd.DataFrame: date, model, factor1, factor2, pair_factor1, pair_factor2 and value
+            columns, one row per factor pair.
+        """
+        n_factors = len(self.factors)
+        loadings = self.rng.normal(0.0, 1.0, (n_factors, max(1, n_factors // 5)))
+        shared = loadings @ loadings.T + np.diag(self.rng.uniform(0.5, 1.5, n_factors))
+        scale = 1.0 / np.sqrt(np.diag(shared))
+        correlation = shared * np.outer(scale, scale)
+
+        volatility = self.rng.uniform(0.05, 0.25, n_factors)
+        covariance = correlation * np.outer(volatility, volatility)
+
+        # Raises LinAlgError if the matrix is not positive-definite
+        np.linalg.cholesky(covariance)
+        self.factor_covariance_matrix = covariance
+
+        factor1, factor2 = (np.array(names, dtype=object) for names in zip(*self.factors))
+        rows, columns = np.indices((n_factors, n_factors)).reshape(2, -1)
+        self.factor_covariance = pd.DataFrame({
+            "date": date,
+            "model": self.model,
+            "factor1": factor1[rows],
+            "factor2": factor2[rows],
+            "pair_factor1": factor1[columns],
+            "pair_factor2": factor2[columns],
+            "value": covariance.ravel(),
+        })
+
+        logging.info(f"Generated {n_factors}x{n_factors} factor covariance")
+        return self.factor_covariance
+
+    def generate_specific_risk(self, date: date) -> pd.DataFrame:
+        """
+        Generates a random specific (idiosyncratic) volatility per symbol, log-normal around 30%.
+
+        Args:
+            date (date): The date for which to generate the data.
+
+        Returns:
+            pd.DataFrame: date, model, symbol and value columns.
+        """
+        symbols = self._get_symbols_from_master_data()
+        self.specific_risk = pd.DataFrame({
+            "date": date,
+            "model": self.model,
+            "symbol": symbols,
+            "value": self.rng.lognormal(np.log(0.30), 0.4, len(symbols)),
+        })
+
+        logging.info(f"Generated specific risk for {len(symbols)} symbols")
+        return self.specific_risk
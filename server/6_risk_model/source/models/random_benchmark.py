@@ -0,0 +1,199 @@
+"""
+Invariant checks and scaling benchmark for the random risk model.
+
+    python -m source.models.random_benchmark --check-symbols 2000 --sizes 5000 10000 20000 50000
+
+Builds synthetic master data the way load_master_file reads it (all strings, blanks as '') with
+missing and non-standard sectors, regions, currencies and market cap scales, so the update_* fills
+run as they do on real files. The checks assert the sector/region/currency/market cap blocks of the
+exposure matrix match the original per-symbol master scans, every such block sums to 1, the factor
+covariance is symmetric positive-definite, specific risk is positive, and a seed reproduces every
+output. The benchmark times model construction, exposures, covariance and specific risk, and the
+Parquet save; the original row-by-row exposure loop is only timed up to --legacy-symbols.
+"""
+import argparse
+import contextlib
+import io
+import logging
+import os
+import random
+import shutil
+import tempfile
+import time
+from datetime import date
+
+ROOT = tempfile.mkdtemp(prefix='random_risk_benchmark_')
+os.environ.update({
+    'ENVIRONMENT': 'benchmark',
+    'LOG_LEVEL': 'WARNING',
+    'MASTER_DIR': os.path.join(ROOT, 'master'),
+    'OUTPUT_DIR': os.path.join(ROOT, 'output'),
+})
+
+import numpy as np
+import pandas as pd
+
+from source.config import config
+from source.models.random import RandomRiskModel
+
+SECTORS = ['Energy', 'Materials', 'Industrials', 'Consumer Discretionary', 'Consumer Staples', 'Health Care',
+           'Financials', 'Information Technology', 'Communication Services', 'Utilities', 'Real Estate',
+           'Healthcare', 'Technology', 'Basic Materials']
+SCALES = [('1 - Nano', 1e6, 5e7), ('2 - Micro', 5e7, 3e8), ('3 - Small', 3e8, 2e9), ('4 - Mid', 2e9, 1e10),
+          ('5 - Large', 1e10, 2e11), ('6 - Mega', 2e11, 3e12)]
+COUNTRIES = ['United States', 'United States', 'United States', 'Canada', 'United Kingdom', 'Germany', 'Japan',
+             'India', 'Brazil', 'Cayman Islands']
+TODAY = date.today()
+
+
+def make_master_data(n_symbols: int, seed: int = 0) -> pd.DataFrame:
+    """Synthetic master data with gaps for every update_* fill and a few duplicated symbols"""
+    rng = random.Random(seed)
+
+    def maybe_blank(value, share):
+        return '' if rng.random() < share else value
+
+    rows = []
+    for i in range(n_symbols):
+        scale, low, high = rng.choice(SCALES)
+        rows.append({
+            'symbol': f"S{i}",
+            'composite_figi': f"F{rng.randrange(max(1, n_symbols // 3))}",
+            'industry': f"I{rng.randrange(60)}",
+            'sector': maybe_blank(rng.choice(SECTORS), 0.1),
+            'country': maybe_blank(rng.choice(COUNTRIES), 0.02),
+            'region': '',
+            'currency': maybe_blank(rng.choice(['USD', 'EUR', 'JPY', 'CAD', 'GBP']), 0.3),
+            'scalemarketcap': maybe_blank(scale, 0.2),
+            'market_capital': maybe_blank(f"{rng.uniform(low, high):.2f}", 0.05),
+        })
+    rows += [dict(rows[rng.randrange(n_symbols)], sector='Utilities') for _ in range(n_symbols // 100)]
+    return pd.DataFrame(rows, dtype=str)
+
+
+class LegacyRandomRiskModel(RandomRiskModel):
+    """The original exposure loop: a master scan per symbol and factor type, one dict per row"""
+
+    def _scan(self, symbol: str, column: str) -> str:
+        symbol_data = self.master_data[self.master_data['symbol'] == symbol]
+        if not symbol_data.empty:
+            value = symbol_data[column].iloc[0]
+            if pd.notna(value) and value != 'UNKNOWN':
+                return value
+        return 'UNKNOWN'
+
+    def generate_exposures(self, date: date) -> pd.DataFrame:
+        data = []
+        for symbol in self.master_data['symbol'].dropna().unique().tolist():
+            for factor_type, factor_names in self.factor_types_cum_eq_1.items():
+                symbol_value = self._scan(symbol, self.FACTOR_TYPE_COLUMNS[factor_type])
+                for factor_name in factor_names:
+                    data.append({"date": date, "model": self.model, "symbol": symbol, "factor1": factor_type,
+                                 "factor2": factor_name, "factor3": "",
+                                 "value": 1.0 if factor_name == symbol_value else 0.0})
+            for factor_type, factor_names in self.factor_types_cum_neq_1.items():
+                for factor_name in factor_names:
+                    data.append({"date": date, "model": self.model, "symbol": symbol, "factor1": factor_type,
+                                 "factor2": factor_name, "factor3": "", "value": round(random.uniform(-1.0, 1.0), 6)})
+        self.exposures = pd.DataFrame([row for row in data if row['value'] != 0.0])
+        return self.exposures
+
+
+def _build(model_class, master_data, **kwargs):
+    """Construct a model with the update_* and debug prints kept off stdout"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return model_class(model='RANDOM', master_data=master_data, **kwargs)
+
+
+def _categorical(exposures: pd.DataFrame) -> pd.DataFrame:
+    return exposures[exposures['factor1'] != 'Style'].reset_index(drop=True)
+
+
+def check_invariants(n_symbols: int, seed: int = 0):
+    master_data = make_master_data(n_symbols, seed)
+    model = _build(RandomRiskModel, master_data, seed=seed)
+    exposures = model.generate_exposures(date=TODAY)
+    covariance = model.generate_factor_covariance(date=TODAY)
+    specific_risk = model.generate_specific_risk(date=TODAY)
+
+    legacy = _build(LegacyRandomRiskModel, master_data)
+    pd.testing.assert_frame_equal(_categorical(exposures), _categorical(legacy.generate_exposures(date=TODAY)))
+
+    matrix = model.exposure_matrix
+    assert matrix.shape == (len(model.symbols), len(model.factors))
+    column = 0
+    for factor_type, factor_names in model.factor_types_cum_eq_1.items():
+        block = matrix[:, column:column + len(factor_names)]
+        assert np.allclose(block.sum(axis=1), 1.0), factor_type
+        column += len(factor_names)
+    style = matrix[:, column:]
+    assert style.shape[1] == len(model.style_factors) and np.all(np.abs(style) <= 1.0)
+    assert len(exposures) == np.count_nonzero(matrix)
+    for symbol in model.symbols[:50]:
+        assert model.get_symbol_sector(symbol) == legacy._scan(symbol, 'sector')
+
+    sigma = model.factor_covariance_matrix
+    assert np.allclose(sigma, sigma.T)
+    assert np.linalg.eigvalsh(sigma).min() > 0
+    assert len(covariance) == len(model.factors) ** 2
+    assert len(specific_risk) == len(model.symbols) and (specific_risk['value'] > 0).all()
+
+    again = _build(RandomRiskModel, master_data, seed=seed)
+    pd.testing.assert_frame_equal(again.generate_exposures(date=TODAY), exposures)
+    pd.testing.assert_frame_equal(again.generate_factor_covariance(date=TODAY), covariance)
+    pd.testing.assert_frame_equal(again.generate_specific_risk(date=TODAY), specific_risk)
+    print(f"checks ok: symbols={len(model.symbols):,} factors={len(model.factors)} exposure_rows={len(exposures):,} "
+          f"min_eigenvalue={np.linalg.eigvalsh(sigma).min():.2e}")
+
+
+def benchmark(sizes, legacy_symbols: int, seed: int = 0):
+    print(f"\n{'symbols':>10} {'rows':>10} {'init_s':>8} {'row-by-row_s':>13} {'exposures_s':>12} "
+          f"{'cov+specific_s':>15} {'parquet_s':>10} {'parquet_MB':>11}")
+    for n_symbols in sizes:
+        master_data = make_master_data(n_symbols, seed)
+        started = time.perf_counter()
+        model = _build(RandomRiskModel, master_data, seed=seed)
+        init = time.perf_counter() - started
+
+        started = time.perf_counter()
+        exposures = model.generate_exposures(date=TODAY)
+        generate = time.perf_counter() - started
+
+        started = time.perf_counter()
+        model.generate_factor_covariance(date=TODAY)
+        model.generate_specific_risk(date=TODAY)
+        risk = time.perf_counter() - started
+
+        started = time.perf_counter()
+        model.save_file()
+        save = time.perf_counter() - started
+        model_dir = os.path.join(config.get_output_dir(), model.model.lower())
+        size = sum(os.path.getsize(os.path.join(model_dir, name)) for name in os.listdir(model_dir)) / 1e6
+
+        legacy = '-'
+        if n_symbols <= legacy_symbols:
+            legacy_model = _build(LegacyRandomRiskModel, master_data)
+            started = time.perf_counter()
+            legacy_model.generate_exposures(date=TODAY)
+            legacy = f"{time.perf_counter() - started:.2f}"
+        print(f"{n_symbols:>10,} {len(exposures):>10,} {init:>8.2f} {legacy:>13} {generate:>12.3f} "
+              f"{risk:>15.3f} {save:>10.3f} {size:>11.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Invariant checks and scaling benchmark for the random risk model")
+    parser.add_argument('--check-symbols', type=int, default=2000, help="symbols for the checks (0 to skip)")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 10000, 20000, 50000])
+    parser.add_argument('--legacy-symbols', type=int, default=5000,
+                        help="largest size the row-by-row exposure loop is timed at")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # The model and the update_* fills log and print per run; keep the output about the results
+    logging.disable(logging.WARNING)
+    try:
+        if args.check_symbols:
+            check_invariants(args.check_symbols, args.seed)
+        benchmark(args.sizes, args.legacy_symbols, args.seed)
+    finally:
+        shutil.rmtree(ROOT, ignore_errors=True)
@@ -23,41 +23,26 @@ def update_currencies(df):
         'Offshore': 'USD',
     }
 
-    filled_count = 0
-    debug_count = 0
-
-    for idx, row in result_df.iterrows():
-        current_currency = row.get('currency')
-
-        # Skip if we already have a valid currency
-        if (pd.notna(current_currency) and
-                current_currency != '' and
-                current_currency != 'UNKNOWN' and
-                str(current_currency).strip() != ''):
-            continue
-
-        # Debug the first few problematic records
-        if debug_count < 5:
-            print(f"DEBUG: Symbol {row.get('symbol')}, Region: '{row.get('region')}', Currency: '{current_currency}'")
-            debug_count += 1
-
-        # Try to map using region
-        if 'region' in result_df.columns:
-            current_region = row.get('region')
-            if (pd.notna(current_region) and
-                    current_region != 'UNKNOWN' and
-                    str(current_region).strip() in region_to_currency):
-
-                mapped_currency = region_to_currency[str(current_region).strip()]
-                result_df.at[idx, 'currency'] = mapped_currency
-                filled_count += 1
-
-                if debug_count <= 5:
-                    print(f"DEBUG: Mapped {current_region} -> {mapped_currency}")
-                continue
-
-        # Default to UNKNOWN
-        result_df.at[idx, 'currency'] = "UNKNOWN"
+    current_currency = result_df['currency']
+    needs_currency = ~(current_currency.notna() & (current_currency != '') & (current_currency != 'UNKNOWN') &
+                       (current_currency.astype(str).str.strip() != ''))
+
+    # Try to map using region, default to UNKNOWN
+    mapped_currency = pd.Series("UNKNOWN", index=result_df.index, dtype=object)
+    if 'region' in result_df.columns:
+        current_region = result_df['region']
+        from_region = current_region.where(current_region.notna() & (current_region != 'UNKNOWN'))
+        from_region = from_region.astype(str).str.strip().map(region_to_currency)
+        mapped_currency = from_region.where(from_region.notna(), mapped_currency)
+
+    # Debug the first few problematic records
+    for idx, row in result_df[needs_currency].head(5).iterrows():
+        print(f"DEBUG: Symbol {row.get('symbol')}, Region: '{row.get('region')}', Currency: '{row.get('currency')}'")
+        if mapped_currency[idx] != "UNKNOWN":
+            print(f"DEBUG: Mapped {row.get('region')} -> {mapped_currency[idx]}")
+
+    filled_count = int((needs_currency & (mapped_currency != "UNKNOWN")).sum())
+    result_df.loc[needs_currency, 'currency'] = mapped_currency[needs_currency]
 
     # Final cleanup
     result_df['currency'] = result_df['currency'].fillna("UNKNOWN")
@@ -121,38 +121,26 @@ def update_mktcap(df):
                 f"  {category}: ${bounds[0]:,.0f} - ${bounds[1]:,.0f} (median: ${scale_bins[category]['median']:,.0f}, count: {scale_bins[category]['count']})")
 
     # Step 4: Apply mapping to fill missing scalemarketcap values
-    filled_count = 0
-
-    for idx, row in result_df.iterrows():
-        current_scale = row.get('scalemarketcap')
-        current_mktcap = row.get('market_capital')
-
-        # Skip if we already have a valid scalemarketcap
-        if (pd.notna(current_scale) and
-                current_scale != '' and
-                current_scale != 'UNKNOWN' and
-                str(current_scale).strip() != ''):
-            continue
-
-        # Try to map using market_capital
-        if pd.notna(current_mktcap) and isinstance(current_mktcap, (int, float)) and current_mktcap > 0:
-            mapped_category = None
-
-            try:
-                for (lower, upper), category in category_mapping.items():
-                    if lower <= current_mktcap < upper:
-                        mapped_category = category
-                        break
-
-                if mapped_category:
-                    result_df.at[idx, 'scalemarketcap'] = mapped_category
-                    filled_count += 1
-                else:
-                    result_df.at[idx, 'scalemarketcap'] = "UNKNOWN"
-            except (TypeError, ValueError):
-                result_df.at[idx, 'scalemarketcap'] = "UNKNOWN"
-        else:
-            result_df.at[idx, 'scalemarketcap'] = "UNKNOWN"
+    # Bins are contiguous [lower, upper) intervals from 0, so a sorted search on the upper bounds finds each bin
+    scale = result_df['scalemarketcap']
+    has_scale = (scale.notna() & (scale != '') & (scale != 'UNKNOWN') &
+                 (scale.astype(str).str.strip() != '')).to_numpy()
+    needs_scale = ~has_scale
+
+    bounds = list(category_mapping)
+    uppers = np.array([upper for _, upper in bounds], dtype=float)
+    categories = np.array([category_mapping[bound] for bound in bounds] + ["UNKNOWN"], dtype=object)
+
+    mktcap = result_df['market_capital'].to_numpy(dtype=float)
+    mappable = needs_scale & (mktcap > 0)  # False for NaN
+    bins = np.full(len(result_df), len(bounds))
+    bins[mappable] = np.searchsorted(uppers, mktcap[mappable], side='right')
+    in_range = mappable & (bins < len(bounds))
+    in_range[in_range] = mktcap[in_range] >= np.array([lower for lower, _ in bounds])[bins[in_range]]
+    bins[~in_range] = len(bounds)
+
+    filled_count = int(in_range.sum())
+    result_df.loc[needs_scale, 'scalemarketcap'] = categories[bins[needs_scale]]
 
     # Final cleanup
     result_df['scalemarketcap'] = result_df['scalemarketcap'].fillna("UNKNOWN")
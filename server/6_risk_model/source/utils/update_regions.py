@@ -133,28 +133,17 @@ def update_regions(df):
             f"Unmapped countries found: {unmapped_countries}. Add these to country_to_region_mapping in update_regions.py")
 
     # Map countries to regions
-    mapped_count = 0
-
-    for idx, row in result_df.iterrows():
-        current_region = row.get('region')
-        current_country = row.get('country')
-
-        # Skip if we already have a valid region
-        if (pd.notna(current_region) and
-                current_region != '' and
-                current_region != 'UNKNOWN' and
-                str(current_region).strip() != ''):
-            continue
-
-        # Map country to region
-        if pd.notna(current_country) and str(current_country).strip() != '':
-            country_key = str(current_country).strip()
-
-            result_df.at[idx, 'region'] = country_to_region_mapping[country_key]
-            mapped_count += 1
-        else:
-            # Empty or null countries map to UNKNOWN
-            result_df.at[idx, 'region'] = "UNKNOWN"
+    current_region = result_df['region']
+    needs_region = ~(current_region.notna() & (current_region != '') & (current_region != 'UNKNOWN') &
+                     (current_region.astype(str).str.strip() != ''))
+
+    # Empty or null countries map to UNKNOWN
+    country_key = result_df['country'].where(result_df['country'].notna()).astype(str).str.strip()
+    has_country = result_df['country'].notna() & (country_key != '')
+    mapped_region = country_key.map(country_to_region_mapping).where(has_country, "UNKNOWN")
+
+    mapped_count = int((needs_region & has_country).sum())
+    result_df.loc[needs_region, 'region'] = mapped_region[needs_region]
 
     # Final cleanup
     result_df['region'] = result_df['region'].fillna("UNKNOWN")
@@ -1,6 +1,5 @@
 import pandas as pd
 import numpy as np
-from collections import defaultdict
 
 
 def update_sectors(df):
@@ -25,10 +24,8 @@ def update_sectors(df):
     }
 
     # Apply sector standardization
-    for idx, row in result_df.iterrows():
-        current_sector = row.get('sector')
-        if pd.notna(current_sector) and str(current_sector).strip() in sector_mapping:
-            result_df.at[idx, 'sector'] = sector_mapping[str(current_sector).strip()]
+    standardized = result_df['sector'].where(result_df['sector'].notna()).astype(str).str.strip().map(sector_mapping)
+    result_df.loc[standardized.notna(), 'sector'] = standardized[standardized.notna()]
 
     # Define identifier columns to use for mapping (in priority order)
     identifier_columns = ['composite_figi', 'share_class_figi', 'cik', 'isin',
@@ -44,69 +41,39 @@ def update_sectors(df):
 
     # Create mappings from identifiers to sectors for records that already have sectors
     identifier_to_sector_maps = {}
+    has_sector = (result_df['sector'].notna()) & (result_df['sector'] != '') & (result_df['sector'] != 'UNKNOWN')
+    sector_key = result_df['sector'].astype(str).str.strip()
 
     for identifier_col in available_identifiers:
-        identifier_to_sector_maps[identifier_col] = {}
-
         # Get records that have both the identifier and a valid sector
-        valid_records = result_df[
-            (result_df[identifier_col].notna()) &
-            (result_df[identifier_col] != '') &
-            (result_df['sector'].notna()) &
-            (result_df['sector'] != '') &
-            (result_df['sector'] != 'UNKNOWN')
-            ]
-
-        if len(valid_records) > 0:
-            # Group by identifier and collect unique sectors
-            identifier_sectors = defaultdict(set)
-            for _, row in valid_records.iterrows():
-                identifier_key = str(row[identifier_col]).strip()
-                sector_value = str(row['sector']).strip()
-                identifier_sectors[identifier_key].add(sector_value)
+        valid = has_sector & (result_df[identifier_col].notna()) & (result_df[identifier_col] != '')
+        identifier_sectors = pd.DataFrame({
+            'identifier': result_df.loc[valid, identifier_col].astype(str).str.strip(),
+            'sector': sector_key[valid],
+        }).drop_duplicates()
 
-            # Only keep mappings where identifier maps to exactly one unique sector
-            for identifier_key, sectors in identifier_sectors.items():
-                if len(sectors) == 1:
-                    identifier_to_sector_maps[identifier_col][identifier_key] = list(sectors)[0]
+        # Only keep mappings where identifier maps to exactly one unique sector
+        unique = identifier_sectors[~identifier_sectors['identifier'].duplicated(keep=False)]
+        identifier_to_sector_maps[identifier_col] = dict(zip(unique['identifier'], unique['sector']))
 
     # Apply fallback logic to fill missing sectors
-    filled_count = 0
-
-    for idx, row in result_df.iterrows():
-        current_sector = row.get('sector')
-
-        # Skip if we already have a valid sector
-        if (pd.notna(current_sector) and
-                current_sector != '' and
-                current_sector != 'UNKNOWN' and
-                str(current_sector).strip() != ''):
-            continue
-
-        # Try to find a sector using available identifiers (in priority order)
-        found_sector = None
+    current_sector = result_df['sector']
+    needs_sector = ~(current_sector.notna() & (current_sector != '') & (current_sector != 'UNKNOWN') &
+                     (current_sector.astype(str).str.strip() != ''))
 
-        for identifier_col in available_identifiers:
-            if identifier_col in result_df.columns:
-                identifier_value = row.get(identifier_col)
-
-                if (pd.notna(identifier_value) and
-                        identifier_value != '' and
-                        str(identifier_value).strip() != ''):
-
-                    identifier_key = str(identifier_value).strip()
-
-                    if (identifier_col in identifier_to_sector_maps and
-                            identifier_key in identifier_to_sector_maps[identifier_col]):
-                        found_sector = identifier_to_sector_maps[identifier_col][identifier_key]
-                        break
-
-        # Update the sector
-        if found_sector:
-            result_df.at[idx, 'sector'] = found_sector
-            filled_count += 1
-        else:
-            result_df.at[idx, 'sector'] = "UNKNOWN"
+    # Try to find a sector using available identifiers (in priority order)
+    found_sector = pd.Series(np.nan, index=result_df.index, dtype=object)
+    for identifier_col in available_identifiers:
+        identifier_value = result_df[identifier_col]
+        identifier_key = identifier_value.astype(str).str.strip()
+        usable = identifier_value.notna() & (identifier_value != '') & (identifier_key != '')
+        candidate = identifier_key.where(usable).map(identifier_to_sector_maps[identifier_col])
+        found_sector = found_sector.where(found_sector.notna(), candidate)
+
+    # Update the sector
+    found_sector = found_sector.where(found_sector.notna() & (found_sector != ''), "UNKNOWN")
+    filled_count = int((needs_sector & (found_sector != "UNKNOWN")).sum())
+    result_df.loc[needs_sector, 'sector'] = found_sector[needs_sector]
 
     # Final cleanup: ensure any remaining null/empty values are set to "UNKNOWN"
     result_df['sector'] = result_df['sector'].fillna("UNKNOWN")